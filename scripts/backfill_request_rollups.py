@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Backfill the request rollup tables from chat_completion_requests.
+
+Run once after applying supabase/migrations/20261019000000_add_request_rollups.sql
+to build minute/hour/day rollups for existing history, then set
+REQUEST_ROLLUPS_READ_ENABLED=true so the analytics endpoints read them. Live
+traffic keeps the rollups current from then on; the hourly maintenance job only
+repairs the most recent hours.
+
+The window is rebuilt one UTC day at a time (each day is one
+``rebuild_request_rollups`` transaction), oldest first, so an interrupted run
+can be resumed with ``--since`` set to the last day it reported. Rebuilding a
+day that is already correct is harmless. Buckets that closed less than 5
+minutes ago are left to live traffic.
+
+Minute and hour rows older than their retention are pruned afterwards, so a
+long backfill only keeps day rows for old history.
+
+Usage:
+    python scripts/backfill_request_rollups.py --since 2025-12-26
+    python scripts/backfill_request_rollups.py --since 30d
+    python scripts/backfill_request_rollups.py --since 2026-01-01 --until 2026-02-01
+
+Requires SUPABASE_URL + a service-role key in the environment.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.db.request_rollups import (  # noqa: E402
+    floor_bucket,
+    parse_timestamp,
+    prune_rollups,
+    rebuild_rollups,
+)
+
+_REL_RE = re.compile(r"^(\d+)\s*([dh])$")  # "30d", "12h"
+
+
+def _parse_when(value: str, *, now: datetime) -> datetime:
+    """Parse an absolute ISO timestamp/date or a relative '<N>d'/'<N>h'."""
+    m = _REL_RE.match(value.strip())
+    if m:
+        n, unit = int(m.group(1)), m.group(2)
+        return now - (timedelta(days=n) if unit == "d" else timedelta(hours=n))
+    return parse_timestamp(value)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--since", required=True, help="ISO date/timestamp or relative '<N>d'/'<N>h'"
+    )
+    parser.add_argument("--until", default=None, help="ISO date/timestamp (default: now)")
+    parser.add_argument("--no-prune", action="store_true", help="keep expired minute/hour rows")
+    args = parser.parse_args()
+
+    now = datetime.now(UTC)
+    day = floor_bucket(_parse_when(args.since, now=now), "day")
+    until = _parse_when(args.until, now=now) if args.until else now
+
+    total_rows = 0
+    while day < until:
+        next_day = min(day + timedelta(days=1), until)
+        started = time.monotonic()
+        rows = rebuild_rollups(day, next_day)
+        total_rows += rows
+        print(f"{day.date()}  {rows:>8} rollup rows  ({time.monotonic() - started:.1f}s)")
+        day = next_day
+
+    print(f"Rebuilt {total_rows} rollup rows")
+    if not args.no_prune:
+        print(f"Pruned expired rows: {prune_rollups(now)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Latency of the per-request Redis stages, sync-in-thread vs the async client.
+
+Each simulated request does what the gateway does against Redis on its hot
+path: the security middleware's IP limit (INCR + EXPIRE) and the metrics
+record (counters, latency sketch, clamped health score), both through
+``redis_pipeline``. Requests run concurrently, first with
+``REDIS_ASYNC_ENABLED`` off (sync client in ``asyncio.to_thread``), then on.
+p50/p99 are reported per stage.
+
+Without ``--redis-url`` the script starts a fake RESP server in a child
+process that answers the handful of commands used, adding ``--rtt-ms`` per
+round-trip to stand in for the network.
+
+Usage:
+    python scripts/performance/bench_redis_hot_path.py
+    python scripts/performance/bench_redis_hot_path.py --requests 5000 --concurrency 500
+    python scripts/performance/bench_redis_hot_path.py --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+# --- fake server -----------------------------------------------------------
+
+
+class FakeRedis:
+    """Just enough Redis for the benchmarked commands (RESP2, one database)."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.data: dict[str, object] = {}
+
+    def run(self, cmd: list[str]):
+        name, args = cmd[0].upper(), cmd[1:]
+        if name in ("INCR", "INCRBY", "HINCRBY"):
+            key = args[0] if name != "HINCRBY" else (args[0], args[1])
+            amount = int(args[-1]) if name != "INCR" else 1
+            self.data[key] = int(self.data.get(key, 0)) + amount
+            return self.data[key]
+        if name == "HINCRBYFLOAT":
+            key = (args[0], args[1])
+            self.data[key] = float(self.data.get(key, 0)) + float(args[2])
+            return str(self.data[key])
+        if name in ("EXPIRE", "LPUSH", "ZADD"):
+            return 1
+        if name == "EVAL":  # the clamped health-score script
+            return "100"
+        if name == "PING":
+            return "+PONG"
+        return "+OK"  # CLIENT SETINFO, SELECT, LTRIM, SETEX, ...
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        queued, replies = None, []
+        try:
+            while True:
+                cmd = await _read_command(reader)
+                if cmd is None:
+                    break
+                name = cmd[0].upper()
+                if name == "MULTI":
+                    queued, reply = [], "+OK"
+                elif name == "EXEC":
+                    reply, queued = [self.run(c) for c in queued or []], None
+                elif queued is not None:
+                    queued.append(cmd)
+                    reply = "+QUEUED"
+                else:
+                    reply = self.run(cmd)
+                replies.append(_encode(reply))
+                if not reader._buffer:  # end of the client's batch: one round-trip
+                    await asyncio.sleep(self.rtt)
+                    writer.write(b"".join(replies))
+                    replies.clear()
+                    await writer.drain()
+        finally:
+            writer.close()
+
+
+async def _read_command(reader: asyncio.StreamReader) -> list[str] | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readline())[1:])
+        parts.append((await reader.readexactly(size + 2))[:-2].decode())
+    return parts
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if value.startswith("+"):
+        return value.encode() + b"\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value.encode())
+
+
+def _serve_forever(rtt: float, port_out) -> None:
+    async def main():
+        server = await asyncio.start_server(FakeRedis(rtt).serve, "127.0.0.1", 0)
+        port_out.send(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def start_fake_server(rtt: float) -> str:
+    # A separate process, so the server does not compete for the client's GIL
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    multiprocessing.Process(target=_serve_forever, args=(rtt, sender), daemon=True).start()
+    return f"redis://127.0.0.1:{receiver.recv()}/0"
+
+
+# --- workload ----------------------------------------------------------------
+
+
+async def _one_request(client, metrics, i: int, timings: dict[str, list[float]]) -> None:
+    from src.config.redis_config import redis_pipeline
+
+    key = f"sec_rl:ip:10.0.{i % 256}.{i % 7}:0"
+    start = time.perf_counter()
+    await redis_pipeline(client, lambda pipe: pipe.incr(key).expire(key, 120))
+    timings["security_limit"].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await metrics.record_request("openrouter", f"model-{i % 20}", 420, i % 10 != 0, 0.001, 50, 20)
+    timings["metrics_record"].append(time.perf_counter() - start)
+
+
+async def _run(requests: int, concurrency: int) -> dict[str, list[float]]:
+    from src.config.redis_config import close_async_redis_client, get_redis_client
+    from src.services.redis_metrics import RedisMetrics
+
+    client = get_redis_client()
+    metrics = RedisMetrics(client)
+    timings = {"security_limit": [], "metrics_record": []}
+    gate = asyncio.Semaphore(concurrency)
+
+    async def bounded(i):
+        async with gate:
+            await _one_request(client, metrics, i, timings)
+
+    await asyncio.gather(*(bounded(i) for i in range(requests)))
+    await close_async_redis_client()
+    return timings
+
+
+def _pct(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="fake server round-trip")
+    parser.add_argument("--redis-url", help="benchmark a real server instead of the fake")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.environ["REDIS_URL"] = args.redis_url or start_fake_server(args.rtt_ms / 1000)
+
+    from src.config import Config
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {os.environ['REDIS_URL']}")
+    print(f"{'mode':<8} {'stage':<16} {'p50 ms':>8} {'p99 ms':>8}")
+    for enabled in (False, True):
+        Config.REDIS_ASYNC_ENABLED = enabled
+        mode = "async" if enabled else "thread"
+        for stage, values in asyncio.run(_run(args.requests, args.concurrency)).items():
+            print(f"{mode:<8} {stage:<16} {_pct(values, 50):>8.2f} {_pct(values, 99):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -143,6 +143,10 @@ class OpenAIChatAdapter(BaseChatAdapter):
             "output_cost_usd": round(internal_response.output_cost_usd, 6),
         }
 
+        # Served from the gateway's response cache (billed at the cache-hit rate)
+        if getattr(internal_response, "response_cache", None):
+            response["gateway_usage"]["response_cache"] = internal_response.response_cache
+
         # Add processing time if available
         if internal_response.processing_time_ms:
             response["gateway_usage"]["processing_time_ms"] = internal_response.processing_time_ms
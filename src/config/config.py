@@ -143,6 +143,15 @@ class Config:
     ENABLE_LEDGER_RECONCILIATION = os.environ.get(
         "ENABLE_LEDGER_RECONCILIATION", str(CREDIT_LEDGER_SHADOW_ENABLED)
     ).lower() in {"1", "true", "yes"}
+    # Single-RPC request settlement: deduction, credit_transactions, usage_records,
+    # rate_limit_usage, shadow ledger and the chat_completion_requests row in one
+    # idempotent settle_request() call keyed by request id. Off by default until
+    # migration 20261018000001 is applied; the multi-call path remains the fallback.
+    SETTLE_REQUEST_RPC_ENABLED = os.environ.get("SETTLE_REQUEST_RPC_ENABLED", "false").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
     LEDGER_RECONCILIATION_INTERVAL_MINUTES = int(
         os.environ.get("LEDGER_RECONCILIATION_INTERVAL_MINUTES", "360")
     )
@@ -183,6 +192,49 @@ class Config:
     # "balanced" / "latency" / "quality" trade margin for latency/quality.
     SMART_ROUTER_POLICY = os.environ.get("SMART_ROUTER_POLICY", "cost").strip().lower()
 
+    # Hedged provider requests (src/services/provider_hedging.py). Opt-in: when
+    # enabled, an authenticated non-streaming request also goes to the second
+    # provider in its failover chain once the first has been slower than the
+    # model's recent p95, and a streaming request races both for the first chunk.
+    # Only the winner is billed. Hedges are capped at PROVIDER_HEDGE_BUDGET_PERCENT
+    # extra upstream requests (a retry budget, not a per-request probability).
+    PROVIDER_HEDGING_ENABLED: bool = os.environ.get(
+        "PROVIDER_HEDGING_ENABLED", "false"
+    ).lower() in {"1", "true", "yes"}
+    PROVIDER_HEDGE_STREAMING_ENABLED: bool = os.environ.get(
+        "PROVIDER_HEDGE_STREAMING_ENABLED", "true"
+    ).lower() in {"1", "true", "yes"}
+    PROVIDER_HEDGE_BUDGET_PERCENT = float(os.environ.get("PROVIDER_HEDGE_BUDGET_PERCENT", "5"))
+    # Hedge delay used until a model has enough latency samples for a p95
+    PROVIDER_HEDGE_DEFAULT_DELAY_MS = int(os.environ.get("PROVIDER_HEDGE_DEFAULT_DELAY_MS", "3000"))
+    PROVIDER_HEDGE_MIN_DELAY_MS = int(os.environ.get("PROVIDER_HEDGE_MIN_DELAY_MS", "250"))
+
+    # Chat body fast path (src/routes/chat_body.py): plain /v1/chat/completions
+    # bodies are validated with exact type checks and their messages forwarded as
+    # decoded. Disable to run every body through the ProxyRequest model instead.
+    CHAT_FAST_PARSE_ENABLED: bool = os.environ.get("CHAT_FAST_PARSE_ENABLED", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+
+    # Exact-match response cache (src/services/cache/response_cache.py). Opt-in:
+    # when enabled, deterministic chat requests (temperature 0 or a seed, no
+    # tools, n=1) are answered from a per-user cache, and identical concurrent
+    # requests share one upstream call. Clients can bypass it per request with
+    # "Cache-Control: no-cache". A hit is billed at RESPONSE_CACHE_HIT_COST_FACTOR
+    # times the normal price (0 = free, 1 = full price).
+    RESPONSE_CACHE_ENABLED: bool = os.environ.get("RESPONSE_CACHE_ENABLED", "false").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+    RESPONSE_CACHE_MAX_BYTES = int(
+        os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    RESPONSE_CACHE_HIT_COST_FACTOR = float(os.environ.get("RESPONSE_CACHE_HIT_COST_FACTOR", "0"))
+
     # Auto-routing Phase 2 — task classifier (src/services/task_classifier.py).
     # Cheap/fast model used ONLY for the internal task_type + reasoning-needed
     # judgment call, never for serving the user's actual request. "gpt-4o-mini"
@@ -262,6 +314,25 @@ class Config:
     SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
     # Optional direct Postgres connection string for maintenance tasks
     SUPABASE_DB_DSN = os.environ.get("SUPABASE_DB_DSN")
+    # Native async PostgREST client (src/db/async_client.py): one pooled
+    # httpx.AsyncClient per event loop. When enabled, the hot paths (request
+    # principal, plan checks, settlement, request records, health flushes) await
+    # it instead of running the sync client in asyncio.to_thread.
+    SUPABASE_ASYNC_ENABLED: bool = os.environ.get("SUPABASE_ASYNC_ENABLED", "false").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    SUPABASE_ASYNC_HTTP2: bool = os.environ.get("SUPABASE_ASYNC_HTTP2", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    SUPABASE_ASYNC_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_ASYNC_MAX_CONNECTIONS", "100"))
+    # Identical concurrent reads share one in-flight request
+    SUPABASE_ASYNC_COALESCE_READS: bool = os.environ.get(
+        "SUPABASE_ASYNC_COALESCE_READS", "true"
+    ).lower() in {"1", "true", "yes"}
 
     # OpenRouter Configuration
     OPENROUTER_API_KEY = _get_env_var("OPENROUTER_API_KEY")
@@ -306,6 +377,24 @@ class Config:
 
     # Tavily Web Search Configuration
     TAVILY_API_KEY = os.environ.get("TAVILY_API_KEY")
+    # Normalized-query result cache for web_search (src/services/cache/web_search_cache.py).
+    # TTLs are per search depth: "basic" answers go stale faster than the
+    # comprehensive "advanced" crawl, and both are short because the whole point
+    # of auto web search is fresh information.
+    WEB_SEARCH_CACHE_ENABLED = os.environ.get("WEB_SEARCH_CACHE_ENABLED", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    WEB_SEARCH_CACHE_TTL_BASIC = int(os.environ.get("WEB_SEARCH_CACHE_TTL_BASIC", "120"))
+    WEB_SEARCH_CACHE_TTL_ADVANCED = int(os.environ.get("WEB_SEARCH_CACHE_TTL_ADVANCED", "300"))
+    WEB_SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("WEB_SEARCH_CACHE_MAX_ENTRIES", "2000"))
+    # Start the auto web search as soon as the query classifier fires, before
+    # auth/plan checks finish. Off by default: a request that then fails auth
+    # has still spent one Tavily call (its result is cached for the next caller).
+    WEB_SEARCH_PREFETCH_ENABLED = os.environ.get(
+        "WEB_SEARCH_PREFETCH_ENABLED", "false"
+    ).lower() in {"1", "true", "yes"}
 
     # Alibaba Cloud Configuration
     ALIBABA_CLOUD_API_KEY = os.environ.get("ALIBABA_CLOUD_API_KEY")
@@ -379,6 +468,11 @@ class Config:
     # Maximum total credits an admin can grant in a 24-hour rolling window (default $5000)
     ADMIN_DAILY_GRANT_LIMIT: float = float(os.environ.get("ADMIN_DAILY_GRANT_LIMIT", "5000"))
 
+    # Admin Exports
+    # Rows fetched per keyset page when streaming ledger / request-log exports.
+    # Memory and per-page latency stay bounded by this, whatever the export size.
+    ADMIN_EXPORT_BATCH_SIZE = int(os.environ.get("ADMIN_EXPORT_BATCH_SIZE", "1000"))
+
     # GZip Compression Configuration
     # Minimum response size (bytes) before GZip compression is applied.
     # 1 KB (1024 bytes) is a reasonable floor: below this the gzip header overhead
@@ -410,15 +504,47 @@ class Config:
         "true",
         "yes",
     }
+    # Comma-separated; each destination gets its own queue and sender thread
     PROMETHEUS_REMOTE_WRITE_URL = os.environ.get(
         "PROMETHEUS_REMOTE_WRITE_URL",
         "http://prometheus:9090/api/v1/write",
     )
+    # Remote write ships only series that changed since their last push, plus
+    # every series at least once per RESEND_SECONDS so none go stale (Prometheus
+    # treats a series as gone after 5 minutes without samples). Batches hold at
+    # most MAX_SAMPLES_PER_SEND samples; at most MAX_PENDING_BATCHES wait per
+    # destination, and are kept in WAL_DIR until accepted ("" keeps them in
+    # memory only).
+    PROMETHEUS_REMOTE_WRITE_INTERVAL_SECONDS = float(
+        os.environ.get("PROMETHEUS_REMOTE_WRITE_INTERVAL_SECONDS", "30")
+    )
+    PROMETHEUS_REMOTE_WRITE_RESEND_SECONDS = float(
+        os.environ.get("PROMETHEUS_REMOTE_WRITE_RESEND_SECONDS", "240")
+    )
+    PROMETHEUS_REMOTE_WRITE_MAX_SAMPLES_PER_SEND = int(
+        os.environ.get("PROMETHEUS_REMOTE_WRITE_MAX_SAMPLES_PER_SEND", "2000")
+    )
+    PROMETHEUS_REMOTE_WRITE_MAX_PENDING_BATCHES = int(
+        os.environ.get("PROMETHEUS_REMOTE_WRITE_MAX_PENDING_BATCHES", "100")
+    )
+    PROMETHEUS_REMOTE_WRITE_WAL_DIR = os.environ.get(
+        "PROMETHEUS_REMOTE_WRITE_WAL_DIR", str(_data_dir / "remote_write")
+    )
     PROMETHEUS_SCRAPE_ENABLED = os.environ.get("PROMETHEUS_SCRAPE_ENABLED", "true").lower() in {
         "1",
         "true",
         "yes",
     }
+    # Cardinality governor for the ``model`` label: only the top-K models by
+    # traffic keep exact series; the long tail is folded into model="other".
+    PROMETHEUS_MODEL_LABEL_GOVERNOR_ENABLED = os.environ.get(
+        "PROMETHEUS_MODEL_LABEL_GOVERNOR_ENABLED", "true"
+    ).lower() in {"1", "true", "yes"}
+    PROMETHEUS_MODEL_LABEL_TOP_K = int(os.environ.get("PROMETHEUS_MODEL_LABEL_TOP_K", "250"))
+    # How often the governor re-ranks models by recent traffic
+    PROMETHEUS_MODEL_LABEL_RERANK_SECONDS = int(
+        os.environ.get("PROMETHEUS_MODEL_LABEL_RERANK_SECONDS", "300")
+    )
 
     # Tempo/OpenTelemetry OTLP Configuration
     # Hard-defaulted off as part of cost reduction; consumers no-op when false.
@@ -495,11 +621,149 @@ class Config:
     REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", "50"))
     REDIS_SOCKET_TIMEOUT = int(os.environ.get("REDIS_SOCKET_TIMEOUT", "5"))
     REDIS_SOCKET_CONNECT_TIMEOUT = int(os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", "5"))
+    # redis.asyncio client on one shared pool per event loop (redis_config).
+    # When enabled, the hot paths (security limits, metrics, circuit breaker,
+    # catalog cache) await it instead of running the sync client in to_thread.
+    REDIS_ASYNC_ENABLED: bool = os.environ.get("REDIS_ASYNC_ENABLED", "false").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
 
-    # Concurrency Control (global server-level admission gate)
+    # Concurrency Control (server-level admission gate, split into lanes below)
     CONCURRENCY_LIMIT = int(os.environ.get("CONCURRENCY_LIMIT", "20"))
     CONCURRENCY_QUEUE_SIZE = int(os.environ.get("CONCURRENCY_QUEUE_SIZE", "50"))
     CONCURRENCY_QUEUE_TIMEOUT = float(os.environ.get("CONCURRENCY_QUEUE_TIMEOUT", "10.0"))
+    # Per-lane ceilings. By default they split CONCURRENCY_LIMIT (the size of the
+    # old single gate) 40/30/20/10 between streaming, inference, catalog and
+    # admin, so the lanes together admit no more requests than before; streams
+    # hold their slot for the whole response, so that lane gets the largest share.
+    # CONCURRENCY_QUEUE_SIZE is split between the lane queues in the same ratio.
+    CONCURRENCY_STREAMING_LIMIT = int(
+        os.environ.get("CONCURRENCY_STREAMING_LIMIT", str(max(1, CONCURRENCY_LIMIT * 4 // 10)))
+    )
+    CONCURRENCY_INFERENCE_LIMIT = int(
+        os.environ.get("CONCURRENCY_INFERENCE_LIMIT", str(max(1, CONCURRENCY_LIMIT * 3 // 10)))
+    )
+    CONCURRENCY_CATALOG_LIMIT = int(
+        os.environ.get("CONCURRENCY_CATALOG_LIMIT", str(max(1, CONCURRENCY_LIMIT * 2 // 10)))
+    )
+    CONCURRENCY_ADMIN_LIMIT = int(
+        os.environ.get(
+            "CONCURRENCY_ADMIN_LIMIT",
+            str(max(1, CONCURRENCY_LIMIT - CONCURRENCY_LIMIT * 9 // 10)),
+        )
+    )
+    # Adapt each lane's limit (up to its ceiling) from observed latency
+    CONCURRENCY_ADAPTIVE_ENABLED = os.environ.get(
+        "CONCURRENCY_ADAPTIVE_ENABLED", "true"
+    ).lower() in {"1", "true", "yes"}
+    CONCURRENCY_MIN_LIMIT = int(os.environ.get("CONCURRENCY_MIN_LIMIT", "2"))
+
+    # Streaming SSE coalescing window (ms). When sending a frame to the client
+    # stalls for longer than this, content deltas arriving within one window are
+    # merged into a single frame until the client catches up. 0 disables it.
+    STREAM_COALESCE_WINDOW_MS = float(os.environ.get("STREAM_COALESCE_WINDOW_MS", "5"))
+
+    # Multi-worker mode. start.sh runs WORKERS uvicorn workers per container;
+    # with more than one, metrics are aggregated through PROMETHEUS_MULTIPROC_DIR,
+    # cluster-wide background jobs run only on the worker holding the Redis
+    # leader lease (src/services/leader_election.py), and the local catalog tier
+    # is backed by per-key snapshot files shared by the workers, so a catalog is
+    # fetched once per container rather than once per worker.
+    WORKERS = max(1, int(os.environ.get("WORKERS", "1")))
+    MULTI_WORKER_MODE = WORKERS > 1
+    LEADER_LEASE_TTL_SECONDS = float(os.environ.get("LEADER_LEASE_TTL_SECONDS", "30"))
+    CATALOG_SNAPSHOT_PATH = os.environ.get(
+        "CATALOG_SNAPSHOT_PATH",
+        (
+            "/dev/shm/gatewayz-catalog.snapshot"
+            if os.path.isdir("/dev/shm")
+            else str(_data_dir / "catalog.snapshot")
+        ),
+    )
+
+    # Cold-start snapshot (src/services/cache/boot_snapshot.py). Every successful
+    # sync records the full catalog, model mappings, capabilities and pricing
+    # index on local disk; boot restores them before the warmup reconciles with
+    # the database. Snapshots older than the max age are ignored.
+    BOOT_SNAPSHOT_ENABLED = os.environ.get("BOOT_SNAPSHOT_ENABLED", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    BOOT_SNAPSHOT_PATH = os.environ.get("BOOT_SNAPSHOT_PATH", str(_data_dir / "boot.snapshot"))
+    BOOT_SNAPSHOT_MAX_AGE_SECONDS = float(os.environ.get("BOOT_SNAPSHOT_MAX_AGE_SECONDS", "86400"))
+
+    # Post-completion work queue (src/services/post_completion_queue.py). Billing
+    # and analytics that run after a completion is returned go through a bounded
+    # queue served by a fixed worker pool, billing first. The billing fields of
+    # each job (ids and token counts, no keys or content) are journaled to a
+    # spill file in POST_COMPLETION_SPILL_DIR and replayed after a restart;
+    # shutdown drains for up to POST_COMPLETION_DRAIN_SECONDS.
+    POST_COMPLETION_QUEUE_ENABLED = os.environ.get(
+        "POST_COMPLETION_QUEUE_ENABLED", "true"
+    ).lower() in {"1", "true", "yes"}
+    POST_COMPLETION_QUEUE_SIZE = int(os.environ.get("POST_COMPLETION_QUEUE_SIZE", "5000"))
+    POST_COMPLETION_WORKERS = int(os.environ.get("POST_COMPLETION_WORKERS", "16"))
+    POST_COMPLETION_DRAIN_SECONDS = float(os.environ.get("POST_COMPLETION_DRAIN_SECONDS", "20"))
+    POST_COMPLETION_SPILL_DIR = os.environ.get(
+        "POST_COMPLETION_SPILL_DIR", str(_data_dir / "post_completion")
+    )
+
+    # Audio transcription splitting (src/routes/audio.py). When enabled, PCM WAV
+    # uploads up to AUDIO_MAX_UPLOAD_BYTES are accepted, cut at silence into
+    # chunks of at most AUDIO_SPLIT_TARGET_SECONDS and transcribed with up to
+    # AUDIO_SPLIT_CONCURRENCY parallel Whisper requests. Other formats keep the
+    # 25MB single-request limit.
+    AUDIO_SPLIT_ENABLED = os.environ.get("AUDIO_SPLIT_ENABLED", "false").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    AUDIO_SPLIT_TARGET_SECONDS = float(os.environ.get("AUDIO_SPLIT_TARGET_SECONDS", "600"))
+    AUDIO_SPLIT_CONCURRENCY = int(os.environ.get("AUDIO_SPLIT_CONCURRENCY", "4"))
+    AUDIO_MAX_UPLOAD_BYTES = int(os.environ.get("AUDIO_MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+
+    # Local Chatterbox TTS (src/services/providers/chatterbox_tts_client.py). Each
+    # model is loaded once and stays resident; CHATTERBOX_WARMUP_MODELS are loaded
+    # at startup instead of on first use. Synthesis runs on
+    # CHATTERBOX_INFERENCE_WORKERS threads and at most CHATTERBOX_MAX_QUEUED
+    # further requests wait; beyond that requests are rejected.
+    CHATTERBOX_WARMUP_MODELS: tuple[str, ...] = tuple(
+        s.strip() for s in os.environ.get("CHATTERBOX_WARMUP_MODELS", "").split(",") if s.strip()
+    )
+    CHATTERBOX_INFERENCE_WORKERS = int(os.environ.get("CHATTERBOX_INFERENCE_WORKERS", "1"))
+    CHATTERBOX_MAX_QUEUED = int(os.environ.get("CHATTERBOX_MAX_QUEUED", "8"))
+
+    # Request rollups (src/services/request_rollups.py, src/db/request_rollups.py).
+    # Every recorded request is folded into minute/hour/day aggregates that are
+    # flushed every REQUEST_ROLLUPS_FLUSH_SECONDS; a leader job rebuilds the last
+    # REQUEST_ROLLUPS_REBUILD_HOURS from chat_completion_requests and prunes fine
+    # grains past their retention. Analytics endpoints read the rollups only once
+    # REQUEST_ROLLUPS_READ_ENABLED is set, i.e. after the history has been
+    # backfilled with scripts/backfill_request_rollups.py.
+    REQUEST_ROLLUPS_ENABLED = os.environ.get("REQUEST_ROLLUPS_ENABLED", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    REQUEST_ROLLUPS_READ_ENABLED = os.environ.get(
+        "REQUEST_ROLLUPS_READ_ENABLED", "false"
+    ).lower() in {"1", "true", "yes"}
+    REQUEST_ROLLUPS_FLUSH_SECONDS = float(os.environ.get("REQUEST_ROLLUPS_FLUSH_SECONDS", "10"))
+    # Distinct (minute, model, user) keys held between flushes
+    REQUEST_ROLLUPS_MAX_KEYS = int(os.environ.get("REQUEST_ROLLUPS_MAX_KEYS", "20000"))
+    REQUEST_ROLLUPS_MAINTENANCE_INTERVAL_MINUTES = int(
+        os.environ.get("REQUEST_ROLLUPS_MAINTENANCE_INTERVAL_MINUTES", "60")
+    )
+    REQUEST_ROLLUPS_REBUILD_HOURS = int(os.environ.get("REQUEST_ROLLUPS_REBUILD_HOURS", "2"))
+    REQUEST_ROLLUPS_MINUTE_RETENTION_DAYS = int(
+        os.environ.get("REQUEST_ROLLUPS_MINUTE_RETENTION_DAYS", "7")
+    )
+    REQUEST_ROLLUPS_HOUR_RETENTION_DAYS = int(
+        os.environ.get("REQUEST_ROLLUPS_HOUR_RETENTION_DAYS", "90")
+    )
 
     # Pricing Sync Scheduler Configuration - DEPRECATED 2026-02 (Phase 3, Issue #1063)
     # Pricing is now synced via model sync (model_catalog_sync.py)
@@ -548,6 +812,40 @@ class Config:
         "yes",
     }
 
+    # Public status page snapshot (src/services/monitoring/status_snapshot.py).
+    # The /v1/status endpoints are served from pre-rendered JSON bytes rebuilt
+    # every STATUS_SNAPSHOT_REFRESH_SECONDS, or sooner when an incident opens or
+    # resolves, so status-page traffic never reaches the database.
+    STATUS_SNAPSHOT_ENABLED: bool = os.environ.get("STATUS_SNAPSHOT_ENABLED", "true").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    STATUS_SNAPSHOT_REFRESH_SECONDS = float(os.environ.get("STATUS_SNAPSHOT_REFRESH_SECONDS", "30"))
+    STATUS_SNAPSHOT_MAX_MODELS = int(os.environ.get("STATUS_SNAPSHOT_MAX_MODELS", "5000"))
+    STATUS_SNAPSHOT_MAX_INCIDENTS = int(os.environ.get("STATUS_SNAPSHOT_MAX_INCIDENTS", "500"))
+    STATUS_SSE_MAX_SUBSCRIBERS = int(os.environ.get("STATUS_SSE_MAX_SUBSCRIBERS", "500"))
+
+    # Routing metadata snapshots (src/services/cache/refreshable_snapshot.py).
+    # Model mappings, capabilities, manual pricing and the OpenRouter price index
+    # are rebuilt by a background task and swapped in whole, so no request waits
+    # on a reload. Disabled, a stale table is reloaded inline by the request that
+    # finds it.
+    ROUTING_SNAPSHOT_REFRESHER_ENABLED: bool = os.environ.get(
+        "ROUTING_SNAPSHOT_REFRESHER_ENABLED", "true"
+    ).lower() in {"1", "true", "yes"}
+
+    # Passive health aggregation (src/services/monitoring/passive_health_aggregator.py).
+    # Per-request health samples are accumulated per (provider, model) in memory
+    # and flushed as one bulk upsert every PASSIVE_HEALTH_FLUSH_SECONDS, instead
+    # of a select + upsert on model_health_tracking for every request.
+    PASSIVE_HEALTH_AGGREGATION_ENABLED: bool = os.environ.get(
+        "PASSIVE_HEALTH_AGGREGATION_ENABLED", "true"
+    ).lower() in {"1", "true", "yes"}
+    PASSIVE_HEALTH_FLUSH_SECONDS = float(os.environ.get("PASSIVE_HEALTH_FLUSH_SECONDS", "5"))
+    # Distinct pairs held between flushes; reaching it triggers an early flush
+    PASSIVE_HEALTH_MAX_PAIRS = int(os.environ.get("PASSIVE_HEALTH_MAX_PAIRS", "2000"))
+
     # How often to sync models from provider APIs (in minutes)
     # Recommended: 15-30 minutes for balance between freshness and API rate limits
     MODEL_SYNC_INTERVAL_MINUTES: int = int(os.environ.get("MODEL_SYNC_INTERVAL_MINUTES", "30"))
@@ -649,6 +947,27 @@ class Config:
         "true",
         "yes",
     )
+    # Resolved BYOK keys are cached per (user, provider), sealed with a
+    # process-local key, for BYOK_KEY_CACHE_TTL_SECONDS; "no key" answers for
+    # BYOK_NEGATIVE_CACHE_TTL_SECONDS. Upserts and deletes invalidate every
+    # worker's cache (via a Redis epoch) within a few seconds; while Redis is
+    # unreachable, entries are trusted for only those few seconds instead.
+    BYOK_KEY_CACHE_TTL_SECONDS = float(os.environ.get("BYOK_KEY_CACHE_TTL_SECONDS", "60"))
+    BYOK_NEGATIVE_CACHE_TTL_SECONDS = float(
+        os.environ.get("BYOK_NEGATIVE_CACHE_TTL_SECONDS", "300")
+    )
+    BYOK_KEY_CACHE_MAX_ENTRIES = int(os.environ.get("BYOK_KEY_CACHE_MAX_ENTRIES", "10000"))
+
+    # Per-request principal snapshot (src/services/request_principal.py). When
+    # enabled, the chat path loads key + user + plan + usage + rate-limit config
+    # + routing policy + BYOK presence through ONE get_request_principal RPC and
+    # the per-piece accessors read from that cached snapshot. Off by default
+    # until the migration (20261018000000) is applied everywhere.
+    REQUEST_PRINCIPAL_ENABLED: bool = os.environ.get(
+        "REQUEST_PRINCIPAL_ENABLED", "false"
+    ).strip().lower() in ("1", "true", "yes")
+    REQUEST_PRINCIPAL_TTL_SECONDS = float(os.environ.get("REQUEST_PRINCIPAL_TTL_SECONDS", "15"))
+    REQUEST_PRINCIPAL_MAX_ENTRIES = int(os.environ.get("REQUEST_PRINCIPAL_MAX_ENTRIES", "10000"))
 
     # Pricing Sync Configuration - DEPRECATED 2026-02 (Phase 3, Issue #1063)
     # Pricing is now synced via model sync (model_catalog_sync.py)
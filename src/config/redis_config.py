@@ -2,18 +2,71 @@
 """
 Redis Configuration Module
 Handles Redis connection and configuration for rate limiting and caching.
+
+Besides the process-wide sync client, each event loop can get a
+``redis.asyncio`` client on its own shared pool (``get_async_redis_client``).
+Async callers go through :func:`redis_pipeline` / :func:`redis_command` with
+the sync client they were given: when that is the process-wide client and
+``Config.REDIS_ASYNC_ENABLED`` is set, the work runs on the async pool with no
+thread hop; otherwise (flag off, or an injected client such as a test double)
+it runs the sync client in ``asyncio.to_thread`` as before.
 """
 
+import asyncio
 import logging
 import os
 import threading
+import weakref
+from collections.abc import Callable
+from typing import Any
 
 import redis
+import redis.asyncio as aioredis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
 from redis.connection import ConnectionPool
 
+from src.config.config import Config
+
 logger = logging.getLogger(__name__)
 
 
+class _WaitingConnectionPool(aioredis.ConnectionPool):
+    """Async pool that waits for a free connection instead of raising.
+
+    redis-py's ``BlockingConnectionPool`` holds its lock while a new connection
+    connects, so a cold pool under a burst opens connections one at a time;
+    here callers only queue for a slot and connect concurrently.
+    """
+
+    def __init__(self, *args, timeout: float | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._slots = asyncio.Semaphore(self.max_connections)
+        self._slot_timeout = timeout
+
+    async def get_connection(self, command_name, *keys, **options):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._slot_timeout)
+        except TimeoutError:
+            raise redis.exceptions.ConnectionError("No connection available.") from None
+
+        try:
+            connection = self._available_connections.pop()
+        except IndexError:
+            connection = self.make_connection()
+        self._in_use_connections.add(connection)
+        try:
+            await self.ensure_connection(connection)
+        except BaseException:
+            await self.release(connection)
+            raise
+        return connection
+
+    async def release(self, connection) -> None:
+        await super().release(connection)
+        self._slots.release()
+
+
 class RedisConfig:
     """Redis configuration and connection management"""
 
@@ -37,6 +90,9 @@ class RedisConfig:
         self.redis_retry_on_timeout = (
             os.environ.get("REDIS_RETRY_ON_TIMEOUT", "false").lower() == "true"
         )
+        # PING a pooled connection that has idled this long before reusing it, so
+        # a connection the server or a proxy dropped is replaced instead of failing
+        self.redis_health_check_interval = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", "30"))
 
         self._client: redis.Redis | None = None
         self._pool: ConnectionPool | None = None
@@ -49,41 +105,62 @@ class RedisConfig:
         self._available_cached_at: float = 0.0
         self._available_cache_ttl: float = 30.0  # seconds
 
+    def _connection_kwargs(self) -> dict[str, Any]:
+        """Pool settings shared by the sync and async pools."""
+        return {
+            "max_connections": self.redis_max_connections,
+            "socket_timeout": self.redis_socket_timeout,
+            "socket_connect_timeout": self.redis_socket_connect_timeout,
+            "retry_on_timeout": self.redis_retry_on_timeout,
+            "health_check_interval": self.redis_health_check_interval,
+            "decode_responses": True,
+        }
+
+    def _build_pool(self, pool_class, **extra):
+        connection_kwargs = {**self._connection_kwargs(), **extra}
+        # Parse Redis URL if it contains connection details
+        if self.redis_url and "://" in self.redis_url:
+            # Use URL-based connection for Redis Cloud (Upstash, Railway, etc.)
+            # For Upstash with TLS (rediss://), we need to disable SSL cert verification
+            if self.redis_url.startswith("rediss://"):
+                connection_kwargs["ssl_cert_reqs"] = None  # Don't verify SSL cert
+
+            return pool_class.from_url(self.redis_url, **connection_kwargs)
+
+        # Use individual parameters for local Redis
+        return pool_class(
+            host=self.redis_host,
+            port=self.redis_port,
+            db=self.redis_db,
+            password=self.redis_password,
+            **connection_kwargs,
+        )
+
     def get_connection_pool(self) -> ConnectionPool:
         """Get Redis connection pool"""
         if self._pool is None:
-            # Parse Redis URL if it contains connection details
-            if self.redis_url and "://" in self.redis_url:
-                # Use URL-based connection for Redis Cloud (Upstash, Railway, etc.)
-                # For Upstash with TLS (rediss://), we need to disable SSL cert verification
-                connection_kwargs = {
-                    "max_connections": self.redis_max_connections,
-                    "socket_timeout": self.redis_socket_timeout,
-                    "socket_connect_timeout": self.redis_socket_connect_timeout,
-                    "retry_on_timeout": self.redis_retry_on_timeout,
-                    "decode_responses": True,
-                }
-
-                # Add SSL configuration for rediss:// URLs (Upstash)
-                if self.redis_url.startswith("rediss://"):
-                    connection_kwargs["ssl_cert_reqs"] = None  # Don't verify SSL cert
-
-                self._pool = ConnectionPool.from_url(self.redis_url, **connection_kwargs)
-            else:
-                # Use individual parameters for local Redis
-                self._pool = ConnectionPool(
-                    host=self.redis_host,
-                    port=self.redis_port,
-                    db=self.redis_db,
-                    password=self.redis_password,
-                    max_connections=self.redis_max_connections,
-                    socket_timeout=self.redis_socket_timeout,
-                    socket_connect_timeout=self.redis_socket_connect_timeout,
-                    retry_on_timeout=self.redis_retry_on_timeout,
-                    decode_responses=True,
-                )
+            self._pool = self._build_pool(ConnectionPool)
         return self._pool
 
+    def create_async_client(self) -> aioredis.Redis:
+        """A redis.asyncio client on a new pool with the same settings.
+
+        Async pools are bound to the loop that first uses them, so callers keep
+        one per event loop (see ``get_async_redis_client``). With every
+        connection checked out, a caller waits (up to the socket timeout)
+        instead of failing with "Too many connections", which a burst of
+        coroutines would otherwise hit at once. A command that hits a dropped
+        connection is retried once on a fresh one; timeouts are not retried
+        (see the FREEZE FIX note on ``redis_retry_on_timeout``).
+        """
+        pool = self._build_pool(
+            _WaitingConnectionPool,
+            timeout=self.redis_socket_timeout,
+            retry=Retry(ExponentialBackoff(cap=0.5, base=0.05), retries=1),
+            retry_on_error=[redis.exceptions.ConnectionError],
+        )
+        return aioredis.Redis(connection_pool=pool)
+
     def get_client(self) -> redis.Redis:
         """Get Redis client instance"""
         if self._client is None:
@@ -349,3 +426,78 @@ def is_redis_available() -> bool:
 def get_redis_manager() -> RedisConfig:
     """Get Redis manager instance (alias for get_redis_config)"""
     return get_redis_config()
+
+
+# Event loop -> its async client (each owns one shared connection pool)
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_redis_client() -> aioredis.Redis | None:
+    """Get the async Redis client for the running event loop.
+
+    Returns None when ``Config.REDIS_ASYNC_ENABLED`` is off or the sync client
+    has not connected (Redis not configured). Never blocks: it does not retry
+    the sync client's connection.
+    """
+    if not Config.REDIS_ASYNC_ENABLED or get_redis_config()._client is None:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = get_redis_config().create_async_client()
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_redis_client() -> None:
+    """Close the running loop's async client and its pool (app shutdown)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+        await client.connection_pool.disconnect()
+
+
+def _async_twin(client) -> aioredis.Redis | None:
+    # Only the process-wide client has an async twin; injected clients keep
+    # their own (sync) behaviour
+    if client is None or not Config.REDIS_ASYNC_ENABLED:
+        return None
+    if _redis_config is None or client is not _redis_config._client:
+        return None
+    return get_async_redis_client()
+
+
+async def redis_pipeline(client, build: Callable[[Any], Any]) -> list[Any]:
+    """
+    Run a batch of commands in one round-trip and return their replies.
+
+    Args:
+        client: The sync Redis client the caller holds
+        build: Queues commands on a pipeline (``lambda pipe: pipe.get(k)``);
+            called with a sync or an async pipeline, which share that API
+
+    Returns:
+        One reply per queued command, as ``pipeline.execute()`` returns them
+    """
+    async_client = _async_twin(client)
+    if async_client is not None:
+        async with async_client.pipeline() as pipe:
+            build(pipe)
+            return await pipe.execute()
+
+    def run():
+        pipe = client.pipeline()
+        build(pipe)
+        return pipe.execute()
+
+    return await asyncio.to_thread(run)
+
+
+async def redis_command(client, command: str, *args, **kwargs) -> Any:
+    """Run one Redis command (``await redis_command(r, "get", key)``), off the loop."""
+    async_client = _async_twin(client)
+    if async_client is not None:
+        return await getattr(async_client, command)(*args, **kwargs)
+    return await asyncio.to_thread(getattr(client, command), *args, **kwargs)
@@ -21,15 +21,22 @@ The three singleton clients and their connection budgets:
   - Primary API client  : 80 connections  (general reads + writes)
   - Read-replica client : 30-100 connections  (catalog SELECT queries, if configured)
   - Sync client         : 20 connections  (bulk model sync, isolated to prevent API downtime)
+
+``get_async_supabase_client`` adds a native async PostgREST client (one
+``httpx.AsyncClient`` pool per event loop, HTTP/2 by default) for the request
+hot paths; see ``src/db/async_client.py``.
 """
 
+import asyncio
 import logging
 import os
 import threading
 import time
+import weakref
 
 import httpx
 from httpx import RemoteProtocolError
+from postgrest import AsyncPostgrestClient
 from supabase.client import ClientOptions
 
 from src.config.config import Config
@@ -46,6 +53,10 @@ _last_error_time: float = 0  # Timestamp of last error
 _client_lock = threading.Lock()  # Thread-safe client access
 _replica_lock = threading.Lock()  # Thread-safe replica access
 _sync_lock = threading.Lock()  # Thread-safe sync client access
+# Event loop -> its async client (see get_async_supabase_client)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncPostgrestClient]" = (
+    weakref.WeakKeyDictionary()
+)
 ERROR_CACHE_TTL = 60.0  # Retry after 60 seconds
 
 # Connection error types that indicate the connection needs to be refreshed
@@ -810,6 +821,77 @@ def get_client_for_query(read_only: bool = False, for_sync: bool = False) -> Cli
     return get_supabase_client()
 
 
+class _PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose session is the gateway's tuned connection pool."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        http2 = Config.SUPABASE_ASYNC_HTTP2
+        max_conn = Config.SUPABASE_ASYNC_MAX_CONNECTIONS
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            follow_redirects=True,
+            http2=http2,
+            transport=httpx.AsyncHTTPTransport(
+                retries=3,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=max_conn,
+                    max_keepalive_connections=max(1, max_conn // 4),
+                    keepalive_expiry=120.0,
+                ),
+            ),
+        )
+
+
+def get_async_supabase_client() -> AsyncPostgrestClient:
+    """
+    Async PostgREST client for the running event loop.
+
+    Exposes the same ``table()`` / ``rpc()`` builders as the sync client, with
+    ``await query.execute()``. One client (one connection pool) per event loop,
+    since httpx connections cannot be shared between loops; in the app that is
+    a single shared pool. With HTTP/2 on, concurrent queries are multiplexed
+    over a few connections instead of one socket each.
+
+    Raises:
+        RuntimeError: No running event loop, or Supabase is not configured
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+
+    if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
+        raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set for the async client")
+    client = _PooledAsyncPostgrestClient(
+        f"{Config.SUPABASE_URL}/rest/v1",
+        headers={
+            "apikey": Config.SUPABASE_KEY,
+            "Authorization": f"Bearer {Config.SUPABASE_KEY}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "X-Client-Info": "gatewayz-backend/1.0",
+        },
+    )
+    _async_clients[loop] = client
+    logger.info(
+        "Created async Supabase client (HTTP/%s, %d max connections)",
+        "2" if Config.SUPABASE_ASYNC_HTTP2 else "1.1",
+        Config.SUPABASE_ASYNC_MAX_CONNECTIONS,
+    )
+    return client
+
+
+async def close_async_supabase_client() -> None:
+    """Close the running loop's async client, if one was created."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+        logger.info("✅ Async Supabase client closed successfully")
+
+
 class _LazySupabaseClient:
     """
     Lazy proxy for the Supabase client.
@@ -8,6 +8,16 @@ from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from src.config.supabase_config import get_supabase_client
+from src.db.request_rollups import (
+    ceil_bucket,
+    fetch_rollup_series,
+    fetch_rollup_totals,
+    floor_bucket,
+    model_label,
+    parse_timestamp,
+    rollup_tokens,
+    successful_requests,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -97,8 +107,6 @@ def get_user_activity_stats(
         Dictionary with date-aggregated stats
     """
     try:
-        client = get_supabase_client()
-
         # Calculate date range
         if from_date and to_date:
             start_date = datetime.fromisoformat(from_date).replace(tzinfo=UTC).isoformat()
@@ -115,7 +123,13 @@ def get_user_activity_stats(
             start_date = (datetime.now(UTC) - timedelta(days=30)).isoformat()
             end_date = datetime.now(UTC).isoformat()
 
+        # Whole days from the per-user rollups when available
+        stats = _activity_stats_from_rollups(user_id, start_date, end_date)
+        if stats is not None:
+            return stats
+
         # Fetch activity records
+        client = get_supabase_client()
         result = (
             client.table("activity_log")
             .select("*")
@@ -235,6 +249,76 @@ def get_user_activity_stats(
         }
 
 
+def _activity_stats_from_rollups(
+    user_id: int, start_date: str, end_date: str
+) -> dict[str, Any] | None:
+    """
+    Activity stats from request_rollups over the whole UTC days spanning the
+    range, or None when the rollups can't answer. Counts successful requests,
+    like activity_log.
+    """
+    start = floor_bucket(parse_timestamp(start_date), "day")
+    end = ceil_bucket(parse_timestamp(end_date), "day")
+    series = fetch_rollup_series("day", start, end, user_id=user_id)
+    if series is None:
+        return None
+    rows = fetch_rollup_totals(start, end, user_id=user_id)
+    if rows is None:
+        return None
+
+    by_date_list = [
+        {
+            "date": point["bucket_start"][:10],
+            "requests": successful_requests(point),
+            "tokens": rollup_tokens(point),
+            "cost": float(point.get("cost_usd") or 0),
+        }
+        for point in series
+        if successful_requests(point) > 0
+    ]
+
+    by_model = {}
+    by_provider = {}
+    for row in rows:
+        requests = successful_requests(row)
+        if requests <= 0:
+            continue
+        model = model_label(row)
+        for bucket, key in ((by_model, model), (by_provider, get_provider_from_model(model))):
+            entry = bucket.setdefault(key, {"requests": 0, "tokens": 0, "cost": 0.0})
+            entry["requests"] += requests
+            entry["tokens"] += rollup_tokens(row)
+            entry["cost"] += float(row.get("cost_usd") or 0)
+
+    total_requests = sum(item["requests"] for item in by_date_list)
+    total_tokens = sum(item["tokens"] for item in by_date_list)
+    total_cost = sum(item["cost"] for item in by_date_list)
+
+    return {
+        "total_requests": total_requests,
+        "total_tokens": total_tokens,
+        "total_spend": round(total_cost, 4),
+        "total_cost": round(total_cost, 4),
+        "daily_stats": [
+            {
+                "date": item["date"],
+                "spend": round(item["cost"], 4),
+                "tokens": item["tokens"],
+                "requests": item["requests"],
+            }
+            for item in by_date_list
+        ],
+        "by_date": by_date_list,
+        "by_model": by_model,
+        "by_provider": by_provider,
+        "avg_cost_per_request": total_cost / total_requests if total_requests > 0 else 0.0,
+        "avg_cost_per_token": total_cost / total_tokens if total_tokens > 0 else 0.0,
+        "avg_tokens_per_request": (
+            round(total_tokens / total_requests, 2) if total_requests > 0 else 0.0
+        ),
+    }
+
+
 def get_user_activity_log(
     user_id: int,
     limit: int = 50,
@@ -9,6 +9,7 @@ from src.config.supabase_config import execute_with_retry, get_supabase_client
 from src.config.usage_limits import TRIAL_CREDITS_AMOUNT, TRIAL_DURATION_DAYS
 from src.db.plans import check_plan_entitlements
 from src.db.postgrest_schema import is_schema_cache_error
+from src.services.request_principal import invalidate_request_principal
 from src.utils.crypto import encrypt_api_key, last4, sha256_key_hash
 from src.utils.db_safety import DatabaseResultError, safe_get_first
 from src.utils.security_validators import sanitize_for_logging
@@ -524,6 +525,7 @@ def delete_api_key(api_key: str, user_id: int) -> bool:
             else:
                 logger.debug("api_key_audit_logs table not found - skipping audit log")
 
+        invalidate_request_principal(api_key=api_key)
         return True
 
     except Exception as e:
@@ -932,6 +934,7 @@ def update_api_key(api_key: str, user_id: int, updates: dict[str, Any]) -> bool:
             else:
                 logger.debug("api_key_audit_logs table not found - skipping audit log")
 
+        invalidate_request_principal(api_key=api_key)
         return True
 
     except Exception as e:
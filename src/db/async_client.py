@@ -0,0 +1,149 @@
+"""
+Async database access.
+
+``get_async_db()`` returns the event loop's async PostgREST client
+(``src.config.supabase_config.get_async_supabase_client``): the same
+``table()`` / ``rpc()`` query builders as ``get_db()``, finished with
+``await execute(query)`` instead of ``query.execute()``. Nothing here takes a
+thread, so DB-bound request handling scales with concurrency instead of the
+default executor's size.
+
+:func:`execute` coalesces identical concurrent reads: while a GET (or an RPC
+the caller marks read-only) is in flight, an identical query waits for the
+same response instead of sending its own. A burst of requests for one API key
+or plan therefore costs one round-trip.
+
+Functions that need several dependent queries are written once as a *query
+plan*: a generator that takes a client, yields query builders and receives each
+result (or has the query's exception thrown into it), then returns its value.
+:func:`run_plan` drives it with the sync client, :func:`run_plan_async` with
+the async one, so the sync and async variants cannot drift apart.
+
+Call sites check ``Config.SUPABASE_ASYNC_ENABLED`` and otherwise keep running
+their sync function through ``asyncio.to_thread``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import logging
+import weakref
+from collections.abc import Generator
+from typing import Any
+
+from src.config import Config
+from src.config.supabase_config import get_async_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Event loop -> {query key: in-flight task}
+_inflight: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, _Flight]] = (
+    weakref.WeakKeyDictionary()
+)
+
+_stats = {"queries": 0, "coalesced": 0}
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+def get_async_db():
+    """Get the async PostgREST client for the running event loop."""
+    return get_async_supabase_client()
+
+
+def _query_key(query) -> tuple:
+    body = json.dumps(query.json, sort_keys=True, default=str) if query.json else None
+    return (
+        query.http_method,
+        query.path,
+        str(query.params),
+        body,
+        tuple(sorted(query.headers.items())),
+    )
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    # Every waiter may have been cancelled; don't log "exception never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+async def execute(query, *, coalesce: bool | None = None) -> Any:
+    """
+    Execute an async query builder.
+
+    Args:
+        query: A builder from ``get_async_db().table(...)`` / ``.rpc(...)``
+        coalesce: Share the request with identical concurrent queries. Defaults
+            to True for GET/HEAD; pass True for read-only RPCs (POST)
+
+    Returns:
+        The builder's ``APIResponse``. When the request was shared, every caller
+        gets its own copy, so mutating ``.data`` stays local.
+    """
+    _stats["queries"] += 1
+    if coalesce is None:
+        coalesce = query.http_method in ("GET", "HEAD")
+    if not coalesce or not Config.SUPABASE_ASYNC_COALESCE_READS:
+        return await query.execute()
+
+    loop = asyncio.get_running_loop()
+    flights = _inflight.setdefault(loop, {})
+    key = _query_key(query)
+    flight = flights.get(key)
+    if flight is None:
+        # A task, so one caller being cancelled does not cancel the others
+        flight = _Flight(loop.create_task(query.execute()))
+        flights[key] = flight
+        flight.task.add_done_callback(lambda _task: flights.pop(key, None))
+        flight.task.add_done_callback(_retrieve)
+    else:
+        _stats["coalesced"] += 1
+    flight.waiters += 1
+
+    result = await asyncio.shield(flight.task)
+    return result if flight.waiters == 1 else copy.deepcopy(result)
+
+
+QueryPlan = Generator[Any, Any, Any]
+
+
+def run_plan(plan: QueryPlan) -> Any:
+    """Run a query plan with blocking ``query.execute()`` calls."""
+    result, error = None, None
+    try:
+        while True:
+            query = plan.throw(error) if error is not None else plan.send(result)
+            try:
+                result, error = query.execute(), None
+            except Exception as e:
+                result, error = None, e
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_plan_async(plan: QueryPlan) -> Any:
+    """Run a query plan on the async client, coalescing its reads."""
+    result, error = None, None
+    try:
+        while True:
+            query = plan.throw(error) if error is not None else plan.send(result)
+            try:
+                result, error = await execute(query), None
+            except Exception as e:
+                result, error = None, e
+    except StopIteration as stop:
+        return stop.value
+
+
+def get_async_db_stats() -> dict[str, int]:
+    """Query and coalesced-read counters for monitoring."""
+    return dict(_stats)
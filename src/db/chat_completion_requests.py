@@ -3,10 +3,15 @@ Chat Completion Requests Database Operations
 Handles saving and retrieval of chat completion request metrics
 """
 
+import asyncio
 import logging
 from typing import Any
 
+from src.config import Config
 from src.config.supabase_config import get_supabase_client
+from src.db.async_client import execute, get_async_db, run_plan, run_plan_async
+from src.db.request_rollups import fetch_rollup_totals, parse_timestamp, rollups_readable
+from src.services.request_rollups import record_request
 from src.utils.db_safety import DatabaseResultError, safe_get_first
 
 logger = logging.getLogger(__name__)
@@ -33,94 +38,109 @@ def get_model_id_by_name(model_name: str, provider_name: str | None = None) -> i
         The model ID if found, None otherwise
     """
     try:
-        client = get_supabase_client()
+        return run_plan(_model_id_plan(get_supabase_client(), model_name, provider_name))
+    except Exception as e:
+        logger.error(
+            f"Failed to get model ID for {model_name} (provider: {provider_name}): {e}",
+            exc_info=True,
+        )
+        return None
 
-        # Step 1: If provider specified, lookup provider_id first (more reliable)
-        provider_id = None
-        if provider_name:
-            provider_result = (
-                client.table("providers")
-                .select("id")
-                .or_(f"slug.ilike.{provider_name},name.ilike.{provider_name}")
-                .execute()
-            )
-            try:
-                provider_data = safe_get_first(provider_result, error_message="Provider not found")
-                provider_id = provider_data.get("id")
-                logger.debug(f"Found provider_id={provider_id} for provider={provider_name}")
-            except DatabaseResultError:
-                logger.debug(f"Provider not found: {provider_name}")
-
-        # Step 2: Search models with provider filter
-        if provider_id:
-            # Search with provider_id filter for more accurate matching
-            # Try multiple fields: provider_model_id, model_name (model_id column was removed)
-            # Use prefix wildcard for "ends with" matching (e.g., "gpt-4o-mini" matches "openai/gpt-4o-mini")
-            # This prevents matching longer variants like "gpt-4o-mini-2024-07-18"
-            result = (
-                client.table("models")
-                .select("id, provider_model_id, model_name")
-                .eq("provider_id", provider_id)
-                .or_(f"provider_model_id.ilike.%{model_name}," f"model_name.ilike.%{model_name}")
-                .execute()
-            )
 
-            if result.data:
-                # Prefer exact match, then case-insensitive match
-                for row in result.data:
-                    if (
-                        row.get("provider_model_id") == model_name
-                        or row.get("model_name") == model_name
-                    ):
-                        logger.debug(
-                            f"Found model_id={row.get('id')} for model={model_name}, "
-                            f"provider={provider_name} (exact match)"
-                        )
-                        return row.get("id")
+async def get_model_id_by_name_async(
+    model_name: str, provider_name: str | None = None
+) -> int | None:
+    """Async :func:`get_model_id_by_name`; concurrent lookups of one model share queries."""
+    if not Config.SUPABASE_ASYNC_ENABLED:
+        return await asyncio.to_thread(get_model_id_by_name, model_name, provider_name)
+    try:
+        return await run_plan_async(_model_id_plan(get_async_db(), model_name, provider_name))
+    except Exception as e:
+        logger.error(
+            f"Failed to get model ID for {model_name} (provider: {provider_name}): {e}",
+            exc_info=True,
+        )
+        return None
 
-                # Return first case-insensitive match
-                try:
-                    first_model = safe_get_first(result, error_message="Model not found")
-                    logger.debug(
-                        f"Found model_id={first_model.get('id')} for model={model_name}, "
-                        f"provider={provider_name} (fuzzy match)"
-                    )
-                    return first_model.get("id")
-                except DatabaseResultError:
-                    pass  # Fall through to next strategy
 
-        # Step 3: Fallback to search without provider filter (less reliable)
-        # Use prefix wildcard for "ends with" matching
-        result = (
+def _model_id_plan(client, model_name: str, provider_name: str | None):
+    """Query plan behind get_model_id_by_name (see src/db/async_client.py)."""
+    # Step 1: If provider specified, lookup provider_id first (more reliable)
+    provider_id = None
+    if provider_name:
+        provider_result = yield (
+            client.table("providers")
+            .select("id")
+            .or_(f"slug.ilike.{provider_name},name.ilike.{provider_name}")
+        )
+        try:
+            provider_data = safe_get_first(provider_result, error_message="Provider not found")
+            provider_id = provider_data.get("id")
+            logger.debug(f"Found provider_id={provider_id} for provider={provider_name}")
+        except DatabaseResultError:
+            logger.debug(f"Provider not found: {provider_name}")
+
+    # Step 2: Search models with provider filter
+    if provider_id:
+        # Search with provider_id filter for more accurate matching
+        # Try multiple fields: provider_model_id, model_name (model_id column was removed)
+        # Use prefix wildcard for "ends with" matching (e.g., "gpt-4o-mini" matches "openai/gpt-4o-mini")
+        # This prevents matching longer variants like "gpt-4o-mini-2024-07-18"
+        result = yield (
             client.table("models")
             .select("id, provider_model_id, model_name")
+            .eq("provider_id", provider_id)
             .or_(f"provider_model_id.ilike.%{model_name}," f"model_name.ilike.%{model_name}")
-            .limit(1)
-            .execute()
         )
 
-        try:
-            first_model = safe_get_first(result, error_message="Model not found")
-            logger.debug(
-                f"Found model_id={first_model.get('id')} for model={model_name} "
-                f"(no provider filter)"
-            )
-            return first_model.get("id")
-        except DatabaseResultError:
-            pass  # Return None below
+        if result.data:
+            # Prefer exact match, then case-insensitive match
+            for row in result.data:
+                if (
+                    row.get("provider_model_id") == model_name
+                    or row.get("model_name") == model_name
+                ):
+                    logger.debug(
+                        f"Found model_id={row.get('id')} for model={model_name}, "
+                        f"provider={provider_name} (exact match)"
+                    )
+                    return row.get("id")
 
-        logger.warning(
-            f"Model not found in database: model_name={model_name}, provider={provider_name}, "
-            f"provider_id={provider_id}"
-        )
-        return None
+            # Return first case-insensitive match
+            try:
+                first_model = safe_get_first(result, error_message="Model not found")
+                logger.debug(
+                    f"Found model_id={first_model.get('id')} for model={model_name}, "
+                    f"provider={provider_name} (fuzzy match)"
+                )
+                return first_model.get("id")
+            except DatabaseResultError:
+                pass  # Fall through to next strategy
 
-    except Exception as e:
-        logger.error(
-            f"Failed to get model ID for {model_name} (provider: {provider_name}): {e}",
-            exc_info=True,
+    # Step 3: Fallback to search without provider filter (less reliable)
+    # Use prefix wildcard for "ends with" matching
+    result = yield (
+        client.table("models")
+        .select("id, provider_model_id, model_name")
+        .or_(f"provider_model_id.ilike.%{model_name}," f"model_name.ilike.%{model_name}")
+        .limit(1)
+    )
+
+    try:
+        first_model = safe_get_first(result, error_message="Model not found")
+        logger.debug(
+            f"Found model_id={first_model.get('id')} for model={model_name} "
+            f"(no provider filter)"
         )
-        return None
+        return first_model.get("id")
+    except DatabaseResultError:
+        pass  # Return None below
+
+    logger.warning(
+        f"Model not found in database: model_name={model_name}, provider={provider_name}, "
+        f"provider_id={provider_id}"
+    )
+    return None
 
 
 def save_chat_completion_request(
@@ -199,6 +219,14 @@ def save_chat_completion_request(
                 f"model={model_name}, tokens={input_tokens}+{output_tokens}, "
                 f"time={processing_time_ms}ms"
             )
+            record_request(
+                model_id=model_id,
+                user_id=user_id,
+                status=status,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                processing_time_ms=processing_time_ms,
+            )
             try:
                 return safe_get_first(result, error_message="Insert returned no data")
             except DatabaseResultError as e:
@@ -598,6 +626,69 @@ def get_chat_completion_summary_by_api_key(api_key_id: int) -> dict[str, Any]:
         }
 
 
+def _summary_from_rollups(
+    model_id: int | None,
+    provider_id: int | None,
+    model_name: str | None,
+    start_date: str | None,
+    end_date: str | None,
+) -> dict[str, Any] | None:
+    """Filtered summary from request_rollups, or None when they can't answer."""
+    if not rollups_readable():
+        return None
+
+    model_ids = [model_id] if model_id is not None else None
+    rows: list[dict[str, Any]] | None = []
+    if model_name is not None:
+        matched = (
+            get_supabase_client()
+            .table("models")
+            .select("id")
+            .ilike("model_name", f"%{model_name}%")
+            .execute()
+        )
+        model_ids = [
+            row["id"] for row in matched.data or [] if model_id is None or row["id"] == model_id
+        ]
+    if model_ids != []:
+        rows = fetch_rollup_totals(
+            parse_timestamp(start_date) if start_date else None,
+            parse_timestamp(end_date) if end_date else None,
+            model_ids=model_ids,
+            provider_id=provider_id,
+        )
+        if rows is None:
+            return None
+
+    total_requests = sum(int(r.get("requests") or 0) for r in rows)
+    failed = sum(int(r.get("errors") or 0) for r in rows)
+    total_input = sum(int(r.get("input_tokens") or 0) for r in rows)
+    total_output = sum(int(r.get("output_tokens") or 0) for r in rows)
+    total_processing = sum(float(r.get("latency_ms_sum") or 0) for r in rows)
+    total_cost = sum(float(r.get("cost_usd") or 0) for r in rows)
+    firsts = [r["first_request_at"] for r in rows if r.get("first_request_at")]
+    lasts = [r["last_request_at"] for r in rows if r.get("last_request_at")]
+
+    def _avg(total: float) -> float:
+        return round(total / total_requests, 2) if total_requests > 0 else 0
+
+    return {
+        "total_requests": total_requests,
+        "total_input_tokens": total_input,
+        "total_output_tokens": total_output,
+        "total_tokens": total_input + total_output,
+        "avg_input_tokens": _avg(total_input),
+        "avg_output_tokens": _avg(total_output),
+        "avg_processing_time_ms": _avg(total_processing),
+        "completed_requests": total_requests - failed,
+        "failed_requests": failed,
+        "success_rate": _avg((total_requests - failed) * 100),
+        "first_request_at": min(firsts) if firsts else None,
+        "last_request_at": max(lasts) if lasts else None,
+        "total_cost_usd": round(total_cost, 2),
+    }
+
+
 def get_chat_completion_summary_by_filters(
     model_id: int | None = None,
     provider_id: int | None = None,
@@ -637,6 +728,11 @@ def get_chat_completion_summary_by_filters(
         }
     """
     try:
+        # Rollups read a few rows per day/hour/minute in range instead of every request
+        summary = _summary_from_rollups(model_id, provider_id, model_name, start_date, end_date)
+        if summary is not None:
+            return summary
+
         client = get_supabase_client()
 
         # Try to use RPC function first (fastest)
@@ -1064,6 +1160,25 @@ def get_top_models_by_requests(limit: int = 3) -> list[dict[str, Any]]:
         ]
     """
     try:
+        # All-time per-model totals come from the day rollups when available
+        rows = fetch_rollup_totals(None)
+        if rows is not None:
+            top = [
+                {
+                    "id": row["model_id"],
+                    "model_name": row.get("model_name"),
+                    "provider": row.get("provider_slug") or "unknown",
+                    "requests": int(row.get("requests") or 0) - int(row.get("errors") or 0),
+                    "total_tokens": int(row.get("input_tokens") or 0)
+                    + int(row.get("output_tokens") or 0),
+                }
+                for row in rows
+                if row.get("model_id")
+            ]
+            top = [model for model in top if model["requests"] > 0]
+            top.sort(key=lambda x: x["requests"], reverse=True)
+            return top[:limit]
+
         client = get_supabase_client()
 
         # Note: Ideally we'd use raw SQL like:
@@ -1408,78 +1523,220 @@ def save_chat_completion_request_with_cost(
         if model_id is None:
             model_id = get_model_id_by_name(model_name, provider_name)
 
-        if model_id is None:
-            if status == "failed":
-                # Persist failed requests even when the model can't be resolved —
-                # these are exactly the failures worth surfacing (e.g. a dead
-                # provider key or a model removed from the catalog).
-                logger.warning(
-                    f"Saving failed chat completion request with unresolved model "
-                    f"(model_name={model_name}, provider={provider_name})"
-                )
-            else:
-                logger.warning(
-                    f"Skipping chat completion request save: model not found in database "
-                    f"(model_name={model_name}, provider={provider_name})"
-                )
-                return None
-
-        # Prepare the data with cost fields
-        request_data = {
-            "request_id": request_id,
-            "model_id": model_id,
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-            "processing_time_ms": processing_time_ms,
-            "status": status,
-            "is_anonymous": is_anonymous,
-            "cost_usd": round(cost_usd, 6),
-            "input_cost_usd": round(input_cost_usd, 6),
-            "output_cost_usd": round(output_cost_usd, 6),
-            "pricing_source": pricing_source,
-        }
-
-        # Add optional fields if provided
-        if error_message:
-            request_data["error_message"] = error_message
-        if user_id:
-            request_data["user_id"] = user_id
-        if api_key_id:
-            request_data["api_key_id"] = api_key_id
-        if metadata:
-            request_data["metadata"] = metadata
-        if model_id is None and status == "failed":
-            request_data["metadata"] = {
-                **(request_data.get("metadata") or {}),
-                "unresolved_model_name": model_name,
-            }
+        request_data = _cost_request_row(
+            request_id,
+            model_name,
+            input_tokens,
+            output_tokens,
+            processing_time_ms,
+            cost_usd,
+            input_cost_usd,
+            output_cost_usd,
+            pricing_source,
+            status,
+            error_message,
+            user_id,
+            provider_name,
+            model_id,
+            api_key_id,
+            is_anonymous,
+            metadata,
+        )
+        if request_data is None:
+            return None
 
         # Insert into database
         result = client.table("chat_completion_requests").insert(request_data).execute()
+        return _cost_request_saved(result, request_data, model_name, cost_usd)
 
-        if result.data and len(result.data) > 0:
-            logger.debug(
-                f"Chat completion request saved with cost: request_id={request_id}, "
-                f"model={model_name}, tokens={input_tokens}+{output_tokens}, "
-                f"cost=${cost_usd:.6f}, time={processing_time_ms}ms"
-            )
-            return result.data[0]
-        else:
-            logger.error(
-                f"Failed to save chat completion request: insert returned no data. "
-                f"Request ID: {request_id}, Model: {model_name}"
-            )
+    except Exception as e:
+        logger.error(
+            f"Failed to save chat completion request {request_id} for model {model_name}: {e}",
+            exc_info=True,
+        )
+        # Don't raise - request tracking should not break the main flow
+        return None
+
+
+async def save_chat_completion_request_with_cost_async(
+    request_id: str,
+    model_name: str,
+    input_tokens: int,
+    output_tokens: int,
+    processing_time_ms: int,
+    cost_usd: float,
+    input_cost_usd: float,
+    output_cost_usd: float,
+    pricing_source: str = "calculated",
+    status: str = "completed",
+    error_message: str | None = None,
+    user_id: int | None = None,
+    provider_name: str | None = None,
+    model_id: int | None = None,
+    api_key_id: int | None = None,
+    is_anonymous: bool = False,
+    metadata: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """Async :func:`save_chat_completion_request_with_cost` (same arguments and result).
+
+    Uses the async DB client when ``Config.SUPABASE_ASYNC_ENABLED``; otherwise
+    runs the sync function in a thread.
+    """
+    if not Config.SUPABASE_ASYNC_ENABLED:
+        return await asyncio.to_thread(
+            save_chat_completion_request_with_cost,
+            request_id,
+            model_name,
+            input_tokens,
+            output_tokens,
+            processing_time_ms,
+            cost_usd,
+            input_cost_usd,
+            output_cost_usd,
+            pricing_source,
+            status,
+            error_message,
+            user_id,
+            provider_name,
+            model_id,
+            api_key_id,
+            is_anonymous,
+            metadata,
+        )
+
+    try:
+        if model_id is None:
+            model_id = await get_model_id_by_name_async(model_name, provider_name)
+
+        request_data = _cost_request_row(
+            request_id,
+            model_name,
+            input_tokens,
+            output_tokens,
+            processing_time_ms,
+            cost_usd,
+            input_cost_usd,
+            output_cost_usd,
+            pricing_source,
+            status,
+            error_message,
+            user_id,
+            provider_name,
+            model_id,
+            api_key_id,
+            is_anonymous,
+            metadata,
+        )
+        if request_data is None:
             return None
 
+        query = get_async_db().table("chat_completion_requests").insert(request_data)
+        return _cost_request_saved(await execute(query), request_data, model_name, cost_usd)
+
     except Exception as e:
         logger.error(
             f"Failed to save chat completion request {request_id} for model {model_name}: {e}",
             exc_info=True,
         )
-        # Don't raise - request tracking should not break the main flow
         return None
 
 
+def _cost_request_row(
+    request_id,
+    model_name,
+    input_tokens,
+    output_tokens,
+    processing_time_ms,
+    cost_usd,
+    input_cost_usd,
+    output_cost_usd,
+    pricing_source,
+    status,
+    error_message,
+    user_id,
+    provider_name,
+    model_id,
+    api_key_id,
+    is_anonymous,
+    metadata,
+) -> dict[str, Any] | None:
+    """chat_completion_requests row for a costed request; None to skip saving it."""
+    if model_id is None:
+        if status == "failed":
+            # Persist failed requests even when the model can't be resolved —
+            # these are exactly the failures worth surfacing (e.g. a dead
+            # provider key or a model removed from the catalog).
+            logger.warning(
+                f"Saving failed chat completion request with unresolved model "
+                f"(model_name={model_name}, provider={provider_name})"
+            )
+        else:
+            logger.warning(
+                f"Skipping chat completion request save: model not found in database "
+                f"(model_name={model_name}, provider={provider_name})"
+            )
+            return None
+
+    # Prepare the data with cost fields
+    request_data = {
+        "request_id": request_id,
+        "model_id": model_id,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "processing_time_ms": processing_time_ms,
+        "status": status,
+        "is_anonymous": is_anonymous,
+        "cost_usd": round(cost_usd, 6),
+        "input_cost_usd": round(input_cost_usd, 6),
+        "output_cost_usd": round(output_cost_usd, 6),
+        "pricing_source": pricing_source,
+    }
+
+    # Add optional fields if provided
+    if error_message:
+        request_data["error_message"] = error_message
+    if user_id:
+        request_data["user_id"] = user_id
+    if api_key_id:
+        request_data["api_key_id"] = api_key_id
+    if metadata:
+        request_data["metadata"] = metadata
+    if model_id is None and status == "failed":
+        request_data["metadata"] = {
+            **(request_data.get("metadata") or {}),
+            "unresolved_model_name": model_name,
+        }
+    return request_data
+
+
+def _cost_request_saved(result, request_data: dict[str, Any], model_name: str, cost_usd: float):
+    """Log, roll up and return the inserted row (None when nothing came back)."""
+    request_id = request_data["request_id"]
+    if result.data and len(result.data) > 0:
+        logger.debug(
+            f"Chat completion request saved with cost: request_id={request_id}, "
+            f"model={model_name}, "
+            f"tokens={request_data['input_tokens']}+{request_data['output_tokens']}, "
+            f"cost=${cost_usd:.6f}, time={request_data['processing_time_ms']}ms"
+        )
+        record_request(
+            model_id=request_data["model_id"],
+            user_id=request_data.get("user_id"),
+            status=request_data["status"],
+            input_tokens=request_data["input_tokens"],
+            output_tokens=request_data["output_tokens"],
+            cost_usd=cost_usd,
+            processing_time_ms=request_data["processing_time_ms"],
+        )
+        return result.data[0]
+
+    logger.error(
+        f"Failed to save chat completion request: insert returned no data. "
+        f"Request ID: {request_id}, Model: {model_name}"
+    )
+    return None
+
+
 def update_request_cost(
     request_id: str,
     cost_usd: float,
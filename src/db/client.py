@@ -2,7 +2,8 @@
 Database client facade.
 
 Preferred import point for database access. Routes and services should import
-from here rather than from src.config.supabase_config directly.
+from here rather than from src.config.supabase_config directly. Async callers use
+``get_async_db`` and ``src.db.async_client.execute``.
 """
 
 from src.config.supabase_config import (
@@ -10,7 +11,13 @@ from src.config.supabase_config import (
     get_supabase_client,
 )
 
-__all__ = ["get_db", "get_table", "get_initialization_status", "get_supabase_client"]
+__all__ = [
+    "get_async_db",
+    "get_db",
+    "get_table",
+    "get_initialization_status",
+    "get_supabase_client",
+]
 
 
 def get_db():
@@ -18,6 +25,13 @@ def get_db():
     return get_supabase_client()
 
 
+def get_async_db():
+    """Get the async PostgREST client for the running event loop."""
+    from src.db.async_client import get_async_db as _get_async_db
+
+    return _get_async_db()
+
+
 def get_table(table_name: str):
     """Convenience: get_db().table(table_name)."""
     return get_db().table(table_name)
@@ -12,6 +12,7 @@ from src.config.supabase_config import (
     execute_with_retry,
     get_supabase_client,
 )
+from src.db.keyset import fetch_keyset_page
 from src.utils.sentry_context import capture_database_error
 
 logger = logging.getLogger(__name__)
@@ -287,6 +288,70 @@ def get_user_transactions(
         return []
 
 
+def _admin_transactions_query(
+    client: Any,
+    *,
+    user_id: int | None,
+    transaction_type: str | None,
+    from_date: str | None,
+    to_date: str | None,
+    direction: str | None,
+    payment_id: int | None,
+) -> Any:
+    """Filtered, unordered credit_transactions query for the admin readers"""
+    query = client.table("credit_transactions").select("*")
+
+    # Filter by user_id if provided
+    if user_id is not None:
+        query = query.eq("user_id", user_id)
+
+    # Filter by transaction type
+    if transaction_type:
+        query = query.eq("transaction_type", transaction_type)
+
+    # Filter by date range
+    if from_date:
+        try:
+            if "T" not in from_date:
+                from_date = f"{from_date}T00:00:00Z"
+            query = query.gte("created_at", from_date)
+        except Exception as e:
+            logger.warning(f"Invalid from_date format: {from_date}, error: {e}")
+
+    if to_date:
+        try:
+            if "T" not in to_date:
+                to_date = f"{to_date}T23:59:59Z"
+            query = query.lte("created_at", to_date)
+        except Exception as e:
+            logger.warning(f"Invalid to_date format: {to_date}, error: {e}")
+
+    # Filter by direction (credit = positive, charge = negative)
+    if direction:
+        if direction.lower() == "credit":
+            query = query.gt("amount", 0)
+        elif direction.lower() == "charge":
+            query = query.lt("amount", 0)
+
+    # Filter by payment_id
+    if payment_id is not None:
+        query = query.eq("payment_id", payment_id)
+
+    return query
+
+
+def _within_amount_range(
+    txn: dict[str, Any], min_amount: float | None, max_amount: float | None
+) -> bool:
+    """Absolute-value amount range check (for matching credits and charges alike)"""
+    amount = abs(float(txn.get("amount", 0)))
+    if min_amount is not None and amount < min_amount:
+        return False
+    if max_amount is not None and amount > max_amount:
+        return False
+    return True
+
+
 def get_all_transactions(
     limit: int = 50,
     offset: int = 0,
@@ -324,43 +389,15 @@ def get_all_transactions(
     try:
         client = get_supabase_client()
 
-        query = client.table("credit_transactions").select("*")
-
-        # Filter by user_id if provided
-        if user_id is not None:
-            query = query.eq("user_id", user_id)
-
-        # Filter by transaction type
-        if transaction_type:
-            query = query.eq("transaction_type", transaction_type)
-
-        # Filter by date range
-        if from_date:
-            try:
-                if "T" not in from_date:
-                    from_date = f"{from_date}T00:00:00Z"
-                query = query.gte("created_at", from_date)
-            except Exception as e:
-                logger.warning(f"Invalid from_date format: {from_date}, error: {e}")
-
-        if to_date:
-            try:
-                if "T" not in to_date:
-                    to_date = f"{to_date}T23:59:59Z"
-                query = query.lte("created_at", to_date)
-            except Exception as e:
-                logger.warning(f"Invalid to_date format: {to_date}, error: {e}")
-
-        # Filter by direction (credit = positive, charge = negative)
-        if direction:
-            if direction.lower() == "credit":
-                query = query.gt("amount", 0)
-            elif direction.lower() == "charge":
-                query = query.lt("amount", 0)
-
-        # Filter by payment_id
-        if payment_id is not None:
-            query = query.eq("payment_id", payment_id)
+        query = _admin_transactions_query(
+            client,
+            user_id=user_id,
+            transaction_type=transaction_type,
+            from_date=from_date,
+            to_date=to_date,
+            direction=direction,
+            payment_id=payment_id,
+        )
 
         # Sorting
         desc_order = sort_order.lower() == "desc"
@@ -368,8 +405,8 @@ def get_all_transactions(
             query = query.order("amount", desc=desc_order)
         elif sort_by == "transaction_type":
             query = query.order("transaction_type", desc=desc_order)
-        else:  # default to created_at
-            query = query.order("created_at", desc=desc_order)
+        else:  # default to created_at, with id breaking ties so keyset cursors line up
+            query = query.order("created_at", desc=desc_order).order("id", desc=desc_order)
 
         # If min_amount/max_amount filtering is needed, we must fetch all and filter client-side
         # Otherwise, use database-side pagination for efficiency
@@ -378,22 +415,11 @@ def get_all_transactions(
         if needs_client_side_filtering:
             # Fetch all results, filter by absolute amount, then paginate
             result = query.execute()
-            transactions = result.data or []
-
-            # Post-process: Apply amount range filtering (for absolute value matching)
-            filtered_transactions = []
-            for txn in transactions:
-                amount = abs(float(txn.get("amount", 0)))
-                include = True
-
-                if min_amount is not None and amount < min_amount:
-                    include = False
-                if max_amount is not None and amount > max_amount:
-                    include = False
-
-                if include:
-                    filtered_transactions.append(txn)
-            transactions = filtered_transactions
+            transactions = [
+                txn
+                for txn in result.data or []
+                if _within_amount_range(txn, min_amount, max_amount)
+            ]
 
             # Apply pagination after filtering
             paginated_transactions = transactions[offset : offset + limit]
@@ -408,6 +434,61 @@ def get_all_transactions(
         return []
 
 
+def get_transactions_page(
+    limit: int = 50,
+    cursor: str | None = None,
+    user_id: int | None = None,
+    transaction_type: str | None = None,
+    from_date: str | None = None,
+    to_date: str | None = None,
+    min_amount: float | None = None,
+    max_amount: float | None = None,
+    direction: str | None = None,
+    payment_id: int | None = None,
+    sort_order: str = "desc",
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    Get one keyset page of credit transactions across all users (admin only)
+
+    Pages are ordered by (created_at, id) and cost one index seek however deep
+    they are, which is what deep pagination and ledger exports need. Filters
+    match get_all_transactions. The absolute-amount range is applied to each
+    fetched page, so a page may hold fewer than ``limit`` rows; keep following
+    next_cursor until it is None.
+
+    Args:
+        limit: Rows to scan for this page
+        cursor: next_cursor from the previous page (None for the first page)
+        sort_order: 'desc' (newest first) or 'asc'
+
+    Returns:
+        (transactions, next_cursor)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    client = get_supabase_client()
+    transactions, next_cursor = fetch_keyset_page(
+        lambda: _admin_transactions_query(
+            client,
+            user_id=user_id,
+            transaction_type=transaction_type,
+            from_date=from_date,
+            to_date=to_date,
+            direction=direction,
+            payment_id=payment_id,
+        ),
+        cursor,
+        limit,
+        desc=sort_order.lower() == "desc",
+    )
+    if min_amount is not None or max_amount is not None:
+        transactions = [
+            txn for txn in transactions if _within_amount_range(txn, min_amount, max_amount)
+        ]
+    return transactions, next_cursor
+
+
 def add_credits(
     api_key: str,
     amount: float,
@@ -8,6 +8,15 @@ from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from src.config.supabase_config import get_supabase_client
+from src.db.activity import get_provider_from_model
+from src.db.request_rollups import (
+    fetch_rollup_totals,
+    fetch_rollup_user_count,
+    model_label,
+    parse_timestamp,
+    rollup_tokens,
+    successful_requests,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +50,16 @@ def get_provider_stats(
         logger.debug("Defaulting time_range to 24h for provider stats query")
 
     try:
+        usage = _rollup_model_usage(time_range, user_id)
+        if usage is not None:
+            usage = [u for u in usage if _matches_provider(u, provider_name)]
+            if gateway:
+                usage = [u for u in usage if u["gateway"].lower() == gateway.lower()]
+            if not usage:
+                return _empty_provider_stats(provider_name)
+            unique_users = _rollup_unique_users(time_range, user_id, usage)
+            return _rollup_provider_statistics(usage, provider_name, gateway, unique_users)
+
         supabase = get_supabase_client()
 
         # Calculate time filter
@@ -120,6 +139,14 @@ def get_gateway_stats(
         logger.debug("Defaulting time_range to 24h for gateway stats query")
 
     try:
+        usage = _rollup_model_usage(time_range, user_id)
+        if usage is not None:
+            usage = [u for u in usage if u["gateway"].lower() == gateway.lower()]
+            if not usage:
+                return _empty_gateway_stats(gateway)
+            unique_users = _rollup_unique_users(time_range, user_id, usage)
+            return _rollup_gateway_statistics(usage, gateway, unique_users)
+
         supabase = get_supabase_client()
 
         # Calculate time filter
@@ -196,14 +223,32 @@ def get_trending_models(
             return cached_data
 
     try:
-        supabase = get_supabase_client()
-
         # Calculate time filter - default to 24h if not specified or "all"
         # CRITICAL: Never query without a time filter to prevent timeouts
         if not time_range or time_range == "all":
             time_range = "24h"
             logger.debug("Defaulting time_range to 24h for trending models query")
 
+        usage = _rollup_model_usage(time_range, with_users=True)
+        if usage is not None:
+            if gateway and gateway.lower() != "all":
+                usage = [u for u in usage if u["gateway"].lower() == gateway.lower()]
+            trending = [
+                {
+                    "model": u["model"],
+                    "provider": u["provider"],
+                    "requests": u["requests"],
+                    "total_tokens": u["tokens"],
+                    "unique_users": u["unique_users"],
+                    "total_cost": u["cost"],
+                    "avg_speed": _speed(u["tokens"], u["latency_s"]),
+                    "gateway": u["gateway"],
+                }
+                for u in usage
+            ]
+            return _sort_and_cache_trending(trending, sort_by, limit, cache_key)
+
+        supabase = get_supabase_client()
         time_filter = _get_time_filter(time_range)
 
         # Build query with only necessary columns for performance
@@ -274,20 +319,7 @@ def get_trending_models(
             stats["avg_speed"] = sum(avg_speed_list) / len(avg_speed_list) if avg_speed_list else 0
             trending.append(stats)
 
-        # Sort by specified criteria
-        if sort_by == "tokens":
-            trending.sort(key=lambda x: x["total_tokens"], reverse=True)
-        elif sort_by == "users":
-            trending.sort(key=lambda x: x["unique_users"], reverse=True)
-        else:  # default: requests
-            trending.sort(key=lambda x: x["requests"], reverse=True)
-
-        result = trending[:limit]
-
-        # Cache the result
-        _trending_cache[cache_key] = (result, datetime.now(UTC))
-
-        return result
+        return _sort_and_cache_trending(trending, sort_by, limit, cache_key)
 
     except Exception as e:
         logger.error(f"Error getting trending models: {e}")
@@ -357,6 +389,15 @@ def get_top_models_by_provider(
         List of top models with usage statistics
     """
     try:
+        usage = _rollup_model_usage(time_range)
+        if usage is not None:
+            top_models = [
+                {key: u[key] for key in ("model", "requests", "tokens", "cost")}
+                for u in usage
+                if _matches_provider(u, provider_name)
+            ]
+            return sorted(top_models, key=lambda x: x["requests"], reverse=True)[:limit]
+
         supabase = get_supabase_client()
 
         # Calculate time filter
@@ -437,6 +478,148 @@ def _get_time_filter(time_range: str) -> str | None:
         return None
 
 
+def _sort_and_cache_trending(
+    trending: list[dict[str, Any]], sort_by: str, limit: int, cache_key: str
+) -> list[dict[str, Any]]:
+    """Sort trending models by the requested criteria, cache and return the top ``limit``"""
+    if sort_by == "tokens":
+        trending.sort(key=lambda x: x["total_tokens"], reverse=True)
+    elif sort_by == "users":
+        trending.sort(key=lambda x: x["unique_users"], reverse=True)
+    else:  # default: requests
+        trending.sort(key=lambda x: x["requests"], reverse=True)
+
+    result = trending[:limit]
+
+    # Cache the result
+    _trending_cache[cache_key] = (result, datetime.now(UTC))
+
+    return result
+
+
+def _rollup_model_usage(
+    time_range: str, user_id: int | None = None, with_users: bool = False
+) -> list[dict[str, Any]] | None:
+    """
+    Per-model usage over the time range from request_rollups, or None when the
+    rollups can't answer. Counts successful requests, like activity_log.
+    """
+    time_filter = _get_time_filter(time_range)
+    rows = fetch_rollup_totals(
+        parse_timestamp(time_filter) if time_filter else None,
+        user_id=user_id,
+        with_users=with_users,
+    )
+    if rows is None:
+        return None
+
+    usage = []
+    for row in rows:
+        requests = successful_requests(row)
+        if requests <= 0:
+            continue
+        model = model_label(row)
+        usage.append(
+            {
+                "model_id": row.get("model_id"),
+                "model": model,
+                "provider": get_provider_from_model(model),
+                "gateway": row.get("provider_slug") or "unknown",
+                "requests": requests,
+                "tokens": rollup_tokens(row),
+                "cost": float(row.get("cost_usd") or 0),
+                "latency_s": float(row.get("latency_ms_sum") or 0) / 1000,
+                "unique_users": int(row.get("unique_users") or 0),
+            }
+        )
+    return usage
+
+
+def _rollup_unique_users(time_range: str, user_id: int | None, usage: list[dict[str, Any]]) -> int:
+    """Distinct users behind the given rollup usage rows"""
+    if user_id:
+        return 1
+    time_filter = _get_time_filter(time_range)
+    count = fetch_rollup_user_count(
+        parse_timestamp(time_filter) if time_filter else None,
+        model_ids=[u["model_id"] for u in usage],
+    )
+    return count or 0
+
+
+def _matches_provider(usage: dict[str, Any], provider_name: str) -> bool:
+    provider_lower = provider_name.lower()
+    return usage["provider"].lower() == provider_lower or usage["model"].lower().startswith(
+        f"{provider_lower}/"
+    )
+
+
+def _speed(tokens: int, seconds: float) -> float:
+    return tokens / seconds if seconds > 0 else 0
+
+
+def _rollup_provider_statistics(
+    usage: list[dict[str, Any]], provider_name: str, gateway: str | None, unique_users: int
+) -> dict[str, Any]:
+    """Provider statistics from per-model rollup usage"""
+    total_requests = sum(u["requests"] for u in usage)
+    total_tokens = sum(u["tokens"] for u in usage)
+    total_cost = sum(u["cost"] for u in usage)
+    model_usage = {u["model"]: {"requests": u["requests"], "tokens": u["tokens"]} for u in usage}
+    top_model = max(usage, key=lambda u: u["requests"])["model"]
+
+    return {
+        "provider": provider_name,
+        "gateway": gateway or "all",
+        "total_requests": total_requests,
+        "total_tokens": total_tokens,
+        "total_cost": round(total_cost, 4),
+        "unique_users": unique_users,
+        "unique_models": len(model_usage),
+        "avg_speed_tokens_per_sec": round(
+            _speed(total_tokens, sum(u["latency_s"] for u in usage)), 2
+        ),
+        "top_model": top_model,
+        "model_breakdown": model_usage,
+        "avg_tokens_per_request": round(total_tokens / total_requests, 2),
+        "avg_cost_per_request": round(total_cost / total_requests, 4),
+    }
+
+
+def _rollup_gateway_statistics(
+    usage: list[dict[str, Any]], gateway: str, unique_users: int
+) -> dict[str, Any]:
+    """Gateway statistics from per-model rollup usage"""
+    total_requests = sum(u["requests"] for u in usage)
+    total_tokens = sum(u["tokens"] for u in usage)
+    total_cost = sum(u["cost"] for u in usage)
+
+    provider_usage = {}
+    for u in usage:
+        entry = provider_usage.setdefault(u["provider"], {"requests": 0, "tokens": 0, "cost": 0.0})
+        entry["requests"] += u["requests"]
+        entry["tokens"] += u["tokens"]
+        entry["cost"] += u["cost"]
+    top_provider = max(provider_usage.items(), key=lambda x: x[1]["requests"])[0]
+
+    return {
+        "gateway": gateway,
+        "total_requests": total_requests,
+        "total_tokens": total_tokens,
+        "total_cost": round(total_cost, 4),
+        "unique_users": unique_users,
+        "unique_models": len({u["model"] for u in usage}),
+        "unique_providers": len(provider_usage),
+        "avg_speed_tokens_per_sec": round(
+            _speed(total_tokens, sum(u["latency_s"] for u in usage)), 2
+        ),
+        "top_provider": top_provider,
+        "provider_breakdown": provider_usage,
+        "avg_tokens_per_request": round(total_tokens / total_requests, 2),
+        "avg_cost_per_request": round(total_cost / total_requests, 4),
+    }
+
+
 def _calculate_provider_statistics(
     logs: list[dict[str, Any]], provider_name: str, gateway: str | None = None
 ) -> dict[str, Any]:
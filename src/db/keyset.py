@@ -0,0 +1,85 @@
+"""
+Keyset (cursor) pagination over ``(created_at, id)``.
+
+Offset pagination makes Postgres walk and discard every skipped row, so each
+page gets slower the deeper it is. A keyset page instead asks for the rows
+strictly after the last ``(created_at, id)`` already returned, which a
+``(created_at, id)`` index answers with one seek whatever the depth. The tuple
+travels to clients as an opaque cursor string.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Callable
+from typing import Any
+
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    """Encode a ``(created_at, id)`` position as an opaque, URL-safe cursor."""
+    raw = json.dumps([created_at, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(created_at, str) or not isinstance(row_id, int) or '"' in created_at:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+
+def cursor_for(row: dict[str, Any]) -> str | None:
+    """Cursor positioned just after ``row``, or None if it lacks created_at/id."""
+    if row.get("created_at") is None or row.get("id") is None:
+        return None
+    return encode_cursor(str(row["created_at"]), int(row["id"]))
+
+
+def apply_keyset(query: Any, cursor: str | None, limit: int, *, desc: bool = True) -> Any:
+    """
+    Restrict a PostgREST query to the ``limit`` rows after ``cursor``.
+
+    Orders by ``(created_at, id)`` so ties on created_at still page
+    deterministically. The query must not already use ``or_`` on the base table.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        op = "lt" if desc else "gt"
+        query = query.or_(
+            f'created_at.{op}."{created_at}",' f'and(created_at.eq."{created_at}",id.{op}.{row_id})'
+        )
+    return query.order("created_at", desc=desc).order("id", desc=desc).limit(limit)
+
+
+def fetch_keyset_page(
+    build_query: Callable[[], Any],
+    cursor: str | None,
+    limit: int,
+    *,
+    desc: bool = True,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    Fetch one page of a filtered query.
+
+    Args:
+        build_query: Returns a fresh filtered (unordered) PostgREST query
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+        desc: Newest first when True
+
+    Returns:
+        (rows, next_cursor); next_cursor is None once the result is exhausted
+    """
+    rows = apply_keyset(build_query(), cursor, limit, desc=desc).execute().data or []
+    next_cursor = cursor_for(rows[-1]) if len(rows) == limit else None
+    return rows, next_cursor
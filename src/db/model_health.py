@@ -5,15 +5,21 @@ This module handles recording and querying model call metrics,
 including response times, success rates, and health status.
 """
 
+import asyncio
 import logging
 from datetime import UTC, datetime
 
 from postgrest.exceptions import APIError
 
+from src.config import Config
 from src.config.supabase_config import get_supabase_client
+from src.db.async_client import QueryPlan, get_async_db, run_plan, run_plan_async
 
 logger = logging.getLogger(__name__)
 
+# Models per lookup query in record_model_calls_batch
+_MODEL_LOOKUP_CHUNK = 150
+
 
 def record_model_call(
     provider: str,
@@ -181,6 +187,128 @@ def record_model_call(
         return {}
 
 
+def record_model_calls_batch(batch: list[dict]) -> int:
+    """
+    Apply pre-aggregated call counts for many provider-model pairs at once.
+
+    Used by the passive health aggregator: instead of a select + upsert per
+    request, each flush does ONE select for every pair in the batch and ONE bulk
+    upsert, so the write rate depends on the number of active models rather than
+    on request volume.
+
+    Each batch entry holds, for one (provider, model) pair since the last flush:
+        provider, model, gateway, call_count, success_count, error_count,
+        response_time_ms_sum, last_response_time_ms, last_status, last_called_at,
+        last_error_message, input_tokens, output_tokens, total_tokens (last call),
+        window (summary merged into metadata["passive_window"])
+
+    Args:
+        batch: Aggregated entries, at most one per provider-model pair
+
+    Returns:
+        Number of rows written (0 if the table doesn't exist)
+    """
+    if not batch:
+        return 0
+    return run_plan(_calls_batch_plan(get_supabase_client(), batch))
+
+
+async def record_model_calls_batch_async(batch: list[dict]) -> int:
+    """Async :func:`record_model_calls_batch`.
+
+    Uses the async DB client when ``Config.SUPABASE_ASYNC_ENABLED``; otherwise
+    runs the sync function in a thread.
+    """
+    if not batch:
+        return 0
+    if not Config.SUPABASE_ASYNC_ENABLED:
+        return await asyncio.to_thread(record_model_calls_batch, batch)
+    return await run_plan_async(_calls_batch_plan(get_async_db(), batch))
+
+
+def _calls_batch_plan(supabase, batch: list[dict]) -> QueryPlan:
+    """Query plan for :func:`record_model_calls_batch` (see ``src.db.async_client``)."""
+    try:
+        models = sorted({entry["model"] for entry in batch})
+        existing_rows = []
+        # Chunked so the model list stays well within URL length limits
+        for i in range(0, len(models), _MODEL_LOOKUP_CHUNK):
+            existing = yield (
+                supabase.table("model_health_tracking")
+                .select(
+                    "provider,model,call_count,success_count,error_count,"
+                    "average_response_time_ms,metadata,last_error_message,"
+                    "input_tokens,output_tokens,total_tokens"
+                )
+                .in_("model", models[i : i + _MODEL_LOOKUP_CHUNK])
+            )
+            existing_rows.extend(existing.data or [])
+    except APIError as e:
+        if "PGRST205" in str(e) or "Could not find the table" in str(e):
+            logger.debug("model_health_tracking table not found - skipping health batch")
+            return 0
+        raise
+
+    current = {(row["provider"], row["model"]): row for row in existing_rows}
+
+    rows = []
+    for entry in batch:
+        provider, model = entry["provider"], entry["model"]
+        record = current.get((provider, model))
+        calls = entry["call_count"]
+
+        if record:
+            new_call_count = record["call_count"] + calls
+            if record["average_response_time_ms"] is not None:
+                new_avg = (
+                    record["average_response_time_ms"] * record["call_count"]
+                    + entry["response_time_ms_sum"]
+                ) / new_call_count
+            else:
+                new_avg = entry["response_time_ms_sum"] / calls
+            success_count = record["success_count"] + entry["success_count"]
+            error_count = record["error_count"] + entry["error_count"]
+            metadata = dict(record.get("metadata") or {})
+        else:
+            new_call_count = calls
+            new_avg = entry["response_time_ms_sum"] / calls
+            success_count = entry["success_count"]
+            error_count = entry["error_count"]
+            metadata = {}
+
+        metadata["passive_window"] = entry["window"]
+
+        row = {
+            "provider": provider,
+            "model": model,
+            "gateway": entry.get("gateway") or provider,
+            "last_response_time_ms": entry["last_response_time_ms"],
+            "last_status": entry["last_status"],
+            "last_called_at": entry["last_called_at"],
+            "call_count": new_call_count,
+            "success_count": success_count,
+            "error_count": error_count,
+            "average_response_time_ms": new_avg,
+            "metadata": metadata,
+        }
+        for column in ("last_error_message", "input_tokens", "output_tokens", "total_tokens"):
+            if entry.get(column) is not None:
+                row[column] = entry[column]
+        rows.append(row)
+
+    # PostgREST bulk upserts need every row to carry the same columns; a pair
+    # that didn't report one keeps its stored value
+    columns = set().union(*rows)
+    for row in rows:
+        for column in columns - row.keys():
+            row[column] = current.get((row["provider"], row["model"]), {}).get(column)
+
+    result = yield supabase.table("model_health_tracking").upsert(
+        rows, on_conflict="provider,model"
+    )
+    return len(result.data or [])
+
+
 def get_model_health(provider: str, model: str) -> dict | None:
     """
     Get health tracking data for a specific provider-model combination.
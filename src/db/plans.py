@@ -3,6 +3,10 @@ from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from src.config.supabase_config import get_supabase_client
+from src.services.request_principal import (
+    invalidate_request_principal,
+    peek_request_principal_for_user,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -73,12 +77,14 @@ def get_user_plan_cache_stats() -> dict[str, Any]:
 def invalidate_usage_cache(user_id: int) -> None:
     """Invalidate cache for a specific user (e.g., after usage recorded)"""
     clear_usage_cache(user_id)
+    invalidate_request_principal(user_id=user_id)
     logger.debug(f"Invalidated usage cache for user {user_id}")
 
 
 def invalidate_user_plan_cache(user_id: int) -> None:
     """Invalidate user plan cache for a specific user (e.g., after plan change)"""
     clear_user_plan_cache(user_id)
+    invalidate_request_principal(user_id=user_id)
     logger.debug(f"Invalidated user plan cache for user {user_id}")
 
 
@@ -162,6 +168,57 @@ def get_plan_id_by_tier(tier: str) -> int | None:
         return None
 
 
+def build_user_plan(
+    user_id: int, user_plan: dict[str, Any], plan: dict[str, Any] | None
+) -> dict[str, Any]:
+    """Combine a ``user_plans`` row and its ``plans`` row into the get_user_plan shape.
+
+    Shared by the per-query path below and the request-principal snapshot
+    (``src/services/request_principal.py``), which receives both rows from one RPC.
+    """
+    if not plan:
+        # Fallback: still surface the existence of an active user_plan
+        return {
+            "user_plan_id": user_plan["id"],
+            "user_id": user_id,
+            "plan_id": user_plan["plan_id"],
+            "plan_name": "Unknown",
+            "plan_description": "",
+            "daily_request_limit": DEFAULT_DAILY_REQUEST_LIMIT,
+            "monthly_request_limit": DEFAULT_MONTHLY_REQUEST_LIMIT,
+            "daily_token_limit": DEFAULT_DAILY_TOKEN_LIMIT,
+            "monthly_token_limit": DEFAULT_MONTHLY_TOKEN_LIMIT,
+            "price_per_month": 0,
+            "features": [],
+            "start_date": user_plan["started_at"],
+            "end_date": user_plan["expires_at"],
+            "is_active": True,
+        }
+
+    features = plan.get("features", [])
+    if isinstance(features, dict):
+        features = list(features.keys())
+    elif not isinstance(features, list):
+        features = []
+
+    return {
+        "user_plan_id": user_plan["id"],
+        "user_id": user_id,
+        "plan_id": plan["id"],
+        "plan_name": plan["name"],
+        "plan_description": plan.get("description", ""),
+        "daily_request_limit": plan["daily_request_limit"],
+        "monthly_request_limit": plan["monthly_request_limit"],
+        "daily_token_limit": plan["daily_token_limit"],
+        "monthly_token_limit": plan["monthly_token_limit"],
+        "price_per_month": plan["price_per_month"],
+        "features": features,
+        "start_date": user_plan["started_at"],
+        "end_date": user_plan["expires_at"],
+        "is_active": user_plan["is_active"],
+    }
+
+
 def _get_user_plan_uncached(user_id: int) -> dict[str, Any] | None:
     """Internal function: Get user plan from database (no caching)"""
     try:
@@ -182,52 +239,11 @@ def _get_user_plan_uncached(user_id: int) -> dict[str, Any] | None:
         # Reuse helper so feature normalization is consistent
         plan = get_plan_by_id(user_plan["plan_id"])
 
-        if not plan:
-            # Fallback: still surface the existence of an active user_plan
-            return {
-                "user_plan_id": user_plan["id"],
-                "user_id": user_id,
-                "plan_id": user_plan["plan_id"],
-                "plan_name": "Unknown",
-                "plan_description": "",
-                "daily_request_limit": DEFAULT_DAILY_REQUEST_LIMIT,
-                "monthly_request_limit": DEFAULT_MONTHLY_REQUEST_LIMIT,
-                "daily_token_limit": DEFAULT_DAILY_TOKEN_LIMIT,
-                "monthly_token_limit": DEFAULT_MONTHLY_TOKEN_LIMIT,
-                "price_per_month": 0,
-                "features": [],
-                "start_date": user_plan["started_at"],
-                "end_date": user_plan["expires_at"],
-                "is_active": True,
-            }
-
-        features = plan.get("features", [])
-        if isinstance(features, dict):
-            features = list(features.keys())
-        elif not isinstance(features, list):
-            features = []
-
         logger.info("get_user_plan: user=%s", user_id)
         logger.info(" -> found active user_plans: %s", bool(user_plan_result.data))
-        if user_plan_result.data:
-            logger.info(" -> plan lookup id=%s", user_plan_result.data[0]["plan_id"])
-            logger.info(" -> plan found: %s", bool(plan))
-        return {
-            "user_plan_id": user_plan["id"],
-            "user_id": user_id,
-            "plan_id": plan["id"],
-            "plan_name": plan["name"],
-            "plan_description": plan.get("description", ""),
-            "daily_request_limit": plan["daily_request_limit"],
-            "monthly_request_limit": plan["monthly_request_limit"],
-            "daily_token_limit": plan["daily_token_limit"],
-            "monthly_token_limit": plan["monthly_token_limit"],
-            "price_per_month": plan["price_per_month"],
-            "features": features,
-            "start_date": user_plan["started_at"],
-            "end_date": user_plan["expires_at"],
-            "is_active": user_plan["is_active"],
-        }
+        logger.info(" -> plan lookup id=%s", user_plan["plan_id"])
+        logger.info(" -> plan found: %s", bool(plan))
+        return build_user_plan(user_id, user_plan, plan)
     except Exception as e:
         logger.error(f"Error getting user plan for user {user_id}: {e}")
         return None
@@ -239,6 +255,10 @@ def get_user_plan(user_id: int) -> dict[str, Any] | None:
     Caching prevents concurrent Supabase calls that can trigger Cloudflare
     rate limiting (400 Bad Request with HTML response instead of JSON).
     """
+    principal = peek_request_principal_for_user(user_id)
+    if principal is not None:
+        return principal.plan
+
     cache_key = f"user_plan:{user_id}"
 
     # PERF: Check cache first to avoid database queries and rate limiting
@@ -340,18 +360,24 @@ def check_plan_entitlements(user_id: int, required_feature: str = None) -> dict[
         user_plan = get_user_plan(user_id)
 
         # If get_user_plan() failed, inspect user_plans directly to avoid dropping to trial by mistake
+        # (The request-principal snapshot already read user_plans in the same
+        # query that produced user_plan=None, so it skips the re-check.)
         if not user_plan:
-            client = get_supabase_client()
-            up_rs = (
-                client.table("user_plans")
-                .select("*")
-                .eq("user_id", user_id)
-                .eq("is_active", True)
-                .execute()
-            )
-
-            if up_rs.data:
-                up = up_rs.data[0]
+            up_rows = []
+            if peek_request_principal_for_user(user_id) is None:
+                client = get_supabase_client()
+                up_rs = (
+                    client.table("user_plans")
+                    .select("*")
+                    .eq("user_id", user_id)
+                    .eq("is_active", True)
+                    .execute()
+                )
+                up_rows = up_rs.data or []
+
+            if up_rows:
+                client = get_supabase_client()
+                up = up_rows[0]
                 end_str = up.get("expires_at")
                 end_dt = None
                 if end_str:
@@ -498,6 +524,44 @@ def check_plan_entitlements(user_id: int, required_feature: str = None) -> dict[
         }
 
 
+def build_usage_summary(
+    entitlements: dict[str, Any],
+    *,
+    daily_requests: int,
+    daily_tokens: int,
+    monthly_requests: int,
+    monthly_tokens: int,
+) -> dict[str, Any]:
+    """Shape plan-window usage counts against entitlements (get_user_usage_within_plan_limits)."""
+    return {
+        "plan_name": entitlements["plan_name"],
+        "usage": {
+            "daily_requests": daily_requests,
+            "daily_tokens": daily_tokens,
+            "monthly_requests": monthly_requests,
+            "monthly_tokens": monthly_tokens,
+        },
+        "limits": {
+            "daily_request_limit": entitlements["daily_request_limit"],
+            "daily_token_limit": entitlements["daily_token_limit"],
+            "monthly_request_limit": entitlements["monthly_request_limit"],
+            "monthly_token_limit": entitlements["monthly_token_limit"],
+        },
+        "remaining": {
+            "daily_requests": max(0, entitlements["daily_request_limit"] - daily_requests),
+            "daily_tokens": max(0, entitlements["daily_token_limit"] - daily_tokens),
+            "monthly_requests": max(0, entitlements["monthly_request_limit"] - monthly_requests),
+            "monthly_tokens": max(0, entitlements["monthly_token_limit"] - monthly_tokens),
+        },
+        "at_limit": {
+            "daily_requests": daily_requests >= entitlements["daily_request_limit"],
+            "daily_tokens": daily_tokens >= entitlements["daily_token_limit"],
+            "monthly_requests": monthly_requests >= entitlements["monthly_request_limit"],
+            "monthly_tokens": monthly_tokens >= entitlements["monthly_token_limit"],
+        },
+    }
+
+
 def _get_user_usage_within_plan_limits_uncached(user_id: int) -> dict[str, Any]:
     """Internal function: Get user usage from database (no caching)"""
     try:
@@ -533,35 +597,13 @@ def _get_user_usage_within_plan_limits_uncached(user_id: int) -> dict[str, Any]:
         daily_requests = len(daily_usage_result.data or [])
         monthly_requests = len(monthly_usage_result.data or [])
 
-        return {
-            "plan_name": entitlements["plan_name"],
-            "usage": {
-                "daily_requests": daily_requests,
-                "daily_tokens": daily_tokens,
-                "monthly_requests": monthly_requests,
-                "monthly_tokens": monthly_tokens,
-            },
-            "limits": {
-                "daily_request_limit": entitlements["daily_request_limit"],
-                "daily_token_limit": entitlements["daily_token_limit"],
-                "monthly_request_limit": entitlements["monthly_request_limit"],
-                "monthly_token_limit": entitlements["monthly_token_limit"],
-            },
-            "remaining": {
-                "daily_requests": max(0, entitlements["daily_request_limit"] - daily_requests),
-                "daily_tokens": max(0, entitlements["daily_token_limit"] - daily_tokens),
-                "monthly_requests": max(
-                    0, entitlements["monthly_request_limit"] - monthly_requests
-                ),
-                "monthly_tokens": max(0, entitlements["monthly_token_limit"] - monthly_tokens),
-            },
-            "at_limit": {
-                "daily_requests": daily_requests >= entitlements["daily_request_limit"],
-                "daily_tokens": daily_tokens >= entitlements["daily_token_limit"],
-                "monthly_requests": monthly_requests >= entitlements["monthly_request_limit"],
-                "monthly_tokens": monthly_tokens >= entitlements["monthly_token_limit"],
-            },
-        }
+        return build_usage_summary(
+            entitlements,
+            daily_requests=daily_requests,
+            daily_tokens=daily_tokens,
+            monthly_requests=monthly_requests,
+            monthly_tokens=monthly_tokens,
+        )
 
     except Exception as e:
         logger.error(f"Error getting usage within plan limits for user {user_id}: {e}")
@@ -570,6 +612,10 @@ def _get_user_usage_within_plan_limits_uncached(user_id: int) -> dict[str, Any]:
 
 def get_user_usage_within_plan_limits(user_id: int) -> dict[str, Any]:
     """Get user's current usage against their plan limits with caching (saves ~50-80ms per request)"""
+    principal = peek_request_principal_for_user(user_id)
+    if principal is not None:
+        return build_usage_summary(check_plan_entitlements(user_id), **principal.usage)
+
     cache_key = f"usage:{user_id}"
 
     # PERF: Check cache first to avoid database queries
@@ -671,6 +717,26 @@ def enforce_plan_limits(
         return {"allowed": False, "reason": "Error checking plan limits"}
 
 
+def plan_limits_need_io(user_id: int) -> bool:
+    """False when enforce_plan_limits(user_id) is answered from the cached request principal.
+
+    Plan, usage and admin tier then come from the snapshot; only an expired plan
+    (which enforce_plan_limits deactivates) still writes to the database.
+    """
+    principal = peek_request_principal_for_user(user_id)
+    if principal is None:
+        return True
+    if principal.is_admin or not principal.plan:
+        return False
+    end_date = principal.plan.get("end_date")
+    if not end_date:
+        return False
+    try:
+        return datetime.fromisoformat(end_date.replace("Z", "+00:00")) < datetime.now(UTC)
+    except (TypeError, ValueError):
+        return True  # let enforce_plan_limits deal with the odd value
+
+
 def get_subscription_plans() -> list[dict[str, Any]]:
     """Get available subscription plans"""
     try:
@@ -698,6 +764,10 @@ def is_admin_tier_user(user_id: int) -> bool:
     if not ADMIN_BYPASS_LIMITS:
         return False
 
+    principal = peek_request_principal_for_user(user_id)
+    if principal is not None:
+        return principal.is_admin
+
     try:
         client = get_supabase_client()
 
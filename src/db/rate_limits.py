@@ -5,6 +5,7 @@ from typing import Any
 
 from src.config.supabase_config import get_supabase_client
 from src.db.users import get_user
+from src.services.request_principal import invalidate_request_principal
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +114,7 @@ async def set_user_rate_limits(api_key: str, rate_limits: dict[str, int]) -> Non
 
         # Execute the synchronous function in a thread pool
         await asyncio.to_thread(_set_rate_limits_sync)
+        invalidate_request_principal(api_key=api_key)
 
     except ValueError:
         # Re-raise ValueError as-is for proper error handling (400 response)
@@ -391,6 +393,36 @@ def get_environment_usage_summary(user_id: int) -> dict[str, Any]:
 # =============================================================================
 
 
+# Per-key config returned when neither api_keys_new.rate_limit_config nor a
+# rate_limit_configs row exists.
+DEFAULT_KEY_RATE_LIMIT_CONFIG: dict[str, int] = {
+    "requests_per_minute": 60,
+    "requests_per_hour": 1000,
+    "requests_per_day": 10000,
+    "tokens_per_minute": 10000,
+    "tokens_per_hour": 100000,
+    "tokens_per_day": 1000000,
+    "burst_limit": 100,
+    "concurrency_limit": 50,
+    "window_size_seconds": 60,
+}
+
+
+def rate_limit_config_from_row(config: dict[str, Any]) -> dict[str, Any]:
+    """Translate a ``rate_limit_configs`` row (hourly maxima) into per-window limits."""
+    return {
+        "requests_per_minute": config.get("max_requests", 1000) // 60,
+        "requests_per_hour": config.get("max_requests", 1000),
+        "requests_per_day": config.get("max_requests", 1000) * 24,
+        "tokens_per_minute": config.get("max_tokens", 1000000) // 60,
+        "tokens_per_hour": config.get("max_tokens", 1000000),
+        "tokens_per_day": config.get("max_tokens", 1000000) * 24,
+        "burst_limit": config.get("burst_limit", 100),
+        "concurrency_limit": config.get("concurrency_limit", 50),
+        "window_size_seconds": config.get("window_size", 60),
+    }
+
+
 def get_rate_limit_config(api_key: str) -> dict[str, Any] | None:
     """Get rate limit configuration for a specific API key"""
     try:
@@ -422,33 +454,12 @@ def get_rate_limit_config(api_key: str) -> dict[str, Any] | None:
                     .execute()
                 )
                 if config_result.data and len(config_result.data) > 0:
-                    config = config_result.data[0]
-                    return {
-                        "requests_per_minute": config.get("max_requests", 1000) // 60,
-                        "requests_per_hour": config.get("max_requests", 1000),
-                        "requests_per_day": config.get("max_requests", 1000) * 24,
-                        "tokens_per_minute": config.get("max_tokens", 1000000) // 60,
-                        "tokens_per_hour": config.get("max_tokens", 1000000),
-                        "tokens_per_day": config.get("max_tokens", 1000000) * 24,
-                        "burst_limit": config.get("burst_limit", 100),
-                        "concurrency_limit": config.get("concurrency_limit", 50),
-                        "window_size_seconds": config.get("window_size", 60),
-                    }
+                    return rate_limit_config_from_row(config_result.data[0])
         except Exception as e:
             logger.debug(f"rate_limit_configs table not available: {e}")
 
         # Fallback to default config
-        return {
-            "requests_per_minute": 60,
-            "requests_per_hour": 1000,
-            "requests_per_day": 10000,
-            "tokens_per_minute": 10000,
-            "tokens_per_hour": 100000,
-            "tokens_per_day": 1000000,
-            "burst_limit": 100,
-            "concurrency_limit": 50,
-            "window_size_seconds": 60,
-        }
+        return dict(DEFAULT_KEY_RATE_LIMIT_CONFIG)
 
     except Exception as e:
         logger.error(f"Error getting rate limit config for key {api_key[:10]}...: {e}")
@@ -475,6 +486,7 @@ def update_rate_limit_config(api_key: str, config: dict[str, Any]) -> bool:
             )
 
             if len(result.data) > 0:
+                invalidate_request_principal(api_key=api_key)
                 return True
         except Exception as e:
             logger.debug(f"Could not update rate_limit_config in api_keys_new: {e}")
@@ -515,6 +527,7 @@ def update_rate_limit_config(api_key: str, config: dict[str, Any]) -> bool:
                             "window_size": config.get("window_size_seconds", 60),
                         }
                     ).execute()
+                invalidate_request_principal(api_key=api_key)
                 return True
         except Exception as e:
             logger.debug(f"Could not update rate_limit_configs table: {e}")
@@ -625,6 +638,7 @@ def bulk_update_rate_limit_configs(user_id: int, config: dict[str, Any]) -> int:
             .execute()
         )
 
+        invalidate_request_principal(user_id=user_id)
         return len(result.data)
 
     except Exception as e:
@@ -0,0 +1,51 @@
+"""Database access for the per-request principal snapshot.
+
+One call to the ``get_request_principal`` function
+(supabase/migrations/20261018000000_add_get_request_principal.sql) returns the
+key, user, active plan, admin tier, plan-window usage, rate-limit config,
+routing policy and BYOK provider slugs for an API key. Caching and the typed
+snapshot live in ``src/services/request_principal.py``.
+"""
+
+import logging
+from typing import Any
+
+from src.config.supabase_config import get_supabase_client
+from src.utils.db_instrumentation import track_database_query
+from src.utils.security_validators import sanitize_for_logging
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_request_principal(api_key: str) -> dict[str, Any] | None:
+    """Fetch the raw principal document for ``api_key``.
+
+    Returns the parsed JSONB dict, or None when the key is unknown. Raises on
+    transport/RPC errors so the caller can fall back to the per-query path.
+    """
+    client = get_supabase_client()
+    with track_database_query(table="get_request_principal", operation="rpc"):
+        result = client.rpc("get_request_principal", {"p_api_key": api_key}).execute()
+    return _principal_doc(result.data)
+
+
+async def fetch_request_principal_async(api_key: str) -> dict[str, Any] | None:
+    """Async :func:`fetch_request_principal`; concurrent loads of one key share the RPC."""
+    from src.db.async_client import execute, get_async_db
+
+    query = get_async_db().rpc("get_request_principal", {"p_api_key": api_key})
+    with track_database_query(table="get_request_principal", operation="rpc"):
+        result = await execute(query, coalesce=True)
+    return _principal_doc(result.data)
+
+
+def _principal_doc(data: Any) -> dict[str, Any] | None:
+    if isinstance(data, list):
+        data = data[0] if data else None
+    if data is not None and not isinstance(data, dict):
+        logger.warning(
+            "get_request_principal returned unexpected payload type: %s",
+            sanitize_for_logging(type(data).__name__),
+        )
+        return None
+    return data
@@ -0,0 +1,350 @@
+"""Request rollups: minute/hour/day request aggregates.
+
+Wraps the functions in supabase/migrations/20261019000000_add_request_rollups.sql.
+The API workers add per-minute deltas (see src/services/request_rollups.py), a
+leader job rebuilds recent closed buckets from chat_completion_requests, and the
+analytics endpoints read totals and series from here instead of scanning raw
+rows.
+
+A read over [start, end) is split into whole days, whole hours at the edges and
+minutes for the rest (:func:`decompose_range`), so it touches a number of rows
+proportional to the range, not to traffic. Edges older than a grain's retention
+are widened to the next coarser grain.
+
+Every read returns None when the rollups cannot answer (read path disabled,
+migration not applied, query failure) so callers can fall back to their raw
+aggregation.
+"""
+
+import logging
+import time
+from bisect import bisect_right
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from src.config import Config
+from src.config.supabase_config import get_supabase_client
+from src.utils.db_instrumentation import track_database_query
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = ("minute", "hour", "day")
+BUCKET_STEPS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Upper bounds (ms) of the first nine latency slots; the tenth is open-ended
+LATENCY_BOUNDS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Lower bound for "all time" reads
+ROLLUP_EPOCH = datetime(2020, 1, 1, tzinfo=UTC)
+
+# Series longer than this many points step up to the next coarser grain
+MAX_SERIES_POINTS = 400
+
+# Set when PostgREST reports the functions missing; rechecked after a while so a
+# migration applied to a running deployment is picked up without a restart
+_missing_until = 0.0
+_MISSING_RECHECK_SECONDS = 600
+
+_MISSING_MARKERS = ("PGRST202", "PGRST205", "Could not find the function", "42P01")
+
+
+def latency_slot(latency_ms: float) -> int:
+    """Histogram slot (0-9) for a latency, matching rollup_latency_slot() - 1."""
+    return bisect_right(LATENCY_BOUNDS_MS, latency_ms)
+
+
+def floor_bucket(ts: datetime, bucket: str) -> datetime:
+    if bucket == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if bucket == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_bucket(ts: datetime, bucket: str) -> datetime:
+    floored = floor_bucket(ts, bucket)
+    return floored if floored == ts else floored + BUCKET_STEPS[bucket]
+
+
+def parse_timestamp(value: str | datetime | date) -> datetime:
+    """Parse an ISO timestamp or date into an aware UTC datetime."""
+    if isinstance(value, datetime):
+        ts = value
+    elif isinstance(value, date):
+        ts = datetime(value.year, value.month, value.day)
+    else:
+        ts = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=UTC)
+    return ts.astimezone(UTC)
+
+
+def _retention_floor(bucket: str, now: datetime) -> datetime | None:
+    if bucket == "minute":
+        return now - timedelta(days=Config.REQUEST_ROLLUPS_MINUTE_RETENTION_DAYS)
+    if bucket == "hour":
+        return now - timedelta(days=Config.REQUEST_ROLLUPS_HOUR_RETENTION_DAYS)
+    return None
+
+
+def _finest_retained(ts: datetime, now: datetime) -> str:
+    for bucket in BUCKETS:
+        floor = _retention_floor(bucket, now)
+        if floor is None or ts >= floor:
+            return bucket
+    return "day"
+
+
+def decompose_range(
+    start: datetime, end: datetime, now: datetime | None = None
+) -> list[tuple[str, datetime, datetime]]:
+    """
+    Split [start, end) into non-overlapping (bucket, lo, hi) spans.
+
+    Whole days are read from day rows, whole hours left at either edge from hour
+    rows and the remaining minutes from minute rows. Each edge is first rounded
+    outward to the finest grain still retained at that point in time.
+    """
+    now = now or datetime.now(UTC)
+    start = floor_bucket(start, _finest_retained(start, now))
+    end = ceil_bucket(end, _finest_retained(end, now))
+    if end <= start:
+        return []
+
+    hour_lo, hour_hi = ceil_bucket(start, "hour"), floor_bucket(end, "hour")
+    if hour_lo >= hour_hi:
+        return [("minute", start, end)]
+    day_lo, day_hi = ceil_bucket(start, "day"), floor_bucket(end, "day")
+
+    spans = [("minute", start, hour_lo)]
+    if day_lo >= day_hi:
+        spans.append(("hour", hour_lo, hour_hi))
+    else:
+        spans += [("hour", hour_lo, day_lo), ("day", day_lo, day_hi), ("hour", day_hi, hour_hi)]
+    spans.append(("minute", hour_hi, end))
+    return [(bucket, lo, hi) for bucket, lo, hi in spans if lo < hi]
+
+
+def series_bucket(start: datetime | None, end: datetime, now: datetime | None = None) -> str:
+    """The finest retained grain that plots [start, end) in at most MAX_SERIES_POINTS."""
+    if start is None:
+        return "day"
+    now = now or datetime.now(UTC)
+    for bucket in BUCKETS:
+        floor = _retention_floor(bucket, now)
+        if floor is not None and start < floor:
+            continue
+        if (end - start) / BUCKET_STEPS[bucket] <= MAX_SERIES_POINTS:
+            return bucket
+    return "day"
+
+
+def _is_missing(error: Exception) -> bool:
+    message = str(error)
+    return any(marker in message for marker in _MISSING_MARKERS)
+
+
+def _mark_missing() -> None:
+    global _missing_until
+    _missing_until = time.monotonic() + _MISSING_RECHECK_SECONDS
+    logger.info("Request rollups are not deployed, analytics use raw aggregation")
+
+
+def rollups_available() -> bool:
+    """Whether the rollup functions are deployed, as far as this worker knows."""
+    return time.monotonic() >= _missing_until
+
+
+def rollups_readable() -> bool:
+    """Whether analytics reads should try the rollups first."""
+    return Config.REQUEST_ROLLUPS_READ_ENABLED and rollups_available()
+
+
+def reset_rollup_availability() -> None:
+    """Forget a cached "not deployed" verdict (tests, post-migration)."""
+    global _missing_until
+    _missing_until = 0.0
+
+
+def _rpc(name: str, params: dict[str, Any]) -> Any:
+    """Call a rollup function; None when it is missing or fails."""
+    try:
+        with track_database_query(table="request_rollups", operation="rpc"):
+            return get_supabase_client().rpc(name, params).execute().data
+    except Exception as e:
+        if _is_missing(e):
+            _mark_missing()
+        else:
+            logger.warning(f"Request rollup call {name} failed: {e}")
+        return None
+
+
+def _spans_param(spans: list[tuple[str, datetime, datetime]]) -> list[dict[str, str]]:
+    return [{"bucket": b, "lo": lo.isoformat(), "hi": hi.isoformat()} for b, lo, hi in spans]
+
+
+# ==================== Writes ====================
+
+
+def apply_rollup_deltas(rows: list[dict[str, Any]]) -> int | None:
+    """Add per-minute deltas to every grain; returns rows upserted, None if not deployed."""
+    if not rows:
+        return 0
+    if not rollups_available():
+        return None
+    try:
+        with track_database_query(table="request_rollups", operation="rpc"):
+            result = (
+                get_supabase_client().rpc("apply_request_rollup_deltas", {"p_rows": rows}).execute()
+            )
+    except Exception as e:
+        if _is_missing(e):
+            _mark_missing()
+            return None
+        raise
+    return int(result.data or 0)
+
+
+def rebuild_rollups(start: datetime, end: datetime) -> int:
+    """Recompute the closed buckets in [start, end) from chat_completion_requests."""
+    with track_database_query(table="request_rollups", operation="rpc"):
+        result = (
+            get_supabase_client()
+            .rpc(
+                "rebuild_request_rollups",
+                {"p_start": start.isoformat(), "p_end": end.isoformat()},
+            )
+            .execute()
+        )
+    return int(result.data or 0)
+
+
+def prune_rollups(now: datetime | None = None) -> dict[str, int]:
+    """Delete minute and hour rows older than their retention."""
+    now = now or datetime.now(UTC)
+    client = get_supabase_client()
+    deleted = {}
+    for bucket in ("minute", "hour"):
+        cutoff = floor_bucket(_retention_floor(bucket, now), "day")
+        result = (
+            client.table("request_rollups")
+            .delete()
+            .eq("bucket", bucket)
+            .lt("bucket_start", cutoff.isoformat())
+            .execute()
+        )
+        deleted[bucket] = len(result.data or [])
+    return deleted
+
+
+# ==================== Reads ====================
+
+
+def fetch_rollup_totals(
+    start: datetime | None,
+    end: datetime | None = None,
+    *,
+    user_id: int | None = None,
+    model_ids: list[int] | None = None,
+    provider_id: int | None = None,
+    with_users: bool = False,
+) -> list[dict[str, Any]] | None:
+    """
+    Per-model totals over [start, end).
+
+    Rows carry model_id, model_name, provider_model_id, provider_id,
+    provider_slug, requests, errors, input_tokens, output_tokens, cost_usd,
+    latency_ms_sum, latency_hist, first_request_at, last_request_at and, with
+    ``with_users``, unique_users. ``user_id`` restricts to one user's requests.
+    None for ``start``/``end`` means all time / now.
+    """
+    if not rollups_readable():
+        return None
+    spans = decompose_range(start or ROLLUP_EPOCH, end or datetime.now(UTC))
+    if not spans:
+        return []
+    return _rpc(
+        "request_rollup_totals",
+        {
+            "p_spans": _spans_param(spans),
+            "p_user_id": user_id,
+            "p_model_ids": model_ids,
+            "p_provider_id": provider_id,
+            "p_with_users": with_users,
+        },
+    )
+
+
+def fetch_rollup_user_count(
+    start: datetime | None,
+    end: datetime | None = None,
+    model_ids: list[int] | None = None,
+) -> int | None:
+    """Distinct signed-in users with requests in [start, end)."""
+    if not rollups_readable():
+        return None
+    spans = decompose_range(start or ROLLUP_EPOCH, end or datetime.now(UTC))
+    if not spans:
+        return 0
+    result = _rpc(
+        "request_rollup_user_count",
+        {"p_spans": _spans_param(spans), "p_model_ids": model_ids},
+    )
+    return None if result is None else int(result or 0)
+
+
+def fetch_rollup_series(
+    bucket: str,
+    start: datetime | None,
+    end: datetime,
+    *,
+    user_id: int | None = None,
+    model_ids: list[int] | None = None,
+    provider_id: int | None = None,
+) -> list[dict[str, Any]] | None:
+    """
+    Per-bucket totals (summed over models) for buckets starting in [start, end).
+
+    ``start`` and ``end`` are widened to whole buckets; None for ``start`` reads
+    from the first bucket on record.
+    """
+    if not rollups_readable():
+        return None
+    return _rpc(
+        "request_rollup_series",
+        {
+            "p_bucket": bucket,
+            "p_start": floor_bucket(start, bucket).isoformat() if start else None,
+            "p_end": ceil_bucket(end, bucket).isoformat(),
+            "p_user_id": user_id,
+            "p_model_ids": model_ids,
+            "p_provider_id": provider_id,
+        },
+    )
+
+
+def fetch_signup_series(start: date, end: date) -> list[dict[str, Any]] | None:
+    """Daily signups and cumulative user count for each day in [start, end]."""
+    if not rollups_readable():
+        return None
+    return _rpc(
+        "user_signup_series",
+        {"p_start": start.isoformat(), "p_end": end.isoformat()},
+    )
+
+
+def model_label(row: dict[str, Any]) -> str:
+    """The model identifier analytics report for a totals row."""
+    return row.get("provider_model_id") or row.get("model_name") or "unknown"
+
+
+def successful_requests(row: dict[str, Any]) -> int:
+    return int(row.get("requests") or 0) - int(row.get("errors") or 0)
+
+
+def rollup_tokens(row: dict[str, Any]) -> int:
+    return int(row.get("input_tokens") or 0) + int(row.get("output_tokens") or 0)
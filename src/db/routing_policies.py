@@ -19,6 +19,7 @@ import logging
 from typing import Any
 
 from src.config.supabase_config import get_supabase_client
+from src.services.request_principal import peek_request_principal
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,10 @@ def get_routing_policy_for_key(api_key: str) -> dict[str, Any] | None:
     Returns None on no row / any lookup error -- callers must treat that as
     "no override, fall back to the global default," never as a hard failure.
     """
+    principal = peek_request_principal(api_key)
+    if principal is not None:
+        return principal.routing_policy
+
     try:
         client = get_supabase_client()
         key_record = client.table("api_keys_new").select("id").eq("api_key", api_key).execute()
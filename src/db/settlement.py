@@ -0,0 +1,281 @@
+"""Single-RPC request settlement.
+
+Wraps the ``settle_request`` database function
+(supabase/migrations/20261018000001_add_settle_request.sql), which performs the
+credit deduction, credit_transactions row, usage_records row, rate_limit_usage
+windows, optional shadow credit_ledger entry and the chat_completion_requests
+row for a request in ONE transaction, idempotent by request id.
+
+Callers fall back to the multi-call path (``deduct_credits`` + ``record_usage``
++ ...) only when :func:`settle_request` returns None, i.e. the function is not
+deployed. Any other failure raises: because the RPC is idempotent, retrying it
+is always safe, whereas falling back after an ambiguous failure is not.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from src.config import Config
+from src.config.supabase_config import get_supabase_client
+from src.config.usage_limits import DAILY_USAGE_LIMIT, ENFORCE_DAILY_LIMITS, TRACK_DAILY_USAGE
+from src.services.request_rollups import record_request
+from src.utils.db_instrumentation import track_database_query
+from src.utils.security_validators import sanitize_for_logging
+
+logger = logging.getLogger(__name__)
+
+# Set once PostgREST reports the function missing, so a worker running ahead of
+# the migration doesn't pay a failed round-trip on every request.
+_rpc_missing = False
+
+_MISSING_FUNCTION_MARKERS = ("PGRST202", "Could not find the function")
+
+
+def _is_missing_function(error: Exception) -> bool:
+    message = str(error)
+    return any(marker in message for marker in _MISSING_FUNCTION_MARKERS)
+
+
+def _raise_for_error(result: dict[str, Any], cost: float) -> None:
+    """Translate a failed settlement into the errors deduct_credits() raises."""
+    error = result.get("error") or "unknown_settlement_error"
+    balance = result.get("new_balance")
+
+    if error == "insufficient_credits":
+        balance_rounded = round(float(balance), 2) if balance is not None else 0.0
+        raise ValueError(
+            f"Insufficient credits. Current balance: ~${balance_rounded:.2f}, "
+            f"Required: ~${round(cost, 2):.2f}. Please add credits to continue."
+        )
+    if error == "daily_limit_exceeded":
+        used = float(balance) if balance is not None else 0.0
+        raise ValueError(
+            f"Daily usage limit exceeded. Used: ${used:.4f}, Limit: ${DAILY_USAGE_LIMIT:.2f}."
+        )
+    if error == "user_not_found":
+        raise ValueError("User with API key not found")
+    raise RuntimeError(f"settle_request failed: {error}")
+
+
+def settle_request(
+    request_id: str,
+    user_id: int,
+    api_key: str,
+    model: str,
+    cost: float,
+    total_tokens: int,
+    description: str,
+    metadata: dict[str, Any] | None = None,
+    *,
+    is_trial: bool = False,
+    update_rate_limits: bool = True,
+    shadow_ledger: bool = False,
+    request_record: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """
+    Settle a completed request in one database round-trip.
+
+    Args:
+        request_id: Idempotency key; replays return the original result
+        user_id: User to charge
+        api_key: API key used for the request
+        model: Model id used for the request
+        cost: Amount in USD (ignored for trial / admin users)
+        total_tokens: Tokens consumed
+        description: credit_transactions description
+        metadata: credit_transactions metadata (model, token counts, ...)
+        is_trial: Log a $0 trial transaction instead of deducting
+        update_rate_limits: Also bump rate_limit_usage and api_keys_new.last_used_at
+        shadow_ledger: Also write the settled credit_ledger double-entry
+        request_record: chat_completion_requests columns (plus ``provider_name``
+            for model resolution); None skips the request record
+
+    Returns:
+        The settlement result dict, or None when the RPC is not deployed
+
+    Raises:
+        ValueError: Insufficient credits, daily limit exceeded or unknown user
+        RuntimeError: Any other settlement failure (safe to retry)
+    """
+    if _rpc_missing:
+        return None
+
+    params = _settle_params(
+        request_id,
+        user_id,
+        api_key,
+        model,
+        cost,
+        total_tokens,
+        description,
+        metadata,
+        is_trial,
+        update_rate_limits,
+        shadow_ledger,
+        request_record,
+    )
+    client = get_supabase_client()
+    try:
+        with track_database_query(table="settle_request", operation="rpc"):
+            response = client.rpc("settle_request", params).execute()
+    except Exception as e:
+        return _rpc_failed(e)
+    return _settled(response.data, request_id, user_id, api_key, model, cost, request_record)
+
+
+async def settle_request_async(
+    request_id: str,
+    user_id: int,
+    api_key: str,
+    model: str,
+    cost: float,
+    total_tokens: int,
+    description: str,
+    metadata: dict[str, Any] | None = None,
+    *,
+    is_trial: bool = False,
+    update_rate_limits: bool = True,
+    shadow_ledger: bool = False,
+    request_record: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """Async :func:`settle_request` (same arguments, result and errors).
+
+    Awaits the RPC on the async DB client when ``Config.SUPABASE_ASYNC_ENABLED``;
+    otherwise runs :func:`settle_request` in a thread.
+    """
+    if not Config.SUPABASE_ASYNC_ENABLED:
+        return await asyncio.to_thread(
+            settle_request,
+            request_id,
+            user_id,
+            api_key,
+            model,
+            cost,
+            total_tokens,
+            description,
+            metadata,
+            is_trial=is_trial,
+            update_rate_limits=update_rate_limits,
+            shadow_ledger=shadow_ledger,
+            request_record=request_record,
+        )
+    if _rpc_missing:
+        return None
+
+    from src.db.async_client import execute, get_async_db
+
+    params = _settle_params(
+        request_id,
+        user_id,
+        api_key,
+        model,
+        cost,
+        total_tokens,
+        description,
+        metadata,
+        is_trial,
+        update_rate_limits,
+        shadow_ledger,
+        request_record,
+    )
+    try:
+        with track_database_query(table="settle_request", operation="rpc"):
+            response = await execute(get_async_db().rpc("settle_request", params))
+    except Exception as e:
+        return _rpc_failed(e)
+    return _settled(response.data, request_id, user_id, api_key, model, cost, request_record)
+
+
+def _settle_params(
+    request_id,
+    user_id,
+    api_key,
+    model,
+    cost,
+    total_tokens,
+    description,
+    metadata,
+    is_trial,
+    update_rate_limits,
+    shadow_ledger,
+    request_record,
+) -> dict[str, Any]:
+    return {
+        "p_request_id": str(request_id),
+        "p_user_id": user_id,
+        "p_api_key": api_key,
+        "p_model": model,
+        "p_cost": float(cost),
+        "p_total_tokens": int(total_tokens),
+        "p_description": description,
+        "p_metadata": metadata or {},
+        "p_is_trial": is_trial,
+        "p_daily_limit": (
+            DAILY_USAGE_LIMIT if ENFORCE_DAILY_LIMITS and TRACK_DAILY_USAGE else None
+        ),
+        "p_update_rate_limits": update_rate_limits,
+        "p_shadow_ledger": shadow_ledger,
+        "p_request_record": request_record,
+    }
+
+
+def _rpc_failed(error: Exception) -> None:
+    global _rpc_missing
+
+    if _is_missing_function(error):
+        _rpc_missing = True
+        logger.info("settle_request RPC not deployed, using multi-call settlement path")
+        return None
+    raise RuntimeError(f"settle_request failed: {error}") from error
+
+
+def _settled(
+    result: Any,
+    request_id: str,
+    user_id: int,
+    api_key: str,
+    model: str,
+    cost: float,
+    request_record: dict[str, Any] | None,
+) -> dict[str, Any]:
+    """Validate the RPC payload and run the post-settlement bookkeeping."""
+    if isinstance(result, list):
+        result = result[0] if result else None
+    if not isinstance(result, dict):
+        raise RuntimeError(f"settle_request returned unexpected payload: {type(result).__name__}")
+
+    if not result.get("success"):
+        _raise_for_error(result, cost)
+
+    from src.db.users import invalidate_user_cache
+
+    invalidate_user_cache(api_key)
+
+    if request_record and result.get("request_record_id") and not result.get("duplicate"):
+        record_request(
+            model_id=request_record.get("model_id"),
+            model_name=model,
+            provider_name=request_record.get("provider_name"),
+            user_id=user_id,
+            status=request_record.get("status", "completed"),
+            input_tokens=request_record.get("input_tokens") or 0,
+            output_tokens=request_record.get("output_tokens") or 0,
+            cost_usd=float(request_record.get("cost_usd") or 0),
+            processing_time_ms=request_record.get("processing_time_ms") or 0,
+        )
+
+    logger.info(
+        "Settled request %s for user %s: charged $%s%s",
+        sanitize_for_logging(str(request_id)),
+        sanitize_for_logging(str(user_id)),
+        sanitize_for_logging(f"{float(result.get('charged') or 0):.6f}"),
+        " (duplicate)" if result.get("duplicate") else "",
+    )
+    return result
+
+
+def reset_settle_request_availability() -> None:
+    """Forget a cached "RPC missing" verdict (tests, post-migration)."""
+    global _rpc_missing
+    _rpc_missing = False
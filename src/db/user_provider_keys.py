@@ -10,6 +10,8 @@ import logging
 from typing import Any
 
 from src.config.supabase_config import get_supabase_client
+from src.services.byok import invalidate_byok_keys
+from src.services.request_principal import invalidate_request_principal
 from src.utils.crypto import decrypt_api_key, encrypt_api_key, last4
 
 logger = logging.getLogger(__name__)
@@ -35,6 +37,8 @@ def upsert_provider_key(user_id: int, provider_slug: str, plaintext_key: str) ->
     }
     client = get_supabase_client()
     client.table(_TABLE).upsert(row, on_conflict="user_id,provider_slug").execute()
+    invalidate_request_principal(user_id=user_id)
+    invalidate_byok_keys(user_id)
     return {
         "user_id": user_id,
         "provider_slug": provider_slug,
@@ -66,6 +70,8 @@ def delete_provider_key(user_id: int, provider_slug: str) -> bool:
         .eq("provider_slug", provider_slug)
         .execute()
     )
+    invalidate_request_principal(user_id=user_id)
+    invalidate_byok_keys(user_id)
     return bool(result.data)
 
 
@@ -74,23 +80,24 @@ def get_decrypted_provider_key(user_id: int, provider_slug: str) -> str | None:
 
     SERVER-SIDE ONLY — the result is used to authenticate the upstream provider
     call and must never be returned to a client. Returns None when the user has
-    no active BYOK key for the provider or decryption fails.
+    no active BYOK key for the provider or decryption fails. A failed lookup
+    raises, so callers can tell "no key" from "unknown" (and not cache it).
     """
+    client = get_supabase_client()
+    result = (
+        client.table(_TABLE)
+        .select("encrypted_key,key_version")
+        .eq("user_id", user_id)
+        .eq("provider_slug", provider_slug)
+        .eq("is_active", True)
+        .limit(1)
+        .execute()
+    )
+    if not result.data:
+        return None
+    row = result.data[0]
     try:
-        client = get_supabase_client()
-        result = (
-            client.table(_TABLE)
-            .select("encrypted_key,key_version")
-            .eq("user_id", user_id)
-            .eq("provider_slug", provider_slug)
-            .eq("is_active", True)
-            .limit(1)
-            .execute()
-        )
-        if not result.data:
-            return None
-        row = result.data[0]
         return decrypt_api_key(row["encrypted_key"], row.get("key_version"))
     except Exception as e:
-        logger.warning("BYOK key lookup failed for provider %s: %s", provider_slug, e)
+        logger.warning("BYOK key decryption failed for provider %s: %s", provider_slug, e)
         return None
@@ -6,6 +6,7 @@ from typing import Any
 
 from src.config.supabase_config import get_supabase_client
 from src.db.api_keys import create_api_key
+from src.services.request_principal import invalidate_request_principal, peek_request_principal
 from src.utils.db_instrumentation import track_database_query
 from src.utils.db_safety import DatabaseResultError, safe_get_first, safe_get_value
 from src.utils.security_validators import sanitize_for_logging
@@ -23,6 +24,7 @@ def clear_user_cache(api_key: str | None = None) -> None:
     """Clear user cache (for testing or explicit invalidation)"""
     global _user_cache
     if api_key:
+        invalidate_request_principal(api_key=api_key)
         if api_key in _user_cache:
             del _user_cache[api_key]
             logger.debug(f"Cleared user cache for API key {api_key[:10]}...")
@@ -52,6 +54,7 @@ def invalidate_user_cache_by_id(user_id: int) -> None:
     matching the user_id and removes them.
     """
     global _user_cache
+    invalidate_request_principal(user_id=user_id)
     keys_to_remove = [
         api_key
         for api_key, entry in _user_cache.items()
@@ -324,6 +327,15 @@ def _schedule_background_migration(client, user: dict[str, Any], api_key: str) -
     thread.start()
 
 
+def _has_legacy_credit_balance(user: dict[str, Any]) -> bool:
+    """True if the user's balance still sits only in the legacy ``credits`` column."""
+    return (
+        float(user.get("credits") or 0) > 0
+        and float(user.get("subscription_allowance") or 0) == 0
+        and float(user.get("purchased_credits") or 0) == 0
+    )
+
+
 def _migrate_legacy_credit_balance(client, user: dict[str, Any]) -> None:
     """Persist a legacy ``users.credits`` balance into the tiered balance fields.
 
@@ -340,12 +352,10 @@ def _migrate_legacy_credit_balance(client, user: dict[str, Any]) -> None:
     updated in place so this request already sees the spendable balance.
     """
     try:
-        allowance = float(user.get("subscription_allowance") or 0)
-        purchased = float(user.get("purchased_credits") or 0)
-        legacy_raw = user.get("credits")
-        legacy = float(legacy_raw or 0)
-        if legacy <= 0 or allowance != 0 or purchased != 0:
+        if not _has_legacy_credit_balance(user):
             return
+        legacy_raw = user.get("credits")
+        legacy = float(legacy_raw)
 
         # Same target selection as the get_user_profile display fallback
         if user.get("tier") in ("pro", "max") and user.get("subscription_status") == "active":
@@ -365,6 +375,8 @@ def _migrate_legacy_credit_balance(client, user: dict[str, Any]) -> None:
         if result.data:
             user[target_field] = legacy
             user["credits"] = 0
+            # A cached principal still holds the pre-migration balance
+            invalidate_request_principal(user_id=user["id"])
             logger.info(
                 "Migrated legacy credits balance for user %s: %.6f -> %s",
                 sanitize_for_logging(str(user["id"])),
@@ -482,6 +494,17 @@ def get_user(api_key: str) -> dict[str, Any] | None:
     PERF: Uses in-memory cache with 60s TTL to reduce database queries.
     On cache hit, returns immediately without any DB calls.
     """
+    # The request-principal snapshot, when loaded, is the single source of truth
+    # for keys in api_keys_new. Legacy and temporary keys (no key row) and
+    # unmigrated legacy balances take the lookup below, which handles them.
+    principal = peek_request_principal(api_key)
+    if (
+        principal is not None
+        and principal.api_key_id is not None
+        and not _has_legacy_credit_balance(principal.user)
+    ):
+        return principal.user
+
     # PERF: Check cache first to avoid database queries
     if api_key in _user_cache:
         entry = _user_cache[api_key]
@@ -2105,6 +2128,9 @@ def update_user_profile(api_key: str, profile_data: dict[str, Any]) -> dict[str,
         if not result.data:
             raise ValueError("Failed to update user profile")
 
+        # Settings feed routing preferences; drop the stale cached user/principal
+        invalidate_user_cache(api_key)
+
         # Return updated user data
         updated_user = get_user(api_key)
         return updated_user
@@ -15,7 +15,7 @@ from typing import Any, AsyncIterator
 
 from fastapi import Request
 
-from src.db.chat_completion_requests import save_chat_completion_request_with_cost
+from src.db.chat_completion_requests import save_chat_completion_request_with_cost_async
 from src.db.users import deduct_credits, get_user, record_usage
 from src.schemas.internal.chat import (
     InternalChatRequest,
@@ -25,6 +25,7 @@ from src.schemas.internal.chat import (
 )
 from src.services.circuit_breaker import CircuitBreakerError
 from src.services.credit_precheck import estimate_and_check_credits
+from src.services.post_completion_queue import submit_post_completion
 from src.services.pricing import calculate_cost_split, get_model_pricing
 from src.services.provider_selector import get_selector
 
@@ -35,6 +36,8 @@ from src.services.providers.openrouter_client import (
     make_openrouter_request_openai,
     make_openrouter_request_openai_stream_async,
 )
+from src.utils.disconnect_watcher import DisconnectWatcher
+from src.utils.token_estimator import count_tokens_messages_async
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +58,17 @@ def _rfield(obj: Any, name: str, default: Any = None) -> Any:
     return getattr(obj, name, default)
 
 
+def _is_cacheable(completion: dict[str, Any]) -> bool:
+    """Whether a completion may be stored in the response cache.
+
+    Only cleanly finished text answers are kept; tool calls and filtered or
+    truncated-by-error outputs are served once and never replayed.
+    """
+    return completion.get("finish_reason") in ("stop", "length") and not completion.get(
+        "tool_calls"
+    )
+
+
 # FREEZE FIX: Hard ceiling for streaming responses — prevents hung provider connections
 # from monopolizing the event loop indefinitely. Configured via MAX_STREAM_DURATION_SECONDS env var.
 # Mirrors the same constant in src/routes/chat.py (anonymous user path).
@@ -217,6 +231,13 @@ class ChatInferenceHandler:
         # X-Gatewayz-Dropped-Params response header so that a silently ignored
         # tool_choice or response_format is visible rather than mysterious.
         self.dropped_params: list[str] = []
+        # Shared by the attempts of a hedged request (src/services/provider_hedging.py)
+        # so that only the first attempt to reach billing is charged.
+        self.settlement_gate = None
+        # Set on the hedge attempt of a hedged request. A hedge must reach a
+        # provider: answering it from the response cache, or from the primary's
+        # own in-flight fetch, would bill the whole request as a cache hit.
+        self.is_hedge = False
 
         logger.debug(
             f"[ChatHandler] Initialized with request_id={self.request_id}, anonymous={self.is_anonymous}"
@@ -310,6 +331,9 @@ class ChatInferenceHandler:
             logger.debug("[ChatHandler] Skipping credit check for free model %s", model_id)
             return max_tokens
 
+        # Fill the token memo off the loop; the pre-flight check then hits it
+        await count_tokens_messages_async(messages)
+
         # Perform pre-flight check (now includes affordability capping)
         check_result = estimate_and_check_credits(
             model_id=model_id,
@@ -689,8 +713,11 @@ class ChatInferenceHandler:
 
                 routing = PROVIDER_ROUTING.get(provider_name)
                 if routing and routing.get("stream"):
-                    # All non-OpenRouter providers use sync streaming clients
-                    stream = routing["stream"](messages, model_id, **kwargs)
+                    # All non-OpenRouter providers use sync streaming clients; open
+                    # the stream off the event loop (the BYOK binding is copied in)
+                    stream = await asyncio.to_thread(
+                        routing["stream"], messages, model_id, **kwargs
+                    )
                     is_sync_stream = True
                 else:
                     # Fallback to OpenRouter for unknown providers
@@ -743,15 +770,18 @@ class ChatInferenceHandler:
             async for chunk in stream:
                 yield chunk
 
-    def _apply_byok_fee(self, cost: float) -> float:
+    def _apply_byok_fee(self, cost: float, is_byok: bool | None = None) -> float:
         """Return the amount to bill, applying the BYOK routing fee when applicable.
 
         When the request was served on the customer's own provider key
-        (``self.is_byok``), the inference cost was paid on their upstream account,
-        so we bill only ``byok_routing_fee(cost)`` (a fraction, default 0) instead
-        of the full credit cost. Otherwise the cost is unchanged.
+        (``is_byok``, defaulting to ``self.is_byok``), the inference cost was paid
+        on their upstream account, so we bill only ``byok_routing_fee(cost)`` (a
+        fraction, default 0) instead of the full credit cost. Otherwise the cost
+        is unchanged.
         """
-        if not getattr(self, "is_byok", False):
+        if is_byok is None:
+            is_byok = getattr(self, "is_byok", False)
+        if not is_byok:
             return cost
         from src.services.byok import byok_routing_fee
 
@@ -765,6 +795,119 @@ class ChatInferenceHandler:
         )
         return fee
 
+    async def _charge_and_record(
+        self,
+        cost: float,
+        input_cost: float,
+        output_cost: float,
+        model_name: str,
+        provider_name: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> None:
+        """
+        Charge the user and save the completed request record.
+
+        With SETTLE_REQUEST_RPC_ENABLED, both happen in one idempotent
+        settle_request round-trip; otherwise (or when the RPC isn't deployed)
+        via deduct_credits + record_usage + the request-record insert.
+
+        Raises HedgeLostError when another attempt of the same hedged request
+        has already been billed.
+        """
+        if self.settlement_gate is not None and not self.settlement_gate.claim(self):
+            from src.services.provider_hedging import HedgeLostError
+
+            raise HedgeLostError(f"request {self.request_id} lost the hedge race")
+
+        if await self._settle_request(
+            cost,
+            input_cost,
+            output_cost,
+            model_name,
+            provider_name,
+            prompt_tokens,
+            completion_tokens,
+        ):
+            return
+
+        await self._charge_user(cost, model_name, prompt_tokens, completion_tokens)
+        self._save_request_record(
+            model_name=model_name,
+            provider_name=provider_name,
+            input_tokens=prompt_tokens,
+            output_tokens=completion_tokens,
+            status="completed",
+            cost_usd=cost,
+            input_cost_usd=input_cost,
+            output_cost_usd=output_cost,
+        )
+
+    async def _settle_request(
+        self,
+        cost: float,
+        input_cost: float,
+        output_cost: float,
+        model_name: str,
+        provider_name: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> bool:
+        """
+        Settle the request with a single settle_request RPC.
+
+        Rate-limit usage and the shadow ledger stay with the route (see
+        handle_credits_and_usage(already_charged=True)), so they are not
+        written here.
+
+        Returns:
+            True if settled, False if the caller should use the multi-call path
+
+        Raises:
+            ValueError: Insufficient credits / daily limit exceeded
+            RuntimeError: Settlement failed (nothing was written)
+        """
+        from src.config import Config
+        from src.db.settlement import settle_request_async
+
+        if self.is_anonymous or not Config.SETTLE_REQUEST_RPC_ENABLED:
+            return False
+
+        total_tokens = prompt_tokens + completion_tokens
+        elapsed_ms = int((time.monotonic() - self.start_time) * 1000)
+        result = await settle_request_async(
+            self.request_id,
+            self.user["id"],
+            self.api_key,
+            model_name,
+            cost,
+            total_tokens,
+            f"Chat completion - {model_name}",
+            {
+                "model": model_name,
+                "total_tokens": total_tokens,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost_usd": cost,
+                "request_id": self.request_id,
+            },
+            update_rate_limits=False,
+            request_record={
+                "provider_name": provider_name,
+                "api_key_id": self.user.get("key_id"),
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "processing_time_ms": elapsed_ms,
+                "status": "completed",
+                "is_anonymous": False,
+                "cost_usd": round(cost, 6),
+                "input_cost_usd": round(input_cost, 6),
+                "output_cost_usd": round(output_cost, 6),
+                "pricing_source": "calculated" if cost > 0 else "free",
+            },
+        )
+        return result is not None
+
     async def _charge_user(
         self,
         cost: float,
@@ -881,16 +1024,237 @@ class ChatInferenceHandler:
             "is_anonymous": self.is_anonymous,
         }
 
-        if self.background_tasks:
-            self.background_tasks.add_task(save_chat_completion_request_with_cost, **save_kwargs)
-        else:
-            save_chat_completion_request_with_cost(**save_kwargs)
+        submit_post_completion(
+            "chat_request_record", save_chat_completion_request_with_cost_async, save_kwargs
+        )
 
         logger.debug(
             f"[ChatHandler] Saved request record: request_id={self.request_id}, "
             f"status={status}, tokens={input_tokens}+{output_tokens}"
         )
 
+    async def _fetch_completion(
+        self,
+        request: InternalChatRequest,
+        messages: list[dict[str, Any]],
+        kwargs: dict[str, Any],
+    ) -> dict[str, Any]:
+        """
+        Call the provider (with failover for registry models) and extract the
+        completion and its token usage into a plain, cacheable dict.
+        """
+        # Try using provider selector for multi-provider models
+        selector = get_selector()
+
+        # Check if model is in multi-provider registry
+        model_in_registry = selector.registry.get_model(request.model) is not None
+
+        if model_in_registry:
+            # Use intelligent routing with failover for multi-provider models
+            result = await asyncio.to_thread(
+                selector.execute_with_failover,
+                model_id=request.model,
+                execute_fn=lambda provider_name, provider_model_id: self._call_provider(
+                    provider_name, provider_model_id, messages, **kwargs
+                ),
+            )
+
+            if not result["success"]:
+                error_msg = result.get("error", "All providers failed")
+                logger.error(f"[ChatHandler] All providers failed: {error_msg}")
+                # Save failed request
+                self._save_request_record(
+                    model_name=request.model,
+                    provider_name="unknown",
+                    input_tokens=0,
+                    output_tokens=0,
+                    status="failed",
+                    error_message=error_msg,
+                )
+                raise Exception(error_msg)
+
+            # Extract provider response
+            provider_response = result["response"]
+            provider_used = result["provider"]
+            provider_model_id = result.get("provider_model_id", request.model)
+        else:
+            # Use provider hint from chat.py (already detected from model ID + catalog)
+            # Falls back to detect_provider_from_model_id if no hint
+            from src.services.model_transformations import (
+                detect_provider_from_model_id,
+                transform_model_id,
+            )
+
+            provider_used = (
+                request.provider or detect_provider_from_model_id(request.model) or "openrouter"
+            )
+            provider_model_id = transform_model_id(request.model, provider_used)
+            logger.info(
+                f"[ChatHandler] Model {request.model} not in registry, "
+                f"using provider='{provider_used}', model_id='{provider_model_id}'"
+            )
+            # Off the event loop, so a hedged attempt can run alongside this one
+            provider_response = await asyncio.to_thread(
+                self._call_provider, provider_used, provider_model_id, messages, **kwargs
+            )
+
+        logger.info(
+            f"[ChatHandler] Provider call successful: provider={provider_used}, "
+            f"model={provider_model_id}"
+        )
+
+        # Step 4: Extract token usage from response
+        # (_rfield handles both OpenAI-SDK objects and dict-shaped responses, e.g. Vertex.)
+        usage = _rfield(provider_response, "usage")
+        if usage:
+            prompt_tokens = _rfield(usage, "prompt_tokens", 0) or 0
+            completion_tokens = _rfield(usage, "completion_tokens", 0) or 0
+        else:
+            prompt_tokens = 0
+            completion_tokens = 0
+
+        # Prompt-cache accounting. Cache reads cost a fraction of full input
+        # tokens; billing them at the input rate is the difference between
+        # beating and losing to the provider's direct pricing.
+        from src.services.pricing.cache_pricing import extract_cache_tokens
+
+        cache_read_tokens, cache_write_tokens = extract_cache_tokens(usage)
+
+        # Extract response content
+        choices = _rfield(provider_response, "choices")
+        if choices:
+            choice = choices[0]
+            message = _rfield(choice, "message")
+            if not message:
+                raise ValueError("Provider response missing message")
+
+            content = _rfield(message, "content", "")
+            finish_reason = _rfield(choice, "finish_reason", "stop")
+            tool_calls = _rfield(message, "tool_calls")
+        else:
+            raise ValueError("Provider response missing choices")
+
+        # Token estimation fallback if provider didn't return usage data
+        if prompt_tokens == 0 and completion_tokens == 0:
+            completion_tokens = max(1, len(content or "") // 4)
+            prompt_chars = sum(
+                len(m.get("content", "")) if isinstance(m.get("content"), str) else 0
+                for m in messages
+            )
+            prompt_tokens = max(1, prompt_chars // 4)
+            logger.info(
+                f"[ChatHandler] No usage data from provider {provider_used}, estimated "
+                f"{prompt_tokens} prompt + {completion_tokens} completion tokens"
+            )
+
+        return {
+            "content": content,
+            "finish_reason": finish_reason,
+            "tool_calls": tool_calls,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cache_read_tokens": cache_read_tokens,
+            "cache_write_tokens": cache_write_tokens,
+            "provider_used": provider_used,
+            "provider_model_id": provider_model_id,
+            "byok": self.is_byok,
+        }
+
+    def _response_cache_key(
+        self,
+        request: InternalChatRequest,
+        messages: list[dict[str, Any]],
+        kwargs: dict[str, Any],
+    ) -> str | None:
+        """
+        Response-cache key for the request, or None when it must not be cached.
+
+        Only deterministic requests (temperature 0 or a fixed seed, no tools,
+        a single choice) from authenticated users qualify; the key is scoped to
+        the user. Hedge attempts never use the cache. Clients opt out with
+        ``Cache-Control: no-cache``/``no-store``.
+        """
+        from src.config import Config
+
+        if not Config.RESPONSE_CACHE_ENABLED or self.is_anonymous or not self.user:
+            return None
+        if self.is_hedge:
+            return None
+        if kwargs.get("tools") or kwargs.get("tool_choice") or kwargs.get("n", 1) != 1:
+            return None
+        if kwargs.get("temperature") != 0 and kwargs.get("seed") is None:
+            return None
+
+        headers = getattr(self.request, "headers", None)
+        cache_control = headers.get("cache-control") if headers is not None else None
+        if isinstance(cache_control, str) and (
+            "no-cache" in cache_control.lower() or "no-store" in cache_control.lower()
+        ):
+            return None
+
+        from src.services.cache.response_cache import make_cache_key
+
+        return make_cache_key(messages, request.model, kwargs, scope=str(self.user.get("id")))
+
+    async def _cached_completion(self, cache_key: str) -> dict[str, Any] | None:
+        """Cached completion for ``cache_key``, waiting for an identical in-flight request."""
+        from src.services.cache.response_cache import get_cache
+
+        cache = get_cache()
+        cached = await cache.get_by_key_async(cache_key)
+        if cached is not None:
+            return cached
+
+        leader = cache.inflight(cache_key)
+        if leader is None:
+            return None
+        try:
+            return await asyncio.shield(leader)
+        except Exception:
+            return None
+
+    async def _completion_cost(
+        self, model: str, completion: dict[str, Any], cache_hit: bool
+    ) -> tuple[float, float, float]:
+        """
+        Billed (cost, input_cost, output_cost) for a completion.
+
+        The BYOK routing fee applies as usual; for a response-cache hit it
+        follows the key that served the cached answer, and the result is then
+        billed at RESPONSE_CACHE_HIT_COST_FACTOR times that price.
+        """
+        cost, input_cost, output_cost = await asyncio.to_thread(
+            _loss_proof_cost_split,
+            model,
+            completion["provider_model_id"],
+            completion["prompt_tokens"],
+            completion["completion_tokens"],
+            completion["cache_read_tokens"],
+            completion["cache_write_tokens"],
+            completion["provider_used"],
+        )
+
+        logger.debug(
+            f"[ChatHandler] Cost calculation: total=${cost:.6f}, "
+            f"input=${input_cost:.6f}, output=${output_cost:.6f}"
+        )
+
+        if cache_hit:
+            from src.config import Config
+
+            cost = self._apply_byok_fee(cost, completion.get("byok", False))
+            factor = Config.RESPONSE_CACHE_HIT_COST_FACTOR
+            logger.info(
+                f"[ChatHandler] Response cache hit: billing {factor:g}x of ${cost:.6f} "
+                f"(request_id={self.request_id})"
+            )
+            return cost * factor, input_cost * factor, output_cost * factor
+
+        # BYOK: bill a routing fee instead of the full upstream cost when the
+        # request was served on the customer's own key. cost flows into the
+        # request record and response, so they reflect the billed amount.
+        return self._apply_byok_fee(cost), input_cost, output_cost
+
     async def process(self, request: InternalChatRequest) -> InternalChatResponse:
         """
         Process a non-streaming chat completion request.
@@ -967,146 +1331,47 @@ class ChatInferenceHandler:
             # Remove None values
             kwargs = {k: v for k, v in kwargs.items() if v is not None}
 
-            # Try using provider selector for multi-provider models
-            selector = get_selector()
-
-            # Check if model is in multi-provider registry
-            model_in_registry = selector.registry.get_model(request.model) is not None
-
-            if model_in_registry:
-                # Use intelligent routing with failover for multi-provider models
-                result = await asyncio.to_thread(
-                    selector.execute_with_failover,
-                    model_id=request.model,
-                    execute_fn=lambda provider_name, provider_model_id: self._call_provider(
-                        provider_name, provider_model_id, messages, **kwargs
-                    ),
-                )
-
-                if not result["success"]:
-                    error_msg = result.get("error", "All providers failed")
-                    logger.error(f"[ChatHandler] All providers failed: {error_msg}")
-                    # Save failed request
-                    self._save_request_record(
-                        model_name=request.model,
-                        provider_name="unknown",
-                        input_tokens=0,
-                        output_tokens=0,
-                        status="failed",
-                        error_message=error_msg,
-                    )
-                    raise Exception(error_msg)
-
-                # Extract provider response
-                provider_response = result["response"]
-                provider_used = result["provider"]
-                provider_model_id = result.get("provider_model_id", request.model)
+            # Step 3: Call the provider, or answer from the response cache for a
+            # deterministic request (identical concurrent requests share one call)
+            cache_key = self._response_cache_key(request, messages, kwargs)
+            cache_hit = False
+            if cache_key is None:
+                completion = await self._fetch_completion(request, messages, kwargs)
             else:
-                # Use provider hint from chat.py (already detected from model ID + catalog)
-                # Falls back to detect_provider_from_model_id if no hint
-                from src.services.model_transformations import (
-                    detect_provider_from_model_id,
-                    transform_model_id,
-                )
+                from src.services.cache.response_cache import get_cache
 
-                provider_used = (
-                    request.provider or detect_provider_from_model_id(request.model) or "openrouter"
-                )
-                provider_model_id = transform_model_id(request.model, provider_used)
-                logger.info(
-                    f"[ChatHandler] Model {request.model} not in registry, "
-                    f"using provider='{provider_used}', model_id='{provider_model_id}'"
-                )
-                provider_response = self._call_provider(
-                    provider_used, provider_model_id, messages, **kwargs
-                )
-
-            logger.info(
-                f"[ChatHandler] Provider call successful: provider={provider_used}, "
-                f"model={provider_model_id}"
-            )
+                async def fetch():
+                    result = await self._fetch_completion(request, messages, kwargs)
+                    return result, _is_cacheable(result)
 
-            # Step 4: Extract token usage from response
-            # (_rfield handles both OpenAI-SDK objects and dict-shaped responses, e.g. Vertex.)
-            usage = _rfield(provider_response, "usage")
-            if usage:
-                prompt_tokens = _rfield(usage, "prompt_tokens", 0) or 0
-                completion_tokens = _rfield(usage, "completion_tokens", 0) or 0
-            else:
-                prompt_tokens = 0
-                completion_tokens = 0
-
-            # Prompt-cache accounting. Cache reads cost a fraction of full input
-            # tokens; billing them at the input rate is the difference between
-            # beating and losing to the provider's direct pricing.
-            from src.services.pricing.cache_pricing import extract_cache_tokens
-
-            cache_read_tokens, cache_write_tokens = extract_cache_tokens(usage)
-
-            # Extract response content
-            choices = _rfield(provider_response, "choices")
-            if choices:
-                choice = choices[0]
-                message = _rfield(choice, "message")
-                if not message:
-                    raise ValueError("Provider response missing message")
-
-                content = _rfield(message, "content", "")
-                finish_reason = _rfield(choice, "finish_reason", "stop")
-                tool_calls = _rfield(message, "tool_calls")
-            else:
-                raise ValueError("Provider response missing choices")
-
-            # Token estimation fallback if provider didn't return usage data
-            if prompt_tokens == 0 and completion_tokens == 0:
-                completion_tokens = max(1, len(content or "") // 4)
-                prompt_chars = sum(
-                    len(m.get("content", "")) if isinstance(m.get("content"), str) else 0
-                    for m in messages
-                )
-                prompt_tokens = max(1, prompt_chars // 4)
-                logger.info(
-                    f"[ChatHandler] No usage data from provider {provider_used}, estimated "
-                    f"{prompt_tokens} prompt + {completion_tokens} completion tokens"
+                completion, cache_hit = await get_cache().single_flight(
+                    cache_key, fetch, request.model
                 )
 
+            content = completion["content"]
+            finish_reason = completion["finish_reason"]
+            tool_calls = completion["tool_calls"]
+            prompt_tokens = completion["prompt_tokens"]
+            completion_tokens = completion["completion_tokens"]
+            cache_read_tokens = completion["cache_read_tokens"]
+            cache_write_tokens = completion["cache_write_tokens"]
+            provider_used = completion["provider_used"]
             total_tokens = prompt_tokens + completion_tokens
 
             # Step 5: Calculate cost (loss-proof: never bill below the served provider)
-            cost, input_cost, output_cost = await asyncio.to_thread(
-                _loss_proof_cost_split,
+            cost, input_cost, output_cost = await self._completion_cost(
+                request.model, completion, cache_hit
+            )
+
+            # Step 6-7: Charge user and save request record
+            await self._charge_and_record(
+                cost,
+                input_cost,
+                output_cost,
                 request.model,
-                provider_model_id,
+                provider_used,
                 prompt_tokens,
                 completion_tokens,
-                cache_read_tokens,
-                cache_write_tokens,
-                provider_used,
-            )
-
-            logger.debug(
-                f"[ChatHandler] Cost calculation: total=${cost:.6f}, "
-                f"input=${input_cost:.6f}, output=${output_cost:.6f}"
-            )
-
-            # BYOK: bill a routing fee instead of the full upstream cost when the
-            # request was served on the customer's own key. cost flows into the
-            # request record and response below, so they reflect the billed amount.
-            cost = self._apply_byok_fee(cost)
-
-            # Step 6: Charge user
-            await self._charge_user(cost, request.model, prompt_tokens, completion_tokens)
-
-            # Step 7: Save request record
-            self._save_request_record(
-                model_name=request.model,
-                provider_name=provider_used,
-                input_tokens=prompt_tokens,
-                output_tokens=completion_tokens,
-                status="completed",
-                cost_usd=cost,
-                input_cost_usd=input_cost,
-                output_cost_usd=output_cost,
             )
 
             # Step 8: Return InternalChatResponse with all metadata
@@ -1140,6 +1405,7 @@ class ChatInferenceHandler:
                 provider_used=provider_used,
                 processing_time_ms=elapsed_ms,
                 tool_calls=tool_calls,
+                **({"response_cache": "hit"} if cache_hit else {}),
             )
 
             logger.info(
@@ -1150,6 +1416,10 @@ class ChatInferenceHandler:
             return response
 
         except Exception as e:
+            if self.settlement_gate is not None and self.settlement_gate.winner is not self:
+                # A losing hedge attempt is not a failed request
+                raise
+
             # Log error and save failed request
             logger.error(f"[ChatHandler] Request failed: {e}", exc_info=True)
 
@@ -1165,6 +1435,53 @@ class ChatInferenceHandler:
 
             raise
 
+    async def _replay_completion(
+        self, request: InternalChatRequest, completion: dict[str, Any]
+    ) -> AsyncIterator[InternalStreamChunk]:
+        """
+        Stream a response-cache hit: the cached content, then a finish chunk
+        carrying the usage.
+
+        Billing happens after the first chunk, like a live stream whose loser
+        in a hedged race is closed before it is charged.
+        """
+        created = int(time.time())
+        yield InternalStreamChunk(
+            id=self.request_id,
+            model=request.model,
+            created=created,
+            content=completion["content"],
+            role="assistant",
+            response_cache="hit",
+        )
+
+        cost, input_cost, output_cost = await self._completion_cost(
+            request.model, completion, cache_hit=True
+        )
+        await self._charge_and_record(
+            cost,
+            input_cost,
+            output_cost,
+            request.model,
+            completion["provider_used"],
+            completion["prompt_tokens"],
+            completion["completion_tokens"],
+        )
+
+        yield InternalStreamChunk(
+            id=self.request_id,
+            model=request.model,
+            created=created,
+            finish_reason=completion["finish_reason"],
+            usage=InternalUsage(
+                prompt_tokens=completion["prompt_tokens"],
+                completion_tokens=completion["completion_tokens"],
+                total_tokens=completion["prompt_tokens"] + completion["completion_tokens"],
+            ),
+            response_cache="hit",
+        )
+        logger.info(f"[ChatHandler] Streaming request served from response cache: cost=${cost:.6f}")
+
     async def process_stream(
         self, request: InternalChatRequest
     ) -> AsyncIterator[InternalStreamChunk]:
@@ -1246,6 +1563,17 @@ class ChatInferenceHandler:
             }
             kwargs = {k: v for k, v in kwargs.items() if v is not None}
 
+            # A deterministic request that is cached, or in flight, is replayed
+            cache_key = self._response_cache_key(request, messages, kwargs)
+            cached = await self._cached_completion(cache_key) if cache_key else None
+            if cached is not None:
+                provider_used = cached["provider_used"]
+                prompt_tokens = cached["prompt_tokens"]
+                completion_tokens = cached["completion_tokens"]
+                async for chunk in self._replay_completion(request, cached):
+                    yield chunk
+                return
+
             # Check if model is in multi-provider registry
             selector = get_selector()
             model_in_registry = selector.registry.get_model(request.model) is not None
@@ -1293,23 +1621,43 @@ class ChatInferenceHandler:
                 )
 
             # Step 5: Yield normalized chunks
-            accumulated_content = ""  # For token estimation fallback
+            content_parts: list[str] = []  # For token estimation fallback
             chunk_count = 0
+            # For the response cache: only a stream that ran to completion is stored
+            finish_reason = None
+            streamed_tool_calls = False
+            interrupted = False
 
             # FREEZE FIX: Set wall-clock deadline before entering the streaming loop.
             # A hung provider that sends headers then goes silent will hold this coroutine
             # (and therefore the entire event loop) indefinitely without this guard.
             _stream_deadline = time.monotonic() + _MAX_STREAM_DURATION
 
+            # CRITICAL: Stop on client disconnect to prevent zombie requests (499).
+            # One background watcher replaces a receive-channel poll per chunk.
+            watcher = DisconnectWatcher.start(self.request)
+            upstream = aiter(stream)
             try:
-                async for provider_chunk in stream:
-                    # CRITICAL: Check for client disconnect to prevent zombie requests (499)
-                    if self.request and await self.request.is_disconnected():
+                while True:
+                    if watcher.disconnected:
                         logger.warning(
                             f"[ChatHandler] Client disconnected during stream (request_id={self.request_id})"
                         )
+                        interrupted = True
                         break
 
+                    watcher.waiting = True
+                    try:
+                        provider_chunk = await upstream.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.CancelledError:
+                        if not watcher.absorb_cancel():
+                            raise
+                        continue  # reported at the top of the loop
+                    finally:
+                        watcher.waiting = False
+
                     # FREEZE FIX: Wall-clock deadline — abort if provider stream exceeds limit.
                     if time.monotonic() > _stream_deadline:
                         _elapsed = time.monotonic() - (_stream_deadline - _MAX_STREAM_DURATION)
@@ -1318,6 +1666,7 @@ class ChatInferenceHandler:
                             f"{_MAX_STREAM_DURATION}s ({_elapsed:.1f}s elapsed) for "
                             f"provider={provider_used}, model={provider_model_id}. Terminating."
                         )
+                        interrupted = True
                         break
 
                     chunk_count += 1
@@ -1338,7 +1687,11 @@ class ChatInferenceHandler:
                             tool_calls = _rfield(delta, "tool_calls")
 
                             if content:
-                                accumulated_content += content
+                                content_parts.append(content)
+                            if chunk_finish_reason:
+                                finish_reason = chunk_finish_reason
+                            if tool_calls:
+                                streamed_tool_calls = True
 
                             # Extract usage from final chunk if available
                             chunk_usage = _rfield(provider_chunk, "usage")
@@ -1395,6 +1748,7 @@ class ChatInferenceHandler:
                             yield internal_chunk
 
             finally:
+                watcher.stop()
                 # FREEZE FIX: Always release the underlying provider connection back to the pool.
                 # Without this, an aborted/timed-out stream holds the httpx connection open,
                 # exhausting the connection pool and eventually freezing new requests.
@@ -1407,6 +1761,7 @@ class ChatInferenceHandler:
                     pass  # Never let cleanup block the generator teardown
 
             logger.debug(f"[ChatHandler] Streamed {chunk_count} chunks")
+            accumulated_content = "".join(content_parts)
 
             # Step 6: Token estimation fallback if provider didn't provide usage
             if prompt_tokens == 0 and completion_tokens == 0:
@@ -1441,18 +1796,15 @@ class ChatInferenceHandler:
             # BYOK: bill a routing fee instead of the full upstream cost.
             cost = self._apply_byok_fee(cost)
 
-            await self._charge_user(cost, request.model, prompt_tokens, completion_tokens)
-
-            # Step 8: Save request record
-            self._save_request_record(
-                model_name=request.model,
-                provider_name=provider_used,
-                input_tokens=prompt_tokens,
-                output_tokens=completion_tokens,
-                status="completed",
-                cost_usd=cost,
-                input_cost_usd=input_cost,
-                output_cost_usd=output_cost,
+            # Step 8: Charge user and save request record
+            await self._charge_and_record(
+                cost,
+                input_cost,
+                output_cost,
+                request.model,
+                provider_used,
+                prompt_tokens,
+                completion_tokens,
             )
 
             logger.info(
@@ -1460,6 +1812,24 @@ class ChatInferenceHandler:
                 f"tokens={prompt_tokens + completion_tokens}, cost=${cost:.6f}"
             )
 
+            if cache_key is not None and not interrupted:
+                completion = {
+                    "content": accumulated_content,
+                    "finish_reason": finish_reason,
+                    "tool_calls": streamed_tool_calls or None,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "cache_read_tokens": cache_read_tokens,
+                    "cache_write_tokens": cache_write_tokens,
+                    "provider_used": provider_used,
+                    "provider_model_id": provider_model_id,
+                    "byok": self.is_byok,
+                }
+                if _is_cacheable(completion):
+                    from src.services.cache.response_cache import get_cache
+
+                    await get_cache().set_by_key_async(cache_key, completion, request.model)
+
         except Exception as e:
             # Log error and save failed request
             logger.error(f"[ChatHandler] Streaming request failed: {e}", exc_info=True)
@@ -5,11 +5,12 @@ import logging
 
 from src.db.activity import get_provider_from_model, log_activity
 from src.db.api_keys import increment_api_key_usage
-from src.db.chat_completion_requests import save_chat_completion_request_with_cost
+from src.db.chat_completion_requests import save_chat_completion_request_with_cost_async
 from src.db.chat_history import get_chat_session, save_chat_message
 from src.db.plans import enforce_plan_limits
 from src.services.anonymous_rate_limiter import record_anonymous_request
 from src.services.passive_health_monitor import capture_model_health
+from src.services.post_completion_queue import submit_post_completion
 from src.services.pricing import calculate_cost_async
 from src.services.prometheus_metrics import (
     credits_used,
@@ -94,6 +95,7 @@ async def _handle_credits_and_usage_with_fallback(
     completion_tokens: int,
     elapsed_ms: int,
     request_id: str | None = None,
+    request_record: dict | None = None,
 ) -> tuple[float, bool]:
     """
     Credit handling for streaming background tasks with fallback on failure.
@@ -106,6 +108,8 @@ async def _handle_credits_and_usage_with_fallback(
 
     Args:
         request_id: Optional UUID idempotency key to prevent duplicate deductions
+        request_record: chat_completion_requests columns, written with the charge
+            when it succeeds
 
     Returns: tuple[float, bool] - (cost, success)
     """
@@ -123,6 +127,7 @@ async def _handle_credits_and_usage_with_fallback(
         endpoint="/v1/chat/completions",
         is_streaming=True,
         request_id=request_id,
+        request_record=request_record,
     )
 
 
@@ -196,16 +201,17 @@ async def _record_inference_metrics_and_health(
         }
 
         # Call passive health monitor in background (non-blocking)
-        # Note: capture_model_health is already async, so we just create a task for it
-        asyncio.create_task(
-            capture_model_health(
-                provider=provider,
-                model=model,
-                response_time_ms=response_time_ms,
-                status=health_status,
-                error_message=error_message,
-                usage=usage,
-            )
+        submit_post_completion(
+            "model_health",
+            capture_model_health,
+            {
+                "provider": provider,
+                "model": model,
+                "response_time_ms": response_time_ms,
+                "status": health_status,
+                "error_message": error_message,
+                "usage": usage,
+            },
         )
 
         logger.debug(
@@ -329,6 +335,14 @@ async def _process_stream_completion_background(
                     logger.debug(f"Failed to capture health metric: {e}")
                 return
 
+            # The request record is written with the charge (in the same
+            # settle_request transaction when the RPC is enabled)
+            request_record = None
+            if request_id:
+                request_record = _stream_request_record(
+                    model, provider, api_key_id, prompt_tokens, completion_tokens, elapsed, cost
+                )
+
             # Handle credits and usage (centralized helper with fallback for streaming)
             # Use the fallback handler which:
             # 1. Has built-in retry logic with exponential backoff
@@ -344,6 +358,7 @@ async def _process_stream_completion_background(
                 completion_tokens=completion_tokens,
                 elapsed_ms=int(elapsed * 1000),
                 request_id=request_id,
+                request_record=request_record,
             )
 
             if not credit_deduction_success:
@@ -471,38 +486,142 @@ async def _process_stream_completion_background(
             except Exception as e:
                 logger.debug(f"Failed to capture health metric: {e}")
 
-            # Save chat completion request metadata to database with cost tracking
-            if request_id:
+            # Billing wrote the request record unless it failed
+            if request_record and not credit_deduction_success:
                 try:
-                    # Calculate cost breakdown for analytics
-                    from src.services.pricing import get_model_pricing
-
-                    pricing_info = get_model_pricing(model)
-                    input_cost = prompt_tokens * pricing_info.get("prompt", 0)
-                    output_cost = completion_tokens * pricing_info.get("completion", 0)
-                    total_cost = input_cost + output_cost
-
-                    await _to_thread(
-                        save_chat_completion_request_with_cost,
+                    await save_chat_completion_request_with_cost_async(
                         request_id=request_id,
                         model_name=model,
-                        input_tokens=prompt_tokens,
-                        output_tokens=completion_tokens,
-                        processing_time_ms=int(elapsed * 1000),
-                        cost_usd=total_cost,
-                        input_cost_usd=input_cost,
-                        output_cost_usd=output_cost,
-                        pricing_source="calculated",
-                        status="completed",
-                        error_message=None,
                         user_id=user["id"] if user else None,
-                        provider_name=provider,
-                        model_id=None,
-                        api_key_id=api_key_id,
-                        is_anonymous=is_anonymous,
+                        **request_record,
                     )
                 except Exception as e:
                     logger.debug(f"Failed to save chat completion request: {e}")
 
     except Exception as e:
         logger.error(f"Background stream processing error: {e}", exc_info=True)
+
+
+def _stream_request_record(
+    model, provider, api_key_id, prompt_tokens, completion_tokens, elapsed, cost
+) -> dict | None:
+    """chat_completion_requests columns for a completed stream, or None without pricing."""
+    from src.services.pricing import get_model_pricing
+
+    try:
+        pricing_info = get_model_pricing(model)
+    except Exception as e:
+        logger.debug(f"Skipping request record for {model}: {e}")
+        return None
+    return {
+        "provider_name": provider,
+        "api_key_id": api_key_id,
+        "input_tokens": prompt_tokens,
+        "output_tokens": completion_tokens,
+        "processing_time_ms": int(elapsed * 1000),
+        "status": "completed",
+        "is_anonymous": False,
+        "cost_usd": cost,
+        "input_cost_usd": prompt_tokens * pricing_info.get("prompt", 0),
+        "output_cost_usd": completion_tokens * pricing_info.get("completion", 0),
+        "pricing_source": "calculated",
+    }
+
+
+def _stream_billing_record(kwargs: dict) -> dict | None:
+    """
+    The part of a stream completion job kept in the post-completion journal.
+
+    Only ids, the model and the numbers billing is computed from; the API key,
+    user row, messages and response text never reach the disk. Anonymous usage
+    has nothing to bill, so it is not journaled.
+    """
+    if kwargs.get("is_anonymous") or not kwargs.get("user"):
+        return None
+    trial = kwargs.get("trial") or {}
+    return {
+        "request_id": kwargs.get("request_id"),
+        "user_id": kwargs["user"].get("id"),
+        "api_key_id": kwargs.get("api_key_id"),
+        "model": kwargs["model"],
+        "provider": kwargs.get("provider"),
+        "trial": {
+            "is_trial": bool(trial.get("is_trial", False)),
+            "is_expired": bool(trial.get("is_expired", False)),
+        },
+        "session_id": kwargs.get("session_id"),
+        "prompt_tokens": int(kwargs.get("prompt_tokens") or 0),
+        "completion_tokens": int(kwargs.get("completion_tokens") or 0),
+        "total_tokens": int(kwargs.get("total_tokens") or 0),
+        "elapsed": float(kwargs.get("elapsed") or 0.0),
+    }
+
+
+async def _replay_stream_billing(
+    request_id,
+    user_id,
+    api_key_id,
+    model,
+    provider,
+    trial,
+    session_id,
+    prompt_tokens,
+    completion_tokens,
+    total_tokens,
+    elapsed,
+):
+    """
+    Settle a stream completion from its journal record (see
+    :func:`_stream_billing_record`): credits, key usage and the activity log.
+
+    Runs for jobs replayed after a restart or overflowed from a full queue.
+    The user and API key are looked up again by id; chat history is not saved
+    because the journal holds no content. Credit deduction is idempotent per
+    request_id, so a job that had already been billed is not charged twice.
+    """
+    from src.db.api_keys import get_api_key_by_id
+    from src.db.users import get_user_by_id
+
+    user = await _to_thread(get_user_by_id, user_id)
+    if not user:
+        logger.warning(f"Dropping journaled billing for request {request_id}: user not found")
+        return
+    key_row = await _to_thread(get_api_key_by_id, api_key_id, user_id) if api_key_id else None
+    api_key = key_row["api_key"] if key_row else user.get("api_key")
+
+    cost, _ = await _handle_credits_and_usage_with_fallback(
+        api_key=api_key,
+        user=user,
+        model=model,
+        trial=trial,
+        total_tokens=total_tokens,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        elapsed_ms=int(elapsed * 1000),
+        request_id=request_id,
+    )
+    if api_key:
+        await _to_thread(increment_api_key_usage, api_key)
+
+    try:
+        await _to_thread(
+            log_activity,
+            user_id=user_id,
+            model=model,
+            provider=get_provider_from_model(model),
+            tokens=total_tokens,
+            cost=cost,
+            speed=total_tokens / elapsed if elapsed > 0 else 0,
+            finish_reason="stop",
+            app="API",
+            metadata={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "endpoint": "/v1/chat/completions",
+                "stream": True,
+                "session_id": session_id,
+                "gateway": provider,
+            },
+        )
+    except Exception as e:
+        logger.error(f"Failed to log activity for user {user_id}, model {model}: {e}")
@@ -7,7 +7,6 @@ from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from prometheus_client import REGISTRY
 
 from src.config import Config
 
@@ -278,10 +277,21 @@ def create_app() -> FastAPI:
         limit=Config.CONCURRENCY_LIMIT,
         queue_size=Config.CONCURRENCY_QUEUE_SIZE,
         queue_timeout=Config.CONCURRENCY_QUEUE_TIMEOUT,
+        lane_limits={
+            "streaming": Config.CONCURRENCY_STREAMING_LIMIT,
+            "inference": Config.CONCURRENCY_INFERENCE_LIMIT,
+            "catalog": Config.CONCURRENCY_CATALOG_LIMIT,
+            "admin": Config.CONCURRENCY_ADMIN_LIMIT,
+        },
+        adaptive=Config.CONCURRENCY_ADAPTIVE_ENABLED,
+        min_limit=Config.CONCURRENCY_MIN_LIMIT,
     )
     logger.info(
         f"  🚦 [3] Concurrency middleware enabled "
-        f"(limit={Config.CONCURRENCY_LIMIT}, queue={Config.CONCURRENCY_QUEUE_SIZE})"
+        f"(streaming={Config.CONCURRENCY_STREAMING_LIMIT}, "
+        f"inference={Config.CONCURRENCY_INFERENCE_LIMIT}, "
+        f"catalog={Config.CONCURRENCY_CATALOG_LIMIT}, admin={Config.CONCURRENCY_ADMIN_LIMIT}, "
+        f"queue={Config.CONCURRENCY_QUEUE_SIZE})"
     )
 
     # [2] Timeout — enforces a 55 s hard deadline; wraps concurrency + inner layers
@@ -357,9 +367,15 @@ def create_app() -> FastAPI:
                 generate_latest as generate_openmetrics,
             )
 
-            return Response(generate_openmetrics(REGISTRY), media_type=OPENMETRICS_CT)
+            return Response(
+                generate_openmetrics(prometheus_metrics.metrics_registry()),
+                media_type=OPENMETRICS_CT,
+            )
 
-        return Response(generate_latest(REGISTRY), media_type="text/plain; charset=utf-8")
+        return Response(
+            generate_latest(prometheus_metrics.metrics_registry()),
+            media_type="text/plain; charset=utf-8",
+        )
 
     logger.info("  [OK] Prometheus metrics endpoint at /metrics")
 
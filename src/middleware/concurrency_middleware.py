@@ -1,9 +1,30 @@
 """
 Concurrency Control Middleware
 
-Global server-level admission gate using asyncio.Semaphore.
-Limits the number of requests processed concurrently with a bounded queue
-for overflow, preventing resource exhaustion under bot/attack traffic.
+Server-level admission gate with one lane per traffic class:
+
+- ``streaming``: streamed inference (SSE). Slots are held for the whole stream.
+- ``inference``: non-streamed inference (chat, completions, messages, embeddings, audio).
+- ``catalog``: everything else (models, catalog, metadata, user endpoints).
+- ``admin``: ``/admin`` endpoints, so operators can still get in under load.
+
+A three-minute stream and a 5ms ``/v1/models`` GET no longer compete for the
+same slots, and a long-lived lane can't starve the short ones.
+
+Each lane has its own concurrency limit, adapted from observed latency with a
+gradient controller (Netflix "Gradient2"): the limit shrinks when short-term
+latency rises above the long-term baseline and grows by ~sqrt(limit) while
+latency is flat. The configured limit is the ceiling. Latency is measured from
+admission to the response start, which is what queueing inside the worker
+inflates; stream length is not a load signal.
+
+Overflow waits in a per-lane queue (the queue budget is split between lanes
+like the limits, so the lanes together queue no more than the old gate did)
+ordered by start-time fair queueing on the caller (API key, else client IP), so one tenant's burst queues behind its own
+earlier requests instead of in front of everyone else. When a lane's queue is
+full, the newest waiter of the most backlogged caller is shed in favour of a
+less backlogged newcomer; requests whose expected wait already exceeds the
+queue timeout are shed up front rather than after holding a connection.
 
 Returns 503 Service Unavailable (not 429) because this is server capacity
 protection, not rate limiting. Existing rate limiters handle per-key 429s.
@@ -13,17 +34,22 @@ and proper streaming support.
 """
 
 import asyncio
+import hashlib
+import heapq
+import itertools
 import json
 import logging
-import threading
+import math
+import re
 import time
+from typing import Any
 
-from prometheus_client import Counter, Gauge
-from starlette.types import ASGIApp, Receive, Scope, Send
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
-# Prometheus metrics for concurrency monitoring
+# Prometheus metrics for concurrency monitoring (totals across lanes)
 concurrency_active = Gauge(
     "concurrency_active_requests",
     "Number of requests currently being processed",
@@ -38,6 +64,34 @@ concurrency_rejected = Counter(
     ["reason"],
 )
 
+# Per-lane metrics
+concurrency_lane_active = Gauge(
+    "concurrency_lane_active_requests",
+    "Requests currently admitted, per admission lane",
+    ["lane"],
+)
+concurrency_lane_queued = Gauge(
+    "concurrency_lane_queued_requests",
+    "Requests waiting for admission, per admission lane",
+    ["lane"],
+)
+concurrency_lane_limit = Gauge(
+    "concurrency_lane_limit",
+    "Current (adaptive) concurrency limit, per admission lane",
+    ["lane"],
+)
+concurrency_lane_wait_seconds = Histogram(
+    "concurrency_lane_wait_seconds",
+    "Time spent waiting for admission, per admission lane",
+    ["lane"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+concurrency_lane_shed = Counter(
+    "concurrency_lane_shed_total",
+    "Requests shed by the admission gate, per admission lane and reason",
+    ["lane", "reason"],
+)
+
 # Paths exempt from concurrency control (monitoring must always work)
 CONCURRENCY_EXEMPT_PATHS = frozenset(
     {
@@ -47,16 +101,305 @@ CONCURRENCY_EXEMPT_PATHS = frozenset(
     }
 )
 
+LANE_STREAMING = "streaming"
+LANE_INFERENCE = "inference"
+LANE_CATALOG = "catalog"
+LANE_ADMIN = "admin"
+LANES = (LANE_STREAMING, LANE_INFERENCE, LANE_CATALOG, LANE_ADMIN)
+
+# POST endpoints that run model inference
+INFERENCE_PATHS = frozenset(
+    {
+        "/v1/chat/completions",
+        "/v1/completions",
+        "/v1/messages",
+        "/v1/embeddings",
+        "/v1/responses",
+    }
+)
+INFERENCE_PREFIXES = ("/v1/audio/", "/v1/images/")
+
+ADMIN_PREFIXES = ("/admin", "/api/admin", "/v1/admin")
+
+# Matches a top-level ``"stream": true``; inside string values the quotes are
+# escaped, so message content can't produce a false positive
+_STREAM_TRUE = re.compile(rb'"stream"\s*:\s*true')
+
+# Fair-queueing tags older than the lane's virtual time are pruned past this size
+_MAX_TRACKED_CALLERS = 10_000
+
+
+def classify_lane(method: str, path: str, body: bytes | None = None) -> str:
+    """Admission lane of a request; ``body`` is the JSON body of inference POSTs."""
+    if path.startswith(ADMIN_PREFIXES):
+        return LANE_ADMIN
+    if method == "POST" and (path in INFERENCE_PATHS or path.startswith(INFERENCE_PREFIXES)):
+        if body and _STREAM_TRUE.search(body):
+            return LANE_STREAMING
+        return LANE_INFERENCE
+    return LANE_CATALOG
+
+
+def caller_key(scope: Scope) -> str:
+    """
+    Fair-queueing identity: the API key if present, else the client address.
+
+    Keys are kept only as a short digest, so the fairness map never holds
+    credentials.
+    """
+    forwarded = None
+    for name, value in scope.get("headers") or ():
+        if name == b"authorization":
+            token = value.split(b" ", 1)[-1].strip()
+            if token:
+                return "k:" + _digest(token)
+        elif name == b"x-api-key" and value:
+            return "k:" + _digest(value)
+        elif name == b"x-forwarded-for" and value:
+            forwarded = value.split(b",", 1)[0].strip().decode("latin-1")
+    if forwarded:
+        return "ip:" + forwarded
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def _digest(token: bytes) -> str:
+    return hashlib.blake2b(token, digest_size=12).hexdigest()
+
+
+class GradientLimit:
+    """
+    Latency-gradient concurrency limit.
+
+    ``limit * clamp(tolerance * long_rtt / short_rtt, 0.5, 1) + sqrt(limit)``,
+    smoothed, between ``min_limit`` and ``max_limit``. The limit only grows
+    while the lane is actually using at least half of it.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        short_window: int = 10,
+        long_window: int = 500,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.estimate = float(min(max(initial, self.min_limit), self.max_limit))
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self._short_alpha = 2 / (short_window + 1)
+        self._long_alpha = 2 / (long_window + 1)
+        self.short_rtt: float | None = None
+        self.long_rtt: float | None = None
+
+    @property
+    def limit(self) -> int:
+        return int(self.estimate)
+
+    def on_sample(self, rtt: float, inflight: int) -> int:
+        """Fold one latency sample (seconds) taken with ``inflight`` requests admitted."""
+        rtt = max(rtt, 1e-6)
+        if self.short_rtt is None:
+            self.short_rtt = self.long_rtt = rtt
+            return self.limit
+
+        self.short_rtt += self._short_alpha * (rtt - self.short_rtt)
+        self.long_rtt += self._long_alpha * (rtt - self.long_rtt)
+
+        # Let the baseline recover after a sustained latency drop
+        if self.long_rtt / self.short_rtt > 2:
+            self.long_rtt *= 0.95
+
+        # Application-limited: low usage says nothing about capacity
+        if inflight < self.estimate / 2:
+            return self.limit
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / self.short_rtt))
+        target = self.estimate * gradient + math.sqrt(self.estimate)
+        estimate = self.estimate * (1 - self.smoothing) + target * self.smoothing
+        self.estimate = min(max(estimate, self.min_limit), self.max_limit)
+        return self.limit
+
+
+class _Waiter:
+    __slots__ = ("tag", "seq", "key", "future")
+
+    def __init__(self, tag: float, seq: int, key: str, future: asyncio.Future):
+        self.tag = tag
+        self.seq = seq
+        self.key = key
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.tag, self.seq) < (other.tag, other.seq)
+
+
+class AdmissionLane:
+    """
+    One admission lane: an adaptive slot count plus a fair queue.
+
+    All methods are synchronous and run on the event loop, so no locking is
+    needed. Waiters are futures resolved with True (admitted) or False (shed).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        queue_size: int,
+        adaptive: bool = True,
+        min_limit: int = 1,
+    ):
+        self.name = name
+        self.queue_size = queue_size
+        self.adaptive = adaptive
+        self.limiter = GradientLimit(max_limit, min_limit=min_limit, max_limit=max_limit)
+        self.active = 0
+        self._heap: list[_Waiter] = []
+        self._queued = 0
+        self._virtual_time = 0.0
+        self._finish: dict[str, float] = {}
+        self._seq = itertools.count()
+        # Mean slot hold time, for the expected-wait estimate
+        self._hold_ewma: float | None = None
+
+        concurrency_lane_limit.labels(lane=name).set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return self.limiter.limit
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def try_acquire(self) -> bool:
+        if self.active < self.limit and not self._queued:
+            self.active += 1
+            return True
+        return False
+
+    def expected_wait(self) -> float:
+        """Rough seconds until a newly queued request would be admitted."""
+        if self._hold_ewma is None:
+            return 0.0
+        return (self._queued + 1) * self._hold_ewma / max(1, self.limit)
+
+    def enqueue(self, key: str) -> tuple[_Waiter | None, _Waiter | None]:
+        """
+        Queue a caller. Returns ``(waiter, evicted)``; ``waiter`` is None when
+        the queue is full and the newcomer is the one to shed.
+        """
+        start = max(self._virtual_time, self._finish.get(key, 0.0))
+
+        evicted = None
+        if self._queued >= self.queue_size:
+            victim = self._most_backlogged()
+            # Only displace someone further behind in the fair order
+            if victim is None or victim.tag <= start:
+                return None, None
+            self._remove(victim)
+            evicted = victim
+
+        waiter = _Waiter(start, next(self._seq), key, asyncio.get_running_loop().create_future())
+        self._finish[key] = start + 1.0
+        heapq.heappush(self._heap, waiter)
+        self._queued += 1
+        return waiter, evicted
+
+    def cancel(self, waiter: _Waiter) -> bool:
+        """Withdraw a waiter that gave up; False if it was already resolved."""
+        if waiter.future.done() and not waiter.future.cancelled():
+            return False
+        if waiter in self._heap:
+            self._remove(waiter)
+        return True
+
+    def release(self, hold_time: float | None = None) -> list[_Waiter]:
+        """Free a slot and admit waiters up to the limit; returns those admitted."""
+        self.active -= 1
+        if hold_time is not None:
+            if self._hold_ewma is None:
+                self._hold_ewma = hold_time
+            else:
+                self._hold_ewma += 0.1 * (hold_time - self._hold_ewma)
+        return self._dispatch()
+
+    def on_latency(self, rtt: float) -> None:
+        if not self.adaptive:
+            return
+        before = self.limit
+        after = self.limiter.on_sample(rtt, self.active)
+        if after != before:
+            concurrency_lane_limit.labels(lane=self.name).set(after)
+            if after > before:
+                self._dispatch()
+
+    def _dispatch(self) -> list[_Waiter]:
+        admitted = []
+        while self._heap and self.active < self.limit:
+            waiter = heapq.heappop(self._heap)
+            if waiter.future.done():
+                continue
+            self._queued -= 1
+            self._virtual_time = max(self._virtual_time, waiter.tag)
+            self.active += 1
+            waiter.future.set_result(True)
+            admitted.append(waiter)
+        if len(self._finish) > _MAX_TRACKED_CALLERS:
+            self._finish = {k: v for k, v in self._finish.items() if v > self._virtual_time}
+        return admitted
+
+    def _most_backlogged(self) -> _Waiter | None:
+        live = [w for w in self._heap if not w.future.done()]
+        return max(live, key=lambda w: (w.tag, w.seq), default=None)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        self._heap.remove(waiter)
+        heapq.heapify(self._heap)
+        self._queued -= 1
+        if self._finish.get(waiter.key) == waiter.tag + 1.0:
+            self._finish[waiter.key] = waiter.tag
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": self._queued,
+            "limit": self.limit,
+            "max_limit": self.limiter.max_limit,
+            "short_rtt_ms": round((self.limiter.short_rtt or 0) * 1000, 1),
+            "long_rtt_ms": round((self.limiter.long_rtt or 0) * 1000, 1),
+        }
+
+
+def split_queue_size(queue_size: int, limits: dict[str, int]) -> dict[str, int]:
+    """
+    Share one queue budget between the lanes in proportion to their limits.
+
+    The lane queues together hold ``queue_size`` waiters, as the single queue
+    did; rounding leftovers go to the widest lanes.
+    """
+    total = sum(limits.values()) or 1
+    queues = {lane: queue_size * lane_limit // total for lane, lane_limit in limits.items()}
+    leftover = queue_size - sum(queues.values())
+    for lane in sorted(limits, key=limits.get, reverse=True)[:leftover]:
+        queues[lane] += 1
+    return queues
+
 
 class ConcurrencyMiddleware:
     """
-    Global concurrency gate that limits simultaneous request processing.
+    Per-lane concurrency gate with fair queueing and adaptive limits.
 
-    Behavior:
-    - Slot available: acquire immediately and process
-    - Slots full, queue has room: wait up to queue_timeout seconds
-    - Slots full, queue full: immediate 503
-    - Queue timeout exceeded: 503
+    Behavior (per lane):
+    - Slot available and nobody queued: admit immediately
+    - Slots full, expected wait within queue_timeout: queue in fair order
+    - Queue full: shed the most backlogged caller's newest waiter, or the newcomer
+    - Expected wait over queue_timeout, or queue timeout exceeded: 503
     """
 
     def __init__(
@@ -65,18 +408,31 @@ class ConcurrencyMiddleware:
         limit: int = 20,
         queue_size: int = 50,
         queue_timeout: float = 10.0,
+        lane_limits: dict[str, int] | None = None,
+        adaptive: bool = True,
+        min_limit: int = 2,
     ):
         self.app = app
-        self.semaphore = asyncio.Semaphore(limit)
         self.limit = limit
         self.queue_size = queue_size
         self.queue_timeout = queue_timeout
-        self._waiting = 0
-        self._lock = threading.Lock()
-        self._active_count = 0
+        limits = dict.fromkeys(LANES, limit)
+        limits.update(lane_limits or {})
+        queues = split_queue_size(queue_size, limits)
+        self.lanes = {
+            lane: AdmissionLane(
+                lane,
+                max_limit=limits[lane],
+                queue_size=queues[lane],
+                adaptive=adaptive,
+                min_limit=min(min_limit, limits[lane]),
+            )
+            for lane in LANES
+        }
         logger.info(
             f"Concurrency middleware initialized "
-            f"(limit={limit}, queue={queue_size}, timeout={queue_timeout}s)"
+            f"(lanes={limits}, queues={queues}, timeout={queue_timeout}s, "
+            f"adaptive={adaptive})"
         )
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
@@ -96,81 +452,107 @@ class ConcurrencyMiddleware:
             await self.app(scope, receive, send)
             return
 
-        # Fast path: try non-blocking acquire with zero timeout
-        try:
-            await asyncio.wait_for(self.semaphore.acquire(), timeout=0)
-        except TimeoutError:
-            pass  # Semaphore full, fall through to queued path
-        else:
-            # Successfully acquired without waiting
-            with self._lock:
-                self._active_count += 1
-            concurrency_active.inc()
-            try:
-                await self.app(scope, receive, send)
-            finally:
-                self.semaphore.release()
-                with self._lock:
-                    self._active_count -= 1
-                concurrency_active.dec()
+        method = scope.get("method", "UNKNOWN")
+        body = None
+        if method == "POST" and _is_json(scope) and classify_lane(method, path) == LANE_INFERENCE:
+            # Streamed and unstreamed inference only differ in the body
+            body, receive = await _buffer_body(receive)
+        lane = self.lanes[classify_lane(method, path, body)]
+
+        # Fast path: free slot and nobody ahead in the queue
+        if lane.try_acquire():
+            await self._run(lane, scope, receive, send)
             return
 
-        # Queue is full — reject immediately (atomic check-then-act)
-        with self._lock:
-            if self._waiting >= self.queue_size:
-                method = scope.get("method", "UNKNOWN")
-                active_snapshot = self._active_count
-                waiting_snapshot = self._waiting
-                reject = True
-            else:
-                # Atomically increment _waiting inside the lock
-                self._waiting += 1
-                reject = False
-
-        if reject:
-            concurrency_rejected.labels(reason="queue_full").inc()
-            logger.warning(
-                f"Concurrency gate REJECT (queue full): {method} {path} "
-                f"(active={active_snapshot}, queued={waiting_snapshot})"
-            )
-            await self._send_503(scope, send, "Server at capacity, please retry")
+        if lane.expected_wait() > self.queue_timeout:
+            await self._reject(lane, "expected_timeout", scope, send)
             return
 
-        concurrency_queued.inc()
-        wait_start = time.monotonic()
+        waiter, evicted = lane.enqueue(caller_key(scope))
+        if evicted is not None:
+            evicted.future.set_result(False)
+        if waiter is None:
+            await self._reject(lane, "queue_full", scope, send)
+            return
 
+        self._update_queue_gauges(lane)
+        wait_start = time.monotonic()
         try:
-            await asyncio.wait_for(
-                self.semaphore.acquire(),
-                timeout=self.queue_timeout,
-            )
+            admitted = await asyncio.wait_for(waiter.future, timeout=self.queue_timeout)
         except TimeoutError:
-            with self._lock:
-                self._waiting -= 1
-            concurrency_queued.dec()
-            method = scope.get("method", "UNKNOWN")
-            wait_time = time.monotonic() - wait_start
-            concurrency_rejected.labels(reason="queue_timeout").inc()
-            logger.warning(
-                f"Concurrency gate REJECT (queue timeout {wait_time:.1f}s): " f"{method} {path}"
-            )
-            await self._send_503(scope, send, "Server busy, please retry")
+            if lane.cancel(waiter):
+                self._update_queue_gauges(lane)
+                concurrency_lane_wait_seconds.labels(lane=lane.name).observe(
+                    time.monotonic() - wait_start
+                )
+                await self._reject(lane, "queue_timeout", scope, send)
+                return
+            # Resolved just as the timeout fired
+            admitted = waiter.future.result()
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot we were granted in the meantime
+            if not lane.cancel(waiter) and waiter.future.result():
+                lane.release()
+            self._update_queue_gauges(lane)
+            raise
+
+        self._update_queue_gauges(lane)
+        concurrency_lane_wait_seconds.labels(lane=lane.name).observe(time.monotonic() - wait_start)
+        if not admitted:
+            await self._reject(lane, "shed", scope, send)
             return
 
-        # Acquired after waiting — process the request
-        with self._lock:
-            self._waiting -= 1
-            self._active_count += 1
-        concurrency_queued.dec()
+        await self._run(lane, scope, receive, send, counted=True)
+
+    async def _run(
+        self,
+        lane: AdmissionLane,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        counted: bool = False,
+    ) -> None:
+        """Process an admitted request and give its slot back afterwards."""
+        if not counted:
+            # Admitted on the fast path
+            concurrency_lane_wait_seconds.labels(lane=lane.name).observe(0)
         concurrency_active.inc()
+        concurrency_lane_active.labels(lane=lane.name).inc()
+        admitted_at = time.monotonic()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message.get("status", 200) < 500:
+                lane.on_latency(time.monotonic() - admitted_at)
+            await send(message)
 
         try:
-            await self.app(scope, receive, send)
+            await self.app(scope, receive, send_wrapper)
         finally:
-            self.semaphore.release()
-            with self._lock:
-                self._active_count -= 1
             concurrency_active.dec()
+            concurrency_lane_active.labels(lane=lane.name).dec()
+            lane.release(time.monotonic() - admitted_at)
+
+    def _update_queue_gauges(self, lane: AdmissionLane) -> None:
+        concurrency_lane_queued.labels(lane=lane.name).set(lane.queued)
+        concurrency_queued.set(sum(other.queued for other in self.lanes.values()))
+
+    async def _reject(self, lane: AdmissionLane, reason: str, scope: Scope, send: Send) -> None:
+        concurrency_rejected.labels(reason=reason).inc()
+        concurrency_lane_shed.labels(lane=lane.name, reason=reason).inc()
+        logger.warning(
+            f"Concurrency gate REJECT ({reason}): {scope.get('method', 'UNKNOWN')} "
+            f"{scope.get('path', '')} lane={lane.name} "
+            f"(active={lane.active}, limit={lane.limit}, queued={lane.queued})"
+        )
+        message = (
+            "Server at capacity, please retry"
+            if reason in ("queue_full", "shed", "expected_timeout")
+            else "Server busy, please retry"
+        )
+        await self._send_503(scope, send, message)
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        return {name: lane.get_stats() for name, lane in self.lanes.items()}
 
     @staticmethod
     async def _send_503(scope: Scope, send: Send, message: str) -> None:
@@ -202,3 +584,31 @@ class ConcurrencyMiddleware:
                 "body": body,
             }
         )
+
+
+def _is_json(scope: Scope) -> bool:
+    for name, value in scope.get("headers") or ():
+        if name == b"content-type":
+            return b"json" in value
+    return False
+
+
+async def _buffer_body(receive: Receive) -> tuple[bytes, Receive]:
+    """Read the request body and return it with a receive that replays it."""
+    messages: list[Message] = []
+    chunks: list[bytes] = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+
+    async def replay() -> Message:
+        if messages:
+            return messages.pop(0)
+        return await receive()
+
+    return b"".join(chunks), replay
@@ -28,6 +28,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 from starlette.types import ASGIApp
 
+from src.config.redis_config import redis_pipeline
 from src.services.prometheus_metrics import rate_limited_requests
 
 logger = logging.getLogger(__name__)
@@ -491,8 +492,8 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         Generic sliding window rate limit check.
         Returns True if allowed, False if blocked.
 
-        Note: Redis client is synchronous, so we use asyncio.to_thread to avoid
-        blocking the event loop.
+        INCR and EXPIRE go out as one pipeline (one round-trip) via
+        ``redis_pipeline``, which never blocks the event loop.
         """
         now = int(time.time())
         bucket = now // window
@@ -500,11 +501,13 @@ class SecurityMiddleware(BaseHTTPMiddleware):
 
         if self.redis:
             try:
-                # Use Redis for distributed limiting
-                # Wrap synchronous Redis calls in to_thread to avoid blocking event loop
-                count = await asyncio.to_thread(self.redis.incr, full_key)
-                if count == 1:
-                    await asyncio.to_thread(self.redis.expire, full_key, window * 2)
+                # Use Redis for distributed limiting. Re-arming the TTL on every
+                # hit is harmless: the bucket key changes each window anyway.
+                def build(pipe):
+                    pipe.incr(full_key)
+                    pipe.expire(full_key, window * 2)
+
+                count, _ = await redis_pipeline(self.redis, build)
                 return count <= limit
             except _RedisError as e:
                 logger.error(f"Redis security limit error (falling back to local): {e}")
@@ -1,6 +1,7 @@
 import asyncio
 import logging
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
@@ -10,7 +11,9 @@ from src.db.credit_transactions import (
     get_admin_daily_grant_total,
     get_all_transactions,
     get_transaction_summary,
+    get_transactions_page,
 )
+from src.db.keyset import cursor_for, decode_cursor, fetch_keyset_page
 from src.db.rate_limits import get_user_rate_limits, set_user_rate_limits
 from src.db.users import (
     add_credits_to_user,
@@ -37,6 +40,7 @@ from src.services.model_catalog_cache import (
 )
 from src.services.models import get_cached_models
 from src.services.providers import get_cached_providers
+from src.services.streaming_export import EXPORT_FORMATS, export_response
 
 # Initialize logging
 logger = logging.getLogger(__name__)
@@ -397,6 +401,10 @@ async def admin_clear_rate_limit_cache(admin_user: dict = Depends(require_admin)
             manager.key_configs.clear()
             logger.info("Cleared rate limit manager key_configs cache")
 
+        from src.services.request_principal import clear_request_principal_cache
+
+        clear_request_principal_cache()
+
         # Clear the LRU cache by clearing the function cache
         get_rate_limit_manager.cache_clear()
 
@@ -413,6 +421,33 @@ async def admin_clear_rate_limit_cache(admin_user: dict = Depends(require_admin)
         ) from e
 
 
+def _user_growth_response(
+    days: int,
+    start_date: date,
+    end_date: date,
+    cumulative_data: list[dict[str, Any]],
+    cumulative_total: int,
+) -> dict[str, Any]:
+    # Calculate growth rate
+    if len(cumulative_data) >= 2:
+        start_value = cumulative_data[0]["value"]
+        end_value = cumulative_data[-1]["value"]
+        growth_rate = ((end_value - start_value) / start_value * 100) if start_value > 0 else 0
+    else:
+        growth_rate = 0
+
+    return {
+        "status": "success",
+        "days": days,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "data": cumulative_data,
+        "total": cumulative_total,
+        "growth_rate": round(growth_rate, 2),
+        "timestamp": datetime.now(UTC).isoformat(),
+    }
+
+
 @router.get("/admin/users/growth", tags=["admin"])
 async def get_user_growth(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze (1-365)"),
@@ -442,6 +477,24 @@ async def get_user_growth(
         end_date = datetime.now(UTC).date()
         start_date = end_date - timedelta(days=days - 1)
 
+        # Daily signup rollups: one row per day instead of one per user
+        from src.db.request_rollups import fetch_signup_series
+
+        series = fetch_signup_series(start_date, end_date)
+        if series is not None:
+            cumulative_data = [
+                {
+                    "date": row["day"],
+                    "value": int(row["cumulative"]),
+                    "new_users": int(row["signups"]),
+                }
+                for row in series
+            ]
+            cumulative_total = cumulative_data[-1]["value"] if cumulative_data else 0
+            return _user_growth_response(
+                days, start_date, end_date, cumulative_data, cumulative_total
+            )
+
         # Get user registration data grouped by day
         # Use created_at field primarily, fallback to registration_date
         try:
@@ -557,24 +610,7 @@ async def get_user_growth(
                 {"date": date_str, "value": cumulative_total, "new_users": new_users_today}
             )
 
-        # Calculate growth rate
-        if len(cumulative_data) >= 2:
-            start_value = cumulative_data[0]["value"]
-            end_value = cumulative_data[-1]["value"]
-            growth_rate = ((end_value - start_value) / start_value * 100) if start_value > 0 else 0
-        else:
-            growth_rate = 0
-
-        return {
-            "status": "success",
-            "days": days,
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "data": cumulative_data,
-            "total": cumulative_total,
-            "growth_rate": round(growth_rate, 2),
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
+        return _user_growth_response(days, start_date, end_date, cumulative_data, cumulative_total)
 
     except Exception as e:
         logger.error(f"Error getting user growth data: {e}")
@@ -1042,10 +1078,56 @@ async def get_all_users_info(
         ) from e
 
 
+def _format_admin_transaction(txn: dict[str, Any]) -> dict[str, Any]:
+    """Credit transaction as shown to admins (includes user_id)"""
+    return {
+        "id": txn["id"],
+        "user_id": txn["user_id"],
+        "amount": float(txn["amount"]),
+        "transaction_type": txn["transaction_type"],
+        "description": txn.get("description", ""),
+        "balance_before": float(txn["balance_before"]),
+        "balance_after": float(txn["balance_after"]),
+        "created_at": txn["created_at"],
+        "payment_id": txn.get("payment_id"),
+        "metadata": txn.get("metadata", {}),
+        "created_by": txn.get("created_by"),
+    }
+
+
+_TRANSACTION_EXPORT_COLUMNS = [
+    "id",
+    "user_id",
+    "amount",
+    "transaction_type",
+    "description",
+    "balance_before",
+    "balance_after",
+    "created_at",
+    "payment_id",
+    "metadata",
+    "created_by",
+]
+
+
+def _validate_export_params(format: str, cursor: str | None) -> None:
+    """Reject a bad format or cursor before the streaming response starts"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+
 @router.get("/admin/credit-transactions", tags=["admin"])
 async def get_all_credit_transactions_admin(
     limit: int = Query(50, ge=1, le=1000, description="Maximum number of transactions to return"),
     offset: int = Query(0, ge=0, description="Number of transactions to skip"),
+    cursor: str | None = Query(
+        None, description="Keyset cursor from pagination.next_cursor (use instead of offset)"
+    ),
     user_id: int = Query(None, description="Filter by specific user ID"),
     transaction_type: str = Query(
         None,
@@ -1088,11 +1170,23 @@ async def get_all_credit_transactions_admin(
     - `sort_by`: Sort by date, amount, or type
     - `sort_order`: 'asc' or 'desc'
 
+    **Pagination:**
+    - `offset`: Classic offset paging; deep pages get progressively slower
+    - `cursor`: Keyset paging over (created_at, id); every page costs the same.
+      Pass `pagination.next_cursor` from the previous response (created_at sort only).
+      Pages may hold fewer than `limit` rows when min/max_amount is set.
+
     **Response includes:**
     - Filtered transactions list (with user_id included)
     - Summary analytics (if include_summary=true)
     """
     try:
+        # Validate keyset pagination
+        if cursor and offset:
+            raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+        if cursor and sort_by != "created_at":
+            raise HTTPException(status_code=400, detail="cursor requires sort_by=created_at")
+
         # Validate direction filter
         if direction and direction.lower() not in ("credit", "charge"):
             raise HTTPException(status_code=400, detail="direction must be 'credit' or 'charge'")
@@ -1108,39 +1202,39 @@ async def get_all_credit_transactions_admin(
         if sort_order.lower() not in ("asc", "desc"):
             raise HTTPException(status_code=400, detail="sort_order must be 'asc' or 'desc'")
 
-        # Get all transactions with filters
-        transactions = get_all_transactions(
-            limit=limit,
-            offset=offset,
-            user_id=user_id,
-            transaction_type=transaction_type,
-            from_date=from_date,
-            to_date=to_date,
-            min_amount=min_amount,
-            max_amount=max_amount,
-            direction=direction,
-            payment_id=payment_id,
-            sort_by=sort_by,
-            sort_order=sort_order,
-        )
+        filters = {
+            "user_id": user_id,
+            "transaction_type": transaction_type,
+            "from_date": from_date,
+            "to_date": to_date,
+            "min_amount": min_amount,
+            "max_amount": max_amount,
+            "direction": direction,
+            "payment_id": payment_id,
+            "sort_order": sort_order,
+        }
+
+        if cursor:
+            try:
+                transactions, next_cursor = get_transactions_page(
+                    limit=limit, cursor=cursor, **filters
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+            has_more = next_cursor is not None
+        else:
+            # Get all transactions with filters
+            transactions = get_all_transactions(
+                limit=limit, offset=offset, sort_by=sort_by, **filters
+            )
+            has_more = len(transactions) == limit  # Best guess
+            # Lets offset callers switch to keyset paging from here on
+            next_cursor = (
+                cursor_for(transactions[-1]) if has_more and sort_by == "created_at" else None
+            )
 
         # Format transactions (include user_id for admin view)
-        formatted_transactions = [
-            {
-                "id": txn["id"],
-                "user_id": txn["user_id"],
-                "amount": float(txn["amount"]),
-                "transaction_type": txn["transaction_type"],
-                "description": txn.get("description", ""),
-                "balance_before": float(txn["balance_before"]),
-                "balance_after": float(txn["balance_after"]),
-                "created_at": txn["created_at"],
-                "payment_id": txn.get("payment_id"),
-                "metadata": txn.get("metadata", {}),
-                "created_by": txn.get("created_by"),
-            }
-            for txn in transactions
-        ]
+        formatted_transactions = [_format_admin_transaction(txn) for txn in transactions]
 
         # Build response
         response = {
@@ -1149,7 +1243,9 @@ async def get_all_credit_transactions_admin(
                 "total": len(formatted_transactions),
                 "limit": limit,
                 "offset": offset,
-                "has_more": len(formatted_transactions) == limit,  # Best guess
+                "has_more": has_more,
+                "cursor": cursor,
+                "next_cursor": next_cursor,
             },
             "filters_applied": {
                 "user_id": user_id,
@@ -1187,6 +1283,65 @@ async def get_all_credit_transactions_admin(
         raise HTTPException(status_code=500, detail="Internal server error") from e
 
 
+@router.get("/admin/credit-transactions/export", tags=["admin"])
+async def export_credit_transactions_admin(
+    format: str = Query("ndjson", description="Export format: 'ndjson' or 'csv'"),
+    cursor: str | None = Query(None, description="Resume after this row's cursor"),
+    limit: int | None = Query(None, ge=1, description="Maximum rows to export (default: all)"),
+    user_id: int | None = Query(None, description="Filter by specific user ID"),
+    transaction_type: str | None = Query(None, description="Filter by transaction type"),
+    from_date: str | None = Query(None, description="Start date filter (YYYY-MM-DD or ISO format)"),
+    to_date: str | None = Query(None, description="End date filter (YYYY-MM-DD or ISO format)"),
+    min_amount: float | None = Query(None, description="Minimum amount (absolute value)"),
+    max_amount: float | None = Query(None, description="Maximum amount (absolute value)"),
+    direction: str | None = Query(None, description="'credit' or 'charge'"),
+    payment_id: int | None = Query(None, description="Filter by payment ID"),
+    sort_order: str = Query("desc", description="Sort order by created_at: 'asc' or 'desc'"),
+    admin_user: dict = Depends(require_admin),
+):
+    """
+    Stream the credit transaction ledger as NDJSON or CSV (Admin only).
+
+    Rows are fetched in keyset batches of ADMIN_EXPORT_BATCH_SIZE and written as
+    they arrive, so exports of any size run in constant memory. Filters match
+    `/admin/credit-transactions`.
+
+    Every row carries a `cursor` column. If a download is cut short, repeat the
+    request with `cursor` set to the last row received to continue from there.
+    An interrupted NDJSON export ends with an `{"error": ..., "cursor": ...}` line.
+    """
+    _validate_export_params(format, cursor)
+    if direction and direction.lower() not in ("credit", "charge"):
+        raise HTTPException(status_code=400, detail="direction must be 'credit' or 'charge'")
+    if sort_order.lower() not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="sort_order must be 'asc' or 'desc'")
+
+    def fetch_page(page_cursor: str | None, page_limit: int):
+        return get_transactions_page(
+            limit=page_limit,
+            cursor=page_cursor,
+            user_id=user_id,
+            transaction_type=transaction_type,
+            from_date=from_date,
+            to_date=to_date,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            direction=direction,
+            payment_id=payment_id,
+            sort_order=sort_order,
+        )
+
+    return export_response(
+        fetch_page,
+        fmt=format,
+        filename="credit_transactions",
+        columns=_TRANSACTION_EXPORT_COLUMNS,
+        transform=_format_admin_transaction,
+        cursor=cursor,
+        max_rows=limit,
+    )
+
+
 @router.get("/admin/users/by-api-key", tags=["admin"])
 async def get_user_by_api_key(
     api_key: str = Query(..., description="Full API key (exact match required)"),
@@ -2062,6 +2217,66 @@ async def get_models_with_requests_admin(
         raise HTTPException(status_code=500, detail=f"Failed to get models with requests: {str(e)}")
 
 
+_CHAT_REQUEST_SELECT = (
+    "*, models!inner(id, model_id, model_name, provider_model_id, provider_id, "
+    "providers!inner(id, name, slug))"
+)
+
+_CHAT_REQUEST_EXPORT_COLUMNS = [
+    "id",
+    "created_at",
+    "request_id",
+    "status",
+    "model_id",
+    "model_name",
+    "provider_model_id",
+    "provider_slug",
+    "user_id",
+    "api_key_id",
+    "is_anonymous",
+    "input_tokens",
+    "output_tokens",
+    "processing_time_ms",
+    "cost_usd",
+    "input_cost_usd",
+    "output_cost_usd",
+    "pricing_source",
+]
+
+
+def _filter_chat_requests(
+    query: Any,
+    *,
+    model_id: int | None,
+    provider_id: int | None,
+    model_name: str | None,
+    start_date: str | None,
+    end_date: str | None,
+) -> Any:
+    """Apply the admin chat-request filters to a chat_completion_requests query"""
+    if model_id is not None:
+        query = query.eq("model_id", model_id)
+    if provider_id is not None:
+        query = query.eq("models.provider_id", provider_id)
+    if model_name is not None:
+        query = query.ilike("models.model_name", f"%{model_name}%")
+    if start_date is not None:
+        query = query.gte("created_at", start_date)
+    if end_date is not None:
+        query = query.lte("created_at", end_date)
+    return query
+
+
+def _flatten_chat_request(row: dict[str, Any]) -> dict[str, Any]:
+    """One CSV record per request, with the joined model/provider inlined"""
+    model = row.get("models") or {}
+    record = {column: row.get(column) for column in _CHAT_REQUEST_EXPORT_COLUMNS}
+    record["model_name"] = model.get("model_name")
+    record["provider_model_id"] = model.get("provider_model_id")
+    record["provider_slug"] = (model.get("providers") or {}).get("slug")
+    return record
+
+
 @router.get("/admin/monitoring/chat-requests", tags=["admin", "monitoring"])
 async def get_chat_completion_requests_admin(
     model_id: int | None = Query(None, description="Filter by model ID"),
@@ -2071,6 +2286,9 @@ async def get_chat_completion_requests_admin(
     end_date: str | None = Query(None, description="Filter by end date (ISO format)"),
     limit: int = Query(100, ge=1, le=100000, description="Maximum records to return"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
+    cursor: str | None = Query(
+        None, description="Keyset cursor from metadata.next_cursor (use instead of offset)"
+    ),
     admin_user: dict = Depends(require_admin),
 ):
     """
@@ -2078,68 +2296,78 @@ async def get_chat_completion_requests_admin(
 
     Allows fetching chat completion data for analytics with multiple filter options.
     Returns full request details including model, provider, tokens, and performance metrics.
+
+    Pages are newest first. `offset` paging gets slower the deeper it goes; pass
+    `metadata.next_cursor` back as `cursor` for keyset paging instead, which costs
+    the same on every page. Cursor pages skip the exact total count
+    (`total_count` is null) since counting is itself a full scan.
     """
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+
     try:
         from src.db.client import get_db
 
         client = get_db()
+        filters = {
+            "model_id": model_id,
+            "provider_id": provider_id,
+            "model_name": model_name,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
 
-        query = client.table("chat_completion_requests").select(
-            "*, models!inner(id, model_id, model_name, provider_model_id, provider_id, providers!inner(id, name, slug))"
-        )
-
-        if model_id is not None:
-            query = query.eq("model_id", model_id)
-        if provider_id is not None:
-            query = query.eq("models.provider_id", provider_id)
-        if model_name is not None:
-            query = query.ilike("models.model_name", f"%{model_name}%")
-        if start_date is not None:
-            query = query.gte("created_at", start_date)
-        if end_date is not None:
-            query = query.lte("created_at", end_date)
-
-        query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-        result = query.execute()
-
-        # Get total count with all filters applied
-        count_query = client.table("chat_completion_requests").select(
-            "id, models!inner(id, model_id, model_name, provider_model_id, provider_id, providers!inner(id, name, slug))",
-            count="exact",
-            head=True,
-        )
-        if model_id is not None:
-            count_query = count_query.eq("model_id", model_id)
-        if provider_id is not None:
-            count_query = count_query.eq("models.provider_id", provider_id)
-        if model_name is not None:
-            count_query = count_query.ilike("models.model_name", f"%{model_name}%")
-        if start_date is not None:
-            count_query = count_query.gte("created_at", start_date)
-        if end_date is not None:
-            count_query = count_query.lte("created_at", end_date)
-        count_result = count_query.execute()
-        total_count = count_result.count if count_result.count is not None else len(result.data)
+        if cursor:
+            try:
+                data, next_cursor = fetch_keyset_page(
+                    lambda: _filter_chat_requests(
+                        client.table("chat_completion_requests").select(_CHAT_REQUEST_SELECT),
+                        **filters,
+                    ),
+                    cursor,
+                    limit,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+            total_count = None
+        else:
+            query = _filter_chat_requests(
+                client.table("chat_completion_requests").select(_CHAT_REQUEST_SELECT), **filters
+            )
+            query = query.order("created_at", desc=True).order("id", desc=True)
+            result = query.range(offset, offset + limit - 1).execute()
+            data = result.data or []
+            next_cursor = cursor_for(data[-1]) if len(data) == limit else None
+
+            # Get total count with all filters applied
+            count_query = _filter_chat_requests(
+                client.table("chat_completion_requests").select(
+                    "id, models!inner(id, model_id, model_name, provider_model_id, provider_id, providers!inner(id, name, slug))",
+                    count="exact",
+                    head=True,
+                ),
+                **filters,
+            )
+            count_result = count_query.execute()
+            total_count = count_result.count if count_result.count is not None else len(data)
 
         return {
             "success": True,
-            "data": result.data or [],
+            "data": data,
             "metadata": {
                 "total_count": total_count,
                 "limit": limit,
                 "offset": offset,
-                "returned_count": len(result.data or []),
-                "filters": {
-                    "model_id": model_id,
-                    "provider_id": provider_id,
-                    "model_name": model_name,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                },
+                "returned_count": len(data),
+                "cursor": cursor,
+                "next_cursor": next_cursor,
+                "filters": filters,
                 "timestamp": datetime.now(UTC).isoformat(),
             },
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get chat completion requests: {e}", exc_info=True)
         raise HTTPException(
@@ -2147,6 +2375,60 @@ async def get_chat_completion_requests_admin(
         )
 
 
+@router.get("/admin/monitoring/chat-requests/export", tags=["admin", "monitoring"])
+async def export_chat_completion_requests_admin(
+    format: str = Query("ndjson", description="Export format: 'ndjson' or 'csv'"),
+    cursor: str | None = Query(None, description="Resume after this row's cursor"),
+    limit: int | None = Query(None, ge=1, description="Maximum rows to export (default: all)"),
+    model_id: int | None = Query(None, description="Filter by model ID"),
+    provider_id: int | None = Query(None, description="Filter by provider ID"),
+    model_name: str | None = Query(None, description="Filter by model name (contains)"),
+    start_date: str | None = Query(None, description="Filter by start date (ISO format)"),
+    end_date: str | None = Query(None, description="Filter by end date (ISO format)"),
+    admin_user: dict = Depends(require_admin),
+):
+    """
+    Stream chat completion requests as NDJSON or CSV, newest first (Admin only).
+
+    Rows are fetched in keyset batches of ADMIN_EXPORT_BATCH_SIZE and written as
+    they arrive, so exports of any size run in constant memory. NDJSON rows match
+    the `data` items of `/admin/monitoring/chat-requests`. CSV rows inline the
+    model name and provider slug.
+
+    Every row carries a `cursor` column. If a download is cut short, repeat the
+    request with `cursor` set to the last row received to continue from there.
+    """
+    _validate_export_params(format, cursor)
+
+    from src.db.client import get_db
+
+    client = get_db()
+
+    def fetch_page(page_cursor: str | None, page_limit: int):
+        return fetch_keyset_page(
+            lambda: _filter_chat_requests(
+                client.table("chat_completion_requests").select(_CHAT_REQUEST_SELECT),
+                model_id=model_id,
+                provider_id=provider_id,
+                model_name=model_name,
+                start_date=start_date,
+                end_date=end_date,
+            ),
+            page_cursor,
+            page_limit,
+        )
+
+    return export_response(
+        fetch_page,
+        fmt=format,
+        filename="chat_completion_requests",
+        columns=_CHAT_REQUEST_EXPORT_COLUMNS,
+        transform=_flatten_chat_request if format == "csv" else dict,
+        cursor=cursor,
+        max_rows=limit,
+    )
+
+
 @router.get("/admin/monitoring/chat-requests/summary", tags=["admin", "monitoring"])
 async def get_chat_requests_summary_admin(
     model_id: int | None = Query(None, description="Filter by model ID"),
@@ -2332,6 +2614,47 @@ async def get_chat_requests_plot_data_admin(
         for req in recent_requests:
             req["total_tokens"] = req.get("input_tokens", 0) + req.get("output_tokens", 0)
 
+        # Bucketed series from the request rollups: one point per minute, hour or
+        # day depending on the range, instead of one point per request
+        from src.db.request_rollups import fetch_rollup_series, parse_timestamp, series_bucket
+
+        range_end = parse_timestamp(end_date) if end_date else datetime.now(UTC)
+        range_start = parse_timestamp(start_date) if start_date else None
+        bucket = series_bucket(range_start, range_end)
+        series = fetch_rollup_series(
+            bucket,
+            range_start,
+            range_end,
+            model_ids=[model_id] if model_id is not None else None,
+            provider_id=provider_id,
+        )
+        if series is not None:
+            requests_array = [int(point.get("requests") or 0) for point in series]
+            return {
+                "success": True,
+                "recent_requests": recent_requests[:10],
+                "plot_data": {
+                    "tokens": [
+                        int(point.get("input_tokens") or 0) + int(point.get("output_tokens") or 0)
+                        for point in series
+                    ],
+                    "latency": [
+                        round(float(point.get("latency_ms_sum") or 0) / count, 2) if count else 0
+                        for point, count in zip(series, requests_array, strict=True)
+                    ],
+                    "timestamps": [point.get("bucket_start") for point in series],
+                    "requests": requests_array,
+                },
+                "metadata": {
+                    "recent_count": len(recent_requests[:10]),
+                    "total_count": sum(requests_array),
+                    "timestamp": datetime.now(UTC).isoformat(),
+                    "compression": "buckets",
+                    "bucket": bucket,
+                    "format_version": "2.0",
+                },
+            }
+
         # Get ALL requests for plotting (lightweight - only 4 fields)
         plot_query = client.table("chat_completion_requests").select(
             "input_tokens, output_tokens, processing_time_ms, created_at"
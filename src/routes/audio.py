@@ -4,19 +4,27 @@ This module provides endpoints for audio transcription using OpenAI Whisper
 or compatible services (Simplismart). Supports various audio formats and
 provides options for language hints, prompt context, and output formatting.
 
+Uploads are copied (or base64-decoded) into a spooled temp file in bounded
+chunks and sent with the async OpenAI client, so a large upload neither sits
+in memory nor blocks the event loop during the Whisper round-trip. With
+AUDIO_SPLIT_ENABLED, long PCM WAV recordings are split at silence and the
+pieces are transcribed in parallel, then stitched back together
+(src/utils/audio_container.py).
+
 Billing: Audio transcription is billed per minute of audio. When the actual
-duration is not available from the API response, duration is estimated from
-file size (approximately 1 minute per 1MB for compressed formats).
+duration is not available from the API response, it is read from the
+container headers. When the headers do not record it either, it is estimated
+from file size (approximately 1 minute per 1MB for compressed formats).
 """
 
 import asyncio
-import base64
 import logging
 import os
-import tempfile
 import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import JSONResponse
@@ -26,8 +34,15 @@ from src.db.api_keys import increment_api_key_usage
 from src.db.users import deduct_credits, get_user, record_usage
 from src.security.deps import get_api_key
 from src.security.inference_gates import enforce_subscription_status_gate
-from src.services.connection_pool import get_openai_pooled_client
+from src.services.connection_pool import get_openai_pooled_async_client
 from src.utils.ai_tracing import AIRequestType, AITracer
+from src.utils.audio_container import (
+    AudioTooLarge,
+    probe_duration_seconds,
+    split_wav_at_silence,
+    spool_base64,
+    spool_upload,
+)
 from src.utils.rate_limit_guard import enforce_request_rate_limit
 
 logger = logging.getLogger(__name__)
@@ -50,6 +65,9 @@ SUPPORTED_FORMATS = {
 # Maximum file size (25MB - Whisper's limit)
 MAX_FILE_SIZE = 25 * 1024 * 1024
 
+# Formats whose chunk transcriptions can be stitched back together
+STITCHABLE_FORMATS = {"json", "text", "verbose_json"}
+
 # Audio transcription pricing (cost per minute in USD)
 # This is the hardcoded fallback. At runtime get_audio_cost() first tries
 # pricing_lookup.get_model_pricing() and falls back to this dict.
@@ -231,6 +249,114 @@ async def _deduct_audio_credits(
     return actual_balance_after
 
 
+def _max_upload_bytes() -> int:
+    """Largest accepted upload; bigger than one Whisper request only when it can be split."""
+    if Config.AUDIO_SPLIT_ENABLED:
+        return max(MAX_FILE_SIZE, Config.AUDIO_MAX_UPLOAD_BYTES)
+    return MAX_FILE_SIZE
+
+
+def _header_duration_minutes(audio: Any, extension: str) -> float | None:
+    seconds = probe_duration_seconds(audio, extension)
+    return seconds / 60.0 if seconds else None
+
+
+def _as_dict(item: Any) -> dict:
+    if isinstance(item, dict):
+        return dict(item)
+    if hasattr(item, "model_dump"):
+        return item.model_dump()
+    return dict(vars(item))
+
+
+def _stitch_transcriptions(offsets: list[float], responses: list[Any], response_format: str) -> Any:
+    """Combine per-chunk transcriptions into one response, shifting timestamps by chunk start."""
+    texts = [r if isinstance(r, str) else getattr(r, "text", str(r)) for r in responses]
+    text = " ".join(t.strip() for t in texts if t and t.strip())
+    if response_format == "text":
+        return text
+
+    stitched = SimpleNamespace(text=text)
+    if response_format != "verbose_json":
+        return stitched
+
+    languages = [getattr(r, "language", None) for r in responses]
+    stitched.language = next((lang for lang in languages if lang), None)
+    last_duration = getattr(responses[-1], "duration", None)
+    if last_duration is not None:
+        stitched.duration = offsets[-1] + last_duration
+    for field in ("segments", "words"):
+        items = []
+        for offset, response in zip(offsets, responses, strict=True):
+            for item in getattr(response, field, None) or []:
+                item = _as_dict(item)
+                for key in ("start", "end"):
+                    if item.get(key) is not None:
+                        item[key] += offset
+                if field == "segments":
+                    item["id"] = len(items)
+                items.append(item)
+        setattr(stitched, field, items)
+    return stitched
+
+
+async def _transcribe_audio(
+    client: Any,
+    audio: Any,
+    size: int,
+    extension: str,
+    content_type: str,
+    transcription_params: dict,
+    request_id: str,
+) -> Any:
+    """
+    Send the spooled audio upstream, split into parallel requests when enabled and possible.
+
+    Raises HTTPException(413) when the audio is too big for one request and
+    cannot be split.
+    """
+    chunks = []
+    if (
+        Config.AUDIO_SPLIT_ENABLED
+        and extension == ".wav"
+        and transcription_params["response_format"] in STITCHABLE_FORMATS
+    ):
+        chunks = await asyncio.to_thread(
+            split_wav_at_silence, audio, Config.AUDIO_SPLIT_TARGET_SECONDS, MAX_FILE_SIZE
+        )
+
+    if not chunks:
+        if size > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Audio file too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB "
+                "(larger uploads are only accepted as PCM WAV with splitting enabled)",
+            )
+        return await client.audio.transcriptions.create(
+            file=(f"audio{extension}", audio, content_type), **transcription_params
+        )
+
+    logger.info(f"[{request_id}] Transcribing {len(chunks)} chunks split at silence")
+    semaphore = asyncio.Semaphore(max(1, Config.AUDIO_SPLIT_CONCURRENCY))
+
+    async def transcribe_chunk(index: int, chunk: Any) -> Any:
+        async with semaphore:
+            return await client.audio.transcriptions.create(
+                file=(f"audio-{index}.wav", chunk, "audio/wav"), **transcription_params
+            )
+
+    try:
+        responses = await asyncio.gather(
+            *(transcribe_chunk(i, chunk) for i, (_, chunk) in enumerate(chunks))
+        )
+    finally:
+        for _, chunk in chunks:
+            chunk.close()
+    return _stitch_transcriptions(
+        [start for start, _ in chunks], responses, transcription_params["response_format"]
+    )
+
+
 @router.post("/transcriptions")
 async def create_transcription(
     request: Request,
@@ -302,27 +428,27 @@ async def create_transcription(
             f"Supported formats: {', '.join(SUPPORTED_FORMATS.keys())}",
         )
 
-    # Read file content
+    # Stream the upload into a spooled temp file, enforcing the size limit as it arrives
+    max_bytes = _max_upload_bytes()
     try:
-        content = await file.read()
-    except Exception as e:
-        logger.error(f"[{request_id}] Failed to read audio file: {e}")
-        raise HTTPException(status_code=400, detail="Failed to read audio file")
-
-    # Validate file size
-    if len(content) > MAX_FILE_SIZE:
+        audio, file_size = await spool_upload(file, max_bytes)
+    except AudioTooLarge:
         raise HTTPException(
             status_code=413,
-            detail=f"Audio file too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB",
+            detail=f"Audio file too large. Maximum size is {max_bytes // (1024 * 1024)}MB",
         )
+    except Exception as e:
+        logger.error(f"[{request_id}] Failed to read audio file: {e}")
+        raise HTTPException(status_code=400, detail="Failed to read audio file")
 
-    if len(content) == 0:
+    if file_size == 0:
+        audio.close()
         raise HTTPException(status_code=400, detail="Audio file is empty")
 
     logger.info(
         f"[{request_id}] Transcription request: "
         f"model={model}, language={language}, format={response_format}, "
-        f"size={len(content)} bytes, content_type={content_type}"
+        f"size={file_size} bytes, content_type={content_type}"
     )
 
     # Determine file extension
@@ -332,8 +458,6 @@ async def create_transcription(
     loop = asyncio.get_running_loop()
     executor = ThreadPoolExecutor(max_workers=4)
 
-    # Create temporary file for the API
-    tmp_file_path = None
     try:
         # --- Auth & credit pre-check ---
         user = await loop.run_in_executor(executor, get_user, api_key)
@@ -351,8 +475,11 @@ async def create_transcription(
 
         enforce_subscription_status_gate(user)
 
-        # Estimate duration from file size for pre-check
-        estimated_duration = estimate_audio_duration_minutes(len(content), extension)
+        # Duration for the pre-check: container headers, else estimated from size
+        header_duration = await asyncio.to_thread(_header_duration_minutes, audio, extension)
+        estimated_duration = header_duration or estimate_audio_duration_minutes(
+            file_size, extension
+        )
         estimated_cost, cost_per_minute, _ = get_audio_cost(model, estimated_duration)
 
         # Pre-flight credit sufficiency check with 10% buffer for race conditions
@@ -371,13 +498,9 @@ async def create_transcription(
                 ),
             )
 
-        with tempfile.NamedTemporaryFile(suffix=extension, delete=False) as tmp_file:
-            tmp_file_path = tmp_file.name
-            tmp_file.write(content)
-
         # Get OpenAI client
         try:
-            client = get_openai_pooled_client()
+            client = get_openai_pooled_async_client()
         except Exception as e:
             logger.error(f"[{request_id}] Failed to get OpenAI client: {e}")
             raise HTTPException(
@@ -406,14 +529,21 @@ async def create_transcription(
             model=model,
             request_type=AIRequestType.AUDIO_TRANSCRIPTION,
         ) as trace_ctx:
-            with open(tmp_file_path, "rb") as audio_file:
-                try:
-                    response = client.audio.transcriptions.create(
-                        file=audio_file, **transcription_params
-                    )
-                except Exception as e:
-                    logger.error(f"[{request_id}] Whisper API error: {e}")
-                    raise HTTPException(status_code=502, detail=f"Transcription failed: {str(e)}")
+            try:
+                response = await _transcribe_audio(
+                    client,
+                    audio,
+                    file_size,
+                    extension,
+                    content_type,
+                    transcription_params,
+                    request_id,
+                )
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"[{request_id}] Whisper API error: {e}")
+                raise HTTPException(status_code=502, detail=f"Transcription failed: {str(e)}")
 
             elapsed = max(0.001, time.monotonic() - start)
 
@@ -435,7 +565,7 @@ async def create_transcription(
             trace_ctx.add_event(
                 "transcription_completed",
                 {
-                    "file_size_bytes": len(content),
+                    "file_size_bytes": file_size,
                     "language": language,
                     "response_format": response_format,
                     "duration_minutes": round(actual_duration, 2),
@@ -509,12 +639,8 @@ async def create_transcription(
         logger.error(f"[{request_id}] Unexpected error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
     finally:
-        # Clean up temp file
-        if tmp_file_path:
-            try:
-                os.unlink(tmp_file_path)
-            except OSError as cleanup_err:
-                logger.warning(f"[{request_id}] Failed to clean up temp file: {cleanup_err}")
+        # Release the spooled upload (deletes its temp file if it rolled to disk)
+        audio.close()
         # Clean up executor
         if "executor" in locals():
             executor.shutdown(wait=False)
@@ -559,39 +685,39 @@ async def create_transcription_base64(
 
     request_id = str(uuid.uuid4())[:8]
 
-    # Handle data URL format
+    # Handle data URL format (data:audio/webm;base64,<data>) without copying the payload
+    encoded_start = 0
     if audio_data.startswith("data:"):
-        try:
-            # Parse data URL: data:audio/webm;base64,<data>
-            header, encoded = audio_data.split(",", 1)
-            if ";" in header:
-                mime_part = header.split(";")[0]
-                content_type = mime_part.replace("data:", "")
-            audio_data = encoded
-        except ValueError:
+        encoded_start = audio_data.find(",") + 1
+        if encoded_start == 0:
             raise HTTPException(status_code=400, detail="Invalid data URL format")
+        header = audio_data[: encoded_start - 1]
+        if ";" in header:
+            content_type = header.split(";")[0].replace("data:", "")
 
-    # Decode base64
+    # Decode base64 in chunks into a spooled temp file, off the event loop
+    max_bytes = _max_upload_bytes()
     try:
-        content = base64.b64decode(audio_data)
-    except Exception as e:
-        logger.error(f"[{request_id}] Failed to decode base64 audio: {e}")
-        raise HTTPException(status_code=400, detail="Invalid base64-encoded audio data")
-
-    # Validate size
-    if len(content) > MAX_FILE_SIZE:
+        audio, file_size = await asyncio.to_thread(
+            spool_base64, audio_data, max_bytes, encoded_start
+        )
+    except AudioTooLarge:
         raise HTTPException(
             status_code=413,
-            detail=f"Audio data too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB",
+            detail=f"Audio data too large. Maximum size is {max_bytes // (1024 * 1024)}MB",
         )
+    except Exception as e:
+        logger.error(f"[{request_id}] Failed to decode base64 audio: {e}")
+        raise HTTPException(status_code=400, detail="Invalid base64-encoded audio data")
 
-    if len(content) == 0:
+    if file_size == 0:
+        audio.close()
         raise HTTPException(status_code=400, detail="Audio data is empty")
 
     logger.info(
         f"[{request_id}] Base64 transcription request: "
         f"model={model}, language={language}, format={response_format}, "
-        f"size={len(content)} bytes, content_type={content_type}"
+        f"size={file_size} bytes, content_type={content_type}"
     )
 
     # Determine file extension
@@ -601,8 +727,6 @@ async def create_transcription_base64(
     loop = asyncio.get_running_loop()
     executor = ThreadPoolExecutor(max_workers=4)
 
-    # Create temporary file and transcribe
-    tmp_file_path = None
     try:
         # --- Auth & credit pre-check ---
         user = await loop.run_in_executor(executor, get_user, api_key)
@@ -620,8 +744,11 @@ async def create_transcription_base64(
 
         enforce_subscription_status_gate(user)
 
-        # Estimate duration from file size for pre-check
-        estimated_duration = estimate_audio_duration_minutes(len(content), extension)
+        # Duration for the pre-check: container headers, else estimated from size
+        header_duration = await asyncio.to_thread(_header_duration_minutes, audio, extension)
+        estimated_duration = header_duration or estimate_audio_duration_minutes(
+            file_size, extension
+        )
         estimated_cost, cost_per_minute, _ = get_audio_cost(model, estimated_duration)
 
         # Pre-flight credit sufficiency check with 10% buffer for race conditions
@@ -640,13 +767,9 @@ async def create_transcription_base64(
                 ),
             )
 
-        with tempfile.NamedTemporaryFile(suffix=extension, delete=False) as tmp_file:
-            tmp_file_path = tmp_file.name
-            tmp_file.write(content)
-
         # Get OpenAI client
         try:
-            client = get_openai_pooled_client()
+            client = get_openai_pooled_async_client()
         except Exception as e:
             logger.error(f"[{request_id}] Failed to get OpenAI client: {e}")
             raise HTTPException(
@@ -669,14 +792,15 @@ async def create_transcription_base64(
         start = time.monotonic()
 
         # Call Whisper API
-        with open(tmp_file_path, "rb") as audio_file:
-            try:
-                response = client.audio.transcriptions.create(
-                    file=audio_file, **transcription_params
-                )
-            except Exception as e:
-                logger.error(f"[{request_id}] Whisper API error: {e}")
-                raise HTTPException(status_code=502, detail=f"Transcription failed: {str(e)}")
+        try:
+            response = await _transcribe_audio(
+                client, audio, file_size, extension, content_type, transcription_params, request_id
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"[{request_id}] Whisper API error: {e}")
+            raise HTTPException(status_code=502, detail=f"Transcription failed: {str(e)}")
 
         elapsed = max(0.001, time.monotonic() - start)
 
@@ -744,12 +868,8 @@ async def create_transcription_base64(
         logger.error(f"[{request_id}] Unexpected error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
     finally:
-        # Clean up temp file
-        if tmp_file_path:
-            try:
-                os.unlink(tmp_file_path)
-            except OSError as cleanup_err:
-                logger.warning(f"[{request_id}] Failed to clean up temp file: {cleanup_err}")
+        # Release the spooled upload (deletes its temp file if it rolled to disk)
+        audio.close()
         # Clean up executor
         if "executor" in locals():
             executor.shutdown(wait=False)
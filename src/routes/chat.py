@@ -15,7 +15,10 @@ import src.db.plans as plans_module
 import src.db.rate_limits as rate_limits_module
 import src.db.users as users_module
 from src.config import Config
-from src.db.chat_completion_requests import save_chat_completion_request_with_cost
+from src.db.chat_completion_requests import (
+    save_chat_completion_request_with_cost,
+    save_chat_completion_request_with_cost_async,
+)
 from src.schemas import ProxyRequest
 from src.security.deps import get_optional_api_key
 from src.services.anonymous_rate_limiter import (
@@ -25,9 +28,9 @@ from src.services.anonymous_rate_limiter import (
     validate_anonymous_request,
 )
 from src.services.passive_health_monitor import capture_model_health
-from src.services.prometheus_metrics import (
-    record_free_model_usage,
-)
+from src.services.post_completion_queue import submit_post_completion
+from src.services.prometheus_metrics import record_free_model_usage
+from src.services.request_principal import get_request_principal_async
 from src.utils.errors import APIExceptions
 from src.utils.performance_tracker import PerformanceTracker
 from src.utils.rate_limit_headers import get_rate_limit_headers
@@ -92,7 +95,7 @@ from src.security.inference_gates import (
     enforce_subscription_status_gate,
 )
 from src.services.pricing import calculate_cost_async, get_model_pricing_async
-from src.utils.token_estimator import estimate_message_tokens
+from src.utils.token_estimator import count_tokens_messages_async, estimate_message_tokens_async
 
 
 # Backwards compatibility wrappers for test patches
@@ -104,6 +107,13 @@ def enforce_plan_limits(*args, **kwargs):
     return plans_module.enforce_plan_limits(*args, **kwargs)
 
 
+async def _enforce_plan_limits_async(user_id, tokens_requested, environment_tag):
+    # Answered from the cached request principal: no I/O, so no thread either
+    if Config.SUPABASE_ASYNC_ENABLED and not plans_module.plan_limits_need_io(user_id):
+        return enforce_plan_limits(user_id, tokens_requested, environment_tag)
+    return await _to_thread(enforce_plan_limits, user_id, tokens_requested, environment_tag)
+
+
 def create_rate_limit_alert(*args, **kwargs):
     return rate_limits_module.create_rate_limit_alert(*args, **kwargs)
 
@@ -304,25 +314,31 @@ def _fallback_get_user(api_key: str):
     return None
 
 
+from src.routes.chat_body import CHAT_REQUEST_OPENAPI, ChatRequest, chat_request_body, message_dicts
 from src.routes.chat_context import inject_conversation_history, persist_conversation_turn
 from src.routes.chat_request import prepare_upstream_request
 from src.routes.chat_routing import resolve_auto_routed_model, resolve_model_routing
 from src.routes.chat_streaming import stream_generator  # noqa: F401
+from src.routes.chat_web_search import apply_web_search_results, start_auto_web_search
 
 # Log route registration for debugging
 logger.info("📍 Registering /chat/completions endpoint")
 
 
-@router.post("/chat/completions", tags=["chat"])
+@router.post("/chat/completions", tags=["chat"], openapi_extra=CHAT_REQUEST_OPENAPI)
 @traced(name="chat_completions", type="llm")
 async def chat_completions(
-    req: ProxyRequest,
     background_tasks: BackgroundTasks,
+    req: ChatRequest = Depends(chat_request_body),
     api_key: str | None = Depends(get_optional_api_key),
     session_id: int | None = Query(None, description="Chat session ID to save messages to"),
     request: Request = None,
 ):
     # === 0) Setup / sanity ===
+    # /v1/completions and /v1/messages call in with a ProxyRequest they built
+    if isinstance(req, ProxyRequest):
+        req = ChatRequest.from_model(req)
+
     # Generate request correlation ID for distributed tracing
     request_id = str(uuid.uuid4())
     request_id_var.set(request_id)
@@ -375,6 +391,12 @@ async def chat_completions(
     # Initialize performance tracker
     tracker = PerformanceTracker(endpoint="/v1/chat/completions")
 
+    # Speculative web search: start as soon as the classifier fires instead of
+    # after auth/plan checks (opt-in, see Config.WEB_SEARCH_PREFETCH_ENABLED).
+    web_search_task = None
+    if Config.WEB_SEARCH_PREFETCH_ENABLED:
+        web_search_task = start_auto_web_search(req, message_dicts(req.messages))
+
     # Bound before the try so the exception handlers below can always
     # reference them, even for failures during auth/validation.
     rate_limit_mgr = None
@@ -470,6 +492,12 @@ async def chat_completions(
                 # OPTIMIZED: Run auth operations in parallel to reduce overhead from 200-500ms → 100-150ms
                 from src.utils.api_key_lookup import get_api_key_id_with_retry
 
+                # Load the request principal once (single RPC on a miss); the
+                # user, plan, usage, rate-limit and routing accessors below then
+                # read from the snapshot instead of querying separately.
+                if Config.REQUEST_PRINCIPAL_ENABLED:
+                    await get_request_principal_async(api_key)
+
                 # Parallelize independent auth operations
                 user_task = _to_thread(get_user, api_key)
                 api_key_id_task = get_api_key_id_with_retry(api_key, max_retries=3, retry_delay=0.1)
@@ -542,7 +570,7 @@ async def chat_completions(
 
         # Pre-check plan limits before making any upstream calls (only for authenticated users)
         if not is_anonymous:
-            pre_plan = await _to_thread(enforce_plan_limits, user["id"], 0, environment_tag)
+            pre_plan = await _enforce_plan_limits_async(user["id"], 0, environment_tag)
             if not pre_plan.get("allowed", False):
                 raise APIExceptions.plan_limit_exceeded(reason=pre_plan.get("reason", "unknown"))
 
@@ -595,7 +623,12 @@ async def chat_completions(
             )
             if _user_credits <= 0:
                 raise APIExceptions.payment_required(credits=_user_credits)
-            _msgs = [{"role": m.role, "content": m.content} for m in req.messages]
+            _msgs = [
+                {"role": m["role"], "content": m.get("content")}
+                for m in message_dicts(req.messages)
+            ]
+            # Fill the token memo off the loop; the precheck below then hits it
+            await count_tokens_messages_async(_msgs)
             _precheck = estimate_and_check_credits(
                 model_id=req.model,
                 messages=_msgs,
@@ -639,13 +672,14 @@ async def chat_completions(
 
         # Pre-check plan limits before streaming (fail fast) - only for authenticated users
         if not is_anonymous:
-            pre_plan = await _to_thread(enforce_plan_limits, user["id"], 0, environment_tag)
+            pre_plan = await _enforce_plan_limits_async(user["id"], 0, environment_tag)
             if not pre_plan.get("allowed", False):
                 raise APIExceptions.plan_limit_exceeded(reason=pre_plan.get("reason", "unknown"))
 
         # === 2) Build upstream request ===
         with tracker.stage("request_parsing"):
-            messages = [m.model_dump() for m in req.messages]
+            # Plain dicts straight from the body (see chat_body.py), no dump pass
+            messages = message_dicts(req.messages)
 
         # === 2.1) Inject conversation history if session_id provided ===
         messages, session_id = await inject_conversation_history(
@@ -653,82 +687,17 @@ async def chat_completions(
         )
 
         # === 2.1.5) Auto Web Search - start search in parallel to hide latency ===
-        web_search_task = None  # Will hold the async task if search is triggered
-
-        # Get auto_web_search setting (default to "auto")
-        auto_web_search = getattr(req, "auto_web_search", "auto")
-        web_search_threshold = getattr(req, "web_search_threshold", None)
-        if web_search_threshold is None:
-            web_search_threshold = 0.5
-
-        # Determine if we should perform web search (classifier is ~0.06ms, negligible)
-        should_search = False
-        search_query = None
-
-        if auto_web_search is True:
-            # Explicit enable - always search
-            should_search = True
-            logger.debug("Auto web search explicitly enabled")
-        elif auto_web_search == "auto":
-            # Auto mode - use query classifier
-            try:
-                from src.services.query_classifier import should_auto_search
-
-                should_search, web_search_classification = should_auto_search(
-                    messages=messages,
-                    threshold=web_search_threshold,
-                    enabled=True,
-                )
-                if should_search:
-                    logger.info(
-                        "Auto web search triggered: confidence=%.2f, reason=%s",
-                        web_search_classification.confidence,
-                        web_search_classification.reason,
-                    )
-            except Exception as e:
-                logger.warning("Query classification failed, skipping auto search: %s", str(e))
-                should_search = False
-
-        # Start web search task in parallel (non-blocking) to hide latency
-        if should_search:
-            # Extract search query
-            for msg in reversed(messages):
-                if msg.get("role") == "user":
-                    content = msg.get("content", "")
-                    if isinstance(content, str):
-                        search_query = content
-                    elif isinstance(content, list):
-                        text_parts = [
-                            p.get("text", "") if isinstance(p, dict) else str(p)
-                            for p in content
-                            if (isinstance(p, dict) and p.get("type") == "text")
-                            or isinstance(p, str)
-                        ]
-                        search_query = " ".join(text_parts)
-                    break
-
-            if search_query and len(search_query.strip()) > 0:
-                # Start search as background task - runs in parallel with provider detection
-                from src.services.tools import execute_tool
-
-                logger.info("Starting parallel web search for: %s...", search_query[:50])
-                web_search_task = asyncio.create_task(
-                    execute_tool(
-                        "web_search",
-                        {
-                            "query": search_query,
-                            "max_results": 5,
-                            "include_answer": True,
-                            "search_depth": "basic",
-                        },
-                    )
-                )
+        # Skipped when the prefetch path above already started it.
+        if web_search_task is None:
+            web_search_task = start_auto_web_search(req, messages)
 
         # === 2.2) Plan limit pre-check with estimated tokens (only for authenticated users) ===
-        estimated_tokens = estimate_message_tokens(messages, getattr(req, "max_tokens", None))
+        estimated_tokens = await estimate_message_tokens_async(
+            messages, getattr(req, "max_tokens", None)
+        )
         if not is_anonymous:
-            pre_plan = await _to_thread(
-                enforce_plan_limits, user["id"], estimated_tokens, environment_tag
+            pre_plan = await _enforce_plan_limits_async(
+                user["id"], estimated_tokens, environment_tag
             )
             if not pre_plan.get("allowed", False):
                 raise HTTPException(
@@ -751,77 +720,7 @@ async def chat_completions(
 
         # === 2.5) Await web search results if task was started (runs in parallel, minimal added latency) ===
         if web_search_task is not None:
-            try:
-                # Wait for search with timeout (5s max to avoid blocking too long)
-                search_result = await asyncio.wait_for(web_search_task, timeout=5.0)
-
-                if search_result.success and search_result.result:
-                    results = search_result.result.get("results", [])
-                    answer = search_result.result.get("answer")
-
-                    if results or answer:
-                        context_parts = ["[Web Search Results]"]
-
-                        if answer:
-                            context_parts.append(f"\nSummary: {answer}")
-
-                        if results:
-                            context_parts.append("\nSources:")
-                            for i, item in enumerate(results[:5], 1):
-                                title = item.get("title", "Untitled")
-                                content_snippet = item.get("content", "")
-                                url = item.get("url", "")
-
-                                if len(content_snippet) > 300:
-                                    content_snippet = content_snippet[:297] + "..."
-
-                                context_parts.append(f"\n{i}. {title}")
-                                if content_snippet:
-                                    context_parts.append(f"   {content_snippet}")
-                                if url:
-                                    context_parts.append(f"   {url}")
-
-                        context_parts.append("\n[End of Search Results]\n")
-                        search_context = "\n".join(context_parts)
-
-                        # Prepend search context as a system message
-                        search_system_message = {
-                            "role": "system",
-                            "content": (
-                                f"The following web search results were retrieved to help answer "
-                                f"the user's query. Use this information to provide accurate, "
-                                f"up-to-date responses. Cite sources when appropriate.\n\n{search_context}"
-                            ),
-                        }
-
-                        # Insert after any existing system messages
-                        insert_index = 0
-                        for i, msg in enumerate(messages):
-                            if msg.get("role") == "system":
-                                insert_index = i + 1
-                            else:
-                                break
-
-                        messages.insert(insert_index, search_system_message)
-
-                        logger.info(
-                            "Auto web search augmented messages with %d results (context_length=%d)",
-                            len(results),
-                            len(search_context),
-                        )
-                else:
-                    logger.warning(
-                        "Auto web search returned no results: %s",
-                        search_result.error or "empty results",
-                    )
-
-            except TimeoutError:
-                logger.warning("Auto web search timed out after 5s, continuing without results")
-                web_search_task.cancel()
-            except Exception as e:
-                logger.warning(
-                    "Auto web search failed, continuing without augmentation: %s", str(e)
-                )
+            await apply_web_search_results(messages, web_search_task)
 
         # === 3) Call upstream (streaming or non-streaming) ===
         if req.stream:
@@ -872,9 +771,7 @@ async def chat_completions(
 
         # Plan limits and usage tracking (only for authenticated users)
         if not is_anonymous:
-            post_plan = await _to_thread(
-                enforce_plan_limits, user["id"], total_tokens, environment_tag
-            )
+            post_plan = await _enforce_plan_limits_async(user["id"], total_tokens, environment_tag)
             if not post_plan.get("allowed", False):
                 raise HTTPException(
                     status_code=429,
@@ -949,6 +846,7 @@ async def chat_completions(
         # call performs only the route-owned bookkeeping (rate-limit + shadow
         # ledger) and does NOT deduct a second time — the prior behaviour billed
         # paid users twice per request.
+        response_cache_hit = (processed.get("gateway_usage") or {}).get("response_cache") == "hit"
         if not is_anonymous:
             cost = await _handle_credits_and_usage(
                 api_key=api_key,
@@ -963,6 +861,9 @@ async def chat_completions(
                 request_id=request_id,
                 already_charged=True,
             )
+            if response_cache_hit:
+                # The handler billed the cache-hit rate, not the recomputed list price
+                cost = processed["gateway_usage"]["cost_usd"]
             await _to_thread(increment_api_key_usage, api_key)
         else:
             cost = await calculate_cost_async(model, prompt_tokens, completion_tokens)
@@ -1027,19 +928,24 @@ async def chat_completions(
             # If you can cheaply re-fetch balance, do it here; otherwise omit
             processed["gateway_usage"]["cost_usd"] = round(cost, 6)
 
-        # Capture health metrics (passive monitoring) - run as background task
-        background_tasks.add_task(
-            capture_model_health,
-            provider=provider,
-            model=model,
-            response_time_ms=elapsed * 1000,
-            status="success",
-            usage={
-                "prompt_tokens": prompt_tokens,
-                "completion_tokens": completion_tokens,
-                "total_tokens": total_tokens,
-            },
-        )
+        # Capture health metrics (passive monitoring) - run as background task.
+        # A response-cache hit never reached the provider, so says nothing about it.
+        if not response_cache_hit:
+            submit_post_completion(
+                "model_health",
+                capture_model_health,
+                {
+                    "provider": provider,
+                    "model": model,
+                    "response_time_ms": elapsed * 1000,
+                    "status": "success",
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": total_tokens,
+                    },
+                },
+            )
 
         # Save chat completion request metadata to database with cost tracking - run as background task
         # Calculate cost breakdown for analytics
@@ -1057,24 +963,27 @@ async def chat_completions(
             input_cost = 0.0
             output_cost = 0.0
 
-        background_tasks.add_task(
-            save_chat_completion_request_with_cost,
-            request_id=request_id,
-            model_name=model,
-            input_tokens=prompt_tokens,
-            output_tokens=completion_tokens,
-            processing_time_ms=int(elapsed * 1000),
-            cost_usd=cost,
-            input_cost_usd=input_cost,
-            output_cost_usd=output_cost,
-            pricing_source="calculated",
-            status="completed",
-            error_message=None,
-            user_id=user["id"] if not is_anonymous else None,
-            provider_name=provider,
-            model_id=None,
-            api_key_id=api_key_id,
-            is_anonymous=is_anonymous,
+        submit_post_completion(
+            "chat_request_record",
+            save_chat_completion_request_with_cost_async,
+            {
+                "request_id": request_id,
+                "model_name": model,
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "processing_time_ms": int(elapsed * 1000),
+                "cost_usd": cost,
+                "input_cost_usd": input_cost,
+                "output_cost_usd": output_cost,
+                "pricing_source": "calculated",
+                "status": "completed",
+                "error_message": None,
+                "user_id": user["id"] if not is_anonymous else None,
+                "provider_name": provider,
+                "model_id": None,
+                "api_key_id": api_key_id,
+                "is_anonymous": is_anonymous,
+            },
         )
 
         # Prepare headers including rate limit information
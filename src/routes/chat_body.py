@@ -0,0 +1,314 @@
+"""Request body parsing for the chat route.
+
+``ProxyRequest`` builds a ``Message`` model per message and the route then
+``model_dump()``s them straight back into dicts, so a long agent transcript was
+materialized and re-serialized several times before it went upstream.
+``parse_chat_body`` decodes the body once (orjson when installed) and checks the
+fields the gateway acts on -- model, messages/roles, stream, sampling limits --
+with exact type tests, keeping the messages as the client's own dicts.
+
+Anything outside that plain subset (a coerced value such as ``"true"`` for a
+bool, an out-of-range limit, a malformed message) is handed to ``ProxyRequest``
+itself, so accepted bodies, coercions and 422 error payloads are exactly what
+FastAPI's model binding produced before.
+"""
+
+from __future__ import annotations
+
+import email.message
+import json
+import math
+import re
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+from src.config import Config
+from src.schemas.proxy import ALLOWED_CHAT_ROLES, ProxyRequest
+
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    _orjson = None
+
+# Every optional ProxyRequest field with its declared default
+_DEFAULTS = {
+    name: field.get_default()
+    for name, field in ProxyRequest.model_fields.items()
+    if name not in ("model", "messages")
+}
+
+_LONG_DIGIT_RUN = re.compile(rb"\d{19}")
+
+# Same adapter shape FastAPI binds a body parameter with
+_PROXY_REQUEST = TypeAdapter(ProxyRequest)
+
+
+class ChatRequest:
+    """
+    A chat completion request as the route uses it: ProxyRequest's fields as
+    attributes (defaults filled in, extra keys kept), with ``messages`` as
+    plain dicts ready to forward.
+    """
+
+    def __init__(
+        self, model: str, messages: list[dict[str, Any]], fields: dict[str, Any] | None = None
+    ):
+        self.__dict__.update(_DEFAULTS)
+        self.__dict__.update(fields or {})
+        self.model = model
+        self.messages = messages
+
+    @classmethod
+    def from_model(cls, req: ProxyRequest) -> ChatRequest:
+        """Convert a validated ProxyRequest (internal callers, coerced bodies)."""
+        fields = {name: getattr(req, name) for name in _DEFAULTS}
+        fields.update(req.model_extra or {})
+        if fields["stream_options"] is not None:
+            fields["stream_options"] = fields["stream_options"].model_dump(exclude_none=True)
+        return cls(req.model, [m.model_dump() for m in req.messages], fields)
+
+    def __repr__(self) -> str:
+        return f"ChatRequest(model={self.model!r}, messages={len(self.messages)})"
+
+
+def message_dicts(messages) -> list[dict[str, Any]]:
+    """Messages as dicts, whether they arrived raw or as ``Message`` models."""
+    return [m if isinstance(m, dict) else m.model_dump() for m in messages or ()]
+
+
+# --- exact-type checks for the plain subset ---------------------------------
+
+
+def _is_int(v: Any) -> bool:
+    return type(v) is int
+
+
+def _is_bool(v: Any) -> bool:
+    return type(v) is bool
+
+
+def _is_str(v: Any) -> bool:
+    return type(v) is str
+
+
+def _is_dict(v: Any) -> bool:
+    return type(v) is dict
+
+
+def _is_dict_list(v: Any) -> bool:
+    return type(v) is list and all(type(item) is dict for item in v)
+
+
+def _number_between(low: float, high: float) -> Callable[[Any], bool]:
+    def check(v: Any) -> bool:
+        return type(v) in (int, float) and math.isfinite(v) and low <= v <= high
+
+    return check
+
+
+def _is_stop(v: Any) -> bool:
+    if type(v) is str:
+        return True
+    return type(v) is list and len(v) <= 4 and all(type(s) is str for s in v)
+
+
+def _is_stream_options(v: Any) -> bool:
+    return type(v) is dict and (v.get("include_usage") is None or _is_bool(v["include_usage"]))
+
+
+def _is_literal(*values: str) -> Callable[[Any], bool]:
+    return lambda v: type(v) is str and v in values
+
+
+_FIELD_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "max_tokens": _is_int,
+    "temperature": _number_between(0.0, 2.0),
+    "top_p": _number_between(0.0, 1.0),
+    "n": lambda v: type(v) is int and v >= 1,
+    "stop": _is_stop,
+    "frequency_penalty": _number_between(-2.0, 2.0),
+    "presence_penalty": _number_between(-2.0, 2.0),
+    "stream": _is_bool,
+    "stream_options": _is_stream_options,
+    "tools": _is_dict_list,
+    "tool_choice": lambda v: type(v) in (str, dict),
+    "parallel_tool_calls": _is_bool,
+    "response_format": _is_dict,
+    "logprobs": _is_bool,
+    "top_logprobs": lambda v: type(v) is int and 0 <= v <= 20,
+    "logit_bias": lambda v: type(v) is dict and all(type(b) is int for b in v.values()),
+    "seed": _is_int,
+    "user": _is_str,
+    "service_tier": _is_literal("auto", "default"),
+    "reasoning_effort": _is_literal("low", "medium", "high"),
+    "provider": _is_str,
+    "auto_web_search": lambda v: type(v) is bool or v == "auto",
+    "web_search_threshold": _number_between(0.0, 1.0),
+    "auto_routing": _is_bool,
+}
+
+# ProxyRequest stores these as float even when the client sent an integer
+_FLOAT_FIELDS = {
+    "temperature",
+    "top_p",
+    "frequency_penalty",
+    "presence_penalty",
+    "web_search_threshold",
+}
+
+
+def _is_empty(content: Any) -> bool:
+    if content is None:
+        return True
+    if type(content) is str:
+        return not content.strip()
+    return not content
+
+
+def _is_plain_message(m: Any) -> bool:
+    """Mirror of Message's validators, limited to values it would not coerce."""
+    if type(m) is not dict:
+        return False
+    role = m.get("role")
+    if type(role) is not str or role not in ALLOWED_CHAT_ROLES:
+        return False
+    content = m.get("content")
+    if content is not None and type(content) is not str and not _is_dict_list(content):
+        return False
+    for key in ("name", "tool_call_id"):
+        if m.get(key) is not None and type(m[key]) is not str:
+            return False
+    tool_calls = m.get("tool_calls")
+    if tool_calls is not None and not _is_dict_list(tool_calls):
+        return False
+    if _is_empty(content):
+        return role == "assistant" and bool(tool_calls)
+    return True
+
+
+def _fast_parse(data: Any) -> ChatRequest | None:
+    """Build a ChatRequest for bodies ProxyRequest would accept unchanged, else None."""
+    if type(data) is not dict:
+        return None
+    model = data.get("model")
+    messages = data.get("messages")
+    if type(model) is not str or type(messages) is not list or not messages:
+        return None
+    if not all(_is_plain_message(m) for m in messages):
+        return None
+
+    fields = {}
+    for name, value in data.items():
+        if name in ("model", "messages"):
+            continue
+        check = _FIELD_CHECKS.get(name)
+        if check is not None and value is not None:
+            if not check(value):
+                return None
+            if name in _FLOAT_FIELDS:
+                value = float(value)
+            elif name == "stream_options":
+                include_usage = value.get("include_usage")
+                value = {} if include_usage is None else {"include_usage": include_usage}
+        fields[name] = value
+    return ChatRequest(model, messages, fields)
+
+
+def _validate_with_schema(data: Any) -> ChatRequest:
+    try:
+        req = _PROXY_REQUEST.validate_python(data, from_attributes=True)
+    except ValidationError as exc:
+        errors = [
+            {**err, "loc": ("body", *err.get("loc", ()))} for err in exc.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors, body=data) from None
+    return ChatRequest.from_model(req)
+
+
+def _is_json_content_type(content_type: str | None) -> bool:
+    if not content_type:
+        return True
+    message = email.message.Message()
+    message["content-type"] = content_type
+    if message.get_content_maintype() != "application":
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == "json" or subtype.endswith("+json")
+
+
+def _decode(body: bytes) -> Any:
+    # orjson turns integers past 64 bits into floats; leave those bodies to json
+    if _orjson is not None and not _LONG_DIGIT_RUN.search(body):
+        try:
+            return _orjson.loads(body)
+        except _orjson.JSONDecodeError:
+            pass  # json.loads accepts a few inputs orjson rejects (NaN, 1e400)
+    return json.loads(body)
+
+
+def parse_chat_body(body: bytes, content_type: str | None = None) -> ChatRequest:
+    """
+    Decode and validate a /v1/chat/completions body.
+
+    Raises the same RequestValidationError / HTTPException FastAPI raises when
+    binding ``req: ProxyRequest`` directly.
+    """
+    if not body:
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
+        )
+    if not _is_json_content_type(content_type):
+        return _validate_with_schema(body)
+    try:
+        data = _decode(body)
+    except json.JSONDecodeError as e:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", e.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": e.msg},
+                }
+            ],
+            body=e.doc,
+        ) from e
+    except Exception as e:
+        raise HTTPException(status_code=400, detail="There was an error parsing the body") from e
+
+    if Config.CHAT_FAST_PARSE_ENABLED:
+        req = _fast_parse(data)
+        if req is not None:
+            return req
+    return _validate_with_schema(data)
+
+
+async def chat_request_body(request: Request) -> ChatRequest:
+    """FastAPI dependency: the chat route's request body."""
+    return parse_chat_body(await request.body(), request.headers.get("content-type"))
+
+
+def _inline_refs(schema: Any, defs: dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        ref = schema.get("$ref")
+        if ref is not None:
+            return _inline_refs(defs[ref.rsplit("/", 1)[-1]], defs)
+        return {k: _inline_refs(v, defs) for k, v in schema.items() if k != "$defs"}
+    if isinstance(schema, list):
+        return [_inline_refs(v, defs) for v in schema]
+    return schema
+
+
+def _request_body_openapi() -> dict[str, Any]:
+    schema = ProxyRequest.model_json_schema()
+    schema = _inline_refs(schema, schema.get("$defs", {}))
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": schema}}}}
+
+
+# Keeps /docs describing the body now that it is not a bound model parameter
+CHAT_REQUEST_OPENAPI = _request_body_openapi()
@@ -8,12 +8,15 @@ The dynamically-injected OpenRouter provider functions and ``stream_generator``
 are resolved through the ``src.routes.chat`` module at call time (``_chat.*``)
 rather than imported directly, so that tests patching
 ``src.routes.chat.make_openrouter_request_openai`` etc. still bind. Behaviour is
-unchanged from the original inline code.
+unchanged from the original inline code, except that authenticated requests may
+hedge their first provider with the second (opt-in, see
+``src.services.provider_hedging``).
 """
 
 from __future__ import annotations
 
 import asyncio  # noqa: F401  (used by moved bodies)
+import functools
 import logging
 import time  # noqa: F401  (used by moved bodies)
 
@@ -40,6 +43,12 @@ from src.services.provider_failover import (  # noqa: F401
     map_provider_error,
     should_failover,
 )
+from src.services.provider_hedging import (
+    hedge_partner,
+    hedged_request,
+    race_first_chunk,
+    record_latency,
+)
 from src.utils.ai_tracing import AIRequestType, AITracer  # noqa: F401
 from src.utils.rate_limit_headers import get_rate_limit_headers  # noqa: F401
 from src.utils.sentry_context import capture_provider_error  # noqa: F401
@@ -113,25 +122,41 @@ async def dispatch_streaming(
         async def _auth_stream_attempts():
             _adapter = OpenAIChatAdapter()
             last_exc = None
+            _hedged = set()
+
+            def _open_stream(_provider, _is_hedge=False):
+                _internal_req = _adapter.to_internal_request(
+                    {
+                        "messages": messages,
+                        "model": original_model,
+                        "stream": True,
+                        **optional,
+                    }
+                )
+                # Set the provider for this attempt
+                _internal_req.provider = _provider
+
+                _handler = ChatInferenceHandler(api_key, background_tasks, request=request)
+                _handler.is_hedge = _is_hedge
+                _internal_stream = _handler.process_stream(_internal_req)
+                return _adapter.from_internal_stream(_internal_stream)
 
             for _idx, _attempt_provider in enumerate(provider_chain):
+                if _attempt_provider in _hedged:
+                    continue  # already raced against the first provider
                 _is_last = _idx == len(provider_chain) - 1
                 _content_started = False
                 try:
-                    _internal_req = _adapter.to_internal_request(
-                        {
-                            "messages": messages,
-                            "model": original_model,
-                            "stream": True,
-                            **optional,
-                        }
-                    )
-                    # Set the provider for this attempt
-                    _internal_req.provider = _attempt_provider
-
-                    _handler = ChatInferenceHandler(api_key, background_tasks, request=request)
-                    _internal_stream = _handler.process_stream(_internal_req)
-                    _sse_stream = _adapter.from_internal_stream(_internal_stream)
+                    _sse_stream = _open_stream(_attempt_provider)
+                    _hedge_provider = hedge_partner(provider_chain, _idx, streaming=True)
+                    if _hedge_provider:
+                        # Race both for the first chunk; the loser is closed unbilled.
+                        # Failover skips the partner only if the race actually ran it.
+                        _sse_stream = race_first_chunk(
+                            _sse_stream,
+                            _open_stream(_hedge_provider, _is_hedge=True),
+                            on_hedge=functools.partial(_hedged.add, _hedge_provider),
+                        )
 
                     async for _chunk in _sse_stream:
                         _content_started = True
@@ -397,7 +422,10 @@ async def dispatch_non_streaming(
                 status_code=502,
                 detail={"error": {"message": f"No providers available for model {original_model}"}},
             )
+        hedged = set()
         for idx, attempt_provider in enumerate(provider_chain):
+            if attempt_provider in hedged:
+                continue  # already ran as the hedge of the first provider
             is_last = idx == len(provider_chain) - 1
             try:
                 logger.info(
@@ -425,7 +453,36 @@ async def dispatch_non_streaming(
                     operation_name=f"unified_handler/{original_model}",
                 ) as trace_ctx:
                     # Process request through unified pipeline
-                    internal_response = await handler.process(internal_request)
+                    hedge_provider = hedge_partner(provider_chain, idx, streaming=False)
+                    if hedge_provider:
+
+                        async def _attempt(_provider, _gate):
+                            _request = adapter.to_internal_request(
+                                {
+                                    "messages": messages,
+                                    "model": original_model,
+                                    "stream": False,
+                                    **optional,
+                                }
+                            )
+                            _request.provider = _provider
+                            _handler = ChatInferenceHandler(
+                                api_key, background_tasks, request=request
+                            )
+                            _handler.settlement_gate = _gate
+                            _handler.is_hedge = _provider == hedge_provider
+                            return await _handler.process(_request)
+
+                        # Failover skips the partner only if the hedge actually fired
+                        internal_response = await hedged_request(
+                            _attempt,
+                            attempt_provider,
+                            hedge_provider,
+                            original_model,
+                            on_hedge=functools.partial(hedged.add, hedge_provider),
+                        )
+                    else:
+                        internal_response = await handler.process(internal_request)
 
                     # Convert internal response back to OpenAI format
                     processed = adapter.from_internal_response(internal_response)
@@ -468,6 +525,7 @@ async def dispatch_non_streaming(
 
                 # Record Prometheus metrics for model popularity tracking
                 inference_duration = time.time() - inference_start
+                record_latency(original_model, inference_duration)
                 exemplar = get_trace_exemplar()
                 model_inference_requests.labels(
                     provider=provider, model=model, status="success"
@@ -24,6 +24,7 @@ from typing import Any
 from fastapi import HTTPException
 
 from src.config import Config
+from src.routes.chat_body import message_dicts
 
 logger = logging.getLogger(__name__)
 
@@ -149,7 +150,7 @@ async def resolve_auto_routed_model(
     from src.services.task_classifier import classify_task
 
     original_alias = req.model
-    messages = [m.model_dump() for m in (req.messages or [])]
+    messages = message_dicts(req.messages)
 
     classification = await asyncio.to_thread(
         classify_task,
@@ -2,8 +2,12 @@
 
 Holds ``stream_generator`` and its wall-clock deadline constant. Re-imported into
 ``src/routes/chat.py`` so ``src.routes.chat.stream_generator`` keeps resolving
-(tests and the handler reference it there). Behaviour is unchanged — this is a
-verbatim move with the dependencies it needs imported from their source modules.
+(tests and the handler reference it there).
+
+The per-chunk loop is kept lean: client disconnects are detected by one
+background watcher rather than a poll per chunk, and content deltas are merged
+into fewer frames while the client is backpressured. Measure changes to it with
+``scripts/performance/bench_stream_generator.py``.
 """
 
 from __future__ import annotations
@@ -16,17 +20,20 @@ from fastapi import Request  # noqa: F401
 
 from src.config import Config  # noqa: F401
 from src.db.chat_completion_requests import (  # noqa: F401
-    save_chat_completion_request_with_cost,
+    save_chat_completion_request_with_cost_async,
 )
 from src.db.plans import enforce_plan_limits  # noqa: F401
 from src.handlers.post_processing import _process_stream_completion_background  # noqa: F401
 from src.routes.chat_helpers import _to_thread  # noqa: F401
+from src.services.post_completion_queue import submit_post_completion
 from src.services.prometheus_metrics import track_time_to_first_chunk  # noqa: F401
 from src.services.stream_normalizer import (  # noqa: F401
     StreamNormalizer,
+    coalesce_content_chunks,
     create_done_sse,
     create_error_sse_chunk,
 )
+from src.utils.disconnect_watcher import DisconnectWatcher
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +106,8 @@ async def stream_generator(
         # Sentinel value to signal iterator exhaustion (PEP 479 compliance)
         # StopIteration cannot be raised into a Future, so we use a sentinel instead
         _STREAM_EXHAUSTED = object()
+        # Returned by the read step when held deltas are due to be sent
+        _FLUSH_HELD = object()
 
         def _safe_next(iterator):
             """Wrapper for next() that returns a sentinel instead of raising StopIteration.
@@ -149,115 +158,195 @@ async def stream_generator(
         # httpx read_timeout covers the "provider sends headers then goes silent" case.
         _stream_deadline = time.monotonic() + MAX_STREAM_DURATION
 
-        async for chunk in iterate_stream():
-            # CRITICAL: Check for client disconnect to prevent zombie requests (499)
-            if request and await request.is_disconnected():
-                logger.warning(f"[StreamGenerator] Client disconnected (request_id={request_id})")
-                break
-
-            # FREEZE FIX: Wall-clock deadline — abort if stream exceeds MAX_STREAM_DURATION.
-            # This fires between chunk arrivals; the httpx read_timeout covers intra-chunk hangs.
-            if time.monotonic() > _stream_deadline:
-                _elapsed_s = time.monotonic() - start_time
-                logger.error(
-                    f"[STREAM WATCHDOG] Stream exceeded {MAX_STREAM_DURATION}s wall-clock limit "
-                    f"({_elapsed_s:.1f}s elapsed) for {provider}/{model}. Terminating."
-                )
-                yield create_error_sse_chunk(
-                    error_message=(
-                        f"Stream timeout: provider did not complete the response within "
-                        f"{MAX_STREAM_DURATION}s. Please retry or contact support."
-                    ),
-                    error_type="stream_timeout",
-                    provider=provider,
-                    model=model,
-                )
-                yield create_done_sse()
-                return
+        # One background task notices the client going away, instead of a
+        # receive-channel poll per chunk. A disconnect while waiting on the
+        # provider cancels that wait, and iterate_stream() closes the stream.
+        watcher = DisconnectWatcher.start(request)
+        upstream = iterate_stream()
+        # Adaptive coalescing: once sending a frame stalls for longer than the
+        # window (the client socket is backpressured), content-only deltas that
+        # arrive within one window go out as a single frame.
+        coalesce_window = Config.STREAM_COALESCE_WINDOW_MS / 1000
+        backpressured = False
+        held: list = []  # content chunks waiting to go out as one frame
+        held_since = 0.0
+        pending_read = None  # upstream read still in flight across a held-frame flush
+        try:
+            while not watcher.disconnected:
+                watcher.waiting = True
+                try:
+                    if held:
+                        if pending_read is None:
+                            pending_read = asyncio.ensure_future(upstream.__anext__())
+                        done, _ = await asyncio.wait(
+                            (pending_read,),
+                            timeout=max(0.0, held_since + coalesce_window - time.monotonic()),
+                        )
+                        if done:
+                            chunk, pending_read = pending_read.result(), None
+                        else:
+                            chunk = _FLUSH_HELD
+                    else:
+                        chunk = await upstream.__anext__()
+                except StopAsyncIteration:
+                    break
+                except asyncio.CancelledError:
+                    if not watcher.absorb_cancel():
+                        raise
+                    break
+                finally:
+                    watcher.waiting = False
+
+                if chunk is _FLUSH_HELD:
+                    frame = coalesce_content_chunks(held).to_sse()
+                    held = []
+                else:
+                    # FREEZE FIX: Wall-clock deadline — abort if stream exceeds
+                    # MAX_STREAM_DURATION. This fires between chunk arrivals; the httpx
+                    # read_timeout covers intra-chunk hangs.
+                    if time.monotonic() > _stream_deadline:
+                        _elapsed_s = time.monotonic() - start_time
+                        logger.error(
+                            f"[STREAM WATCHDOG] Stream exceeded {MAX_STREAM_DURATION}s "
+                            f"wall-clock limit ({_elapsed_s:.1f}s elapsed) for "
+                            f"{provider}/{model}. Terminating."
+                        )
+                        if held:
+                            yield coalesce_content_chunks(held).to_sse()
+                        yield create_error_sse_chunk(
+                            error_message=(
+                                f"Stream timeout: provider did not complete the response within "
+                                f"{MAX_STREAM_DURATION}s. Please retry or contact support."
+                            ),
+                            error_type="stream_timeout",
+                            provider=provider,
+                            model=model,
+                        )
+                        yield create_done_sse()
+                        return
+
+                    chunk_count += 1
+
+                    # TTFC: Track time to first chunk for performance monitoring
+                    if not first_chunk_sent:
+                        ttfc = time.monotonic() - ttfc_start
+                        first_chunk_sent = True
+                        # Record TTFC metric
+                        track_time_to_first_chunk(provider=provider, model=model, ttfc=ttfc)
+                        # Log TTFC for debugging slow streams with enhanced context
+                        if ttfc > 2.0:
+                            severity = "CRITICAL" if ttfc > 10.0 else "WARNING"
+                            logger.warning(
+                                f"⚠️ [TTFC {severity}] Slow first chunk: {ttfc:.2f}s for {provider}/{model} "
+                                f"(threshold: 2.0s, timeout: {Config.GOOGLE_VERTEX_TIMEOUT if provider == 'google-vertex' else 'N/A'}s)"
+                            )
 
-            chunk_count += 1
-
-            # TTFC: Track time to first chunk for performance monitoring
-            if not first_chunk_sent:
-                ttfc = time.monotonic() - ttfc_start
-                first_chunk_sent = True
-                # Record TTFC metric
-                track_time_to_first_chunk(provider=provider, model=model, ttfc=ttfc)
-                # Log TTFC for debugging slow streams with enhanced context
-                if ttfc > 2.0:
-                    severity = "CRITICAL" if ttfc > 10.0 else "WARNING"
-                    logger.warning(
-                        f"⚠️ [TTFC {severity}] Slow first chunk: {ttfc:.2f}s for {provider}/{model} "
-                        f"(threshold: 2.0s, timeout: {Config.GOOGLE_VERTEX_TIMEOUT if provider == 'google-vertex' else 'N/A'}s)"
-                    )
+                            # Sentry alerting for critical TTFC (>10s)
+                            if ttfc > 10.0:
+                                try:
+                                    import sentry_sdk
+
+                                    sentry_sdk.capture_message(
+                                        f"Critical TTFC: {ttfc:.2f}s for {provider}/{model}",
+                                        level="warning",
+                                        extras={
+                                            "ttfc_seconds": ttfc,
+                                            "provider": provider,
+                                            "model": model,
+                                            "threshold": 10.0,
+                                            "severity": "CRITICAL",
+                                            "timeout_config": (
+                                                Config.GOOGLE_VERTEX_TIMEOUT
+                                                if provider == "google-vertex"
+                                                else None
+                                            ),
+                                        },
+                                    )
+                                except Exception as sentry_error:
+                                    logger.debug(
+                                        f"Failed to send Sentry alert for TTFC: {sentry_error}"
+                                    )
+                        else:
+                            logger.info(
+                                f"✓ [TTFC] First chunk in {ttfc:.2f}s for {provider}/{model}"
+                            )
 
-                    # Sentry alerting for critical TTFC (>10s)
-                    if ttfc > 10.0:
-                        try:
-                            import sentry_sdk
-
-                            sentry_sdk.capture_message(
-                                f"Critical TTFC: {ttfc:.2f}s for {provider}/{model}",
-                                level="warning",
-                                extras={
-                                    "ttfc_seconds": ttfc,
-                                    "provider": provider,
-                                    "model": model,
-                                    "threshold": 10.0,
-                                    "severity": "CRITICAL",
-                                    "timeout_config": (
-                                        Config.GOOGLE_VERTEX_TIMEOUT
-                                        if provider == "google-vertex"
-                                        else None
-                                    ),
-                                },
+                    logger.debug("[STREAM] Processing chunk %d for model %s", chunk_count, model)
+
+                    normalized_chunk = normalizer.normalize_chunk(chunk)
+
+                    # Check for usage in chunk (some providers send it in final chunk)
+                    if hasattr(chunk, "usage") and chunk.usage:
+                        prompt_tokens = chunk.usage.prompt_tokens
+                        completion_tokens = chunk.usage.completion_tokens
+                        total_tokens = chunk.usage.total_tokens
+
+                    if normalized_chunk:
+                        if backpressured and normalized_chunk.content_delta() is not None:
+                            if not held:
+                                held_since = time.monotonic()
+                            held.append(normalized_chunk)
+                            continue
+                        frame = normalized_chunk.to_sse()
+                        if held:
+                            # Held text goes first, in the same write
+                            frame = coalesce_content_chunks(held).to_sse() + frame
+                            held = []
+                    else:
+                        # Only count as a real drop if it's not an Anthropic control event
+                        # (message_start, content_block_stop, ping, etc. legitimately produce
+                        # no output)
+                        is_anthropic_noop = False
+                        if hasattr(chunk, "type") and chunk.type in {
+                            "message_start",
+                            "message_stop",
+                            "message_delta",
+                            "content_block_start",
+                            "content_block_stop",
+                            "ping",
+                        }:
+                            is_anthropic_noop = True
+
+                        if not is_anthropic_noop:
+                            dropped_chunks += 1
+                            logger.warning(
+                                "[STREAM_DROP] Chunk %d dropped for %s/%s (request_id=%s)",
+                                chunk_count,
+                                provider,
+                                model,
+                                request_id,
                             )
-                        except Exception as sentry_error:
-                            logger.debug(f"Failed to send Sentry alert for TTFC: {sentry_error}")
+                            try:
+                                from src.services.prometheus_metrics import (
+                                    stream_chunks_dropped,
+                                )
+
+                                stream_chunks_dropped.labels(provider=provider, model=model).inc()
+                            except ImportError:
+                                pass
+                        continue
+
+                if coalesce_window:
+                    sent_at = time.monotonic()
+                    yield frame
+                    backpressured = time.monotonic() - sent_at > coalesce_window
                 else:
-                    logger.info(f"✓ [TTFC] First chunk in {ttfc:.2f}s for {provider}/{model}")
-
-            logger.debug(f"[STREAM] Processing chunk {chunk_count} for model {model}")
+                    yield frame
 
-            normalized_chunk = normalizer.normalize_chunk(chunk)
-
-            # Check for usage in chunk (some providers send it in final chunk)
-            if hasattr(chunk, "usage") and chunk.usage:
-                prompt_tokens = chunk.usage.prompt_tokens
-                completion_tokens = chunk.usage.completion_tokens
-                total_tokens = chunk.usage.total_tokens
-
-            if normalized_chunk:
-                yield normalized_chunk.to_sse()
+            if watcher.disconnected:
+                logger.warning(f"[StreamGenerator] Client disconnected (request_id={request_id})")
+            elif held:
+                yield coalesce_content_chunks(held).to_sse()
+        finally:
+            watcher.stop()
+            if pending_read is not None and not pending_read.done():
+                # Cancelling the read runs iterate_stream()'s cleanup
+                pending_read.cancel()
             else:
-                # Only count as a real drop if it's not an Anthropic control event
-                # (message_start, content_block_stop, ping, etc. legitimately produce no output)
-                is_anthropic_noop = False
-                if hasattr(chunk, "type") and chunk.type in {
-                    "message_start",
-                    "message_stop",
-                    "message_delta",
-                    "content_block_start",
-                    "content_block_stop",
-                    "ping",
-                }:
-                    is_anthropic_noop = True
-
-                if not is_anthropic_noop:
-                    dropped_chunks += 1
-                    logger.warning(
-                        "[STREAM_DROP] Chunk %d dropped for %s/%s (request_id=%s)",
-                        chunk_count,
-                        provider,
-                        model,
-                        request_id,
-                    )
-                    try:
-                        from src.services.prometheus_metrics import stream_chunks_dropped
-
-                        stream_chunks_dropped.labels(provider=provider, model=model).inc()
-                    except ImportError:
-                        pass
+                try:
+                    await upstream.aclose()
+                except Exception:
+                    pass  # Never let cleanup block generator teardown
 
         accumulated_content = normalizer.get_accumulated_content()
         logger.info(
@@ -317,14 +406,13 @@ async def stream_generator(
                 )
             else:
                 from src.utils.token_estimator import (
-                    count_completion_tokens,
-                    count_tokens_messages,
+                    count_tokens_messages_async,
                     get_estimation_method,
                 )
 
                 estimation_source = get_estimation_method()
-                completion_tokens = count_completion_tokens(accumulated_content)
-                prompt_tokens = count_tokens_messages(messages)
+                completion_tokens = normalizer.completion_counter.count()
+                prompt_tokens = await count_tokens_messages_async(messages)
                 total_tokens = prompt_tokens + completion_tokens
 
                 # Log warning with provider/model for identifying which
@@ -363,14 +451,13 @@ async def stream_generator(
                 # When we have actual counts, also compute estimates so we can
                 # measure estimation accuracy for future calibration.
                 from src.utils.token_estimator import (
-                    count_completion_tokens,
-                    count_tokens_messages,
+                    count_tokens_messages_async,
                     get_estimation_method,
                 )
 
                 estimation_method = get_estimation_method()
-                est_prompt = count_tokens_messages(messages)
-                est_completion = count_completion_tokens(accumulated_content)
+                est_prompt = await count_tokens_messages_async(messages)
+                est_completion = normalizer.completion_counter.count()
 
                 from src.services.prometheus_metrics import record_token_estimation_accuracy
 
@@ -407,27 +494,29 @@ async def stream_generator(
         # This makes the stream complete 100-200ms faster for the client
         yield create_done_sse()
 
-        # Schedule background processing (non-blocking)
-        asyncio.create_task(
-            _process_stream_completion_background(
-                user=user,
-                api_key=api_key,
-                model=model,
-                trial=trial,
-                environment_tag=environment_tag,
-                session_id=session_id,
-                messages=messages,
-                accumulated_content=accumulated_content,
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                total_tokens=total_tokens,
-                elapsed=elapsed,
-                provider=provider,
-                is_anonymous=is_anonymous,
-                request_id=request_id,
-                client_ip=client_ip,
-                api_key_id=api_key_id,
-            )
+        # Queue billing and logging (bounded, billing-first, billing fields journaled)
+        submit_post_completion(
+            "stream_completion",
+            _process_stream_completion_background,
+            {
+                "user": user,
+                "api_key": api_key,
+                "model": model,
+                "trial": trial,
+                "environment_tag": environment_tag,
+                "session_id": session_id,
+                "messages": messages,
+                "accumulated_content": accumulated_content,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens,
+                "elapsed": elapsed,
+                "provider": provider,
+                "is_anonymous": is_anonymous,
+                "request_id": request_id,
+                "client_ip": client_ip,
+                "api_key_id": api_key_id,
+            },
         )
 
     except Exception as e:
@@ -572,8 +661,7 @@ async def stream_generator(
                 error_elapsed = time.monotonic() - start_time
 
                 # Save failed streaming request with cost tracking (costs are 0 for failed requests)
-                await _to_thread(
-                    save_chat_completion_request_with_cost,
+                await save_chat_completion_request_with_cost_async(
                     request_id=request_id,
                     model_name=model,
                     input_tokens=prompt_tokens,  # Use tokens accumulated so far
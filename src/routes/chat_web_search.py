@@ -0,0 +1,201 @@
+"""Auto web search for the chat route.
+
+Extracted from the ``chat_completions`` handler. The handler classifies the
+incoming messages, starts a Tavily search in the background to hide its
+latency behind provider detection, and later prepends the results as a system
+message.
+
+With ``Config.WEB_SEARCH_PREFETCH_ENABLED`` the handler starts the search before
+auth/plan checks, as soon as the classifier fires. The search itself is cached
+and single-flighted in ``src/services/cache/web_search_cache.py``, so a
+prefetched search that is abandoned (auth fails) still warms the cache, and one
+that is still in flight is simply joined by the normal path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Seconds the handler waits for search results before continuing without them.
+WEB_SEARCH_WAIT_SECONDS = 5.0
+
+# Keep strong references so an abandoned prefetch task is not garbage-collected
+# mid-flight (asyncio only holds weak references to tasks).
+_web_search_tasks: set[asyncio.Task] = set()
+
+
+def _extract_search_query(messages: list[dict[str, Any]]) -> str | None:
+    """Return the text of the last user message, or None."""
+    for msg in reversed(messages):
+        if msg.get("role") == "user":
+            content = msg.get("content", "")
+            if isinstance(content, str):
+                return content
+            if isinstance(content, list):
+                text_parts = [
+                    p.get("text", "") if isinstance(p, dict) else str(p)
+                    for p in content
+                    if (isinstance(p, dict) and p.get("type") == "text") or isinstance(p, str)
+                ]
+                return " ".join(text_parts)
+            return None
+    return None
+
+
+def should_search(req: Any, messages: list[dict[str, Any]]) -> bool:
+    """Decide whether auto web search applies to this request.
+
+    ``auto_web_search`` may be True (always), False (never) or "auto" (use the
+    query classifier, ~0.06ms).
+    """
+    auto_web_search = getattr(req, "auto_web_search", "auto")
+    if auto_web_search is True:
+        logger.debug("Auto web search explicitly enabled")
+        return True
+    if auto_web_search != "auto":
+        return False
+
+    threshold = getattr(req, "web_search_threshold", None)
+    if threshold is None:
+        threshold = 0.5
+    try:
+        from src.services.query_classifier import should_auto_search
+
+        triggered, classification = should_auto_search(
+            messages=messages,
+            threshold=threshold,
+            enabled=True,
+        )
+        if triggered:
+            logger.info(
+                "Auto web search triggered: confidence=%.2f, reason=%s",
+                classification.confidence,
+                classification.reason,
+            )
+        return triggered
+    except Exception as e:
+        logger.warning("Query classification failed, skipping auto search: %s", str(e))
+        return False
+
+
+def start_auto_web_search(req: Any, messages: list[dict[str, Any]]) -> asyncio.Task | None:
+    """Start the web search in the background if this request needs one.
+
+    Returns the task, or None when no search applies.
+    """
+    if not should_search(req, messages):
+        return None
+
+    search_query = _extract_search_query(messages)
+    if not search_query or not search_query.strip():
+        return None
+
+    from src.services.tools import execute_tool
+
+    logger.info("Starting parallel web search for: %s...", search_query[:50])
+    task = asyncio.create_task(
+        execute_tool(
+            "web_search",
+            {
+                "query": search_query,
+                "max_results": 5,
+                "include_answer": True,
+                "search_depth": "basic",
+            },
+        )
+    )
+    _web_search_tasks.add(task)
+    task.add_done_callback(_web_search_tasks.discard)
+    return task
+
+
+def _build_search_context(results: list[dict[str, Any]], answer: str | None) -> str:
+    context_parts = ["[Web Search Results]"]
+
+    if answer:
+        context_parts.append(f"\nSummary: {answer}")
+
+    if results:
+        context_parts.append("\nSources:")
+        for i, item in enumerate(results[:5], 1):
+            title = item.get("title", "Untitled")
+            content_snippet = item.get("content", "")
+            url = item.get("url", "")
+
+            if len(content_snippet) > 300:
+                content_snippet = content_snippet[:297] + "..."
+
+            context_parts.append(f"\n{i}. {title}")
+            if content_snippet:
+                context_parts.append(f"   {content_snippet}")
+            if url:
+                context_parts.append(f"   {url}")
+
+    context_parts.append("\n[End of Search Results]\n")
+    return "\n".join(context_parts)
+
+
+async def apply_web_search_results(
+    messages: list[dict[str, Any]], web_search_task: asyncio.Task
+) -> None:
+    """Await the search (bounded) and insert its results into ``messages`` in place.
+
+    Results go in a system message after any leading system messages. Timeouts
+    and failures are logged and swallowed; the request continues unaugmented.
+    """
+    try:
+        search_result = await asyncio.wait_for(
+            asyncio.shield(web_search_task), timeout=WEB_SEARCH_WAIT_SECONDS
+        )
+
+        if not (search_result.success and search_result.result):
+            logger.warning(
+                "Auto web search returned no results: %s",
+                search_result.error or "empty results",
+            )
+            return
+
+        results = search_result.result.get("results", [])
+        answer = search_result.result.get("answer")
+        if not results and not answer:
+            return
+
+        search_context = _build_search_context(results, answer)
+        search_system_message = {
+            "role": "system",
+            "content": (
+                f"The following web search results were retrieved to help answer "
+                f"the user's query. Use this information to provide accurate, "
+                f"up-to-date responses. Cite sources when appropriate.\n\n{search_context}"
+            ),
+        }
+
+        insert_index = 0
+        for i, msg in enumerate(messages):
+            if msg.get("role") == "system":
+                insert_index = i + 1
+            else:
+                break
+
+        messages.insert(insert_index, search_system_message)
+
+        logger.info(
+            "Auto web search augmented messages with %d results (context_length=%d, cached=%s)",
+            len(results),
+            len(search_context),
+            bool(search_result.metadata.get("cached")),
+        )
+
+    except TimeoutError:
+        # The shielded search keeps running and populates the cache for the
+        # next caller; only this request stops waiting for it.
+        logger.warning(
+            "Auto web search timed out after %.0fs, continuing without results",
+            WEB_SEARCH_WAIT_SECONDS,
+        )
+    except Exception as e:
+        logger.warning("Auto web search failed, continuing without augmentation: %s", str(e))
@@ -2,121 +2,67 @@
 Public Status Page API Endpoints
 
 Provides public-facing endpoints for status page display without authentication.
-Optimized for performance with caching and pre-aggregated data.
+Optimized for performance with caching and pre-aggregated data: when the status
+snapshot refresher is running (src/services/monitoring/status_snapshot.py) the
+overview, provider, model, incident and stats endpoints serve pre-rendered bytes
+with an ETag and never touch the database. They fall back to querying directly
+when no fresh snapshot exists.
 """
 
+import asyncio
 import logging
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
 from src.db.client import get_db
+from src.services.monitoring import status_snapshot
+from src.services.monitoring.status_snapshot import (
+    format_incident,
+    format_model_status,
+    format_provider_status,
+    query_overall,
+    query_stats,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/status", tags=["status-page"])
 
+# Seconds between SSE keep-alive comments on /status/stream
+_SSE_HEARTBEAT_SECONDS = 15.0
+
+
+def _snapshot_response(name: str, request: Request | None) -> Response | None:
+    """Serve a pre-rendered status document, or None when there is no fresh snapshot."""
+    document = status_snapshot.get_status_document(name)
+    if document is None:
+        return None
+
+    headers = {
+        "ETag": document.etag,
+        "Cache-Control": "public, max-age=5, stale-while-revalidate=30",
+    }
+    if request is not None and request.headers.get("if-none-match") == document.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=document.body, media_type="application/json", headers=headers)
+
 
 @router.get("/", response_model=dict[str, Any])
-async def get_overall_status():
+async def get_overall_status(request: Request = None):
     """
     Get overall system status for status page
 
     Public endpoint - no authentication required.
     Returns current status, uptime, and basic metrics.
     """
-    try:
-        # Get overall system health from view
-        response = get_db().table("provider_health_current").select("*").execute()
-
-        providers = response.data or []
-
-        if not providers:
-            return {
-                "status": "unknown",
-                "message": "Status data not available",
-                "timestamp": datetime.now(UTC).isoformat(),
-            }
-
-        # Calculate overall metrics
-        total_models = sum(p["total_models"] for p in providers)
-        healthy_models = sum(p["healthy_models"] for p in providers)
-        offline_models = sum(p["offline_models"] for p in providers)
-
-        # Ensure healthy_models doesn't exceed total_models (data consistency fix)
-        # This can happen when the database view has stale data
-        if healthy_models > total_models:
-            logger.warning(
-                f"Data inconsistency: healthy_models ({healthy_models}) > total_models ({total_models}). "
-                "Constraining healthy_models to total_models."
-            )
-            healthy_models = total_models
-
-        # Determine overall status
-        if total_models == 0:
-            status = "unknown"
-            status_message = "No models monitored"
-        elif offline_models == 0:
-            status = "operational"
-            status_message = "All Systems Operational"
-        elif offline_models < total_models * 0.1:
-            status = "degraded"
-            status_message = "Partial Service Degradation"
-        else:
-            status = "major_outage"
-            status_message = "Major Service Disruption"
-
-        uptime_percentage = (healthy_models / total_models * 100) if total_models > 0 else 0
-
-        # Get active incidents count
-        incidents_response = (
-            get_db()
-            .table("model_health_incidents")
-            .select("id", count="exact")
-            .eq("status", "active")
-            .execute()
-        )
-
-        active_incidents = incidents_response.count or 0
-
-        # Calculate gateway health metrics
-        # Filter out None and empty string gateways
-        gateways_set = set(
-            p["gateway"] for p in providers if p.get("gateway") and p["gateway"].strip()
-        )
-        total_gateways = len(gateways_set) if gateways_set else 0
-
-        # Calculate healthy gateways (gateways that have at least one healthy provider)
-        gateway_health = {}
-        for p in providers:
-            gw = p.get("gateway")
-            if gw and gw.strip():  # Filter out None and empty strings
-                if gw not in gateway_health:
-                    gateway_health[gw] = {"has_healthy": False}
-                # Consider a gateway healthy if any of its providers are operational
-                if p.get("status_indicator") == "operational":
-                    gateway_health[gw]["has_healthy"] = True
-        healthy_gateways = sum(1 for g in gateway_health.values() if g.get("has_healthy", False))
-
-        # Calculate gateway health percentage
-        gateway_health_percentage = (
-            round((healthy_gateways / total_gateways) * 100, 1) if total_gateways > 0 else 0.0
-        )
+    cached = _snapshot_response(status_snapshot.OVERVIEW, request)
+    if cached is not None:
+        return cached
 
-        return {
-            "status": status,
-            "status_message": status_message,
-            "uptime_percentage": round(uptime_percentage, 2),
-            "total_models": total_models,
-            "healthy_models": healthy_models,
-            "offline_models": offline_models,
-            "total_providers": len(providers),
-            "total_gateways": total_gateways,
-            "healthy_gateways": healthy_gateways,
-            "gateway_health_percentage": gateway_health_percentage,
-            "active_incidents": active_incidents,
-            "last_updated": datetime.now(UTC).isoformat(),
-        }
+    try:
+        return query_overall(get_db())
 
     except Exception as e:
         logger.error(f"Failed to get overall status: {e}", exc_info=True)
@@ -124,48 +70,22 @@ async def get_overall_status():
 
 
 @router.get("/providers", response_model=list[dict[str, Any]])
-async def get_providers_status():
+async def get_providers_status(request: Request = None):
     """
     Get status for all providers
 
     Public endpoint - no authentication required.
     Returns health status for each provider/gateway combination.
     """
+    cached = _snapshot_response(status_snapshot.PROVIDERS, request)
+    if cached is not None:
+        return cached
+
     try:
         response = get_db().table("provider_health_current").select("*").order("provider").execute()
 
-        providers = response.data or []
-
         # Format for frontend display
-        formatted = []
-        for provider in providers:
-            healthy = provider["healthy_models"]
-            total = provider["total_models"]
-
-            # Apply same data consistency check as main status endpoint
-            if healthy > total:
-                logger.warning(
-                    f"Data inconsistency in provider {provider['provider']}/{provider['gateway']}: "
-                    f"healthy_models ({healthy}) > total_models ({total}). Capping to total."
-                )
-                healthy = total
-
-            formatted.append(
-                {
-                    "name": provider["provider"],
-                    "gateway": provider["gateway"],
-                    "status": provider["status_indicator"],
-                    "uptime_24h": round(provider["avg_uptime_24h"] or 0, 2),
-                    "uptime_7d": round(provider["avg_uptime_7d"] or 0, 2),
-                    "total_models": total,
-                    "healthy_models": healthy,
-                    "offline_models": provider["offline_models"],
-                    "avg_response_time_ms": round(provider["avg_response_time_ms"] or 0, 0),
-                    "last_checked": provider["last_checked_at"],
-                }
-            )
-
-        return formatted
+        return [format_provider_status(provider) for provider in response.data or []]
 
     except Exception as e:
         logger.error(f"Failed to get providers status: {e}", exc_info=True)
@@ -174,6 +94,7 @@ async def get_providers_status():
 
 @router.get("/models", response_model=list[dict[str, Any]])
 async def get_models_status(
+    request: Request = None,
     provider: str | None = Query(None, description="Filter by provider"),
     gateway: str | None = Query(None, description="Filter by gateway"),
     status: str | None = Query(None, description="Filter by status"),
@@ -187,6 +108,24 @@ async def get_models_status(
     Public endpoint - no authentication required.
     Supports filtering and pagination.
     """
+    filtered = any((provider, gateway, status, tier))
+    if not filtered and limit == status_snapshot.DEFAULT_MODELS_LIMIT and offset == 0:
+        cached = _snapshot_response(status_snapshot.MODELS, request)
+        if cached is not None:
+            return cached
+
+    snapshot_models = status_snapshot.get_snapshot_models()
+    if snapshot_models is not None:
+        matches = [
+            status_snapshot.model_list_view(m)
+            for m in snapshot_models
+            if (not provider or m["provider"] == provider)
+            and (not gateway or m["gateway"] == gateway)
+            and (not status or m["status"] == status)
+            and (not tier or m["tier"] == tier)
+        ]
+        return matches[offset : offset + limit]
+
     try:
         query = get_db().table("model_status_current").select("*")
 
@@ -205,31 +144,9 @@ async def get_models_status(
         query = query.order("usage_count_24h", desc=True)
 
         response = query.execute()
-        models = response.data or []
 
         # Format for frontend
-        formatted = []
-        for model in models:
-            formatted.append(
-                {
-                    "model_id": model["model"],
-                    "provider": model["provider"],
-                    "gateway": model["gateway"],
-                    "status": model["status_indicator"],
-                    "tier": model["monitoring_tier"],
-                    "uptime_24h": round(model["uptime_percentage_24h"] or 0, 2),
-                    "uptime_7d": round(model["uptime_percentage_7d"] or 0, 2),
-                    "uptime_30d": round(model["uptime_percentage_30d"] or 0, 2),
-                    "avg_response_time_ms": round(model["average_response_time_ms"] or 0, 0),
-                    "last_checked": model["last_called_at"],
-                    "last_success": model["last_success_at"],
-                    "last_failure": model["last_failure_at"],
-                    "circuit_breaker_state": model["circuit_breaker_state"],
-                    "active_incidents": model["active_incidents_count"],
-                }
-            )
-
-        return formatted
+        return [format_model_status(model) for model in response.data or []]
 
     except Exception as e:
         logger.error(f"Failed to get models status: {e}", exc_info=True)
@@ -244,6 +161,17 @@ async def get_model_status(provider: str, model_id: str, gateway: str | None = Q
     Public endpoint - no authentication required.
     Returns detailed status information for a single model.
     """
+    snapshot_models = status_snapshot.get_snapshot_models()
+    if snapshot_models is not None:
+        for model in snapshot_models:
+            if (
+                model["provider"] == provider
+                and model["model_id"] == model_id
+                and (not gateway or model["gateway"] == gateway)
+            ):
+                return model
+        raise HTTPException(status_code=404, detail="Model not found")
+
     try:
         query = (
             get_db()
@@ -261,27 +189,7 @@ async def get_model_status(provider: str, model_id: str, gateway: str | None = Q
         if not response.data:
             raise HTTPException(status_code=404, detail="Model not found")
 
-        model = response.data
-
-        return {
-            "model_id": model["model"],
-            "provider": model["provider"],
-            "gateway": model["gateway"],
-            "status": model["status_indicator"],
-            "tier": model["monitoring_tier"],
-            "uptime_24h": round(model["uptime_percentage_24h"] or 0, 2),
-            "uptime_7d": round(model["uptime_percentage_7d"] or 0, 2),
-            "uptime_30d": round(model["uptime_percentage_30d"] or 0, 2),
-            "avg_response_time_ms": round(model["average_response_time_ms"] or 0, 0),
-            "last_checked": model["last_called_at"],
-            "last_success": model["last_success_at"],
-            "last_failure": model["last_failure_at"],
-            "circuit_breaker_state": model["circuit_breaker_state"],
-            "consecutive_failures": model["consecutive_failures"],
-            "usage_24h": model["usage_count_24h"],
-            "is_enabled": model["is_enabled"],
-            "active_incidents": model["active_incidents_count"],
-        }
+        return format_model_status(response.data, detailed=True)
 
     except HTTPException:
         raise
@@ -292,6 +200,7 @@ async def get_model_status(provider: str, model_id: str, gateway: str | None = Q
 
 @router.get("/incidents", response_model=list[dict[str, Any]])
 async def get_incidents(
+    request: Request = None,
     status: str | None = Query(None, description="Filter by status (active, resolved)"),
     severity: str | None = Query(None, description="Filter by severity"),
     provider: str | None = Query(None, description="Filter by provider"),
@@ -304,6 +213,27 @@ async def get_incidents(
     Public endpoint - no authentication required.
     Returns recent incidents with filtering.
     """
+    filtered = any((status, severity, provider))
+    if not filtered and limit == status_snapshot.DEFAULT_INCIDENTS_LIMIT and offset == 0:
+        cached = _snapshot_response(status_snapshot.INCIDENTS, request)
+        if cached is not None:
+            return cached
+
+    # A filtered query may need rows past the snapshot's cap, so only a
+    # complete snapshot can answer it.
+    snapshot_incidents = status_snapshot.get_snapshot_incidents(
+        None if filtered else offset + limit
+    )
+    if snapshot_incidents is not None:
+        matches = [
+            i
+            for i in snapshot_incidents
+            if (not status or i["status"] == status)
+            and (not severity or i["severity"] == severity)
+            and (not provider or i["provider"] == provider)
+        ]
+        return matches[offset : offset + limit]
+
     try:
         query = get_db().table("model_health_incidents").select("*")
 
@@ -320,45 +250,69 @@ async def get_incidents(
         query = query.order("started_at", desc=True)
 
         response = query.execute()
-        incidents = response.data or []
 
         # Format for frontend
-        formatted = []
-        for incident in incidents:
-            duration = None
-            if incident["resolved_at"]:
-                duration = incident["duration_seconds"]
-            else:
-                # Calculate current duration for active incidents
-                started = datetime.fromisoformat(incident["started_at"])
-                duration = int((datetime.now(UTC) - started).total_seconds())
-
-            formatted.append(
-                {
-                    "id": incident["id"],
-                    "provider": incident["provider"],
-                    "model": incident["model"],
-                    "gateway": incident["gateway"],
-                    "type": incident["incident_type"],
-                    "severity": incident["severity"],
-                    "status": incident["status"],
-                    "started_at": incident["started_at"],
-                    "resolved_at": incident["resolved_at"],
-                    "duration_seconds": duration,
-                    "duration_human": _format_duration(duration) if duration else None,
-                    "error_message": incident["error_message"],
-                    "error_count": incident["error_count"],
-                    "resolution_notes": incident.get("resolution_notes"),
-                }
-            )
-
-        return formatted
+        now = datetime.now(UTC)
+        return [format_incident(incident, now) for incident in response.data or []]
 
     except Exception as e:
         logger.error(f"Failed to get incidents: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve incidents") from e
 
 
+@router.get("/stream")
+async def stream_status(request: Request):
+    """
+    Server-sent events stream of status changes
+
+    Public endpoint - no authentication required.
+    Sends every status document once on connect, then only the documents whose
+    content changed, as ``event: <name>`` / ``data: <json>`` pairs.
+    """
+    queue = status_snapshot.subscribe()
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Too many status stream subscribers")
+
+    names = (
+        status_snapshot.OVERVIEW,
+        status_snapshot.PROVIDERS,
+        status_snapshot.MODELS,
+        status_snapshot.INCIDENTS,
+        status_snapshot.STATS,
+    )
+
+    def _events(changed) -> str:
+        chunks = []
+        for name in changed:
+            document = status_snapshot.get_status_document(name)
+            if document is not None:
+                chunks.append(f"event: {name}\ndata: {document.body.decode()}\n\n")
+        return "".join(chunks)
+
+    async def event_stream():
+        try:
+            initial = _events(names)
+            if initial:
+                yield initial
+            while not await request.is_disconnected():
+                try:
+                    changed = await asyncio.wait_for(queue.get(), timeout=_SSE_HEARTBEAT_SECONDS)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                events = _events(changed)
+                if events:
+                    yield events
+        finally:
+            status_snapshot.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/uptime/{provider}/{model_id}", response_model=dict[str, Any])
 async def get_model_uptime_history(
     provider: str,
@@ -479,99 +433,23 @@ async def search_models(
 
 
 @router.get("/stats", response_model=dict[str, Any])
-async def get_stats():
+async def get_stats(request: Request = None):
     """
     Get overall statistics for status page
 
     Public endpoint - no authentication required.
     Returns summary statistics and metrics.
     """
-    try:
-        # Get model counts by tier
-        tier_counts_response = (
-            get_db()
-            .table("model_health_tracking")
-            .select("monitoring_tier", count="exact")
-            .eq("is_enabled", True)
-            .execute()
-        )
-
-        tier_data = tier_counts_response.data or []
-        tier_counts = {}
-        for row in tier_data:
-            tier = row.get("monitoring_tier", "unknown")
-            tier_counts[tier] = tier_counts.get(tier, 0) + 1
+    cached = _snapshot_response(status_snapshot.STATS, request)
+    if cached is not None:
+        return cached
 
-        # Get incident statistics
-        incidents_response = (
-            get_db()
-            .table("model_health_incidents")
-            .select("severity,status", count="exact")
-            .execute()
-        )
-
-        total_incidents = incidents_response.count or 0
-        active_incidents = len([i for i in incidents_response.data if i.get("status") == "active"])
-
-        # Get check statistics from last 24h
-        yesterday = datetime.now(UTC) - timedelta(hours=24)
-        checks_response = (
-            get_db()
-            .table("model_health_history")
-            .select("status", count="exact")
-            .gte("checked_at", yesterday.isoformat())
-            .execute()
-        )
-
-        total_checks = checks_response.count or 0
-        successful_checks = len([c for c in checks_response.data if c.get("status") == "success"])
-
-        return {
-            "monitoring": {
-                "total_models": sum(tier_counts.values()),
-                "critical_tier": tier_counts.get("critical", 0),
-                "popular_tier": tier_counts.get("popular", 0),
-                "standard_tier": tier_counts.get("standard", 0),
-                "on_demand_tier": tier_counts.get("on_demand", 0),
-            },
-            "incidents": {
-                "total_all_time": total_incidents,
-                "active": active_incidents,
-                "resolved": total_incidents - active_incidents,
-            },
-            "checks_24h": {
-                "total": total_checks,
-                "successful": successful_checks,
-                "failed": total_checks - successful_checks,
-                # null, not 0, when there are no samples. This endpoint is public
-                # and unauthenticated, so reporting 0 for "no data" tells every
-                # reader the gateway failed 100% of its checks. monitoring_active
-                # keeps "not measured" distinguishable from "measured and failing".
-                "success_rate": (
-                    round(successful_checks / total_checks * 100, 2) if total_checks > 0 else None
-                ),
-                "monitoring_active": total_checks > 0,
-            },
-            "last_updated": datetime.now(UTC).isoformat(),
-        }
+    try:
+        return query_stats(get_db())
 
     except Exception as e:
         logger.error(f"Failed to get stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve statistics") from e
 
 
-def _format_duration(seconds: int) -> str:
-    """Format duration in human-readable format"""
-    if seconds < 60:
-        return f"{seconds}s"
-    elif seconds < 3600:
-        minutes = seconds // 60
-        return f"{minutes}m"
-    elif seconds < 86400:
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        return f"{hours}h {minutes}m"
-    else:
-        days = seconds // 86400
-        hours = (seconds % 86400) // 3600
-        return f"{days}d {hours}h"
+_format_duration = status_snapshot.format_duration
@@ -1140,6 +1140,26 @@ async def get_cache_debouncer_stats(admin_user: dict = Depends(require_admin)):
         ) from e
 
 
+@router.get("/admin/cache/routing-snapshots/stats", tags=["admin", "cache", "monitoring"])
+async def get_routing_snapshot_stats(admin_user: dict = Depends(require_admin)):
+    """
+    Get the state of this worker's background-refreshed routing datasets
+    (model mappings, capabilities, manual pricing, OpenRouter price index):
+    age, refresh interval, last rebuild duration and failure counts.
+    """
+    from src.services.cache.refreshable_snapshot import (
+        get_snapshot_stats,
+        is_snapshot_refresher_running,
+    )
+
+    return {
+        "success": True,
+        "refresher_running": is_snapshot_refresher_running(),
+        "datasets": get_snapshot_stats(),
+        "timestamp": datetime.now(UTC).isoformat(),
+    }
+
+
 @router.get("/admin/cache/warmer/stats", tags=["admin", "cache", "monitoring"])
 async def get_cache_warmer_stats(admin_user: dict = Depends(require_admin)):
     """
@@ -5,6 +5,7 @@ This module provides endpoints for:
 - Listing available tools
 - Getting tool definitions for chat completion requests
 - Direct tool execution (requires authentication)
+- Streaming text-to-speech (audio returned sentence by sentence)
 - Search augmentation for non-tool models
 """
 
@@ -12,9 +13,15 @@ import logging
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from src.security.deps import get_api_key, get_optional_api_key
+from src.services.providers.chatterbox_tts_client import (
+    TTSQueueFull,
+    open_speech_stream,
+    wav_stream_header,
+)
 from src.services.tools import (
     execute_tool,
     get_tool_by_name,
@@ -42,6 +49,17 @@ class ToolExecuteResponse(BaseModel):
     metadata: dict[str, Any] = {}
 
 
+class SpeechStreamRequest(BaseModel):
+    """Request body for streaming text-to-speech."""
+
+    text: str = Field(..., min_length=1, description="Text to convert to speech")
+    model: str = Field(default="chatterbox-turbo", description="Chatterbox model")
+    language: str = Field(default="en", description="Language code (multilingual model)")
+    voice_reference_url: str | None = Field(default=None, description="Voice to clone")
+    exaggeration: float = Field(default=1.0, ge=0.0, le=2.0)
+    cfg_weight: float = Field(default=0.5, ge=0.0, le=1.0)
+
+
 class SearchAugmentRequest(BaseModel):
     """Request body for search augmentation."""
 
@@ -161,6 +179,51 @@ async def execute_tool_endpoint(
         raise HTTPException(status_code=500, detail=f"Tool execution failed: {str(e)}")
 
 
+@router.post("/text_to_speech/stream")
+async def stream_text_to_speech(
+    request: SpeechStreamRequest,
+    api_key: str = Depends(get_api_key),
+) -> StreamingResponse:
+    """Synthesize speech with local Chatterbox inference, streaming WAV audio.
+
+    Audio is sent as each sentence finishes, so playback can start before the
+    whole text has been synthesized. Requires authentication via API key.
+
+    Raises:
+        400: If parameters are invalid
+        401: If not authenticated
+        503: If the TTS inference queue is full
+        500: If the model cannot be loaded
+    """
+    try:
+        sample_rate, chunks = await open_speech_stream(
+            text=request.text,
+            model=request.model,
+            voice_reference_url=request.voice_reference_url,
+            language=request.language,
+            exaggeration=request.exaggeration,
+            cfg_weight=request.cfg_weight,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TTSQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except RuntimeError as e:
+        logger.error(f"Streaming TTS failed to start: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def audio():
+        yield wav_stream_header(sample_rate)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except RuntimeError as e:
+            # Headers are already sent; the client sees the audio end early
+            logger.error(f"Streaming TTS failed mid-stream: {e}")
+
+    return StreamingResponse(audio(), media_type="audio/wav")
+
+
 @router.post("/search/augment")
 async def search_augment(
     request: SearchAugmentRequest,
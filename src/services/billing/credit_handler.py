@@ -189,6 +189,22 @@ def _send_critical_billing_alert(
         logger.error(f"Failed to send Sentry alert for billing failure: {e}")
 
 
+async def _save_request_record(
+    request_id: str | None, user: dict, model: str, request_record: dict | None
+) -> None:
+    """Write the chat_completion_requests row outside settle_request (never raises)."""
+    if not request_id or not request_record or not user:
+        return
+    from src.db.chat_completion_requests import save_chat_completion_request_with_cost_async
+
+    try:
+        await save_chat_completion_request_with_cost_async(
+            request_id=request_id, model_name=model, user_id=user.get("id"), **request_record
+        )
+    except Exception as e:
+        logger.warning(f"Failed to save request record for {request_id}: {e}")
+
+
 async def handle_credits_and_usage(
     api_key: str,
     user: dict,
@@ -202,6 +218,7 @@ async def handle_credits_and_usage(
     is_streaming: bool = False,
     request_id: str | None = None,
     already_charged: bool = False,
+    request_record: dict | None = None,
 ) -> float:
     """
     Centralized credit/trial handling logic for all chat endpoints.
@@ -231,6 +248,11 @@ async def handle_credits_and_usage(
             this function skips the paid-user deduction + usage record to avoid a
             double charge. It still performs the route-owned bookkeeping the
             handler does not do (rate-limit usage update, shadow-ledger write).
+        request_record: chat_completion_requests columns for this request (see
+            ``settle_request``). When given, the row is written with the charge:
+            in the settle_request transaction, or right after the fallback
+            deduction or trial transaction. Not written if billing raises, and
+            ignored when ``already_charged``.
 
     Returns:
         float: Calculated cost in USD
@@ -354,6 +376,7 @@ async def handle_credits_and_usage(
                     "endpoint": endpoint,
                 },
             )
+        await _save_request_record(request_id, user, model, request_record)
     elif already_charged:
         # The unified handler already deducted credits and recorded usage for this
         # request (authenticated non-streaming path). Skip the duplicate deduction
@@ -391,30 +414,58 @@ async def handle_credits_and_usage(
             logger.warning("credit_ledger shadow dual-write failed (non-fatal): %s", e)
 
     else:
+        from src.config import Config
+        from src.db.settlement import settle_request_async
+
         # Paid user - deduct credits with retry logic
         last_error = None
         deduction_successful = False
+        # True when settle_request did the deduction AND the usage record,
+        # rate-limit update and shadow-ledger write in the same transaction.
+        settled = False
 
         for attempt in range(1, CREDIT_DEDUCTION_MAX_RETRIES + 1):
             try:
-                await _to_thread(
-                    deduct_credits,
-                    api_key,
-                    cost,
-                    f"API usage - {model}",
-                    {
-                        "model": model,
-                        "total_tokens": total_tokens,
-                        "prompt_tokens": prompt_tokens,
-                        "completion_tokens": completion_tokens,
-                        "cost_usd": cost,
-                        "endpoint": endpoint,
-                        "is_streaming": is_streaming,
-                        "attempt_number": attempt,
-                        "request_id": request_id,
-                    },
-                    request_id,
-                )
+                metadata = {
+                    "model": model,
+                    "total_tokens": total_tokens,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "cost_usd": cost,
+                    "endpoint": endpoint,
+                    "is_streaming": is_streaming,
+                    "attempt_number": attempt,
+                    "request_id": request_id,
+                }
+
+                # Single round-trip settlement, idempotent by request_id, so a
+                # retry after an ambiguous failure can never double-charge.
+                if Config.SETTLE_REQUEST_RPC_ENABLED and request_id and user:
+                    settled = (
+                        await settle_request_async(
+                            request_id,
+                            user["id"],
+                            api_key,
+                            model,
+                            cost,
+                            total_tokens,
+                            f"API usage - {model}",
+                            metadata,
+                            shadow_ledger=Config.CREDIT_LEDGER_SHADOW_ENABLED,
+                            request_record=request_record,
+                        )
+                        is not None
+                    )
+
+                if not settled:
+                    await _to_thread(
+                        deduct_credits,
+                        api_key,
+                        cost,
+                        f"API usage - {model}",
+                        metadata,
+                        request_id,
+                    )
 
                 # CRITICAL: Once deduct_credits succeeds, mark as successful immediately
                 # to prevent duplicate deductions if subsequent operations fail.
@@ -505,6 +556,11 @@ async def handle_credits_and_usage(
                 f"Credit deduction failed after {CREDIT_DEDUCTION_MAX_RETRIES} attempts: {last_error}"
             ) from last_error
 
+        if settled:
+            return cost
+
+        await _save_request_record(request_id, user, model, request_record)
+
         # Secondary operations: record usage and update rate limits
         # These are done AFTER the retry loop to prevent duplicate deductions.
         # Failures here are logged but don't affect the billing outcome.
@@ -546,8 +602,6 @@ async def handle_credits_and_usage(
         # request's in-memory snapshot, which can be stale under concurrency. The
         # REVENUE total stays correct (= cost); only the debit split can drift.
         try:
-            from src.config import Config
-
             if (
                 Config.CREDIT_LEDGER_SHADOW_ENABLED
                 and user
@@ -581,6 +635,7 @@ async def handle_credits_and_usage_with_fallback(
     endpoint: str = "/v1/chat/completions",
     is_streaming: bool = True,
     request_id: str | None = None,
+    request_record: dict | None = None,
 ) -> tuple[float, bool]:
     """
     Wrapper for streaming background tasks that handles failures gracefully.
@@ -617,6 +672,7 @@ async def handle_credits_and_usage_with_fallback(
                 endpoint=endpoint,
                 is_streaming=is_streaming,
                 request_id=request_id,
+                request_record=request_record,
             )
 
             if attempt > 1:
@@ -15,12 +15,32 @@ threading an ``api_key`` argument through every provider client. The context is
 copied into ``asyncio.to_thread`` workers automatically, so sync provider clients
 see it too.
 
+``resolve_byok_key`` answers from a per-worker cache: a customer's key is held
+sealed with a process-local key (``utils/crypto.seal_secret``) for
+``Config.BYOK_KEY_CACHE_TTL_SECONDS``, and "no key for this provider" is cached
+for ``Config.BYOK_NEGATIVE_CACHE_TTL_SECONDS``, so a warm lookup costs one dict
+read plus, for a key, one AES-GCM unseal. Failed lookups are never cached.
+Upserts and deletes call :func:`invalidate_byok_keys`, which drops the user's
+entries here and bumps a Redis epoch that every other worker checks at most
+every ``_EPOCH_RECHECK_SECONDS``.
+
+Without Redis the epoch can't carry an invalidation to other workers, so while
+it is unreachable (to read or to bump) cached entries are only trusted for
+``_EPOCH_RECHECK_SECONDS`` after they were stored: a rotated or deleted key
+then stops being used everywhere within that time, at the cost of more DB
+lookups until Redis is back.
+
 See docs/BUSINESS_PIVOT_DIRECT_SUPPLY.md Phase 5.
 """
 
 import contextvars
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.utils import crypto
 
 logger = logging.getLogger(__name__)
 
@@ -75,21 +95,197 @@ def get_byok_key_for(provider_slug: str) -> str | None:
     return None
 
 
+# --- Resolved-key cache --------------------------------------------------------
+
+BYOK_EPOCH_KEY = "gw:byok:epoch"
+_EPOCH_RECHECK_SECONDS = 5.0
+
+# (user_id, provider_slug) -> (sealed key or None for "no key", stored_at, expires_at, epoch)
+_key_cache: OrderedDict[tuple[int, str], tuple[bytes | None, float, float, int]] = OrderedDict()
+_key_cache_lock = threading.Lock()
+_key_cache_stats = {"hits": 0, "negative_hits": 0, "misses": 0, "invalidations": 0}
+
+_epoch_value: int = 0
+_epoch_checked_at: float = 0.0
+# False while Redis can't be read or bumped; entries then expire much sooner
+_epoch_reachable: bool = True
+# Bumped by every local invalidation, so a lookup that raced one is not stored
+_generation: int = 0
+
+
+def _byok_epoch() -> int:
+    """Shared invalidation epoch, re-read from Redis at most every few seconds.
+
+    Only moves forward, and keeps the last known value when Redis is unreachable.
+    """
+    global _epoch_value, _epoch_checked_at, _epoch_reachable
+
+    now = time.monotonic()
+    with _key_cache_lock:
+        if now - _epoch_checked_at < _EPOCH_RECHECK_SECONDS:
+            return _epoch_value
+        _epoch_checked_at = now
+        known = _epoch_value
+
+    try:
+        from src.config.redis_config import get_redis_client, is_redis_available
+
+        client = get_redis_client()
+        if not client or not is_redis_available():
+            _epoch_reachable = False
+            return known
+        raw = client.get(BYOK_EPOCH_KEY)
+        observed = int(raw) if raw not in (None, b"", "") else 0
+    except Exception as e:
+        logger.debug("BYOK epoch read failed, keeping %s: %s", known, e)
+        _epoch_reachable = False
+        return known
+
+    with _key_cache_lock:
+        _epoch_reachable = True
+        _epoch_value = max(_epoch_value, observed)
+        return _epoch_value
+
+
+def _bump_byok_epoch() -> None:
+    global _epoch_value, _epoch_reachable
+
+    try:
+        from src.config.redis_config import get_redis_client, is_redis_available
+
+        client = get_redis_client()
+        if not client or not is_redis_available():
+            _epoch_reachable = False
+            return
+        new_epoch = int(client.incr(BYOK_EPOCH_KEY))
+    except Exception as e:
+        logger.warning("Could not bump BYOK epoch: %s", e)
+        _epoch_reachable = False
+        return
+
+    with _key_cache_lock:
+        _epoch_value = max(_epoch_value, new_epoch)
+
+
+def _cached_key(user_id: int, provider_slug: str) -> tuple[bool, str | None]:
+    """Return ``(hit, key)``; a hit with key None means the user has no key."""
+    epoch = _byok_epoch()
+    cache_key = (user_id, provider_slug)
+    now = time.monotonic()
+    with _key_cache_lock:
+        entry = _key_cache.get(cache_key)
+        if (
+            entry is None
+            or entry[2] <= now
+            or entry[3] < epoch
+            # Invalidations from other workers can't reach us without Redis
+            or (not _epoch_reachable and now - entry[1] >= _EPOCH_RECHECK_SECONDS)
+        ):
+            if entry is not None:
+                del _key_cache[cache_key]
+            _key_cache_stats["misses"] += 1
+            return False, None
+        _key_cache.move_to_end(cache_key)
+        sealed = entry[0]
+        if sealed is None:
+            _key_cache_stats["negative_hits"] += 1
+            return True, None
+    try:
+        key = crypto.unseal_secret(sealed)
+    except Exception:
+        # Sealed under a previous process key (crypto module reloaded)
+        with _key_cache_lock:
+            _key_cache.pop(cache_key, None)
+            _key_cache_stats["misses"] += 1
+        return False, None
+    with _key_cache_lock:
+        _key_cache_stats["hits"] += 1
+    return True, key
+
+
+def _store_key(
+    user_id: int, provider_slug: str, key: str | None, epoch: int, generation: int
+) -> None:
+    from src.config import Config
+
+    if key is None:
+        sealed, ttl = None, Config.BYOK_NEGATIVE_CACHE_TTL_SECONDS
+    else:
+        try:
+            sealed, ttl = crypto.seal_secret(key), Config.BYOK_KEY_CACHE_TTL_SECONDS
+        except Exception:
+            return  # never hold a plaintext key
+    with _key_cache_lock:
+        if generation != _generation or epoch < _epoch_value:
+            return  # invalidated while we were loading
+        now = time.monotonic()
+        _key_cache[(user_id, provider_slug)] = (sealed, now, now + ttl, epoch)
+        _key_cache.move_to_end((user_id, provider_slug))
+        while len(_key_cache) > Config.BYOK_KEY_CACHE_MAX_ENTRIES:
+            _key_cache.popitem(last=False)
+
+
+def invalidate_byok_keys(user_id: int) -> None:
+    """Forget a user's cached keys in every worker. Call after BYOK writes."""
+    global _generation
+
+    with _key_cache_lock:
+        for cache_key in [k for k in _key_cache if k[0] == user_id]:
+            del _key_cache[cache_key]
+            _key_cache_stats["invalidations"] += 1
+        _generation += 1
+    _bump_byok_epoch()
+
+
+def clear_byok_key_cache() -> None:
+    """Drop every cached key (tests)."""
+    with _key_cache_lock:
+        _key_cache.clear()
+
+
+def get_byok_key_cache_stats() -> dict:
+    """Get cache statistics for monitoring."""
+    with _key_cache_lock:
+        return {
+            **_key_cache_stats,
+            "cached_keys": len(_key_cache),
+            "epoch": _epoch_value,
+            "epoch_reachable": _epoch_reachable,
+        }
+
+
 def resolve_byok_key(user_id: int | None, provider_slug: str) -> str | None:
     """Return the customer's decrypted own key for *provider_slug*, or None.
 
-    Never raises — a lookup/decryption failure logs and returns None so inference
-    falls back to the platform key.
+    Served from the resolved-key cache when possible. Never raises — a
+    lookup/decryption failure logs and returns None so inference falls back to
+    the platform key.
     """
     if user_id is None:
         return None
+
+    # The principal snapshot lists which providers the user has keys for, so
+    # users without a key for this provider skip the lookup entirely.
+    from src.services.request_principal import peek_request_principal_for_user
+
+    principal = peek_request_principal_for_user(user_id)
+    if principal is not None and not principal.has_byok_key(provider_slug):
+        return None
+
+    hit, key = _cached_key(user_id, provider_slug)
+    if hit:
+        return key
+
+    epoch, generation = _epoch_value, _generation
     try:
         from src.db.user_provider_keys import get_decrypted_provider_key
 
-        return get_decrypted_provider_key(user_id, provider_slug) or None
+        key = get_decrypted_provider_key(user_id, provider_slug) or None
     except Exception as e:  # never let BYOK lookup break inference
         logger.warning("BYOK resolve failed for %s: %s", provider_slug, e)
         return None
+    _store_key(user_id, provider_slug, key, epoch, generation)
+    return key
 
 
 def resolve_provider_key(user_id: int | None, provider_slug: str) -> tuple[str | None, bool]:
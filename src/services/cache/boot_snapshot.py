@@ -0,0 +1,147 @@
+"""
+Cold-start snapshot of the catalog and routing caches.
+
+Until the staggered startup warmup has rebuilt them from the database, a
+freshly started instance would serve catalog and routing from near-empty
+caches. Every successful sync therefore also records its result in a local
+file, and boot restores the full catalog, model mappings, capabilities and
+pricing index from it before reconciling against the database in the
+background.
+
+The file is a :class:`~src.services.cache.snapshot_file.SnapshotFile`: one
+compact JSON section per cache, with its length, CRC32 and write time in the
+index. Readers memory-map it and decode only the sections they ask for;
+writers replace it atomically under an ``flock``. Files with another magic or
+schema version are ignored.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import zlib
+from typing import Any
+
+from src.config import Config
+from src.services.cache.snapshot_file import SnapshotFile
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GWBOOTSNAP"
+# Bump when a section's shape changes; older files are then ignored
+SCHEMA_VERSION = 1
+# An unchanged section is not rewritten more often than this
+_MIN_REWRITE_SECONDS = 3600.0
+
+
+class BootSnapshot:
+    """Versioned, memory-mapped store of named cache sections."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = SnapshotFile(path, MAGIC, SCHEMA_VERSION)
+        self._lock = threading.Lock()
+
+    def read(self, name: str, max_age: float) -> Any | None:
+        """Decoded section ``name``, or None if missing, corrupt or older than ``max_age``."""
+        with self._file.mapped() as (mapped, index):
+            meta = index.get(name)
+            if meta is None or time.time() - meta["written_at"] > max_age:
+                return None
+            blob = self._file.section(mapped, name, meta)
+        return json.loads(blob) if blob is not None else None
+
+    def write(self, sections: dict[str, Any]) -> bool:
+        """Store ``sections``, keeping the others; False if nothing needed rewriting."""
+        now = time.time()
+        payloads = {
+            name: json.dumps(data, separators=(",", ":"), default=str).encode()
+            for name, data in sections.items()
+        }
+        try:
+            with self._lock, self._file.lock(), self._file.mapped() as (mapped, index):
+                if all(
+                    name in index
+                    and index[name]["crc"] == zlib.crc32(payload)
+                    and now - index[name]["written_at"] < _MIN_REWRITE_SECONDS
+                    for name, payload in payloads.items()
+                ):
+                    return False
+
+                blobs = {
+                    name: mapped[m["offset"] : m["offset"] + m["length"]]
+                    for name, m in index.items()
+                    if name not in payloads
+                }
+                entries = {name: {"written_at": index[name]["written_at"]} for name in blobs}
+                for name, payload in payloads.items():
+                    blobs[name] = payload
+                    entries[name] = {"written_at": now}
+                self._file.write(entries, blobs)
+        except OSError as e:
+            logger.warning(f"Boot snapshot write failed ({self.path}): {e}")
+            return False
+        return True
+
+
+_snapshot: BootSnapshot | None = None
+
+
+def get_boot_snapshot() -> BootSnapshot:
+    """Process-wide handle on ``Config.BOOT_SNAPSHOT_PATH``."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = BootSnapshot(Config.BOOT_SNAPSHOT_PATH)
+    return _snapshot
+
+
+def save_boot_snapshot(sections: dict[str, Any]) -> None:
+    """Record freshly synced cache sections. Never raises."""
+    if not Config.BOOT_SNAPSHOT_ENABLED:
+        return
+    try:
+        if get_boot_snapshot().write(sections):
+            logger.debug(f"Boot snapshot updated: {', '.join(sections)}")
+    except Exception as e:
+        logger.warning(f"Boot snapshot save failed: {e}")
+
+
+def restore_boot_snapshot() -> dict[str, int]:
+    """
+    Seed the in-memory caches from the snapshot.
+
+    Restored caches are marked due for a refresh, so they are reconciled
+    against the database on first use or by the startup warmup, whichever
+    comes first. Returns the number of entries restored per section.
+    """
+    if not Config.BOOT_SNAPSHOT_ENABLED:
+        return {}
+
+    from src.services.cache.local_memory_cache import set_local_catalog
+    from src.services.cache.model_capabilities_cache import restore_model_capabilities
+    from src.services.cache.model_mappings_cache import restore_model_mappings
+    from src.services.pricing.pricing import restore_pricing_cache
+
+    def restore_catalog(catalog: list[dict]) -> int:
+        # Fresh-window 0: served as stale until the warmup rebuild replaces it
+        set_local_catalog("all", catalog, ttl=0)
+        return len(catalog)
+
+    restorers = {
+        "mappings": restore_model_mappings,
+        "capabilities": restore_model_capabilities,
+        "pricing": restore_pricing_cache,
+        "catalog": restore_catalog,
+    }
+    snapshot = get_boot_snapshot()
+    restored: dict[str, int] = {}
+    for name, restore in restorers.items():
+        try:
+            data = snapshot.read(name, Config.BOOT_SNAPSHOT_MAX_AGE_SECONDS)
+            if data is not None:
+                restored[name] = restore(data)
+        except Exception as e:
+            logger.warning(f"Boot snapshot section {name!r} could not be restored: {e}")
+    return restored
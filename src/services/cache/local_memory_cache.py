@@ -352,8 +352,16 @@ def get_local_catalog(provider: str) -> tuple[list[dict] | None, bool]:
     Returns:
         Tuple of (catalog, is_stale)
     """
-    cache = get_local_cache()
+    from src.config import Config
+
     key = f"catalog:{provider}"
+    if Config.MULTI_WORKER_MODE:
+        # One memory-mapped copy for all workers instead of one per worker
+        from src.services.cache.shared_catalog_snapshot import get_shared_catalog_snapshot
+
+        return get_shared_catalog_snapshot().get(key, get_catalog_epoch())
+
+    cache = get_local_cache()
     entry, is_stale = cache.get(key)
     if entry is None:
         return None, False
@@ -378,6 +386,14 @@ def set_local_catalog(
     stale_ttl: float = 3600.0,  # 1 hour stale
 ) -> None:
     """Cache catalog in local memory, stamped with the current epoch."""
-    cache = get_local_cache()
+    from src.config import Config
+
     key = f"catalog:{provider}"
+    if Config.MULTI_WORKER_MODE:
+        from src.services.cache.shared_catalog_snapshot import get_shared_catalog_snapshot
+
+        get_shared_catalog_snapshot().put(key, catalog, get_catalog_epoch(), ttl, stale_ttl)
+        return
+
+    cache = get_local_cache()
     cache.set(key, (get_catalog_epoch(), catalog), ttl=ttl, stale_ttl=stale_ttl)
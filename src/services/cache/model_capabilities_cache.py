@@ -2,8 +2,10 @@
 In-memory cache for model capability flags and quality scores.
 
 Loads the models table capability columns and model_quality_scores from the
-database at startup and caches them in process memory. Automatically refreshes
-every 15 minutes on next access (stale-while-revalidate — never blocks a request).
+database and keeps them in process memory as one :class:`ModelCapabilities`
+snapshot, rebuilt every 15 minutes by the routing snapshot refresher
+(``src/services/cache/refreshable_snapshot.py``) and swapped in whole. Accessors
+only read the published snapshot, so a request never waits for a reload.
 
 This replaces the following hardcoded Python structures:
   - MODEL_MAX_TOKENS in credit_precheck.py
@@ -28,14 +30,14 @@ Usage:
 
 from __future__ import annotations
 
-import asyncio
+import dataclasses
 import logging
-import time
+from dataclasses import dataclass, field
+from typing import Any
 
-logger = logging.getLogger(__name__)
+from src.services.cache.refreshable_snapshot import RefreshableSnapshot
 
-# Global flag to prevent concurrent background cache refreshes.
-_refresh_in_progress: bool = False
+logger = logging.getLogger(__name__)
 
 # ── Hardcoded fallback for max_output_tokens ──────────────────────────────────
 # Used ONLY when the DB has no record for a model_id.
@@ -101,192 +103,167 @@ _FREE_MODELS_FALLBACK = {
 
 # ── In-memory cache state ─────────────────────────────────────────────────────
 
-# provider_model_id (lowercase) → max_output_tokens
-_max_tokens: dict[str, int] = {}
+_CACHE_TTL: float = 900.0  # 15 minutes
 
-# provider_model_id (lowercase) → True for models with json mode
-_has_json_mode: set[str] = set()
 
-# provider_model_id (lowercase) → True for reasoning models
-_is_reasoning: set[str] = set()
+@dataclass(frozen=True)
+class ModelCapabilities:
+    """One consistent load of the capability flags and quality scores."""
 
-# provider_model_id (lowercase) → True for free models
-_free_models: set[str] = set()
+    # provider_model_id (lowercase) → max_output_tokens
+    max_tokens: dict[str, int] = field(default_factory=dict)
+    # provider_model_id (lowercase) for models with json mode
+    has_json_mode: frozenset[str] = frozenset()
+    # provider_model_id (lowercase) for reasoning models
+    is_reasoning: frozenset[str] = frozenset()
+    # provider_model_id (lowercase) for free models
+    free_models: frozenset[str] = frozenset(_FREE_MODELS_FALLBACK)
+    # provider_model_id (lowercase) → latency tier (1-4)
+    latency_tier: dict[str, int] = field(default_factory=dict)
+    # model_id (lowercase) → {task_type → score}
+    quality_priors: dict[str, dict[str, float]] = field(default_factory=dict)
 
-# provider_model_id (lowercase) → latency tier (1-4)
-_latency_tier: dict[str, int] = {}
 
-# model_id (lowercase) → {task_type → score}
-_quality_priors: dict[str, dict[str, float]] = {}
+def _load_model_capabilities() -> ModelCapabilities:
+    """Build a new snapshot from the database (runs off the request path)."""
+    from src.db.model_capabilities_db import get_all_model_capability_flags, get_all_quality_scores
 
-_cache_loaded: bool = False
-_cache_loaded_at: float = 0.0
-_CACHE_TTL: float = 900.0  # 15 minutes
-_refresh_in_progress: bool = False
+    logger.info("Loading model capabilities cache from database...")
 
+    # ── Capability flags ──────────────────────────────────────────────────────
+    capability_rows = get_all_model_capability_flags()
+
+    new_max_tokens: dict[str, int] = {}
+    new_has_json_mode: set[str] = set()
+    new_is_reasoning: set[str] = set()
+    new_free_models: set[str] = set()
+    new_latency_tier: dict[str, int] = {}
+
+    for row in capability_rows:
+        model_id = (row.get("provider_model_id") or row.get("model_name") or "").lower()
+        if not model_id:
+            continue
+
+        if row.get("max_output_tokens") is not None:
+            new_max_tokens[model_id] = int(row["max_output_tokens"])
+        if row.get("has_json_mode"):
+            new_has_json_mode.add(model_id)
+        if row.get("is_reasoning"):
+            new_is_reasoning.add(model_id)
+        if row.get("is_free"):
+            new_free_models.add(model_id)
+        if row.get("latency_tier") is not None:
+            new_latency_tier[model_id] = int(row["latency_tier"])
+
+    # ── Quality scores ────────────────────────────────────────────────────────
+    score_rows = get_all_quality_scores()
+
+    new_quality_priors: dict[str, dict[str, float]] = {}
+    for row in score_rows:
+        model_id = (row.get("model_id") or "").lower()
+        task_type = row.get("task_type") or ""
+        score = row.get("score")
+        if model_id and task_type and score is not None:
+            if model_id not in new_quality_priors:
+                new_quality_priors[model_id] = {}
+            new_quality_priors[model_id][task_type] = float(score)
+
+    if not (capability_rows or score_rows):
+        # DB returned nothing — use hardcoded fallbacks so service stays up
+        logger.warning(
+            "Model capabilities DB returned no data; "
+            "using hardcoded fallbacks for free_models and tier pools"
+        )
+        return dataclasses.replace(
+            _capabilities.current, free_models=frozenset(_FREE_MODELS_FALLBACK)
+        )
 
-# ── Public loaders ────────────────────────────────────────────────────────────
+    capabilities = ModelCapabilities(
+        max_tokens=new_max_tokens,
+        has_json_mode=frozenset(new_has_json_mode),
+        is_reasoning=frozenset(new_is_reasoning),
+        free_models=frozenset(new_free_models or _FREE_MODELS_FALLBACK),
+        latency_tier=new_latency_tier,
+        quality_priors=new_quality_priors,
+    )
+    logger.info(
+        "Model capabilities cache loaded: %d models, %d free, %d quality scores",
+        len(capability_rows),
+        len(capabilities.free_models),
+        sum(len(v) for v in capabilities.quality_priors.values()),
+    )
 
+    from src.services.cache.boot_snapshot import save_boot_snapshot
 
-def load_model_capabilities_cache(force: bool = False) -> None:
-    """
-    Load (or refresh) model capability data from the database into memory.
+    save_boot_snapshot({"capabilities": snapshot_model_capabilities(capabilities)})
+    return capabilities
 
-    Safe to call multiple times — skips reload if cache is fresh unless
-    force=True. Intended to be called via asyncio.to_thread() from startup.py.
 
-    When the DB is unavailable, hardcoded fallbacks are used so the service
-    remains functional.
-    """
-    global _max_tokens, _has_json_mode, _is_reasoning, _free_models
-    global _latency_tier, _quality_priors, _cache_loaded, _cache_loaded_at
-
-    now = time.monotonic()
-    if not force and _cache_loaded and (now - _cache_loaded_at) < _CACHE_TTL:
-        logger.debug(
-            "Model capabilities cache is fresh (%.0fs old), skipping reload",
-            now - _cache_loaded_at,
-        )
-        return
+# Until the first load the hardcoded fallbacks (free models, tier pools) apply
+_capabilities: RefreshableSnapshot[ModelCapabilities] = RefreshableSnapshot(
+    "model_capabilities", _load_model_capabilities, ModelCapabilities(), _CACHE_TTL
+)
 
-    logger.info("Loading model capabilities cache from database...")
 
-    try:
-        from src.db.model_capabilities_db import (
-            get_all_model_capability_flags,
-            get_all_quality_scores,
-        )
+# ── Public loaders ────────────────────────────────────────────────────────────
 
-        # ── Capability flags ──────────────────────────────────────────────────
-        capability_rows = get_all_model_capability_flags()
-
-        new_max_tokens: dict[str, int] = {}
-        new_has_json_mode: set[str] = set()
-        new_is_reasoning: set[str] = set()
-        new_free_models: set[str] = set()
-        new_latency_tier: dict[str, int] = {}
-
-        for row in capability_rows:
-            model_id = (row.get("provider_model_id") or row.get("model_name") or "").lower()
-            if not model_id:
-                continue
-
-            if row.get("max_output_tokens") is not None:
-                new_max_tokens[model_id] = int(row["max_output_tokens"])
-            if row.get("has_json_mode"):
-                new_has_json_mode.add(model_id)
-            if row.get("is_reasoning"):
-                new_is_reasoning.add(model_id)
-            if row.get("is_free"):
-                new_free_models.add(model_id)
-            if row.get("latency_tier") is not None:
-                new_latency_tier[model_id] = int(row["latency_tier"])
-
-        # ── Quality scores ────────────────────────────────────────────────────
-        score_rows = get_all_quality_scores()
-
-        new_quality_priors: dict[str, dict[str, float]] = {}
-        for row in score_rows:
-            model_id = (row.get("model_id") or "").lower()
-            task_type = row.get("task_type") or ""
-            score = row.get("score")
-            if model_id and task_type and score is not None:
-                if model_id not in new_quality_priors:
-                    new_quality_priors[model_id] = {}
-                new_quality_priors[model_id][task_type] = float(score)
-
-        # ── Atomic swap ───────────────────────────────────────────────────────
-        if capability_rows or score_rows:
-            _max_tokens = new_max_tokens
-            _has_json_mode = new_has_json_mode
-            _is_reasoning = new_is_reasoning
-            _free_models = new_free_models if new_free_models else _FREE_MODELS_FALLBACK.copy()
-            _latency_tier = new_latency_tier
-            _quality_priors = new_quality_priors
-            _cache_loaded = True
-            _cache_loaded_at = time.monotonic()
-
-            logger.info(
-                "Model capabilities cache loaded: %d models, %d free, %d quality scores",
-                len(capability_rows),
-                len(_free_models),
-                sum(len(v) for v in _quality_priors.values()),
-            )
-        else:
-            # DB returned nothing — use hardcoded fallbacks so service stays up
-            _free_models = _FREE_MODELS_FALLBACK.copy()
-            _cache_loaded = True
-            _cache_loaded_at = time.monotonic()
-            logger.warning(
-                "Model capabilities DB returned no data; "
-                "using hardcoded fallbacks for free_models and tier pools"
-            )
-
-    except Exception as e:
-        logger.error("Failed to load model capabilities cache: %s", e)
-        # Mark as loaded so _ensure_loaded() doesn't cascade blocking DB calls, but
-        # set _cache_loaded_at=0 so TTL is immediately expired — the next access will
-        # fire a non-blocking background retry via stale-while-revalidate logic.
-        _free_models = _FREE_MODELS_FALLBACK.copy()
-        _cache_loaded = True
-        _cache_loaded_at = 0.0
 
+def load_model_capabilities_cache(force: bool = False) -> None:
+    """
+    Load (or refresh) model capability data from the database now, blocking.
 
-def invalidate_model_capabilities_cache() -> None:
-    """Force a reload on next access by resetting the loaded-at timestamp."""
-    global _cache_loaded_at
-    _cache_loaded_at = 0.0
-    logger.info("Model capabilities cache invalidated — will reload on next access")
+    Safe to call multiple times — skips reload if cache is fresh unless
+    force=True. Intended to be called via asyncio.to_thread() from startup.py;
+    afterwards the routing snapshot refresher keeps the data current.
+
+    When the DB is unavailable, the data already being served (initially the
+    hardcoded fallbacks) stays in place so the service remains functional.
+    """
+    _capabilities.refresh(force=force)
 
 
-# ── Stale-while-revalidate refresh ───────────────────────────────────────────
+def snapshot_model_capabilities(
+    capabilities: ModelCapabilities | None = None,
+) -> dict[str, Any]:
+    """The cached capability data in JSON-serialisable form, for the boot snapshot."""
+    capabilities = capabilities or _capabilities.current
+    return {
+        "max_tokens": capabilities.max_tokens,
+        "has_json_mode": sorted(capabilities.has_json_mode),
+        "is_reasoning": sorted(capabilities.is_reasoning),
+        "free_models": sorted(capabilities.free_models),
+        "latency_tier": capabilities.latency_tier,
+        "quality_priors": capabilities.quality_priors,
+    }
 
 
-def _ensure_loaded() -> None:
+def restore_model_capabilities(data: dict[str, Any]) -> int:
     """
-    Ensure the cache has been loaded at least once (blocking on first call only).
+    Seed the cache from a boot snapshot taken by snapshot_model_capabilities().
 
-    On TTL expiry, fires a non-blocking background refresh and returns
-    immediately with slightly stale data — never blocks the event loop.
+    A cache that has already loaded is left alone. The restored data counts as
+    expired, so the refresher replaces it with a database load. Returns the
+    number of models with a max_output_tokens entry.
     """
-    global _refresh_in_progress
-
-    now = time.monotonic()
-    if not _cache_loaded:
-        # Initial load: if we're on the event loop (e.g., called from a background
-        # task constructor during startup), schedule non-blocking to avoid stalling
-        # all async work during the critical startup window.
-        # If we're in a thread (e.g., startup's asyncio.to_thread call), block fine.
-        try:
-            loop = asyncio.get_running_loop()
-            if not _refresh_in_progress:
-                _refresh_in_progress = True
-                loop.create_task(_refresh_cache_background())
-        except RuntimeError:
-            # No event loop — safe to block (called from a worker thread)
-            load_model_capabilities_cache()
-        return
-
-    if (now - _cache_loaded_at) >= _CACHE_TTL:
-        if not _refresh_in_progress:
-            _refresh_in_progress = True
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(_refresh_cache_background())
-            except RuntimeError:
-                # Not in an async context — refresh synchronously
-                _refresh_in_progress = False
-                load_model_capabilities_cache()
-
-
-async def _refresh_cache_background() -> None:
-    global _refresh_in_progress
-    try:
-        await asyncio.to_thread(load_model_capabilities_cache)
-    except Exception as e:
-        logger.error("Background model capabilities cache refresh failed: %s", e)
-    finally:
-        _refresh_in_progress = False
+    if _capabilities.loaded:
+        return 0
+
+    capabilities = ModelCapabilities(
+        max_tokens=data["max_tokens"],
+        has_json_mode=frozenset(data["has_json_mode"]),
+        is_reasoning=frozenset(data["is_reasoning"]),
+        free_models=frozenset(data["free_models"]),
+        latency_tier=data["latency_tier"],
+        quality_priors=data["quality_priors"],
+    )
+    _capabilities.restore(capabilities)
+    return len(capabilities.max_tokens)
+
+
+def invalidate_model_capabilities_cache() -> None:
+    """Rebuild the data soon; the current copy is served until then."""
+    _capabilities.invalidate()
+    logger.info("Model capabilities cache invalidated — will reload in the background")
 
 
 # ── Public accessors ──────────────────────────────────────────────────────────
@@ -300,16 +277,16 @@ def get_max_output_tokens(model_id: str, default: int = _DEFAULT_MAX_TOKENS) ->
     matching (e.g. "gpt-4o-mini" matches key "gpt-4o-mini"), then to
     `default` if no match is found.
     """
-    _ensure_loaded()
+    max_tokens = _capabilities.get().max_tokens
     key = model_id.lower()
 
     # Exact match from DB
-    if key in _max_tokens:
-        return _max_tokens[key]
+    if key in max_tokens:
+        return max_tokens[key]
 
     # Suffix match from DB: "gpt-4o-mini" key matches "openai/gpt-4o-mini" query.
     # Use "/" as segment boundary to avoid "gpt-4" matching "gpt-4o".
-    for db_key, tokens in _max_tokens.items():
+    for db_key, tokens in max_tokens.items():
         if key.endswith(f"/{db_key}") or db_key.endswith(f"/{key}"):
             return tokens
 
@@ -331,8 +308,8 @@ def get_max_output_tokens(model_id: str, default: int = _DEFAULT_MAX_TOKENS) ->
 
 def get_free_models() -> set[str]:
     """Return a snapshot copy of model IDs that are free (is_free=true)."""
-    _ensure_loaded()
-    return _free_models.copy() if _free_models else _FREE_MODELS_FALLBACK.copy()
+    free_models = _capabilities.get().free_models
+    return set(free_models) if free_models else _FREE_MODELS_FALLBACK.copy()
 
 
 def is_free_model(model_id: str) -> bool:
@@ -345,17 +322,15 @@ def is_free_model(model_id: str) -> bool:
     credit check in chat.py and from the anonymous model allowlist in
     anonymous_rate_limiter.py, so it must only trust models actually known to be free.
     """
-    _ensure_loaded()
     key = model_id.lower()
-    free = _free_models if _free_models else _FREE_MODELS_FALLBACK
+    free = _capabilities.get().free_models or _FREE_MODELS_FALLBACK
     return key in free
 
 
 def get_latency_tier(model_id: str, default: int = 3) -> int:
     """Return the latency tier (1-4) for model_id."""
-    _ensure_loaded()
     key = model_id.lower()
-    return _latency_tier.get(key, default)
+    return _capabilities.get().latency_tier.get(key, default)
 
 
 def get_models_by_latency_tier(max_tier: int = 2) -> list[str]:
@@ -367,10 +342,10 @@ def get_models_by_latency_tier(max_tier: int = 2) -> list[str]:
       max_tier=2 → fast + ultra (SMALL_TIER equivalent)
       max_tier=3 → all but slow
     """
-    _ensure_loaded()
+    latency_tier = _capabilities.get().latency_tier
 
-    if _latency_tier:
-        return [mid for mid, tier in _latency_tier.items() if tier <= max_tier]
+    if latency_tier:
+        return [mid for mid, tier in latency_tier.items() if tier <= max_tier]
 
     # Fallback to hardcoded lists
     if max_tier <= 1:
@@ -386,10 +361,10 @@ def get_stable_models() -> list[str]:
 
     Uses tier-2 models from DB, or the hardcoded STABLE_FALLBACK list.
     """
-    _ensure_loaded()
+    latency_tier = _capabilities.get().latency_tier
 
-    if _latency_tier:
-        tier2 = [mid for mid, tier in _latency_tier.items() if tier <= 2]
+    if latency_tier:
+        tier2 = [mid for mid, tier in latency_tier.items() if tier <= 2]
         return tier2 if tier2 else _STABLE_FALLBACK
     return list(_STABLE_FALLBACK)
 
@@ -401,17 +376,15 @@ def get_quality_priors() -> dict[str, dict[str, float]]:
     Falls back to an empty dict if DB has no scores yet (select_model
     handles the empty-dict case gracefully via .get()).
     """
-    _ensure_loaded()
-    return {model: dict(tasks) for model, tasks in _quality_priors.items()}
+    quality_priors = _capabilities.get().quality_priors
+    return {model: dict(tasks) for model, tasks in quality_priors.items()}
 
 
 def has_json_mode(model_id: str) -> bool:
     """Return True if model supports JSON output mode."""
-    _ensure_loaded()
-    return model_id.lower() in _has_json_mode
+    return model_id.lower() in _capabilities.get().has_json_mode
 
 
 def is_reasoning_model(model_id: str) -> bool:
     """Return True if model is a reasoning/thinking model."""
-    _ensure_loaded()
-    return model_id.lower() in _is_reasoning
+    return model_id.lower() in _capabilities.get().is_reasoning
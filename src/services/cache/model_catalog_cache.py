@@ -42,7 +42,7 @@ except ImportError:
 
 import redis
 
-from src.config.redis_config import get_redis_client, is_redis_available
+from src.config.redis_config import get_redis_client, is_redis_available, redis_command
 
 logger = logging.getLogger(__name__)
 
@@ -1371,6 +1371,11 @@ def rebuild_full_catalog_from_providers() -> list[dict[str, Any]]:
             f"({len(all_models)} models, TTL={ModelCatalogCache.TTL_FULL_CATALOG}s)"
         )
 
+        from src.services.cache.boot_snapshot import save_boot_snapshot
+        from src.services.pricing.pricing import snapshot_pricing_cache
+
+        save_boot_snapshot({"catalog": all_models, "pricing": snapshot_pricing_cache()})
+
     return all_models
 
 
@@ -2931,7 +2936,7 @@ async def get_cached_unique_models_smart(
     Get cached unique models with filter support.
 
     Supports caching different filter/sort combinations separately.
-    Falls back to asyncio.to_thread for non-blocking Redis access.
+    Redis access goes through ``redis_command`` and never blocks the loop.
 
     Args:
         include_inactive: Include inactive models
@@ -2942,8 +2947,6 @@ async def get_cached_unique_models_smart(
     Returns:
         Cached models list or None if not found
     """
-    import asyncio
-
     cache = get_model_catalog_cache()
 
     if not cache.redis_client or not is_redis_available():
@@ -2958,7 +2961,7 @@ async def get_cached_unique_models_smart(
         )
 
         # Non-blocking Redis access
-        cached_data = await asyncio.to_thread(cache.redis_client.get, key)
+        cached_data = await redis_command(cache.redis_client, "get", key)
 
         if cached_data:
             cache._stats["hits"] += 1
@@ -2997,8 +3000,6 @@ async def cache_unique_models_with_filters(
     Returns:
         True if cached successfully
     """
-    import asyncio
-
     cache = get_model_catalog_cache()
 
     if not cache.redis_client or not is_redis_available():
@@ -3015,7 +3016,7 @@ async def cache_unique_models_with_filters(
         serialized_data = _serialize(models)
 
         # Non-blocking Redis access
-        await asyncio.to_thread(cache.redis_client.setex, key, ttl, serialized_data)
+        await redis_command(cache.redis_client, "setex", key, ttl, serialized_data)
 
         cache._stats["sets"] += 1
         logger.info(
@@ -2,13 +2,15 @@
 In-memory cache for model ID mapping tables.
 
 Loads model_aliases, model_provider_mappings, and model_routing_rules from the
-database at startup and caches them in process memory. Automatically refreshes
-every 15 minutes on next access.
+database and keeps them in process memory as one :class:`ModelMappings`
+snapshot, rebuilt every 15 minutes by the routing snapshot refresher
+(``src/services/cache/refreshable_snapshot.py``) and swapped in whole, so a
+reader never sees aliases from one load and provider mappings from another.
 
 This is intentionally synchronous — all callers (transform_model_id,
 detect_provider_from_model_id, apply_model_alias) are in hot-path inference code
-that must not incur per-request DB latency. The in-memory cache mirrors the
-previous hardcoded-dict structure with zero overhead difference.
+that must not incur per-request DB latency. Accessors only read the published
+snapshot; a stale one keeps being served until the refresher replaces it.
 
 Usage:
     # At startup (called from staggered_db_warmup in startup.py):
@@ -25,31 +27,102 @@ Usage:
 
 from __future__ import annotations
 
-import asyncio
 import logging
-import time
+from dataclasses import dataclass, field
 from typing import Any
 
+from src.services.cache.refreshable_snapshot import RefreshableSnapshot
+
 logger = logging.getLogger(__name__)
 
-# ── In-memory cache state ─────────────────────────────────────────────────────
+_CACHE_TTL: float = 900.0  # 15 minutes
 
-# alias (lowercase) → canonical_id
-_aliases: dict[str, str] = {}
 
-# provider → {simplified_model_id (lowercase) → provider_native_model_id}
-_provider_mappings: dict[str, dict[str, str]] = {}
+@dataclass(frozen=True)
+class ModelMappings:
+    """One consistent load of the three mapping tables."""
+
+    # alias (lowercase) → canonical_id
+    aliases: dict[str, str] = field(default_factory=dict)
+    # provider → {simplified_model_id (lowercase) → provider_native_model_id}
+    provider_mappings: dict[str, dict[str, str]] = field(default_factory=dict)
+    # model_pattern (lowercase) → force_provider
+    routing_rules: dict[str, str] = field(default_factory=dict)
+    # provider → set of native model IDs (for O(1) reverse lookup)
+    provider_native_values: dict[str, set[str]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        aliases: dict[str, str],
+        provider_mappings: dict[str, dict[str, str]],
+        routing_rules: dict[str, str],
+    ) -> ModelMappings:
+        return cls(
+            aliases=aliases,
+            provider_mappings=provider_mappings,
+            routing_rules=routing_rules,
+            provider_native_values={
+                provider: set(mapping.values()) for provider, mapping in provider_mappings.items()
+            },
+        )
 
-# model_pattern (lowercase) → force_provider
-_routing_rules: dict[str, str] = {}
 
-# provider → set of native model IDs (for O(1) reverse lookup)
-_provider_native_values: dict[str, set[str]] = {}
+def _load_model_mappings() -> ModelMappings:
+    """Build a new snapshot from the database (runs off the request path)."""
+    from src.db.model_mappings import (
+        get_all_model_aliases,
+        get_all_model_provider_mappings,
+        get_all_model_routing_rules,
+    )
+
+    logger.info("Loading model mappings cache from database...")
+
+    # Load aliases
+    new_aliases: dict[str, str] = {}
+    for row in get_all_model_aliases():
+        alias = (row.get("alias") or "").lower()
+        canonical = row.get("canonical_id") or ""
+        if alias and canonical:
+            new_aliases[alias] = canonical
+
+    # Load provider mappings — build nested dict by provider
+    new_provider_mappings: dict[str, dict[str, str]] = {}
+    for row in get_all_model_provider_mappings():
+        provider = (row.get("provider") or "").lower()
+        model_id = (row.get("model_id") or "").lower()
+        provider_model_id = row.get("provider_model_id") or ""
+        if provider and model_id and provider_model_id:
+            if provider not in new_provider_mappings:
+                new_provider_mappings[provider] = {}
+            new_provider_mappings[provider][model_id] = provider_model_id
+
+    # Load routing rules
+    new_routing_rules: dict[str, str] = {}
+    for row in get_all_model_routing_rules():
+        pattern = (row.get("model_pattern") or "").lower()
+        provider = row.get("force_provider") or ""
+        if pattern and provider:
+            new_routing_rules[pattern] = provider
+
+    mappings = ModelMappings.build(new_aliases, new_provider_mappings, new_routing_rules)
+    logger.info(
+        "Model mappings cache loaded: %d aliases, %d provider mappings (%d providers), %d routing rules",
+        len(mappings.aliases),
+        sum(len(m) for m in mappings.provider_mappings.values()),
+        len(mappings.provider_mappings),
+        len(mappings.routing_rules),
+    )
+
+    from src.services.cache.boot_snapshot import save_boot_snapshot
+
+    save_boot_snapshot({"mappings": snapshot_model_mappings(mappings)})
+    return mappings
 
-_cache_loaded: bool = False
-_cache_loaded_at: float = 0.0
-_CACHE_TTL: float = 900.0  # 15 minutes
-_refresh_in_progress: bool = False  # prevents concurrent background refreshes
+
+_mappings: RefreshableSnapshot[ModelMappings] = RefreshableSnapshot(
+    "model_mappings", _load_model_mappings, ModelMappings(), _CACHE_TTL
+)
 
 
 # ── Public loaders ────────────────────────────────────────────────────────────
@@ -57,151 +130,66 @@ _refresh_in_progress: bool = False  # prevents concurrent background refreshes
 
 def load_model_mappings_cache(force: bool = False) -> None:
     """
-    Load (or refresh) all 3 mapping tables into in-memory dicts.
+    Load (or refresh) all 3 mapping tables now, blocking the caller.
 
     Safe to call multiple times — skips reload if cache is fresh unless
-    force=True. Intended to be called via asyncio.to_thread() from startup.py.
+    force=True. Intended to be called via asyncio.to_thread() from startup.py;
+    afterwards the routing snapshot refresher keeps the tables current.
+    A failed load keeps the tables already being served.
 
     Args:
         force: If True, reload even if cache is still within TTL.
     """
-    global _aliases, _provider_mappings, _routing_rules, _provider_native_values
-    global _cache_loaded, _cache_loaded_at
+    _mappings.refresh(force=force)
 
-    now = time.monotonic()
-    if not force and _cache_loaded and (now - _cache_loaded_at) < _CACHE_TTL:
-        logger.debug(
-            "Model mappings cache is fresh (%.0fs old), skipping reload", now - _cache_loaded_at
-        )
-        return
 
-    logger.info("Loading model mappings cache from database...")
+def snapshot_model_mappings(mappings: ModelMappings | None = None) -> dict[str, Any]:
+    """The cached tables in JSON-serialisable form, for the boot snapshot."""
+    mappings = mappings or _mappings.current
+    return {
+        "aliases": mappings.aliases,
+        "provider_mappings": mappings.provider_mappings,
+        "routing_rules": mappings.routing_rules,
+    }
 
-    try:
-        from src.db.model_mappings import (
-            get_all_model_aliases,
-            get_all_model_provider_mappings,
-            get_all_model_routing_rules,
-        )
 
-        # Load aliases
-        alias_rows = get_all_model_aliases()
-        new_aliases: dict[str, str] = {}
-        for row in alias_rows:
-            alias = (row.get("alias") or "").lower()
-            canonical = row.get("canonical_id") or ""
-            if alias and canonical:
-                new_aliases[alias] = canonical
-
-        # Load provider mappings — build nested dict by provider
-        mapping_rows = get_all_model_provider_mappings()
-        new_provider_mappings: dict[str, dict[str, str]] = {}
-        for row in mapping_rows:
-            provider = (row.get("provider") or "").lower()
-            model_id = (row.get("model_id") or "").lower()
-            provider_model_id = row.get("provider_model_id") or ""
-            if provider and model_id and provider_model_id:
-                if provider not in new_provider_mappings:
-                    new_provider_mappings[provider] = {}
-                new_provider_mappings[provider][model_id] = provider_model_id
-
-        # Load routing rules
-        rule_rows = get_all_model_routing_rules()
-        new_routing_rules: dict[str, str] = {}
-        for row in rule_rows:
-            pattern = (row.get("model_pattern") or "").lower()
-            provider = row.get("force_provider") or ""
-            if pattern and provider:
-                new_routing_rules[pattern] = provider
-
-        # Build reverse lookup: provider → set of native model IDs
-        new_native_values: dict[str, set[str]] = {
-            provider: set(mapping.values()) for provider, mapping in new_provider_mappings.items()
-        }
-
-        # Atomic swap — replace all caches at once
-        _aliases = new_aliases
-        _provider_mappings = new_provider_mappings
-        _routing_rules = new_routing_rules
-        _provider_native_values = new_native_values
-        _cache_loaded = True
-        _cache_loaded_at = time.monotonic()
-
-        logger.info(
-            "Model mappings cache loaded: %d aliases, %d provider mappings (%d providers), %d routing rules",
-            len(_aliases),
-            sum(len(m) for m in _provider_mappings.values()),
-            len(_provider_mappings),
-            len(_routing_rules),
-        )
+def restore_model_mappings(data: dict[str, Any]) -> int:
+    """
+    Seed the cache from a boot snapshot taken by snapshot_model_mappings().
 
-    except Exception as e:
-        logger.error("Failed to load model mappings cache: %s", e)
-        # Do not mark cache as loaded — next call will retry
+    A cache that has already loaded is left alone. The restored tables count
+    as expired, so the refresher replaces them with a database load.
+    Returns the number of provider mappings restored.
+    """
+    if _mappings.loaded:
+        return 0
+
+    mappings = ModelMappings.build(
+        data["aliases"], data["provider_mappings"], data["routing_rules"]
+    )
+    _mappings.restore(mappings)
+    return sum(len(m) for m in mappings.provider_mappings.values())
 
 
 def invalidate_model_mappings_cache() -> None:
-    """Force a reload on next access by resetting the loaded-at timestamp."""
-    global _cache_loaded_at
-    _cache_loaded_at = 0.0
-    logger.info("Model mappings cache invalidated — will reload on next access")
+    """Rebuild the tables soon; the current ones are served until then."""
+    _mappings.invalidate()
+    logger.info("Model mappings cache invalidated — will reload in the background")
 
 
 # ── Cache accessors ───────────────────────────────────────────────────────────
-# Each accessor auto-refreshes if the cache is stale. The refresh is synchronous
-# (not async) because transform_model_id / detect_provider_from_model_id are
+# Accessors read the published snapshot and never wait for a reload. They are
+# synchronous because transform_model_id / detect_provider_from_model_id are
 # called in sync context deep inside request handlers.
 
 
-def _ensure_loaded() -> None:
-    """
-    Ensure the cache has been loaded at least once (blocking).
-
-    On first startup this may block briefly. On TTL expiry it triggers a
-    non-blocking background refresh and returns immediately with stale data,
-    so the event loop is never stalled by a cache refresh mid-request.
-    """
-    global _refresh_in_progress
-
-    now = time.monotonic()
-    if not _cache_loaded:
-        # First load — must block so callers have valid data before serving.
-        load_model_mappings_cache()
-        return
-
-    if (now - _cache_loaded_at) >= _CACHE_TTL:
-        # Cache is stale. Fire a background refresh so we don't block the
-        # event loop; callers get slightly stale data for this one cycle.
-        if not _refresh_in_progress:
-            _refresh_in_progress = True
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(_refresh_cache_background())
-            except RuntimeError:
-                # No running event loop (e.g. tests / CLI context) — fall back to sync.
-                _refresh_in_progress = False
-                load_model_mappings_cache()
-
-
-async def _refresh_cache_background() -> None:
-    """Run load_model_mappings_cache() in a thread pool, then clear the in-progress flag."""
-    global _refresh_in_progress
-    try:
-        await asyncio.to_thread(load_model_mappings_cache)
-    except Exception as e:
-        logger.error("Background model mappings cache refresh failed: %s", e)
-    finally:
-        _refresh_in_progress = False
-
-
 def get_aliases() -> dict[str, str]:
     """
     Return alias → canonical_id mapping (auto-refreshes if stale).
 
     Keys are lowercase. Values are canonical model IDs as stored in the DB.
     """
-    _ensure_loaded()
-    return _aliases
+    return _mappings.get().aliases
 
 
 def get_provider_mappings(provider: str = "") -> dict[str, str]:
@@ -211,11 +199,11 @@ def get_provider_mappings(provider: str = "") -> dict[str, str]:
     If provider is empty string or not found, returns {}.
     Keys are lowercase (matching the normalized lookup in transform_model_id).
     """
-    _ensure_loaded()
+    provider_mappings = _mappings.get().provider_mappings
     if not provider:
         # Return entire nested dict when no provider specified (used by detect_provider)
-        return _provider_mappings  # type: ignore[return-value]
-    return _provider_mappings.get(provider.lower(), {})
+        return provider_mappings  # type: ignore[return-value]
+    return provider_mappings.get(provider.lower(), {})
 
 
 def get_all_provider_mappings() -> dict[str, dict[str, str]]:
@@ -224,8 +212,7 @@ def get_all_provider_mappings() -> dict[str, dict[str, str]]:
 
     Used for provider detection when iterating all providers.
     """
-    _ensure_loaded()
-    return _provider_mappings
+    return _mappings.get().provider_mappings
 
 
 def get_routing_rules() -> dict[str, str]:
@@ -234,8 +221,7 @@ def get_routing_rules() -> dict[str, str]:
 
     Keys are lowercase.
     """
-    _ensure_loaded()
-    return _routing_rules
+    return _mappings.get().routing_rules
 
 
 def get_provider_native_values(provider: str) -> set[str]:
@@ -245,18 +231,21 @@ def get_provider_native_values(provider: str) -> set[str]:
     Used for O(1) reverse lookup in detect_provider_from_model_id.
     Returns empty set if provider not found.
     """
-    _ensure_loaded()
-    return _provider_native_values.get(provider.lower(), set())
+    return _mappings.get().provider_native_values.get(provider.lower(), set())
 
 
 def get_cache_stats() -> dict[str, Any]:
     """Return diagnostic stats about the current cache state."""
+    mappings = _mappings.current
+    age = _mappings.age()
     return {
-        "loaded": _cache_loaded,
-        "age_seconds": round(time.monotonic() - _cache_loaded_at, 1) if _cache_loaded else None,
+        "loaded": _mappings.loaded,
+        "age_seconds": round(age, 1) if age is not None else None,
         "ttl_seconds": _CACHE_TTL,
-        "alias_count": len(_aliases),
-        "provider_count": len(_provider_mappings),
-        "total_mapping_count": sum(len(m) for m in _provider_mappings.values()),
-        "routing_rule_count": len(_routing_rules),
+        "alias_count": len(mappings.aliases),
+        "provider_count": len(mappings.provider_mappings),
+        "total_mapping_count": sum(len(m) for m in mappings.provider_mappings.values()),
+        "routing_rule_count": len(mappings.routing_rules),
+        "last_refresh_seconds": _mappings.last_refresh_seconds,
+        "refresh_failures": _mappings.failures,
     }
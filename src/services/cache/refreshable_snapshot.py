@@ -0,0 +1,324 @@
+"""
+Routing datasets rebuilt in the background and swapped in atomically.
+
+The routing tables consulted on every request — model aliases and provider
+mappings, capability flags, manual pricing, the OpenRouter price index — used
+to check their own TTL on access, so whichever request found one stale paid
+the reload, and concurrent requests could stampede the same reload. Each is
+now a :class:`RefreshableSnapshot`: a loader builds a complete new value off
+the request path, and it is published by rebinding a single reference, so a
+reader sees either the old dataset or the new one, never a mix, and never
+waits for a rebuild.
+
+One refresher task per worker (:func:`start_snapshot_refresher`) rebuilds each
+snapshot when its interval elapses or as soon as it is invalidated, in a
+worker thread. A snapshot that has never loaded (and has nothing restored
+from the boot snapshot) is loaded inline by the first reader instead, still
+single-flight, so nobody is served its empty initial value. A failed rebuild
+keeps the previous value and is retried after ``_RETRY_SECONDS``, or after
+``_FIRST_LOAD_RETRY_SECONDS`` while there is no previous value.
+
+Without a running refresher (tests, scripts, CLI tools) :meth:`get` keeps the
+old behaviour of rebuilding a due snapshot inline, still single-flight.
+
+Exposed per dataset: ``routing_snapshot_age_seconds``,
+``routing_snapshot_refresh_duration_seconds`` and
+``routing_snapshot_refresh_failures_total``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Delay before a failed rebuild is retried (capped at the snapshot's interval)
+_RETRY_SECONDS = 60.0
+# Shorter delay while a snapshot has never loaded, since readers retry inline
+_FIRST_LOAD_RETRY_SECONDS = 5.0
+# Bounds on the refresher's sleep: it wakes at least this often to export
+# ages, and invalidations arriving in a burst are served by one rebuild
+_MAX_SLEEP_SECONDS = 15.0
+_MIN_SLEEP_SECONDS = 1.0
+
+_snapshots: weakref.WeakSet[RefreshableSnapshot] = weakref.WeakSet()
+
+_wake: asyncio.Event | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_refresh_task: asyncio.Task | None = None
+
+
+class RefreshableSnapshot[T]:
+    """
+    A dataset built by ``loader`` and published by a single reference swap.
+
+    Args:
+        name: Dataset label for logs and metrics
+        loader: Builds a complete new value; raising keeps the current one
+        initial: Served until the first successful load
+        interval: Seconds between rebuilds, or None to rebuild only when
+            invalidated
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], T],
+        initial: T,
+        interval: float | None,
+    ):
+        self.name = name
+        self.interval = interval
+        self._loader = loader
+        self._initial = initial
+        self._lock = threading.Lock()
+        self.clear()
+        _snapshots.add(self)
+
+    def clear(self) -> None:
+        """Drop back to the initial value, due for a load (tests, resets)."""
+        self._value: T = self._initial
+        self.loaded = False
+        self.loaded_at: float | None = None
+        self._due = True
+        self._invalidations = 0
+        self._retry_at = 0.0
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_seconds: float | None = None
+
+    @property
+    def current(self) -> T:
+        """The published value, without ever loading."""
+        return self._value
+
+    def get(self) -> T:
+        """
+        The published value.
+
+        While the background refresher is running, loads only if nothing has
+        been loaded yet; a due snapshot keeps serving its previous value until
+        the refresher replaces it.
+        """
+        if (not self.loaded or _refresh_task is None) and self.is_due():
+            self.refresh()
+        return self._value
+
+    def is_due(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if now < self._retry_at:
+            return False
+        if self._due or self.loaded_at is None:
+            return True
+        return self.interval is not None and now - self.loaded_at >= self.interval
+
+    def seconds_until_due(self, now: float) -> float:
+        if self._retry_at > now:
+            return self._retry_at - now
+        if self._due or self.loaded_at is None:
+            return 0.0
+        if self.interval is None:
+            return float("inf")
+        return max(self.loaded_at + self.interval - now, 0.0)
+
+    def age(self, now: float | None = None) -> float | None:
+        """Seconds since the last successful load (None before the first one)."""
+        if self.loaded_at is None:
+            return None
+        return (time.monotonic() if now is None else now) - self.loaded_at
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Build and publish a new value now, blocking the caller.
+
+        Concurrent callers share one build: whoever waited on the lock finds
+        the snapshot fresh and returns. Returns False if the loader failed.
+        """
+        with self._lock:
+            if not force and not self.is_due():
+                return True
+            started = time.monotonic()
+            invalidations = self._invalidations
+            try:
+                value = self._loader()
+            except Exception as e:
+                self.failures += 1
+                retry = min(
+                    self.interval or _RETRY_SECONDS,
+                    _RETRY_SECONDS if self.loaded else _FIRST_LOAD_RETRY_SECONDS,
+                )
+                self._retry_at = time.monotonic() + retry
+                logger.error("Refreshing %s failed, serving the previous copy: %s", self.name, e)
+                _record_failure(self.name)
+                return False
+
+            self._value = value
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+            # An invalidation that arrived mid-build may not be reflected in it
+            self._due = self._invalidations != invalidations
+            self._retry_at = 0.0
+            self.refreshes += 1
+            self.last_refresh_seconds = self.loaded_at - started
+            _record_refresh(self.name, self.last_refresh_seconds)
+            return True
+
+    def restore(self, value: T) -> None:
+        """Serve a value from the boot snapshot until the first real load."""
+        with self._lock:
+            self._value = value
+            self.loaded = True
+            self._due = True
+
+    def invalidate(self) -> None:
+        """Rebuild as soon as possible, serving the current value until then."""
+        self._invalidations += 1
+        self._due = True
+        self._retry_at = 0.0
+        request_refresh()
+
+    def get_stats(self) -> dict[str, Any]:
+        age = self.age()
+        return {
+            "loaded": self.loaded,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "interval_seconds": self.interval,
+            "due": self.is_due(),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh_seconds": (
+                round(self.last_refresh_seconds, 3)
+                if self.last_refresh_seconds is not None
+                else None
+            ),
+        }
+
+
+def _record_refresh(name: str, seconds: float) -> None:
+    try:
+        from src.services.prometheus_metrics import (
+            routing_snapshot_age_seconds,
+            routing_snapshot_refresh_duration_seconds,
+        )
+
+        routing_snapshot_refresh_duration_seconds.labels(dataset=name).observe(seconds)
+        routing_snapshot_age_seconds.labels(dataset=name).set(0)
+    except Exception as e:
+        logger.debug(f"Failed to record routing snapshot refresh metric: {e}")
+
+
+def _record_failure(name: str) -> None:
+    try:
+        from src.services.prometheus_metrics import routing_snapshot_refresh_failures_total
+
+        routing_snapshot_refresh_failures_total.labels(dataset=name).inc()
+    except Exception as e:
+        logger.debug(f"Failed to record routing snapshot failure metric: {e}")
+
+
+def _record_ages(now: float) -> None:
+    try:
+        from src.services.prometheus_metrics import routing_snapshot_age_seconds
+
+        for snapshot in list(_snapshots):
+            age = snapshot.age(now)
+            if age is not None:
+                routing_snapshot_age_seconds.labels(dataset=snapshot.name).set(age)
+    except Exception as e:
+        logger.debug(f"Failed to record routing snapshot ages: {e}")
+
+
+def get_snapshot_stats() -> dict[str, dict[str, Any]]:
+    """Per-dataset state for monitoring endpoints."""
+    return {snapshot.name: snapshot.get_stats() for snapshot in list(_snapshots)}
+
+
+def is_snapshot_refresher_running() -> bool:
+    return _refresh_task is not None and not _refresh_task.done()
+
+
+def request_refresh() -> None:
+    """Wake the refresher to rebuild due snapshots now. Safe from any thread."""
+    if _loop is None or _wake is None:
+        return
+    try:
+        _loop.call_soon_threadsafe(_wake.set)
+    except RuntimeError:
+        # Loop closed during shutdown
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Background refresher
+# ---------------------------------------------------------------------------
+
+
+async def _refresh_loop() -> None:
+    while True:
+        now = time.monotonic()
+        for snapshot in list(_snapshots):
+            if snapshot.is_due(now):
+                try:
+                    await asyncio.to_thread(snapshot.refresh)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Routing snapshot refresh of {snapshot.name} failed: {e}")
+
+        now = time.monotonic()
+        _record_ages(now)
+        sleep = min(
+            (snapshot.seconds_until_due(now) for snapshot in list(_snapshots)),
+            default=_MAX_SLEEP_SECONDS,
+        )
+        try:
+            await asyncio.wait_for(
+                _wake.wait(), timeout=min(max(sleep, _MIN_SLEEP_SECONDS), _MAX_SLEEP_SECONDS)
+            )
+        except TimeoutError:
+            pass
+        _wake.clear()
+
+
+def start_snapshot_refresher() -> None:
+    """
+    Start the routing snapshot refresher.
+    Call this during application startup.
+    """
+    global _refresh_task, _wake, _loop
+
+    if not Config.ROUTING_SNAPSHOT_REFRESHER_ENABLED:
+        logger.info("Routing snapshot refresher disabled via ROUTING_SNAPSHOT_REFRESHER_ENABLED")
+        return
+
+    try:
+        _loop = asyncio.get_running_loop()
+        _wake = asyncio.Event()
+        _refresh_task = _loop.create_task(_refresh_loop(), name="routing_snapshot_refresh")
+        logger.info("Routing snapshot refresher started")
+    except RuntimeError:
+        # No running event loop
+        logger.warning("Event loop not running, cannot start routing snapshot refresher")
+
+
+def stop_snapshot_refresher() -> None:
+    """
+    Stop the routing snapshot refresher.
+    Call this during application shutdown.
+    """
+    global _refresh_task, _wake, _loop
+
+    if _refresh_task:
+        _refresh_task.cancel()
+        logger.info("Routing snapshot refresher stopped")
+    _refresh_task = None
+    _wake = None
+    _loop = None
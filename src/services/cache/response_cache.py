@@ -1,14 +1,22 @@
 """
 Response caching system for chat completions.
 
-This module provides intelligent caching for chat completion responses,
-including semantic caching to match similar queries.
+This module provides exact-match caching for chat completion responses, plus
+single-flight coalescing so identical concurrent requests make one upstream
+call between them.
+
+The in-memory store is an ``OrderedDict`` LRU (O(1) hit, insert and eviction)
+bounded by both entry count and serialized size in bytes.
 """
 
+import asyncio
 import hashlib
 import json
 import logging
 import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
 from dataclasses import dataclass
 from typing import Any
 
@@ -23,6 +31,24 @@ except ImportError:
     REDIS_AVAILABLE = False
     logger.warning("Redis not available, using in-memory cache only")
 
+# Generation parameters that change the output, and so belong in the key
+KEY_PARAMS = (
+    "temperature",
+    "max_tokens",
+    "top_p",
+    "frequency_penalty",
+    "presence_penalty",
+    "stop",
+    "seed",
+    "n",
+    "response_format",
+    "logprobs",
+    "top_logprobs",
+    "logit_bias",
+    "tools",
+    "tool_choice",
+)
+
 
 @dataclass
 class CachedResponse:
@@ -34,6 +60,7 @@ class CachedResponse:
     ttl: int  # Time to live in seconds
     hit_count: int = 0
     metadata: dict[str, Any] = None
+    size_bytes: int = 0
 
     def is_expired(self) -> bool:
         """Check if cache entry has expired"""
@@ -44,12 +71,34 @@ class CachedResponse:
         self.hit_count += 1
 
 
+def make_cache_key(
+    messages: list[dict[str, Any]],
+    model: str,
+    params: dict[str, Any],
+    scope: str | None = None,
+) -> str:
+    """
+    Exact-match key for a request.
+
+    ``scope`` partitions the cache (e.g. per user) so a hit can't reveal that
+    somebody else sent the same prompt.
+    """
+    cache_data = {
+        "scope": scope,
+        "messages": messages,
+        "model": model,
+        **{name: params.get(name) for name in KEY_PARAMS},
+    }
+    cache_str = json.dumps(cache_data, sort_keys=True, default=str)
+    return f"chat_cache:{hashlib.sha256(cache_str.encode()).hexdigest()}"
+
+
 class ResponseCache:
     """
     Manages caching of chat completion responses.
 
-    Supports both exact matching and semantic similarity matching.
-    Can use Redis for distributed caching or in-memory for single instance.
+    Exact-match only. Can use Redis for distributed caching or in-memory for
+    single instance.
     """
 
     def __init__(
@@ -57,6 +106,7 @@ class ResponseCache:
         redis_url: str | None = None,
         default_ttl: int = 3600,  # OPTIMIZED: 60 minutes (was 30)
         max_cache_size: int = 20000,  # OPTIMIZED: 20k entries (was 10k)
+        max_cache_bytes: int = 64 * 1024 * 1024,
     ):
         """
         Initialize response cache.
@@ -65,13 +115,20 @@ class ResponseCache:
             redis_url: Redis connection URL (optional)
             default_ttl: Default cache TTL in seconds
             max_cache_size: Maximum number of entries in memory cache
+            max_cache_bytes: Maximum total serialized size of the memory cache
         """
         self.default_ttl = default_ttl
         self.max_cache_size = max_cache_size
+        self.max_cache_bytes = max_cache_bytes
+        # A single entry may not take more than this share of the budget
+        self.max_entry_bytes = max(1, max_cache_bytes // 16)
 
-        # In-memory cache as fallback
-        self._memory_cache: dict[str, CachedResponse] = {}
-        self._cache_order: list[str] = []  # For LRU eviction
+        # In-memory LRU: least recently used first
+        self._memory_cache: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._memory_bytes = 0
+
+        # Leaders of in-flight requests, for single-flight coalescing
+        self._inflight: dict[str, asyncio.Future] = {}
 
         # Redis client (if available)
         self._redis_client: redis.Redis | None = None
@@ -96,6 +153,8 @@ class ResponseCache:
             "misses": 0,
             "sets": 0,
             "evictions": 0,
+            "coalesced": 0,
+            "oversized": 0,
         }
 
     def _generate_cache_key(
@@ -119,31 +178,190 @@ class ResponseCache:
         Returns:
             Cache key string
         """
-        # Create a deterministic representation of the request
-        cache_data = {
-            "messages": messages,
-            "model": model,
-            "temperature": round(temperature, 2),
-            "max_tokens": max_tokens,
-            # Include other relevant parameters
-            "top_p": kwargs.get("top_p"),
-            "frequency_penalty": kwargs.get("frequency_penalty"),
-            "presence_penalty": kwargs.get("presence_penalty"),
-        }
-
-        # Generate hash
-        cache_str = json.dumps(cache_data, sort_keys=True)
-        cache_hash = hashlib.sha256(cache_str.encode()).hexdigest()
-
-        return f"chat_cache:{cache_hash}"
+        params = {**kwargs, "temperature": round(temperature, 2), "max_tokens": max_tokens}
+        return make_cache_key(messages, model, params, scope=kwargs.get("scope"))
 
     def _evict_lru(self):
         """Evict least recently used entry from memory cache"""
-        if self._cache_order:
-            oldest_key = self._cache_order.pop(0)
-            if oldest_key in self._memory_cache:
-                del self._memory_cache[oldest_key]
-                self._stats["evictions"] += 1
+        if self._memory_cache:
+            _, evicted = self._memory_cache.popitem(last=False)
+            self._memory_bytes -= evicted.size_bytes
+            self._stats["evictions"] += 1
+
+    def _drop(self, cache_key: str) -> None:
+        entry = self._memory_cache.pop(cache_key, None)
+        if entry is not None:
+            self._memory_bytes -= entry.size_bytes
+
+    def get_by_key(self, cache_key: str) -> dict[str, Any] | None:
+        """Cached response for ``cache_key``, or None.
+
+        Blocks on Redis; event-loop code uses :meth:`get_by_key_async`.
+        """
+        if self._redis_client:
+            cached = self._redis_get(cache_key)
+            if cached is not None:
+                self._stats["hits"] += 1
+                return cached
+        return self._memory_get(cache_key)
+
+    async def get_by_key_async(self, cache_key: str) -> dict[str, Any] | None:
+        """:meth:`get_by_key` for the event loop: the Redis read runs in a thread."""
+        if self._redis_client:
+            cached = await asyncio.to_thread(self._redis_get, cache_key)
+            if cached is not None:
+                self._stats["hits"] += 1
+                return cached
+        return self._memory_get(cache_key)
+
+    def set_by_key(
+        self,
+        cache_key: str,
+        response: dict[str, Any],
+        model: str,
+        ttl: int | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> bool:
+        """Cache ``response`` under ``cache_key``; False if it was too large to keep.
+
+        Blocks on Redis; event-loop code uses :meth:`set_by_key_async`.
+        """
+        ttl = ttl or self.default_ttl
+        created_at = time.time()
+        serialized_data = self._serialize(response, model, created_at)
+        if self._redis_client and self._redis_set(cache_key, serialized_data, ttl):
+            self._stats["sets"] += 1
+            return True
+        return self._memory_set(
+            cache_key, response, model, created_at, ttl, metadata, serialized_data
+        )
+
+    async def set_by_key_async(
+        self,
+        cache_key: str,
+        response: dict[str, Any],
+        model: str,
+        ttl: int | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> bool:
+        """:meth:`set_by_key` for the event loop: the Redis write runs in a thread."""
+        ttl = ttl or self.default_ttl
+        created_at = time.time()
+        serialized_data = self._serialize(response, model, created_at)
+        if self._redis_client and await asyncio.to_thread(
+            self._redis_set, cache_key, serialized_data, ttl
+        ):
+            self._stats["sets"] += 1
+            return True
+        return self._memory_set(
+            cache_key, response, model, created_at, ttl, metadata, serialized_data
+        )
+
+    @staticmethod
+    def _serialize(response: dict[str, Any], model: str, created_at: float) -> str:
+        return json.dumps(
+            {"response": response, "model": model, "created_at": created_at}, default=str
+        )
+
+    def _redis_get(self, cache_key: str) -> dict[str, Any] | None:
+        trace_cache_operation = _cache_tracer()
+        try:
+            with _span(trace_cache_operation, "cache.get", cache_key, "redis") as span:
+                cached_data = self._redis_client.get(cache_key)
+                # Set cache hit/miss after we know the result
+                if span:
+                    span.set_data("cache.hit", cached_data is not None)
+                    if cached_data:
+                        span.set_data("cache.item_size", len(cached_data))
+
+            if cached_data:
+                logger.debug(f"Cache HIT (Redis): {cache_key[:16]}...")
+                return json.loads(cached_data)["response"]
+        except Exception as e:
+            logger.warning(f"Redis get failed: {e}")
+        return None
+
+    def _redis_set(self, cache_key: str, serialized_data: str, ttl: int) -> bool:
+        trace_cache_operation = _cache_tracer()
+        try:
+            with _span(
+                trace_cache_operation,
+                "cache.put",
+                cache_key,
+                "redis",
+                item_size=len(serialized_data),
+                ttl=ttl,
+            ):
+                self._redis_client.setex(cache_key, ttl, serialized_data)
+            logger.debug(f"Cache SET (Redis): {cache_key[:16]}...")
+            return True
+        except Exception as e:
+            logger.warning(f"Redis set failed: {e}")
+            return False
+
+    def _memory_get(self, cache_key: str) -> dict[str, Any] | None:
+        trace_cache_operation = _cache_tracer()
+        result = None
+        with _span(trace_cache_operation, "cache.get", cache_key, "memory") as span:
+            cached = self._memory_cache.get(cache_key)
+            if cached is not None and cached.is_expired():
+                self._drop(cache_key)
+                logger.debug(f"Cache EXPIRED: {cache_key[:16]}...")
+                cached = None
+
+            if cached is not None:
+                self._memory_cache.move_to_end(cache_key)
+                cached.increment_hits()
+                self._stats["hits"] += 1
+                logger.debug(f"Cache HIT (memory): {cache_key[:16]}...")
+                result = cached.response
+            else:
+                self._stats["misses"] += 1
+                logger.debug(f"Cache MISS: {cache_key[:16]}...")
+
+            # Set cache hit/miss on span
+            if span:
+                span.set_data("cache.hit", result is not None)
+
+        return result
+
+    def _memory_set(
+        self,
+        cache_key: str,
+        response: dict[str, Any],
+        model: str,
+        created_at: float,
+        ttl: int,
+        metadata: dict[str, Any] | None,
+        serialized_data: str,
+    ) -> bool:
+        size = len(serialized_data)
+        if size > self.max_entry_bytes:
+            self._stats["oversized"] += 1
+            return False
+
+        trace_cache_operation = _cache_tracer()
+        with _span(trace_cache_operation, "cache.put", cache_key, "memory", ttl=ttl):
+            self._drop(cache_key)
+            while self._memory_cache and (
+                len(self._memory_cache) >= self.max_cache_size
+                or self._memory_bytes + size > self.max_cache_bytes
+            ):
+                self._evict_lru()
+
+            self._memory_cache[cache_key] = CachedResponse(
+                response=response,
+                model=model,
+                created_at=created_at,
+                ttl=ttl,
+                metadata=metadata,
+                size_bytes=size,
+            )
+            self._memory_bytes += size
+
+        self._stats["sets"] += 1
+        logger.debug(f"Cache SET (memory): {cache_key[:16]}...")
+        return True
 
     def get(
         self,
@@ -162,109 +380,7 @@ class ResponseCache:
         Returns:
             Cached response or None
         """
-        cache_key = self._generate_cache_key(messages, model, **kwargs)
-
-        # Import Sentry cache instrumentation
-        try:
-            from src.utils.sentry_insights import trace_cache_operation
-        except ImportError:
-            trace_cache_operation = None
-
-        # Try Redis first
-        if self._redis_client:
-            try:
-                # Wrap Redis get operation in Sentry span
-                cached_data = None
-                if trace_cache_operation:
-                    with trace_cache_operation(
-                        "cache.get",
-                        cache_key,
-                        cache_system="redis",
-                    ) as span:
-                        cached_data = self._redis_client.get(cache_key)
-                        # Set cache hit/miss after we know the result
-                        if span:
-                            span.set_data("cache.hit", cached_data is not None)
-                            if cached_data:
-                                span.set_data("cache.item_size", len(cached_data))
-                else:
-                    cached_data = self._redis_client.get(cache_key)
-
-                if cached_data:
-                    cached_response = json.loads(cached_data)
-                    self._stats["hits"] += 1
-                    logger.debug(f"Cache HIT (Redis): {cache_key[:16]}...")
-                    return cached_response["response"]
-            except Exception as e:
-                logger.warning(f"Redis get failed: {e}")
-
-        # Fall back to memory cache - wrap lookup in Sentry span
-        cache_hit = False
-        result = None
-
-        if trace_cache_operation:
-            with trace_cache_operation(
-                "cache.get",
-                cache_key,
-                cache_system="memory",
-            ) as span:
-                if cache_key in self._memory_cache:
-                    cached = self._memory_cache[cache_key]
-
-                    # Check expiration
-                    if cached.is_expired():
-                        del self._memory_cache[cache_key]
-                        if cache_key in self._cache_order:
-                            self._cache_order.remove(cache_key)
-                        self._stats["misses"] += 1
-                        logger.debug(f"Cache EXPIRED: {cache_key[:16]}...")
-                        cache_hit = False
-                    else:
-                        # Update LRU order
-                        if cache_key in self._cache_order:
-                            self._cache_order.remove(cache_key)
-                        self._cache_order.append(cache_key)
-
-                        cached.increment_hits()
-                        self._stats["hits"] += 1
-                        logger.debug(f"Cache HIT (memory): {cache_key[:16]}...")
-                        cache_hit = True
-                        result = cached.response
-                else:
-                    self._stats["misses"] += 1
-                    logger.debug(f"Cache MISS: {cache_key[:16]}...")
-                    cache_hit = False
-
-                # Set cache hit/miss on span
-                if span:
-                    span.set_data("cache.hit", cache_hit)
-
-            return result
-        else:
-            # No Sentry instrumentation
-            if cache_key in self._memory_cache:
-                cached = self._memory_cache[cache_key]
-
-                if cached.is_expired():
-                    del self._memory_cache[cache_key]
-                    if cache_key in self._cache_order:
-                        self._cache_order.remove(cache_key)
-                    self._stats["misses"] += 1
-                    logger.debug(f"Cache EXPIRED: {cache_key[:16]}...")
-                    return None
-
-                if cache_key in self._cache_order:
-                    self._cache_order.remove(cache_key)
-                self._cache_order.append(cache_key)
-
-                cached.increment_hits()
-                self._stats["hits"] += 1
-                logger.debug(f"Cache HIT (memory): {cache_key[:16]}...")
-                return cached.response
-
-            self._stats["misses"] += 1
-            logger.debug(f"Cache MISS: {cache_key[:16]}...")
-            return None
+        return self.get_by_key(self._generate_cache_key(messages, model, **kwargs))
 
     def set(
         self,
@@ -285,87 +401,61 @@ class ResponseCache:
             **kwargs: Additional parameters
         """
         cache_key = self._generate_cache_key(messages, model, **kwargs)
-        ttl = ttl or self.default_ttl
+        self.set_by_key(cache_key, response, model, ttl=ttl, metadata=kwargs.get("metadata"))
 
-        cached_response = CachedResponse(
-            response=response,
-            model=model,
-            created_at=time.time(),
-            ttl=ttl,
-            metadata=kwargs.get("metadata"),
-        )
+    def inflight(self, cache_key: str) -> asyncio.Future | None:
+        """Future of the in-flight leader for ``cache_key``, if there is one."""
+        return self._inflight.get(cache_key)
 
-        # Import Sentry cache instrumentation
-        try:
-            from src.utils.sentry_insights import trace_cache_operation
-        except ImportError:
-            trace_cache_operation = None
+    async def single_flight(
+        self,
+        cache_key: str,
+        fetch: Callable[[], Awaitable[tuple[dict[str, Any], bool]]],
+        model: str,
+        ttl: int | None = None,
+    ) -> tuple[dict[str, Any], bool]:
+        """
+        Cached response for ``cache_key``, fetching it at most once at a time.
 
-        # Try Redis first
-        if self._redis_client:
+        ``fetch`` returns ``(response, cacheable)``. Concurrent callers with the
+        same key wait for the first caller's fetch instead of making their own.
+        Returns ``(response, hit)`` where ``hit`` is True when this caller did
+        not fetch. If the leader fails, each waiter fetches for itself.
+        """
+        cached = await self.get_by_key_async(cache_key)
+        if cached is not None:
+            return cached, True
+
+        leader = self._inflight.get(cache_key)
+        if leader is not None:
             try:
-                cache_data = {
-                    "response": response,
-                    "model": model,
-                    "created_at": cached_response.created_at,
-                }
-                serialized_data = json.dumps(cache_data)
-
-                # Wrap Redis setex operation in Sentry span
-                if trace_cache_operation:
-                    with trace_cache_operation(
-                        "cache.put",
-                        cache_key,
-                        item_size=len(serialized_data),
-                        ttl=ttl,
-                        cache_system="redis",
-                    ):
-                        self._redis_client.setex(
-                            cache_key,
-                            ttl,
-                            serialized_data,
-                        )
-                else:
-                    self._redis_client.setex(
-                        cache_key,
-                        ttl,
-                        serialized_data,
-                    )
+                response = await asyncio.shield(leader)
+                self._stats["coalesced"] += 1
+                return response, True
+            except Exception:
+                pass  # the leader failed; fetch for ourselves
 
-                self._stats["sets"] += 1
-                logger.debug(f"Cache SET (Redis): {cache_key[:16]}...")
-                return
-            except Exception as e:
-                logger.warning(f"Redis set failed: {e}")
+            response, _ = await fetch()
+            return response, False
 
-        # Fall back to memory cache - wrap in Sentry span
-        if trace_cache_operation:
-            with trace_cache_operation(
-                "cache.put",
-                cache_key,
-                ttl=ttl,
-                cache_system="memory",
-            ):
-                # Evict if at capacity
-                if len(self._memory_cache) >= self.max_cache_size:
-                    self._evict_lru()
-
-                self._memory_cache[cache_key] = cached_response
-                if cache_key in self._cache_order:
-                    self._cache_order.remove(cache_key)
-                self._cache_order.append(cache_key)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            response, cacheable = await fetch()
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e if isinstance(e, Exception) else RuntimeError(str(e)))
+                # Nobody may be waiting; don't log "exception never retrieved"
+                future.exception()
+            raise
         else:
-            # Evict if at capacity
-            if len(self._memory_cache) >= self.max_cache_size:
-                self._evict_lru()
-
-            self._memory_cache[cache_key] = cached_response
-            if cache_key in self._cache_order:
-                self._cache_order.remove(cache_key)
-            self._cache_order.append(cache_key)
-
-        self._stats["sets"] += 1
-        logger.debug(f"Cache SET (memory): {cache_key[:16]}...")
+            # Wake the waiters before the (possibly remote) cache write
+            future.set_result(response)
+            if cacheable:
+                await self.set_by_key_async(cache_key, response, model, ttl=ttl)
+            return response, False
+        finally:
+            self._inflight.pop(cache_key, None)
 
     def should_cache(
         self,
@@ -408,7 +498,7 @@ class ResponseCache:
     def clear(self):
         """Clear all cached entries"""
         self._memory_cache.clear()
-        self._cache_order.clear()
+        self._memory_bytes = 0
 
         if self._redis_client:
             try:
@@ -440,8 +530,12 @@ class ResponseCache:
             "misses": self._stats["misses"],
             "sets": self._stats["sets"],
             "evictions": self._stats["evictions"],
+            "coalesced": self._stats["coalesced"],
+            "oversized": self._stats["oversized"],
             "hit_rate_percent": round(hit_rate, 2),
             "memory_cache_size": len(self._memory_cache),
+            "memory_cache_bytes": self._memory_bytes,
+            "inflight": len(self._inflight),
             "redis_connected": self._redis_client is not None,
         }
 
@@ -450,37 +544,53 @@ class ResponseCache:
         expired_keys = [key for key, cached in self._memory_cache.items() if cached.is_expired()]
 
         for key in expired_keys:
-            del self._memory_cache[key]
-            if key in self._cache_order:
-                self._cache_order.remove(key)
+            self._drop(key)
 
         if expired_keys:
             logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
 
 
+def _cache_tracer():
+    # Import Sentry cache instrumentation
+    try:
+        from src.utils.sentry_insights import trace_cache_operation
+    except ImportError:
+        return None
+    return trace_cache_operation
+
+
+def _span(trace_cache_operation, op: str, cache_key: str, cache_system: str, **kwargs):
+    if trace_cache_operation is None:
+        return nullcontext()
+    return trace_cache_operation(op, cache_key, cache_system=cache_system, **kwargs)
+
+
 # Global cache instance
 _cache: ResponseCache | None = None
 
 
 def get_cache(
     redis_url: str | None = None,
-    default_ttl: int = 3600,  # OPTIMIZED: 60 minutes (was 30)
+    default_ttl: int | None = None,
 ) -> ResponseCache:
     """
     Get or create global cache instance.
 
     Args:
         redis_url: Redis connection URL (optional)
-        default_ttl: Default TTL in seconds
+        default_ttl: Default TTL in seconds (Config.RESPONSE_CACHE_TTL_SECONDS if omitted)
 
     Returns:
         ResponseCache instance
     """
     global _cache
     if _cache is None:
+        from src.config import Config
+
         _cache = ResponseCache(
             redis_url=redis_url,
-            default_ttl=default_ttl,
+            default_ttl=default_ttl or Config.RESPONSE_CACHE_TTL_SECONDS,
+            max_cache_bytes=Config.RESPONSE_CACHE_MAX_BYTES,
         )
     return _cache
 
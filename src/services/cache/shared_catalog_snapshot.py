@@ -0,0 +1,191 @@
+"""
+Catalog snapshot shared by the workers of one container.
+
+In multi-worker mode the local catalog tier (``get_local_catalog`` /
+``set_local_catalog``) is backed by one file per cache key (on ``/dev/shm`` by
+default), so a catalog fetched from Redis or the database by one worker is
+available to the others without each of them fetching and caching it again.
+
+Each file is a :class:`~src.services.cache.snapshot_file.SnapshotFile` with a
+single ``catalog`` section whose index entry carries the epoch, fresh-until
+and stale-until it was written with. A writer replaces only its own key's file
+under an ``flock``; the others are untouched.
+
+Every worker keeps one decoded copy per key, for the epoch it was last read
+under. It checks at most every ``_RECHECK_SECONDS`` whether the file was
+replaced and decodes it again only then, so a hit costs a ``stat`` at most,
+never a parse of the whole catalog.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any
+
+from src.services.cache.snapshot_file import SnapshotFile
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GWCATSNAP"
+# Bump when the stored catalog's shape changes; older files are then ignored
+SCHEMA_VERSION = 1
+_SECTION = "catalog"
+
+# How often a reader checks whether a key's file was replaced
+_RECHECK_SECONDS = 1.0
+# An unchanged-epoch entry is not rewritten more often than this; every Redis
+# hit re-offers the catalog, and rewriting the file each time would be wasteful
+_MIN_REWRITE_SECONDS = 60.0
+
+
+class _Entry:
+    """A worker's view of one key's file: its identity, index entry and decoded catalog."""
+
+    __slots__ = ("file_id", "meta", "catalog", "checked_at")
+
+    def __init__(
+        self,
+        file_id: tuple[int, int, int] | None,
+        meta: dict[str, Any] | None,
+        catalog: list[dict] | None,
+    ):
+        self.file_id = file_id
+        self.meta = meta
+        self.catalog = catalog
+        self.checked_at = time.monotonic()
+
+
+def _usable(meta: dict[str, Any] | None, epoch: int, now: float) -> bool:
+    return meta is not None and meta["epoch"] == epoch and now < meta["stale_until"]
+
+
+class SharedCatalogSnapshot:
+    """Memory-mapped, multi-process catalog store keyed by cache key."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._files: dict[str, SnapshotFile] = {}
+        self._entries: dict[str, _Entry] = {}
+
+    def get(self, key: str, epoch: int) -> tuple[list[dict] | None, bool]:
+        """
+        Catalog stored under ``key`` and whether it is stale.
+
+        Entries written under another epoch, or past their stale window, are
+        misses.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.checked_at >= _RECHECK_SECONDS:
+                entry = self._check(key, entry, epoch)
+            if entry.catalog is None and _usable(entry.meta, epoch, now):
+                # The file was last read while another epoch was current
+                entry = self._load(key, epoch)
+            if not _usable(entry.meta, epoch, now):
+                # Superseded or expired: don't keep the decoded copy around
+                entry.catalog = None
+                return None, False
+            catalog = entry.catalog
+            is_stale = now >= entry.meta["fresh_until"]
+        if catalog is None:
+            return None, False
+        return catalog, is_stale
+
+    def put(
+        self,
+        key: str,
+        catalog: list[dict],
+        epoch: int,
+        ttl: float,
+        stale_ttl: float,
+    ) -> bool:
+        """Store ``catalog`` under ``key``; False if an equivalent entry is recent enough."""
+        now = time.time()
+        file = self._file(key)
+        if self._is_recent(file, epoch, ttl, now):
+            return False
+
+        payload = json.dumps(catalog, separators=(",", ":"), default=str).encode()
+        meta = {
+            "epoch": epoch,
+            "written_at": now,
+            "fresh_until": now + ttl,
+            "stale_until": now + ttl + stale_ttl,
+        }
+        try:
+            with file.lock():
+                # Another worker may have stored it while this one encoded
+                if self._is_recent(file, epoch, ttl, now):
+                    return False
+                file.write({_SECTION: meta}, {_SECTION: payload})
+                file_id = file.file_id()
+        except OSError as e:
+            logger.warning(f"Catalog snapshot write failed ({file.path}): {e}")
+            return False
+
+        with self._lock:
+            self._entries[key] = _Entry(file_id, meta, catalog)
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _file(self, key: str) -> SnapshotFile:
+        file = self._files.get(key)
+        if file is None:
+            name = re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+            file = SnapshotFile(f"{self.path}.{name}", MAGIC, SCHEMA_VERSION)
+            self._files[key] = file
+        return file
+
+    def _is_recent(self, file: SnapshotFile, epoch: int, ttl: float, now: float) -> bool:
+        with file.mapped() as (_, index):
+            meta = index.get(_SECTION)
+        return (
+            meta is not None
+            and meta["epoch"] == epoch
+            and now - meta["written_at"] < min(_MIN_REWRITE_SECONDS, ttl)
+        )
+
+    def _check(self, key: str, entry: _Entry | None, epoch: int) -> _Entry:
+        if entry is not None and self._file(key).file_id() == entry.file_id:
+            entry.checked_at = time.monotonic()
+            return entry
+        return self._load(key, epoch)
+
+    def _load(self, key: str, epoch: int) -> _Entry:
+        """Re-read ``key``'s file, decoding the catalog only if ``epoch`` can use it."""
+        file = self._file(key)
+        file_id = file.file_id()
+        catalog = None
+        with file.mapped() as (mapped, index):
+            meta = index.get(_SECTION)
+            if _usable(meta, epoch, time.time()):
+                blob = file.section(mapped, _SECTION, meta)
+                if blob is None:
+                    meta = None
+                else:
+                    catalog = json.loads(blob)
+        entry = _Entry(file_id, meta, catalog)
+        self._entries[key] = entry
+        return entry
+
+
+_snapshot: SharedCatalogSnapshot | None = None
+
+
+def get_shared_catalog_snapshot() -> SharedCatalogSnapshot:
+    """Process-wide handle on ``Config.CATALOG_SNAPSHOT_PATH``."""
+    global _snapshot
+    if _snapshot is None:
+        from src.config import Config
+
+        _snapshot = SharedCatalogSnapshot(Config.CATALOG_SNAPSHOT_PATH)
+    return _snapshot
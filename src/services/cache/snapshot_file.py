@@ -0,0 +1,123 @@
+"""
+Memory-mapped section files shared by the boot and catalog snapshots.
+
+File layout::
+
+    MAGIC | u16 schema version | u32 index length | index JSON | section blobs
+
+Each section is a compact JSON blob; the index records its offset (from the
+end of the index), length and CRC32, plus whatever metadata the owner keeps
+with it (write time, epoch, ...). Writers rebuild the file under an ``flock``
+and ``os.replace`` it into place, so a reader never sees a torn file. Files
+with another magic or schema version are ignored.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from contextlib import contextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">HI")
+
+
+class SnapshotFile:
+    """One section file at ``path``, identified by ``magic`` and ``schema_version``."""
+
+    def __init__(self, path: str, magic: bytes, schema_version: int):
+        self.path = path
+        self.magic = magic
+        self.schema_version = schema_version
+        self._lock_path = f"{path}.lock"
+        self._header_size = len(magic) + _HEADER.size
+
+    def file_id(self) -> tuple[int, int, int] | None:
+        """Identity of the current file (changes on every rewrite), or None if absent."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    @contextmanager
+    def mapped(self):
+        """Yield ``(mapping, index)``; an empty index when there is no usable file."""
+        try:
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            yield b"", {}
+            return
+        try:
+            index = self._read_index(mapped)
+            if index is None:
+                logger.warning(f"Snapshot {self.path} is corrupt or outdated; ignoring it")
+                index = {}
+            yield mapped, index
+        finally:
+            mapped.close()
+
+    def section(self, mapped: mmap.mmap, name: str, meta: dict[str, Any]) -> bytes | None:
+        """Raw blob of section ``name``, or None if it fails its checksum."""
+        blob = mapped[meta["offset"] : meta["offset"] + meta["length"]]
+        if zlib.crc32(blob) != meta["crc"]:
+            logger.warning(f"Snapshot {self.path} section {name!r} failed its checksum")
+            return None
+        return blob
+
+    def write(self, entries: dict[str, dict[str, Any]], blobs: dict[str, bytes]) -> None:
+        """Replace the file with ``blobs``; ``entries`` holds each section's metadata.
+
+        Hold :meth:`lock` when other processes may write the same file.
+        """
+        offset = 0
+        for name, meta in entries.items():
+            meta.update(offset=offset, length=len(blobs[name]), crc=zlib.crc32(blobs[name]))
+            offset += len(blobs[name])
+        index = json.dumps(entries, separators=(",", ":")).encode()
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.magic)
+            f.write(_HEADER.pack(self.schema_version, len(index)))
+            f.write(index)
+            for name in entries:
+                f.write(blobs[name])
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def lock(self):
+        """Exclusive cross-process lock for read-modify-write cycles."""
+        import fcntl
+
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _read_index(self, mapped: mmap.mmap) -> dict[str, dict[str, Any]] | None:
+        magic = self.magic
+        if len(mapped) < self._header_size or mapped[: len(magic)] != magic:
+            return None
+        version, index_len = _HEADER.unpack(mapped[len(magic) : self._header_size])
+        if version != self.schema_version:
+            return None
+        try:
+            index = json.loads(mapped[self._header_size : self._header_size + index_len])
+        except ValueError:
+            return None
+        data_start = self._header_size + index_len
+        for meta in index.values():
+            meta["offset"] += data_start
+            if meta["offset"] + meta["length"] > len(mapped):
+                return None
+        return index
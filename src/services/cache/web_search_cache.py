@@ -0,0 +1,250 @@
+"""Result cache for the Tavily-backed ``web_search`` tool.
+
+Auto web search (``routes/chat.py``) fires for trending, time-sensitive queries,
+so many users ask the same question within seconds of each other. Without a
+cache every one of them pays the full Tavily round-trip (capped at 5s by the
+chat route's ``wait_for``).
+
+Layers:
+- In-process LRU keyed by the normalized query plus every parameter that
+  changes the answer (depth, max_results, include_answer, domain filters).
+  TTL depends on ``search_depth``.
+- Redis, for HOT entries only: once a key has been served locally
+  ``HOT_HIT_THRESHOLD`` times it is published so other workers/instances can
+  skip the upstream call too. Cold one-off queries are never written to Redis,
+  but every local miss costs one pipelined Redis read (GET + TTL) to check
+  whether another worker already published the key.
+- Single-flight: identical concurrent searches share one upstream call. The
+  shared call is shielded, so a waiter that gives up (timeout, client
+  disconnect) does not cancel it for everyone else — and the result still lands
+  in the cache.
+
+Only successful results are cached; errors (rate limit, timeout, bad key) are
+returned to the caller and retried on the next request.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from src.config.config import Config
+from src.services.tools.base import ToolResult
+
+logger = logging.getLogger(__name__)
+
+WEB_SEARCH_REDIS_PREFIX = "web_search:"
+
+# Number of local hits after which an entry is considered hot and shared via Redis.
+HOT_HIT_THRESHOLD = 2
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT = " ?!.,;:"
+
+# key -> (expires_at, payload, hits)
+_local_cache: "OrderedDict[str, tuple[float, dict[str, Any], int]]" = OrderedDict()
+_inflight: dict[str, asyncio.Task] = {}
+
+_stats = {"hits": 0, "redis_hits": 0, "misses": 0, "coalesced": 0, "promotions": 0}
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a key."""
+    normalized = _WHITESPACE_RE.sub(" ", query.strip().lower())
+    return normalized.rstrip(_TRAILING_PUNCT)
+
+
+def ttl_for_depth(search_depth: str) -> int:
+    """Return the cache TTL (seconds) for a Tavily search depth."""
+    if search_depth == "advanced":
+        return Config.WEB_SEARCH_CACHE_TTL_ADVANCED
+    return Config.WEB_SEARCH_CACHE_TTL_BASIC
+
+
+def build_cache_key(
+    query: str,
+    search_depth: str = "basic",
+    max_results: int = 5,
+    include_answer: bool = True,
+    include_domains: list[str] | None = None,
+    exclude_domains: list[str] | None = None,
+) -> str:
+    """Build the cache key for a search. The depth stays readable in the key."""
+    fingerprint = json.dumps(
+        [
+            normalize_query(query),
+            int(max_results),
+            bool(include_answer),
+            sorted(d.lower() for d in include_domains or []),
+            sorted(d.lower() for d in exclude_domains or []),
+        ],
+        separators=(",", ":"),
+    )
+    digest = hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+    return f"{search_depth}:{digest}"
+
+
+def _to_result(payload: dict[str, Any], source: str) -> ToolResult:
+    metadata = dict(payload.get("metadata") or {})
+    metadata["cached"] = True
+    metadata["cache_source"] = source
+    return ToolResult(success=True, result=payload.get("result"), metadata=metadata)
+
+
+def _get_local(key: str) -> dict[str, Any] | None:
+    entry = _local_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, payload, hits = entry
+    if expires_at <= time.monotonic():
+        _local_cache.pop(key, None)
+        return None
+    _local_cache[key] = (expires_at, payload, hits + 1)
+    _local_cache.move_to_end(key)
+    if hits + 1 == HOT_HIT_THRESHOLD:
+        _schedule_promotion(key, payload, expires_at)
+    return payload
+
+
+def _set_local(key: str, payload: dict[str, Any], ttl: float) -> None:
+    _local_cache[key] = (time.monotonic() + ttl, payload, 0)
+    _local_cache.move_to_end(key)
+    while len(_local_cache) > Config.WEB_SEARCH_CACHE_MAX_ENTRIES:
+        _local_cache.popitem(last=False)
+
+
+def _get_redis_client():
+    try:
+        from src.config.redis_config import get_redis_client
+
+        return get_redis_client()
+    except Exception as e:
+        logger.debug(f"Web search cache: Redis unavailable: {e}")
+        return None
+
+
+def _schedule_promotion(key: str, payload: dict[str, Any], expires_at: float) -> None:
+    """Publish a hot entry to Redis without blocking the caller."""
+    remaining = int(expires_at - time.monotonic())
+    if remaining <= 0:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.create_task(_promote(key, payload, remaining))
+
+
+async def _promote(key: str, payload: dict[str, Any], ttl: int) -> None:
+    client = _get_redis_client()
+    if client is None:
+        return
+    try:
+        await asyncio.to_thread(
+            client.setex, f"{WEB_SEARCH_REDIS_PREFIX}{key}", ttl, json.dumps(payload)
+        )
+        _stats["promotions"] += 1
+    except Exception as e:
+        logger.debug(f"Web search cache: failed to publish hot entry: {e}")
+
+
+async def _get_shared(key: str) -> tuple[dict[str, Any], int] | None:
+    """Look up a hot entry published by another worker. Returns (payload, ttl)."""
+    client = _get_redis_client()
+    if client is None:
+        return None
+    redis_key = f"{WEB_SEARCH_REDIS_PREFIX}{key}"
+
+    def read() -> list[Any]:
+        pipe = client.pipeline(transaction=False)
+        pipe.get(redis_key)
+        pipe.ttl(redis_key)
+        return pipe.execute()
+
+    try:
+        raw, ttl = await asyncio.to_thread(read)
+    except Exception as e:
+        logger.debug(f"Web search cache: Redis lookup failed: {e}")
+        return None
+    if not raw:
+        return None
+    try:
+        return json.loads(raw), max(int(ttl or 0), 1)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _load(
+    key: str, search_depth: str, fetch: Callable[[], Awaitable[ToolResult]]
+) -> ToolResult:
+    shared = await _get_shared(key)
+    if shared is not None:
+        payload, ttl = shared
+        _stats["redis_hits"] += 1
+        _set_local(key, payload, ttl)
+        return _to_result(payload, "redis")
+
+    _stats["misses"] += 1
+    result = await fetch()
+    if result.success and result.result is not None:
+        _set_local(
+            key,
+            {"result": result.result, "metadata": dict(result.metadata)},
+            ttl_for_depth(search_depth),
+        )
+    return result
+
+
+async def get_or_fetch(
+    key: str, search_depth: str, fetch: Callable[[], Awaitable[ToolResult]]
+) -> ToolResult:
+    """Serve a search from cache, join an in-flight identical search, or run ``fetch``.
+
+    Args:
+        key: Key from :func:`build_cache_key`
+        search_depth: Tavily search depth (selects the TTL)
+        fetch: Coroutine factory performing the upstream search
+
+    Returns:
+        ToolResult (``metadata["cached"]`` is True when served from cache)
+    """
+    if not Config.WEB_SEARCH_CACHE_ENABLED:
+        return await fetch()
+
+    payload = _get_local(key)
+    if payload is not None:
+        _stats["hits"] += 1
+        return _to_result(payload, "memory")
+
+    task = _inflight.get(key)
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        _stats["coalesced"] += 1
+    else:
+        task = asyncio.create_task(_load(key, search_depth, fetch))
+        _inflight[key] = task
+
+        def _done(t: asyncio.Task, _key: str = key) -> None:
+            if _inflight.get(_key) is t:
+                _inflight.pop(_key, None)
+
+        task.add_done_callback(_done)
+
+    return await asyncio.shield(task)
+
+
+def clear_web_search_cache() -> None:
+    """Drop all local entries and in-flight bookkeeping (tests, admin tooling)."""
+    _local_cache.clear()
+    _inflight.clear()
+    for stat in _stats:
+        _stats[stat] = 0
+
+
+def get_web_search_cache_stats() -> dict[str, Any]:
+    """Return cache counters for monitoring."""
+    return {**_stats, "size": len(_local_cache), "inflight": len(_inflight)}
@@ -129,24 +129,28 @@ class CircuitBreaker:
             if not redis:
                 return False
 
-            state_str = redis.get(self._get_redis_key("state"))
+            # One MGET instead of a GET per field
+            state_str, failure_count, success_count, opened_at, consecutive_opens = redis.mget(
+                [
+                    self._get_redis_key(suffix)
+                    for suffix in (
+                        "state",
+                        "failure_count",
+                        "success_count",
+                        "opened_at",
+                        "consecutive_opens",
+                    )
+                ]
+            )
             if state_str:
                 # Redis client has decode_responses=True, so state_str is already a string
                 self._state = CircuitState(state_str)
-
-            failure_count = redis.get(self._get_redis_key("failure_count"))
             if failure_count:
                 self._failure_count = int(failure_count)
-
-            success_count = redis.get(self._get_redis_key("success_count"))
             if success_count:
                 self._success_count = int(success_count)
-
-            opened_at = redis.get(self._get_redis_key("opened_at"))
             if opened_at:
                 self._opened_at = float(opened_at)
-
-            consecutive_opens = redis.get(self._get_redis_key("consecutive_opens"))
             if consecutive_opens:
                 self._consecutive_opens = int(consecutive_opens)
 
@@ -524,6 +524,18 @@ def get_openai_pooled_client() -> OpenAI:
     )
 
 
+def get_openai_pooled_async_client() -> AsyncOpenAI:
+    """Get pooled async client for OpenAI direct API (see get_openai_pooled_client)."""
+    if not Config.OPENAI_API_KEY:
+        raise ValueError("OpenAI API key not configured")
+
+    return get_pooled_async_client(
+        provider="openai",
+        base_url="https://api.openai.com/v1",
+        api_key=Config.OPENAI_API_KEY,
+    )
+
+
 def get_anthropic_pooled_client() -> OpenAI:
     """Get pooled client for Anthropic direct API (OpenAI-compatible endpoint).
 
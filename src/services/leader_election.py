@@ -0,0 +1,205 @@
+"""
+Cluster-wide leader election for background jobs.
+
+Catalog sync, price refresh, ledger reconciliation, the drift monitor, health
+probing and the catalog/router-snapshot refreshers must run once per cluster,
+not once per uvicorn worker. In multi-worker mode (``Config.WORKERS > 1``)
+every worker runs a :class:`LeaderElector`; the one holding the Redis lease
+``gw:leader:<name>`` runs those jobs and the rest stand by.
+
+The lease is a plain ``SET NX PX`` key whose value identifies the holder.
+Renewal and release go through compare-and-set scripts so a worker can never
+extend or delete a lease that has already passed to someone else. A holder
+that cannot reach Redis to renew steps down immediately; the lease then
+expires after ``Config.LEADER_LEASE_TTL_SECONDS`` and another worker takes
+over, so a job never runs on two leaders for longer than one renew interval.
+
+Without a Redis client the lease falls back to an exclusive ``flock`` on a
+local file: still one leader per container, which is what single-container
+deployments need.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import tempfile
+import uuid
+from collections.abc import Awaitable, Callable
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY_PREFIX = "gw:leader:"
+
+# Only the holder may extend or drop its lease
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _default_client():
+    from src.config.redis_config import get_redis_client
+
+    return get_redis_client()
+
+
+class LeaderLease:
+    """A renewable, holder-checked lease on ``gw:leader:<name>``."""
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        client_factory: Callable[[], object | None] = _default_client,
+        lock_dir: str | None = None,
+    ):
+        self.name = name
+        self.key = f"{LEADER_KEY_PREFIX}{name}"
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.held = False
+        self._client_factory = client_factory
+        self._lock_path = os.path.join(lock_dir or tempfile.gettempdir(), f"gatewayz-{name}.lock")
+        self._lock_fd: int | None = None
+
+    def try_acquire(self) -> bool:
+        """Acquire the lease, or renew it if already held. Returns whether it is held."""
+        client = self._client_factory()
+        if client is None:
+            self.held = self._try_local_lock()
+            return self.held
+
+        try:
+            # A worker that stepped down on a failed renewal may still own the
+            # key; renewing takes it back without waiting for it to expire.
+            self.held = bool(
+                (not self.held and client.set(self.key, self.owner, nx=True, px=self.ttl_ms))
+                or client.eval(_RENEW_SCRIPT, 1, self.key, self.owner, self.ttl_ms)
+            )
+        except Exception as e:
+            # Can't confirm the lease, so step down rather than risk two leaders
+            logger.warning(f"[Leader] Lease {self.key} check failed: {e}")
+            self.held = False
+        return self.held
+
+    def release(self) -> None:
+        """Give the lease up so another worker can take over without waiting for expiry."""
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # closing drops the flock
+            self._lock_fd = None
+        if self.held:
+            client = self._client_factory()
+            if client is not None:
+                try:
+                    client.eval(_RELEASE_SCRIPT, 1, self.key, self.owner)
+                except Exception as e:
+                    logger.debug(f"[Leader] Lease {self.key} release failed: {e}")
+        self.held = False
+
+    def _try_local_lock(self) -> bool:
+        if self._lock_fd is not None:
+            return True
+        import fcntl
+
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+
+class LeaderElector:
+    """Keeps trying for the lease and runs callbacks on gaining or losing it."""
+
+    def __init__(
+        self,
+        lease: LeaderLease,
+        on_elected: Callable[[], Awaitable[None]],
+        on_deposed: Callable[[], Awaitable[None]],
+        interval: float,
+    ):
+        self.lease = lease
+        self.on_elected = on_elected
+        self.on_deposed = on_deposed
+        self.interval = interval
+        self.is_leader = False
+
+    async def step(self) -> None:
+        """One acquire/renew round."""
+        held = await asyncio.to_thread(self.lease.try_acquire)
+        if held and not self.is_leader:
+            self.is_leader = True
+            logger.info(f"[Leader] {self.lease.owner} elected for {self.lease.key}")
+            await self._run(self.on_elected, "start")
+        elif self.is_leader and not held:
+            self.is_leader = False
+            logger.warning(f"[Leader] {self.lease.owner} lost {self.lease.key}")
+            await self._run(self.on_deposed, "stop")
+
+    async def run(self) -> None:
+        while True:
+            await self.step()
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        """Stop the leader-only jobs (if running here) and release the lease."""
+        if self.is_leader:
+            self.is_leader = False
+            await self._run(self.on_deposed, "stop")
+        await asyncio.to_thread(self.lease.release)
+
+    async def _run(self, callback: Callable[[], Awaitable[None]], action: str) -> None:
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"[Leader] Failed to {action} leader jobs: {e}", exc_info=True)
+
+
+_elector: LeaderElector | None = None
+_elector_task: asyncio.Task | None = None
+
+
+def start_leader_election(
+    on_elected: Callable[[], Awaitable[None]],
+    on_deposed: Callable[[], Awaitable[None]],
+    name: str = "background-jobs",
+) -> None:
+    """Start competing for leadership. Call during application startup."""
+    global _elector, _elector_task
+
+    ttl = Config.LEADER_LEASE_TTL_SECONDS
+    _elector = LeaderElector(LeaderLease(name, ttl), on_elected, on_deposed, interval=ttl / 3)
+    _elector_task = asyncio.get_running_loop().create_task(_elector.run(), name="leader_election")
+    logger.info(f"[Leader] Election started for {LEADER_KEY_PREFIX}{name} (lease {ttl}s)")
+
+
+async def stop_leader_election() -> None:
+    """Stop competing, stopping leader jobs first if this worker runs them."""
+    global _elector, _elector_task
+
+    if _elector_task is not None:
+        _elector_task.cancel()
+        try:
+            await _elector_task
+        except asyncio.CancelledError:
+            pass
+        _elector_task = None
+    if _elector is not None:
+        await _elector.stop()
+        _elector = None
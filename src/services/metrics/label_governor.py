@@ -0,0 +1,230 @@
+"""
+Cardinality governor for the ``model`` Prometheus label.
+
+Every provider/model metric multiplies series by the number of distinct models.
+With a catalog of 10k+ models the registry grows without bound, and both the
+``/metrics`` scrape and the remote-write serializer (which walks the whole
+registry every flush) slow down with it.
+
+:class:`ModelLabelGovernor` keeps exact series for the top-K models by recent
+traffic and folds the long tail into ``model="other"``. Traffic is counted on
+every ``labels()`` call and re-ranked every ``rerank_seconds`` with exponential
+decay, so a model that becomes popular is promoted at the next re-rank and a
+model that goes quiet is demoted. The series of a demoted model are removed
+from every governed metric, which is what actually bounds the registry.
+
+While fewer than K distinct models have been seen, every model is admitted on
+first sight, so small deployments never see ``other``.
+
+Metrics opt in through one wrapper, :class:`GovernedMetric`, which is a drop-in
+for the wrapped collector: call sites keep using ``.labels(...)``.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+OTHER_MODEL_LABEL = "other"
+
+# Weight kept by last window's score at each re-rank
+_DECAY = 0.5
+
+# Scores below this are dropped so the candidate table doesn't keep every model
+# ever seen
+_MIN_SCORE = 0.5
+
+
+class ModelLabelGovernor:
+    """Decides which model names keep their own series."""
+
+    def __init__(
+        self,
+        top_k: int,
+        rerank_seconds: float,
+        enabled: bool = True,
+        on_rerank: Callable[["ModelLabelGovernor"], None] | None = None,
+    ):
+        self.top_k = max(1, top_k)
+        self.rerank_seconds = rerank_seconds
+        self.enabled = enabled
+        self._on_rerank = on_rerank
+
+        self._lock = threading.Lock()
+        self._admitted: set[str] = set()
+        self._window: dict[str, int] = {}
+        self._scores: dict[str, float] = {}
+        self._metrics: list[GovernedMetric] = []
+        self._next_rerank = time.monotonic() + rerank_seconds
+
+        self.folded = 0
+        self.reranks = 0
+        self.demotions = 0
+
+    # Bound on distinct names counted per window. Long-tail names beyond it
+    # still fold into "other"; they just can't be promoted this window.
+    @property
+    def _max_candidates(self) -> int:
+        return self.top_k * 20
+
+    def register(self, metric: "GovernedMetric") -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def resolve(self, model: str) -> str:
+        """Count one observation for ``model`` and return the label to use."""
+        if not self.enabled:
+            return model
+
+        rerank_due = False
+        with self._lock:
+            if model in self._window or len(self._window) < self._max_candidates:
+                self._window[model] = self._window.get(model, 0) + 1
+
+            if model in self._admitted:
+                label = model
+            elif len(self._admitted) < self.top_k:
+                self._admitted.add(model)
+                label = model
+            else:
+                self.folded += 1
+                label = OTHER_MODEL_LABEL
+
+            if time.monotonic() >= self._next_rerank:
+                self._next_rerank = time.monotonic() + self.rerank_seconds
+                rerank_due = True
+
+        if rerank_due:
+            self.rerank()
+        return label
+
+    def rerank(self) -> None:
+        """Re-rank models by decayed traffic and drop series of demoted models."""
+        with self._lock:
+            scores = {m: s * _DECAY for m, s in self._scores.items()}
+            for model, count in self._window.items():
+                scores[model] = scores.get(model, 0.0) + count
+            self._scores = {m: s for m, s in scores.items() if s >= _MIN_SCORE}
+            self._window = {}
+
+            # Incumbents win ties so equal traffic doesn't churn series
+            ranked = sorted(
+                self._scores,
+                key=lambda m: (self._scores[m], m in self._admitted),
+                reverse=True,
+            )
+            admitted = set(ranked[: self.top_k])
+            demoted = self._admitted - admitted
+            self._admitted = admitted
+            metrics = list(self._metrics)
+            self.reranks += 1
+            self.demotions += len(demoted)
+
+        if demoted:
+            for metric in metrics:
+                metric.remove_models(demoted)
+            logger.debug(f"Model label governor demoted {len(demoted)} models to 'other'")
+
+        if self._on_rerank is not None:
+            try:
+                self._on_rerank(self)
+            except Exception as e:
+                logger.debug(f"Model label governor rerank hook failed: {e}")
+
+    def is_admitted(self, model: str) -> bool:
+        with self._lock:
+            return model in self._admitted
+
+    def series_count(self) -> int:
+        """Label sets currently held by all governed metrics."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return sum(metric.series_count() for metric in metrics)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = {
+                "enabled": self.enabled,
+                "top_k": self.top_k,
+                "tracked_models": len(self._admitted),
+                "candidates": len(self._scores) + len(self._window),
+                "folded": self.folded,
+                "reranks": self.reranks,
+                "demotions": self.demotions,
+                "governed_metrics": len(self._metrics),
+            }
+        stats["series"] = self.series_count()
+        return stats
+
+    def reset(self) -> None:
+        """Forget all ranking state (tests)."""
+        with self._lock:
+            self._admitted.clear()
+            self._window.clear()
+            self._scores.clear()
+            self._next_rerank = time.monotonic() + self.rerank_seconds
+            self.folded = 0
+            self.reranks = 0
+            self.demotions = 0
+
+
+class GovernedMetric:
+    """
+    Drop-in wrapper that routes a metric's ``model`` label through a governor.
+
+    ``labels()`` accepts the same positional or keyword arguments as the wrapped
+    collector; every other attribute is forwarded.
+    """
+
+    def __init__(self, metric, governor: ModelLabelGovernor, label: str = "model"):
+        self._metric = metric
+        self._governor = governor
+        self._labelnames = tuple(metric._labelnames)
+        self._index = self._labelnames.index(label)
+        self._label = label
+        self._series_lock = threading.Lock()
+        # model label value -> label tuples emitted with it
+        self._series: dict[str, set[tuple[str, ...]]] = {}
+        governor.register(self)
+
+    def labels(self, *labelvalues, **labelkwargs):
+        if labelkwargs:
+            if labelvalues or set(labelkwargs) != set(self._labelnames):
+                # Let the wrapped collector raise its usual error
+                return self._metric.labels(*labelvalues, **labelkwargs)
+            values = [str(labelkwargs[name]) for name in self._labelnames]
+        else:
+            values = [str(v) for v in labelvalues]
+            if len(values) != len(self._labelnames):
+                return self._metric.labels(*labelvalues)
+
+        model = values[self._index]
+        label = self._governor.resolve(model)
+        values[self._index] = label
+        key = tuple(values)
+        with self._series_lock:
+            self._series.setdefault(label, set()).add(key)
+        return self._metric.labels(*key)
+
+    def remove_models(self, models: set[str]) -> None:
+        with self._series_lock:
+            removed = [self._series.pop(m) for m in models if m in self._series]
+        for keys in removed:
+            for key in keys:
+                try:
+                    self._metric.remove(*key)
+                except KeyError:
+                    pass
+
+    def series_count(self) -> int:
+        with self._series_lock:
+            return sum(len(keys) for keys in self._series.values())
+
+    def __getattr__(self, name):
+        return getattr(self._metric, name)
+
+    def __repr__(self) -> str:
+        return f"GovernedMetric({self._metric!r})"
@@ -0,0 +1,138 @@
+"""
+Mergeable latency sketch (DDSketch-style log buckets) stored as Redis hashes.
+
+A latency ``x`` ms lands in bucket ``ceil(log_gamma(x))`` with
+``gamma = (1 + a) / (1 - a)``. Every value in a bucket is within a relative
+error ``a`` of the bucket's representative value, so any quantile read from the
+bucket counts is accurate to ``a`` (1% here). Buckets are plain counters, so:
+
+- recording is a few ``HINCRBY``s on one hash (no read-modify-write)
+- sketches for different minutes / models merge by adding counts
+- size is bounded by the latency range (a few hundred buckets for 1ms..10min),
+  not by traffic
+
+Hash layout (one hash per provider/model/minute, see :func:`sketch_key`)::
+
+    n      -> number of samples
+    s      -> sum of samples (ms), for the mean
+    b<i>   -> count in bucket i (b0 holds samples below 1ms)
+"""
+
+import math
+from datetime import datetime
+from typing import Any
+
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+KEY_PREFIX = "latsk"
+
+# Minute sketches must outlive the hourly rollup of their hour
+SKETCH_TTL_SECONDS = 3 * 3600
+
+_MINUTE_FORMAT = "%Y%m%d%H%M"
+
+
+def sketch_key(provider: str, model: str, minute: datetime) -> str:
+    """Redis key of the (provider, model, minute) sketch.
+
+    The timestamp sits before the model because model ids may contain ``:``.
+    """
+    return f"{KEY_PREFIX}:{provider}:{minute.strftime(_MINUTE_FORMAT)}:{model}"
+
+
+def provider_hour_pattern(provider: str, hour: datetime) -> str:
+    """SCAN pattern matching every minute sketch of ``provider`` in ``hour``."""
+    return f"{KEY_PREFIX}:{provider}:{hour.strftime('%Y%m%d%H')}??:*"
+
+
+def bucket_index(value_ms: float) -> int:
+    """Bucket holding ``value_ms``; 0 for sub-millisecond samples."""
+    if value_ms < 1:
+        return 0
+    return max(1, math.ceil(math.log(value_ms) / _LOG_GAMMA))
+
+
+def bucket_value(index: int) -> float:
+    """Representative value of a bucket (relative error <= RELATIVE_ACCURACY)."""
+    if index <= 0:
+        return 0.0
+    return 2 * _GAMMA**index / (_GAMMA + 1)
+
+
+def record_into(pipe, key: str, latency_ms: float) -> None:
+    """Queue the writes recording one sample into the sketch at ``key``."""
+    pipe.hincrby(key, f"b{bucket_index(latency_ms)}", 1)
+    pipe.hincrby(key, "n", 1)
+    pipe.hincrby(key, "s", int(round(latency_ms)))
+    pipe.expire(key, SKETCH_TTL_SECONDS)
+
+
+class LatencySketch:
+    """In-memory view of one or more merged sketch hashes."""
+
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self):
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+
+    @classmethod
+    def from_hash(cls, data: dict[Any, Any] | None) -> "LatencySketch":
+        sketch = cls()
+        sketch.merge_hash(data)
+        return sketch
+
+    def merge_hash(self, data: dict[Any, Any] | None) -> None:
+        """Add the counts of a raw Redis hash (str or bytes fields)."""
+        for field, raw in (data or {}).items():
+            name = field.decode() if isinstance(field, bytes) else field
+            value = int(raw)
+            if name == "n":
+                self.count += value
+            elif name == "s":
+                self.total += value
+            elif name.startswith("b"):
+                index = int(name[1:])
+                self.buckets[index] = self.buckets.get(index, 0) + value
+
+    def add(self, value_ms: float) -> None:
+        """Record one sample in memory (same bucketing as :func:`record_into`)."""
+        index = bucket_index(value_ms)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += int(round(value_ms))
+
+    def merge(self, other: "LatencySketch") -> None:
+        self.count += other.count
+        self.total += other.total
+        for index, value in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + value
+
+    def quantile(self, q: float) -> float | None:
+        """Value at quantile ``q`` (0..1), or None for an empty sketch."""
+        total = sum(self.buckets.values())
+        if total == 0:
+            return None
+        # Same nearest-rank convention the sorted-list implementation used
+        rank = max(0, min(total - 1, int(q * total)))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return bucket_value(index)
+        return bucket_value(max(self.buckets))
+
+    @property
+    def avg(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    @property
+    def min(self) -> float | None:
+        return bucket_value(min(self.buckets)) if self.buckets else None
+
+    @property
+    def max(self) -> float | None:
+        return bucket_value(max(self.buckets)) if self.buckets else None
@@ -17,6 +17,7 @@ from typing import Any
 
 from src.config.redis_config import get_redis_client
 from src.config.supabase_config import get_supabase_client
+from src.services.metrics.latency_sketch import LatencySketch, provider_hour_pattern
 from src.services.metrics.prometheus_metrics import track_database_query
 
 logger = logging.getLogger(__name__)
@@ -171,7 +172,10 @@ class MetricsAggregator:
         self, provider: str, hour_key: str
     ) -> dict[str, float | None]:
         """
-        Calculate latency statistics from Redis sorted sets.
+        Calculate latency statistics for one hour by merging latency sketches.
+
+        RedisMetrics records one mergeable sketch per (provider, model, minute);
+        the hourly rollup is the sum of that hour's sketches across all models.
 
         Args:
             provider: Provider name
@@ -181,17 +185,18 @@ class MetricsAggregator:
             Dictionary with latency statistics
         """
         try:
-            # Get all latency values for this provider (across all models)
-            # In production, you might want to query per model
-            latency_pattern = f"latency:{provider}:*"
-            latency_keys = list(self.redis.scan_iter(latency_pattern))
-
-            all_latencies = []
-            for latency_key in latency_keys:
-                latencies = self.redis.zrange(latency_key, 0, -1)
-                all_latencies.extend([int(lat) for lat in latencies])
-
-            if not all_latencies:
+            hour = datetime.strptime(hour_key, "%Y-%m-%d:%H")
+            sketch_keys = list(self.redis.scan_iter(provider_hour_pattern(provider, hour)))
+
+            sketch = LatencySketch()
+            if sketch_keys:
+                pipe = self.redis.pipeline()
+                for sketch_key in sketch_keys:
+                    pipe.hgetall(sketch_key)
+                for data in pipe.execute():
+                    sketch.merge_hash(data)
+
+            if not sketch.count:
                 return {
                     "avg": None,
                     "p50": None,
@@ -201,22 +206,13 @@ class MetricsAggregator:
                     "max": None,
                 }
 
-            # Sort for percentile calculation
-            sorted_latencies = sorted(all_latencies)
-            n = len(sorted_latencies)
-
-            # Calculate percentiles
-            p50_idx = max(0, min(n - 1, int(0.50 * n)))
-            p95_idx = max(0, min(n - 1, int(0.95 * n)))
-            p99_idx = max(0, min(n - 1, int(0.99 * n)))
-
             return {
-                "avg": sum(all_latencies) / n,
-                "p50": sorted_latencies[p50_idx],
-                "p95": sorted_latencies[p95_idx],
-                "p99": sorted_latencies[p99_idx],
-                "min": sorted_latencies[0],
-                "max": sorted_latencies[-1],
+                "avg": sketch.avg,
+                "p50": sketch.quantile(0.50),
+                "p95": sketch.quantile(0.95),
+                "p99": sketch.quantile(0.99),
+                "min": sketch.min,
+                "max": sketch.max,
             }
 
         except Exception as e:
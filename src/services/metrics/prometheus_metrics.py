@@ -18,11 +18,18 @@ from contextlib import contextmanager
 
 from prometheus_client import REGISTRY, Counter, Gauge, Histogram, Info, Summary
 
+from src.config.config import Config
+from src.services.metrics.label_governor import GovernedMetric, ModelLabelGovernor
+
 logger = logging.getLogger(__name__)
 
 # Get app name from environment or use default
 APP_NAME = os.environ.get("APP_NAME", "gatewayz")
 
+# Set by start.sh in multi-worker mode. prometheus_client then keeps metric
+# values in per-process files in this directory, and /metrics aggregates them.
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
 
 def get_trace_exemplar() -> dict[str, str] | None:
     """
@@ -90,6 +97,10 @@ def get_or_create_metric(metric_class, name, *args, **kwargs):
             logger.debug(f"Reusing existing metric: {name}")
             return collector
 
+    if MULTIPROC_DIR and metric_class is Gauge:
+        # One series per live worker unless the metric says how to combine them
+        kwargs.setdefault("multiprocess_mode", "liveall")
+
     # Metric doesn't exist, create it
     try:
         return metric_class(name, *args, **kwargs)
@@ -99,6 +110,96 @@ def get_or_create_metric(metric_class, name, *args, **kwargs):
         raise
 
 
+def metrics_registry():
+    """
+    Registry to expose on /metrics.
+
+    With a single worker that is the default registry. In multi-worker mode
+    it is a fresh registry that aggregates every worker's metric files, so
+    any worker can answer the scrape for the whole container.
+    """
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    from prometheus_client import CollectorRegistry, multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess files on shutdown."""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
+
+
+# ==================== Model Label Cardinality Governor ====================
+# Metrics labelled by model are created through get_or_create_governed_metric so
+# only the top-K models by traffic keep exact series; the rest share
+# model="other". See src/services/metrics/label_governor.py.
+model_label_governor_tracked_models = get_or_create_metric(
+    Gauge,
+    "model_label_governor_tracked_models",
+    "Models currently holding exact series in model-labelled metrics",
+)
+
+model_label_governor_series = get_or_create_metric(
+    Gauge,
+    "model_label_governor_series",
+    "Label sets currently held by model-labelled metrics",
+)
+
+model_label_governor_folded_total = get_or_create_metric(
+    Counter,
+    "model_label_governor_folded_total",
+    'Observations folded into model="other" by the label governor',
+)
+
+model_label_governor_demotions_total = get_or_create_metric(
+    Counter,
+    "model_label_governor_demotions_total",
+    'Models demoted to model="other" at re-rank (their series were removed)',
+)
+
+_governor_published = {"folded": 0, "demotions": 0}
+
+
+def _publish_model_label_governor_stats(governor: ModelLabelGovernor) -> None:
+    """Export the governor's own cardinality figures (called after each re-rank)."""
+    stats = governor.get_stats()
+    model_label_governor_tracked_models.set(stats["tracked_models"])
+    model_label_governor_series.set(stats["series"])
+    for key, counter in (
+        ("folded", model_label_governor_folded_total),
+        ("demotions", model_label_governor_demotions_total),
+    ):
+        delta = stats[key] - _governor_published[key]
+        if delta > 0:
+            counter.inc(delta)
+        _governor_published[key] = stats[key]
+
+
+model_label_governor = ModelLabelGovernor(
+    top_k=Config.PROMETHEUS_MODEL_LABEL_TOP_K,
+    rerank_seconds=Config.PROMETHEUS_MODEL_LABEL_RERANK_SECONDS,
+    enabled=Config.PROMETHEUS_MODEL_LABEL_GOVERNOR_ENABLED,
+    on_rerank=_publish_model_label_governor_stats,
+)
+
+
+def get_or_create_governed_metric(metric_class, name, *args, **kwargs):
+    """
+    get_or_create_metric() for metrics with a ``model`` label.
+
+    The returned wrapper behaves like the metric but routes the model label
+    through ``model_label_governor``.
+    """
+    metric = get_or_create_metric(metric_class, name, *args, **kwargs)
+    return GovernedMetric(metric, model_label_governor)
+
+
 # ==================== Application Info ====================
 # This metric helps Grafana dashboard populate the app_name variable dropdown
 fastapi_app_info = get_or_create_metric(Info, "fastapi_app_info", "FastAPI application information")
@@ -174,14 +275,14 @@ fastapi_exceptions_total = get_or_create_metric(
 )
 
 # ==================== Model Inference Metrics ====================
-model_inference_requests = get_or_create_metric(
+model_inference_requests = get_or_create_governed_metric(
     Counter,
     "model_inference_requests_total",
     "Total model inference requests",
     ["provider", "model", "status"],
 )
 
-model_inference_duration = get_or_create_metric(
+model_inference_duration = get_or_create_governed_metric(
     Histogram,
     "model_inference_duration_seconds",
     "Model inference duration in seconds",
@@ -189,14 +290,14 @@ model_inference_duration = get_or_create_metric(
     buckets=(0.1, 0.5, 1, 2.5, 5, 10, 25, 60),
 )
 
-tokens_used = get_or_create_metric(
+tokens_used = get_or_create_governed_metric(
     Counter,
     "tokens_used_total",
     "Total tokens used (input + output)",
     ["provider", "model", "token_type"],
 )
 
-credits_used = get_or_create_metric(
+credits_used = get_or_create_governed_metric(
     Counter,
     "credits_used_total",
     "Total credits consumed",
@@ -205,7 +306,7 @@ credits_used = get_or_create_metric(
 
 # ==================== Pricing Metrics ====================
 # Track when default pricing is used (potential under-billing)
-default_pricing_usage_counter = get_or_create_metric(
+default_pricing_usage_counter = get_or_create_governed_metric(
     Counter,
     "gatewayz_default_pricing_usage_total",
     "Count of requests using default pricing (pricing data not found). High values indicate missing pricing data.",
@@ -232,14 +333,14 @@ pricing_cache_misses = get_or_create_metric(
 
 # ==================== Cost Tracking Metrics ====================
 # Track actual USD costs for billing and budget monitoring
-api_cost_usd_total = get_or_create_metric(
+api_cost_usd_total = get_or_create_governed_metric(
     Counter,
     "gatewayz_api_cost_usd_total",
     "Total API cost in USD",
     ["provider", "model"],
 )
 
-api_cost_per_request = get_or_create_metric(
+api_cost_per_request = get_or_create_governed_metric(
     Histogram,
     "gatewayz_api_cost_per_request_usd",
     "Cost per API request in USD",
@@ -247,7 +348,7 @@ api_cost_per_request = get_or_create_metric(
     buckets=(0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, 10.0, 100.0),
 )
 
-cost_per_1k_tokens = get_or_create_metric(
+cost_per_1k_tokens = get_or_create_governed_metric(
     Histogram,
     "gatewayz_cost_per_1k_tokens_usd",
     "Cost per 1000 tokens in USD",
@@ -285,6 +386,30 @@ catalog_cache_invalidations = get_or_create_metric(
     ["gateway", "reason"],  # reason: model_sync, manual, expired
 )
 
+# ==================== Routing Snapshot Metrics ====================
+# Background-refreshed routing tables (src/services/cache/refreshable_snapshot.py)
+routing_snapshot_age_seconds = get_or_create_metric(
+    Gauge,
+    "routing_snapshot_age_seconds",
+    "Seconds since the served routing dataset was last rebuilt in this worker",
+    ["dataset"],  # dataset: model_mappings, model_capabilities, manual_pricing, ...
+)
+
+routing_snapshot_refresh_duration_seconds = get_or_create_metric(
+    Histogram,
+    "routing_snapshot_refresh_duration_seconds",
+    "Time taken to rebuild a routing dataset",
+    ["dataset"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+routing_snapshot_refresh_failures_total = get_or_create_metric(
+    Counter,
+    "routing_snapshot_refresh_failures_total",
+    "Routing dataset rebuilds that failed and kept serving the previous copy",
+    ["dataset"],
+)
+
 # ==================== Read Replica Metrics ====================
 # Track read replica usage for monitoring database load distribution
 read_replica_queries_total = get_or_create_metric(
@@ -315,7 +440,7 @@ monthly_cost_estimate = get_or_create_metric(
 )
 
 # Cost savings from caching
-cache_cost_savings_usd = get_or_create_metric(
+cache_cost_savings_usd = get_or_create_governed_metric(
     Counter,
     "gatewayz_cache_cost_savings_usd_total",
     "Total cost saved from cache hits in USD",
@@ -404,7 +529,7 @@ payment_amount_mismatch = get_or_create_metric(
 # Track when token counts are estimated vs provided by providers,
 # and the accuracy of estimations for calibration purposes.
 
-token_count_source_total = get_or_create_metric(
+token_count_source_total = get_or_create_governed_metric(
     Counter,
     "gatewayz_token_count_source_total",
     "Count of streaming requests by token count source (provider-reported vs estimated)",
@@ -559,7 +684,7 @@ cache_misses = get_or_create_metric(
 )
 
 # ==================== Stream Normalization Metrics ====================
-stream_chunks_dropped = get_or_create_metric(
+stream_chunks_dropped = get_or_create_governed_metric(
     Counter,
     "stream_chunks_dropped_total",
     "Total streaming chunks that failed normalization and were dropped",
@@ -699,7 +824,7 @@ provider_response_time = get_or_create_metric(
 
 # ==================== Provider Response Duration Metrics (Detailed Timing) ====================
 # Fine-grained provider response timing with focus on slow requests (30-60s range)
-provider_response_duration = get_or_create_metric(
+provider_response_duration = get_or_create_governed_metric(
     Histogram,
     "provider_response_duration_seconds",
     "Provider response duration in seconds (detailed buckets for slow request detection)",
@@ -707,13 +832,116 @@ provider_response_duration = get_or_create_metric(
     buckets=(0.1, 0.5, 1, 2.5, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 60, 90, 120),
 )
 
-provider_slow_requests_total = get_or_create_metric(
+provider_slow_requests_total = get_or_create_governed_metric(
     Counter,
     "provider_slow_requests_total",
     "Total slow provider requests (>30s) by severity level",
     ["provider", "model", "severity"],  # severity: slow (30-45s), very_slow (>45s)
 )
 
+# ==================== Provider Hedging Metrics ====================
+# Hedged requests (src/services/provider_hedging.py). Win rate per mode is
+# provider_hedge_wins_total{winner="hedge"} / provider_hedges_total{outcome="fired"}.
+provider_hedges_total = get_or_create_metric(
+    Counter,
+    "provider_hedges_total",
+    "Hedge decisions for requests eligible for hedging",
+    ["mode", "outcome"],  # mode: non_streaming, streaming; outcome: fired, budget_denied
+)
+
+provider_hedge_wins_total = get_or_create_metric(
+    Counter,
+    "provider_hedge_wins_total",
+    "Hedged requests by which attempt won",
+    ["mode", "winner"],  # winner: primary, hedge, none (both failed)
+)
+
+# ==================== Post-Completion Queue Metrics ====================
+# Billing and analytics run after a completion (src/services/post_completion_queue.py)
+post_completion_queue_depth = get_or_create_metric(
+    Gauge,
+    "post_completion_queue_depth",
+    "Post-completion jobs waiting for a worker (billing includes overflowed jobs)",
+    ["priority"],  # billing, analytics
+)
+
+post_completion_queue_oldest_age_seconds = get_or_create_metric(
+    Gauge,
+    "post_completion_queue_oldest_age_seconds",
+    "Time the most recently started post-completion job spent queued (0 when idle)",
+)
+
+post_completion_jobs_dropped_total = get_or_create_metric(
+    Counter,
+    "post_completion_jobs_dropped_total",
+    "Post-completion jobs dropped without running",
+    ["kind", "reason"],  # reason: full, evicted (made room for billing), shutdown
+)
+
+post_completion_jobs_spilled_total = get_or_create_metric(
+    Counter,
+    "post_completion_jobs_spilled_total",
+    "Billing jobs reduced to their journal record because the queue was full",
+    ["kind"],
+)
+
+post_completion_jobs_replayed_total = get_or_create_metric(
+    Counter,
+    "post_completion_jobs_replayed_total",
+    "Post-completion jobs replayed at startup from a previous process's spill file",
+    ["kind"],
+)
+
+post_completion_jobs_failed_total = get_or_create_metric(
+    Counter,
+    "post_completion_jobs_failed_total",
+    "Post-completion jobs that raised",
+    ["kind"],
+)
+
+# ==================== Remote Write Shipping ====================
+# Incremental remote_write shipper (src/services/metrics/prometheus_remote_write.py)
+prometheus_remote_write_samples_total = get_or_create_metric(
+    Counter,
+    "prometheus_remote_write_samples_total",
+    "Samples handed to a remote_write destination",
+    ["outcome"],  # sent, dropped (rejected, or WAL overflow)
+)
+
+prometheus_remote_write_pending_batches = get_or_create_metric(
+    Gauge,
+    "prometheus_remote_write_pending_batches",
+    "Compressed batches waiting for their remote_write destination",
+)
+
+prometheus_remote_write_backpressure_total = get_or_create_metric(
+    Counter,
+    "prometheus_remote_write_backpressure_total",
+    "Collection cycles that left changed series unsent because a queue was full",
+)
+
+# ==================== Chatterbox TTS Metrics ====================
+# Local text-to-speech inference (src/services/providers/chatterbox_tts_client.py)
+tts_model_load_seconds = get_or_create_metric(
+    Histogram,
+    "tts_model_load_seconds",
+    "Time to load a Chatterbox model into memory (once per process per model)",
+    ["model"],
+    buckets=(1, 5, 10, 30, 60, 120, 300),
+)
+
+tts_inference_queue_depth = get_or_create_metric(
+    Gauge,
+    "tts_inference_queue_depth",
+    "TTS requests running or waiting for an inference worker",
+)
+
+tts_requests_rejected_total = get_or_create_metric(
+    Counter,
+    "tts_requests_rejected_total",
+    "TTS requests rejected because the inference queue was full",
+)
+
 # ==================== Zero-Model Event Metrics ====================
 # These metrics track when gateways/providers return zero models
 # Critical for monitoring provider health and fallback activation
@@ -807,7 +1035,7 @@ active_api_keys = get_or_create_metric(
 
 # ==================== Business Metrics ====================
 # Free model usage tracking for expired trials
-free_model_usage = get_or_create_metric(
+free_model_usage = get_or_create_governed_metric(
     Counter,
     "free_model_usage_total",
     "Total free model requests by user status (expired_trial, active_trial, paid)",
@@ -867,6 +1095,7 @@ event_loop_lag_seconds = get_or_create_metric(
     Gauge,
     "gatewayz_event_loop_lag_seconds",
     "Time (seconds) between scheduling a no-op coroutine and its execution — measures asyncio event loop backpressure",
+    multiprocess_mode="livemax",
 )
 
 # ---------------------------------------------------------------------------
@@ -954,7 +1183,7 @@ redis_db_keys = get_or_create_metric(
 
 # ==================== Performance Stage Metrics ====================
 # Detailed stage breakdown metrics for performance profiling
-backend_ttfb_seconds = get_or_create_metric(
+backend_ttfb_seconds = get_or_create_governed_metric(
     Histogram,
     "backend_ttfb_seconds",
     "Backend API time to first byte (TTFB) in seconds",
@@ -962,7 +1191,7 @@ backend_ttfb_seconds = get_or_create_metric(
     buckets=(0.1, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 5.0, 10.0),
 )
 
-streaming_duration_seconds = get_or_create_metric(
+streaming_duration_seconds = get_or_create_governed_metric(
     Histogram,
     "streaming_duration_seconds",
     "Time spent streaming response to client in seconds",
@@ -972,7 +1201,7 @@ streaming_duration_seconds = get_or_create_metric(
 
 # TTFC (Time to First Chunk) - Critical metric for perceived streaming latency
 # Measures time from stream_generator() entry to first SSE chunk yielded
-time_to_first_chunk_seconds = get_or_create_metric(
+time_to_first_chunk_seconds = get_or_create_governed_metric(
     Histogram,
     "time_to_first_chunk_seconds",
     "Time from stream start to first SSE chunk sent to client (TTFC)",
@@ -1681,28 +1910,28 @@ pricing_sync_price_changes_total = get_or_create_metric(
 )
 
 # Pricing validation metrics
-pricing_validation_total = get_or_create_metric(
+pricing_validation_total = get_or_create_governed_metric(
     Counter,
     "pricing_validation_total",
     "Total number of pricing validations performed",
     ["model"],
 )
 
-pricing_validation_failures = get_or_create_metric(
+pricing_validation_failures = get_or_create_governed_metric(
     Counter,
     "pricing_validation_failures",
     "Total number of pricing validation failures",
     ["model", "reason"],
 )
 
-pricing_spike_detected_total = get_or_create_metric(
+pricing_spike_detected_total = get_or_create_governed_metric(
     Counter,
     "pricing_spike_detected_total",
     "Total number of pricing spikes detected",
     ["model", "price_type"],
 )
 
-pricing_bounds_violations_total = get_or_create_metric(
+pricing_bounds_violations_total = get_or_create_governed_metric(
     Counter,
     "pricing_bounds_violations_total",
     "Total number of pricing bounds violations",
@@ -89,20 +89,20 @@ class TimeSeries:
 
     def SerializeToString(self) -> bytes:
         """Serialize to protobuf wire format."""
-        result = b""
+        parts = []
         # Field 1: labels (repeated Label)
         for label in self.labels:
             label_bytes = label.SerializeToString()
-            result += b"\x0a"  # field 1, wire type 2 (length-delimited)
-            result += _encode_varint(len(label_bytes))
-            result += label_bytes
+            parts.append(b"\x0a")  # field 1, wire type 2 (length-delimited)
+            parts.append(_encode_varint(len(label_bytes)))
+            parts.append(label_bytes)
         # Field 2: samples (repeated Sample)
         for sample in self.samples:
             sample_bytes = sample.SerializeToString()
-            result += b"\x12"  # field 2, wire type 2 (length-delimited)
-            result += _encode_varint(len(sample_bytes))
-            result += sample_bytes
-        return result
+            parts.append(b"\x12")  # field 2, wire type 2 (length-delimited)
+            parts.append(_encode_varint(len(sample_bytes)))
+            parts.append(sample_bytes)
+        return b"".join(parts)
 
 
 class WriteRequest:
@@ -119,14 +119,15 @@ class WriteRequest:
 
     def SerializeToString(self) -> bytes:
         """Serialize to protobuf wire format."""
-        result = b""
+        # Joined once at the end: repeated ``+=`` copies the whole message per series
+        parts = []
         # Field 1: timeseries (repeated TimeSeries)
         for ts in self.timeseries:
             ts_bytes = ts.SerializeToString()
-            result += b"\x0a"  # field 1, wire type 2 (length-delimited)
-            result += _encode_varint(len(ts_bytes))
-            result += ts_bytes
-        return result
+            parts.append(b"\x0a")  # field 1, wire type 2 (length-delimited)
+            parts.append(_encode_varint(len(ts_bytes)))
+            parts.append(ts_bytes)
+        return b"".join(parts)
 
 
 def _encode_varint(value: int) -> bytes:
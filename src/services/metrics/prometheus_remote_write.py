@@ -11,12 +11,38 @@ to receive metrics via:
 
 This implementation uses protobuf format with Snappy compression as required
 by the Prometheus remote write protocol.
+
+Shipping runs off the event loop and scales with churn, not registry size:
+
+- A collector thread reads the registry every push interval. Each destination
+  (``RemoteWriteShard``) remembers the value it was last sent per series and
+  only gets the series that changed, plus any series not sent for
+  ``Config.PROMETHEUS_REMOTE_WRITE_RESEND_SECONDS`` so it does not go stale.
+  Series labels are encoded once and cached.
+- Changed series are cut into snappy-compressed batches of at most
+  ``max_samples_per_send`` samples. Each destination queues at most
+  ``max_pending_batches``; when its queue is full the remaining series stay
+  unsent and go out, with their latest value, once it drains.
+- A sender thread per destination posts batches in order, retrying with
+  exponential backoff and a circuit breaker. Batches are written to a segment
+  file in ``<wal dir>/<destination>/<pid>-<random>/`` before they are queued
+  and deleted once accepted. The directory is flocked by its process; at
+  startup, directories whose owner is gone are claimed and replayed first.
 """
 
 import asyncio
+import fcntl
+import hashlib
 import logging
+import math
+import os
 import socket
+import struct
+import threading
 import time
+import uuid
+from collections import deque
+from pathlib import Path
 from typing import Any
 
 import httpx
@@ -24,13 +50,39 @@ import snappy
 from prometheus_client import REGISTRY
 
 from src.config import Config
-from src.services.metrics.prometheus_pb2 import Label, Sample, TimeSeries, WriteRequest
+from src.services.metrics.prometheus_metrics import (
+    prometheus_remote_write_backpressure_total,
+    prometheus_remote_write_pending_batches,
+    prometheus_remote_write_samples_total,
+)
+from src.services.metrics.prometheus_pb2 import (
+    Label,
+    Sample,
+    TimeSeries,
+    WriteRequest,
+    _encode_varint,
+)
 
 logger = logging.getLogger(__name__)
 
 # Protobuf is now always available via our custom implementation
 PROTOBUF_AVAILABLE = True
 
+_HEADERS = {
+    "Content-Encoding": "snappy",
+    "Content-Type": "application/x-protobuf",
+    "X-Prometheus-Remote-Write-Version": "0.1.0",
+}
+
+_DOUBLE = struct.Struct("<d")
+
+# Retry backoff for a failing destination, in seconds
+_MIN_BACKOFF = 1.0
+_MAX_BACKOFF = 30.0
+
+# (sample name, label pairs in the collector's order)
+SeriesKey = tuple[str, tuple[tuple[str, str], ...]]
+
 
 def _get_instance_labels() -> dict[str, str]:
     """Get instance-identifying labels for all metrics."""
@@ -101,17 +153,149 @@ def _serialize_metrics_to_protobuf(registry=REGISTRY) -> bytes:
     return compressed_data
 
 
-class PrometheusRemoteWriter:
+def collect_series(registry=REGISTRY) -> list[tuple[SeriesKey, float]]:
+    """Current value of every sample in the registry."""
+    series = []
+    for metric in registry.collect():
+        for sample in metric.samples:
+            series.append(((sample.name, tuple(sample.labels.items())), float(sample.value)))
+    return series
+
+
+class SeriesEncoder:
+    """Protobuf encoding of single-sample series, with each series' labels cached."""
+
+    def __init__(self, instance_labels: dict[str, str] | None = None):
+        self._instance_labels = instance_labels or _get_instance_labels()
+        self._labels: dict[SeriesKey, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def labels(self, key: SeriesKey) -> bytes:
+        """The TimeSeries ``labels`` fields for a series, sorted by label name."""
+        encoded = self._labels.get(key)
+        if encoded is None:
+            name, pairs = key
+            all_labels = {"__name__": name, **self._instance_labels}
+            all_labels.update((k, str(v)) for k, v in pairs)
+            parts = []
+            for label_name in sorted(all_labels):
+                label = Label(name=label_name, value=all_labels[label_name]).SerializeToString()
+                parts.append(b"\x0a" + _encode_varint(len(label)) + label)
+            encoded = self._labels[key] = b"".join(parts)
+        return encoded
+
+    def series(self, key: SeriesKey, value: float, timestamp: bytes) -> bytes:
+        """
+        One WriteRequest ``timeseries`` field.
+
+        ``timestamp`` is the Sample's encoded timestamp field
+        (:func:`encode_timestamp`), shared by every series of a collection.
+        """
+        sample = (b"\x09" + _DOUBLE.pack(value) if value != 0.0 else b"") + timestamp
+        body = self.labels(key) + b"\x12" + _encode_varint(len(sample)) + sample
+        return b"\x0a" + _encode_varint(len(body)) + body
+
+    def prune(self, live: set[SeriesKey]) -> None:
+        """Forget series that are no longer in the registry."""
+        for key in [k for k in self._labels if k not in live]:
+            del self._labels[key]
+
+
+def encode_timestamp(timestamp_ms: int) -> bytes:
+    return b"\x10" + _encode_varint(timestamp_ms)
+
+
+def _unchanged(old: float, new: float) -> bool:
+    return old == new or (math.isnan(old) and math.isnan(new))
+
+
+class _Batch:
+    __slots__ = ("payload", "samples", "path")
+
+    def __init__(self, payload: bytes | None, samples: int, path: Path | None):
+        self.payload = payload
+        self.samples = samples
+        self.path = path
+
+
+class SegmentLog:
     """
-    Client for pushing Prometheus metrics via remote_write.
+    One process's on-disk copy of a destination's pending batches.
 
-    This follows the Prometheus remote write protocol:
-    - Metrics are collected from the local registry
-    - Serialized to protobuf format (WriteRequest message)
-    - Compressed with Snappy compression
-    - Sent to the remote Prometheus instance via HTTP POST
+    Each batch is one ``<sequence>.seg`` file of compressed WriteRequest bytes
+    in a directory the process holds an exclusive flock on.
+    """
 
-    Includes circuit breaker pattern to reduce noise when Prometheus is unavailable.
+    def __init__(self, destination_dir: Path):
+        self.parent = destination_dir
+        name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # Locked under a hidden name first, so no other process can claim it
+        hidden = destination_dir / f".{name}"
+        hidden.mkdir(parents=True)
+        self._fd = os.open(hidden / "lock", os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self.directory = destination_dir / name
+        os.rename(hidden, self.directory)
+        self._sequence = 0
+
+    def _next_path(self) -> Path:
+        self._sequence += 1
+        return self.directory / f"{self._sequence:012d}.seg"
+
+    def append(self, payload: bytes) -> Path:
+        path = self._next_path()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)  # never leave a torn segment under a .seg name
+        return path
+
+    def claim_orphans(self) -> list[Path]:
+        """Move the segments of directories whose owner is gone into ours, oldest first."""
+        claimed = []
+        for directory in sorted(self.parent.iterdir()):
+            if directory == self.directory or directory.name.startswith("."):
+                continue
+            if not directory.is_dir():
+                continue
+            try:
+                fd = os.open(directory / "lock", os.O_RDWR | os.O_CREAT, 0o600)
+            except OSError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # owner still running
+                for segment in sorted(directory.glob("*.seg")):
+                    path = self._next_path()
+                    os.replace(segment, path)
+                    claimed.append(path)
+                for leftover in directory.iterdir():
+                    leftover.unlink(missing_ok=True)
+                directory.rmdir()
+            except OSError as e:
+                logger.warning(f"Could not claim remote write segments in {directory}: {e}")
+            finally:
+                os.close(fd)
+        return claimed
+
+    def close(self) -> None:
+        """Release the lock; the directory is removed when nothing is left in it."""
+        if not any(self.directory.glob("*.seg")):
+            (self.directory / "lock").unlink(missing_ok=True)
+            try:
+                self.directory.rmdir()
+            except OSError:
+                pass
+        os.close(self._fd)
+
+
+class RemoteWriteShard:
+    """
+    One remote_write destination: the values it was last sent, a bounded
+    queue of compressed batches and the thread that posts them.
     """
 
     # Circuit breaker settings
@@ -120,83 +304,228 @@ class PrometheusRemoteWriter:
 
     def __init__(
         self,
-        remote_write_url: str = None,
-        push_interval: int = 30,
-        enabled: bool = True,
+        url: str,
+        max_pending_batches: int = 100,
+        wal: SegmentLog | None = None,
+        client: httpx.Client | None = None,
     ):
-        """
-        Initialize the Prometheus remote writer.
+        self.url = url
+        self.max_pending_batches = max(1, max_pending_batches)
+        self.wal = wal
+        self.client = client
+        # series -> (value last queued, monotonic time it was queued)
+        self._sent: dict[SeriesKey, tuple[float, float]] = {}
+        self._pending: deque[_Batch] = deque()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._drain_deadline = 0.0
+        self._thread: threading.Thread | None = None
+        self._backoff = _MIN_BACKOFF
 
-        Args:
-            remote_write_url: URL of Prometheus remote_write endpoint
-                            Default: http://prometheus:9090/api/v1/write
-            push_interval: Interval in seconds between metric pushes (default: 30s)
-            enabled: Whether to enable remote write (default: True)
-        """
-        self.remote_write_url = remote_write_url or Config.PROMETHEUS_REMOTE_WRITE_URL
-        self.push_interval = push_interval
-        self.enabled = enabled and PROTOBUF_AVAILABLE
-        self.client = None
-        self._push_task = None
-        self._last_push_time = 0
         self._push_count = 0
         self._push_errors = 0
+        self._samples_sent = 0
+        self._samples_dropped = 0
+        self._last_push_time = 0.0
 
         # Circuit breaker state
         self._consecutive_failures = 0
         self._circuit_open_time = 0
         self._circuit_open = False
 
-        if enabled and not PROTOBUF_AVAILABLE:
-            logger.warning(
-                "Prometheus remote write requested but protobuf support not available. "
-                "Install with: pip install python-snappy"
-            )
-
-        logger.info("Prometheus Remote Writer initialized")
-        logger.info(f"  URL: {self.remote_write_url}")
-        logger.info(f"  Push interval: {self.push_interval}s")
-        logger.info(f"  Enabled: {self.enabled}")
-        logger.info(f"  Protobuf support: {PROTOBUF_AVAILABLE}")
-
-    async def start(self):
-        """Start the background push task."""
-        if not self.enabled:
-            logger.info("Prometheus remote write is disabled")
-            return
-
-        self.client = httpx.AsyncClient(timeout=10.0)
-        self._push_task = asyncio.create_task(self._push_loop())
-        logger.info("Prometheus remote write task started")
+        if wal is not None:
+            # Replayed batches are read back when sent; their sample count is unknown
+            for path in wal.claim_orphans():
+                self._pending.append(_Batch(None, 0, path))
+            self._trim_replayed()
+
+    def _trim_replayed(self) -> None:
+        # Replayed segments count against the queue; keep the newest that fit
+        excess = len(self._pending) - self.max_pending_batches
+        if excess > 0:
+            logger.warning(f"Dropping {excess} old remote write batches for {self.url}")
+            for _ in range(excess):
+                self._pending.popleft().path.unlink(missing_ok=True)
+        if self._pending:
+            logger.info(f"Replaying {len(self._pending)} remote write batches for {self.url}")
+
+    # --- collector side ---------------------------------------------------
+
+    def enqueue_changed(
+        self,
+        snapshot: list[tuple[SeriesKey, float]],
+        encoder: SeriesEncoder,
+        timestamp: bytes,
+        now: float,
+        resend_after: float,
+        max_samples_per_send: int,
+    ) -> int:
+        """
+        Queue batches of the series this destination has not been sent yet.
 
-    async def stop(self):
-        """Stop the background push task and cleanup."""
-        if self._push_task:
-            self._push_task.cancel()
+        Returns the number of samples queued. Stops at a full queue: what is
+        left stays unsent and is picked up by a later collection.
+        """
+        sent = self._sent
+        parts: list[bytes] = []
+        values: list[tuple[SeriesKey, float]] = []
+        queued = 0
+        for key, value in snapshot:
+            last = sent.get(key)
+            if last is not None and now - last[1] < resend_after and _unchanged(last[0], value):
+                continue
+            parts.append(encoder.series(key, value, timestamp))
+            values.append((key, value))
+            if len(parts) >= max_samples_per_send:
+                if not self._offer(parts, values, now, resend_after):
+                    return queued
+                queued += len(values)
+                parts, values = [], []
+        if parts and self._offer(parts, values, now, resend_after):
+            queued += len(values)
+        return queued
+
+    def _offer(
+        self,
+        parts: list[bytes],
+        values: list[tuple[SeriesKey, float]],
+        now: float,
+        resend_after: float,
+    ) -> bool:
+        with self._cond:
+            if len(self._pending) >= self.max_pending_batches:
+                prometheus_remote_write_backpressure_total.inc()
+                return False
+        payload = snappy.compress(b"".join(parts))
+        path = None
+        if self.wal is not None:
             try:
-                await self._push_task
-            except asyncio.CancelledError:
-                pass
-
-        if self.client:
-            await self.client.aclose()
-
-        logger.info(
-            f"Prometheus remote write stopped "
-            f"(pushed {self._push_count} times, {self._push_errors} errors)"
+                path = self.wal.append(payload)
+            except OSError as e:
+                logger.warning(f"Remote write WAL append failed, keeping batch in memory: {e}")
+        with self._cond:
+            self._pending.append(_Batch(payload, len(values), path))
+            self._cond.notify()
+        sent = self._sent
+        for key, value in values:
+            # Series first sent together are spread over the resend window, so
+            # the periodic resend does not arrive as one full-registry burst
+            first = key not in sent
+            sent[key] = (value, now - (hash(key) % 997) / 997 * resend_after if first else now)
+        return True
+
+    def forget(self, live: set[SeriesKey]) -> None:
+        """Drop send state for series that are no longer in the registry."""
+        for key in [k for k in self._sent if k not in live]:
+            del self._sent[key]
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # --- sender side ------------------------------------------------------
+
+    def start(self) -> None:
+        if self.client is None:
+            self.client = httpx.Client(timeout=10.0)
+        self._thread = threading.Thread(
+            target=self._run, name=f"remote-write-{self.url}", daemon=True
         )
-
-    async def _push_loop(self):
-        """Background task that pushes metrics at regular intervals."""
+        self._thread.start()
+
+    def stop(self, timeout: float) -> None:
+        """Send what is queued for up to ``timeout`` seconds, then stop the sender."""
+        with self._cond:
+            self._stopping = True
+            self._drain_deadline = time.monotonic() + timeout
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout + 1)
+            self._thread = None
+        if self.client is not None:
+            self.client.close()
+        if self.wal is not None:
+            self.wal.close()
+
+    def _run(self) -> None:
         while True:
-            try:
-                await asyncio.sleep(self.push_interval)
-                await self.push_metrics()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in prometheus push loop: {e}")
-                self._push_errors += 1
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending or (
+                    self._stopping and time.monotonic() >= self._drain_deadline
+                ):
+                    return
+            delay = self.send_next()
+            if delay > 0:
+                if self._stopping:
+                    return  # what is left stays in the WAL for the next start
+                with self._cond:
+                    self._cond.wait_for(lambda: self._stopping, timeout=delay)
+
+    def send_next(self) -> float:
+        """Post the oldest pending batch; returns how long to wait before the next attempt."""
+        if not self._check_circuit_breaker():
+            return self._circuit_open_time + self.CIRCUIT_BREAKER_RESET_TIMEOUT - time.time()
+
+        batch = self._pending[0]
+        try:
+            payload = batch.payload if batch.payload is not None else batch.path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Dropping unreadable remote write segment {batch.path}: {e}")
+            self._finish(batch, sent=False)
+            return 0.0
+
+        delivered = self._post(payload)
+        if delivered is None:
+            self._record_failure()
+            delay, self._backoff = self._backoff, min(self._backoff * 2, _MAX_BACKOFF)
+            return delay
+        self._backoff = _MIN_BACKOFF
+        self._finish(batch, sent=delivered)
+        return 0.0
+
+    def _post(self, payload: bytes) -> bool | None:
+        """True when accepted, False when rejected for good, None to retry."""
+        try:
+            response = self.client.post(self.url, content=payload, headers=_HEADERS)
+            response.raise_for_status()
+            self._record_success()
+            return True
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status == 429 or status >= 500:
+                if not self._circuit_open:
+                    logger.warning(f"Remote write to {self.url} failed with {status}, retrying")
+                return None
+            # Bad data (e.g. out-of-order samples): resending cannot succeed
+            self._consecutive_failures = 0
+            logger.error(
+                f"Remote write to {self.url} rejected a batch: {status} - {e.response.text}"
+            )
+            return False
+        except (httpx.ConnectError, httpx.TimeoutException) as e:
+            # Only log if circuit is not yet open (avoid spam)
+            if not self._circuit_open:
+                logger.warning(
+                    f"Connection error pushing metrics to {self.url}: {type(e).__name__}: {e}"
+                )
+            return None
+        except Exception as e:
+            if not self._circuit_open:
+                logger.error(f"Error pushing metrics to {self.url}: {type(e).__name__}: {e}")
+            return None
+
+    def _finish(self, batch: _Batch, sent: bool) -> None:
+        with self._cond:
+            self._pending.popleft()
+        if batch.path is not None:
+            batch.path.unlink(missing_ok=True)
+        outcome = "sent" if sent else "dropped"
+        if sent:
+            self._samples_sent += batch.samples
+        else:
+            self._samples_dropped += batch.samples
+        prometheus_remote_write_samples_total.labels(outcome=outcome).inc(batch.samples)
 
     def _check_circuit_breaker(self) -> bool:
         """
@@ -243,106 +572,221 @@ class PrometheusRemoteWriter:
                 f"Will retry in {self.CIRCUIT_BREAKER_RESET_TIMEOUT}s"
             )
 
-    async def push_metrics(self) -> bool:
-        """
-        Push current metrics to Prometheus remote_write endpoint.
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "pending_batches": len(self._pending),
+            "push_count": self._push_count,
+            "push_errors": self._push_errors,
+            "samples_sent": self._samples_sent,
+            "samples_dropped": self._samples_dropped,
+            "last_push_time": self._last_push_time,
+            "wal": str(self.wal.directory) if self.wal is not None else None,
+            "circuit_breaker": {
+                "open": self._circuit_open,
+                "consecutive_failures": self._consecutive_failures,
+                "threshold": self.CIRCUIT_BREAKER_THRESHOLD,
+                "reset_timeout": self.CIRCUIT_BREAKER_RESET_TIMEOUT,
+            },
+        }
 
-        Serializes metrics to protobuf format with Snappy compression
-        and sends them via HTTP POST to the remote write endpoint.
 
-        Includes circuit breaker pattern to avoid excessive retries when
-        the Prometheus endpoint is unavailable.
+def _open_wal(wal_dir: str | None, url: str) -> SegmentLog | None:
+    if not wal_dir:
+        return None
+    destination = hashlib.sha1(url.encode()).hexdigest()[:12]
+    try:
+        return SegmentLog(Path(wal_dir) / destination)
+    except OSError as e:
+        logger.warning(f"Remote write WAL unavailable for {url}, buffering in memory: {e}")
+        return None
 
-        Returns:
-            True if push was successful, False otherwise
+
+class PrometheusRemoteWriter:
+    """
+    Client for pushing Prometheus metrics via remote_write.
+
+    This follows the Prometheus remote write protocol:
+    - Metrics are collected from the local registry
+    - Serialized to protobuf format (WriteRequest message)
+    - Compressed with Snappy compression
+    - Sent to the remote Prometheus instance via HTTP POST
+
+    Collection and sending run on their own threads; see the module docstring.
+    """
+
+    def __init__(
+        self,
+        remote_write_url: str = None,
+        push_interval: float = 30,
+        enabled: bool = True,
+        *,
+        registry=REGISTRY,
+        resend_after: float | None = None,
+        max_samples_per_send: int | None = None,
+        max_pending_batches: int | None = None,
+        wal_dir: str | None = None,
+    ):
         """
-        if not self.enabled or not self.client:
-            return False
+        Initialize the Prometheus remote writer.
 
-        # Check circuit breaker
-        if not self._check_circuit_breaker():
-            # Circuit is open, skip this push silently
-            return False
+        Args:
+            remote_write_url: URL of Prometheus remote_write endpoint, or several
+                            separated by commas
+                            Default: http://prometheus:9090/api/v1/write
+            push_interval: Interval in seconds between collections (default: 30s)
+            enabled: Whether to enable remote write (default: True)
+            registry: Registry to ship (default: REGISTRY)
+            resend_after: Seconds after which an unchanged series is sent again
+            max_samples_per_send: Samples per compressed batch
+            max_pending_batches: Batches queued per destination before backpressure
+            wal_dir: Directory for pending batches; None keeps them in memory
+        """
+        self.remote_write_url = remote_write_url or Config.PROMETHEUS_REMOTE_WRITE_URL
+        self.push_interval = push_interval
+        self.enabled = enabled and PROTOBUF_AVAILABLE
+        self.registry = registry
+        self.resend_after = (
+            resend_after
+            if resend_after is not None
+            else Config.PROMETHEUS_REMOTE_WRITE_RESEND_SECONDS
+        )
+        self.max_samples_per_send = max(
+            1, max_samples_per_send or Config.PROMETHEUS_REMOTE_WRITE_MAX_SAMPLES_PER_SEND
+        )
+        self.max_pending_batches = (
+            max_pending_batches or Config.PROMETHEUS_REMOTE_WRITE_MAX_PENDING_BATCHES
+        )
+        self.wal_dir = wal_dir
+        self.urls = [u.strip() for u in self.remote_write_url.split(",") if u.strip()]
+        self.shards: list[RemoteWriteShard] = []
+        self.encoder = SeriesEncoder()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._collections = 0
+        self._collect_errors = 0
+        self._last_collect_seconds = 0.0
+        self._series = 0
 
-        try:
-            # Serialize and compress metrics
-            compressed_data = _serialize_metrics_to_protobuf(REGISTRY)
-
-            # Send to remote write endpoint
-            response = await self.client.post(
-                self.remote_write_url,
-                content=compressed_data,
-                headers={
-                    "Content-Encoding": "snappy",
-                    "Content-Type": "application/x-protobuf",
-                    "X-Prometheus-Remote-Write-Version": "0.1.0",
-                },
+        if enabled and not PROTOBUF_AVAILABLE:
+            logger.warning(
+                "Prometheus remote write requested but protobuf support not available. "
+                "Install with: pip install python-snappy"
             )
 
-            response.raise_for_status()
+        logger.info("Prometheus Remote Writer initialized")
+        logger.info(f"  URL: {self.remote_write_url}")
+        logger.info(f"  Push interval: {self.push_interval}s")
+        logger.info(f"  Enabled: {self.enabled}")
+        logger.info(f"  Protobuf support: {PROTOBUF_AVAILABLE}")
 
-            self._record_success()
+    async def start(self):
+        """Start the collector and sender threads."""
+        if not self.enabled:
+            logger.info("Prometheus remote write is disabled")
+            return
 
-            logger.debug(
-                f"Successfully pushed metrics to {self.remote_write_url} "
-                f"(status: {response.status_code})"
-            )
-            return True
+        # Opening the WALs claims (and lists) segments left by earlier processes
+        await asyncio.to_thread(self._open_shards)
+        self._thread = threading.Thread(
+            target=self._collect_loop, name="remote-write-collector", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Prometheus remote write started for {len(self.shards)} destination(s)")
+
+    def _open_shards(self) -> None:
+        self.shards = [
+            RemoteWriteShard(url, self.max_pending_batches, _open_wal(self.wal_dir, url))
+            for url in self.urls
+        ]
+        for shard in self.shards:
+            shard.start()
+
+    async def stop(self, timeout: float = 5.0):
+        """Ship a final collection, give the senders ``timeout`` seconds to drain, and stop."""
+        await asyncio.to_thread(self._stop_threads, timeout)
+        stats = self.get_stats()
+        logger.info(
+            f"Prometheus remote write stopped "
+            f"(pushed {stats['push_count']} times, {stats['push_errors']} errors)"
+        )
 
-        except httpx.HTTPStatusError as e:
-            self._record_failure()
-            logger.error(
-                f"HTTP error pushing metrics to {self.remote_write_url}: "
-                f"{e.response.status_code} - {e.response.text}"
-            )
-            return False
-        except httpx.ConnectError as e:
-            self._record_failure()
-            # Only log if circuit is not yet open (avoid spam)
-            if not self._circuit_open:
-                logger.warning(
-                    f"Connection error pushing metrics to {self.remote_write_url}: "
-                    f"{type(e).__name__}: {e}"
-                )
-            return False
-        except httpx.TimeoutException as e:
-            self._record_failure()
-            # Only log if circuit is not yet open (avoid spam)
-            if not self._circuit_open:
-                logger.warning(
-                    f"Timeout pushing metrics to {self.remote_write_url}: "
-                    f"{type(e).__name__}: {e}"
-                )
-            return False
+    def _stop_threads(self, timeout: float) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for shard in self.shards:
+            shard.stop(timeout)
+        prometheus_remote_write_pending_batches.set(0)
+
+    def _collect_loop(self) -> None:
+        while not self._stop.wait(self.push_interval):
+            self.ship()
+        self.ship()  # final values before shutdown
+
+    def ship(self) -> int:
+        """
+        Collect the registry once and queue each destination's changed series.
+
+        Returns the number of samples queued across destinations.
+        """
+        started = time.monotonic()
+        try:
+            snapshot = collect_series(self.registry)
         except Exception as e:
-            self._record_failure()
-            # Only log if circuit is not yet open (avoid spam)
-            if not self._circuit_open:
-                logger.error(
-                    f"Error pushing metrics to {self.remote_write_url}: " f"{type(e).__name__}: {e}"
+            self._collect_errors += 1
+            logger.error(f"Error collecting metrics for remote write: {e}")
+            return 0
+
+        timestamp = encode_timestamp(int(time.time() * 1000))
+        queued = 0
+        for shard in self.shards:
+            try:
+                queued += shard.enqueue_changed(
+                    snapshot,
+                    self.encoder,
+                    timestamp,
+                    started,
+                    self.resend_after,
+                    self.max_samples_per_send,
                 )
-            return False
+            except Exception as e:
+                self._collect_errors += 1
+                logger.error(f"Error queueing remote write batches for {shard.url}: {e}")
+
+        # Series disappear rarely (label removal, governor demotions)
+        if len(self.encoder) > len(snapshot):
+            live = {key for key, _ in snapshot}
+            self.encoder.prune(live)
+            for shard in self.shards:
+                shard.forget(live)
+
+        self._series = len(snapshot)
+        self._collections += 1
+        self._last_collect_seconds = time.monotonic() - started
+        prometheus_remote_write_pending_batches.set(sum(s.pending() for s in self.shards))
+        return queued
 
     def get_stats(self) -> dict[str, Any]:
         """Get remote write statistics."""
+        destinations = [shard.get_stats() for shard in self.shards]
+        push_count = sum(d["push_count"] for d in destinations)
+        push_errors = sum(d["push_errors"] for d in destinations)
+        attempts = push_count + push_errors
         return {
             "enabled": self.enabled,
             "url": self.remote_write_url,
             "push_interval": self.push_interval,
-            "push_count": self._push_count,
-            "push_errors": self._push_errors,
-            "last_push_time": self._last_push_time,
-            "success_rate": (
-                (self._push_count - self._push_errors) / self._push_count * 100
-                if self._push_count > 0
-                else 0
-            ),
-            "circuit_breaker": {
-                "open": self._circuit_open,
-                "consecutive_failures": self._consecutive_failures,
-                "threshold": self.CIRCUIT_BREAKER_THRESHOLD,
-                "reset_timeout": self.CIRCUIT_BREAKER_RESET_TIMEOUT,
-            },
+            "push_count": push_count,
+            "push_errors": push_errors,
+            "last_push_time": max((d["last_push_time"] for d in destinations), default=0),
+            "success_rate": push_count / attempts * 100 if attempts > 0 else 0,
+            "collections": self._collections,
+            "collect_errors": self._collect_errors,
+            "last_collect_seconds": self._last_collect_seconds,
+            "series": self._series,
+            "destinations": destinations,
         }
 
 
@@ -362,8 +806,9 @@ async def init_prometheus_remote_write():
     # Falls back to scraping via /metrics endpoint if protobuf is not available
     prometheus_writer = PrometheusRemoteWriter(
         remote_write_url=Config.PROMETHEUS_REMOTE_WRITE_URL,
-        push_interval=30,  # Push every 30 seconds
+        push_interval=Config.PROMETHEUS_REMOTE_WRITE_INTERVAL_SECONDS,
         enabled=True,  # Enabled with protobuf support
+        wal_dir=Config.PROMETHEUS_REMOTE_WRITE_WAL_DIR,
     )
 
     if prometheus_writer.enabled:
@@ -27,6 +27,8 @@ from typing import Any
 
 import httpx
 
+from src.services.monitoring.status_snapshot import mark_status_dirty
+
 logger = logging.getLogger(__name__)
 
 
@@ -1029,6 +1031,7 @@ class IntelligentHealthMonitor:
                         "status": "active",
                     }
                 ).execute()
+                mark_status_dirty()
 
         except Exception as e:
             logger.error(f"Failed to create/update incident: {e}")
@@ -1040,18 +1043,27 @@ class IntelligentHealthMonitor:
 
             now = datetime.now(UTC)
 
-            supabase.table("model_health_incidents").update(
-                {
-                    "resolved_at": now.isoformat(),
-                    "status": "resolved",
-                    "resolution_notes": "Model recovered and passed health checks",
-                    "updated_at": now.isoformat(),
-                }
-            ).eq("provider", result.provider).eq("model", result.model).eq(
-                "gateway", result.gateway
-            ).eq(
-                "status", "active"
-            ).execute()
+            resolved = (
+                supabase.table("model_health_incidents")
+                .update(
+                    {
+                        "resolved_at": now.isoformat(),
+                        "status": "resolved",
+                        "resolution_notes": "Model recovered and passed health checks",
+                        "updated_at": now.isoformat(),
+                    }
+                )
+                .eq("provider", result.provider)
+                .eq("model", result.model)
+                .eq("gateway", result.gateway)
+                .eq("status", "active")
+                .execute()
+            )
+
+            # Most healthy checks resolve nothing; only a real state change
+            # should trigger a status page rebuild.
+            if resolved is not None and resolved.data:
+                mark_status_dirty()
 
         except Exception as e:
             logger.error(f"Failed to resolve incidents: {e}")
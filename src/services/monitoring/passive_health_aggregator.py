@@ -0,0 +1,277 @@
+"""
+In-memory aggregation of passive health samples.
+
+Every completed call used to run ``record_model_call`` (a select plus an upsert
+on ``model_health_tracking``) in a thread. Request volume is high but the
+number of distinct (provider, model) pairs is small, so almost all of those
+writes were redundant read-modify-write cycles on the same rows.
+
+This module keeps one accumulator per pair in the worker (counts, error
+classes, last-call fields, token sums and a latency sketch) and a background
+task flushes them every ``Config.PASSIVE_HEALTH_FLUSH_SECONDS`` through
+``record_model_calls_batch``: one select and one bulk upsert per flush. The
+DB write rate then scales with model count, not request count.
+
+Memory is bounded by ``Config.PASSIVE_HEALTH_MAX_PAIRS``: reaching it triggers
+an early flush, and samples for new pairs are dropped (and counted) if the
+buffer reaches twice the limit before that flush catches up. Shutdown drains
+whatever is buffered.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+from src.config import Config
+from src.services.metrics.latency_sketch import LatencySketch
+
+logger = logging.getLogger(__name__)
+
+
+class _PairStats:
+    """Accumulated samples for one (provider, model) pair since the last flush."""
+
+    __slots__ = (
+        "gateway",
+        "calls",
+        "successes",
+        "errors",
+        "error_classes",
+        "response_ms_sum",
+        "sketch",
+        "last_response_ms",
+        "last_status",
+        "last_called_at",
+        "last_error_message",
+        "last_tokens",
+        "tokens_sum",
+    )
+
+    def __init__(self, gateway: str | None):
+        self.gateway = gateway
+        self.calls = 0
+        self.successes = 0
+        self.errors = 0
+        self.error_classes: dict[str, int] = {}
+        self.response_ms_sum = 0.0
+        self.sketch = LatencySketch()
+        self.last_response_ms = 0.0
+        self.last_status = "success"
+        self.last_called_at = ""
+        self.last_error_message: str | None = None
+        self.last_tokens: tuple[int | None, int | None, int | None] = (None, None, None)
+        self.tokens_sum = [0, 0]
+
+    def to_entry(self, provider: str, model: str) -> dict[str, Any]:
+        input_tokens, output_tokens, total_tokens = self.last_tokens
+        return {
+            "provider": provider,
+            "model": model,
+            "gateway": self.gateway,
+            "call_count": self.calls,
+            "success_count": self.successes,
+            "error_count": self.errors,
+            "response_time_ms_sum": self.response_ms_sum,
+            "last_response_time_ms": self.last_response_ms,
+            "last_status": self.last_status,
+            "last_called_at": self.last_called_at,
+            "last_error_message": self.last_error_message,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": total_tokens,
+            "window": {
+                "calls": self.calls,
+                "error_classes": self.error_classes,
+                "p50_ms": self.sketch.quantile(0.50),
+                "p95_ms": self.sketch.quantile(0.95),
+                "p99_ms": self.sketch.quantile(0.99),
+                "input_tokens_sum": self.tokens_sum[0],
+                "output_tokens_sum": self.tokens_sum[1],
+                "last_sample_at": self.last_called_at,
+            },
+        }
+
+
+class PassiveHealthAggregator:
+    """Per-worker accumulator of passive health samples."""
+
+    def __init__(self, max_pairs: int):
+        self.max_pairs = max(1, max_pairs)
+        self._pairs: dict[tuple[str, str], _PairStats] = {}
+        self._flush_requested: asyncio.Event | None = None
+
+        self.samples = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.flush_errors = 0
+
+    def add(
+        self,
+        provider: str,
+        model: str,
+        response_time_ms: float,
+        status: str,
+        error_message: str | None = None,
+        input_tokens: int | None = None,
+        output_tokens: int | None = None,
+        total_tokens: int | None = None,
+        gateway: str | None = None,
+    ) -> bool:
+        """Accumulate one sample; returns False if it was dropped."""
+        key = (provider, model)
+        stats = self._pairs.get(key)
+        if stats is None:
+            if len(self._pairs) >= self.max_pairs:
+                self.request_flush()
+                if len(self._pairs) >= self.max_pairs * 2:
+                    self.dropped += 1
+                    return False
+            stats = self._pairs[key] = _PairStats(gateway)
+
+        stats.calls += 1
+        if status == "success":
+            stats.successes += 1
+        else:
+            stats.errors += 1
+            stats.error_classes[status] = stats.error_classes.get(status, 0) + 1
+        stats.response_ms_sum += response_time_ms
+        stats.sketch.add(response_time_ms)
+        stats.last_response_ms = response_time_ms
+        stats.last_status = status
+        stats.last_called_at = datetime.now(UTC).isoformat()
+        if error_message:
+            stats.last_error_message = error_message
+        if input_tokens is not None or output_tokens is not None or total_tokens is not None:
+            stats.last_tokens = (input_tokens, output_tokens, total_tokens)
+            stats.tokens_sum[0] += input_tokens or 0
+            stats.tokens_sum[1] += output_tokens or 0
+
+        self.samples += 1
+        return True
+
+    def drain(self) -> list[dict[str, Any]]:
+        """Take every buffered pair as a batch of upsert entries."""
+        pairs, self._pairs = self._pairs, {}
+        return [stats.to_entry(provider, model) for (provider, model), stats in pairs.items()]
+
+    async def flush(self) -> int:
+        """Write the buffered pairs; returns the number of rows written."""
+        batch = self.drain()
+        if not batch:
+            return 0
+
+        from src.db.model_health import record_model_calls_batch_async
+
+        try:
+            written = await record_model_calls_batch_async(batch)
+        except Exception as e:
+            # Health stats are best effort: a failed batch is dropped, not
+            # re-buffered, so a DB outage can't grow memory
+            self.flush_errors += 1
+            logger.warning(f"Passive health flush of {len(batch)} pairs failed: {e}")
+            return 0
+
+        self.flushes += 1
+        self.rows_written += written
+        return written
+
+    def request_flush(self) -> None:
+        if self._flush_requested is not None:
+            self._flush_requested.set()
+
+    def pending_pairs(self) -> int:
+        return len(self._pairs)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "pending_pairs": len(self._pairs),
+            "max_pairs": self.max_pairs,
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "flush_errors": self.flush_errors,
+        }
+
+
+_aggregator: PassiveHealthAggregator | None = None
+_flush_task: asyncio.Task | None = None
+
+
+def get_passive_health_aggregator() -> PassiveHealthAggregator | None:
+    """The running aggregator, or None when samples should be written directly."""
+    return _aggregator if _flush_task is not None else None
+
+
+async def _flush_loop(aggregator: PassiveHealthAggregator) -> None:
+    interval = Config.PASSIVE_HEALTH_FLUSH_SECONDS
+    while True:
+        try:
+            await asyncio.wait_for(aggregator._flush_requested.wait(), timeout=interval)
+        except TimeoutError:
+            pass
+        aggregator._flush_requested.clear()
+
+        started = time.monotonic()
+        try:
+            written = await aggregator.flush()
+            if written:
+                logger.debug(
+                    f"Flushed passive health for {written} pairs in "
+                    f"{(time.monotonic() - started) * 1000:.0f}ms"
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Passive health flush loop error: {e}")
+
+
+def start_passive_health_aggregator() -> None:
+    """
+    Start buffering passive health samples with a periodic flush.
+    Call this during application startup.
+    """
+    global _aggregator, _flush_task
+
+    if not Config.PASSIVE_HEALTH_AGGREGATION_ENABLED:
+        logger.info("Passive health aggregation disabled via PASSIVE_HEALTH_AGGREGATION_ENABLED")
+        return
+    if _flush_task is not None:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning("Event loop not running, cannot start passive health aggregator")
+        return
+
+    _aggregator = PassiveHealthAggregator(Config.PASSIVE_HEALTH_MAX_PAIRS)
+    _aggregator._flush_requested = asyncio.Event()
+    _flush_task = loop.create_task(_flush_loop(_aggregator), name="passive_health_flush")
+    logger.info("Passive health aggregator started")
+
+
+async def stop_passive_health_aggregator() -> None:
+    """
+    Stop the flush task and drain buffered samples.
+    Call this during application shutdown.
+    """
+    global _aggregator, _flush_task
+
+    task, aggregator = _flush_task, _aggregator
+    _flush_task = None
+    _aggregator = None
+
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    if aggregator is not None:
+        written = await aggregator.flush()
+        logger.info(f"Passive health aggregator stopped (final drain: {written} pairs)")
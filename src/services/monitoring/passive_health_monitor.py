@@ -10,6 +10,7 @@ import logging
 from typing import Any
 
 from src.db.model_health import record_model_call
+from src.services.monitoring.passive_health_aggregator import get_passive_health_aggregator
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,8 @@ async def capture_model_health(
 
     This function runs as a background task and does not block the API response.
     It extracts token usage from the response and records it in the health tracking table.
+    While the passive health aggregator is running the sample is only buffered
+    in memory; the aggregator flushes all pairs to the table periodically.
 
     Args:
         provider: The AI provider name (e.g., 'openrouter', 'portkey')
@@ -54,6 +57,20 @@ async def capture_model_health(
             if total_tokens is None and input_tokens is not None and output_tokens is not None:
                 total_tokens = input_tokens + output_tokens
 
+        aggregator = get_passive_health_aggregator()
+        if aggregator is not None:
+            aggregator.add(
+                provider=provider,
+                model=model,
+                response_time_ms=response_time_ms,
+                status=status,
+                error_message=error_message,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=total_tokens,
+            )
+            return
+
         # Record the model call in background (non-blocking)
         await asyncio.to_thread(
             record_model_call,
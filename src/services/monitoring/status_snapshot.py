@@ -0,0 +1,602 @@
+"""
+Pre-rendered public status page snapshot.
+
+The ``/v1/status`` endpoints are public, unauthenticated and hit hardest during
+an incident, which is exactly when the health tables are busiest. Instead of
+querying ``provider_health_current``, ``model_status_current`` and
+``model_health_incidents`` (with ``count="exact"``) per request, a background
+refresher builds every status document once, renders it to JSON bytes with an
+ETag, and the endpoints serve those bytes. Status-page traffic costs no DB.
+
+Rebuilds happen every ``Config.STATUS_SNAPSHOT_REFRESH_SECONDS`` and, sooner,
+whenever the health monitor opens or resolves an incident
+(:func:`mark_status_dirty`). Every rebuild re-renders the bodies, so
+timestamps and durations stay current, but the (weak) ETag only changes with
+the content: conditional requests keep returning 304 and SSE subscribers
+(:func:`subscribe`) only receive the documents that changed.
+
+Also home to the row formatting shared with the DB fallback path in
+``src/routes/status_page.py``.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Documents rendered by the snapshot builder
+OVERVIEW = "overview"
+PROVIDERS = "providers"
+MODELS = "models"
+INCIDENTS = "incidents"
+STATS = "stats"
+
+# Default page sizes of the /models and /incidents endpoints
+DEFAULT_MODELS_LIMIT = 100
+DEFAULT_INCIDENTS_LIMIT = 50
+
+# Fields that change on every build without the status changing (including the
+# "timestamp" of the "no providers" overview); excluded from the change
+# fingerprint so they don't bust ETags or wake SSE subscribers (they are still
+# re-rendered into every body).
+_VOLATILE_KEYS = frozenset({"last_updated", "timestamp", "duration_seconds", "duration_human"})
+
+# Model fields only present in the single-model detail view
+_DETAIL_ONLY_KEYS = frozenset({"consecutive_failures", "usage_24h", "is_enabled"})
+
+# Minimum gap between two rebuilds, so an incident storm can't turn into a
+# rebuild storm.
+_MIN_REBUILD_INTERVAL_SECONDS = 2.0
+
+# Documents older than this many refresh intervals are ignored (refresher died).
+_STALE_AFTER_INTERVALS = 5
+
+
+# ---------------------------------------------------------------------------
+# Row formatting (shared with the DB fallback path)
+# ---------------------------------------------------------------------------
+
+
+def format_duration(seconds: int) -> str:
+    """Format duration in human-readable format"""
+    if seconds < 60:
+        return f"{seconds}s"
+    elif seconds < 3600:
+        minutes = seconds // 60
+        return f"{minutes}m"
+    elif seconds < 86400:
+        hours = seconds // 3600
+        minutes = (seconds % 3600) // 60
+        return f"{hours}h {minutes}m"
+    else:
+        days = seconds // 86400
+        hours = (seconds % 86400) // 3600
+        return f"{days}d {hours}h"
+
+
+def format_provider_status(provider: dict[str, Any]) -> dict[str, Any]:
+    """Format a provider_health_current row for the status page."""
+    healthy = provider["healthy_models"]
+    total = provider["total_models"]
+
+    # Apply same data consistency check as main status endpoint
+    if healthy > total:
+        logger.warning(
+            f"Data inconsistency in provider {provider['provider']}/{provider['gateway']}: "
+            f"healthy_models ({healthy}) > total_models ({total}). Capping to total."
+        )
+        healthy = total
+
+    return {
+        "name": provider["provider"],
+        "gateway": provider["gateway"],
+        "status": provider["status_indicator"],
+        "uptime_24h": round(provider["avg_uptime_24h"] or 0, 2),
+        "uptime_7d": round(provider["avg_uptime_7d"] or 0, 2),
+        "total_models": total,
+        "healthy_models": healthy,
+        "offline_models": provider["offline_models"],
+        "avg_response_time_ms": round(provider["avg_response_time_ms"] or 0, 0),
+        "last_checked": provider["last_checked_at"],
+    }
+
+
+def format_model_status(model: dict[str, Any], detailed: bool = False) -> dict[str, Any]:
+    """Format a model_status_current row (list view, or detail view)."""
+    formatted = {
+        "model_id": model["model"],
+        "provider": model["provider"],
+        "gateway": model["gateway"],
+        "status": model["status_indicator"],
+        "tier": model["monitoring_tier"],
+        "uptime_24h": round(model["uptime_percentage_24h"] or 0, 2),
+        "uptime_7d": round(model["uptime_percentage_7d"] or 0, 2),
+        "uptime_30d": round(model["uptime_percentage_30d"] or 0, 2),
+        "avg_response_time_ms": round(model["average_response_time_ms"] or 0, 0),
+        "last_checked": model["last_called_at"],
+        "last_success": model["last_success_at"],
+        "last_failure": model["last_failure_at"],
+        "circuit_breaker_state": model["circuit_breaker_state"],
+    }
+    if detailed:
+        formatted["consecutive_failures"] = model["consecutive_failures"]
+        formatted["usage_24h"] = model["usage_count_24h"]
+        formatted["is_enabled"] = model["is_enabled"]
+    formatted["active_incidents"] = model["active_incidents_count"]
+    return formatted
+
+
+def format_incident(incident: dict[str, Any], now: datetime) -> dict[str, Any]:
+    """Format a model_health_incidents row for the status page."""
+    if incident["resolved_at"]:
+        duration = incident["duration_seconds"]
+    else:
+        # Calculate current duration for active incidents
+        started = datetime.fromisoformat(incident["started_at"])
+        duration = int((now - started).total_seconds())
+
+    return {
+        "id": incident["id"],
+        "provider": incident["provider"],
+        "model": incident["model"],
+        "gateway": incident["gateway"],
+        "type": incident["incident_type"],
+        "severity": incident["severity"],
+        "status": incident["status"],
+        "started_at": incident["started_at"],
+        "resolved_at": incident["resolved_at"],
+        "duration_seconds": duration,
+        "duration_human": format_duration(duration) if duration else None,
+        "error_message": incident["error_message"],
+        "error_count": incident["error_count"],
+        "resolution_notes": incident.get("resolution_notes"),
+    }
+
+
+def summarize_overall(
+    providers: list[dict[str, Any]], active_incidents: int, now: datetime
+) -> dict[str, Any]:
+    """Aggregate provider_health_current rows into the overall status document."""
+    if not providers:
+        return {
+            "status": "unknown",
+            "message": "Status data not available",
+            "timestamp": now.isoformat(),
+        }
+
+    # Calculate overall metrics
+    total_models = sum(p["total_models"] for p in providers)
+    healthy_models = sum(p["healthy_models"] for p in providers)
+    offline_models = sum(p["offline_models"] for p in providers)
+
+    # Ensure healthy_models doesn't exceed total_models (data consistency fix)
+    # This can happen when the database view has stale data
+    if healthy_models > total_models:
+        logger.warning(
+            f"Data inconsistency: healthy_models ({healthy_models}) > total_models ({total_models}). "
+            "Constraining healthy_models to total_models."
+        )
+        healthy_models = total_models
+
+    # Determine overall status
+    if total_models == 0:
+        status = "unknown"
+        status_message = "No models monitored"
+    elif offline_models == 0:
+        status = "operational"
+        status_message = "All Systems Operational"
+    elif offline_models < total_models * 0.1:
+        status = "degraded"
+        status_message = "Partial Service Degradation"
+    else:
+        status = "major_outage"
+        status_message = "Major Service Disruption"
+
+    uptime_percentage = (healthy_models / total_models * 100) if total_models > 0 else 0
+
+    # Calculate gateway health metrics
+    # Filter out None and empty string gateways
+    gateways_set = set(p["gateway"] for p in providers if p.get("gateway") and p["gateway"].strip())
+    total_gateways = len(gateways_set) if gateways_set else 0
+
+    # Calculate healthy gateways (gateways that have at least one healthy provider)
+    gateway_health = {}
+    for p in providers:
+        gw = p.get("gateway")
+        if gw and gw.strip():  # Filter out None and empty strings
+            if gw not in gateway_health:
+                gateway_health[gw] = {"has_healthy": False}
+            # Consider a gateway healthy if any of its providers are operational
+            if p.get("status_indicator") == "operational":
+                gateway_health[gw]["has_healthy"] = True
+    healthy_gateways = sum(1 for g in gateway_health.values() if g.get("has_healthy", False))
+
+    # Calculate gateway health percentage
+    gateway_health_percentage = (
+        round((healthy_gateways / total_gateways) * 100, 1) if total_gateways > 0 else 0.0
+    )
+
+    return {
+        "status": status,
+        "status_message": status_message,
+        "uptime_percentage": round(uptime_percentage, 2),
+        "total_models": total_models,
+        "healthy_models": healthy_models,
+        "offline_models": offline_models,
+        "total_providers": len(providers),
+        "total_gateways": total_gateways,
+        "healthy_gateways": healthy_gateways,
+        "gateway_health_percentage": gateway_health_percentage,
+        "active_incidents": active_incidents,
+        "last_updated": now.isoformat(),
+    }
+
+
+def query_overall(db) -> dict[str, Any]:
+    """Build the overall status document from the database."""
+    now = datetime.now(UTC)
+    providers = db.table("provider_health_current").select("*").execute().data or []
+    if not providers:
+        return summarize_overall([], 0, now)
+
+    incidents_response = (
+        db.table("model_health_incidents")
+        .select("id", count="exact")
+        .eq("status", "active")
+        .execute()
+    )
+    return summarize_overall(providers, incidents_response.count or 0, now)
+
+
+def query_providers(db) -> list[dict[str, Any]]:
+    """Build the providers status document from the database."""
+    response = db.table("provider_health_current").select("*").order("provider").execute()
+    return [format_provider_status(p) for p in response.data or []]
+
+
+def query_stats(db) -> dict[str, Any]:
+    """Build the status statistics document from the database."""
+    # Get model counts by tier
+    tier_counts_response = (
+        db.table("model_health_tracking")
+        .select("monitoring_tier", count="exact")
+        .eq("is_enabled", True)
+        .execute()
+    )
+
+    tier_data = tier_counts_response.data or []
+    tier_counts = {}
+    for row in tier_data:
+        tier = row.get("monitoring_tier", "unknown")
+        tier_counts[tier] = tier_counts.get(tier, 0) + 1
+
+    # Get incident statistics
+    incidents_response = (
+        db.table("model_health_incidents").select("severity,status", count="exact").execute()
+    )
+
+    total_incidents = incidents_response.count or 0
+    active_incidents = len([i for i in incidents_response.data if i.get("status") == "active"])
+
+    # Get check statistics from last 24h
+    yesterday = datetime.now(UTC) - timedelta(hours=24)
+    checks_response = (
+        db.table("model_health_history")
+        .select("status", count="exact")
+        .gte("checked_at", yesterday.isoformat())
+        .execute()
+    )
+
+    total_checks = checks_response.count or 0
+    successful_checks = len([c for c in checks_response.data if c.get("status") == "success"])
+
+    return {
+        "monitoring": {
+            "total_models": sum(tier_counts.values()),
+            "critical_tier": tier_counts.get("critical", 0),
+            "popular_tier": tier_counts.get("popular", 0),
+            "standard_tier": tier_counts.get("standard", 0),
+            "on_demand_tier": tier_counts.get("on_demand", 0),
+        },
+        "incidents": {
+            "total_all_time": total_incidents,
+            "active": active_incidents,
+            "resolved": total_incidents - active_incidents,
+        },
+        "checks_24h": {
+            "total": total_checks,
+            "successful": successful_checks,
+            "failed": total_checks - successful_checks,
+            # null, not 0, when there are no samples. This endpoint is public
+            # and unauthenticated, so reporting 0 for "no data" tells every
+            # reader the gateway failed 100% of its checks. monitoring_active
+            # keeps "not measured" distinguishable from "measured and failing".
+            "success_rate": (
+                round(successful_checks / total_checks * 100, 2) if total_checks > 0 else None
+            ),
+            "monitoring_active": total_checks > 0,
+        },
+        "last_updated": datetime.now(UTC).isoformat(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class StatusDocument:
+    """One rendered status document."""
+
+    name: str
+    body: bytes
+    etag: str
+    fingerprint: str
+    built_at: float
+
+
+@dataclass(frozen=True)
+class _Collections:
+    """Formatted rows kept for serving filtered queries from memory."""
+
+    models: tuple[dict[str, Any], ...] = ()
+    models_complete: bool = False
+    incidents: tuple[dict[str, Any], ...] = ()
+    incidents_complete: bool = False
+
+
+_documents: dict[str, StatusDocument] = {}
+_collections = _Collections()
+_built_at: float | None = None
+
+_subscribers: set[asyncio.Queue] = set()
+_dirty: asyncio.Event | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_refresh_task: asyncio.Task | None = None
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in _VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def _render(name: str, payload: Any, now: float) -> StatusDocument:
+    fingerprint = hashlib.blake2b(
+        json.dumps(_strip_volatile(payload), sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+    body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    # Weak: bodies differing only in volatile fields share the validator
+    return StatusDocument(name, body, f'W/"{fingerprint}"', fingerprint, now)
+
+
+def _build_snapshot(db) -> tuple[dict[str, Any], _Collections]:
+    """Run the status queries once and return every document payload."""
+    now = datetime.now(UTC)
+
+    provider_rows = db.table("provider_health_current").select("*").order("provider").execute()
+    providers = provider_rows.data or []
+
+    active_response = (
+        db.table("model_health_incidents")
+        .select("id", count="exact")
+        .eq("status", "active")
+        .execute()
+    )
+
+    max_models = Config.STATUS_SNAPSHOT_MAX_MODELS
+    model_rows = (
+        db.table("model_status_current")
+        .select("*")
+        .order("usage_count_24h", desc=True)
+        .range(0, max_models - 1)
+        .execute()
+    ).data or []
+
+    max_incidents = Config.STATUS_SNAPSHOT_MAX_INCIDENTS
+    incident_rows = (
+        db.table("model_health_incidents")
+        .select("*")
+        .order("started_at", desc=True)
+        .range(0, max_incidents - 1)
+        .execute()
+    ).data or []
+
+    models = tuple(format_model_status(m, detailed=True) for m in model_rows)
+    incidents = tuple(format_incident(i, now) for i in incident_rows)
+
+    payloads = {
+        OVERVIEW: summarize_overall(providers, active_response.count or 0, now),
+        PROVIDERS: [format_provider_status(p) for p in providers],
+        MODELS: [model_list_view(m) for m in models[:DEFAULT_MODELS_LIMIT]],
+        INCIDENTS: list(incidents[:DEFAULT_INCIDENTS_LIMIT]),
+        STATS: query_stats(db),
+    }
+    collections = _Collections(
+        models=models,
+        models_complete=len(model_rows) < max_models,
+        incidents=incidents,
+        incidents_complete=len(incident_rows) < max_incidents,
+    )
+    return payloads, collections
+
+
+def model_list_view(model: dict[str, Any]) -> dict[str, Any]:
+    """Strip detail-only fields from a snapshot model row."""
+    return {k: v for k, v in model.items() if k not in _DETAIL_ONLY_KEYS}
+
+
+async def refresh_status_snapshot() -> list[str]:
+    """Rebuild every status document; returns the names of documents that changed."""
+    global _collections, _built_at
+
+    from src.db.client import get_db
+
+    payloads, collections = await asyncio.to_thread(_build_snapshot, get_db())
+
+    now = time.monotonic()
+    changed = []
+    for name, payload in payloads.items():
+        document = _render(name, payload, now)
+        previous = _documents.get(name)
+        if previous is None or previous.fingerprint != document.fingerprint:
+            changed.append(name)
+        _documents[name] = document
+
+    _collections = collections
+    _built_at = now
+
+    if changed:
+        _publish(changed)
+    return changed
+
+
+def _is_fresh() -> bool:
+    if _built_at is None:
+        return False
+    max_age = Config.STATUS_SNAPSHOT_REFRESH_SECONDS * _STALE_AFTER_INTERVALS
+    return time.monotonic() - _built_at < max_age
+
+
+def get_status_document(name: str) -> StatusDocument | None:
+    """Return the rendered document, or None when there is no fresh snapshot."""
+    if not Config.STATUS_SNAPSHOT_ENABLED or not _is_fresh():
+        return None
+    return _documents.get(name)
+
+
+def get_snapshot_models() -> tuple[dict[str, Any], ...] | None:
+    """All formatted model rows (detail view), or None if the snapshot can't answer."""
+    if not Config.STATUS_SNAPSHOT_ENABLED or not _is_fresh() or not _collections.models_complete:
+        return None
+    return _collections.models
+
+
+def get_snapshot_incidents(need: int | None = None) -> tuple[dict[str, Any], ...] | None:
+    """Recent formatted incidents, newest first, or None if the snapshot can't answer.
+
+    ``need`` is the number of leading rows the caller will read; an incomplete
+    snapshot (capped at STATUS_SNAPSHOT_MAX_INCIDENTS) can still answer when it
+    holds at least that many.
+    """
+    if not Config.STATUS_SNAPSHOT_ENABLED or not _is_fresh():
+        return None
+    incidents = _collections.incidents
+    if _collections.incidents_complete or (need is not None and need <= len(incidents)):
+        return incidents
+    return None
+
+
+def clear_status_snapshot() -> None:
+    """Drop all rendered documents (tests)."""
+    global _collections, _built_at
+    _documents.clear()
+    _collections = _Collections()
+    _built_at = None
+
+
+# ---------------------------------------------------------------------------
+# Change push (SSE)
+# ---------------------------------------------------------------------------
+
+
+def _publish(changed: list[str]) -> None:
+    for queue in list(_subscribers):
+        try:
+            queue.put_nowait(changed)
+        except asyncio.QueueFull:
+            # Slow consumer: it will get the latest bytes on the next change.
+            logger.debug("Status snapshot subscriber queue full, dropping update")
+
+
+def subscribe() -> asyncio.Queue | None:
+    """Register an SSE subscriber; None when the subscriber cap is reached."""
+    if len(_subscribers) >= Config.STATUS_SSE_MAX_SUBSCRIBERS:
+        return None
+    queue: asyncio.Queue = asyncio.Queue(maxsize=16)
+    _subscribers.add(queue)
+    return queue
+
+
+def unsubscribe(queue: asyncio.Queue) -> None:
+    _subscribers.discard(queue)
+
+
+def mark_status_dirty() -> None:
+    """Request a rebuild soon (health state changed). Safe from any thread."""
+    if _loop is None or _dirty is None:
+        return
+    try:
+        _loop.call_soon_threadsafe(_dirty.set)
+    except RuntimeError:
+        # Loop closed during shutdown
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Background refresher
+# ---------------------------------------------------------------------------
+
+
+async def _refresh_loop() -> None:
+    while True:
+        try:
+            await refresh_status_snapshot()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Status snapshot refresh failed: {e}")
+
+        try:
+            await asyncio.wait_for(_dirty.wait(), timeout=Config.STATUS_SNAPSHOT_REFRESH_SECONDS)
+        except TimeoutError:
+            pass
+        _dirty.clear()
+        await asyncio.sleep(_MIN_REBUILD_INTERVAL_SECONDS)
+
+
+def start_status_snapshot_task() -> None:
+    """
+    Start the status snapshot refresher.
+    Call this during application startup.
+    """
+    global _refresh_task, _dirty, _loop
+
+    if not Config.STATUS_SNAPSHOT_ENABLED:
+        logger.info("Status snapshot disabled via STATUS_SNAPSHOT_ENABLED")
+        return
+
+    try:
+        _loop = asyncio.get_running_loop()
+        _dirty = asyncio.Event()
+        _refresh_task = _loop.create_task(_refresh_loop(), name="status_snapshot_refresh")
+        logger.info("Status snapshot refresher started")
+    except RuntimeError:
+        # No running event loop
+        logger.warning("Event loop not running, cannot start status snapshot task")
+
+
+def stop_status_snapshot_task() -> None:
+    """
+    Stop the status snapshot refresher.
+    Call this during application shutdown.
+    """
+    global _refresh_task, _dirty, _loop
+
+    if _refresh_task:
+        _refresh_task.cancel()
+        logger.info("Status snapshot refresher stopped")
+    _refresh_task = None
+    _dirty = None
+    _loop = None
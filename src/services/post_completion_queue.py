@@ -0,0 +1,486 @@
+"""
+Bounded, durable queue for work that runs after a completion is returned.
+
+Billing for a stream (credit deduction, usage counters, activity and history)
+and analytics (request records, passive health samples) used to be started
+with bare ``asyncio.create_task`` calls or FastAPI background tasks. Nothing
+bounded them, so a slow Supabase let thousands pile up, each holding the full
+``messages`` and response text. Billing had no priority over analytics, and a
+deploy dropped whatever was still pending.
+
+Call sites now hand the work to :func:`submit_post_completion` as a *kind*
+(a key of ``JOB_KINDS``) plus JSON-able keyword arguments. A fixed pool of
+``Config.POST_COMPLETION_WORKERS`` tasks runs the jobs:
+
+- At most ``Config.POST_COMPLETION_QUEUE_SIZE`` jobs are held in memory, and
+  billing jobs are always taken before analytics jobs.
+- Billing jobs are journaled to this process's spill file before they are
+  queued, and a ``done`` record is appended when they finish. The journal
+  holds only what billing needs (ids, model, token counts, timings), never
+  API keys, user rows, messages or response text, and a single writer thread
+  does the appends so the event loop never touches the disk.
+- When the queue is full, a queued analytics job is dropped to make room for
+  a billing job. If the queue holds only billing jobs, the new job keeps just
+  its journal record and waits in an overflow list. Overflowed and replayed
+  jobs run the kind's billing function from that record, so they settle
+  credits, usage and activity but skip chat history. Analytics jobs that
+  arrive at a full queue are dropped.
+- Analytics jobs are journaled only when still queued at shutdown, and again
+  when replayed from another process's file, so a replayed record is never
+  held only in memory.
+- Each process owns ``<spill dir>/<pid>-<random>.jsonl`` under an exclusive
+  flock (container PIDs repeat across restarts, hence the suffix). At
+  startup, files whose owner is gone are replayed, then deleted. Jobs are keyed
+  by kind and request_id, so one spilled job never runs twice across files.
+  Credit deduction is itself idempotent per request_id.
+- Shutdown drains the queue for up to ``Config.POST_COMPLETION_DRAIN_SECONDS``.
+  Whatever is left, analytics included, stays in the spill file for the next
+  start.
+
+When the queue is not running (disabled, or outside the app lifespan), jobs
+run detached, as they did before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import importlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from src.config import Config
+from src.services.prometheus_metrics import (
+    post_completion_jobs_dropped_total,
+    post_completion_jobs_failed_total,
+    post_completion_jobs_replayed_total,
+    post_completion_jobs_spilled_total,
+    post_completion_queue_depth,
+    post_completion_queue_oldest_age_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_BILLING = 0
+PRIORITY_ANALYTICS = 1
+
+# kind -> (priority, "module:function" run from a journal record,
+#          "module:function" reducing kwargs to that record, or None to journal them as-is).
+# A reducer returning None means there is nothing worth keeping (e.g. anonymous usage).
+JOB_KINDS: dict[str, tuple[int, str, str | None]] = {
+    "stream_completion": (
+        PRIORITY_BILLING,
+        "src.handlers.post_processing:_replay_stream_billing",
+        "src.handlers.post_processing:_stream_billing_record",
+    ),
+    "chat_request_record": (
+        PRIORITY_ANALYTICS,
+        "src.db.chat_completion_requests:save_chat_completion_request_with_cost_async",
+        None,
+    ),
+    "model_health": (
+        PRIORITY_ANALYTICS,
+        "src.services.passive_health_monitor:capture_model_health",
+        None,
+    ),
+}
+
+# Truncate the spill file once nothing in it is outstanding and it is this large
+_COMPACT_BYTES = 1 << 20
+
+# Strong references for jobs run outside the queue, so they are not collected mid-run
+_detached: set[asyncio.Task] = set()
+
+
+def _import(path: str) -> Callable[..., Any]:
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _resolve(kind: str) -> Callable[..., Any]:
+    return _import(JOB_KINDS[kind][1])
+
+
+def _journal_record(kind: str, kwargs: dict[str, Any]) -> dict[str, Any] | None:
+    reducer = JOB_KINDS[kind][2]
+    return kwargs if reducer is None else _import(reducer)(kwargs)
+
+
+def _job_key(kind: str, kwargs: dict[str, Any]) -> str:
+    request_id = kwargs.get("request_id")
+    return f"{kind}:{request_id}" if request_id else f"{kind}:{uuid.uuid4().hex}"
+
+
+async def _call(func: Callable[..., Any], kwargs: dict[str, Any]) -> None:
+    if asyncio.iscoroutinefunction(func):
+        await func(**kwargs)
+    else:
+        await asyncio.to_thread(func, **kwargs)
+
+
+class _Job:
+    __slots__ = ("kind", "key", "func", "kwargs", "enqueued_at", "journaled")
+
+    def __init__(self, kind, key, func, kwargs, enqueued_at, journaled):
+        self.kind = kind
+        self.key = key
+        self.func = func
+        self.kwargs = kwargs
+        self.enqueued_at = enqueued_at
+        self.journaled = journaled
+
+
+class SpillFile:
+    """Append-only JSON-lines journal owned (flocked) by one process.
+
+    Records are serialised by the caller and written by one writer thread, in
+    order, so appending never blocks the event loop.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(self._fd)
+            raise
+        self.size = os.fstat(self._fd).st_size
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="post-completion-spill")
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Queue one record for writing; raises if it is not plain JSON."""
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        self.size += len(line)
+        self._writer.submit(self._run, os.write, self._fd, line)
+
+    def truncate(self) -> None:
+        self.size = 0
+        self._writer.submit(self._run, os.ftruncate, self._fd, 0)
+
+    def close(self, remove: bool) -> None:
+        """Wait for pending writes, then close (and optionally delete) the file."""
+        self._writer.shutdown(wait=True)
+        if remove:
+            self.path.unlink(missing_ok=True)
+        os.close(self._fd)
+
+    def _run(self, op: Callable[..., Any], *args: Any) -> None:
+        try:
+            op(*args)
+        except OSError as e:
+            logger.warning(f"Post-completion spill file {self.path.name} write failed: {e}")
+
+
+def read_pending(fd: int) -> list[dict[str, Any]]:
+    """Job records in a spill file that have no matching ``done`` record."""
+    with os.fdopen(os.dup(fd), "rb") as f:
+        f.seek(0)
+        jobs: dict[str, dict[str, Any]] = {}
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn write at the tail of a crashed process
+            if "done" in record:
+                jobs.pop(record["done"], None)
+            elif record.get("kind") in JOB_KINDS:
+                jobs[record["id"]] = record
+    return list(jobs.values())
+
+
+def _claim_orphans(spill_dir: Path, own: Path) -> list[tuple[Path, int, list[dict[str, Any]]]]:
+    """Lock and read spill files whose owning process is gone."""
+    claimed = []
+    for path in sorted(spill_dir.glob("*.jsonl")):
+        if path == own:
+            continue
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)  # owner still running
+            continue
+        claimed.append((path, fd, read_pending(fd)))
+    return claimed
+
+
+class PostCompletionQueue:
+    """Bounded two-priority queue with a fixed worker pool and a spill file."""
+
+    def __init__(self, max_size: int, spill: SpillFile | None = None):
+        self.max_size = max(1, max_size)
+        self._spill = spill
+        self._queues: tuple[deque[_Job], deque[_Job]] = (deque(), deque())
+        # Journaled jobs that did not fit, as (kind, key, journal kwargs, enqueued_at)
+        self._overflow: deque[tuple[str, str, dict[str, Any], float]] = deque()
+        self._outstanding = 0  # journaled jobs without a done record
+        self._running = 0
+        self._not_empty = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+
+    def depth(self) -> int:
+        return len(self._queues[0]) + len(self._queues[1])
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Any],
+        kwargs: dict[str, Any],
+        from_journal: bool = False,
+    ) -> None:
+        """Queue a job; ``from_journal`` marks kwargs that already are a journal record."""
+        priority = JOB_KINDS[kind][0]
+        key = _job_key(kind, kwargs)
+        now = time.monotonic()
+
+        record = None
+        if priority == PRIORITY_BILLING or from_journal:
+            record = self._journal(kind, key, kwargs, from_journal)
+
+        if self.depth() >= self.max_size:
+            if priority == PRIORITY_ANALYTICS or not self._evict_analytics():
+                if record is None:
+                    post_completion_jobs_dropped_total.labels(kind=kind, reason="full").inc()
+                else:
+                    self._overflow.append((kind, key, record, now))
+                    post_completion_jobs_spilled_total.labels(kind=kind).inc()
+                self._update_depth()
+                return
+
+        journaled = record is not None and self._spill is not None
+        self._queues[priority].append(_Job(kind, key, func, kwargs, now, journaled))
+        self._update_depth()
+        self._not_empty.set()
+
+    def start(self, workers: int) -> None:
+        loop = asyncio.get_running_loop()
+        self._workers = [
+            loop.create_task(self._worker(), name=f"post_completion_worker_{i}")
+            for i in range(max(1, workers))
+        ]
+
+    async def stop(self, timeout: float) -> int:
+        """Drain for up to ``timeout`` seconds; returns the number of jobs left."""
+        deadline = time.monotonic() + timeout
+        while (self.depth() or self._overflow or self._running) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        left = self.depth() + len(self._overflow)
+        for queue in self._queues:
+            for job in queue:
+                if not job.journaled and self._spill is not None:
+                    if self._journal(job.kind, job.key, job.kwargs) is None:
+                        post_completion_jobs_dropped_total.labels(
+                            kind=job.kind, reason="shutdown"
+                        ).inc()
+            queue.clear()
+        self._overflow.clear()
+        self._update_depth()
+
+        if self._spill is not None:
+            spill, self._spill = self._spill, None
+            await asyncio.to_thread(spill.close, self._outstanding == 0)
+        return left
+
+    def _journal(
+        self, kind: str, key: str, kwargs: dict[str, Any], from_journal: bool = False
+    ) -> dict[str, Any] | None:
+        """
+        Reduce a job to its journal record and append it to the spill file.
+
+        Returns the record, or None when there is nothing to keep. Without a
+        spill file the record is still returned, for the overflow list.
+        """
+        try:
+            record = kwargs if from_journal else _journal_record(kind, kwargs)
+            if record is not None and self._spill is not None:
+                self._spill.append({"id": key, "kind": kind, "at": time.time(), "kwargs": record})
+                self._outstanding += 1
+        except Exception as e:
+            logger.warning(f"Could not journal {kind} job {key}: {e}")
+            return None
+        return record
+
+    def _mark_done(self, key: str) -> None:
+        self._outstanding -= 1
+        if self._outstanding == 0 and self._spill.size >= _COMPACT_BYTES:
+            self._spill.truncate()
+        else:
+            self._spill.append({"done": key})
+
+    def _evict_analytics(self) -> bool:
+        analytics = self._queues[PRIORITY_ANALYTICS]
+        if not analytics:
+            return False
+        job = analytics.pop()
+        if job.journaled:
+            # A replayed record exists nowhere else; keep it in the overflow list
+            self._overflow.append((job.kind, job.key, job.kwargs, job.enqueued_at))
+            return True
+        post_completion_jobs_dropped_total.labels(kind=job.kind, reason="evicted").inc()
+        return True
+
+    def _pop(self) -> _Job | None:
+        for queue in self._queues:
+            if queue:
+                job = queue.popleft()
+                break
+        else:
+            return None
+
+        while self._overflow and self.depth() < self.max_size:
+            kind, key, record, enqueued_at = self._overflow.popleft()
+            self._queues[JOB_KINDS[kind][0]].append(
+                _Job(kind, key, _resolve(kind), record, enqueued_at, self._spill is not None)
+            )
+        return job
+
+    def _update_depth(self) -> None:
+        post_completion_queue_depth.labels(priority="billing").set(
+            len(self._queues[PRIORITY_BILLING]) + len(self._overflow)
+        )
+        post_completion_queue_depth.labels(priority="analytics").set(
+            len(self._queues[PRIORITY_ANALYTICS])
+        )
+
+    async def _worker(self) -> None:
+        while True:
+            job = self._pop()
+            if job is None:
+                self._not_empty.clear()
+                post_completion_queue_oldest_age_seconds.set(0)
+                await self._not_empty.wait()
+                continue
+
+            post_completion_queue_oldest_age_seconds.set(time.monotonic() - job.enqueued_at)
+            self._update_depth()
+            self._running += 1
+            try:
+                await _call(job.func, job.kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                post_completion_jobs_failed_total.labels(kind=job.kind).inc()
+                logger.error(f"Post-completion {job.kind} job {job.key} failed: {e}", exc_info=True)
+            finally:
+                self._running -= 1
+            # A job cancelled mid-run keeps no done record and is replayed on restart
+            if job.journaled and self._spill is not None:
+                self._mark_done(job.key)
+
+
+_queue: PostCompletionQueue | None = None
+
+
+def get_post_completion_queue() -> PostCompletionQueue | None:
+    """The running queue, or None when post-completion work runs detached."""
+    return _queue
+
+
+def submit_post_completion(kind: str, func: Callable[..., Any], kwargs: dict[str, Any]) -> None:
+    """
+    Schedule post-completion work of ``kind`` without waiting for it.
+
+    ``func`` is what runs now (normally the function named in ``JOB_KINDS``);
+    replays after a restart always use the registered function.
+    """
+    if _queue is not None:
+        _queue.submit(kind, func, kwargs)
+        return
+
+    task = asyncio.get_running_loop().create_task(_call(func, kwargs))
+    _detached.add(task)
+    task.add_done_callback(_detached.discard)
+
+
+async def _replay(queue: PostCompletionQueue, spill_dir: Path, own: Path) -> int:
+    claimed = await asyncio.to_thread(_claim_orphans, spill_dir, own)
+    seen: set[str] = set()
+    replayed = 0
+    for path, fd, records in claimed:
+        for record in records:
+            if record["id"] in seen:
+                continue
+            seen.add(record["id"])
+            kind = record["kind"]
+            try:
+                queue.submit(kind, _resolve(kind), record["kwargs"], from_journal=True)
+            except Exception as e:
+                logger.warning(f"Could not replay {kind} job {record['id']}: {e}")
+                continue
+            post_completion_jobs_replayed_total.labels(kind=kind).inc()
+            replayed += 1
+        # submit() journaled every replayed job, analytics included, in our own
+        # file (or kept it in the overflow list), so the orphan can go
+        path.unlink(missing_ok=True)
+        os.close(fd)
+    return replayed
+
+
+async def start_post_completion_queue() -> None:
+    """
+    Start the worker pool and replay spill files left by stopped processes.
+    Call this during application startup.
+    """
+    global _queue
+
+    if not Config.POST_COMPLETION_QUEUE_ENABLED:
+        logger.info("Post-completion queue disabled via POST_COMPLETION_QUEUE_ENABLED")
+        return
+    if _queue is not None:
+        return
+
+    spill = None
+    spill_dir = Path(Config.POST_COMPLETION_SPILL_DIR)
+    try:
+        spill_dir.mkdir(parents=True, exist_ok=True)
+        spill = SpillFile(spill_dir / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+    except OSError as e:
+        logger.warning(f"Post-completion spill file unavailable, running in memory only: {e}")
+
+    queue = PostCompletionQueue(Config.POST_COMPLETION_QUEUE_SIZE, spill)
+    queue.start(Config.POST_COMPLETION_WORKERS)
+    _queue = queue
+
+    if spill is not None:
+        replayed = await _replay(queue, spill_dir, spill.path)
+        if replayed:
+            logger.info(f"Replayed {replayed} post-completion jobs from spill files")
+    logger.info(
+        f"Post-completion queue started ({Config.POST_COMPLETION_WORKERS} workers, "
+        f"max {queue.max_size} jobs)"
+    )
+
+
+async def stop_post_completion_queue() -> None:
+    """
+    Drain the queue and stop its workers; unfinished jobs stay spilled.
+    Call this during application shutdown.
+    """
+    global _queue
+
+    queue, _queue = _queue, None
+    if queue is None:
+        return
+    left = await queue.stop(Config.POST_COMPLETION_DRAIN_SECONDS)
+    if left:
+        logger.warning(f"Post-completion queue stopped with {left} jobs left in the spill file")
+    else:
+        logger.info("Post-completion queue drained and stopped")
@@ -414,6 +414,33 @@ def get_pricing_cache_stats() -> dict[str, Any]:
     }
 
 
+def snapshot_pricing_cache() -> dict[str, dict[str, Any]]:
+    """Unexpired pricing entries (model_id → pricing), for the boot snapshot."""
+    now = time.time()
+    with _pricing_cache_lock:
+        return {
+            model_id: entry["data"]
+            for model_id, entry in _pricing_cache.items()
+            if now - entry["timestamp"] < _pricing_cache_ttl
+        }
+
+
+def restore_pricing_cache(entries: dict[str, dict[str, Any]]) -> int:
+    """Seed the pricing cache from a boot snapshot without overriding live entries.
+
+    Restored entries get a full TTL from now, the same staleness the live
+    cache already tolerates, and are then looked up again as usual.
+    """
+    now = time.time()
+    restored = 0
+    with _pricing_cache_lock:
+        for model_id, data in entries.items():
+            if model_id not in _pricing_cache:
+                _pricing_cache[model_id] = {"data": data, "timestamp": now}
+                restored += 1
+    return restored
+
+
 def _get_pricing_from_database(model_id: str, candidate_ids: set[str]) -> dict[str, float] | None:
     """Query database for pricing — delegates to the shared resolver.
 
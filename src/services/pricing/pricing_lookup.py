@@ -24,6 +24,8 @@ import time
 from pathlib import Path
 from typing import Any
 
+from src.services.cache.refreshable_snapshot import RefreshableSnapshot
+
 logger = logging.getLogger(__name__)
 
 # Manual pricing seed: src/data/manual_pricing.json (this file is src/services/pricing/).
@@ -103,18 +105,31 @@ OPENROUTER_PROVIDER_ALIASES: dict[str, str] = {
 # Pricing lookup tier order (checked in sequence, first match wins)
 PRICING_TIERS = ["database", "manual_json", "cross_reference"]
 
-# Cache for pricing data
-_pricing_cache: dict[str, Any] | None = None
-_pricing_cache_lock = threading.Lock()
-# Timestamp (monotonic seconds) of when _pricing_cache was last populated.
-# None means the cache has never been loaded or was explicitly invalidated.
-_pricing_cache_timestamp: float | None = None
-# How long (in seconds) the in-memory pricing cache is considered fresh.
-# After this interval the next access will clear the cache so it reloads from disk.
+# How long (in seconds) the in-memory manual pricing is served before the
+# routing snapshot refresher rereads the file.
 PRICING_CACHE_TTL: float = 15 * 60  # 15 minutes
 
-# Cache for OpenRouter pricing index (O(1) lookups)
-_openrouter_pricing_index: dict[str, dict] | None = None
+
+def _read_manual_pricing() -> dict[str, Any]:
+    try:
+        with open(_MANUAL_PRICING_PATH, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RuntimeError(f"cannot read {_MANUAL_PRICING_PATH}: {e}") from e
+
+    normalized: dict[str, Any] = {}
+    for gateway, models in raw.items():
+        gw = str(gateway).lower()
+        if isinstance(models, dict):
+            normalized[gw] = {str(k).lower(): v for k, v in models.items()}
+        else:
+            normalized[gw] = models
+    return normalized
+
+
+_manual_pricing: RefreshableSnapshot[dict[str, Any]] = RefreshableSnapshot(
+    "manual_pricing", _read_manual_pricing, {}, PRICING_CACHE_TTL
+)
 
 
 def load_manual_pricing() -> dict[str, Any]:
@@ -124,41 +139,12 @@ def load_manual_pricing() -> dict[str, Any]:
     upstream ``/models`` API returns no pricing (e.g. OpenAI, Anthropic). Without
     it, those models sync with ``None`` pricing and get filtered out of the served
     catalog (and blocked at the inference gate). Model keys are lowercased at load
-    time so lookups are O(1) and case-insensitive. Result is cached in-memory for
-    ``PRICING_CACHE_TTL``; thread-safe. On any read/parse error, caches and returns
-    an empty dict so callers degrade gracefully to the next tier.
+    time so lookups are O(1) and case-insensitive. The file is reread every
+    ``PRICING_CACHE_TTL`` by the routing snapshot refresher. On a read/parse error
+    the last good copy keeps being served (an empty dict before the first one),
+    so callers degrade gracefully to the next tier.
     """
-    global _pricing_cache, _pricing_cache_timestamp
-
-    now = time.monotonic()
-    with _pricing_cache_lock:
-        if (
-            _pricing_cache is not None
-            and _pricing_cache_timestamp is not None
-            and (now - _pricing_cache_timestamp) < PRICING_CACHE_TTL
-        ):
-            return _pricing_cache
-
-        try:
-            with open(_MANUAL_PRICING_PATH, encoding="utf-8") as f:
-                raw = json.load(f)
-        except (OSError, json.JSONDecodeError) as e:
-            logger.error(f"Failed to load manual pricing from {_MANUAL_PRICING_PATH}: {e}")
-            _pricing_cache = {}
-            _pricing_cache_timestamp = now
-            return _pricing_cache
-
-        normalized: dict[str, Any] = {}
-        for gateway, models in raw.items():
-            gw = str(gateway).lower()
-            if isinstance(models, dict):
-                normalized[gw] = {str(k).lower(): v for k, v in models.items()}
-            else:
-                normalized[gw] = models
-
-        _pricing_cache = normalized
-        _pricing_cache_timestamp = now
-        return _pricing_cache
+    return _manual_pricing.get()
 
 
 def get_model_pricing(gateway: str, model_id: str) -> dict[str, str] | None:
@@ -395,54 +381,51 @@ def _load_price_reference_catalog() -> list[dict]:
     return catalog
 
 
-def _build_openrouter_pricing_index() -> dict[str, dict]:
-    """Build an O(1) lookup index from OpenRouter models.
+def _index_price_reference_catalog() -> dict[str, dict]:
+    index: dict[str, dict] = {}
+    for model in _load_price_reference_catalog():
+        if not isinstance(model, dict):
+            continue
+        pricing = model.get("pricing")
+        if not pricing:
+            continue
+        model_id = model.get("id", "")
+        base_id = model_id.split("/")[-1] if "/" in model_id else model_id
 
-    Called once per catalog build cycle. Returns a dict keyed by multiple
-    aliases for each model (full id, base id, lowercase variants) so that
-    cross-reference lookups are O(1) instead of O(N).
-    """
-    global _openrouter_pricing_index
-    if _openrouter_pricing_index is not None:
-        return _openrouter_pricing_index
-
-    # CRITICAL: when we're inside the catalog rebuild path, calling
-    # get_cached_models("openrouter") would re-enter transform_db_models_batch
-    # → _build_openrouter_pricing_index → … (infinite recursion through the
-    # rebuild lock). Skip the index build entirely; cross-reference lookups
-    # are already a no-op while building (see _get_cross_reference_pricing
-    # at the _is_building_catalog() guard) so an empty index is harmless.
-    if _is_building_catalog():
-        return {}
+        for key in (model_id, model_id.lower(), base_id, base_id.lower()):
+            if key:
+                index[key] = pricing
+    return index
 
-    index: dict[str, dict] = {}
-    try:
-        openrouter_models = _load_price_reference_catalog()
-        for model in openrouter_models:
-            if not isinstance(model, dict):
-                continue
-            pricing = model.get("pricing")
-            if not pricing:
-                continue
-            model_id = model.get("id", "")
-            base_id = model_id.split("/")[-1] if "/" in model_id else model_id
 
-            for key in (model_id, model_id.lower(), base_id, base_id.lower()):
-                if key:
-                    index[key] = pricing
+# Rebuilt only when invalidated (after each OpenRouter catalog sync)
+_openrouter_pricing_index: RefreshableSnapshot[dict[str, dict]] = RefreshableSnapshot(
+    "openrouter_pricing_index", _index_price_reference_catalog, {}, None
+)
 
-        _openrouter_pricing_index = index
-    except Exception as e:
-        logger.warning(f"Failed to build OpenRouter pricing index: {e}")
-        _openrouter_pricing_index = {}
 
-    return _openrouter_pricing_index
+def _build_openrouter_pricing_index() -> dict[str, dict]:
+    """Return the O(1) lookup index over OpenRouter prices.
+
+    Keyed by multiple aliases for each model (full id, base id, lowercase
+    variants) so that cross-reference lookups are O(1) instead of O(N). The
+    index is rebuilt in the background after each invalidation; until then
+    the previous one is served.
+    """
+    # CRITICAL: never build inside the catalog rebuild path. Loading the price
+    # reference there re-enters transform_db_models_batch →
+    # _build_openrouter_pricing_index → … through the rebuild lock.
+    # Cross-reference lookups are already a no-op while building (see
+    # _get_cross_reference_pricing at the _is_building_catalog() guard), so
+    # whatever index is published is good enough.
+    if _is_building_catalog():
+        return _openrouter_pricing_index.current
+    return _openrouter_pricing_index.get()
 
 
 def invalidate_openrouter_pricing_index() -> None:
     """Invalidate the OpenRouter pricing index. Call when the OpenRouter cache is refreshed."""
-    global _openrouter_pricing_index
-    _openrouter_pricing_index = None
+    _openrouter_pricing_index.invalidate()
 
 
 # Anthropic and OpenRouter spell the same model differently: Anthropic ships
@@ -995,8 +978,6 @@ def get_pricing_metadata() -> dict[str, Any]:
 
 def refresh_pricing_cache():
     """Refresh the pricing cache by reloading from file and invalidating all derived caches."""
-    global _pricing_cache, _pricing_cache_timestamp
-    _pricing_cache = None
-    _pricing_cache_timestamp = None
     invalidate_openrouter_pricing_index()
-    return load_manual_pricing()
+    _manual_pricing.refresh(force=True)
+    return _manual_pricing.current
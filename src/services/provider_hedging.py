@@ -0,0 +1,282 @@
+"""
+Hedged provider requests.
+
+The failover chain tries providers strictly in order, so a provider that is
+merely slow (not failing) costs the caller the full timeout before the next one
+is tried. Hedging sends the same request to the next provider in the chain
+while the first is still running and keeps whichever answers first:
+
+- non-streaming: the hedge fires once the primary has run longer than the
+  model's recent p95 latency (:func:`hedge_delay`), so only the slow tail is
+  duplicated;
+- streaming: the top two providers race for the first chunk and the loser is
+  closed before anything reaches the client.
+
+Hedges are paid for twice upstream, so they draw from a retry-style budget:
+every eligible request deposits ``PROVIDER_HEDGE_BUDGET_PERCENT / 100`` of a
+token and every hedge spends one, capping hedges at that percentage of eligible
+traffic regardless of how slow providers get.
+
+Billing: attempts of one hedged request share a :class:`SettlementGate`.
+``ChatInferenceHandler`` claims the gate right before charging; the first
+claimant is billed and any other attempt raises :class:`HedgeLostError`
+instead. A cancelled or closed loser never reaches the charge step at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from src.config import Config
+from src.services.metrics.latency_sketch import LatencySketch
+from src.services.prometheus_metrics import provider_hedge_wins_total, provider_hedges_total
+
+logger = logging.getLogger(__name__)
+
+MODE_NON_STREAMING = "non_streaming"
+MODE_STREAMING = "streaming"
+
+# p95 needs this many samples in the current + previous window to be trusted
+_MIN_SAMPLES = 20
+_WINDOW_SECONDS = 300
+_MAX_TRACKED_MODELS = 2000
+# Burst allowance of the hedge budget, in hedges
+_BUDGET_CAPACITY = 10.0
+
+
+class HedgeLostError(Exception):
+    """Raised in a hedge attempt that finished after another one was billed."""
+
+
+class SettlementGate:
+    """First-claimant-wins token shared by the attempts of one hedged request."""
+
+    __slots__ = ("winner",)
+
+    def __init__(self):
+        self.winner: Any = None
+
+    def claim(self, owner: Any) -> bool:
+        """True if ``owner`` may bill; runs on the event loop, so no lock is needed."""
+        if self.winner is None:
+            self.winner = owner
+        return self.winner is owner
+
+
+class HedgeBudget:
+    """Token bucket: each eligible request adds ``ratio`` tokens, each hedge spends one."""
+
+    def __init__(self, ratio: float, capacity: float = _BUDGET_CAPACITY):
+        self.ratio = max(0.0, ratio)
+        self.capacity = capacity
+        self.tokens = 0.0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class _ModelLatency:
+    """Latency of one model over the current and previous window."""
+
+    __slots__ = ("current", "previous", "window_start")
+
+    def __init__(self, now: float):
+        self.current = LatencySketch()
+        self.previous = LatencySketch()
+        self.window_start = now
+
+    def rotate(self, now: float) -> None:
+        if now - self.window_start >= _WINDOW_SECONDS:
+            expired = now - self.window_start >= 2 * _WINDOW_SECONDS
+            self.previous = LatencySketch() if expired else self.current
+            self.current = LatencySketch()
+            self.window_start = now
+
+
+_latencies: dict[str, _ModelLatency] = {}
+_budget = HedgeBudget(Config.PROVIDER_HEDGE_BUDGET_PERCENT / 100)
+
+
+def record_latency(model: str, seconds: float) -> None:
+    """Feed a successful request's duration into the model's hedge delay."""
+    if not Config.PROVIDER_HEDGING_ENABLED:
+        return
+    now = time.monotonic()
+    stats = _latencies.get(model)
+    if stats is None:
+        if len(_latencies) >= _MAX_TRACKED_MODELS:
+            _latencies.pop(next(iter(_latencies)))
+        stats = _latencies[model] = _ModelLatency(now)
+    stats.rotate(now)
+    stats.current.add(seconds * 1000)
+
+
+def hedge_delay(model: str) -> float:
+    """Seconds to wait for the primary before hedging: the model's recent p95."""
+    stats = _latencies.get(model)
+    delay_ms = None
+    if stats is not None:
+        stats.rotate(time.monotonic())
+        merged = LatencySketch()
+        merged.merge(stats.previous)
+        merged.merge(stats.current)
+        if merged.count >= _MIN_SAMPLES:
+            delay_ms = merged.quantile(0.95)
+    if delay_ms is None:
+        delay_ms = Config.PROVIDER_HEDGE_DEFAULT_DELAY_MS
+    return max(delay_ms, Config.PROVIDER_HEDGE_MIN_DELAY_MS) / 1000
+
+
+def hedge_partner(provider_chain: list[str], index: int, streaming: bool) -> str | None:
+    """
+    Provider to hedge the attempt at ``provider_chain[index]`` with, if any.
+
+    Only the first attempt is hedged, with the next provider in the chain.
+    Calling this counts the request towards the hedge budget.
+    """
+    if not Config.PROVIDER_HEDGING_ENABLED:
+        return None
+    if streaming and not Config.PROVIDER_HEDGE_STREAMING_ENABLED:
+        return None
+    if index != 0 or len(provider_chain) < 2 or provider_chain[1] == provider_chain[0]:
+        return None
+    _budget.deposit()
+    return provider_chain[1]
+
+
+def _spend_budget(mode: str) -> bool:
+    if _budget.try_spend():
+        provider_hedges_total.labels(mode=mode, outcome="fired").inc()
+        return True
+    provider_hedges_total.labels(mode=mode, outcome="budget_denied").inc()
+    return False
+
+
+async def _cancel_all(tasks) -> None:
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except BaseException:
+            pass
+
+
+async def hedged_request[T](
+    attempt: Callable[[str, SettlementGate], Awaitable[T]],
+    primary: str,
+    hedge: str,
+    model: str,
+    on_hedge: Callable[[], Any] | None = None,
+) -> T:
+    """
+    Run ``attempt(primary, gate)``; if it hasn't finished within the model's
+    hedge delay, also run ``attempt(hedge, gate)`` and return the first success.
+
+    ``on_hedge`` is called once the hedge is actually started, so callers can
+    tell a hedge that ran (and failed) from one that never fired. If every
+    attempt fails, the primary's exception is raised.
+    """
+    gate = SettlementGate()
+    tasks = {asyncio.ensure_future(attempt(primary, gate)): "primary"}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay(model))
+        if done or not _spend_budget(MODE_NON_STREAMING):
+            return await next(iter(tasks))
+
+        logger.info(f"[Hedging] {primary} slow for {model}, hedging with {hedge}")
+        tasks[asyncio.ensure_future(attempt(hedge, gate))] = "hedge"
+        if on_hedge is not None:
+            on_hedge()
+
+        errors: dict[str, BaseException] = {}
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: tasks[t] != "primary"):
+                if task.exception() is None:
+                    provider_hedge_wins_total.labels(
+                        mode=MODE_NON_STREAMING, winner=tasks[task]
+                    ).inc()
+                    return task.result()
+                if not isinstance(task.exception(), HedgeLostError):
+                    errors[tasks[task]] = task.exception()
+
+        provider_hedge_wins_total.labels(mode=MODE_NON_STREAMING, winner="none").inc()
+        raise errors.get("primary") or errors.get("hedge") or HedgeLostError(model)
+    finally:
+        await _cancel_all([task for task in tasks if not task.done()])
+
+
+async def race_first_chunk[T](
+    primary: AsyncIterator[T],
+    hedge: AsyncIterator[T],
+    on_hedge: Callable[[], Any] | None = None,
+) -> AsyncIterator[T]:
+    """
+    Stream from whichever of ``primary`` / ``hedge`` yields its first item
+    first; the other is closed before that item is passed on. Falls back to
+    ``primary`` alone when the hedge budget is spent.
+
+    ``on_hedge`` is called once the hedge is actually started. If both fail
+    before producing anything, the primary's exception is raised.
+    """
+    if not _spend_budget(MODE_STREAMING):
+        await _close(hedge)
+        async for item in primary:
+            yield item
+        return
+
+    if on_hedge is not None:
+        on_hedge()
+
+    streams = {"primary": primary, "hedge": hedge}
+    tasks = {asyncio.ensure_future(anext(stream)): name for name, stream in streams.items()}
+    winner = first = None
+    errors: dict[str, BaseException] = {}
+    try:
+        pending = set(tasks)
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: tasks[t] != "primary"):
+                if task.exception() is None:
+                    winner, first = tasks[task], task.result()
+                    break
+                errors[tasks[task]] = task.exception()
+    finally:
+        await _cancel_all([task for task in tasks if not task.done()])
+        for name, stream in streams.items():
+            if name != winner:
+                await _close(stream)
+
+    if winner is None:
+        provider_hedge_wins_total.labels(mode=MODE_STREAMING, winner="none").inc()
+        error = errors.get("primary") or errors.get("hedge")
+        if isinstance(error, StopAsyncIteration):
+            return
+        raise error
+
+    provider_hedge_wins_total.labels(mode=MODE_STREAMING, winner=winner).inc()
+    yield first
+    async for item in streams[winner]:
+        yield item
+
+
+async def _close(stream: AsyncIterator[Any]) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is None:
+        return
+    try:
+        await aclose()
+    except Exception as e:
+        logger.debug(f"[Hedging] Closing losing stream failed: {e}")
@@ -9,23 +9,43 @@ Models available:
 - Chatterbox-Multilingual (500M): 23+ languages, zero-shot voice cloning
 - Chatterbox (500M): English with creative control (CFG weighting, exaggeration)
 
+Local inference keeps each model resident after its first load (or after
+startup warmup, see CHATTERBOX_WARMUP_MODELS) and runs synthesis on a fixed
+pool of inference threads with a bounded wait queue. Text is synthesized
+sentence by sentence, so :func:`open_speech_stream` can return audio as each
+sentence finishes rather than after the whole waveform exists.
+
 Reference: https://github.com/resemble-ai/chatterbox
 """
 
 import asyncio
 import base64
+import importlib
 import io
 import ipaddress
 import logging
 import os
+import re
+import struct
+import sys
 import tempfile
+import threading
 import time
+import wave
+from array import array
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
 
 from src.config import Config
+from src.services.prometheus_metrics import (
+    tts_inference_queue_depth,
+    tts_model_load_seconds,
+    tts_requests_rejected_total,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -241,6 +261,32 @@ def validate_language(model_id: str, language: str) -> bool:
     return language in CHATTERBOX_MODELS[model_id]["languages"]
 
 
+def _validate_speech_request(
+    text: str, model: str, voice_reference_url: str | None, language: str
+) -> None:
+    """Raise ValueError for input that no TTS backend would accept."""
+    if not text or not text.strip():
+        raise ValueError("Text cannot be empty")
+
+    if len(text) > CHATTERBOX_MAX_TEXT_LENGTH:
+        raise ValueError(
+            f"Text too long: {len(text)} characters (max: {CHATTERBOX_MAX_TEXT_LENGTH})"
+        )
+
+    if not validate_chatterbox_model(model):
+        raise ValueError(f"Invalid model: {model}. Available: {list(CHATTERBOX_MODELS.keys())}")
+
+    if model == "chatterbox-multilingual" and not validate_language(model, language):
+        raise ValueError(
+            f"Language '{language}' not supported by {model}. "
+            f"Supported: {CHATTERBOX_MODELS[model]['languages']}"
+        )
+
+    # Validate voice reference URL for SSRF
+    if voice_reference_url and not _is_safe_url(voice_reference_url):
+        raise ValueError("Invalid voice reference URL: must be a public HTTP/HTTPS URL")
+
+
 async def generate_speech(
     text: str,
     model: str = "chatterbox-turbo",
@@ -274,27 +320,7 @@ async def generate_speech(
         ValueError: If parameters are invalid
         RuntimeError: If TTS generation fails
     """
-    # Validate inputs
-    if not text or not text.strip():
-        raise ValueError("Text cannot be empty")
-
-    if len(text) > CHATTERBOX_MAX_TEXT_LENGTH:
-        raise ValueError(
-            f"Text too long: {len(text)} characters (max: {CHATTERBOX_MAX_TEXT_LENGTH})"
-        )
-
-    if not validate_chatterbox_model(model):
-        raise ValueError(f"Invalid model: {model}. Available: {list(CHATTERBOX_MODELS.keys())}")
-
-    if model == "chatterbox-multilingual" and not validate_language(model, language):
-        raise ValueError(
-            f"Language '{language}' not supported by {model}. "
-            f"Supported: {CHATTERBOX_MODELS[model]['languages']}"
-        )
-
-    # Validate voice reference URL for SSRF
-    if voice_reference_url and not _is_safe_url(voice_reference_url):
-        raise ValueError("Invalid voice reference URL: must be a public HTTP/HTTPS URL")
+    _validate_speech_request(text, model, voice_reference_url, language)
 
     # Check for API key (Resemble AI hosted API)
     resemble_api_key = getattr(Config, "RESEMBLE_API_KEY", None)
@@ -384,76 +410,372 @@ async def _generate_speech_api(
         raise RuntimeError(f"TTS generation failed: {str(e)}")
 
 
-def _run_tts_inference(
+# Module and class of each model in the chatterbox-tts package
+_MODEL_CLASSES = {
+    "chatterbox-turbo": ("chatterbox.tts_turbo", "ChatterboxTurboTTS"),
+    "chatterbox-multilingual": ("chatterbox.mtl_tts", "ChatterboxMultilingualTTS"),
+    "chatterbox": ("chatterbox.tts", "ChatterboxTTS"),
+}
+DEFAULT_SAMPLE_RATE = 24000
+
+# Sentence ends: ., !, ? or an ellipsis followed by whitespace, or a CJK full stop
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？])")
+# Shorter sentences are merged into the next one so prosody is not chopped up
+_MIN_SENTENCE_CHARS = 40
+
+# Resident models. Chatterbox keeps the voice conditionals on the model
+# instance, so each generate() call holds that model's lock and restores the
+# request's own conditionals first.
+_models: dict[str, Any] = {}
+_default_conds: dict[str, Any] = {}
+_model_locks: dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+# Inference workers and the slots (running + waiting) they admit
+_executor: ThreadPoolExecutor | None = None
+_slots: threading.BoundedSemaphore | None = None
+
+
+class TTSQueueFull(RuntimeError):
+    """Every inference worker is busy and the wait queue is full."""
+
+
+def _load_model(model: str) -> Any:
+    """Load a Chatterbox model from the chatterbox-tts package onto the best device."""
+    try:
+        import torch
+
+        module_name, class_name = _MODEL_CLASSES[model]
+        model_class = getattr(importlib.import_module(module_name), class_name)
+    except ImportError as e:
+        logger.error(f"Chatterbox TTS import failed: {e}")
+        raise RuntimeError(
+            "Local TTS requires torch and chatterbox-tts. "
+            "Install with: pip install torch chatterbox-tts"
+        ) from e
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    logger.info(f"Loading {model} on {device} for Chatterbox TTS")
+    return model_class.from_pretrained(device=device)
+
+
+def _model_lock(model: str) -> threading.Lock:
+    with _registry_lock:
+        return _model_locks.setdefault(model, threading.Lock())
+
+
+def get_tts_model(model: str) -> Any:
+    """Return the resident instance of a Chatterbox model, loading it on first use."""
+    tts_model = _models.get(model)
+    if tts_model is not None:
+        return tts_model
+
+    with _model_lock(model):
+        tts_model = _models.get(model)
+        if tts_model is None:
+            start = time.monotonic()
+            tts_model = _load_model(model)
+            elapsed = time.monotonic() - start
+            tts_model_load_seconds.labels(model=model).observe(elapsed)
+            logger.info(f"Loaded Chatterbox model {model} in {elapsed:.1f}s")
+            _default_conds[model] = getattr(tts_model, "conds", None)
+            _models[model] = tts_model
+    return tts_model
+
+
+def warmup_tts_models(models: tuple[str, ...] | list[str]) -> None:
+    """Load the given models now so the first request pays only generation cost."""
+    for model in models:
+        if not validate_chatterbox_model(model):
+            logger.warning(f"Skipping TTS warmup for unknown model: {model}")
+            continue
+        try:
+            get_tts_model(model)
+        except Exception as e:
+            logger.warning(f"TTS warmup failed for {model}: {e}")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _slots
+    if _executor is None:
+        with _registry_lock:
+            if _executor is None:
+                workers = max(1, Config.CHATTERBOX_INFERENCE_WORKERS)
+                _slots = threading.BoundedSemaphore(workers + max(0, Config.CHATTERBOX_MAX_QUEUED))
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="chatterbox-tts"
+                )
+    return _executor
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences, merging any shorter than ``_MIN_SENTENCE_CHARS``."""
+    spans = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        if match.start() - start >= _MIN_SENTENCE_CHARS:
+            spans.append((start, match.start()))
+            start = match.end()
+    if spans and len(text[start:].strip()) < _MIN_SENTENCE_CHARS:
+        start = spans.pop()[0]  # a short tail joins the previous sentence
+    spans.append((start, len(text)))
+    return [sentence for a, b in spans if (sentence := text[a:b].strip())]
+
+
+def wav_stream_header(sample_rate: int) -> bytes:
+    """WAV header for mono 16-bit PCM of unknown length (both sizes set to the maximum)."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        0xFFFFFFFF,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        1,  # mono
+        sample_rate,
+        sample_rate * 2,
+        2,
+        16,
+        b"data",
+        0xFFFFFFFF,
+    )
+
+
+def _to_pcm16(wav: Any) -> bytes:
+    """Convert a waveform in [-1, 1] (torch tensor or flat float sequence) to PCM16 LE."""
+    if hasattr(wav, "detach"):
+        samples = wav.detach().cpu().flatten().clamp(-1.0, 1.0)
+        return (samples * 32767).short().numpy().astype("<i2").tobytes()
+
+    pcm = array("h", (int(max(-1.0, min(1.0, x)) * 32767) for x in wav))
+    if sys.byteorder == "big":
+        pcm.byteswap()
+    return pcm.tobytes()
+
+
+def _generate_wav(
+    tts_model: Any,
+    model: str,
     text: str,
+    audio_prompt_path: str | None,
+    language: str,
+    exaggeration: float,
+    cfg_weight: float,
+) -> Any:
+    if model == "chatterbox-turbo":
+        return tts_model.generate(text, audio_prompt_path=audio_prompt_path)
+    if model == "chatterbox-multilingual":
+        return tts_model.generate(text, language_id=language, audio_prompt_path=audio_prompt_path)
+    return tts_model.generate(
+        text,
+        audio_prompt_path=audio_prompt_path,
+        exaggeration=exaggeration,
+        cfg_weight=cfg_weight,
+    )
+
+
+def _synthesize_sentences(
+    emit: Callable[[Any], None],
+    cancelled: threading.Event,
     model: str,
+    sentences: list[str],
     audio_prompt_path: str | None,
     language: str,
     exaggeration: float,
     cfg_weight: float,
-) -> tuple[Any, int]:
-    """Run TTS inference synchronously (to be called in thread pool).
-
-    Args:
-        text: Text to synthesize
-        model: Model name
-        audio_prompt_path: Path to voice reference audio file
-        language: Language code
-        exaggeration: Exaggeration level
-        cfg_weight: CFG weight
+) -> None:
+    """
+    Inference-worker job: emit the sample rate, then PCM per sentence, then None.
 
-    Returns:
-        Tuple of (wav tensor, sample_rate)
+    Any error is emitted in place of the remaining items. The worker slot is
+    released before the final item, so a caller that saw the end can submit
+    again at once. The voice reference is only read for the first sentence;
+    later sentences reuse the conditionals it produced. The job owns
+    ``audio_prompt_path`` and deletes it.
     """
-    import torch
-    import torchaudio
+    outcome = None
+    try:
+        tts_model = get_tts_model(model)
+        emit(getattr(tts_model, "sr", DEFAULT_SAMPLE_RATE))
+        conds = None if audio_prompt_path else _default_conds.get(model)
+        for sentence in sentences:
+            if cancelled.is_set():
+                return
+            with _model_lock(model):
+                if conds is not None:
+                    tts_model.conds = conds
+                wav = _generate_wav(
+                    tts_model,
+                    model,
+                    sentence,
+                    audio_prompt_path if conds is None else None,
+                    language,
+                    exaggeration,
+                    cfg_weight,
+                )
+                conds = getattr(tts_model, "conds", None)
+            emit(_to_pcm16(wav))
+    except Exception as e:
+        outcome = e
+    finally:
+        _slots.release()
+        tts_inference_queue_depth.dec()
+        _remove_voice_reference(audio_prompt_path)
+        emit(outcome)
 
-    # Select device
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    logger.info(f"Using device: {device} for Chatterbox TTS")
 
-    # Generate based on model type
-    if model == "chatterbox-turbo":
-        from chatterbox.tts_turbo import ChatterboxTurboTTS
+def _remove_voice_reference(path: str | None) -> None:
+    if path:
+        try:
+            os.unlink(path)
+        except OSError as e:
+            logger.warning(f"Failed to clean up temp file {path}: {e}")
 
-        tts_model = ChatterboxTurboTTS.from_pretrained(device=device)
-        wav = tts_model.generate(text, audio_prompt_path=audio_prompt_path)
 
-    elif model == "chatterbox-multilingual":
-        from chatterbox.mtl_tts import ChatterboxMultilingualTTS
+async def _download_voice_reference(voice_reference_url: str) -> str:
+    """Download a voice reference to a temp file (size-limited, SSRF-safe); returns its path."""
+    # Resolve URL to IP to prevent DNS rebinding attacks
+    is_safe, url_info = _resolve_and_validate_url(voice_reference_url)
+    if not is_safe or not url_info:
+        raise ValueError("Invalid voice reference URL")
 
-        tts_model = ChatterboxMultilingualTTS.from_pretrained(device=device)
-        wav = tts_model.generate(
-            text,
-            language_id=language,
-            audio_prompt_path=audio_prompt_path,
-        )
+    safe_url, original_hostname = url_info
+    headers = {"Host": original_hostname}  # Preserve original Host header
 
-    else:  # chatterbox (original)
-        from chatterbox.tts import ChatterboxTTS
+    async with httpx.AsyncClient(timeout=CHATTERBOX_TIMEOUT) as client:
+        # Use streaming to limit download size
+        async with client.stream("GET", safe_url, headers=headers) as response:
+            response.raise_for_status()
 
-        tts_model = ChatterboxTTS.from_pretrained(device=device)
-        wav = tts_model.generate(
-            text,
-            audio_prompt_path=audio_prompt_path,
-            exaggeration=exaggeration,
-            cfg_weight=cfg_weight,
+            # Check Content-Length header if available
+            content_length = response.headers.get("content-length")
+            if content_length and int(content_length) > CHATTERBOX_MAX_VOICE_REF_SIZE:
+                raise ValueError(
+                    f"Voice reference file too large: {int(content_length)} bytes "
+                    f"(max: {CHATTERBOX_MAX_VOICE_REF_SIZE} bytes)"
+                )
+
+            # Stream to temp file with size limit
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+                try:
+                    total_size = 0
+                    async for chunk in response.aiter_bytes(chunk_size=8192):
+                        total_size += len(chunk)
+                        if total_size > CHATTERBOX_MAX_VOICE_REF_SIZE:
+                            raise ValueError(
+                                f"Voice reference file too large "
+                                f"(max: {CHATTERBOX_MAX_VOICE_REF_SIZE} bytes)"
+                            )
+                        f.write(chunk)
+                except BaseException:
+                    _remove_voice_reference(f.name)
+                    raise
+                return f.name
+
+
+async def _start_local_synthesis(
+    text: str,
+    model: str,
+    voice_reference_url: str | None,
+    language: str,
+    exaggeration: float,
+    cfg_weight: float,
+) -> tuple[int, AsyncIterator[bytes]]:
+    """
+    Queue local synthesis and wait until the model is ready.
+
+    Returns (sample_rate, PCM chunks, one per sentence). Raises TTSQueueFull
+    when the inference queue is full, and RuntimeError when the model fails to load.
+    """
+    audio_prompt_path = None
+    if voice_reference_url:
+        audio_prompt_path = await _download_voice_reference(voice_reference_url)
+
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        _remove_voice_reference(audio_prompt_path)
+        tts_requests_rejected_total.inc()
+        raise TTSQueueFull("TTS inference queue is full, retry shortly")
+    tts_inference_queue_depth.inc()
+
+    loop = asyncio.get_running_loop()
+    results: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def emit(item: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(results.put_nowait, item)
+        except RuntimeError:
+            cancelled.set()  # the caller's event loop is gone
+
+    try:
+        executor.submit(
+            _synthesize_sentences,
+            emit,
+            cancelled,
+            model,
+            split_sentences(text),
+            audio_prompt_path,
+            language,
+            exaggeration,
+            cfg_weight,
         )
+    except BaseException:
+        _slots.release()
+        tts_inference_queue_depth.dec()
+        _remove_voice_reference(audio_prompt_path)
+        raise
 
-    sample_rate = tts_model.sr if hasattr(tts_model, "sr") else 24000
+    try:
+        sample_rate = await results.get()
+    except BaseException:
+        cancelled.set()
+        raise
+    if isinstance(sample_rate, BaseException):
+        if isinstance(sample_rate, RuntimeError):
+            raise sample_rate
+        raise RuntimeError(f"TTS generation failed: {sample_rate}") from sample_rate
+
+    async def chunks() -> AsyncIterator[bytes]:
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise RuntimeError(f"TTS generation failed: {item}") from item
+                yield item
+        finally:
+            cancelled.set()  # stop generating if the consumer went away
 
-    # Convert tensor to WAV bytes
-    audio_buffer = io.BytesIO()
-    torchaudio.save(audio_buffer, wav.cpu(), sample_rate, format="wav")
-    audio_buffer.seek(0)
+    return sample_rate, chunks()
 
-    # Encode as base64
-    audio_base64 = base64.b64encode(audio_buffer.read()).decode("utf-8")
 
-    # Calculate duration
-    audio_duration = wav.shape[-1] / sample_rate
+async def open_speech_stream(
+    text: str,
+    model: str = "chatterbox-turbo",
+    voice_reference_url: str | None = None,
+    language: str = "en",
+    exaggeration: float = 1.0,
+    cfg_weight: float = 0.5,
+) -> tuple[int, AsyncIterator[bytes]]:
+    """Start local synthesis and return (sample_rate, mono PCM16 chunks per sentence).
 
-    return audio_base64, audio_duration, sample_rate
+    Input, queue and model-load errors are raised here, before any audio, so
+    callers can still answer with an error status. Prefix the chunks with
+    :func:`wav_stream_header` to serve them as a WAV stream.
+
+    Raises:
+        ValueError: If parameters are invalid
+        TTSQueueFull: If the inference queue is full
+        RuntimeError: If the model cannot be loaded (the iterator raises it for
+            failures after the first sentence)
+    """
+    _validate_speech_request(text, model, voice_reference_url, language)
+    return await _start_local_synthesis(
+        text, model, voice_reference_url, language, exaggeration, cfg_weight
+    )
 
 
 async def _generate_speech_local(
@@ -469,68 +791,25 @@ async def _generate_speech_local(
     This uses the open-source chatterbox-tts Python package for local inference.
     Requires: pip install chatterbox-tts
 
-    Note: Blocking operations are offloaded to a thread pool to avoid blocking
-    the event loop.
+    Note: Inference runs on the shared Chatterbox worker pool, so the event
+    loop is never blocked and models are loaded only once.
     """
-    try:
-        import torch  # noqa: F401
-        import torchaudio  # noqa: F401
-    except ImportError:
-        raise RuntimeError(
-            "Local TTS requires torch and torchaudio. " "Install with: pip install torch torchaudio"
-        )
-
-    audio_prompt_path = None
     start_time = time.time()
 
     try:
-        # Download voice reference if provided
-        if voice_reference_url:
-            # Resolve URL to IP to prevent DNS rebinding attacks
-            is_safe, url_info = _resolve_and_validate_url(voice_reference_url)
-            if not is_safe or not url_info:
-                raise ValueError("Invalid voice reference URL")
-
-            safe_url, original_hostname = url_info
-            headers = {"Host": original_hostname}  # Preserve original Host header
-
-            async with httpx.AsyncClient(timeout=CHATTERBOX_TIMEOUT) as client:
-                # Use streaming to limit download size
-                async with client.stream("GET", safe_url, headers=headers) as response:
-                    response.raise_for_status()
-
-                    # Check Content-Length header if available
-                    content_length = response.headers.get("content-length")
-                    if content_length and int(content_length) > CHATTERBOX_MAX_VOICE_REF_SIZE:
-                        raise ValueError(
-                            f"Voice reference file too large: {int(content_length)} bytes "
-                            f"(max: {CHATTERBOX_MAX_VOICE_REF_SIZE} bytes)"
-                        )
-
-                    # Stream to temp file with size limit
-                    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-                        total_size = 0
-                        async for chunk in response.aiter_bytes(chunk_size=8192):
-                            total_size += len(chunk)
-                            if total_size > CHATTERBOX_MAX_VOICE_REF_SIZE:
-                                raise ValueError(
-                                    f"Voice reference file too large (max: {CHATTERBOX_MAX_VOICE_REF_SIZE} bytes)"
-                                )
-                            f.write(chunk)
-                        audio_prompt_path = f.name
-
-        # Run TTS inference in thread pool to avoid blocking event loop
-        loop = asyncio.get_event_loop()
-        audio_base64, audio_duration, sample_rate = await loop.run_in_executor(
-            None,  # Use default thread pool
-            _run_tts_inference,
-            text,
-            model,
-            audio_prompt_path,
-            language,
-            exaggeration,
-            cfg_weight,
+        sample_rate, chunks = await _start_local_synthesis(
+            text, model, voice_reference_url, language, exaggeration, cfg_weight
         )
+        pcm = b"".join([chunk async for chunk in chunks])
+
+        audio_buffer = io.BytesIO()
+        with wave.open(audio_buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm)
+        audio_base64 = base64.b64encode(audio_buffer.getvalue()).decode("utf-8")
+        audio_duration = len(pcm) / 2 / sample_rate
 
         generation_time = time.time() - start_time
         logger.info(
@@ -547,16 +826,8 @@ async def _generate_speech_local(
             "provider": "local",
         }
 
-    except ImportError as e:
-        logger.error(f"Chatterbox TTS import failed: {e}")
-        raise RuntimeError("Chatterbox TTS not installed. Install with: pip install chatterbox-tts")
+    except TTSQueueFull:
+        raise
     except Exception as e:
         logger.error(f"Chatterbox TTS generation failed: {e}", exc_info=True)
         raise RuntimeError(f"TTS generation failed: {str(e)}")
-    finally:
-        # Always clean up temp file
-        if audio_prompt_path:
-            try:
-                os.unlink(audio_prompt_path)
-            except OSError as e:
-                logger.warning(f"Failed to clean up temp file {audio_prompt_path}: {e}")
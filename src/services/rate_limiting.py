@@ -16,6 +16,7 @@ from typing import Any
 
 import redis
 
+from src.config.redis_config import redis_pipeline
 from src.db.rate_limits import get_rate_limit_config, update_rate_limit_config
 from src.services.rate_limiting_fallback import get_fallback_rate_limit_manager
 
@@ -272,25 +273,20 @@ class SlidingWindowRateLimiter:
         When consume=False, only reports the current bucket state without
         taking a token (used for post-request accounting checks).
 
-        FIX (2026-02-06): Removed invalid `await` on sync Redis pipeline operations.
-        Pipeline commands queue up and execute together - they don't return awaitables.
-        Used asyncio.to_thread() to wrap the blocking execute() call.
+        Each step is one pipelined round-trip through ``redis_pipeline`` (async
+        client when enabled, else the sync client in a thread).
         """
-        import asyncio
-
         now = time.time()
         key = f"burst:{api_key}"
 
         if self.redis_client:
             # Use Redis for distributed burst limiting
             # Step 1: Get current state
-            def _get_burst_state():
-                pipe = self.redis_client.pipeline()
+            def _get_burst_state(pipe):
                 pipe.hget(key, "tokens")
                 pipe.hget(key, "last_refill")
-                return pipe.execute()
 
-            results = await asyncio.to_thread(_get_burst_state)
+            results = await redis_pipeline(self.redis_client, _get_burst_state)
             current_tokens = float(results[0] or 0)
             last_refill = float(results[1] or now)
 
@@ -309,14 +305,12 @@ class SlidingWindowRateLimiter:
                     }
 
                 # Consume one token
-                def _consume_token():
-                    pipe = self.redis_client.pipeline()
+                def _consume_token(pipe):
                     pipe.hset(key, "tokens", current_tokens - 1)
                     pipe.hset(key, "last_refill", now)
                     pipe.expire(key, 300)  # Expire after 5 minutes
-                    return pipe.execute()
 
-                await asyncio.to_thread(_consume_token)
+                await redis_pipeline(self.redis_client, _consume_token)
 
                 return {
                     "allowed": True,
@@ -399,29 +393,23 @@ class SlidingWindowRateLimiter:
     ) -> dict[str, Any]:
         """Check sliding window using Redis
 
-        FIX (2026-02-06): Removed invalid `await` on sync Redis pipeline operations.
-        Pipeline commands queue up and execute together - they don't return awaitables.
-        Used asyncio.to_thread() to wrap the blocking execute() calls.
+        Reads and updates are one pipelined round-trip each via ``redis_pipeline``.
         """
-        import asyncio
-
         # Get current usage for different time windows
         minute_key = f"rate_limit:{api_key}:minute:{now.strftime('%Y%m%d%H%M')}"
         hour_key = f"rate_limit:{api_key}:hour:{now.strftime('%Y%m%d%H')}"
         day_key = f"rate_limit:{api_key}:day:{now.strftime('%Y%m%d')}"
 
-        # Get current counts - wrap sync Redis calls in thread
-        def _get_current_counts():
-            pipe = self.redis_client.pipeline()
+        # Get current counts
+        def _get_current_counts(pipe):
             pipe.get(f"{minute_key}:requests")
             pipe.get(f"{minute_key}:tokens")
             pipe.get(f"{hour_key}:requests")
             pipe.get(f"{hour_key}:tokens")
             pipe.get(f"{day_key}:requests")
             pipe.get(f"{day_key}:tokens")
-            return pipe.execute()
 
-        results = await asyncio.to_thread(_get_current_counts)
+        results = await redis_pipeline(self.redis_client, _get_current_counts)
 
         minute_requests = int(results[0] or 0)
         minute_tokens = int(results[1] or 0)
@@ -493,9 +481,8 @@ class SlidingWindowRateLimiter:
                 "reason": "Day token limit exceeded",
             }
 
-        # All checks passed, update counters - wrap sync Redis calls in thread
-        def _update_counters():
-            pipe = self.redis_client.pipeline()
+        # All checks passed, update counters
+        def _update_counters(pipe):
             if count_request:
                 pipe.incr(f"{minute_key}:requests")
                 pipe.incr(f"{hour_key}:requests")
@@ -511,9 +498,8 @@ class SlidingWindowRateLimiter:
             pipe.expire(f"{hour_key}:tokens", 7200)
             pipe.expire(f"{day_key}:requests", 172800)  # 2 days
             pipe.expire(f"{day_key}:tokens", 172800)
-            return pipe.execute()
 
-        await asyncio.to_thread(_update_counters)
+        await redis_pipeline(self.redis_client, _update_counters)
 
         return {
             "allowed": True,
@@ -617,6 +603,12 @@ class RateLimitManager:
 
     async def get_key_config(self, api_key: str) -> RateLimitConfig:
         """Get rate limit configuration for a specific API key"""
+        from src.services.request_principal import peek_request_principal
+
+        principal = peek_request_principal(api_key)
+        if principal is not None:
+            return self._config_from_dict(principal.rate_limit_config)
+
         if api_key in self.key_configs:
             return self.key_configs[api_key]
 
@@ -636,23 +628,28 @@ class RateLimitManager:
         try:
             config_data = await asyncio.to_thread(get_rate_limit_config, api_key)
             if config_data:
-                return RateLimitConfig(
-                    requests_per_minute=config_data.get("requests_per_minute", 250),
-                    requests_per_hour=config_data.get("requests_per_hour", 1000),
-                    requests_per_day=config_data.get("requests_per_day", 10000),
-                    tokens_per_minute=config_data.get("tokens_per_minute", 10000),
-                    tokens_per_hour=config_data.get("tokens_per_hour", 100000),
-                    tokens_per_day=config_data.get("tokens_per_day", 1000000),
-                    burst_limit=config_data.get("burst_limit", 500),
-                    concurrency_limit=config_data.get("concurrency_limit", 50),
-                    window_size_seconds=config_data.get("window_size_seconds", 60),
-                )
+                return self._config_from_dict(config_data)
         except Exception as e:
             logger.error(f"Failed to load rate limit config from DB: {e}")
 
         # Return default config if not found or error
         return DEFAULT_CONFIG
 
+    @staticmethod
+    def _config_from_dict(config_data: dict) -> RateLimitConfig:
+        """Build a RateLimitConfig from a stored per-key config dict."""
+        return RateLimitConfig(
+            requests_per_minute=config_data.get("requests_per_minute", 250),
+            requests_per_hour=config_data.get("requests_per_hour", 1000),
+            requests_per_day=config_data.get("requests_per_day", 10000),
+            tokens_per_minute=config_data.get("tokens_per_minute", 10000),
+            tokens_per_hour=config_data.get("tokens_per_hour", 100000),
+            tokens_per_day=config_data.get("tokens_per_day", 1000000),
+            burst_limit=config_data.get("burst_limit", 500),
+            concurrency_limit=config_data.get("concurrency_limit", 50),
+            window_size_seconds=config_data.get("window_size_seconds", 60),
+        )
+
     async def increment_request(self, api_key: str, config: RateLimitConfig, tokens_used: int = 0):
         """Increment request count (handled by fallback system)"""
         # Note: Fallback manager doesn't have increment_request, it's handled in check_rate_limit
@@ -788,6 +785,10 @@ class RateLimitManager:
         # Also update in database
         await self._save_key_config_to_db(api_key, config)
 
+        from src.services.request_principal import invalidate_request_principal
+
+        invalidate_request_principal(api_key=api_key)
+
     async def _get_severe_rate_limit_config_with_user(
         self, user: dict | None
     ) -> RateLimitConfig | None:
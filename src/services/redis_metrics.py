@@ -3,7 +3,7 @@ Redis-based metrics service for real-time monitoring and dashboards.
 
 This service provides:
 - Request counters (per provider, model, hour)
-- Latency tracking (sorted sets with TTL)
+- Latency tracking (mergeable per-minute quantile sketches with TTL)
 - Error tracking (lists, last 100 errors per provider)
 - Provider health scores (sorted set)
 - Cost tracking (hash with hourly keys)
@@ -12,7 +12,6 @@ This service provides:
 All data is stored in Redis with appropriate TTLs to prevent unbounded growth.
 """
 
-import asyncio
 import json
 import logging
 import time
@@ -20,10 +19,20 @@ from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-from src.config.redis_config import get_redis_client
+from src.config.redis_config import get_redis_client, redis_command, redis_pipeline
+from src.services.metrics.latency_sketch import LatencySketch, record_into, sketch_key
 
 logger = logging.getLogger(__name__)
 
+# Clamped provider health update, queued in record_request's pipeline so the
+# read-modify-write costs no extra round-trip
+_HEALTH_SCORE_SCRIPT = """
+local score = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]) or '100')
+score = math.max(0, math.min(100, score + tonumber(ARGV[2])))
+redis.call('ZADD', KEYS[1], score, ARGV[1])
+return tostring(score)
+"""
+
 
 @dataclass
 class RequestMetrics:
@@ -62,7 +71,7 @@ class RedisMetrics:
 
     Key patterns:
     - metrics:{provider}:{hour} -> Hash (request counts, costs)
-    - latency:{provider}:{model} -> Sorted Set (timestamp:latency_ms)
+    - latsk:{provider}:{YYYYmmddHHMM}:{model} -> Hash (latency sketch buckets)
     - errors:{provider} -> List (last 100 errors)
     - health:{provider} -> Float (health score 0-100)
     - circuit:{provider}:{model} -> String (circuit breaker state)
@@ -109,56 +118,49 @@ class RedisMetrics:
             hour_key = now.strftime("%Y-%m-%d:%H")
             metrics_key = f"metrics:{provider}:{hour_key}"
 
-            # Use pipeline for atomic operations
-            pipe = self.redis.pipeline()
-
-            # 1. Increment request counters
-            pipe.hincrby(metrics_key, "total_requests", 1)
-            if success:
-                pipe.hincrby(metrics_key, "successful_requests", 1)
-            else:
-                pipe.hincrby(metrics_key, "failed_requests", 1)
-
-            # 2. Track tokens
-            pipe.hincrby(metrics_key, "tokens_input", tokens_input)
-            pipe.hincrby(metrics_key, "tokens_output", tokens_output)
-
-            # 3. Track cost
-            pipe.hincrbyfloat(metrics_key, "total_cost", cost)
-
-            # 4. Set expiry (2 hours TTL for hourly aggregates)
-            pipe.expire(metrics_key, 7200)
-
-            # 5. Track latency in sorted set (score = timestamp, value = latency_ms)
-            latency_key = f"latency:{provider}:{model}"
             timestamp = time.time()
-            pipe.zadd(latency_key, {str(latency_ms): timestamp})
-
-            # Remove old latencies (keep last hour only)
-            cutoff = timestamp - 3600
-            pipe.zremrangebyscore(latency_key, 0, cutoff)
-            pipe.expire(latency_key, 7200)
-
-            # 6. Track errors
-            if not success and error_message:
-                error_key = f"errors:{provider}"
-                error_data = json.dumps(
-                    {
-                        "model": model,
-                        "error": error_message[:500],  # Limit error message length
-                        "timestamp": timestamp,
-                        "latency_ms": latency_ms,
-                    }
-                )
-                pipe.lpush(error_key, error_data)
-                pipe.ltrim(error_key, 0, 99)  # Keep last 100 errors
-                pipe.expire(error_key, 3600)  # 1 hour TTL
 
-            # 7. Update health score
-            await self._update_health_score_pipe(pipe, provider, success)
-
-            # Execute all operations atomically in a thread to avoid blocking the event loop
-            await asyncio.to_thread(pipe.execute)
+            def build(pipe):
+                # 1. Increment request counters
+                pipe.hincrby(metrics_key, "total_requests", 1)
+                if success:
+                    pipe.hincrby(metrics_key, "successful_requests", 1)
+                else:
+                    pipe.hincrby(metrics_key, "failed_requests", 1)
+
+                # 2. Track tokens
+                pipe.hincrby(metrics_key, "tokens_input", tokens_input)
+                pipe.hincrby(metrics_key, "tokens_output", tokens_output)
+
+                # 3. Track cost
+                pipe.hincrbyfloat(metrics_key, "total_cost", cost)
+
+                # 4. Set expiry (2 hours TTL for hourly aggregates)
+                pipe.expire(metrics_key, 7200)
+
+                # 5. Track latency in this minute's sketch (a few HINCRBYs, constant size)
+                record_into(pipe, sketch_key(provider, model, now), latency_ms)
+
+                # 6. Track errors
+                if not success and error_message:
+                    error_key = f"errors:{provider}"
+                    error_data = json.dumps(
+                        {
+                            "model": model,
+                            "error": error_message[:500],  # Limit error message length
+                            "timestamp": timestamp,
+                            "latency_ms": latency_ms,
+                        }
+                    )
+                    pipe.lpush(error_key, error_data)
+                    pipe.ltrim(error_key, 0, 99)  # Keep last 100 errors
+                    pipe.expire(error_key, 3600)  # 1 hour TTL
+
+                # 7. Update health score
+                self._update_health_score_pipe(pipe, provider, success)
+
+            # Everything above is one round-trip, off the event loop
+            await redis_pipeline(self.redis, build)
 
             logger.debug(
                 f"Recorded metrics: {provider}/{model} - "
@@ -169,25 +171,11 @@ class RedisMetrics:
             # Never let metrics recording break the application
             logger.warning(f"Failed to record Redis metrics: {e}")
 
-    async def _update_health_score_pipe(self, pipe, provider: str, success: bool):
-        """Update provider health score (internal helper for pipeline)"""
-        health_key = f"health:{provider}"
-
-        # Adjust health score based on success/failure
+    def _update_health_score_pipe(self, pipe, provider: str, success: bool):
+        """Queue a provider health score update (internal helper for pipeline)"""
+        # Adjust health score based on success/failure, clamped to 0-100 server-side
         delta = 2 if success else -5
-
-        # We can't easily get current value in a pipeline, so we'll do this separately
-        # This is a minor inconsistency but acceptable for health scores
-        try:
-            current = await asyncio.to_thread(self.redis.zscore, "provider_health", provider)
-            if current is None:
-                current = 100.0
-
-            new_score = max(0.0, min(100.0, current + delta))
-            pipe.zadd("provider_health", {provider: new_score})
-        except Exception:
-            # If we can't get current score, just set to a reasonable default
-            pipe.zadd("provider_health", {provider: 85.0 if success else 50.0})
+        pipe.eval(_HEALTH_SCORE_SCRIPT, 1, "provider_health", provider, delta)
 
     async def get_provider_health(self, provider: str) -> float:
         """
@@ -200,7 +188,7 @@ class RedisMetrics:
             return 100.0
 
         try:
-            score = self.redis.zscore("provider_health", provider)
+            score = await redis_command(self.redis, "zscore", "provider_health", provider)
             return float(score) if score is not None else 100.0
         except Exception as e:
             logger.warning(f"Failed to get health score for {provider}: {e}")
@@ -222,7 +210,7 @@ class RedisMetrics:
 
         try:
             error_key = f"errors:{provider}"
-            errors = self.redis.lrange(error_key, 0, limit - 1)
+            errors = await redis_command(self.redis, "lrange", error_key, 0, limit - 1)
 
             return [json.loads(err) for err in errors]
         except Exception as e:
@@ -270,8 +258,33 @@ class RedisMetrics:
             logger.warning(f"Failed to get hourly stats for {provider}: {e}")
             return {}
 
+    async def get_latency_sketch(
+        self, provider: str, model: str, window_minutes: int = 60
+    ) -> LatencySketch:
+        """
+        Merge the per-minute latency sketches of the last ``window_minutes``.
+
+        One pipelined HGETALL per minute; cost is independent of traffic.
+        """
+        now = datetime.now(UTC).replace(second=0, microsecond=0)
+
+        def build(pipe):
+            for minute_offset in range(window_minutes):
+                pipe.hgetall(sketch_key(provider, model, now - timedelta(minutes=minute_offset)))
+
+        hashes = await redis_pipeline(self.redis, build)
+
+        sketch = LatencySketch()
+        for data in hashes:
+            sketch.merge_hash(data)
+        return sketch
+
     async def get_latency_percentiles(
-        self, provider: str, model: str, percentiles: list[int] = [50, 95, 99]
+        self,
+        provider: str,
+        model: str,
+        percentiles: list[int] = [50, 95, 99],
+        window_minutes: int = 60,
     ) -> dict[str, float]:
         """
         Calculate latency percentiles from recent data.
@@ -280,33 +293,26 @@ class RedisMetrics:
             provider: Provider name
             model: Model ID
             percentiles: List of percentiles to calculate (e.g., [50, 95, 99])
+            window_minutes: How far back to look (default: last hour)
 
         Returns:
-            Dictionary mapping percentile to latency in ms
+            Dictionary mapping percentile to latency in ms (within 1%)
         """
         if not self.enabled:
             return {}
 
         try:
-            latency_key = f"latency:{provider}:{model}"
+            sketch = await self.get_latency_sketch(provider, model, window_minutes)
 
-            # Get all latencies from last hour
-            latencies = self.redis.zrange(latency_key, 0, -1)
-
-            if not latencies:
+            if not sketch.count:
                 return {}
 
-            # Convert to integers and sort
-            latency_values = sorted([int(lat) for lat in latencies])
-            n = len(latency_values)
-
             result = {}
             for p in percentiles:
-                idx = max(0, min(n - 1, int((p / 100.0) * n)))
-                result[f"p{p}"] = float(latency_values[idx])
+                result[f"p{p}"] = round(sketch.quantile(p / 100.0), 2)
 
-            result["count"] = n
-            result["avg"] = sum(latency_values) / n if n > 0 else 0.0
+            result["count"] = sketch.count
+            result["avg"] = sketch.avg
 
             return result
         except Exception as e:
@@ -334,7 +340,7 @@ class RedisMetrics:
                 {"state": state, "failure_count": failure_count, "updated_at": time.time()}
             )
 
-            self.redis.setex(circuit_key, 300, circuit_data)  # 5 min TTL
+            await redis_command(self.redis, "setex", circuit_key, 300, circuit_data)  # 5 min TTL
 
             logger.debug(f"Updated circuit breaker: {provider}/{model} -> {state}")
         except Exception as e:
@@ -352,7 +358,9 @@ class RedisMetrics:
 
         try:
             # Get all providers from sorted set (high to low)
-            providers = self.redis.zrevrange("provider_health", 0, -1, withscores=True)
+            providers = await redis_command(
+                self.redis, "zrevrange", "provider_health", 0, -1, withscores=True
+            )
 
             # Decode bytes to strings if needed
             return {
@@ -0,0 +1,307 @@
+"""Per-request principal snapshot: everything the request path knows about a caller.
+
+Before dispatch, a chat request needs the API key, its user, tier and balances,
+the active plan and its limits, plan-window usage, the key's rate-limit config,
+its routing policy / preferences and whether the user has BYOK keys. Those used
+to come from separate lookups (``db/users.get_user``, ``db/plans.get_user_plan``,
+``get_user_usage_within_plan_limits``, ``is_admin_tier_user``,
+``RateLimitManager.get_key_config``, ``db/routing_policies``, BYOK), each with
+its own TTL, invalidation rules and unbounded per-worker dict.
+
+``RequestPrincipal`` is one immutable snapshot of all of it, loaded with a
+single ``get_request_principal`` RPC and cached as ONE bounded-LRU entry per API
+key. The accessors listed above consult the snapshot first via
+:func:`peek_request_principal` / :func:`peek_request_principal_for_user` (cache
+only, never a DB call), so once the chat route has loaded the principal a warm
+request makes no DB calls before dispatch.
+
+Invalidation: the existing cache-invalidation hooks for credits
+(``db/users.invalidate_user_cache*``), plans/usage (``db/plans.invalidate_*``),
+keys (``db/api_keys``), rate-limit config, settings and BYOK writes all call
+:func:`invalidate_request_principal`.
+
+Gated by ``Config.REQUEST_PRINCIPAL_ENABLED``; when off, peeks always miss and
+every accessor behaves exactly as before.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+_cache: "OrderedDict[str, RequestPrincipal]" = OrderedDict()
+# user_id -> API keys with a cached principal (a user may have several keys)
+_user_index: dict[int, set[str]] = {}
+_lock = threading.Lock()
+
+_stats = {"hits": 0, "misses": 0, "loads": 0, "load_errors": 0, "invalidations": 0}
+
+
+@dataclass(frozen=True)
+class RequestPrincipal:
+    """Immutable snapshot of a caller's auth, billing and routing state."""
+
+    api_key: str
+    api_key_id: int | None
+    user: dict[str, Any]
+    plan: dict[str, Any] | None
+    is_admin: bool
+    usage: dict[str, int]
+    rate_limit_config: dict[str, Any]
+    routing_policy: dict[str, Any] | None
+    byok_providers: frozenset[str] = field(default_factory=frozenset)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def user_id(self) -> int:
+        return self.user["id"]
+
+    @property
+    def tier(self) -> str | None:
+        return self.user.get("tier")
+
+    @property
+    def balance(self) -> float:
+        """Spendable credits: subscription allowance plus purchased credits."""
+        return float(self.user.get("subscription_allowance") or 0) + float(
+            self.user.get("purchased_credits") or 0
+        )
+
+    @property
+    def routing_preferences(self) -> tuple[str, str]:
+        """(mode, industry) auto-routing preferences from ``users.settings``."""
+        from src.services.routing_preferences import (
+            DEFAULT_INDUSTRY,
+            DEFAULT_MODE,
+            INDUSTRIES,
+            VALID_MODES,
+        )
+
+        settings = self.user.get("settings") or {}
+        mode = settings.get("routing_mode")
+        industry = settings.get("routing_industry")
+        return (
+            mode if mode in VALID_MODES else DEFAULT_MODE,
+            industry if industry in INDUSTRIES else DEFAULT_INDUSTRY,
+        )
+
+    def has_byok_key(self, provider_slug: str) -> bool:
+        return provider_slug in self.byok_providers
+
+    def is_expired(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return now - self.loaded_at >= Config.REQUEST_PRINCIPAL_TTL_SECONDS
+
+
+def build_request_principal(api_key: str, doc: dict[str, Any]) -> RequestPrincipal:
+    """Build a snapshot from the ``get_request_principal`` JSONB document."""
+    from src.db.plans import build_user_plan
+    from src.db.rate_limits import DEFAULT_KEY_RATE_LIMIT_CONFIG, rate_limit_config_from_row
+
+    key = doc.get("key") or {}
+    user = dict(doc["user"])
+
+    # Same enrichment db/users._get_user_uncached applies, so callers of
+    # get_user() see an identical dict whichever path produced it.
+    if key:
+        user["key_id"] = key.get("id")
+        user["key_name"] = key.get("key_name") or ""
+        user["environment_tag"] = key.get("environment_tag") or "live"
+        user["scope_permissions"] = key.get("scope_permissions")
+        user["is_primary"] = key.get("is_primary", False)
+    user["api_key"] = api_key
+
+    user_plan = doc.get("user_plan")
+    plan = build_user_plan(user["id"], user_plan, doc.get("plan")) if user_plan else None
+
+    if key.get("rate_limit_config"):
+        rate_limit_config = dict(key["rate_limit_config"])
+    elif doc.get("rate_limit_configs_row"):
+        rate_limit_config = rate_limit_config_from_row(doc["rate_limit_configs_row"])
+    else:
+        rate_limit_config = dict(DEFAULT_KEY_RATE_LIMIT_CONFIG)
+
+    usage = doc.get("usage") or {}
+    return RequestPrincipal(
+        api_key=api_key,
+        api_key_id=key.get("id"),
+        user=user,
+        plan=plan,
+        is_admin=bool(doc.get("is_admin")),
+        usage={
+            "daily_requests": int(usage.get("daily_requests") or 0),
+            "daily_tokens": int(usage.get("daily_tokens") or 0),
+            "monthly_requests": int(usage.get("monthly_requests") or 0),
+            "monthly_tokens": int(usage.get("monthly_tokens") or 0),
+        },
+        rate_limit_config=rate_limit_config,
+        routing_policy=doc.get("routing_policy"),
+        byok_providers=frozenset(doc.get("byok_providers") or ()),
+    )
+
+
+def _store(principal: RequestPrincipal) -> None:
+    with _lock:
+        _cache[principal.api_key] = principal
+        _cache.move_to_end(principal.api_key)
+        _user_index.setdefault(principal.user_id, set()).add(principal.api_key)
+        while len(_cache) > Config.REQUEST_PRINCIPAL_MAX_ENTRIES:
+            _, evicted = _cache.popitem(last=False)
+            _unindex(evicted)
+
+
+def _unindex(principal: RequestPrincipal) -> None:
+    keys = _user_index.get(principal.user_id)
+    if keys is not None:
+        keys.discard(principal.api_key)
+        if not keys:
+            _user_index.pop(principal.user_id, None)
+
+
+def peek_request_principal(api_key: str | None) -> RequestPrincipal | None:
+    """Return the cached, unexpired principal for ``api_key``. Never hits the DB."""
+    if not api_key or not Config.REQUEST_PRINCIPAL_ENABLED:
+        return None
+    with _lock:
+        principal = _cache.get(api_key)
+        if principal is None:
+            return None
+        if principal.is_expired():
+            _cache.pop(api_key, None)
+            _unindex(principal)
+            return None
+        _cache.move_to_end(api_key)
+        return principal
+
+
+def peek_request_principal_for_user(user_id: int | None) -> RequestPrincipal | None:
+    """Return any cached, unexpired principal for ``user_id``. Never hits the DB.
+
+    Plan, usage, admin tier and BYOK presence are per-user, so any of the
+    user's keys answers those questions.
+    """
+    if user_id is None or not Config.REQUEST_PRINCIPAL_ENABLED:
+        return None
+    with _lock:
+        keys = list(_user_index.get(user_id, ()))
+    for api_key in keys:
+        principal = peek_request_principal(api_key)
+        if principal is not None:
+            return principal
+    return None
+
+
+def get_request_principal(api_key: str | None) -> RequestPrincipal | None:
+    """Return the principal for ``api_key``, loading it with one RPC on a miss.
+
+    Returns None when disabled, the key is unknown, or the RPC is unavailable —
+    callers then fall through to the per-query accessors. Synchronous (blocking
+    DB call on a miss); call via ``asyncio.to_thread`` from async code.
+    """
+    if not api_key or not Config.REQUEST_PRINCIPAL_ENABLED:
+        return None
+
+    principal = _cache_hit(api_key)
+    if principal is not None:
+        return principal
+
+    try:
+        from src.db.request_principal import fetch_request_principal
+
+        doc = fetch_request_principal(api_key)
+    except Exception as e:
+        return _load_failed(e)
+    return _load(api_key, doc)
+
+
+async def get_request_principal_async(api_key: str | None) -> RequestPrincipal | None:
+    """Async :func:`get_request_principal`.
+
+    Awaits the RPC on the async DB client when ``Config.SUPABASE_ASYNC_ENABLED``
+    (concurrent misses for one key share the call); otherwise runs the sync
+    loader in a thread.
+    """
+    if not Config.SUPABASE_ASYNC_ENABLED:
+        return await asyncio.to_thread(get_request_principal, api_key)
+    if not api_key or not Config.REQUEST_PRINCIPAL_ENABLED:
+        return None
+
+    principal = _cache_hit(api_key)
+    if principal is not None:
+        return principal
+
+    try:
+        from src.db.request_principal import fetch_request_principal_async
+
+        doc = await fetch_request_principal_async(api_key)
+    except Exception as e:
+        return _load_failed(e)
+    return _load(api_key, doc)
+
+
+def _cache_hit(api_key: str) -> RequestPrincipal | None:
+    principal = peek_request_principal(api_key)
+    _stats["hits" if principal is not None else "misses"] += 1
+    return principal
+
+
+def _load_failed(error: Exception) -> None:
+    _stats["load_errors"] += 1
+    logger.warning("Request principal load failed, using per-query path: %s", error)
+    return None
+
+
+def _load(api_key: str, doc: dict[str, Any] | None) -> RequestPrincipal | None:
+    if not doc or not doc.get("user"):
+        return None
+    try:
+        principal = build_request_principal(api_key, doc)
+    except Exception as e:
+        return _load_failed(e)
+
+    _stats["loads"] += 1
+    _store(principal)
+    return principal
+
+
+def invalidate_request_principal(api_key: str | None = None, user_id: int | None = None) -> None:
+    """Drop cached principals for an API key and/or every key of a user.
+
+    Called from credits, plans, keys, rate-limit config, settings and BYOK write
+    paths. Cheap no-op when nothing is cached.
+    """
+    with _lock:
+        if api_key is not None:
+            principal = _cache.pop(api_key, None)
+            if principal is not None:
+                _unindex(principal)
+                _stats["invalidations"] += 1
+        if user_id is not None:
+            for key in _user_index.pop(user_id, set()):
+                if _cache.pop(key, None) is not None:
+                    _stats["invalidations"] += 1
+
+
+def clear_request_principal_cache() -> None:
+    """Drop every cached principal (tests, admin cache flush)."""
+    with _lock:
+        _cache.clear()
+        _user_index.clear()
+
+
+def get_request_principal_cache_stats() -> dict[str, Any]:
+    """Get cache statistics for monitoring."""
+    return {
+        **_stats,
+        "cached_principals": len(_cache),
+        "max_entries": Config.REQUEST_PRINCIPAL_MAX_ENTRIES,
+        "ttl_seconds": Config.REQUEST_PRINCIPAL_TTL_SECONDS,
+        "enabled": Config.REQUEST_PRINCIPAL_ENABLED,
+    }
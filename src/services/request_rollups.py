@@ -0,0 +1,340 @@
+"""
+In-memory accumulation of request rollup deltas.
+
+Every saved request record (``save_chat_completion_request*`` and the
+``settle_request`` RPC) calls :func:`record_request`, which folds it into an
+accumulator keyed by (minute, model_id, user_id). A background task flushes the
+accumulators every ``Config.REQUEST_ROLLUPS_FLUSH_SECONDS`` through
+``apply_request_rollup_deltas``, which adds each delta to the minute, hour and
+day buckets in one statement. The rollup write rate therefore scales with the
+number of active (model, user) pairs per minute, not with request volume.
+
+Request records are saved from worker threads, so the accumulator is guarded by
+a lock. Memory is bounded by ``Config.REQUEST_ROLLUPS_MAX_KEYS``: reaching it
+triggers an early flush, and deltas for new keys are dropped (and counted) if
+the buffer reaches twice the limit first. A failed flush is dropped too; the
+hourly rebuild in :func:`run_rollup_maintenance` recomputes closed buckets from
+chat_completion_requests, so lost deltas only delay accuracy.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from src.config import Config
+from src.db.request_rollups import LATENCY_BOUNDS_MS, latency_slot
+
+logger = logging.getLogger(__name__)
+
+_HIST_SLOTS = len(LATENCY_BOUNDS_MS) + 1
+
+# Deltas per apply_request_rollup_deltas call
+_FLUSH_BATCH = 500
+
+
+class _Delta:
+    """Accumulated requests for one (minute, model, user) key since the last flush."""
+
+    __slots__ = (
+        "requests",
+        "errors",
+        "input_tokens",
+        "output_tokens",
+        "cost_usd",
+        "latency_ms_sum",
+        "latency_hist",
+        "first_at",
+        "last_at",
+    )
+
+    def __init__(self, now: datetime):
+        self.requests = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self.latency_ms_sum = 0.0
+        self.latency_hist = [0] * _HIST_SLOTS
+        self.first_at = now
+        self.last_at = now
+
+    def to_row(self, minute: datetime, model_id: int, user_id: int) -> dict[str, Any]:
+        return {
+            "minute": minute.isoformat(),
+            "model_id": model_id,
+            "user_id": user_id,
+            "requests": self.requests,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "latency_ms_sum": round(self.latency_ms_sum, 3),
+            "latency_hist": self.latency_hist,
+            "first_request_at": self.first_at.isoformat(),
+            "last_request_at": self.last_at.isoformat(),
+        }
+
+
+# (minute, model_id or (model_name, provider_name), user_id)
+_Key = tuple[datetime, Any, int]
+
+
+class RequestRollupAggregator:
+    """Per-worker accumulator of request rollup deltas."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max(1, max_keys)
+        self._deltas: dict[_Key, _Delta] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._flush_requested: asyncio.Event | None = None
+        # (model_name, provider_name) -> model_id for records saved without one
+        self._model_ids: dict[tuple[str, str | None], int | None] = {}
+
+        self.samples = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.flush_errors = 0
+
+    def add(
+        self,
+        *,
+        model_id: int | None,
+        model_name: str | None = None,
+        provider_name: str | None = None,
+        user_id: int | None,
+        status: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cost_usd: float = 0.0,
+        processing_time_ms: float = 0.0,
+        now: datetime | None = None,
+    ) -> bool:
+        """Accumulate one request; returns False if it was dropped."""
+        now = now or datetime.now(UTC)
+        if model_id is None and model_name:
+            model = (model_name, provider_name)
+        else:
+            model = model_id or 0
+        key = (now.replace(second=0, microsecond=0), model, user_id or -1)
+
+        with self._lock:
+            delta = self._deltas.get(key)
+            if delta is None:
+                if len(self._deltas) >= self.max_keys:
+                    self.request_flush()
+                    if len(self._deltas) >= self.max_keys * 2:
+                        self.dropped += 1
+                        return False
+                delta = self._deltas[key] = _Delta(now)
+            delta.requests += 1
+            if status == "failed":
+                delta.errors += 1
+            delta.input_tokens += input_tokens or 0
+            delta.output_tokens += output_tokens or 0
+            delta.cost_usd += cost_usd or 0.0
+            latency = processing_time_ms or 0.0
+            delta.latency_ms_sum += latency
+            delta.latency_hist[latency_slot(latency)] += 1
+            delta.last_at = now
+            self.samples += 1
+        return True
+
+    def _resolve_model_id(self, model: Any) -> int:
+        if isinstance(model, int):
+            return model
+        if model not in self._model_ids:
+            from src.db.chat_completion_requests import get_model_id_by_name
+
+            self._model_ids[model] = get_model_id_by_name(*model)
+        return self._model_ids[model] or 0
+
+    def drain(self) -> list[dict[str, Any]]:
+        """Take every buffered delta as rows for apply_request_rollup_deltas."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+        return [
+            delta.to_row(minute, self._resolve_model_id(model), user_id)
+            for (minute, model, user_id), delta in deltas.items()
+        ]
+
+    def flush_sync(self) -> int:
+        """Write the buffered deltas (blocking); returns the number of rollup rows upserted."""
+        from src.db.request_rollups import apply_rollup_deltas
+
+        rows = self.drain()
+        written = 0
+        for i in range(0, len(rows), _FLUSH_BATCH):
+            batch = rows[i : i + _FLUSH_BATCH]
+            try:
+                result = apply_rollup_deltas(batch)
+            except Exception as e:
+                self.flush_errors += 1
+                logger.warning(f"Request rollup flush of {len(batch)} deltas failed: {e}")
+                continue
+            if result is None:
+                # Migration not applied yet; nothing to do until it is
+                break
+            written += result
+        if rows:
+            self.flushes += 1
+            self.rows_written += written
+        return written
+
+    async def flush(self) -> int:
+        return await asyncio.to_thread(self.flush_sync)
+
+    def request_flush(self) -> None:
+        if self._loop is not None and self._flush_requested is not None:
+            self._loop.call_soon_threadsafe(self._flush_requested.set)
+
+    def pending_keys(self) -> int:
+        return len(self._deltas)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "pending_keys": len(self._deltas),
+            "max_keys": self.max_keys,
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "flush_errors": self.flush_errors,
+        }
+
+
+_aggregator: RequestRollupAggregator | None = None
+_flush_task: asyncio.Task | None = None
+
+
+def get_request_rollup_aggregator() -> RequestRollupAggregator | None:
+    """The running aggregator, or None when rollups are not being collected."""
+    return _aggregator if _flush_task is not None else None
+
+
+def record_request(
+    *,
+    model_id: int | None,
+    user_id: int | None,
+    status: str,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    cost_usd: float = 0.0,
+    processing_time_ms: float = 0.0,
+    model_name: str | None = None,
+    provider_name: str | None = None,
+) -> None:
+    """Fold a saved request record into the rollups; a no-op when not collecting."""
+    aggregator = get_request_rollup_aggregator()
+    if aggregator is None:
+        return
+    try:
+        aggregator.add(
+            model_id=model_id,
+            model_name=model_name,
+            provider_name=provider_name,
+            user_id=user_id,
+            status=status,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=cost_usd,
+            processing_time_ms=processing_time_ms,
+        )
+    except Exception as e:
+        logger.debug(f"Failed to record request rollup: {e}")
+
+
+async def _flush_loop(aggregator: RequestRollupAggregator) -> None:
+    interval = Config.REQUEST_ROLLUPS_FLUSH_SECONDS
+    while True:
+        try:
+            await asyncio.wait_for(aggregator._flush_requested.wait(), timeout=interval)
+        except TimeoutError:
+            pass
+        aggregator._flush_requested.clear()
+
+        started = time.monotonic()
+        try:
+            written = await aggregator.flush()
+            if written:
+                logger.debug(
+                    f"Flushed {written} request rollup rows in "
+                    f"{(time.monotonic() - started) * 1000:.0f}ms"
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Request rollup flush loop error: {e}")
+
+
+def start_request_rollups() -> None:
+    """
+    Start collecting request rollup deltas with a periodic flush.
+    Call this during application startup.
+    """
+    global _aggregator, _flush_task
+
+    if not Config.REQUEST_ROLLUPS_ENABLED:
+        logger.info("Request rollups disabled via REQUEST_ROLLUPS_ENABLED")
+        return
+    if _flush_task is not None:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning("Event loop not running, cannot start request rollups")
+        return
+
+    _aggregator = RequestRollupAggregator(Config.REQUEST_ROLLUPS_MAX_KEYS)
+    _aggregator._loop = loop
+    _aggregator._flush_requested = asyncio.Event()
+    _flush_task = loop.create_task(_flush_loop(_aggregator), name="request_rollup_flush")
+    logger.info("Request rollup aggregator started")
+
+
+async def stop_request_rollups() -> None:
+    """
+    Stop the flush task and drain buffered deltas.
+    Call this during application shutdown.
+    """
+    global _aggregator, _flush_task
+
+    task, aggregator = _flush_task, _aggregator
+    _flush_task = None
+    _aggregator = None
+
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    if aggregator is not None:
+        aggregator._loop = None
+        written = await aggregator.flush()
+        logger.info(f"Request rollup aggregator stopped (final drain: {written} rows)")
+
+
+def run_rollup_maintenance(now: datetime | None = None) -> dict[str, Any]:
+    """
+    Rebuild recently closed buckets from chat_completion_requests and prune old rows.
+
+    Recomputing the last ``Config.REQUEST_ROLLUPS_REBUILD_HOURS`` repairs deltas
+    lost to failed flushes, restarts or workers running without the aggregator.
+    Blocking; run it in a thread.
+    """
+    from src.db.request_rollups import prune_rollups, rebuild_rollups, rollups_available
+
+    if not rollups_available():
+        return {"skipped": "not_deployed"}
+
+    now = now or datetime.now(UTC)
+    rebuilt = rebuild_rollups(now - timedelta(hours=Config.REQUEST_ROLLUPS_REBUILD_HOURS), now)
+    pruned = prune_rollups(now)
+    return {"rebuilt_rows": rebuilt, "pruned": pruned}
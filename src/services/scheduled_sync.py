@@ -787,3 +787,102 @@ def get_pricing_drift_status() -> dict[str, Any]:
         "last_worst_deficit_pct": _last_pricing_drift_status["last_worst_deficit_pct"],
         "last_error": _last_pricing_drift_status["last_error"],
     }
+
+
+# ============================================================================
+# Request rollup maintenance — rebuilds recently closed rollup buckets from
+# chat_completion_requests (repairing deltas lost to failed flushes or
+# restarts) and prunes minute/hour rows past their retention.
+# ============================================================================
+
+_rollup_scheduler: AsyncIOScheduler | None = None
+
+_last_rollup_maintenance_status: dict[str, Any] = {
+    "last_run_time": None,
+    "last_rebuilt_rows": None,
+    "last_pruned": None,
+    "last_error": None,
+}
+
+
+async def run_scheduled_rollup_maintenance():
+    """Rebuild the last few hours of request rollups and prune expired rows."""
+    from src.services.request_rollups import run_rollup_maintenance
+
+    now = datetime.now(UTC)
+    _last_rollup_maintenance_status["last_run_time"] = now
+
+    try:
+        result = await asyncio.to_thread(run_rollup_maintenance, now)
+        _last_rollup_maintenance_status["last_rebuilt_rows"] = result.get("rebuilt_rows")
+        _last_rollup_maintenance_status["last_pruned"] = result.get("pruned")
+        _last_rollup_maintenance_status["last_error"] = None
+        logger.info("Request rollup maintenance: %s", result)
+    except Exception as e:
+        _last_rollup_maintenance_status["last_error"] = str(e)
+        logger.warning("Request rollup maintenance failed (non-fatal): %s", e)
+
+
+def start_rollup_maintenance_scheduler():
+    """Start the APScheduler for request rollup maintenance (app lifespan)."""
+    global _rollup_scheduler
+
+    if not Config.REQUEST_ROLLUPS_ENABLED:
+        logger.info("Request rollup maintenance DISABLED: REQUEST_ROLLUPS_ENABLED=false")
+        return
+
+    interval_minutes = Config.REQUEST_ROLLUPS_MAINTENANCE_INTERVAL_MINUTES
+    logger.info(
+        "Starting request rollup maintenance scheduler (interval: %s min)", interval_minutes
+    )
+    try:
+        _rollup_scheduler = AsyncIOScheduler()
+        _rollup_scheduler.add_job(
+            run_scheduled_rollup_maintenance,
+            trigger=IntervalTrigger(minutes=interval_minutes),
+            id="request_rollup_maintenance",
+            name="Request Rollup Maintenance Job",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+        _rollup_scheduler.start()
+        logger.info(
+            "✅ Request rollup maintenance scheduler started (next run in %s min)",
+            interval_minutes,
+        )
+    except Exception as e:
+        logger.error("❌ Failed to start request rollup maintenance scheduler: %s", e)
+        logger.exception(e)
+
+
+def stop_rollup_maintenance_scheduler():
+    """Stop the rollup maintenance APScheduler gracefully (called during shutdown)."""
+    global _rollup_scheduler
+
+    if _rollup_scheduler is None:
+        return
+    logger.info("Stopping request rollup maintenance scheduler...")
+    try:
+        _rollup_scheduler.shutdown(wait=True)
+        logger.info("✅ Request rollup maintenance scheduler stopped successfully")
+    except Exception as e:
+        logger.error("❌ Error stopping request rollup maintenance scheduler: %s", e)
+    finally:
+        _rollup_scheduler = None
+
+
+def get_rollup_maintenance_status() -> dict[str, Any]:
+    """Get the current status of request rollup maintenance (for health monitoring)."""
+    return {
+        "enabled": Config.REQUEST_ROLLUPS_ENABLED,
+        "interval_minutes": Config.REQUEST_ROLLUPS_MAINTENANCE_INTERVAL_MINUTES,
+        "last_run_time": (
+            _last_rollup_maintenance_status["last_run_time"].isoformat()
+            if _last_rollup_maintenance_status["last_run_time"]
+            else None
+        ),
+        "last_rebuilt_rows": _last_rollup_maintenance_status["last_rebuilt_rows"],
+        "last_pruned": _last_rollup_maintenance_status["last_pruned"],
+        "last_error": _last_rollup_maintenance_status["last_error"],
+    }
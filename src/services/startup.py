@@ -9,6 +9,7 @@ See: health-service/main.py
 import asyncio
 import logging
 import os
+import time
 from contextlib import asynccontextmanager
 from datetime import UTC
 
@@ -103,6 +104,242 @@ def _init_google_models_sync() -> None:
     initialize_google_models()
 
 
+async def _start_leader_jobs() -> None:
+    """
+    Start the jobs that must run once per cluster rather than once per worker.
+
+    Called directly at startup with a single worker, and by the leader elector
+    (src/services/leader_election.py) on the elected worker otherwise.
+    """
+    from src.config import Config
+
+    # Optionally sync high-priority models on startup (can be disabled for faster startup).
+    # Periodic model sync is handled by the scheduled_sync APScheduler (started below)
+    # and the external GitHub cron — the canonical catalog-sync engine is the single
+    # source (MVP Task 14: provider_model_sync_service's duplicate loop removed).
+    sync_models_on_startup = os.environ.get("SYNC_MODELS_ON_STARTUP", "false").lower() == "true"
+    if sync_models_on_startup:
+
+        async def sync_initial_models_background():
+            try:
+                from src.services.model_catalog_sync import sync_all_providers
+
+                # Warm a few high-priority providers quickly; the scheduler covers the rest.
+                high_priority = ["openrouter", "openai", "anthropic", "groq"]
+                result = await asyncio.to_thread(
+                    sync_all_providers, provider_slugs=high_priority, dry_run=False
+                )
+                if result.get("success"):
+                    logger.info(
+                        f"✓ Initial model sync: {result.get('total_models_synced', 0)} models"
+                    )
+            except Exception as e:
+                logger.warning(f"Initial model sync warning: {e}")
+
+        _create_background_task(sync_initial_models_background(), name="sync_initial_models")
+
+    # Initialize autonomous error monitoring in background
+    async def init_error_monitoring_background():
+        try:
+            error_monitoring_enabled = (
+                os.environ.get("ERROR_MONITORING_ENABLED", "true").lower() == "true"
+            )
+            auto_fix_enabled = os.environ.get("AUTO_FIX_ENABLED", "true").lower() == "true"
+            scan_interval = int(os.environ.get("ERROR_MONITOR_INTERVAL", "300"))
+
+            if error_monitoring_enabled:
+                await initialize_autonomous_monitor(
+                    enabled=True,
+                    scan_interval=scan_interval,
+                    auto_fix_enabled=auto_fix_enabled,
+                )
+                logger.info("✓ Autonomous error monitoring started")
+        except Exception as e:
+            logger.warning(f"Error monitoring initialization warning: {e}")
+
+    _create_background_task(init_error_monitoring_background(), name="init_error_monitoring")
+
+    # Initialize router health snapshot background task
+    # This updates pre-computed healthy model lists for the prompt router
+    # Critical for meeting < 2ms router latency (single Redis read vs N awaits)
+    try:
+        router_enabled = os.environ.get("ROUTER_ENABLED", "true").lower() == "true"
+        if router_enabled:
+            from src.services.background_tasks import start_router_health_snapshot_task
+
+            start_router_health_snapshot_task()
+            logger.info("✓ Router health snapshot background task started")
+        else:
+            logger.info("⏭️  Router disabled via ROUTER_ENABLED env var")
+    except Exception as e:
+        logger.warning(f"Router health snapshot initialization warning: {e}")
+
+    # Initialize model catalog background refresh task (Prevent 499 Deadlocks)
+    try:
+        from src.services.background_tasks import start_model_catalog_refresh_task
+
+        start_model_catalog_refresh_task()
+    except Exception as e:
+        logger.warning(f"Model catalog refresh initialization warning: {e}")
+
+    # Start scheduled model sync (Phase 3 - Issue #996)
+    try:
+        from src.services.scheduled_sync import start_scheduler
+
+        start_scheduler()
+        logger.info("Scheduled model sync service initialized")
+    except Exception as e:
+        logger.warning(f"Failed to start scheduled model sync: {e}")
+        # Don't fail startup if scheduled sync fails to start
+
+    # Start lightweight price-only refresh (independent of the full sync above)
+    try:
+        from src.services.scheduled_sync import start_price_refresh_scheduler
+
+        start_price_refresh_scheduler()
+        logger.info("Price refresh service initialized")
+    except Exception as e:
+        logger.warning(f"Failed to start price refresh scheduler: {e}")
+        # Don't fail startup if price refresh fails to start
+
+    # Start scheduled credit-ledger reconciliation (Phase 3 shadow vs live)
+    try:
+        from src.services.scheduled_sync import start_ledger_reconciliation_scheduler
+
+        start_ledger_reconciliation_scheduler()
+        logger.info("Ledger reconciliation service initialized")
+    except Exception as e:
+        logger.warning(f"Failed to start ledger reconciliation scheduler: {e}")
+        # Don't fail startup if reconciliation fails to start
+
+    # Start nightly pricing-drift monitor (read-only; alerts if catalog price *
+    # markup would ever bill below current provider/reference cost)
+    try:
+        from src.services.scheduled_sync import start_pricing_drift_scheduler
+
+        start_pricing_drift_scheduler()
+        logger.info("Pricing drift monitor service initialized")
+    except Exception as e:
+        logger.warning(f"Failed to start pricing drift monitor scheduler: {e}")
+        # Don't fail startup if the drift monitor fails to start
+
+    # Hourly rebuild of recently closed request rollup buckets + retention pruning
+    try:
+        from src.services.scheduled_sync import start_rollup_maintenance_scheduler
+
+        start_rollup_maintenance_scheduler()
+        logger.info("Request rollup maintenance service initialized")
+    except Exception as e:
+        logger.warning(f"Failed to start request rollup maintenance scheduler: {e}")
+
+    # Live per-model health probing. Off by default — every probe is a real
+    # billable request. When off, model_health_history stays empty and
+    # /v1/status/stats reports "not measured" rather than inventing a number.
+    try:
+        if Config.ENABLE_HEALTH_MONITOR:
+            from src.services.monitoring.intelligent_health_monitor import (
+                intelligent_health_monitor,
+            )
+
+            await intelligent_health_monitor.start_monitoring()
+            logger.info("  health_monitor    started (live probing enabled)")
+        else:
+            logger.info(
+                "  health_monitor    DISABLED (ENABLE_HEALTH_MONITOR=false); "
+                "/v1/status/stats will report monitoring_active=false"
+            )
+    except Exception as e:
+        logger.warning(f"Health monitor startup warning (non-fatal): {e}")
+
+
+async def _stop_leader_jobs() -> None:
+    """Stop everything :func:`_start_leader_jobs` started."""
+    from src.config import Config
+
+    # Stop live health probing before anything else so in-flight probes do not
+    # outlive the event loop they were scheduled on.
+    try:
+        if Config.ENABLE_HEALTH_MONITOR:
+            from src.services.monitoring.intelligent_health_monitor import (
+                intelligent_health_monitor,
+            )
+
+            await intelligent_health_monitor.stop_monitoring()
+            logger.info("Health monitor stopped")
+    except Exception as e:
+        logger.warning(f"Health monitor shutdown warning: {e}")
+
+    # Stop scheduled model sync (Phase 3 - Issue #996)
+    try:
+        from src.services.scheduled_sync import stop_scheduler
+
+        stop_scheduler()
+        logger.info("Scheduled model sync service stopped")
+    except Exception as e:
+        logger.warning(f"Scheduled model sync shutdown warning: {e}")
+
+    # Stop lightweight price-only refresh
+    try:
+        from src.services.scheduled_sync import stop_price_refresh_scheduler
+
+        stop_price_refresh_scheduler()
+        logger.info("Price refresh service stopped")
+    except Exception as e:
+        logger.warning(f"Price refresh shutdown warning: {e}")
+
+    # Stop scheduled credit-ledger reconciliation
+    try:
+        from src.services.scheduled_sync import stop_ledger_reconciliation_scheduler
+
+        stop_ledger_reconciliation_scheduler()
+        logger.info("Ledger reconciliation service stopped")
+    except Exception as e:
+        logger.warning(f"Ledger reconciliation shutdown warning: {e}")
+
+    # Stop nightly pricing-drift monitor
+    try:
+        from src.services.scheduled_sync import stop_pricing_drift_scheduler
+
+        stop_pricing_drift_scheduler()
+        logger.info("Pricing drift monitor service stopped")
+    except Exception as e:
+        logger.warning(f"Pricing drift monitor shutdown warning: {e}")
+
+    # Stop request rollup maintenance
+    try:
+        from src.services.scheduled_sync import stop_rollup_maintenance_scheduler
+
+        stop_rollup_maintenance_scheduler()
+        logger.info("Request rollup maintenance service stopped")
+    except Exception as e:
+        logger.warning(f"Request rollup maintenance shutdown warning: {e}")
+
+    # Stop autonomous error monitoring
+    try:
+        autonomous_monitor = get_autonomous_monitor()
+        await autonomous_monitor.stop()
+        logger.info("Autonomous error monitoring stopped")
+    except Exception as e:
+        logger.warning(f"Error monitoring shutdown warning: {e}")
+
+    # Stop router health snapshot background task
+    try:
+        from src.services.background_tasks import stop_router_health_snapshot_task
+
+        stop_router_health_snapshot_task()
+        logger.info("Router health snapshot task stopped")
+    except Exception as e:
+        logger.warning(f"Router health snapshot shutdown warning: {e}")
+
+    # Stop model catalog refresh task
+    try:
+        from src.services.background_tasks import stop_model_catalog_refresh_task
+
+        stop_model_catalog_refresh_task()
+    except Exception as e:
+        logger.warning(f"Model catalog refresh shutdown warning: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app):
     """
@@ -301,6 +538,21 @@ async def lifespan(app):
         pool_stats = get_pool_stats()
         logger.info(f"Connection pool manager ready: {pool_stats}")
 
+        # Cold start: seed catalog, mappings, capabilities and pricing from the
+        # last good sync on local disk so this instance serves them right away.
+        # The staggered warmup below then reconciles them with the database.
+        try:
+            from src.services.cache.boot_snapshot import restore_boot_snapshot
+
+            snapshot_start = time.monotonic()
+            restored = await asyncio.to_thread(restore_boot_snapshot)
+            if restored:
+                elapsed_ms = (time.monotonic() - snapshot_start) * 1000
+                counts = ", ".join(f"{name}={count}" for name, count in restored.items())
+                logger.info(f"Boot snapshot restored in {elapsed_ms:.0f}ms: {counts}")
+        except Exception as e:
+            logger.warning(f"Boot snapshot restore warning: {e}")
+
         # ============================================================
         # STAGGERED STARTUP: DB-heavy tasks run sequentially to avoid
         # overwhelming Supabase PostgREST with concurrent connections.
@@ -360,7 +612,6 @@ async def lifespan(app):
                 # Build bottom-up from per-provider catalogs to avoid the single-
                 # giant-query timeout that truncates at ~3600 of 17k+ models.
                 # Per-provider caches are populated as a side-effect.
-                await asyncio.sleep(3)
                 try:
                     logger.info(
                         "🔥 [2/5] Preloading full model catalog cache (per-provider assembly)..."
@@ -377,7 +628,6 @@ async def lifespan(app):
                     logger.warning(f"Model cache preload warning: {e}")
 
                 # Phase 3: Warm unique models cache with common filter variants
-                await asyncio.sleep(2)
                 try:
                     logger.info("🔥 [3/4] Pre-warming unique models cache (all filter variants)...")
                     from src.services.model_catalog_cache import (
@@ -393,7 +643,6 @@ async def lifespan(app):
                     logger.warning(f"Unique models cache warmup warning: {e}")
 
                 # Phase 4: Warm provider connections (HTTP, not DB)
-                await asyncio.sleep(2)
                 try:
                     logger.info("🔥 [4/5] Pre-warming provider connections...")
                     warmup_results = await warmup_provider_connections_async()
@@ -456,6 +705,16 @@ async def lifespan(app):
                 except Exception as e:
                     logger.warning(f"Catalog response cache warmup warning: {e}")
 
+                # Refresh the gateway registry once the catalog has been rebuilt
+                # (DB providers table is the source of truth, Phase 2A)
+                try:
+                    from src.services.gateway_registry import refresh_registry_cache
+
+                    await asyncio.to_thread(refresh_registry_cache)
+                    logger.info("✓ Gateway registry cache refreshed from DB")
+                except Exception as e:
+                    logger.warning(f"Gateway registry refresh warning: {e}")
+
             except Exception as e:
                 logger.error(f"Staggered DB warmup failed: {e}", exc_info=True)
 
@@ -477,98 +736,68 @@ async def lifespan(app):
 
         _create_background_task(init_google_models_background(), name="init_google_models")
 
-        # Refresh gateway registry cache after catalog preload completes
-        # DB providers table is the source of truth (Phase 2A)
-        async def refresh_registry_background():
-            try:
-                await asyncio.sleep(45)  # Wait for catalog preload to finish
-                from src.services.gateway_registry import refresh_registry_cache
+        # Passive health aggregation: buffer per-request health samples per
+        # (provider, model) and flush them in bulk every few seconds
+        try:
+            from src.services.monitoring.passive_health_aggregator import (
+                start_passive_health_aggregator,
+            )
 
-                refresh_registry_cache()
-                logger.info("✓ Gateway registry cache refreshed from DB")
-            except Exception as e:
-                logger.warning(f"Gateway registry refresh warning: {e}")
+            start_passive_health_aggregator()
+        except Exception as e:
+            logger.warning(f"Passive health aggregator initialization warning: {e}")
 
-        _create_background_task(refresh_registry_background(), name="refresh_registry")
+        # Request rollups: fold every saved request record into per-minute deltas
+        # and flush them to the minute/hour/day rollup tables every few seconds
+        try:
+            from src.services.request_rollups import start_request_rollups
 
-        # Optionally sync high-priority models on startup (can be disabled for faster startup).
-        # Periodic model sync is handled by the scheduled_sync APScheduler (started below)
-        # and the external GitHub cron — the canonical catalog-sync engine is the single
-        # source (MVP Task 14: provider_model_sync_service's duplicate loop removed).
-        sync_models_on_startup = os.environ.get("SYNC_MODELS_ON_STARTUP", "false").lower() == "true"
-        if sync_models_on_startup:
+            start_request_rollups()
+        except Exception as e:
+            logger.warning(f"Request rollups initialization warning: {e}")
 
-            async def sync_initial_models_background():
-                try:
-                    from src.services.model_catalog_sync import sync_all_providers
+        # Post-completion queue: bounded, billing-first workers for the billing and
+        # analytics that run after a response, replaying jobs spilled by the
+        # previous process
+        try:
+            from src.services.post_completion_queue import start_post_completion_queue
 
-                    # Warm a few high-priority providers quickly; the scheduler covers the rest.
-                    high_priority = ["openrouter", "openai", "anthropic", "groq"]
-                    result = await asyncio.to_thread(
-                        sync_all_providers, provider_slugs=high_priority, dry_run=False
-                    )
-                    if result.get("success"):
-                        logger.info(
-                            f"✓ Initial model sync: {result.get('total_models_synced', 0)} models"
-                        )
-                except Exception as e:
-                    logger.warning(f"Initial model sync warning: {e}")
+            await start_post_completion_queue()
+        except Exception as e:
+            logger.warning(f"Post-completion queue initialization warning: {e}")
 
-            _create_background_task(sync_initial_models_background(), name="sync_initial_models")
+        # Chatterbox TTS: load the configured local models now so the first
+        # synthesis request pays only generation cost
+        try:
+            from src.config import Config
+            from src.services.providers.chatterbox_tts_client import warmup_tts_models
 
-        # Initialize autonomous error monitoring in background
-        async def init_error_monitoring_background():
-            try:
-                error_monitoring_enabled = (
-                    os.environ.get("ERROR_MONITORING_ENABLED", "true").lower() == "true"
+            if Config.CHATTERBOX_WARMUP_MODELS:
+                _create_background_task(
+                    asyncio.to_thread(warmup_tts_models, Config.CHATTERBOX_WARMUP_MODELS),
+                    name="chatterbox_tts_warmup",
                 )
-                auto_fix_enabled = os.environ.get("AUTO_FIX_ENABLED", "true").lower() == "true"
-                scan_interval = int(os.environ.get("ERROR_MONITOR_INTERVAL", "300"))
-
-                if error_monitoring_enabled:
-                    await initialize_autonomous_monitor(
-                        enabled=True,
-                        scan_interval=scan_interval,
-                        auto_fix_enabled=auto_fix_enabled,
-                    )
-                    logger.info("✓ Autonomous error monitoring started")
-            except Exception as e:
-                logger.warning(f"Error monitoring initialization warning: {e}")
-
-        _create_background_task(init_error_monitoring_background(), name="init_error_monitoring")
-
-        # Initialize router health snapshot background task
-        # This updates pre-computed healthy model lists for the prompt router
-        # Critical for meeting < 2ms router latency (single Redis read vs N awaits)
-        async def init_router_health_snapshots_background():
-            try:
-                router_enabled = os.environ.get("ROUTER_ENABLED", "true").lower() == "true"
-                if router_enabled:
-                    from src.services.background_tasks import start_router_health_snapshot_task
-
-                    start_router_health_snapshot_task()
-                    logger.info("✓ Router health snapshot background task started")
-                else:
-                    logger.info("⏭️  Router disabled via ROUTER_ENABLED env var")
-            except Exception as e:
-                logger.warning(f"Router health snapshot initialization warning: {e}")
+        except Exception as e:
+            logger.warning(f"Chatterbox TTS warmup initialization warning: {e}")
 
-        _create_background_task(
-            init_router_health_snapshots_background(), name="init_router_health_snapshots"
-        )
+        # Status page snapshot: serve /v1/status from pre-rendered bytes instead of
+        # querying the health tables on every public request
+        try:
+            from src.services.monitoring.status_snapshot import start_status_snapshot_task
 
-        # Initialize model catalog background refresh task (Prevent 499 Deadlocks)
-        async def init_model_catalog_refresh_background():
-            try:
-                from src.services.background_tasks import start_model_catalog_refresh_task
+            start_status_snapshot_task()
+        except Exception as e:
+            logger.warning(f"Status snapshot initialization warning: {e}")
 
-                start_model_catalog_refresh_task()
-            except Exception as e:
-                logger.warning(f"Model catalog refresh initialization warning: {e}")
+        # Routing metadata (model mappings, capabilities, manual pricing, OpenRouter
+        # price index): rebuilt in the background and swapped in whole, so no
+        # request reloads a stale table inline
+        try:
+            from src.services.cache.refreshable_snapshot import start_snapshot_refresher
 
-        _create_background_task(
-            init_model_catalog_refresh_background(), name="init_model_catalog_refresh"
-        )
+            start_snapshot_refresher()
+        except Exception as e:
+            logger.warning(f"Routing snapshot refresher initialization warning: {e}")
 
         # FREEZE FIX: Event loop lag monitor — measures how long the event loop
         # takes to execute a no-op coroutine. If this value exceeds ~500ms it means
@@ -613,47 +842,6 @@ async def lifespan(app):
         logger.error(f"Failed to start monitoring services: {e}")
         # Don't fail startup if monitoring fails
 
-    # Start scheduled model sync (Phase 3 - Issue #996)
-    try:
-        from src.services.scheduled_sync import start_scheduler
-
-        start_scheduler()
-        logger.info("Scheduled model sync service initialized")
-    except Exception as e:
-        logger.warning(f"Failed to start scheduled model sync: {e}")
-        # Don't fail startup if scheduled sync fails to start
-
-    # Start lightweight price-only refresh (independent of the full sync above)
-    try:
-        from src.services.scheduled_sync import start_price_refresh_scheduler
-
-        start_price_refresh_scheduler()
-        logger.info("Price refresh service initialized")
-    except Exception as e:
-        logger.warning(f"Failed to start price refresh scheduler: {e}")
-        # Don't fail startup if price refresh fails to start
-
-    # Start scheduled credit-ledger reconciliation (Phase 3 shadow vs live)
-    try:
-        from src.services.scheduled_sync import start_ledger_reconciliation_scheduler
-
-        start_ledger_reconciliation_scheduler()
-        logger.info("Ledger reconciliation service initialized")
-    except Exception as e:
-        logger.warning(f"Failed to start ledger reconciliation scheduler: {e}")
-        # Don't fail startup if reconciliation fails to start
-
-    # Start nightly pricing-drift monitor (read-only; alerts if catalog price *
-    # markup would ever bill below current provider/reference cost)
-    try:
-        from src.services.scheduled_sync import start_pricing_drift_scheduler
-
-        start_pricing_drift_scheduler()
-        logger.info("Pricing drift monitor service initialized")
-    except Exception as e:
-        logger.warning(f"Failed to start pricing drift monitor scheduler: {e}")
-        # Don't fail startup if the drift monitor fails to start
-
     # ---------------------------------------------------------------------------
     # Additional startup work (migrated from @app.on_event("startup"))
     # ---------------------------------------------------------------------------
@@ -724,26 +912,18 @@ async def lifespan(app):
 
     _create_background_task(_setup_admin_user_background(), name="setup_admin_user")
 
-    # Live per-model health probing. Off by default — every probe is a real
-    # billable request. When off, model_health_history stays empty and
-    # /v1/status/stats reports "not measured" rather than inventing a number.
+    # Cluster-wide jobs (catalog sync and refresh, reconciliation, drift monitor,
+    # health probing, error monitoring) must run once. With a single worker that
+    # is this process; in multi-worker mode the workers elect a leader.
     try:
-        from src.config.config import Config as _HealthCfg
+        if Config.MULTI_WORKER_MODE:
+            from src.services.leader_election import start_leader_election
 
-        if _HealthCfg.ENABLE_HEALTH_MONITOR:
-            from src.services.monitoring.intelligent_health_monitor import (
-                intelligent_health_monitor,
-            )
-
-            await intelligent_health_monitor.start_monitoring()
-            logger.info("  health_monitor    started (live probing enabled)")
+            start_leader_election(_start_leader_jobs, _stop_leader_jobs)
         else:
-            logger.info(
-                "  health_monitor    DISABLED (ENABLE_HEALTH_MONITOR=false); "
-                "/v1/status/stats will report monitoring_active=false"
-            )
+            await _start_leader_jobs()
     except Exception as e:
-        logger.warning(f"Health monitor startup warning (non-fatal): {e}")
+        logger.warning(f"Failed to start leader background jobs: {e}")
 
     logger.info("\n🎉 Application startup complete!")
     logger.info(" API Documentation: http://localhost:8000/docs")
@@ -755,56 +935,17 @@ async def lifespan(app):
     # Shutdown
     logger.info("Shutting down monitoring and observability services...")
 
-    # Stop live health probing before anything else so in-flight probes do not
-    # outlive the event loop they were scheduled on.
-    try:
-        from src.config.config import Config as _HealthCfg
-
-        if _HealthCfg.ENABLE_HEALTH_MONITOR:
-            from src.services.monitoring.intelligent_health_monitor import (
-                intelligent_health_monitor,
-            )
-
-            await intelligent_health_monitor.stop_monitoring()
-            logger.info("Health monitor stopped")
-    except Exception as e:
-        logger.warning(f"Health monitor shutdown warning: {e}")
-
-    # Stop scheduled model sync (Phase 3 - Issue #996)
-    try:
-        from src.services.scheduled_sync import stop_scheduler
-
-        stop_scheduler()
-        logger.info("Scheduled model sync service stopped")
-    except Exception as e:
-        logger.warning(f"Scheduled model sync shutdown warning: {e}")
-
-    # Stop lightweight price-only refresh
-    try:
-        from src.services.scheduled_sync import stop_price_refresh_scheduler
-
-        stop_price_refresh_scheduler()
-        logger.info("Price refresh service stopped")
-    except Exception as e:
-        logger.warning(f"Price refresh shutdown warning: {e}")
-
-    # Stop scheduled credit-ledger reconciliation
-    try:
-        from src.services.scheduled_sync import stop_ledger_reconciliation_scheduler
-
-        stop_ledger_reconciliation_scheduler()
-        logger.info("Ledger reconciliation service stopped")
-    except Exception as e:
-        logger.warning(f"Ledger reconciliation shutdown warning: {e}")
-
-    # Stop nightly pricing-drift monitor
+    # Stop the cluster-wide jobs before anything else so in-flight work does not
+    # outlive the event loop it was scheduled on.
     try:
-        from src.services.scheduled_sync import stop_pricing_drift_scheduler
+        if Config.MULTI_WORKER_MODE:
+            from src.services.leader_election import stop_leader_election
 
-        stop_pricing_drift_scheduler()
-        logger.info("Pricing drift monitor service stopped")
+            await stop_leader_election()
+        else:
+            await _stop_leader_jobs()
     except Exception as e:
-        logger.warning(f"Pricing drift monitor shutdown warning: {e}")
+        logger.warning(f"Leader background jobs shutdown warning: {e}")
 
     # Cancel any pending background tasks
     if _background_tasks:
@@ -817,38 +958,64 @@ async def lifespan(app):
     try:
         # Pricing sync scheduler shutdown removed (Phase 3, Issue #1063)
         # Background model sync shutdown removed (MVP Task 14: the periodic loop
-        # is now the scheduled_sync APScheduler, stopped via stop_scheduler below).
+        # is now the scheduled_sync APScheduler, stopped in _stop_leader_jobs).
+
+        # Drain post-completion jobs first: they feed the passive health aggregator
+        try:
+            from src.services.post_completion_queue import stop_post_completion_queue
+
+            await stop_post_completion_queue()
+        except Exception as e:
+            logger.warning(f"Post-completion queue shutdown warning: {e}")
+
+        # Stop passive health aggregator and drain buffered samples
+        try:
+            from src.services.monitoring.passive_health_aggregator import (
+                stop_passive_health_aggregator,
+            )
+
+            await stop_passive_health_aggregator()
+        except Exception as e:
+            logger.warning(f"Passive health aggregator shutdown warning: {e}")
 
-        # Stop autonomous error monitoring
+        # Stop request rollups and drain buffered deltas (after the post-completion
+        # queue, whose jobs save request records)
         try:
-            autonomous_monitor = get_autonomous_monitor()
-            await autonomous_monitor.stop()
-            logger.info("Autonomous error monitoring stopped")
+            from src.services.request_rollups import stop_request_rollups
+
+            await stop_request_rollups()
         except Exception as e:
-            logger.warning(f"Error monitoring shutdown warning: {e}")
+            logger.warning(f"Request rollups shutdown warning: {e}")
 
-        # Stop router health snapshot background task
+        # Stop status page snapshot refresher
         try:
-            from src.services.background_tasks import stop_router_health_snapshot_task
+            from src.services.monitoring.status_snapshot import stop_status_snapshot_task
 
-            stop_router_health_snapshot_task()
-            logger.info("Router health snapshot task stopped")
+            stop_status_snapshot_task()
         except Exception as e:
-            logger.warning(f"Router health snapshot shutdown warning: {e}")
+            logger.warning(f"Status snapshot shutdown warning: {e}")
 
-        # Stop model catalog refresh task
+        # Stop routing snapshot refresher
         try:
-            from src.services.background_tasks import stop_model_catalog_refresh_task
+            from src.services.cache.refreshable_snapshot import stop_snapshot_refresher
 
-            stop_model_catalog_refresh_task()
+            stop_snapshot_refresher()
         except Exception as e:
-            logger.warning(f"Model catalog refresh shutdown warning: {e}")
+            logger.warning(f"Routing snapshot refresher shutdown warning: {e}")
 
         # Health monitoring is handled by the dedicated health-service container
         # No health monitor shutdown needed in main API
         logger.info("Health monitoring: handled by health-service (no shutdown needed)")
         logger.info("Passive health monitoring: no shutdown needed (captures real API calls)")
 
+        # Drop this worker's live gauges from the multiprocess metric files
+        try:
+            from src.services.prometheus_metrics import mark_worker_dead
+
+            mark_worker_dead()
+        except Exception as e:
+            logger.warning(f"Prometheus multiprocess cleanup warning: {e}")
+
         # Shutdown Prometheus remote write
         try:
             await shutdown_prometheus_remote_write()
@@ -860,14 +1027,33 @@ async def lifespan(app):
         clear_connection_pools()
         logger.info("Connection pools cleared")
 
+        # Close the pooled Tavily web-search client
+        try:
+            from src.services.tools.web_search import close_http_client
+
+            await close_http_client()
+        except Exception as e:
+            logger.warning(f"Web search client shutdown warning: {e}")
+
         # Cleanup Supabase client and close httpx connections
         try:
-            from src.config.supabase_config import cleanup_supabase_client
+            from src.config.supabase_config import (
+                cleanup_supabase_client,
+                close_async_supabase_client,
+            )
 
             cleanup_supabase_client()
+            await close_async_supabase_client()
         except Exception as e:
             logger.warning(f"Supabase cleanup warning: {e}")
 
+        try:
+            from src.config.redis_config import close_async_redis_client
+
+            await close_async_redis_client()
+        except Exception as e:
+            logger.warning(f"Redis cleanup warning: {e}")
+
         logger.info("All monitoring and health services stopped successfully")
 
     except Exception as e:
@@ -3,6 +3,8 @@ import logging
 import time
 from typing import Any
 
+from src.utils.token_estimator import CompletionTokenCounter
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,13 +26,27 @@ class NormalizedChunk:
         }
         return f"data: {json.dumps(data)}\n\n"
 
+    def content_delta(self) -> str | None:
+        """The text of a chunk that carries nothing but one content delta, else None."""
+        if len(self.choices) != 1:
+            return None
+        choice = self.choices[0]
+        delta = choice["delta"]
+        if choice.get("finish_reason") is not None or len(delta) != 1:
+            return None
+        return delta.get("content")
+
 
 class StreamNormalizer:
     def __init__(self, provider: str, model: str):
         self.provider = provider
         self.model = model
-        self.accumulated_content = ""
-        self.accumulated_reasoning = ""
+        # Deltas are collected and joined once at the end; += on an attribute
+        # string copies the whole accumulation on every token
+        self._content_parts: list[str] = []
+        self._reasoning_parts: list[str] = []
+        # Counted as it streams, for when the provider reports no usage
+        self.completion_counter = CompletionTokenCounter()
         self._id = f"chatcmpl-{int(time.time())}"
         self._created = int(time.time())
 
@@ -119,6 +135,10 @@ class StreamNormalizer:
             choices=choices,
         )
 
+    def _add_content(self, text: str) -> None:
+        self._content_parts.append(text)
+        self.completion_counter.add(text)
+
     def _to_dict(self, obj: Any) -> dict:
         if isinstance(obj, dict):
             return obj
@@ -159,7 +179,7 @@ class StreamNormalizer:
 
         if content:
             normalized_delta["content"] = content
-            self.accumulated_content += content
+            self._add_content(content)
 
         # Reasoning extraction
         reasoning = self._extract_reasoning(delta)
@@ -169,7 +189,7 @@ class StreamNormalizer:
 
         if reasoning:
             normalized_delta["reasoning_content"] = reasoning
-            self.accumulated_reasoning += reasoning
+            self._reasoning_parts.append(reasoning)
 
         return {"index": index, "delta": normalized_delta, "finish_reason": finish_reason}
 
@@ -241,7 +261,7 @@ class StreamNormalizer:
         delta = {}
         if content:
             delta["content"] = content
-            self.accumulated_content += content
+            self._add_content(content)
 
         return {"index": index, "delta": delta, "finish_reason": finish_reason}
 
@@ -273,7 +293,7 @@ class StreamNormalizer:
                 text = inner_delta.get("text", "")
                 if text:
                     delta["content"] = text
-                    self.accumulated_content += text
+                    self._add_content(text)
 
             # Handle thinking/reasoning delta (extended thinking feature)
             # Use explicit type checking first, fallback to key presence only when type is missing
@@ -281,7 +301,7 @@ class StreamNormalizer:
                 thinking = inner_delta.get("thinking", "")
                 if thinking:
                     delta["reasoning_content"] = thinking
-                    self.accumulated_reasoning += thinking
+                    self._reasoning_parts.append(thinking)
 
             # Handle signature delta (extended thinking verification)
             elif delta_type == "signature_delta":
@@ -313,14 +333,14 @@ class StreamNormalizer:
                 thinking = content_block.get("thinking", "")
                 if thinking:
                     delta["reasoning_content"] = thinking
-                    self.accumulated_reasoning += thinking
+                    self._reasoning_parts.append(thinking)
 
             # For text blocks, extract initial text if present
             elif block_type == "text":
                 text = content_block.get("text", "")
                 if text:
                     delta["content"] = text
-                    self.accumulated_content += text
+                    self._add_content(text)
 
         elif event_type == "message_stop":
             # Message completed - this is the final event
@@ -336,6 +356,14 @@ class StreamNormalizer:
 
         return {"index": 0, "delta": delta, "finish_reason": finish_reason}
 
+    @property
+    def accumulated_content(self) -> str:
+        return "".join(self._content_parts)
+
+    @property
+    def accumulated_reasoning(self) -> str:
+        return "".join(self._reasoning_parts)
+
     def get_accumulated_content(self) -> str:
         return self.accumulated_content
 
@@ -343,6 +371,16 @@ class StreamNormalizer:
         return self.accumulated_reasoning
 
 
+def coalesce_content_chunks(chunks: list[NormalizedChunk]) -> NormalizedChunk:
+    """Fold consecutive content-only chunks into one chunk carrying their joined text."""
+    first = chunks[0]
+    if len(chunks) == 1:
+        return first
+    choice = dict(first.choices[0])
+    choice["delta"] = {"content": "".join(chunk.content_delta() for chunk in chunks)}
+    return NormalizedChunk(first.id, first.object, first.created, first.model, [choice])
+
+
 def create_error_sse_chunk(
     error_message: str,
     error_type: str,
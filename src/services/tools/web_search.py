@@ -11,6 +11,8 @@ Features:
 - Configurable search depth (basic/advanced)
 - Domain filtering (include/exclude)
 - Relevance scoring for results
+- Normalized-query result cache with single-flight (see services/cache/web_search_cache)
+- Pooled keep-alive HTTP client shared across searches
 """
 
 import logging
@@ -19,6 +21,7 @@ from typing import Any
 import httpx
 
 from src.config.config import Config
+from src.services.cache import web_search_cache
 from src.services.tools.base import BaseTool, ToolDefinition, ToolResult
 
 logger = logging.getLogger(__name__)
@@ -26,6 +29,31 @@ logger = logging.getLogger(__name__)
 # Tavily API Configuration
 TAVILY_API_URL = "https://api.tavily.com/search"
 TAVILY_TIMEOUT = 30.0  # 30 second timeout for search requests
+TAVILY_LIMITS = httpx.Limits(
+    max_connections=50,
+    max_keepalive_connections=20,
+    keepalive_expiry=60.0,
+)
+
+# Shared keep-alive client. Opening a new AsyncClient per search paid a fresh
+# TCP+TLS handshake to api.tavily.com on every call.
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the pooled Tavily HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed is True:
+        _http_client = httpx.AsyncClient(timeout=TAVILY_TIMEOUT, limits=TAVILY_LIMITS)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the pooled Tavily HTTP client (called on application shutdown)."""
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
 
 
 class WebSearchTool(BaseTool):
@@ -150,6 +178,40 @@ class WebSearchTool(BaseTool):
                 error_type="configuration",
             )
 
+        cache_key = web_search_cache.build_cache_key(
+            query,
+            search_depth=search_depth,
+            max_results=max_results,
+            include_answer=include_answer,
+            include_domains=include_domains,
+            exclude_domains=exclude_domains,
+        )
+        return await web_search_cache.get_or_fetch(
+            cache_key,
+            search_depth,
+            lambda: self._search(
+                api_key=api_key,
+                query=query,
+                search_depth=search_depth,
+                max_results=max_results,
+                include_answer=include_answer,
+                include_domains=include_domains,
+                exclude_domains=exclude_domains,
+            ),
+        )
+
+    async def _search(
+        self,
+        *,
+        api_key: str,
+        query: str,
+        search_depth: str,
+        max_results: int,
+        include_answer: bool,
+        include_domains: list[str],
+        exclude_domains: list[str],
+    ) -> ToolResult:
+        """Perform the upstream Tavily request (uncached)."""
         try:
             logger.info(
                 f"Executing web search: query='{query[:50]}...', "
@@ -173,30 +235,29 @@ class WebSearchTool(BaseTool):
             if exclude_domains:
                 payload["exclude_domains"] = exclude_domains
 
-            # Make the API request
-            async with httpx.AsyncClient(timeout=TAVILY_TIMEOUT) as client:
-                response = await client.post(TAVILY_API_URL, json=payload)
-
-                if response.status_code == 401:
-                    return self._error(
-                        "Invalid Tavily API key",
-                        error_type="authentication",
-                    )
-
-                if response.status_code == 429:
-                    return self._error(
-                        "Search rate limit exceeded. Please try again later.",
-                        error_type="rate_limit",
-                    )
-
-                if response.status_code != 200:
-                    logger.error(f"Tavily API error: {response.status_code} - {response.text}")
-                    return self._error(
-                        f"Search request failed with status {response.status_code}",
-                        error_type="api_error",
-                    )
-
-                data = response.json()
+            # Make the API request on the pooled keep-alive client
+            response = await _get_http_client().post(TAVILY_API_URL, json=payload)
+
+            if response.status_code == 401:
+                return self._error(
+                    "Invalid Tavily API key",
+                    error_type="authentication",
+                )
+
+            if response.status_code == 429:
+                return self._error(
+                    "Search rate limit exceeded. Please try again later.",
+                    error_type="rate_limit",
+                )
+
+            if response.status_code != 200:
+                logger.error(f"Tavily API error: {response.status_code} - {response.text}")
+                return self._error(
+                    f"Search request failed with status {response.status_code}",
+                    error_type="api_error",
+                )
+
+            data = response.json()
 
             # Extract and format results
             results = []
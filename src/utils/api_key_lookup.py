@@ -36,6 +36,12 @@ async def get_api_key_id_with_retry(
         logger.debug(f"Skipping lookup for special key: {api_key}")
         return None
 
+    from src.services.request_principal import peek_request_principal
+
+    principal = peek_request_principal(api_key)
+    if principal is not None and principal.api_key_id is not None:
+        return principal.api_key_id
+
     from src.db import api_keys as api_keys_module
 
     # Import metrics for tracking
@@ -0,0 +1,447 @@
+"""
+Container-level helpers for uploaded audio.
+
+The transcription routes used to hold the whole upload (or the whole decoded
+base64 payload) in memory and to bill by file size whenever the upstream did
+not report a duration. These helpers keep uploads in a spooled temporary file
+and work on them without decoding any audio:
+
+- :func:`spool_upload` / :func:`spool_base64` copy an upload, or decode a
+  base64 payload, into a ``SpooledTemporaryFile`` in bounded chunks. The size
+  limit is enforced as the data arrives.
+- :func:`probe_duration_seconds` reads the duration from the container
+  headers (WAV, FLAC, MP3 Xing/VBRI or CBR, Ogg Vorbis/Opus, MP4/M4A, WebM)
+  and returns None when the headers do not say. Browser MediaRecorder WebM,
+  for example, has no duration.
+- :func:`split_wav_at_silence` cuts long PCM WAV recordings into standalone
+  WAV chunks. Each cut is at the quietest 20 ms frame near its boundary, so
+  the chunks can be transcribed in parallel and stitched back together.
+  Compressed formats would need a decoder to find silence, so they are never
+  split.
+"""
+
+from __future__ import annotations
+
+import binascii
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Any, BinaryIO
+
+# Uploads stay in memory up to this size, then roll over to a temp file on disk
+SPOOL_MEMORY_BYTES = 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Base64 characters decoded per step (a multiple of 4)
+BASE64_CHUNK_CHARS = 4 * 256 * 1024
+
+_PROBE_BYTES = 64 * 1024
+_NOT_BASE64 = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+class AudioTooLarge(ValueError):
+    """The upload exceeded the caller's size limit."""
+
+
+# ---------------------------------------------------------------------------
+# Spooling
+# ---------------------------------------------------------------------------
+
+
+async def spool_upload(upload: Any, max_bytes: int) -> tuple[tempfile.SpooledTemporaryFile, int]:
+    """Copy an UploadFile into a spooled temp file; returns the file (rewound) and its size."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise AudioTooLarge(f"upload exceeds {max_bytes} bytes")
+            spool.write(chunk)
+            if len(chunk) < UPLOAD_CHUNK_BYTES:
+                break  # a short read is end of file
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, size
+
+
+def spool_base64(
+    data: str, max_bytes: int, offset: int = 0
+) -> tuple[tempfile.SpooledTemporaryFile, int]:
+    """
+    Decode ``data[offset:]`` into a spooled temp file without materializing the decoded bytes.
+
+    Like ``base64.b64decode`` (non-validating), characters outside the base64
+    alphabet are ignored. Raises ``binascii.Error`` on malformed input.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = 0
+    carry = ""
+    try:
+        for start in range(offset, len(data), BASE64_CHUNK_CHARS):
+            chunk = data[start : start + BASE64_CHUNK_CHARS]
+            if _NOT_BASE64.search(chunk):
+                chunk = _NOT_BASE64.sub("", chunk)
+            chunk = carry + chunk
+            whole = len(chunk) - len(chunk) % 4
+            carry = chunk[whole:]
+            decoded = binascii.a2b_base64(chunk[:whole])
+            size += len(decoded)
+            if size > max_bytes:
+                raise AudioTooLarge(f"decoded audio exceeds {max_bytes} bytes")
+            spool.write(decoded)
+        if carry:
+            # Same as b64decode: the leftover must be a complete quantum
+            spool.write(binascii.a2b_base64(carry))
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, size
+
+
+def _file_size(f: BinaryIO) -> int:
+    f.seek(0, 2)
+    return f.tell()
+
+
+# ---------------------------------------------------------------------------
+# Duration from container headers
+# ---------------------------------------------------------------------------
+
+
+def probe_duration_seconds(f: BinaryIO, extension: str) -> float | None:
+    """Duration in seconds read from the container headers, or None if unknown."""
+    probes = {
+        ".wav": _wav_duration,
+        ".flac": _flac_duration,
+        ".mp3": _mp3_duration,
+        ".mpga": _mp3_duration,
+        ".ogg": _ogg_duration,
+        ".m4a": _mp4_duration,
+        ".mp4": _mp4_duration,
+        ".webm": _webm_duration,
+    }
+    probe = probes.get(extension)
+    if probe is None:
+        return None
+    try:
+        duration = probe(f)
+    except (struct.error, ValueError, IndexError, OSError):
+        duration = None
+    finally:
+        f.seek(0)
+    return duration if duration and duration > 0 else None
+
+
+def _wav_layout(f: BinaryIO) -> tuple[tuple[int, ...], int, int] | None:
+    """((format, channels, rate, byte_rate, block_align, bits), data offset, data size)."""
+    f.seek(0)
+    header = f.read(12)
+    if header[:4] not in (b"RIFF", b"RF64") or header[8:12] != b"WAVE":
+        return None
+    file_size = _file_size(f)
+    fmt = None
+    pos = 12
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        chunk_id, chunk_size = struct.unpack("<4sI", f.read(8))
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack("<HHIIHH", f.read(16))
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF (and RF64 keeps
+            # it in ds64); the data runs to the end of the file in those cases
+            if chunk_size in (0, 0xFFFFFFFF) or pos + 8 + chunk_size > file_size:
+                chunk_size = file_size - pos - 8
+            return fmt, pos + 8, chunk_size
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _wav_duration(f: BinaryIO) -> float | None:
+    layout = _wav_layout(f)
+    if layout is None or not layout[0][3]:
+        return None
+    return layout[2] / layout[0][3]
+
+
+def _skip_id3(f: BinaryIO) -> int:
+    f.seek(0)
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b"ID3":
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        return 10 + size + (10 if header[5] & 0x10 else 0)
+    return 0
+
+
+def _flac_duration(f: BinaryIO) -> float | None:
+    start = _skip_id3(f)
+    f.seek(start)
+    head = f.read(4 + 4 + 34)
+    if head[:4] != b"fLaC" or head[4] & 0x7F != 0:  # first block must be STREAMINFO
+        return None
+    info = head[8:]
+    rate = (info[10] << 12) | (info[11] << 4) | (info[12] >> 4)
+    samples = ((info[13] & 0x0F) << 32) | int.from_bytes(info[14:18], "big")
+    return samples / rate if rate and samples else None
+
+
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),  # MPEG-1 layer III
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),  # MPEG-2/2.5 layer III
+}
+_MP3_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mp3_duration(f: BinaryIO) -> float | None:
+    start = _skip_id3(f)
+    f.seek(start)
+    buf = f.read(_PROBE_BYTES)
+    for i in range(len(buf) - 4):
+        if buf[i] != 0xFF or buf[i + 1] & 0xE0 != 0xE0:
+            continue
+        version = (buf[i + 1] >> 3) & 3
+        layer = (buf[i + 1] >> 1) & 3
+        bitrate_index = buf[i + 2] >> 4
+        rate_index = (buf[i + 2] >> 2) & 3
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            continue  # reserved values, or not layer III
+        mpeg1 = version == 3
+        rate = _MP3_RATES[version][rate_index]
+        samples_per_frame = 1152 if mpeg1 else 576
+        mono = buf[i + 3] >> 6 == 3
+        side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+
+        xing = i + 4 + side_info
+        if buf[xing : xing + 4] in (b"Xing", b"Info"):
+            flags = int.from_bytes(buf[xing + 4 : xing + 8], "big")
+            if flags & 1:
+                frames = int.from_bytes(buf[xing + 8 : xing + 12], "big")
+                return frames * samples_per_frame / rate
+        vbri = i + 4 + 32
+        if buf[vbri : vbri + 4] == b"VBRI":
+            frames = int.from_bytes(buf[vbri + 14 : vbri + 18], "big")
+            return frames * samples_per_frame / rate
+
+        # No VBR header: assume constant bitrate
+        bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+        return (_file_size(f) - start - i) * 8 / bitrate
+    return None
+
+
+def _ogg_duration(f: BinaryIO) -> float | None:
+    f.seek(0)
+    head = f.read(_PROBE_BYTES)
+    if head[:4] != b"OggS":
+        return None
+    packet = head[27 + head[26] :]
+    if packet[:7] == b"\x01vorbis":
+        rate, pre_skip = struct.unpack("<I", packet[12:16])[0], 0
+    elif packet[:8] == b"OpusHead":
+        rate, pre_skip = 48000, struct.unpack("<H", packet[10:12])[0]
+    else:
+        return None
+
+    size = _file_size(f)
+    f.seek(max(0, size - _PROBE_BYTES))
+    tail = f.read(_PROBE_BYTES)
+    last = tail.rfind(b"OggS")
+    if last < 0 or last + 14 > len(tail):
+        return None
+    granule = struct.unpack("<q", tail[last + 6 : last + 14])[0]
+    return (granule - pre_skip) / rate if rate and granule > 0 else None
+
+
+def _mp4_boxes(f: BinaryIO, start: int, end: int):
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _mp4_duration(f: BinaryIO) -> float | None:
+    size = _file_size(f)
+    for box_type, body, box_end in _mp4_boxes(f, 0, size):
+        if box_type != b"moov":
+            continue
+        for child, child_body, _ in _mp4_boxes(f, body, box_end):
+            if child != b"mvhd":
+                continue
+            f.seek(child_body)
+            version = f.read(4)[0]
+            if version == 1:
+                _, _, timescale, duration = struct.unpack(">QQIQ", f.read(28))
+            else:
+                _, _, timescale, duration = struct.unpack(">IIII", f.read(16))
+            return duration / timescale if timescale else None
+    return None
+
+
+def _ebml_vint(buf: bytes, pos: int, strip_marker: bool) -> tuple[int, int]:
+    first = buf[pos]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8:
+        raise ValueError("invalid EBML varint")
+    value = first & ((0xFF >> length) if strip_marker else 0xFF)
+    for b in buf[pos + 1 : pos + length]:
+        value = (value << 8) | b
+    return value, pos + length
+
+
+_EBML_SEGMENT, _EBML_INFO, _EBML_CLUSTER = 0x18538067, 0x1549A966, 0x1F43B675
+_EBML_TIMECODE_SCALE, _EBML_DURATION = 0x2AD7B1, 0x4489
+
+
+def _webm_duration(f: BinaryIO) -> float | None:
+    f.seek(0)
+    buf = f.read(_PROBE_BYTES)
+    if buf[:4] != b"\x1a\x45\xdf\xa3":
+        return None
+    scale, duration = 1_000_000, None
+    pos = 0
+    while pos < len(buf) - 2:
+        element, pos = _ebml_vint(buf, pos, strip_marker=False)
+        size, pos = _ebml_vint(buf, pos, strip_marker=True)
+        if element in (_EBML_SEGMENT, _EBML_INFO):
+            continue  # descend into the master element
+        if element == _EBML_CLUSTER:
+            break
+        if element == _EBML_TIMECODE_SCALE:
+            scale = int.from_bytes(buf[pos : pos + size], "big")
+        elif element == _EBML_DURATION:
+            duration = struct.unpack(">f" if size == 4 else ">d", buf[pos : pos + size])[0]
+        pos += size
+    return duration * scale / 1e9 if duration else None
+
+
+# ---------------------------------------------------------------------------
+# Splitting PCM WAV at silence
+# ---------------------------------------------------------------------------
+
+_WAV_HEADER_BYTES = 44
+_FRAME_SECONDS = 0.02
+_SAMPLES_PER_FRAME_CHECKED = 64
+
+
+def _quietest_offset(f: BinaryIO, data_offset: int, lo: int, hi: int, fmt) -> int:
+    """Offset (relative to the data chunk) of the quietest frame in [lo, hi)."""
+    _, channels, rate, _, block_align, bits = fmt
+    frame_bytes = max(block_align, int(rate * _FRAME_SECONDS) * block_align)
+    if bits != 16 or hi - lo < 2 * frame_bytes:
+        return hi  # no cheap energy measure; cut at the limit
+    f.seek(data_offset + lo)
+    region = f.read(hi - lo)
+    region = region[: len(region) - len(region) % frame_bytes]
+    samples = array("h", region)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    per_frame = frame_bytes // 2
+    step = max(channels, per_frame // _SAMPLES_PER_FRAME_CHECKED // channels * channels)
+    best, best_energy = hi, None
+    for start in range(0, len(samples), per_frame):
+        energy = sum(map(abs, samples[start : start + per_frame : step]))
+        if best_energy is None or energy <= best_energy:
+            best, best_energy = lo + (start * 2), energy
+    return best
+
+
+def _wav_chunk(f: BinaryIO, fmt, data_offset: int, start: int, end: int):
+    audio_format, channels, rate, byte_rate, block_align, bits = fmt
+    chunk = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = end - start
+    chunk.write(
+        struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            36 + size,
+            b"WAVE",
+            b"fmt ",
+            16,
+            1 if audio_format == 0xFFFE else audio_format,
+            channels,
+            rate,
+            byte_rate,
+            block_align,
+            bits,
+            b"data",
+            size,
+        )
+    )
+    f.seek(data_offset + start)
+    remaining = size
+    while remaining:
+        block = f.read(min(UPLOAD_CHUNK_BYTES, remaining))
+        if not block:
+            break
+        chunk.write(block)
+        remaining -= len(block)
+    chunk.seek(0)
+    return chunk
+
+
+def split_wav_at_silence(
+    f: BinaryIO,
+    target_seconds: float,
+    max_chunk_bytes: int,
+    search_seconds: float = 10.0,
+) -> list[tuple[float, tempfile.SpooledTemporaryFile]]:
+    """
+    Split a PCM WAV file into (start seconds, standalone WAV file) chunks.
+
+    Each chunk is at most ``target_seconds`` long and ``max_chunk_bytes`` big.
+    It ends at the quietest frame in the last ``search_seconds`` before that
+    limit. Returns an empty list when the file is not PCM WAV or does not need
+    splitting. Callers close the returned files.
+    """
+    layout = _wav_layout(f)
+    if layout is None:
+        return []
+    fmt, data_offset, data_size = layout
+    audio_format, _, _, byte_rate, block_align, _ = fmt
+    if audio_format not in (1, 0xFFFE) or not byte_rate or not block_align:
+        return []
+
+    limit = min(int(target_seconds * byte_rate), max_chunk_bytes - _WAV_HEADER_BYTES)
+    limit -= limit % block_align
+    if limit <= 0 or data_size <= limit:
+        return []
+
+    chunks = []
+    try:
+        start = 0
+        while start < data_size:
+            end = data_size
+            if data_size - start > limit:
+                hi = start + limit
+                lo = max(start + limit // 2, hi - int(search_seconds * byte_rate))
+                lo -= lo % block_align
+                end = _quietest_offset(f, data_offset, lo, hi, fmt)
+            chunks.append((start / byte_rate, _wav_chunk(f, fmt, data_offset, start, end)))
+            start = end
+    except BaseException:
+        for _, chunk in chunks:
+            chunk.close()
+        raise
+    finally:
+        f.seek(0)
+    return chunks
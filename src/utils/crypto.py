@@ -3,9 +3,11 @@ import os
 
 try:
     from cryptography.fernet import Fernet, InvalidToken  # type: ignore
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM  # type: ignore
 except Exception:
     Fernet = None  # type: ignore
     InvalidToken = Exception  # type: ignore
+    AESGCM = None  # type: ignore
 
 
 def _load_keyring_from_env() -> tuple[int, dict[int, "Fernet"]]:
@@ -95,6 +97,29 @@ def decrypt_api_key(token: str, key_version: int | None = None) -> str:
     raise ValueError("Failed to decrypt token with any configured key.")
 
 
+# Process-local key for secrets held in memory (e.g. cached BYOK keys). Generated
+# at import and never persisted, so a cached value that ends up in a log line,
+# a repr or an error report shows only ciphertext. It is no defence against a
+# full memory dump, which contains this key too. Unsealing is a single AES-GCM pass.
+_SEAL = AESGCM(AESGCM.generate_key(bit_length=128)) if AESGCM is not None else None
+
+
+def seal_secret(plaintext: str) -> bytes:
+    """Encrypt a secret for in-memory storage in this process only.
+
+    Raises RuntimeError if the cryptography library is unavailable.
+    """
+    if _SEAL is None:
+        raise RuntimeError("Cryptography library not available. Cannot seal secrets.")
+    nonce = os.urandom(12)
+    return nonce + _SEAL.encrypt(nonce, plaintext.encode("utf-8"), None)
+
+
+def unseal_secret(sealed: bytes) -> str:
+    """Recover a secret sealed by :func:`seal_secret` in this process."""
+    return _SEAL.decrypt(sealed[:12], sealed[12:], None).decode("utf-8")
+
+
 def sha256_key_hash(plaintext: str) -> str:
     """Deterministic hash for lookup/rate limiting. Requires configured salt via env.
 
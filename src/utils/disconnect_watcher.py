@@ -0,0 +1,99 @@
+"""
+Background client-disconnect detection for streaming responses.
+
+Polling ``request.is_disconnected()`` on every streamed chunk costs a receive
+on the ASGI channel per token. A :class:`DisconnectWatcher` instead runs one
+task per stream that blocks on the receive channel until ``http.disconnect``
+arrives. The streaming loop reads :attr:`DisconnectWatcher.disconnected` (a
+plain attribute) between chunks, and brackets its wait on the upstream
+provider with :attr:`DisconnectWatcher.waiting` so a disconnect that arrives
+mid-wait cancels that wait instead of letting a silent provider hold the
+stream open::
+
+    watcher = DisconnectWatcher.start(request)
+    try:
+        while not watcher.disconnected:
+            watcher.waiting = True
+            try:
+                chunk = await upstream.__anext__()
+            except StopAsyncIteration:
+                break
+            except asyncio.CancelledError:
+                if not watcher.absorb_cancel():
+                    raise
+                break
+            finally:
+                watcher.waiting = False
+            ...
+    finally:
+        watcher.stop()
+
+Only the wait marked by ``waiting`` is ever cancelled, never a ``yield`` to
+the ASGI server, so the loop's own post-stream handling still runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class DisconnectWatcher:
+    """Flags (and interrupts) a stream once its client has gone away."""
+
+    __slots__ = ("disconnected", "waiting", "_owner", "_task", "_cancelled", "_cancelling")
+
+    def __init__(self) -> None:
+        self.disconnected = False
+        self.waiting = False
+        self._owner: asyncio.Task | None = None
+        self._task: asyncio.Task | None = None
+        self._cancelled = False
+        self._cancelling = 0
+
+    @classmethod
+    def start(cls, request: Any | None) -> DisconnectWatcher:
+        """Watch ``request`` on behalf of the current task. A None request is never flagged."""
+        watcher = cls()
+        receive = getattr(request, "receive", None)
+        if receive is not None:
+            watcher._owner = asyncio.current_task()
+            watcher._task = asyncio.get_running_loop().create_task(watcher._watch(receive))
+        return watcher
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def absorb_cancel(self) -> bool:
+        """
+        Whether a CancelledError in the upstream wait came from this watcher.
+
+        If so the cancellation is undone and the caller should stop streaming;
+        a cancellation requested by anyone else must be re-raised.
+        """
+        if not self._cancelled:
+            return False
+        self._cancelled = False
+        return self._owner.uncancel() <= self._cancelling
+
+    async def _watch(self, receive) -> None:
+        try:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Without a usable receive channel, fall back to never flagging
+            logger.debug(f"Disconnect watcher stopped: {e}")
+            return
+
+        self.disconnected = True
+        if self.waiting and self._owner is not None and not self._owner.done():
+            self._cancelling = self._owner.cancelling()
+            self._cancelled = True
+            self._owner.cancel()
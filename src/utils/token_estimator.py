@@ -11,12 +11,23 @@ Provides two estimation strategies:
 
 Both strategies handle multimodal (list-of-parts) content gracefully,
 extracting only the text segments.
+
+Multi-turn traffic resends the same system prompt and history on every
+request, so tiktoken counts for long texts are memoized in a bounded LRU keyed
+by a hash of the text. The ``*_async`` variants run uncached encoding in a
+small worker pool once the text to encode is large enough to stall the event
+loop. :class:`CompletionTokenCounter` counts a streamed completion as it
+arrives, so the full text is never re-encoded at the end of a stream.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+from collections import OrderedDict
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -109,6 +120,49 @@ def _extract_text_length_from_content(content: Any) -> int:
 _TOKENS_PER_MESSAGE_OVERHEAD = 4
 
 
+# ---------------------------------------------------------------------------
+# Token-count memo and encoding pool
+# ---------------------------------------------------------------------------
+
+# Texts shorter than this encode faster than a memo round-trip
+_MEMO_MIN_CHARS = 256
+_MEMO_MAX_ENTRIES = 4096
+# Uncached text above this size is encoded in the pool by the async variants
+# (~8k tokens, on the order of a millisecond of tiktoken time)
+_OFFLOAD_MIN_CHARS = 32_768
+
+# (len, hash) of the text -> token count. str hashes are cached on the object,
+# and holding the key instead of the text keeps the memo small.
+_memo: OrderedDict[tuple[int, int], int] = OrderedDict()
+_memo_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _memo_get(text: str) -> int | None:
+    key = (len(text), hash(text))
+    with _memo_lock:
+        count = _memo.get(key)
+        if count is not None:
+            _memo.move_to_end(key)
+        return count
+
+
+def _memo_put(text: str, count: int) -> None:
+    with _memo_lock:
+        _memo[(len(text), hash(text))] = count
+        if len(_memo) > _MEMO_MAX_ENTRIES:
+            _memo.popitem(last=False)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # tiktoken releases the GIL while encoding, so a couple of threads do
+    # real work in parallel without competing with asyncio.to_thread DB calls.
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tokenizer")
+    return _executor
+
+
 def count_tokens_text(text: str) -> int:
     """Count tokens in a plain text string.
 
@@ -123,11 +177,20 @@ def count_tokens_text(text: str) -> int:
 
     enc = _get_tiktoken_encoding()
     if enc is not None:
+        memoize = len(text) >= _MEMO_MIN_CHARS
+        if memoize:
+            count = _memo_get(text)
+            if count is not None:
+                return count
         try:
-            return len(enc.encode(text))
+            count = len(enc.encode(text))
         except Exception:
             # If encoding fails for any reason, fall through to heuristic
             pass
+        else:
+            if memoize:
+                _memo_put(text, count)
+            return count
 
     # Fallback: character-based heuristic (~1 token per 4 characters).
     return max(1, len(text) // 4)
@@ -170,6 +233,29 @@ def count_tokens_messages(messages: Iterable[dict] | None) -> int:
     return max(1, total)
 
 
+def _uncached_chars(messages: Iterable[dict]) -> int:
+    if _get_tiktoken_encoding() is None:
+        return 0
+    chars = 0
+    for message in messages:
+        if isinstance(message, dict):
+            text = _extract_text_from_content(message.get("content"))
+            if len(text) < _MEMO_MIN_CHARS or _memo_get(text) is None:
+                chars += len(text)
+    return chars
+
+
+async def count_tokens_messages_async(messages: Iterable[dict] | None) -> int:
+    """:func:`count_tokens_messages` that encodes large uncached text off the event loop."""
+    if not messages:
+        return 0
+    messages = list(messages)
+    if _uncached_chars(messages) < _OFFLOAD_MIN_CHARS:
+        return count_tokens_messages(messages)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), count_tokens_messages, messages)
+
+
 def count_completion_tokens(text: str) -> int:
     """Count completion tokens from accumulated response text.
 
@@ -183,6 +269,79 @@ def count_completion_tokens(text: str) -> int:
     return max(1, tokens)
 
 
+class CompletionTokenCounter:
+    """Counts completion tokens incrementally as a stream's deltas arrive.
+
+    :meth:`add` only buffers the delta. Once enough text is pending, the part
+    up to the last space that follows a non-whitespace character is encoded and
+    the rest is kept. The cl100k pre-tokenizer always splits there, so the sum
+    of the pieces equals the count for the whole text.
+
+    Text already searched for such a space is not searched again. Text without
+    one (CJK, minified code, base64) is encoded anyway once
+    ``_MAX_PENDING_CHARS`` are pending; the count can then differ from the
+    whole-text count by a token at each forced cut.
+    """
+
+    __slots__ = ("_tokens", "_chars", "_pending", "_pending_chars", "_scanned")
+
+    # Pending text encoded per step; keeps each encode well under a millisecond
+    _FLUSH_CHARS = 2048
+    # Pending text without a safe cut point is encoded in one piece past this
+    _MAX_PENDING_CHARS = 4 * _FLUSH_CHARS
+
+    def __init__(self) -> None:
+        self._tokens = 0
+        self._chars = 0
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._scanned = 0  # leading pending chars known to hold no cut point
+
+    def add(self, delta: str) -> None:
+        if not delta:
+            return
+        self._pending.append(delta)
+        self._pending_chars += len(delta)
+        if self._pending_chars - self._scanned >= self._FLUSH_CHARS:
+            self._flush(final=False)
+
+    def count(self) -> int:
+        """Tokens in everything added so far; same result as :func:`count_completion_tokens`."""
+        if self._pending:
+            self._flush(final=True)
+        if _get_tiktoken_encoding() is None:
+            return max(1, self._chars // 4)
+        return max(1, self._tokens)
+
+    def _flush(self, final: bool) -> None:
+        text = "".join(self._pending)
+        cut = len(text)
+        if not final and len(text) < self._MAX_PENDING_CHARS:
+            cut = next(
+                (
+                    i
+                    for i in range(len(text) - 1, max(self._scanned, 1) - 1, -1)
+                    if text[i] == " " and not text[i - 1].isspace()
+                ),
+                0,
+            )
+            if cut == 0:
+                self._pending = [text]
+                self._scanned = len(text)
+                return
+        head, tail = text[:cut], text[cut:]
+        self._chars += len(head)
+        enc = _get_tiktoken_encoding()
+        if enc is not None:
+            try:
+                self._tokens += len(enc.encode(head))
+            except Exception:
+                self._tokens += max(1, len(head) // 4)
+        self._pending = [tail] if tail else []
+        self._pending_chars = len(tail)
+        self._scanned = len(tail)
+
+
 def get_estimation_method() -> str:
     """Return the name of the active estimation method.
 
@@ -228,3 +387,23 @@ def estimate_message_tokens(
         estimated = fallback_tokens
 
     return max(1, estimated)
+
+
+async def estimate_message_tokens_async(
+    messages: Iterable[dict] | None,
+    max_tokens: int | None = None,
+    *,
+    fallback_tokens: int = 256,
+) -> int:
+    """:func:`estimate_message_tokens` that encodes large uncached text off the event loop."""
+    if max_tokens is not None and max_tokens > 0:
+        return max_tokens
+
+    if not messages:
+        return fallback_tokens
+
+    estimated = await count_tokens_messages_async(messages)
+    if estimated <= 0:
+        estimated = fallback_tokens
+
+    return max(1, estimated)
@@ -41,6 +41,18 @@ fi
 # Set PYTHONPATH to include src directory
 export PYTHONPATH="${PYTHONPATH}:${PWD}/src"
 
+# Worker processes per container (WORKERS, default 1). With more than one,
+# every worker writes its metrics to PROMETHEUS_MULTIPROC_DIR and /metrics
+# aggregates them; the directory must be empty when the workers start.
+WORKERS="${WORKERS:-1}"
+export WORKERS
+if [ "$WORKERS" -gt 1 ]; then
+    export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/gatewayz_prometheus}"
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    echo "🧵 Multi-worker mode: $WORKERS workers (metrics in $PROMETHEUS_MULTIPROC_DIR)"
+fi
+
 # Start the application
 echo "🚀 Starting Gatewayz API..."
 # Note: No --reload to avoid Prometheus metric duplication
@@ -50,6 +62,6 @@ echo "🚀 Starting Gatewayz API..."
 exec uvicorn src.main:app \
   --host 0.0.0.0 \
   --port ${PORT:-8000} \
-  --workers 1 \
+  --workers "$WORKERS" \
   --timeout-keep-alive 75 \
   --timeout-graceful-shutdown 30
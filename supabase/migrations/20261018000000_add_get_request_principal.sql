@@ -0,0 +1,180 @@
+-- Migration: Add get_request_principal() — one-round-trip auth snapshot
+--
+-- Problem:
+-- A chat request assembles the caller's state piecemeal, each piece behind its
+-- own per-worker cache with its own TTL and invalidation rules:
+--   * db/users.get_user            api_keys_new -> users            (2 queries)
+--   * db/plans.is_admin_tier_user  user_plans JOIN plans            (uncached)
+--   * db/plans.get_user_plan       user_plans -> plans              (2 queries)
+--   * db/plans.get_user_usage_...  usage_records today + month      (2 queries)
+--   * RateLimitManager.get_key_config  api_keys_new / rate_limit_configs
+--   * db/routing_policies          api_keys_new -> routing_policies (2 queries)
+--   * BYOK                         user_provider_keys per provider
+-- A cold request pays ~10 PostgREST round-trips before dispatch.
+--
+-- Solution:
+-- A single read-only function returning everything the request path needs as
+-- one JSONB document. src/services/request_principal.py caches the result as a
+-- single bounded-LRU entry per API key and the accessors above read from it.
+--
+-- Parameters:
+--   p_api_key - The caller's API key (api_keys_new.api_key, or legacy users.api_key)
+--
+-- Returns JSONB, or NULL when the key is unknown:
+--   { "key": {id, key_name, environment_tag, scope_permissions, is_primary,
+--             rate_limit_config} | null,
+--     "user": users row,
+--     "user_plan": active user_plans row | null,
+--     "plan": plans row for user_plan | null,
+--     "is_admin": bool,
+--     "usage": {daily_requests, daily_tokens, monthly_requests, monthly_tokens},
+--     "rate_limit_configs_row": rate_limit_configs row | null,
+--     "routing_policy": routing_policies row | null,
+--     "byok_providers": [provider_slug, ...] }
+
+-- ============================================================================
+-- PRE-CREATE CLEANUP (make migration idempotent)
+-- ============================================================================
+DROP FUNCTION IF EXISTS get_request_principal(TEXT);
+
+-- ============================================================================
+-- FUNCTION DEFINITION
+-- ============================================================================
+CREATE OR REPLACE FUNCTION get_request_principal(p_api_key TEXT)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_key          RECORD;
+    v_user         RECORD;
+    v_user_plan    JSONB := NULL;
+    v_plan         JSONB := NULL;
+    v_user_id      BIGINT;
+    v_key_id       BIGINT;
+    v_key_json     JSONB := NULL;
+    v_today_start  TIMESTAMPTZ := date_trunc('day', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    v_month_start  TIMESTAMPTZ := date_trunc('month', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    v_usage        JSONB;
+    v_is_admin     BOOLEAN := false;
+    v_rl_row       JSONB := NULL;
+    v_policy       JSONB := NULL;
+    v_byok         JSONB := '[]'::JSONB;
+BEGIN
+    -- ======================================================================
+    -- STEP 1: Resolve the key (new table first, legacy users.api_key second)
+    -- ======================================================================
+    SELECT * INTO v_key FROM api_keys_new WHERE api_key = p_api_key LIMIT 1;
+
+    IF FOUND THEN
+        v_user_id := v_key.user_id;
+        v_key_id := v_key.id;
+        v_key_json := jsonb_build_object(
+            'id', v_key.id,
+            'key_name', v_key.key_name,
+            'environment_tag', v_key.environment_tag,
+            'scope_permissions', v_key.scope_permissions,
+            'is_primary', v_key.is_primary,
+            'rate_limit_config', to_jsonb(v_key) -> 'rate_limit_config'
+        );
+        SELECT * INTO v_user FROM users WHERE id = v_user_id;
+    ELSE
+        SELECT * INTO v_user FROM users WHERE api_key = p_api_key LIMIT 1;
+        v_user_id := v_user.id;
+    END IF;
+
+    IF v_user_id IS NULL OR v_user.id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- ======================================================================
+    -- STEP 2: Active plan + admin tier
+    -- ======================================================================
+    SELECT to_jsonb(up) INTO v_user_plan
+    FROM user_plans up
+    WHERE up.user_id = v_user_id AND up.is_active = true
+    ORDER BY up.started_at DESC NULLS LAST
+    LIMIT 1;
+
+    IF v_user_plan IS NOT NULL THEN
+        SELECT to_jsonb(p) INTO v_plan FROM plans p WHERE p.id = (v_user_plan ->> 'plan_id')::BIGINT;
+    END IF;
+
+    SELECT EXISTS (
+        SELECT 1
+        FROM user_plans up
+        JOIN plans p ON p.id = up.plan_id
+        WHERE up.user_id = v_user_id AND up.is_active = true AND p.plan_type = 'admin'
+    ) INTO v_is_admin;
+
+    -- ======================================================================
+    -- STEP 3: Plan-window usage (same windows as db/plans.py)
+    -- ======================================================================
+    SELECT jsonb_build_object(
+        'daily_requests', COUNT(*) FILTER (WHERE "timestamp" >= v_today_start),
+        'daily_tokens', COALESCE(SUM(tokens_used) FILTER (WHERE "timestamp" >= v_today_start), 0),
+        'monthly_requests', COUNT(*),
+        'monthly_tokens', COALESCE(SUM(tokens_used), 0)
+    )
+    INTO v_usage
+    FROM usage_records
+    WHERE user_id = v_user_id AND "timestamp" >= v_month_start;
+
+    -- ======================================================================
+    -- STEP 4: Per-key rate-limit config and routing policy (optional tables)
+    -- ======================================================================
+    IF v_key_id IS NOT NULL THEN
+        IF to_regclass('public.rate_limit_configs') IS NOT NULL THEN
+            EXECUTE 'SELECT to_jsonb(r) FROM rate_limit_configs r WHERE api_key_id = $1 LIMIT 1'
+            INTO v_rl_row USING v_key_id;
+        END IF;
+        IF to_regclass('public.routing_policies') IS NOT NULL THEN
+            EXECUTE 'SELECT to_jsonb(r) FROM routing_policies r WHERE api_key_id = $1 LIMIT 1'
+            INTO v_policy USING v_key_id;
+        END IF;
+    END IF;
+
+    -- ======================================================================
+    -- STEP 5: BYOK presence (slugs only — never key material)
+    -- ======================================================================
+    IF to_regclass('public.user_provider_keys') IS NOT NULL THEN
+        EXECUTE 'SELECT COALESCE(jsonb_agg(provider_slug), ''[]''::jsonb)
+                 FROM user_provider_keys WHERE user_id = $1 AND is_active = true'
+        INTO v_byok USING v_user_id;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'key', v_key_json,
+        'user', to_jsonb(v_user),
+        'user_plan', v_user_plan,
+        'plan', v_plan,
+        'is_admin', v_is_admin,
+        'usage', v_usage,
+        'rate_limit_configs_row', v_rl_row,
+        'routing_policy', v_policy,
+        'byok_providers', v_byok
+    );
+END;
+$$;
+
+-- ============================================================================
+-- PERMISSIONS
+-- ============================================================================
+REVOKE ALL ON FUNCTION get_request_principal(TEXT) FROM PUBLIC;
+REVOKE ALL ON FUNCTION get_request_principal(TEXT) FROM anon;
+REVOKE ALL ON FUNCTION get_request_principal(TEXT) FROM authenticated;
+GRANT EXECUTE ON FUNCTION get_request_principal(TEXT) TO service_role;
+
+-- ============================================================================
+-- DOCUMENTATION
+-- ============================================================================
+COMMENT ON FUNCTION get_request_principal(TEXT) IS
+'Returns the per-request principal snapshot (key, user, plan, admin tier, plan-window
+usage, rate-limit config, routing policy, BYOK provider slugs) for an API key in one
+round-trip. Read-only. Cached per worker by src/services/request_principal.py.';
+
+-- ============================================================================
+-- DOWN MIGRATION (commented out - run manually to rollback)
+-- ============================================================================
+-- DROP FUNCTION IF EXISTS get_request_principal(TEXT);
@@ -0,0 +1,403 @@
+-- Migration: Add settle_request() — one-round-trip, idempotent request settlement
+--
+-- Problem:
+-- Settling a paid request takes ~6 separate PostgREST round-trips:
+--   1. deduct_credits         api_keys_new -> users lookup, admin check,
+--                             daily-limit read, atomic_deduct_credits RPC
+--   2. record_usage           INSERT usage_records
+--   3. log_api_usage_transaction (trial path) / credit_transactions
+--   4. update_rate_limit_usage SELECT + UPDATE/INSERT per window (x3)
+--   5. credit_ledger shadow write (SELECT + INSERT)
+--   6. save_chat_completion_request_with_cost (model lookup + INSERT)
+-- Each step can fail independently after the deduction has committed, which is
+-- what _log_failed_deduction_for_reconciliation exists to clean up.
+--
+-- Solution:
+-- settle_request() performs all of the above in ONE transaction, keyed by the
+-- request id. A request_settlements row claims the id first; a replay with the
+-- same id returns the stored result without charging again. Any failure raises
+-- inside the function body and rolls back every write made for the request.
+--
+-- Parameters:
+--   p_request_id         - Idempotency key (the request id)
+--   p_user_id            - User to settle
+--   p_api_key            - API key used (usage_records / rate_limit_usage)
+--   p_model              - Model id used for the request
+--   p_cost               - Amount to charge in USD (0 for trial / free)
+--   p_total_tokens       - Tokens consumed
+--   p_description        - credit_transactions description
+--   p_metadata           - credit_transactions metadata
+--   p_is_trial           - Log a $0 trial transaction instead of deducting
+--   p_daily_limit        - Optional daily spend limit in USD (NULL = no limit)
+--   p_update_rate_limits - Also bump rate_limit_usage windows + last_used_at
+--   p_shadow_ledger      - Also write the settled credit_ledger double-entry
+--   p_request_record     - Optional chat_completion_requests columns as JSONB;
+--                          NULL skips the insert. "provider_name" is used to
+--                          resolve model_id when it is not given.
+--
+-- Returns JSONB:
+--   {
+--     "success": true/false,
+--     "duplicate": <bool>,          -- true when replaying a settled request_id
+--     "charged": <numeric>,
+--     "is_admin": <bool>,
+--     "transaction_id": <bigint or null>,
+--     "new_allowance": <numeric or null>,
+--     "new_purchased": <numeric or null>,
+--     "new_balance": <numeric or null>,
+--     "request_record_id": <bigint or null>,
+--     "error": <string or null>      -- insufficient_credits | daily_limit_exceeded |
+--                                   -- user_not_found | SQLERRM
+--   }
+
+-- ============================================================================
+-- IDEMPOTENCY TABLE
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS public.request_settlements (
+    request_id  TEXT PRIMARY KEY,
+    user_id     BIGINT NOT NULL,
+    result      JSONB,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_request_settlements_created_at
+    ON public.request_settlements (created_at);
+
+ALTER TABLE public.request_settlements ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE public.request_settlements IS
+    'One row per settled request id. Makes settle_request() idempotent across client retries.';
+
+-- ============================================================================
+-- PRE-CREATE CLEANUP (make migration idempotent)
+-- ============================================================================
+DROP FUNCTION IF EXISTS settle_request(
+    TEXT, BIGINT, TEXT, TEXT, NUMERIC, INTEGER, TEXT, JSONB,
+    BOOLEAN, NUMERIC, BOOLEAN, BOOLEAN, JSONB
+);
+
+-- ============================================================================
+-- FUNCTION DEFINITION
+-- ============================================================================
+CREATE OR REPLACE FUNCTION settle_request(
+    p_request_id         TEXT,
+    p_user_id            BIGINT,
+    p_api_key            TEXT,
+    p_model              TEXT,
+    p_cost               NUMERIC,
+    p_total_tokens       INTEGER,
+    p_description        TEXT,
+    p_metadata           JSONB DEFAULT '{}'::JSONB,
+    p_is_trial           BOOLEAN DEFAULT false,
+    p_daily_limit        NUMERIC DEFAULT NULL,
+    p_update_rate_limits BOOLEAN DEFAULT true,
+    p_shadow_ledger      BOOLEAN DEFAULT false,
+    p_request_record     JSONB DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+VOLATILE
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_existing          JSONB;
+    v_claimed           INTEGER;
+    v_is_admin          BOOLEAN := false;
+    v_charge            BOOLEAN;
+    v_allowance_before  NUMERIC;
+    v_purchased_before  NUMERIC;
+    v_from_allowance    NUMERIC := 0;
+    v_from_purchased    NUMERIC := 0;
+    v_allowance_after   NUMERIC;
+    v_purchased_after   NUMERIC;
+    v_daily_used        NUMERIC;
+    v_transaction_id    BIGINT := NULL;
+    v_now               TIMESTAMPTZ := NOW();
+    v_record            JSONB;
+    v_model_id          BIGINT;
+    v_provider_id       BIGINT;
+    v_request_record_id BIGINT := NULL;
+    v_result            JSONB;
+    v_detail            TEXT;
+BEGIN
+    -- ======================================================================
+    -- STEP 0: Claim the request id (replays return the stored result)
+    -- ======================================================================
+    -- Concurrent callers with the same id block on the primary key until the
+    -- first transaction commits, then see the conflict.
+    INSERT INTO request_settlements (request_id, user_id)
+    VALUES (p_request_id, p_user_id)
+    ON CONFLICT (request_id) DO NOTHING;
+
+    GET DIAGNOSTICS v_claimed = ROW_COUNT;
+
+    IF v_claimed = 0 THEN
+        SELECT result INTO v_existing FROM request_settlements WHERE request_id = p_request_id;
+        RETURN COALESCE(v_existing, '{}'::JSONB) || jsonb_build_object('duplicate', true);
+    END IF;
+
+    BEGIN
+        -- ==================================================================
+        -- STEP 1: Lock the user row; admin tier never pays
+        -- ==================================================================
+        SELECT COALESCE(subscription_allowance, 0), COALESCE(purchased_credits, 0)
+        INTO v_allowance_before, v_purchased_before
+        FROM users
+        WHERE id = p_user_id
+        FOR UPDATE;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'user_not_found';
+        END IF;
+
+        SELECT EXISTS (
+            SELECT 1
+            FROM user_plans up
+            JOIN plans p ON p.id = up.plan_id
+            WHERE up.user_id = p_user_id AND up.is_active = true AND p.plan_type = 'admin'
+        ) INTO v_is_admin;
+
+        -- Same thresholds deduct_credits() applies
+        v_charge := NOT p_is_trial AND NOT v_is_admin AND p_cost >= 0.000001;
+
+        v_allowance_after := v_allowance_before;
+        v_purchased_after := v_purchased_before;
+
+        -- ==================================================================
+        -- STEP 2: Daily limit + balance checks, allowance-first deduction
+        -- ==================================================================
+        IF v_charge THEN
+            IF p_daily_limit IS NOT NULL THEN
+                SELECT COALESCE(SUM(ABS(amount)), 0) INTO v_daily_used
+                FROM credit_transactions
+                WHERE user_id = p_user_id
+                  AND created_at >= date_trunc('day', v_now AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+                  AND amount < 0;
+
+                IF v_daily_used + p_cost > p_daily_limit THEN
+                    RAISE EXCEPTION 'daily_limit_exceeded' USING DETAIL = v_daily_used::TEXT;
+                END IF;
+            END IF;
+
+            IF v_allowance_before + v_purchased_before < p_cost THEN
+                RAISE EXCEPTION 'insufficient_credits'
+                    USING DETAIL = (v_allowance_before + v_purchased_before)::TEXT;
+            END IF;
+
+            v_from_allowance := LEAST(v_allowance_before, p_cost);
+            v_from_purchased := p_cost - v_from_allowance;
+            v_allowance_after := v_allowance_before - v_from_allowance;
+            v_purchased_after := v_purchased_before - v_from_purchased;
+
+            UPDATE users
+            SET subscription_allowance = v_allowance_after,
+                purchased_credits = v_purchased_after,
+                updated_at = v_now
+            WHERE id = p_user_id;
+        END IF;
+
+        -- ==================================================================
+        -- STEP 3: credit_transactions (deduction, or $0 trial record)
+        -- ==================================================================
+        IF v_charge OR p_is_trial THEN
+            INSERT INTO credit_transactions (
+                user_id,
+                amount,
+                transaction_type,
+                description,
+                balance_before,
+                balance_after,
+                metadata,
+                created_at
+            ) VALUES (
+                p_user_id,
+                CASE WHEN v_charge THEN -p_cost ELSE 0 END,
+                'api_usage',
+                p_description,
+                v_allowance_before + v_purchased_before,
+                v_allowance_after + v_purchased_after,
+                COALESCE(p_metadata, '{}'::JSONB) || jsonb_build_object(
+                    'request_id', p_request_id,
+                    'is_trial', p_is_trial,
+                    'from_allowance', v_from_allowance,
+                    'from_purchased', v_from_purchased,
+                    'allowance_before', v_allowance_before,
+                    'allowance_after', v_allowance_after,
+                    'purchased_before', v_purchased_before,
+                    'purchased_after', v_purchased_after,
+                    'settle_request', true
+                ),
+                v_now
+            )
+            RETURNING id INTO v_transaction_id;
+        END IF;
+
+        -- ==================================================================
+        -- STEP 4: usage_records (paid and admin requests, as record_usage)
+        -- ==================================================================
+        IF NOT p_is_trial THEN
+            INSERT INTO usage_records (user_id, api_key, model, tokens_used, cost, "timestamp")
+            VALUES (p_user_id, p_api_key, p_model, p_total_tokens, p_cost, v_now);
+        END IF;
+
+        -- ==================================================================
+        -- STEP 5: rate_limit_usage windows + api_keys_new.last_used_at
+        -- ==================================================================
+        IF p_update_rate_limits AND to_regclass('public.rate_limit_usage') IS NOT NULL THEN
+            INSERT INTO rate_limit_usage (
+                user_id, api_key, window_type, window_start,
+                requests_count, tokens_count, created_at, updated_at
+            )
+            SELECT p_user_id, p_api_key, w.window_type,
+                   date_trunc(w.unit, v_now AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                   1, p_total_tokens, v_now, v_now
+            FROM (VALUES ('minute', 'minute'), ('hour', 'hour'), ('day', 'day'))
+                AS w(window_type, unit)
+            ON CONFLICT (api_key, window_type, window_start) DO UPDATE
+            SET requests_count = rate_limit_usage.requests_count + 1,
+                tokens_count = rate_limit_usage.tokens_count + EXCLUDED.tokens_count,
+                updated_at = EXCLUDED.updated_at;
+
+            IF p_api_key LIKE 'gw\_%' THEN
+                UPDATE api_keys_new SET last_used_at = v_now WHERE api_key = p_api_key;
+            END IF;
+        END IF;
+
+        -- ==================================================================
+        -- STEP 6: Shadow credit_ledger double-entry, from the ACTUAL split
+        -- ==================================================================
+        IF p_shadow_ledger AND v_charge AND to_regclass('public.credit_ledger') IS NOT NULL THEN
+            INSERT INTO credit_ledger (ref, user_id, account, debit, credit, state)
+            SELECT p_request_id, p_user_id, e.account, e.debit, e.credit, 'settled'
+            FROM (VALUES
+                ('user:subscription_allowance', v_from_allowance, 0::NUMERIC),
+                ('user:purchased_credits', v_from_purchased, 0::NUMERIC),
+                ('revenue', 0::NUMERIC, p_cost)
+            ) AS e(account, debit, credit)
+            WHERE e.debit > 0 OR e.credit > 0
+            ON CONFLICT (ref, account, state) DO NOTHING;
+        END IF;
+
+        -- ==================================================================
+        -- STEP 7: chat_completion_requests row
+        -- ==================================================================
+        IF p_request_record IS NOT NULL THEN
+            v_model_id := NULLIF(p_request_record ->> 'model_id', '')::BIGINT;
+
+            IF v_model_id IS NULL THEN
+                -- Mirrors get_model_id_by_name(): provider-scoped match first,
+                -- exact before suffix match, then any provider.
+                IF p_request_record ->> 'provider_name' IS NOT NULL THEN
+                    SELECT id INTO v_provider_id
+                    FROM providers
+                    WHERE slug ILIKE p_request_record ->> 'provider_name'
+                       OR name ILIKE p_request_record ->> 'provider_name'
+                    LIMIT 1;
+                END IF;
+
+                SELECT m.id INTO v_model_id
+                FROM models m
+                WHERE (v_provider_id IS NULL OR m.provider_id = v_provider_id)
+                  AND (m.provider_model_id ILIKE '%' || p_model OR m.model_name ILIKE '%' || p_model)
+                ORDER BY (m.provider_model_id = p_model OR m.model_name = p_model) DESC
+                LIMIT 1;
+
+                IF v_model_id IS NULL AND v_provider_id IS NOT NULL THEN
+                    SELECT m.id INTO v_model_id
+                    FROM models m
+                    WHERE m.provider_model_id ILIKE '%' || p_model OR m.model_name ILIKE '%' || p_model
+                    LIMIT 1;
+                END IF;
+            END IF;
+
+            -- Completed requests with an unknown model are skipped, as in
+            -- save_chat_completion_request_with_cost().
+            IF v_model_id IS NOT NULL THEN
+                v_record := (p_request_record - 'provider_name') || jsonb_build_object(
+                    'request_id', p_request_id,
+                    'model_id', v_model_id,
+                    'user_id', p_user_id
+                );
+
+                INSERT INTO chat_completion_requests (
+                    request_id, model_id, user_id, api_key_id, input_tokens, output_tokens,
+                    processing_time_ms, status, is_anonymous, cost_usd, input_cost_usd,
+                    output_cost_usd, pricing_source
+                )
+                SELECT r.request_id, r.model_id, r.user_id, r.api_key_id, r.input_tokens,
+                       r.output_tokens, r.processing_time_ms, COALESCE(r.status, 'completed'),
+                       COALESCE(r.is_anonymous, false), r.cost_usd, r.input_cost_usd,
+                       r.output_cost_usd, COALESCE(r.pricing_source, 'calculated')
+                FROM jsonb_populate_record(NULL::chat_completion_requests, v_record) AS r
+                RETURNING id INTO v_request_record_id;
+            END IF;
+        END IF;
+
+        v_result := jsonb_build_object(
+            'success', true,
+            'duplicate', false,
+            'charged', CASE WHEN v_charge THEN p_cost ELSE 0 END,
+            'is_admin', v_is_admin,
+            'transaction_id', v_transaction_id,
+            'new_allowance', v_allowance_after,
+            'new_purchased', v_purchased_after,
+            'new_balance', v_allowance_after + v_purchased_after,
+            'request_record_id', v_request_record_id,
+            'error', NULL
+        );
+
+        UPDATE request_settlements SET result = v_result WHERE request_id = p_request_id;
+        RETURN v_result;
+
+    EXCEPTION
+        WHEN OTHERS THEN
+            -- The inner block is rolled back as a whole: no deduction, no
+            -- usage/transaction/request rows. Release the claim so a retry can
+            -- settle the request.
+            GET STACKED DIAGNOSTICS v_detail = PG_EXCEPTION_DETAIL;
+            DELETE FROM request_settlements WHERE request_id = p_request_id;
+            RETURN jsonb_build_object(
+                'success', false,
+                'duplicate', false,
+                'charged', 0,
+                'transaction_id', NULL,
+                'new_allowance', NULL,
+                'new_purchased', NULL,
+                -- Only the billing errors carry a number in DETAIL; anything
+                -- else (constraint violations, ...) has free text there
+                'new_balance', CASE
+                    WHEN SQLERRM IN ('insufficient_credits', 'daily_limit_exceeded')
+                    THEN NULLIF(v_detail, '')::NUMERIC
+                END,
+                'request_record_id', NULL,
+                'error', SQLERRM
+            );
+    END;
+END;
+$$;
+
+-- ============================================================================
+-- PERMISSIONS
+-- ============================================================================
+REVOKE ALL ON FUNCTION settle_request(TEXT, BIGINT, TEXT, TEXT, NUMERIC, INTEGER, TEXT, JSONB, BOOLEAN, NUMERIC, BOOLEAN, BOOLEAN, JSONB) FROM PUBLIC;
+REVOKE ALL ON FUNCTION settle_request(TEXT, BIGINT, TEXT, TEXT, NUMERIC, INTEGER, TEXT, JSONB, BOOLEAN, NUMERIC, BOOLEAN, BOOLEAN, JSONB) FROM anon;
+REVOKE ALL ON FUNCTION settle_request(TEXT, BIGINT, TEXT, TEXT, NUMERIC, INTEGER, TEXT, JSONB, BOOLEAN, NUMERIC, BOOLEAN, BOOLEAN, JSONB) FROM authenticated;
+GRANT EXECUTE ON FUNCTION settle_request(TEXT, BIGINT, TEXT, TEXT, NUMERIC, INTEGER, TEXT, JSONB, BOOLEAN, NUMERIC, BOOLEAN, BOOLEAN, JSONB) TO service_role;
+
+-- ============================================================================
+-- DOCUMENTATION
+-- ============================================================================
+COMMENT ON FUNCTION settle_request(TEXT, BIGINT, TEXT, TEXT, NUMERIC, INTEGER, TEXT, JSONB, BOOLEAN, NUMERIC, BOOLEAN, BOOLEAN, JSONB) IS
+'Settles a completed request in one transaction: credit deduction (allowance first),
+credit_transactions, usage_records, rate_limit_usage, optional shadow credit_ledger
+entry and the chat_completion_requests row. Idempotent by request id via
+request_settlements; any failure rolls back every write for the request.';
+
+-- Notify PostgREST to pick up schema changes
+NOTIFY pgrst, 'reload schema';
+
+-- ============================================================================
+-- DOWN MIGRATION (commented out - run manually to rollback)
+-- ============================================================================
+-- DROP FUNCTION IF EXISTS settle_request(TEXT, BIGINT, TEXT, TEXT, NUMERIC, INTEGER, TEXT, JSONB, BOOLEAN, NUMERIC, BOOLEAN, BOOLEAN, JSONB);
+-- DROP TABLE IF EXISTS public.request_settlements;
@@ -0,0 +1,538 @@
+-- Migration: Add request_rollups — minute/hour/day aggregates for analytics
+--
+-- Problem:
+-- The admin plot-data and user-growth endpoints, the model-usage analytics in
+-- src/db/chat_completion_requests.py, gateway analytics and per-user activity
+-- stats all pull every raw row in their window (or the whole table) and
+-- aggregate in Python on each call. Their cost grows with total traffic.
+--
+-- Solution:
+-- request_rollups keeps requests, errors, tokens, cost and a latency histogram
+-- per (bucket, bucket_start, model_id, user_id) for minute, hour and day
+-- buckets. Each bucket is stored once per user plus once for all users
+-- (user_id = 0), so model/provider analytics read a handful of rows per bucket
+-- and per-user analytics read only that user's rows.
+--
+--   * apply_request_rollup_deltas()  - adds a batch of per-minute deltas from the
+--                                      API workers to all three grains
+--   * rebuild_request_rollups()      - recomputes closed buckets from
+--                                      chat_completion_requests (backfill and
+--                                      hourly repair of dropped deltas)
+--   * request_rollup_totals()        - per-model totals over a set of spans
+--   * request_rollup_user_count()    - distinct users over a set of spans
+--   * request_rollup_series()        - per-bucket totals at one grain
+--
+-- A read over [start, end) is decomposed by the caller into day buckets for the
+-- whole days inside the range, hour buckets for the whole hours at its edges and
+-- minute buckets for the rest, so its cost depends on the range, not the table.
+--
+-- user_signup_rollups does the same for /admin/users/growth: one row per day,
+-- maintained by triggers on users.
+--
+-- Key conventions:
+--   model_id = 0   request whose model could not be resolved
+--   user_id  = 0   all users (aggregate row)
+--   user_id  = -1  anonymous requests
+--
+-- Latency histogram: 10 counts split at 100, 250, 500, 1000, 2500, 5000,
+-- 10000, 30000 and 60000 ms (slot i holds width_bucket(ms, bounds) = i - 1).
+
+-- ============================================================================
+-- TABLES
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS public.request_rollups (
+    bucket            TEXT        NOT NULL CHECK (bucket IN ('minute', 'hour', 'day')),
+    bucket_start      TIMESTAMPTZ NOT NULL,
+    model_id          INTEGER     NOT NULL DEFAULT 0,
+    user_id           BIGINT      NOT NULL DEFAULT 0,
+    requests          BIGINT      NOT NULL DEFAULT 0,
+    errors            BIGINT      NOT NULL DEFAULT 0,
+    input_tokens      BIGINT      NOT NULL DEFAULT 0,
+    output_tokens     BIGINT      NOT NULL DEFAULT 0,
+    cost_usd          NUMERIC(20, 6) NOT NULL DEFAULT 0,
+    latency_ms_sum    NUMERIC     NOT NULL DEFAULT 0,
+    latency_hist      BIGINT[]    NOT NULL DEFAULT ARRAY[0,0,0,0,0,0,0,0,0,0]::BIGINT[],
+    first_request_at  TIMESTAMPTZ,
+    last_request_at   TIMESTAMPTZ,
+    updated_at        TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (bucket, user_id, bucket_start, model_id)
+);
+
+-- Distinct-user counts scan every user's rows in a span
+CREATE INDEX IF NOT EXISTS idx_request_rollups_bucket_start
+    ON public.request_rollups (bucket, bucket_start);
+
+ALTER TABLE public.request_rollups ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE public.request_rollups IS
+    'Minute/hour/day request aggregates per model and user (user_id 0 = all users, -1 = anonymous).';
+
+CREATE TABLE IF NOT EXISTS public.user_signup_rollups (
+    day      DATE    PRIMARY KEY,
+    signups  BIGINT  NOT NULL DEFAULT 0
+);
+
+ALTER TABLE public.user_signup_rollups ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE public.user_signup_rollups IS
+    'Users created per UTC day, maintained by triggers on users.';
+
+-- ============================================================================
+-- HELPERS
+-- ============================================================================
+CREATE OR REPLACE FUNCTION rollup_bucket_start(p_bucket TEXT, p_ts TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT date_trunc(p_bucket, p_ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+$$;
+
+CREATE OR REPLACE FUNCTION rollup_latency_slot(p_ms NUMERIC)
+RETURNS INTEGER
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT width_bucket(
+        COALESCE(p_ms, 0),
+        ARRAY[100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]::NUMERIC[]
+    ) + 1
+$$;
+
+CREATE OR REPLACE FUNCTION rollup_hist_add(a BIGINT[], b BIGINT[])
+RETURNS BIGINT[]
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN a IS NULL THEN b
+        WHEN b IS NULL THEN a
+        ELSE ARRAY(
+            SELECT COALESCE(x, 0) + COALESCE(y, 0)
+            FROM unnest(a, b) WITH ORDINALITY AS t(x, y, i)
+            ORDER BY i
+        )
+    END
+$$;
+
+DROP AGGREGATE IF EXISTS rollup_hist_sum(BIGINT[]);
+CREATE AGGREGATE rollup_hist_sum(BIGINT[]) (
+    SFUNC = rollup_hist_add,
+    STYPE = BIGINT[]
+);
+
+-- ============================================================================
+-- WRITE PATH: batched deltas from the API workers
+-- ============================================================================
+-- p_rows: [{"minute", "model_id", "user_id", "requests", "errors", "input_tokens",
+--           "output_tokens", "cost_usd", "latency_ms_sum", "latency_hist",
+--           "first_request_at", "last_request_at"}, ...]
+-- Each row is added to its minute, hour and day bucket, for the user and for
+-- user_id = 0. Rows are locked in key order so concurrent flushes from several
+-- workers cannot deadlock.
+CREATE OR REPLACE FUNCTION apply_request_rollup_deltas(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    WITH d AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_rows) AS r(
+            minute TIMESTAMPTZ,
+            model_id INTEGER,
+            user_id BIGINT,
+            requests BIGINT,
+            errors BIGINT,
+            input_tokens BIGINT,
+            output_tokens BIGINT,
+            cost_usd NUMERIC,
+            latency_ms_sum NUMERIC,
+            latency_hist BIGINT[],
+            first_request_at TIMESTAMPTZ,
+            last_request_at TIMESTAMPTZ
+        )
+    ),
+    expanded AS (
+        SELECT
+            g.bucket,
+            rollup_bucket_start(g.bucket, d.minute) AS bucket_start,
+            COALESCE(d.model_id, 0) AS model_id,
+            u.user_id,
+            d.requests, d.errors, d.input_tokens, d.output_tokens, d.cost_usd,
+            d.latency_ms_sum, d.latency_hist, d.first_request_at, d.last_request_at
+        FROM d
+        CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS g(bucket)
+        CROSS JOIN LATERAL (VALUES (COALESCE(d.user_id, -1)), (0::BIGINT)) AS u(user_id)
+    )
+    INSERT INTO public.request_rollups AS r (
+        bucket, bucket_start, model_id, user_id, requests, errors, input_tokens,
+        output_tokens, cost_usd, latency_ms_sum, latency_hist, first_request_at,
+        last_request_at, updated_at
+    )
+    SELECT
+        bucket, bucket_start, model_id, user_id,
+        SUM(requests), SUM(errors), SUM(input_tokens), SUM(output_tokens),
+        SUM(cost_usd), SUM(latency_ms_sum), rollup_hist_sum(latency_hist),
+        MIN(first_request_at), MAX(last_request_at), NOW()
+    FROM expanded
+    GROUP BY bucket, user_id, bucket_start, model_id
+    ORDER BY bucket, user_id, bucket_start, model_id
+    ON CONFLICT (bucket, user_id, bucket_start, model_id) DO UPDATE SET
+        requests         = r.requests + EXCLUDED.requests,
+        errors           = r.errors + EXCLUDED.errors,
+        input_tokens     = r.input_tokens + EXCLUDED.input_tokens,
+        output_tokens    = r.output_tokens + EXCLUDED.output_tokens,
+        cost_usd         = r.cost_usd + EXCLUDED.cost_usd,
+        latency_ms_sum   = r.latency_ms_sum + EXCLUDED.latency_ms_sum,
+        latency_hist     = rollup_hist_add(r.latency_hist, EXCLUDED.latency_hist),
+        first_request_at = LEAST(r.first_request_at, EXCLUDED.first_request_at),
+        last_request_at  = GREATEST(r.last_request_at, EXCLUDED.last_request_at),
+        updated_at       = NOW();
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+-- ============================================================================
+-- BACKFILL / REPAIR: recompute closed buckets from chat_completion_requests
+-- ============================================================================
+-- Buckets are widened to whole buckets of each grain and clamped to those that
+-- closed at least 5 minutes ago, so a rebuild never races live deltas. Each
+-- grain is deleted and re-inserted in the same transaction.
+CREATE OR REPLACE FUNCTION rebuild_request_rollups(p_start TIMESTAMPTZ, p_end TIMESTAMPTZ)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_bucket TEXT;
+    v_lo TIMESTAMPTZ;
+    v_hi TIMESTAMPTZ;
+    v_rows INTEGER;
+    v_total INTEGER := 0;
+BEGIN
+    FOREACH v_bucket IN ARRAY ARRAY['minute', 'hour', 'day'] LOOP
+        v_lo := rollup_bucket_start(v_bucket, p_start);
+        v_hi := rollup_bucket_start(v_bucket, LEAST(p_end, NOW() - INTERVAL '5 minutes'));
+        CONTINUE WHEN v_hi <= v_lo;
+
+        DELETE FROM public.request_rollups
+        WHERE bucket = v_bucket AND bucket_start >= v_lo AND bucket_start < v_hi;
+
+        INSERT INTO public.request_rollups (
+            bucket, bucket_start, model_id, user_id, requests, errors, input_tokens,
+            output_tokens, cost_usd, latency_ms_sum, latency_hist, first_request_at,
+            last_request_at, updated_at
+        )
+        SELECT
+            v_bucket,
+            c.bucket_start,
+            c.model_id,
+            CASE WHEN GROUPING(c.user_id) = 1 THEN 0 ELSE c.user_id END,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE c.status = 'failed'),
+            COALESCE(SUM(c.input_tokens), 0),
+            COALESCE(SUM(c.output_tokens), 0),
+            COALESCE(SUM(c.cost_usd), 0),
+            COALESCE(SUM(c.processing_time_ms), 0),
+            ARRAY[
+                COUNT(*) FILTER (WHERE c.slot = 1),
+                COUNT(*) FILTER (WHERE c.slot = 2),
+                COUNT(*) FILTER (WHERE c.slot = 3),
+                COUNT(*) FILTER (WHERE c.slot = 4),
+                COUNT(*) FILTER (WHERE c.slot = 5),
+                COUNT(*) FILTER (WHERE c.slot = 6),
+                COUNT(*) FILTER (WHERE c.slot = 7),
+                COUNT(*) FILTER (WHERE c.slot = 8),
+                COUNT(*) FILTER (WHERE c.slot = 9),
+                COUNT(*) FILTER (WHERE c.slot = 10)
+            ]::BIGINT[],
+            MIN(c.created_at),
+            MAX(c.created_at),
+            NOW()
+        FROM (
+            SELECT
+                rollup_bucket_start(v_bucket, ccr.created_at) AS bucket_start,
+                COALESCE(ccr.model_id, 0) AS model_id,
+                COALESCE(ccr.user_id, -1) AS user_id,
+                ccr.status,
+                ccr.input_tokens,
+                ccr.output_tokens,
+                ccr.cost_usd,
+                ccr.processing_time_ms,
+                rollup_latency_slot(ccr.processing_time_ms) AS slot,
+                ccr.created_at
+            FROM public.chat_completion_requests ccr
+            WHERE ccr.created_at >= v_lo AND ccr.created_at < v_hi
+        ) c
+        GROUP BY GROUPING SETS (
+            (c.bucket_start, c.model_id, c.user_id),
+            (c.bucket_start, c.model_id)
+        );
+
+        GET DIAGNOSTICS v_rows = ROW_COUNT;
+        v_total := v_total + v_rows;
+    END LOOP;
+
+    RETURN v_total;
+END;
+$$;
+
+-- ============================================================================
+-- READ PATH
+-- ============================================================================
+-- p_spans: [{"bucket": "hour", "lo": "...", "hi": "..."}, ...] covering the
+-- requested range without overlap (built by src/db/request_rollups.py).
+CREATE OR REPLACE FUNCTION request_rollup_totals(
+    p_spans       JSONB,
+    p_user_id     BIGINT    DEFAULT NULL,
+    p_model_ids   INTEGER[] DEFAULT NULL,
+    p_provider_id INTEGER   DEFAULT NULL,
+    p_with_users  BOOLEAN   DEFAULT false
+)
+RETURNS TABLE (
+    model_id          INTEGER,
+    model_name        TEXT,
+    provider_model_id TEXT,
+    provider_id       INTEGER,
+    provider_slug     TEXT,
+    requests          BIGINT,
+    errors            BIGINT,
+    input_tokens      BIGINT,
+    output_tokens     BIGINT,
+    cost_usd          NUMERIC,
+    latency_ms_sum    NUMERIC,
+    latency_hist      BIGINT[],
+    first_request_at  TIMESTAMPTZ,
+    last_request_at   TIMESTAMPTZ,
+    unique_users      BIGINT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH spans AS (
+        SELECT * FROM jsonb_to_recordset(p_spans) AS s(bucket TEXT, lo TIMESTAMPTZ, hi TIMESTAMPTZ)
+    ),
+    picked AS (
+        SELECT r.*
+        FROM spans s
+        JOIN public.request_rollups r
+          ON r.bucket = s.bucket
+         AND r.user_id = COALESCE(p_user_id, 0)
+         AND r.bucket_start >= s.lo
+         AND r.bucket_start < s.hi
+        WHERE p_model_ids IS NULL OR r.model_id = ANY(p_model_ids)
+    ),
+    distinct_users AS (
+        SELECT r.model_id, COUNT(DISTINCT r.user_id) AS n
+        FROM spans s
+        JOIN public.request_rollups r
+          ON r.bucket = s.bucket
+         AND r.bucket_start >= s.lo
+         AND r.bucket_start < s.hi
+         AND r.user_id > 0
+        WHERE p_with_users AND (p_model_ids IS NULL OR r.model_id = ANY(p_model_ids))
+        GROUP BY r.model_id
+    )
+    SELECT
+        p.model_id,
+        m.model_name::TEXT,
+        m.provider_model_id::TEXT,
+        m.provider_id,
+        pr.slug::TEXT,
+        SUM(p.requests)::BIGINT,
+        SUM(p.errors)::BIGINT,
+        SUM(p.input_tokens)::BIGINT,
+        SUM(p.output_tokens)::BIGINT,
+        SUM(p.cost_usd),
+        SUM(p.latency_ms_sum),
+        rollup_hist_sum(p.latency_hist),
+        MIN(p.first_request_at),
+        MAX(p.last_request_at),
+        COALESCE(MAX(u.n), 0)::BIGINT
+    FROM picked p
+    LEFT JOIN distinct_users u ON u.model_id = p.model_id
+    LEFT JOIN public.models m ON m.id = p.model_id
+    LEFT JOIN public.providers pr ON pr.id = m.provider_id
+    WHERE p_provider_id IS NULL OR m.provider_id = p_provider_id
+    GROUP BY p.model_id, m.model_name, m.provider_model_id, m.provider_id, pr.slug
+$$;
+
+CREATE OR REPLACE FUNCTION request_rollup_user_count(
+    p_spans     JSONB,
+    p_model_ids INTEGER[] DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT COUNT(DISTINCT r.user_id)
+    FROM jsonb_to_recordset(p_spans) AS s(bucket TEXT, lo TIMESTAMPTZ, hi TIMESTAMPTZ)
+    JOIN public.request_rollups r
+      ON r.bucket = s.bucket
+     AND r.bucket_start >= s.lo
+     AND r.bucket_start < s.hi
+     AND r.user_id > 0
+    WHERE p_model_ids IS NULL OR r.model_id = ANY(p_model_ids)
+$$;
+
+CREATE OR REPLACE FUNCTION request_rollup_series(
+    p_bucket      TEXT,
+    p_start       TIMESTAMPTZ,
+    p_end         TIMESTAMPTZ,
+    p_user_id     BIGINT    DEFAULT NULL,
+    p_model_ids   INTEGER[] DEFAULT NULL,
+    p_provider_id INTEGER   DEFAULT NULL
+)
+RETURNS TABLE (
+    bucket_start   TIMESTAMPTZ,
+    requests       BIGINT,
+    errors         BIGINT,
+    input_tokens   BIGINT,
+    output_tokens  BIGINT,
+    cost_usd       NUMERIC,
+    latency_ms_sum NUMERIC
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        r.bucket_start,
+        SUM(r.requests)::BIGINT,
+        SUM(r.errors)::BIGINT,
+        SUM(r.input_tokens)::BIGINT,
+        SUM(r.output_tokens)::BIGINT,
+        SUM(r.cost_usd),
+        SUM(r.latency_ms_sum)
+    FROM public.request_rollups r
+    LEFT JOIN public.models m ON p_provider_id IS NOT NULL AND m.id = r.model_id
+    WHERE r.bucket = p_bucket
+      AND r.user_id = COALESCE(p_user_id, 0)
+      AND (p_start IS NULL OR r.bucket_start >= p_start)
+      AND r.bucket_start < p_end
+      AND (p_model_ids IS NULL OR r.model_id = ANY(p_model_ids))
+      AND (p_provider_id IS NULL OR m.provider_id = p_provider_id)
+    GROUP BY r.bucket_start
+    ORDER BY r.bucket_start
+$$;
+
+-- ============================================================================
+-- USER SIGNUPS
+-- ============================================================================
+CREATE OR REPLACE FUNCTION track_user_signup_rollup()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.created_at IS NOT NULL THEN
+            INSERT INTO public.user_signup_rollups AS s (day, signups)
+            VALUES ((NEW.created_at AT TIME ZONE 'UTC')::DATE, 1)
+            ON CONFLICT (day) DO UPDATE SET signups = s.signups + 1;
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    IF OLD.created_at IS NOT NULL THEN
+        UPDATE public.user_signup_rollups
+        SET signups = GREATEST(signups - 1, 0)
+        WHERE day = (OLD.created_at AT TIME ZONE 'UTC')::DATE;
+    END IF;
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_user_signup_rollup ON public.users;
+CREATE TRIGGER trg_user_signup_rollup
+    AFTER INSERT OR DELETE ON public.users
+    FOR EACH ROW EXECUTE FUNCTION track_user_signup_rollup();
+
+-- One-time backfill; users is small enough to aggregate in the migration
+INSERT INTO public.user_signup_rollups (day, signups)
+SELECT (created_at AT TIME ZONE 'UTC')::DATE, COUNT(*)
+FROM public.users
+WHERE created_at IS NOT NULL
+GROUP BY 1
+ON CONFLICT (day) DO UPDATE SET signups = EXCLUDED.signups;
+
+CREATE OR REPLACE FUNCTION user_signup_series(p_start DATE, p_end DATE)
+RETURNS TABLE (day DATE, signups BIGINT, cumulative BIGINT)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        d::DATE,
+        COALESCE(s.signups, 0),
+        (SELECT COALESCE(SUM(signups), 0) FROM public.user_signup_rollups WHERE day < p_start)
+            + SUM(COALESCE(s.signups, 0)) OVER (ORDER BY d)
+    FROM generate_series(p_start, p_end, INTERVAL '1 day') AS d
+    LEFT JOIN public.user_signup_rollups s ON s.day = d::DATE
+    ORDER BY 1
+$$;
+
+-- ============================================================================
+-- PERMISSIONS
+-- ============================================================================
+REVOKE ALL ON FUNCTION apply_request_rollup_deltas(JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION rebuild_request_rollups(TIMESTAMPTZ, TIMESTAMPTZ) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION request_rollup_totals(JSONB, BIGINT, INTEGER[], INTEGER, BOOLEAN) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION request_rollup_user_count(JSONB, INTEGER[]) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION request_rollup_series(TEXT, TIMESTAMPTZ, TIMESTAMPTZ, BIGINT, INTEGER[], INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION user_signup_series(DATE, DATE) FROM PUBLIC, anon, authenticated;
+
+GRANT EXECUTE ON FUNCTION apply_request_rollup_deltas(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION rebuild_request_rollups(TIMESTAMPTZ, TIMESTAMPTZ) TO service_role;
+GRANT EXECUTE ON FUNCTION request_rollup_totals(JSONB, BIGINT, INTEGER[], INTEGER, BOOLEAN) TO service_role;
+GRANT EXECUTE ON FUNCTION request_rollup_user_count(JSONB, INTEGER[]) TO service_role;
+GRANT EXECUTE ON FUNCTION request_rollup_series(TEXT, TIMESTAMPTZ, TIMESTAMPTZ, BIGINT, INTEGER[], INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION user_signup_series(DATE, DATE) TO service_role;
+GRANT SELECT, DELETE ON public.request_rollups TO service_role;
+GRANT SELECT ON public.user_signup_rollups TO service_role;
+
+-- ============================================================================
+-- DOCUMENTATION
+-- ============================================================================
+COMMENT ON FUNCTION apply_request_rollup_deltas(JSONB) IS
+'Adds a batch of per-minute request deltas to the minute, hour and day rollups,
+for the user and for all users (user_id 0).';
+
+COMMENT ON FUNCTION rebuild_request_rollups(TIMESTAMPTZ, TIMESTAMPTZ) IS
+'Recomputes every grain of request_rollups for buckets in [p_start, p_end) that
+closed at least 5 minutes ago, from chat_completion_requests.';
+
+-- Notify PostgREST to pick up schema changes
+NOTIFY pgrst, 'reload schema';
+
+-- ============================================================================
+-- DOWN MIGRATION (commented out - run manually to rollback)
+-- ============================================================================
+-- DROP TRIGGER IF EXISTS trg_user_signup_rollup ON public.users;
+-- DROP FUNCTION IF EXISTS track_user_signup_rollup();
+-- DROP FUNCTION IF EXISTS user_signup_series(DATE, DATE);
+-- DROP FUNCTION IF EXISTS request_rollup_series(TEXT, TIMESTAMPTZ, TIMESTAMPTZ, BIGINT, INTEGER[], INTEGER);
+-- DROP FUNCTION IF EXISTS request_rollup_user_count(JSONB, INTEGER[]);
+-- DROP FUNCTION IF EXISTS request_rollup_totals(JSONB, BIGINT, INTEGER[], INTEGER, BOOLEAN);
+-- DROP FUNCTION IF EXISTS rebuild_request_rollups(TIMESTAMPTZ, TIMESTAMPTZ);
+-- DROP FUNCTION IF EXISTS apply_request_rollup_deltas(JSONB);
+-- DROP AGGREGATE IF EXISTS rollup_hist_sum(BIGINT[]);
+-- DROP FUNCTION IF EXISTS rollup_hist_add(BIGINT[], BIGINT[]);
+-- DROP FUNCTION IF EXISTS rollup_latency_slot(NUMERIC);
+-- DROP FUNCTION IF EXISTS rollup_bucket_start(TEXT, TIMESTAMPTZ);
+-- DROP TABLE IF EXISTS public.user_signup_rollups;
+-- DROP TABLE IF EXISTS public.request_rollups;
@@ -0,0 +1,21 @@
+-- Keyset pagination indexes for the admin ledger and request-log listings.
+--
+-- /admin/credit-transactions and /admin/monitoring/chat-requests (and their
+-- /export streams) page by (created_at, id):
+--
+--   WHERE created_at < $ts OR (created_at = $ts AND id < $id)
+--   ORDER BY created_at DESC, id DESC LIMIT $n
+--
+-- A composite (created_at, id) index answers each page with a single seek
+-- however deep it is, and keeps the id tie-break out of an in-memory sort.
+-- Postgres scans it backwards for ascending exports.
+--
+-- Both use IF NOT EXISTS so the migration is idempotent. On very large tables,
+-- prefer running the equivalent CREATE INDEX CONCURRENTLY out-of-band (it cannot
+-- run inside a migration transaction) to avoid a write lock during deploy.
+
+CREATE INDEX IF NOT EXISTS "idx_credit_transactions_created_at_id"
+    ON "public"."credit_transactions" USING "btree" ("created_at" DESC, "id" DESC);
+
+CREATE INDEX IF NOT EXISTS "idx_chat_completion_requests_created_at_id"
+    ON "public"."chat_completion_requests" USING "btree" ("created_at" DESC, "id" DESC);
@@ -99,10 +99,10 @@ def test_non_streaming_deduction_only_after_provider_success():
 
 def test_streaming_background_task_only_after_done_event():
     """
-    In the streaming generator, create_task(_process_stream_completion_background)
-    must be called AFTER yield create_done_sse(). The function is defined
-    earlier in the file, but the asyncio.create_task() call inside the
-    generator must follow the [DONE] yield.
+    In the streaming generator, _process_stream_completion_background must be
+    submitted to the post-completion queue AFTER yield create_done_sse(). The
+    function is imported earlier in the file, but the submit_post_completion()
+    call inside the generator must follow the [DONE] yield.
 
     NOTE: stream_generator was extracted from chat.py into chat_streaming.py
     (Gatewayz One Phase 0d); this asserts on its new home.
@@ -112,7 +112,7 @@ def test_streaming_background_task_only_after_done_event():
     # yielded, so the client receives [DONE] before any post-stream DB work begins.
     # (Anchor on the background-task call, then require a [DONE] yield before it —
     # robust to later error-path [DONE] yields that have no trailing task.)
-    task_call_pos = source.find("_process_stream_completion_background(")
+    task_call_pos = source.find('"stream_completion",\n')
     assert task_call_pos > 0, "_process_stream_completion_background scheduling not found"
     done_pos = source.rfind("yield create_done_sse()", 0, task_call_pos)
     assert done_pos > 0, "no 'yield create_done_sse()' precedes the background task"
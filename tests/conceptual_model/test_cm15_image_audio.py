@@ -54,7 +54,7 @@ class TestCM1503AudioTranscriptionReturnsText:
 
         # Build mock OpenAI client with explicit chain to avoid auto-mock issues
         mock_transcriptions = MagicMock()
-        mock_transcriptions.create = MagicMock(return_value=mock_whisper_response)
+        mock_transcriptions.create = AsyncMock(return_value=mock_whisper_response)
         mock_audio = MagicMock()
         mock_audio.transcriptions = mock_transcriptions
         mock_client = MagicMock()
@@ -69,7 +69,7 @@ class TestCM1503AudioTranscriptionReturnsText:
         with (
             patch("src.routes.audio.get_user", return_value=mock_user),
             patch(
-                "src.routes.audio.get_openai_pooled_client",
+                "src.routes.audio.get_openai_pooled_async_client",
                 return_value=mock_client,
             ),
             patch(
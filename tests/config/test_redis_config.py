@@ -2,7 +2,8 @@
 Comprehensive tests for Redis Config
 """
 
-from unittest.mock import MagicMock, Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -22,3 +23,157 @@ class TestRedisConfig:
 
         # Verify expected exports exist
         assert hasattr(redis_config, "__name__")
+
+
+class FakePipeline:
+    """Stands in for both the sync and the async pipeline: queues, then replays."""
+
+    def __init__(self):
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, *args))
+            return self
+
+        return queue
+
+    def execute(self):
+        return [f"{name}:{args[0]}" for name, *args in self.commands]
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        return FakePipeline.execute(self)
+
+
+class TestAsyncRedis:
+    @pytest.fixture
+    def shared(self, monkeypatch):
+        from src.config import Config, redis_config
+
+        sync_client = MagicMock()
+        sync_client.pipeline.side_effect = FakePipeline
+        config = redis_config.RedisConfig()
+        config._client = sync_client
+        monkeypatch.setattr(redis_config, "_redis_config", config)
+        monkeypatch.setattr(Config, "REDIS_ASYNC_ENABLED", True)
+        monkeypatch.setattr(
+            redis_config, "_async_clients", redis_config.weakref.WeakKeyDictionary()
+        )
+        return sync_client
+
+    def test_pool_settings_include_health_checks(self, monkeypatch):
+        from src.config import redis_config
+
+        monkeypatch.setenv("REDIS_HEALTH_CHECK_INTERVAL", "15")
+        client = redis_config.RedisConfig().create_async_client()
+
+        kwargs = client.connection_pool.connection_kwargs
+        assert kwargs["health_check_interval"] == 15
+        assert client.connection_pool.max_connections == 50
+        assert kwargs["retry"]._retries == 1
+
+    def test_shared_client_pipelines_on_one_async_client_per_loop(self, shared, monkeypatch):
+        from src.config import redis_config
+
+        async_client = MagicMock()
+        async_client.pipeline.side_effect = FakeAsyncPipeline
+        created = []
+        monkeypatch.setattr(
+            redis_config.RedisConfig,
+            "create_async_client",
+            lambda self: created.append(1) or async_client,
+        )
+
+        async def main():
+            first = await redis_config.redis_pipeline(shared, lambda p: p.incr("a").expire("a", 5))
+            second = await redis_config.redis_pipeline(shared, lambda p: p.get("b"))
+            return first, second
+
+        assert asyncio.run(main()) == (["incr:a", "expire:a"], ["get:b"])
+        assert created == [1]
+        shared.pipeline.assert_not_called()
+
+    def test_injected_or_disabled_clients_run_in_a_thread(self, shared, monkeypatch):
+        from src.config import Config, redis_config
+
+        injected = MagicMock()
+        injected.pipeline.side_effect = FakePipeline
+        injected.get.return_value = "cached"
+        assert asyncio.run(redis_config.redis_pipeline(injected, lambda p: p.get("k"))) == ["get:k"]
+        assert asyncio.run(redis_config.redis_command(injected, "get", "k")) == "cached"
+
+        monkeypatch.setattr(Config, "REDIS_ASYNC_ENABLED", False)
+        assert asyncio.run(redis_config.redis_pipeline(shared, lambda p: p.get("k"))) == ["get:k"]
+        assert asyncio.run(self._async_client_for_loop()) is None
+
+    @staticmethod
+    async def _async_client_for_loop():
+        from src.config import redis_config
+
+        return redis_config.get_async_redis_client()
+
+    def test_close_drops_the_loops_client(self, shared, monkeypatch):
+        from src.config import redis_config
+
+        async_client = MagicMock()
+        async_client.aclose = AsyncMock()
+        async_client.connection_pool.disconnect = AsyncMock()
+        monkeypatch.setattr(
+            redis_config.RedisConfig, "create_async_client", lambda self: async_client
+        )
+
+        async def main():
+            redis_config.get_async_redis_client()
+            await redis_config.close_async_redis_client()
+            return len(redis_config._async_clients)
+
+        assert asyncio.run(main()) == 0
+        async_client.aclose.assert_awaited_once()
+        async_client.connection_pool.disconnect.assert_awaited_once()
+
+    def test_waiting_pool_queues_a_burst_and_connects_concurrently(self):
+        from redis.exceptions import ConnectionError
+
+        from src.config.redis_config import _WaitingConnectionPool
+
+        connecting = []
+
+        class SlowConnection:
+            def __init__(self, **_kwargs):
+                pass
+
+            async def connect(self):
+                connecting.append(1)
+                peak.append(len(connecting))
+                await asyncio.sleep(0.01)
+                connecting.pop()
+
+            async def can_read_destructive(self):
+                return False
+
+        peak = []
+        pool = _WaitingConnectionPool(connection_class=SlowConnection, max_connections=3)
+
+        async def use():
+            connection = await pool.get_connection("GET")
+            await asyncio.sleep(0.01)
+            await pool.release(connection)
+
+        async def main():
+            await asyncio.gather(*(use() for _ in range(10)))
+            held = [await pool.get_connection("GET") for _ in range(3)]
+            pool._slot_timeout = 0.01
+            with pytest.raises(ConnectionError):
+                await pool.get_connection("GET")
+            return held
+
+        assert len(set(asyncio.run(main()))) == 3
+        assert max(peak) == 3  # the cold pool opened its connections in parallel
@@ -36,6 +36,12 @@ os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
 os.environ.setdefault("PROMETHEUS_ENABLED", "false")
 os.environ.setdefault("TEMPO_ENABLED", "false")
 os.environ.setdefault("LOKI_ENABLED", "false")
+# Keep cache loads in tests from writing a cold-start snapshot into src/data
+os.environ.setdefault("BOOT_SNAPSHOT_ENABLED", "false")
+# ... or spilling post-completion jobs there
+os.environ.setdefault("POST_COMPLETION_QUEUE_ENABLED", "false")
+# ... or flushing request rollups against the mocked database
+os.environ.setdefault("REQUEST_ROLLUPS_ENABLED", "false")
 
 from src.config.supabase_config import get_supabase_client
 from tests.factories import (
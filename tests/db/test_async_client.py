@@ -0,0 +1,163 @@
+"""Tests for src.db.async_client (read coalescing and query plans)."""
+
+import asyncio
+
+import pytest
+
+from src.config import Config
+from src.db import async_client
+from src.db.async_client import execute, run_plan, run_plan_async
+
+
+@pytest.fixture
+def sb():
+    """Bypasses the autouse DB-skip in tests/conftest.py; queries are fakes."""
+    return None
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """Just enough of a postgrest request builder for execute()."""
+
+    def __init__(self, path="/rest/v1/plans", method="GET", params="id=eq.1", json=None):
+        self.http_method = method
+        self.path = path
+        self.params = params
+        self.json = json or {}
+        self.headers = {"Accept": "application/json"}
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.error = None
+
+    async def execute(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return Response([{"path": self.path, "calls": self.calls}])
+
+
+@pytest.fixture(autouse=True)
+def coalescing(sb, monkeypatch):
+    monkeypatch.setattr(Config, "SUPABASE_ASYNC_COALESCE_READS", True)
+
+
+async def _gather(*queries, opened=None):
+    tasks = [asyncio.ensure_future(execute(q)) for q in queries]
+    await asyncio.sleep(0)
+    for q in opened or queries:
+        q.release.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_identical_concurrent_reads_share_one_request():
+    first, second, other = FakeQuery(), FakeQuery(), FakeQuery(params="id=eq.2")
+
+    results = asyncio.run(_gather(first, second, other))
+
+    assert (first.calls, second.calls, other.calls) == (1, 0, 1)
+    assert results[0].data == results[1].data
+    results[0].data.append("mutated")
+    assert results[1].data == [{"path": "/rest/v1/plans", "calls": 1}]
+
+
+def test_writes_and_disabled_coalescing_always_send(monkeypatch):
+    inserts = [FakeQuery(method="POST", json={"a": 1}) for _ in range(2)]
+    asyncio.run(_gather(*inserts))
+    assert [q.calls for q in inserts] == [1, 1]
+
+    monkeypatch.setattr(Config, "SUPABASE_ASYNC_COALESCE_READS", False)
+    reads = [FakeQuery() for _ in range(2)]
+    asyncio.run(_gather(*reads))
+    assert [q.calls for q in reads] == [1, 1]
+
+
+def test_rpc_marked_read_only_is_coalesced():
+    rpcs = [FakeQuery("/rest/v1/rpc/principal", "POST", json={"key": "k"}) for _ in range(2)]
+
+    async def main():
+        tasks = [asyncio.ensure_future(execute(q, coalesce=True)) for q in rpcs]
+        await asyncio.sleep(0)
+        rpcs[0].release.set()
+        return await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+    assert [q.calls for q in rpcs] == [1, 0]
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_request():
+    first, second = FakeQuery(), FakeQuery()
+
+    async def main():
+        leader = asyncio.ensure_future(execute(first))
+        follower = asyncio.ensure_future(execute(second))
+        await asyncio.sleep(0)
+        leader.cancel()
+        first.release.set()
+        return await follower
+
+    assert asyncio.run(main()).data == [{"path": "/rest/v1/plans", "calls": 1}]
+
+
+def test_errors_reach_every_waiter_and_the_next_read_retries():
+    first, second = FakeQuery(), FakeQuery()
+    first.error = RuntimeError("timeout")
+
+    results = asyncio.run(_gather(first, second, opened=[first]))
+
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    retry = FakeQuery()
+    retry.release.set()
+    assert asyncio.run(execute(retry)).data[0]["calls"] == 1
+
+
+def _plan(seen):
+    try:
+        first = yield FakeQuery("/rest/v1/a")
+        seen.append(first.data[0]["path"])
+    except RuntimeError as e:
+        seen.append(f"caught {e}")
+    second = yield FakeQuery("/rest/v1/b")
+    return second.data[0]["path"]
+
+
+class SyncQuery(FakeQuery):
+    def execute(self):
+        if self.path == "/rest/v1/a":
+            raise RuntimeError("missing table")
+        return Response([{"path": self.path}])
+
+
+def test_run_plan_throws_query_errors_into_the_plan():
+    seen = []
+
+    def plan():
+        try:
+            yield SyncQuery("/rest/v1/a")
+        except RuntimeError as e:
+            seen.append(f"caught {e}")
+        second = yield SyncQuery("/rest/v1/b")
+        return second.data[0]["path"]
+
+    assert run_plan(plan()) == "/rest/v1/b"
+    assert seen == ["caught missing table"]
+
+
+def test_run_plan_async_sends_results_through_execute(monkeypatch):
+    sent = []
+
+    async def fake_execute(query, *, coalesce=None):
+        sent.append(query.path)
+        return Response([{"path": query.path}])
+
+    monkeypatch.setattr(async_client, "execute", fake_execute)
+    seen = []
+
+    assert asyncio.run(run_plan_async(_plan(seen))) == "/rest/v1/b"
+    assert sent == ["/rest/v1/a", "/rest/v1/b"]
+    assert seen == ["/rest/v1/a"]
@@ -0,0 +1,124 @@
+"""Tests for keyset pagination over (created_at, id)."""
+
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.db.keyset import apply_keyset, cursor_for, decode_cursor, encode_cursor, fetch_keyset_page
+
+# Rows live in memory; the sb fixture also keeps the no-database skip away
+pytestmark = pytest.mark.usefixtures("sb")
+
+_KEYSET_OR = re.compile(
+    r'^created_at\.(lt|gt)\."([^"]+)",and\(created_at\.eq\."([^"]+)",id\.(lt|gt)\.(\d+)\)$'
+)
+
+
+class FakeQuery:
+    """Evaluates the subset of PostgREST used by keyset pages over a list of rows."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.orders = []
+        self.or_filters = []
+        self.row_limit = None
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def or_(self, filters):
+        self.or_filters.append(filters)
+        op, ts, ts_eq, id_op, row_id = _KEYSET_OR.match(filters).groups()
+        assert ts == ts_eq and op == id_op
+        before = op == "lt"
+
+        def after(row):
+            key, bound = (row["created_at"], row["id"]), (ts, int(row_id))
+            return key < bound if before else key > bound
+
+        self.rows = [r for r in self.rows if after(r)]
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def execute(self):
+        rows = self.rows
+        for column, desc in reversed(self.orders):
+            rows = sorted(rows, key=lambda r: r[column], reverse=desc)
+        return SimpleNamespace(data=rows[: self.row_limit])
+
+
+@pytest.fixture
+def sb():
+    """Rows with heavy created_at ties so pages must break ties on id."""
+    return [
+        {"id": i, "created_at": f"2026-10-18T12:{i // 7:02d}:00+00:00", "user_id": i % 3}
+        for i in range(1, 251)
+    ]
+
+
+def _walk(rows, batch, desc=True, **eq):
+    def build():
+        query = FakeQuery(rows)
+        for column, value in eq.items():
+            query = query.eq(column, value)
+        return query
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = fetch_keyset_page(build, cursor, batch, desc=desc)
+        seen.extend(r["id"] for r in page)
+        pages += 1
+        if cursor is None:
+            return seen, pages
+
+
+def test_cursor_round_trips_and_is_url_safe():
+    cursor = encode_cursor("2026-10-18T12:00:00.123456+00:00", 987654321)
+
+    assert re.fullmatch(r"[A-Za-z0-9_-]+", cursor)
+    assert decode_cursor(cursor) == ("2026-10-18T12:00:00.123456+00:00", 987654321)
+
+
+@pytest.mark.parametrize("bad", ["", "not-a-cursor", encode_cursor("x", 1)[:-3], "WzEsMl0"])
+def test_malformed_cursors_are_rejected(bad):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(bad)
+
+
+def test_cursor_for_requires_both_keys():
+    assert cursor_for({"id": 1}) is None
+    assert decode_cursor(cursor_for({"id": 5, "created_at": "2026-01-01"})) == ("2026-01-01", 5)
+
+
+def test_apply_keyset_orders_by_created_at_then_id():
+    query = apply_keyset(FakeQuery([]), encode_cursor("2026-10-18T00:00:00+00:00", 9), 10)
+
+    assert query.orders == [("created_at", True), ("id", True)]
+    assert query.row_limit == 10
+    assert query.or_filters == [
+        'created_at.lt."2026-10-18T00:00:00+00:00",'
+        'and(created_at.eq."2026-10-18T00:00:00+00:00",id.lt.9)'
+    ]
+
+
+@pytest.mark.parametrize("batch", [1, 7, 64, 250, 1000])
+def test_pages_cover_every_row_once_in_order(sb, batch):
+    seen, pages = _walk(sb, batch)
+
+    assert seen == sorted(range(1, 251), reverse=True)
+    assert pages == 250 // batch + 1
+
+
+def test_ascending_pages_with_filters(sb):
+    seen, _ = _walk(sb, 20, desc=False, user_id=1)
+
+    assert seen == [i for i in range(1, 251) if i % 3 == 1]
@@ -0,0 +1,252 @@
+"""Tests for the request rollup read path and the analytics served from it."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import src.db.request_rollups as rollups
+from src.config import Config
+from src.db.request_rollups import decompose_range, series_bucket
+
+NOW = datetime(2026, 10, 18, 12, 30, tzinfo=UTC)
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=UTC)
+
+
+class FakeRpcClient:
+    """Answers client.rpc(name, params).execute() from a dict of canned results."""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        result = self.results[name]
+        if isinstance(result, Exception):
+            raise result
+        return MagicMock(execute=MagicMock(return_value=MagicMock(data=result)))
+
+
+@pytest.fixture
+def readable(monkeypatch):
+    monkeypatch.setattr(Config, "REQUEST_ROLLUPS_READ_ENABLED", True)
+    rollups.reset_rollup_availability()
+    yield
+    rollups.reset_rollup_availability()
+
+
+@pytest.fixture
+def sb(monkeypatch):
+    """Install a FakeRpcClient; call the fixture with the canned results."""
+
+    def install(results):
+        client = FakeRpcClient(results)
+        monkeypatch.setattr(rollups, "get_supabase_client", lambda: client)
+        return client
+
+    return install
+
+
+class TestDecomposeRange:
+    def test_multi_day_range_uses_days_in_the_middle(self, sb):
+        spans = decompose_range(_ts(2026, 10, 15, 22, 10, 30), _ts(2026, 10, 18, 1, 5), NOW)
+
+        assert spans == [
+            ("minute", _ts(2026, 10, 15, 22, 10), _ts(2026, 10, 15, 23)),
+            ("hour", _ts(2026, 10, 15, 23), _ts(2026, 10, 16)),
+            ("day", _ts(2026, 10, 16), _ts(2026, 10, 18)),
+            ("hour", _ts(2026, 10, 18), _ts(2026, 10, 18, 1)),
+            ("minute", _ts(2026, 10, 18, 1), _ts(2026, 10, 18, 1, 5)),
+        ]
+
+    def test_spans_tile_the_range_without_gaps(self, sb):
+        start, end = _ts(2026, 10, 17, 3, 0), _ts(2026, 10, 18, 12, 29, 1)
+        spans = decompose_range(start, end, NOW)
+
+        assert spans[0][1] == start
+        assert spans[-1][2] == _ts(2026, 10, 18, 12, 30)
+        assert all(a[2] == b[1] for a, b in zip(spans, spans[1:], strict=False))
+        assert [s[0] for s in spans] == ["hour", "minute"]
+
+    def test_range_inside_one_hour_reads_minutes(self, sb):
+        assert decompose_range(_ts(2026, 10, 18, 12, 1), _ts(2026, 10, 18, 12, 20), NOW) == [
+            ("minute", _ts(2026, 10, 18, 12, 1), _ts(2026, 10, 18, 12, 20))
+        ]
+
+    def test_edges_past_retention_widen_to_coarser_grains(self, sb):
+        spans = decompose_range(_ts(2026, 3, 1, 7, 45), _ts(2026, 9, 20, 7, 45), NOW)
+
+        assert spans[0] == ("day", _ts(2026, 3, 1), _ts(2026, 9, 20))
+        assert spans[1:] == [
+            ("hour", _ts(2026, 9, 20), _ts(2026, 9, 20, 8)),
+        ]
+
+    def test_series_bucket_follows_range_length(self, sb):
+        assert series_bucket(NOW - timedelta(hours=3), NOW, NOW) == "minute"
+        assert series_bucket(NOW - timedelta(days=3), NOW, NOW) == "hour"
+        assert series_bucket(NOW - timedelta(days=60), NOW, NOW) == "day"
+        assert series_bucket(None, NOW, NOW) == "day"
+
+
+class TestReads:
+    def test_reads_are_skipped_until_enabled(self, sb, monkeypatch):
+        monkeypatch.setattr(Config, "REQUEST_ROLLUPS_READ_ENABLED", False)
+        client = sb({})
+
+        assert rollups.fetch_rollup_totals(NOW - timedelta(days=1), NOW) is None
+        assert client.calls == []
+
+    def test_totals_send_the_decomposed_spans(self, readable, sb, monkeypatch):
+        client = sb({"request_rollup_totals": [{"model_id": 1}]})
+
+        rows = rollups.fetch_rollup_totals(_ts(2026, 10, 18, 9, 30), NOW, user_id=5)
+
+        assert rows == [{"model_id": 1}]
+        name, params = client.calls[0]
+        assert name == "request_rollup_totals"
+        assert params["p_user_id"] == 5
+        assert [span["bucket"] for span in params["p_spans"]] == ["minute", "hour", "minute"]
+
+    def test_missing_functions_fall_back_and_are_not_retried(self, readable, sb, monkeypatch):
+        client = sb(
+            {"request_rollup_totals": Exception("PGRST202: Could not find the function")},
+        )
+
+        assert rollups.fetch_rollup_totals(NOW - timedelta(days=1), NOW) is None
+        assert rollups.fetch_rollup_totals(NOW - timedelta(days=1), NOW) is None
+        assert len(client.calls) == 1
+        assert rollups.apply_rollup_deltas([{"minute": NOW.isoformat()}]) is None
+
+
+MODEL_ROWS = [
+    {
+        "model_id": 1,
+        "model_name": "GPT-4o",
+        "provider_model_id": "openai/gpt-4o",
+        "provider_slug": "openrouter",
+        "requests": 12,
+        "errors": 2,
+        "input_tokens": 1000,
+        "output_tokens": 500,
+        "cost_usd": 0.3,
+        "latency_ms_sum": 5000,
+        "unique_users": 3,
+    },
+    {
+        "model_id": 2,
+        "model_name": "Claude",
+        "provider_model_id": "anthropic/claude-3.5-sonnet",
+        "provider_slug": "openrouter",
+        "requests": 4,
+        "errors": 0,
+        "input_tokens": 100,
+        "output_tokens": 100,
+        "cost_usd": 0.1,
+        "latency_ms_sum": 1000,
+        "unique_users": 1,
+    },
+    {
+        "model_id": 3,
+        "model_name": "Llama",
+        "provider_model_id": "meta-llama/llama-3-70b",
+        "provider_slug": "deepinfra",
+        "requests": 2,
+        "errors": 2,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cost_usd": 0,
+        "latency_ms_sum": 200,
+        "unique_users": 1,
+    },
+]
+
+
+class TestAnalyticsFromRollups:
+    def test_provider_stats(self, readable, sb, monkeypatch):
+        from src.db.gateway_analytics import get_provider_stats
+
+        sb(
+            {"request_rollup_totals": MODEL_ROWS, "request_rollup_user_count": 3},
+        )
+
+        with patch("src.db.gateway_analytics.get_supabase_client") as raw_client:
+            stats = get_provider_stats("openai", gateway="openrouter", time_range="7d")
+
+        raw_client.assert_not_called()
+        assert stats["total_requests"] == 10
+        assert stats["total_tokens"] == 1500
+        assert stats["unique_users"] == 3
+        assert stats["top_model"] == "openai/gpt-4o"
+        assert stats["avg_speed_tokens_per_sec"] == 300.0
+
+    def test_gateway_stats_and_trending(self, readable, sb, monkeypatch):
+        from src.db import gateway_analytics
+
+        sb(
+            {"request_rollup_totals": MODEL_ROWS, "request_rollup_user_count": 4},
+        )
+        monkeypatch.setattr(gateway_analytics, "_trending_cache", {})
+
+        stats = gateway_analytics.get_gateway_stats("openrouter")
+        trending = gateway_analytics.get_trending_models("all", "24h", limit=5, sort_by="tokens")
+
+        assert stats["total_requests"] == 14
+        assert stats["provider_breakdown"]["OpenAI"]["requests"] == 10
+        assert stats["provider_breakdown"]["Anthropic"]["requests"] == 4
+        assert stats["unique_users"] == 4
+        # Models whose requests all failed are left out, as in activity_log
+        assert [m["model"] for m in trending] == ["openai/gpt-4o", "anthropic/claude-3.5-sonnet"]
+        assert trending[0]["unique_users"] == 3
+
+    def test_top_models_by_requests(self, readable, sb, monkeypatch):
+        from src.db.chat_completion_requests import get_top_models_by_requests
+
+        sb({"request_rollup_totals": MODEL_ROWS})
+
+        top = get_top_models_by_requests(limit=3)
+
+        assert [(m["id"], m["requests"]) for m in top] == [(1, 10), (2, 4)]
+        assert top[0]["provider"] == "openrouter"
+
+    def test_user_activity_stats(self, readable, sb, monkeypatch):
+        from src.db.activity import get_user_activity_stats
+
+        client = sb(
+            {
+                "request_rollup_series": [
+                    {
+                        "bucket_start": "2026-10-17T00:00:00+00:00",
+                        "requests": 9,
+                        "errors": 1,
+                        "input_tokens": 800,
+                        "output_tokens": 400,
+                        "cost_usd": 0.25,
+                    },
+                    {
+                        "bucket_start": "2026-10-18T00:00:00+00:00",
+                        "requests": 7,
+                        "errors": 1,
+                        "input_tokens": 300,
+                        "output_tokens": 200,
+                        "cost_usd": 0.15,
+                    },
+                ],
+                "request_rollup_totals": MODEL_ROWS[:2],
+            },
+        )
+
+        stats = get_user_activity_stats(42, from_date="2026-10-17", to_date="2026-10-18")
+
+        assert stats["total_requests"] == 14
+        assert stats["total_tokens"] == 1700
+        assert [d["date"] for d in stats["daily_stats"]] == ["2026-10-17", "2026-10-18"]
+        assert stats["by_provider"]["OpenAI"]["requests"] == 10
+        assert stats["by_model"]["anthropic/claude-3.5-sonnet"]["tokens"] == 200
+        series_params = client.calls[0][1]
+        assert series_params["p_user_id"] == 42
+        assert series_params["p_start"] == "2026-10-17T00:00:00+00:00"
+        assert series_params["p_end"] == "2026-10-19T00:00:00+00:00"
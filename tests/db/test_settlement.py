@@ -0,0 +1,106 @@
+"""Tests for src.db.settlement (single-RPC request settlement)."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.db import settlement
+
+
+@pytest.fixture
+def sb():
+    """Bypasses the autouse DB-skip in tests/conftest.py; everything is mocked."""
+    return None
+
+
+@pytest.fixture(autouse=True)
+def _reset(sb):
+    settlement.reset_settle_request_availability()
+    yield
+    settlement.reset_settle_request_availability()
+
+
+def _client(data=None, error=None):
+    client = MagicMock()
+    if error is not None:
+        client.rpc.return_value.execute.side_effect = error
+    else:
+        client.rpc.return_value.execute.return_value = MagicMock(data=data)
+    return client
+
+
+def _settle(**kwargs):
+    return settlement.settle_request(
+        "req-1",
+        7,
+        "gw_live_key",
+        "gpt-4",
+        0.05,
+        1000,
+        "API usage - gpt-4",
+        {"model": "gpt-4"},
+        **kwargs,
+    )
+
+
+def test_success_returns_result_and_invalidates_user_cache():
+    client = _client({"success": True, "charged": 0.05, "new_balance": 9.95})
+    with (
+        patch.object(settlement, "get_supabase_client", return_value=client),
+        patch("src.db.users.invalidate_user_cache") as invalidate,
+    ):
+        result = _settle(request_record={"input_tokens": 500})
+
+    assert result["charged"] == 0.05
+    invalidate.assert_called_once_with("gw_live_key")
+    name, params = client.rpc.call_args.args
+    assert name == "settle_request"
+    assert params["p_request_id"] == "req-1"
+    assert params["p_request_record"] == {"input_tokens": 500}
+
+
+def test_list_payload_is_unwrapped():
+    client = _client([{"success": True, "duplicate": True, "charged": 0.05}])
+    with (
+        patch.object(settlement, "get_supabase_client", return_value=client),
+        patch("src.db.users.invalidate_user_cache"),
+    ):
+        assert _settle()["duplicate"] is True
+
+
+@pytest.mark.parametrize(
+    "error,message",
+    [
+        ("insufficient_credits", "Insufficient credits"),
+        ("daily_limit_exceeded", "Daily usage limit exceeded"),
+        ("user_not_found", "User with API key not found"),
+    ],
+)
+def test_business_errors_raise_value_error(error, message):
+    client = _client({"success": False, "error": error, "new_balance": 0.01})
+    with patch.object(settlement, "get_supabase_client", return_value=client):
+        with pytest.raises(ValueError, match=message):
+            _settle()
+
+
+def test_unexpected_failure_raises_runtime_error():
+    client = _client({"success": False, "error": "deadlock detected"})
+    with patch.object(settlement, "get_supabase_client", return_value=client):
+        with pytest.raises(RuntimeError):
+            _settle()
+
+
+def test_missing_function_returns_none_and_is_remembered():
+    client = _client(error=Exception("PGRST202: Could not find the function settle_request"))
+    with patch.object(settlement, "get_supabase_client", return_value=client):
+        assert _settle() is None
+        assert _settle() is None
+
+    assert client.rpc.call_count == 1
+
+
+def test_transport_error_raises_so_caller_retries():
+    client = _client(error=ConnectionError("reset by peer"))
+    with patch.object(settlement, "get_supabase_client", return_value=client):
+        with pytest.raises(RuntimeError):
+            _settle()
@@ -0,0 +1,223 @@
+"""
+Tests for the lane-based concurrency gate.
+"""
+
+import asyncio
+
+from src.middleware.concurrency_middleware import (
+    LANE_ADMIN,
+    LANE_CATALOG,
+    LANE_INFERENCE,
+    LANE_STREAMING,
+    AdmissionLane,
+    ConcurrencyMiddleware,
+    GradientLimit,
+    caller_key,
+    classify_lane,
+    split_queue_size,
+)
+
+
+def _scope(path, method="GET", headers=()):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": list(headers),
+        "client": ("10.0.0.1", 1234),
+    }
+
+
+def _receive_body(body):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    return receive
+
+
+class _Recorder:
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, message):
+        self.messages.append(message)
+
+    @property
+    def status(self):
+        return self.messages[0]["status"] if self.messages else None
+
+
+def test_classify_lanes():
+    assert classify_lane("POST", "/v1/chat/completions", b'{"stream": true}') == LANE_STREAMING
+    assert classify_lane("POST", "/v1/chat/completions", b'{"stream":false}') == LANE_INFERENCE
+    assert classify_lane("POST", "/v1/audio/transcriptions") == LANE_INFERENCE
+    assert classify_lane("GET", "/v1/models") == LANE_CATALOG
+    assert classify_lane("POST", "/admin/cache/clear") == LANE_ADMIN
+
+    quoted = b'{"messages":[{"content":"say \\"stream\\": true"}]}'
+    assert classify_lane("POST", "/v1/chat/completions", quoted) == LANE_INFERENCE
+
+
+def test_caller_key_prefers_api_key():
+    bearer = caller_key(_scope("/", headers=[(b"authorization", b"Bearer gw_abc")]))
+    assert bearer.startswith("k:") and "gw_abc" not in bearer
+    assert caller_key(_scope("/", headers=[(b"x-api-key", b"gw_abc")])) == bearer
+    assert caller_key(_scope("/", headers=[(b"x-forwarded-for", b"1.2.3.4, 5.6.7.8")])) == (
+        "ip:1.2.3.4"
+    )
+    assert caller_key(_scope("/")) == "ip:10.0.0.1"
+
+
+def test_gradient_limit_shrinks_on_latency_and_grows_when_flat():
+    limit = GradientLimit(initial=20, min_limit=2, max_limit=40)
+    for _ in range(50):
+        limit.on_sample(0.1, inflight=20)
+    grown = limit.limit
+    assert grown > 20
+
+    for _ in range(50):
+        limit.on_sample(1.0, inflight=grown)
+    assert limit.limit < grown
+    assert limit.limit >= 2
+
+
+def test_gradient_limit_ignores_samples_when_app_limited():
+    limit = GradientLimit(initial=20, max_limit=40)
+    for _ in range(50):
+        limit.on_sample(0.1, inflight=1)
+    assert limit.limit == 20
+
+
+def test_fair_queue_interleaves_callers():
+    async def scenario():
+        lane = AdmissionLane("inference", max_limit=1, queue_size=10, adaptive=False)
+        assert lane.try_acquire()
+
+        waiters = [lane.enqueue("heavy")[0] for _ in range(3)]
+        waiters.append(lane.enqueue("light")[0])
+
+        order = []
+        for _ in range(4):
+            order.extend(w.key for w in lane.release())
+        return order
+
+    assert asyncio.run(scenario()) == ["heavy", "light", "heavy", "heavy"]
+
+
+def test_full_queue_sheds_most_backlogged_caller():
+    async def scenario():
+        lane = AdmissionLane("inference", max_limit=1, queue_size=2, adaptive=False)
+        assert lane.try_acquire()
+        first, _ = lane.enqueue("heavy")
+        second, _ = lane.enqueue("heavy")
+
+        newcomer, evicted = lane.enqueue("light")
+        rejected, none = lane.enqueue("heavy")
+        return first, second, newcomer, evicted, rejected, none, lane.queued
+
+    first, second, newcomer, evicted, rejected, none, queued = asyncio.run(scenario())
+    assert evicted is second
+    assert newcomer is not None and newcomer.key == "light"
+    assert rejected is None and none is None
+    assert queued == 2
+
+
+def test_streams_do_not_take_catalog_slots():
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/v1/chat/completions":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def scenario():
+        gate = ConcurrencyMiddleware(
+            app,
+            queue_size=0,
+            queue_timeout=0.1,
+            lane_limits={"streaming": 1, "catalog": 1},
+            adaptive=False,
+        )
+        headers = [(b"content-type", b"application/json")]
+        stream = asyncio.create_task(
+            gate(
+                _scope("/v1/chat/completions", "POST", headers),
+                _receive_body(b'{"model":"m","stream":true}'),
+                _Recorder(),
+            )
+        )
+        await asyncio.sleep(0)
+
+        second_stream, models = _Recorder(), _Recorder()
+        await gate(
+            _scope("/v1/chat/completions", "POST", headers),
+            _receive_body(b'{"stream": true}'),
+            second_stream,
+        )
+        await gate(_scope("/v1/models"), _receive_body(b""), models)
+
+        release.set()
+        await stream
+        return second_stream.status, models.status, gate.get_stats()
+
+    second_status, models_status, stats = asyncio.run(scenario())
+    assert second_status == 503
+    assert models_status == 200
+    assert stats["streaming"]["active"] == 0
+
+
+def test_queue_budget_is_split_like_the_limits():
+    limits = {"streaming": 8, "inference": 6, "catalog": 4, "admin": 2}
+    assert split_queue_size(50, limits) == {
+        "streaming": 20,
+        "inference": 15,
+        "catalog": 10,
+        "admin": 5,
+    }
+    assert sum(split_queue_size(7, limits).values()) == 7
+
+    gate = ConcurrencyMiddleware(None, queue_size=50, lane_limits=limits)
+    assert sum(lane.queue_size for lane in gate.lanes.values()) == 50
+
+
+def test_buffered_body_is_replayed_to_the_app():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(await receive())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    gate = ConcurrencyMiddleware(app)
+    asyncio.run(
+        gate(
+            _scope("/v1/chat/completions", "POST", [(b"content-type", b"application/json")]),
+            _receive_body(b'{"stream": false}'),
+            _Recorder(),
+        )
+    )
+    assert seen[0]["body"] == b'{"stream": false}'
+
+
+def test_queued_request_times_out_with_503():
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def scenario():
+        gate = ConcurrencyMiddleware(app, limit=1, queue_timeout=0.05, adaptive=False)
+        first = asyncio.create_task(gate(_scope("/v1/models"), _receive_body(b""), _Recorder()))
+        await asyncio.sleep(0)
+        queued = _Recorder()
+        await gate(_scope("/v1/models"), _receive_body(b""), queued)
+        release.set()
+        await first
+        return queued.status, gate.lanes["catalog"].queued, gate.lanes["catalog"].active
+
+    assert asyncio.run(scenario()) == (503, 0, 0)
@@ -39,8 +39,7 @@ def app_with_security_middleware():
 
     # Mock Redis client
     mock_redis = Mock()
-    mock_redis.incr = Mock(side_effect=lambda key: 1)
-    mock_redis.expire = Mock()
+    mock_redis.pipeline.return_value.execute.return_value = [1, True]  # INCR, EXPIRE
 
     # Add SecurityMiddleware
     app.add_middleware(SecurityMiddleware, redis_client=mock_redis)
@@ -68,8 +67,7 @@ def client(app_with_security_middleware):
 def security_middleware():
     """Create a SecurityMiddleware instance for unit testing"""
     mock_redis = Mock()
-    mock_redis.incr = Mock(side_effect=lambda key: 1)
-    mock_redis.expire = Mock()
+    mock_redis.pipeline.return_value.execute.return_value = [1, True]  # INCR, EXPIRE
 
     mock_app = Mock()
     middleware = SecurityMiddleware(app=mock_app, redis_client=mock_redis)
@@ -0,0 +1,195 @@
+"""Tests for keyset-paginated admin listings and the streaming exports."""
+
+import csv
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import Config
+from src.db.keyset import cursor_for, decode_cursor, encode_cursor
+from src.main import app
+from src.security.deps import require_admin
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def admin(monkeypatch):
+    monkeypatch.setitem(
+        app.dependency_overrides, require_admin, lambda: {"id": 1, "email": "admin@test.com"}
+    )
+
+
+def _txn(i):
+    return {
+        "id": i,
+        "user_id": 10 + i % 2,
+        "amount": -0.5 if i % 2 else 5,
+        "transaction_type": "api_usage" if i % 2 else "purchase",
+        "description": f"txn {i}",
+        "balance_before": 10,
+        "balance_after": 9.5,
+        "created_at": f"2026-10-18T12:00:{i:02d}+00:00",
+        "payment_id": None,
+        "metadata": {"n": i},
+    }
+
+
+LEDGER = [_txn(i) for i in range(25, 0, -1)]
+
+
+def _at(i):
+    return cursor_for(_txn(i))
+
+
+def _pages(calls):
+    """Fake get_transactions_page serving LEDGER newest first, recording cursors."""
+
+    def page(limit, cursor=None, **filters):
+        calls.append((cursor, limit, filters))
+        after = decode_cursor(cursor)[1] if cursor else len(LEDGER) + 1
+        rows = [t for t in LEDGER if t["id"] < after][:limit]
+        return rows, (cursor_for(rows[-1]) if len(rows) == limit else None)
+
+    return page
+
+
+class TestCreditTransactionsListing:
+    def test_offset_page_returns_a_next_cursor(self):
+        with patch("src.routes.admin.get_all_transactions", return_value=LEDGER[:5]):
+            response = client.get("/admin/credit-transactions?limit=5")
+
+        pagination = response.json()["pagination"]
+        assert pagination["has_more"] is True
+        assert pagination["next_cursor"] == _at(21)
+
+    def test_cursor_page_uses_the_keyset_reader(self):
+        calls = []
+        with (
+            patch("src.routes.admin.get_transactions_page", side_effect=_pages(calls)),
+            patch("src.routes.admin.get_all_transactions") as offset_reader,
+        ):
+            response = client.get(f"/admin/credit-transactions?limit=10&cursor={_at(6)}&user_id=11")
+
+        offset_reader.assert_not_called()
+        body = response.json()
+        assert [t["id"] for t in body["transactions"]] == [5, 4, 3, 2, 1]
+        assert body["pagination"]["next_cursor"] is None
+        assert body["pagination"]["has_more"] is False
+        assert calls[0][2]["user_id"] == 11
+
+    @pytest.mark.parametrize(
+        "query",
+        ["cursor=abc&offset=10", "cursor=abc&sort_by=amount"],
+    )
+    def test_cursor_conflicts_are_rejected(self, query):
+        assert client.get(f"/admin/credit-transactions?{query}").status_code == 400
+
+    def test_malformed_cursor_is_a_bad_request(self):
+        with patch("src.db.credit_transactions.get_supabase_client"):
+            response = client.get("/admin/credit-transactions?cursor=garbage")
+
+        assert response.status_code == 400
+
+
+class TestCreditTransactionsExport:
+    def test_ndjson_streams_every_row_in_batches(self, monkeypatch):
+        monkeypatch.setattr(Config, "ADMIN_EXPORT_BATCH_SIZE", 10)
+        calls = []
+        with patch("src.routes.admin.get_transactions_page", side_effect=_pages(calls)):
+            response = client.get("/admin/credit-transactions/export?direction=charge")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == list(range(25, 0, -1))
+        assert [(c[0], c[1]) for c in calls] == [(None, 10), (_at(16), 10), (_at(6), 10)]
+        assert calls[0][2]["direction"] == "charge"
+        assert lines[-1]["cursor"] == _at(1)
+
+    def test_csv_honours_limit_and_resumes_from_cursor(self, monkeypatch):
+        monkeypatch.setattr(Config, "ADMIN_EXPORT_BATCH_SIZE", 4)
+        calls = []
+        with patch("src.routes.admin.get_transactions_page", side_effect=_pages(calls)):
+            response = client.get(
+                f"/admin/credit-transactions/export?format=csv&limit=6&cursor={_at(20)}"
+            )
+
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="credit_transactions.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 6
+        assert [row["id"] for row in rows] == ["19", "18", "17", "16", "15", "14"]
+        assert rows[0]["metadata"] == '{"n": 19}'
+        assert rows[0]["payment_id"] == ""
+        assert list(rows[0])[-1] == "cursor"
+        assert [c[1] for c in calls] == [4, 2]
+
+    def test_failed_batch_ends_ndjson_with_a_resume_cursor(self, monkeypatch):
+        monkeypatch.setattr(Config, "ADMIN_EXPORT_BATCH_SIZE", 10)
+        pages = _pages([])
+
+        def flaky(limit, cursor=None, **filters):
+            if cursor:
+                raise RuntimeError("statement timeout")
+            return pages(limit, cursor, **filters)
+
+        with patch("src.routes.admin.get_transactions_page", side_effect=flaky):
+            response = client.get("/admin/credit-transactions/export")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 11
+        assert lines[-1] == {"error": "export interrupted", "cursor": _at(16)}
+
+    @pytest.mark.parametrize("query", ["format=xml", "cursor=garbage", "direction=sideways"])
+    def test_bad_parameters_fail_before_streaming(self, query):
+        assert client.get(f"/admin/credit-transactions/export?{query}").status_code == 400
+
+
+@patch("src.db.client.get_db")
+def test_chat_requests_cursor_page_skips_offset_and_count(mock_get_db):
+    query = MagicMock()
+    for method in ("select", "eq", "ilike", "gte", "lte", "or_", "order", "limit", "range"):
+        getattr(query, method).return_value = query
+    rows = [{"id": 9, "created_at": "2026-10-18T00:00:00+00:00"}]
+    query.execute.return_value.data = rows
+    mock_get_db.return_value.table.return_value = query
+
+    cursor = encode_cursor("2026-10-18T01:00:00+00:00", 12)
+    response = client.get(f"/admin/monitoring/chat-requests?limit=1&model_id=3&cursor={cursor}")
+
+    metadata = response.json()["metadata"]
+    assert metadata["total_count"] is None
+    assert metadata["next_cursor"] == encode_cursor("2026-10-18T00:00:00+00:00", 9)
+    query.range.assert_not_called()
+    query.eq.assert_any_call("model_id", 3)
+    query.or_.assert_called_once()
+    assert query.execute.call_count == 1
+
+
+@patch("src.db.client.get_db")
+def test_chat_requests_csv_export_flattens_the_model_join(mock_get_db):
+    query = MagicMock()
+    for method in ("select", "eq", "ilike", "gte", "lte", "or_", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.return_value.data = [
+        {
+            "id": 3,
+            "created_at": "2026-10-18T00:00:00+00:00",
+            "status": "completed",
+            "input_tokens": 12,
+            "models": {"model_name": "GPT-4o", "providers": {"slug": "openrouter"}},
+        }
+    ]
+    mock_get_db.return_value.table.return_value = query
+
+    response = client.get("/admin/monitoring/chat-requests/export?format=csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows[0]["model_name"] == "GPT-4o"
+    assert rows[0]["provider_slug"] == "openrouter"
+    assert rows[0]["input_tokens"] == "12"
+    assert "models" not in rows[0]
@@ -0,0 +1,168 @@
+"""The chat body fast path must accept, coerce and reject exactly like ProxyRequest."""
+
+import json
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.config import Config
+from src.routes import chat_body
+from src.routes.chat_body import ChatRequest, chat_request_body, parse_chat_body
+from src.schemas import ProxyRequest
+
+
+def _view(req: ChatRequest) -> dict:
+    # Raw messages omit the null name/tool_calls/tool_call_id a model_dump adds
+    data = dict(vars(req))
+    data["messages"] = [{k: v for k, v in m.items() if v is not None} for m in req.messages]
+    return data
+
+
+app = FastAPI()
+
+
+@app.post("/reference")
+def reference(req: ProxyRequest):
+    return _view(ChatRequest.from_model(req))
+
+
+@app.post("/fast")
+def fast(req: ChatRequest = Depends(chat_request_body)):
+    return _view(req)
+
+
+client = TestClient(app)
+
+USER = {"role": "user", "content": "hi"}
+PLAIN = json.dumps({"model": "m", "messages": [USER]}).encode()
+TRANSCRIPT = [
+    {"role": "system", "content": "be brief"},
+    {"role": "developer", "content": [{"type": "text", "text": "x"}]},
+    {"role": "user", "content": [{"type": "image_url", "image_url": {"url": "u"}}]},
+    {"role": "assistant", "content": None, "tool_calls": [{"id": "c1"}]},
+    {"role": "tool", "content": "42", "tool_call_id": "c1", "name": "calc"},
+    {"role": "function", "content": "ok", "name": "f", "cache_control": {"a": 1}},
+    {"role": "assistant", "content": "done", "tool_calls": None},
+]
+
+VALID = [
+    {"model": "gpt-4o", "messages": [USER]},
+    {"model": "m", "messages": [USER], "temperature": 1, "top_p": 0.5, "max_tokens": 10},
+    {"model": "m", "messages": [USER], "stream": True, "stream_options": {"include_usage": True}},
+    {"model": "m", "messages": [USER], "stream_options": {"include_usage": None, "x": 1}},
+    {"model": "m", "messages": [USER], "stop": ["a", "b", "c", "d"], "seed": 7, "user": "u"},
+    {"model": "m", "messages": [USER], "frequency_penalty": -2, "presence_penalty": 2.0},
+    {"model": "m", "messages": [USER], "logit_bias": {"50256": -100}, "logprobs": True},
+    {"model": "m", "messages": [USER], "top_logprobs": 20, "n": 2, "service_tier": "auto"},
+    {"model": "m", "messages": [USER], "reasoning_effort": "high", "provider": "openrouter"},
+    {"model": "m", "messages": [USER], "auto_web_search": False, "web_search_threshold": 0},
+    {"model": "m", "messages": [USER], "auto_routing": False, "max_tokens": None},
+    {"model": "m", "messages": [USER], "tool_choice": {"type": "function"}, "tools": [{}]},
+    {"model": "m", "messages": [USER], "response_format": {"type": "json_object"}},
+    {"model": "m", "messages": [USER], "custom_extension": {"kept": [1, 2]}},
+    {"model": "m", "messages": TRANSCRIPT},
+    # Coerced by the schema, so these take the ProxyRequest path
+    {"model": "m", "messages": [USER], "stream": "true", "n": "2", "temperature": "0.5"},
+    {"model": "m", "messages": [USER], "max_tokens": 10.0, "logprobs": 1},
+    {"model": "m", "messages": [USER], "stream_options": {"include_usage": "yes"}},
+    {"model": "m", "messages": [USER], "logit_bias": {"1": 2.0}},
+]
+
+INVALID = [
+    {},
+    [],
+    "hello",
+    {"model": "m"},
+    {"messages": [USER]},
+    {"model": 1, "messages": [USER]},
+    {"model": "m", "messages": []},
+    {"model": "m", "messages": {}},
+    {"model": "m", "messages": ["hi"]},
+    {"model": "m", "messages": [{"content": "hi"}]},
+    {"model": "m", "messages": [{"role": "robot", "content": "hi"}]},
+    {"model": "m", "messages": [{"role": "user", "content": "   "}]},
+    {"model": "m", "messages": [{"role": "user", "content": []}]},
+    {"model": "m", "messages": [{"role": "user", "content": 5}]},
+    {"model": "m", "messages": [{"role": "tool", "content": None}]},
+    {"model": "m", "messages": [{"role": "assistant", "content": ""}]},
+    {"model": "m", "messages": [{"role": "assistant", "tool_calls": []}]},
+    {"model": "m", "messages": [{"role": "user", "content": "x", "name": 3}]},
+    {"model": "m", "messages": [USER], "temperature": 2.5},
+    {"model": "m", "messages": [USER], "top_p": -0.1},
+    {"model": "m", "messages": [USER], "n": 0},
+    {"model": "m", "messages": [USER], "top_logprobs": 21},
+    {"model": "m", "messages": [USER], "stop": ["a", "b", "c", "d", "e"]},
+    {"model": "m", "messages": [USER], "stop": [1]},
+    {"model": "m", "messages": [USER], "stream": "maybe"},
+    {"model": "m", "messages": [USER], "service_tier": "flex"},
+    {"model": "m", "messages": [USER], "reasoning_effort": "max"},
+    {"model": "m", "messages": [USER], "auto_web_search": "always"},
+    {"model": "m", "messages": [USER], "web_search_threshold": 1.5},
+    {"model": "m", "messages": [USER], "tools": [1]},
+    {"model": "m", "messages": [USER], "logit_bias": {"1": "high"}},
+    {"model": "m", "messages": [USER], "max_tokens": 1.5},
+]
+
+
+def _post(path, content, content_type="application/json"):
+    headers = {"content-type": content_type} if content_type else {}
+    return client.post(path, content=content, headers=headers)
+
+
+def _assert_same(content, content_type="application/json"):
+    expected = _post("/reference", content, content_type)
+    actual = _post("/fast", content, content_type)
+    assert (actual.status_code, actual.json()) == (expected.status_code, expected.json())
+    return actual
+
+
+@pytest.mark.parametrize("body", VALID)
+def test_valid_bodies_match_the_schema(body):
+    assert _assert_same(json.dumps(body)).status_code == 200
+
+
+@pytest.mark.parametrize("body", INVALID)
+def test_invalid_bodies_fail_like_the_schema(body):
+    assert _assert_same(json.dumps(body)).status_code == 422
+
+
+@pytest.mark.parametrize(
+    "content, content_type",
+    [
+        (b"", "application/json"),
+        (b'{"model": "m",', "application/json"),
+        (b"\xff\xfe{", "application/json"),
+        (PLAIN, None),
+        (PLAIN, "text/plain"),
+        (PLAIN, "x/vnd+json"),
+        (PLAIN, "application/vnd.api+json"),
+        # Numbers orjson decodes differently from (or rejects unlike) json.loads
+        (PLAIN[:-1] + b', "seed": 12345678901234567890123}', None),
+        (PLAIN[:-1] + b', "seed": -9223372036854775809}', None),
+        (PLAIN[:-1] + b', "max_tokens": 1e2, "top_p": 1E-1}', None),
+    ],
+)
+def test_decoding_and_content_types_match_fastapi(content, content_type):
+    _assert_same(content, content_type)
+
+
+def test_plain_bodies_skip_the_model_and_keep_raw_messages(monkeypatch):
+    monkeypatch.setattr(chat_body, "_PROXY_REQUEST", None)  # any fallback would blow up
+    req = parse_chat_body(json.dumps({"model": "m", "messages": TRANSCRIPT}).encode())
+
+    assert req.messages == TRANSCRIPT
+    assert req.max_tokens == 4096 and req.parallel_tool_calls is True
+
+
+def test_fast_path_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(Config, "CHAT_FAST_PARSE_ENABLED", False)
+    monkeypatch.setattr(chat_body, "_fast_parse", None)
+
+    req = parse_chat_body(PLAIN)
+
+    assert req.messages[0]["name"] is None  # model_dump output
+
+
+def test_every_schema_field_has_a_fast_check():
+    assert set(chat_body._FIELD_CHECKS) == set(ProxyRequest.model_fields) - {"model", "messages"}
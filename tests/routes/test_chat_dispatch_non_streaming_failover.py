@@ -4,14 +4,18 @@ exactly one provider (the stale, pre-smart-router `provider` value) and never
 consulted provider_chain at all.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi import BackgroundTasks, HTTPException
 
+from src.config import Config
 from src.handlers.chat_handler import ChatInferenceHandler
 from src.routes.chat_dispatch import dispatch_non_streaming
 from src.schemas.internal.chat import InternalChatResponse, InternalUsage
+from src.services import provider_hedging
+from src.services.provider_hedging import HedgeBudget
 
 
 def _make_response(provider_used: str, model: str) -> InternalChatResponse:
@@ -115,3 +119,35 @@ async def test_raises_502_when_provider_chain_is_empty():
     with pytest.raises(HTTPException) as exc_info:
         await dispatch_non_streaming(**_kwargs(provider_chain=[]))
     assert exc_info.value.status_code == 502
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "budget_ratio, primary_delay",
+    [
+        (0.0, 0.05),  # hedge due but denied by the exhausted budget
+        (1.0, 0.0),  # primary fails before the hedge delay
+    ],
+)
+async def test_unfired_hedge_partner_is_still_tried_on_failover(
+    monkeypatch, budget_ratio, primary_delay
+):
+    monkeypatch.setattr(Config, "PROVIDER_HEDGING_ENABLED", True)
+    monkeypatch.setattr(Config, "PROVIDER_HEDGE_MIN_DELAY_MS", 10)
+    monkeypatch.setattr(Config, "PROVIDER_HEDGE_DEFAULT_DELAY_MS", 20)
+    monkeypatch.setattr(provider_hedging, "_latencies", {})
+    monkeypatch.setattr(provider_hedging, "_budget", HedgeBudget(ratio=budget_ratio))
+    calls = []
+
+    async def fake_process(self, internal_request):
+        calls.append(internal_request.provider)
+        if internal_request.provider == "deepinfra":
+            await asyncio.sleep(primary_delay)
+            raise HTTPException(status_code=503, detail="unavailable")
+        return _make_response("openrouter", internal_request.model)
+
+    with patch.object(ChatInferenceHandler, "process", new=fake_process):
+        processed, provider, model = await dispatch_non_streaming(**_kwargs())
+
+    assert calls == ["deepinfra", "openrouter"]
+    assert provider == "openrouter"
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from starlette.requests import Request
+
+from src.config import Config
+from src.routes.chat_streaming import stream_generator
+
+
+def _chunk(content, finish_reason=None):
+    return {
+        "id": "chatcmpl-1",
+        "created": 0,
+        "model": "m",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": finish_reason}],
+    }
+
+
+def _request(disconnect: asyncio.Event):
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": []}, receive)
+
+
+async def _noop(**_kwargs):
+    return None
+
+
+def _stream(upstream, request=None):
+    return stream_generator(
+        upstream,
+        None,
+        None,
+        "m",
+        {},
+        "live",
+        None,
+        [{"role": "user", "content": "hi"}],
+        provider="openrouter",
+        is_anonymous=True,
+        is_async_stream=True,
+        request_id="req-1",
+        request=request,
+    )
+
+
+def _contents(frames):
+    text = []
+    for frame in frames:
+        for line in frame.split("\n\n"):
+            if line.startswith("data: {"):
+                data = json.loads(line[6:])
+                text += [c["delta"].get("content") or "" for c in data.get("choices", [])]
+    return "".join(text)
+
+
+@pytest.fixture(autouse=True)
+def no_post_processing():
+    with patch("src.routes.chat_streaming._process_stream_completion_background", _noop):
+        yield
+
+
+def test_disconnect_cancels_a_silent_upstream():
+    closed = asyncio.Event()
+
+    async def upstream():
+        try:
+            yield _chunk("hello")
+            await asyncio.sleep(3600)  # provider goes silent
+        finally:
+            closed.set()
+
+    async def run():
+        disconnect = asyncio.Event()
+        frames = []
+        async for frame in _stream(upstream(), _request(disconnect)):
+            frames.append(frame)
+            disconnect.set()
+        return frames
+
+    frames = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert closed.is_set()
+    assert _contents(frames) == "hello"
+    assert frames[-1] == "data: [DONE]\n\n"
+
+
+def test_backpressured_client_gets_coalesced_frames(monkeypatch):
+    monkeypatch.setattr(Config, "STREAM_COALESCE_WINDOW_MS", 5)
+    tokens = [f"t{i} " for i in range(200)]
+
+    async def upstream():
+        for token in tokens:
+            await asyncio.sleep(0)
+            yield _chunk(token)
+        yield _chunk("", finish_reason="stop")
+
+    async def run(client_delay):
+        frames = []
+        async for frame in _stream(upstream()):
+            frames.append(frame)
+            await asyncio.sleep(client_delay)
+        return frames
+
+    fast = asyncio.run(run(0))
+    slow = asyncio.run(run(0.01))
+
+    assert _contents(fast) == _contents(slow) == "".join(tokens)
+    assert len(fast) > len(tokens)
+    assert len(slow) < len(tokens) / 2
+    assert '"finish_reason": "stop"' in "".join(slow)
+
+
+def test_cancellation_from_elsewhere_is_not_absorbed():
+    async def upstream():
+        yield _chunk("hello")
+        await asyncio.sleep(3600)
+
+    async def run():
+        frames = []
+        async for frame in _stream(upstream(), _request(asyncio.Event())):
+            frames.append(frame)
+
+    async def main():
+        task = asyncio.create_task(run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
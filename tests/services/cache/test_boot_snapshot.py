@@ -0,0 +1,112 @@
+import pytest
+
+from src.config import Config
+from src.services.cache import (
+    boot_snapshot,
+    local_memory_cache,
+    model_capabilities_cache,
+    model_mappings_cache,
+)
+from src.services.cache.boot_snapshot import MAGIC, BootSnapshot
+from src.services.cache.refreshable_snapshot import RefreshableSnapshot
+from src.services.pricing import pricing
+
+
+def test_sections_round_trip_and_merge(tmp_path):
+    snapshot = BootSnapshot(str(tmp_path / "boot.snapshot"))
+
+    assert snapshot.write({"catalog": [{"id": "a"}], "pricing": {"a": {"prompt": 1.0}}})
+    assert snapshot.write({"mappings": {"aliases": {"x": "y"}}})
+
+    assert snapshot.read("catalog", max_age=60) == [{"id": "a"}]
+    assert snapshot.read("pricing", max_age=60) == {"a": {"prompt": 1.0}}
+    assert snapshot.read("mappings", max_age=60) == {"aliases": {"x": "y"}}
+    assert snapshot.read("capabilities", max_age=60) is None
+
+
+def test_unchanged_sections_are_not_rewritten(tmp_path):
+    snapshot = BootSnapshot(str(tmp_path / "boot.snapshot"))
+
+    assert snapshot.write({"catalog": [{"id": "a"}]})
+    assert not snapshot.write({"catalog": [{"id": "a"}]})
+    assert snapshot.write({"catalog": [{"id": "b"}]})
+
+
+def test_old_or_foreign_snapshots_are_ignored(tmp_path):
+    path = tmp_path / "boot.snapshot"
+    snapshot = BootSnapshot(str(path))
+    snapshot.write({"catalog": [{"id": "a"}]})
+
+    assert snapshot.read("catalog", max_age=-1) is None
+
+    data = path.read_bytes()
+    path.write_bytes(data[: len(MAGIC)] + b"\xff\xff" + data[len(MAGIC) + 2 :])
+    assert snapshot.read("catalog", max_age=60) is None
+
+    path.write_bytes(b"not a snapshot")
+    assert snapshot.read("catalog", max_age=60) is None
+
+
+def _unreachable():
+    raise RuntimeError("database unavailable")
+
+
+@pytest.fixture
+def empty_caches(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "BOOT_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(boot_snapshot, "_snapshot", BootSnapshot(str(tmp_path / "boot.snapshot")))
+    # restore_* publish into the module snapshots; swap in fresh ones so nothing leaks
+    mappings = model_mappings_cache.ModelMappings()
+    capabilities = model_capabilities_cache.ModelCapabilities()
+    monkeypatch.setattr(
+        model_mappings_cache,
+        "_mappings",
+        RefreshableSnapshot("model_mappings", _unreachable, mappings, 900),
+    )
+    monkeypatch.setattr(
+        model_capabilities_cache,
+        "_capabilities",
+        RefreshableSnapshot("model_capabilities", _unreachable, capabilities, 900),
+    )
+    monkeypatch.setattr(pricing, "_pricing_cache", {})
+    monkeypatch.setattr(local_memory_cache, "_local_cache", None)
+
+
+def test_restore_seeds_caches_as_due_for_refresh(empty_caches):
+    boot_snapshot.save_boot_snapshot(
+        {
+            "mappings": {
+                "aliases": {"gpt4": "openai/gpt-4"},
+                "provider_mappings": {"groq": {"llama-3": "llama3-70b"}},
+                "routing_rules": {},
+            },
+            "capabilities": {
+                "max_tokens": {"m": 8192},
+                "has_json_mode": [],
+                "is_reasoning": ["m"],
+                "free_models": ["m:free"],
+                "latency_tier": {},
+                "quality_priors": {},
+            },
+            "pricing": {"openai/gpt-4": {"prompt": 0.00003, "completion": 0.00006}},
+            "catalog": [{"id": "openai/gpt-4"}],
+        }
+    )
+
+    restored = boot_snapshot.restore_boot_snapshot()
+
+    assert restored == {"mappings": 1, "capabilities": 1, "pricing": 1, "catalog": 1}
+    assert model_mappings_cache._mappings.current.provider_native_values == {"groq": {"llama3-70b"}}
+    assert model_mappings_cache._mappings.is_due()
+    assert model_capabilities_cache._capabilities.current.free_models == {"m:free"}
+    assert pricing._pricing_cache["openai/gpt-4"]["data"]["prompt"] == 0.00003
+    catalog, is_stale = local_memory_cache.get_local_catalog("all")
+    assert catalog == [{"id": "openai/gpt-4"}]
+    assert is_stale
+
+
+def test_restore_is_a_no_op_when_disabled(empty_caches, monkeypatch):
+    boot_snapshot.save_boot_snapshot({"catalog": [{"id": "a"}]})
+    monkeypatch.setattr(Config, "BOOT_SNAPSHOT_ENABLED", False)
+
+    assert boot_snapshot.restore_boot_snapshot() == {}
@@ -0,0 +1,154 @@
+"""Tests for src.services.cache.refreshable_snapshot."""
+
+import asyncio
+import threading
+import time
+import weakref
+
+import pytest
+
+from src.config import Config
+from src.services.cache import refreshable_snapshot
+from src.services.cache.refreshable_snapshot import RefreshableSnapshot
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+        self.gate = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return {"version": self.calls}
+
+
+@pytest.fixture
+def loader():
+    return Loader()
+
+
+@pytest.fixture
+def snapshot(loader, monkeypatch):
+    # Keep the refresher away from the real routing datasets
+    monkeypatch.setattr(refreshable_snapshot, "_snapshots", weakref.WeakSet())
+    return RefreshableSnapshot("test", loader, {}, interval=60)
+
+
+def test_inline_load_without_a_refresher(snapshot, loader):
+    assert snapshot.get() == {"version": 1}
+    assert snapshot.get() == {"version": 1}
+    assert loader.calls == 1
+
+    snapshot.loaded_at -= 61
+    assert snapshot.get() == {"version": 2}
+
+
+def test_concurrent_refreshes_share_one_build(snapshot, loader):
+    loader.gate = threading.Event()
+    threads = [threading.Thread(target=snapshot.get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    loader.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert loader.calls == 1
+    assert snapshot.current == {"version": 1}
+
+
+def test_failed_refresh_keeps_serving_the_previous_copy(snapshot, loader):
+    snapshot.get()
+    loader.error = RuntimeError("db down")
+    snapshot.invalidate()
+
+    assert snapshot.get() == {"version": 1}
+    assert snapshot.failures == 1
+    # Backed off: the next reads don't retry
+    assert snapshot.get() == {"version": 1}
+    assert loader.calls == 2
+
+    loader.error = None
+    snapshot.invalidate()
+    assert snapshot.get() == {"version": 3}
+
+
+def test_reads_never_load_while_the_refresher_runs(snapshot, loader, monkeypatch):
+    snapshot.get()
+    monkeypatch.setattr(refreshable_snapshot, "_refresh_task", object())
+    snapshot.invalidate()
+
+    assert snapshot.get() == {"version": 1}
+    assert loader.calls == 1
+
+
+def test_first_read_loads_inline_while_the_refresher_runs(snapshot, loader, monkeypatch):
+    monkeypatch.setattr(refreshable_snapshot, "_refresh_task", object())
+
+    assert snapshot.get() == {"version": 1}
+    assert loader.calls == 1
+
+
+def test_failed_first_load_backs_off_briefly(snapshot, loader, monkeypatch):
+    monkeypatch.setattr(refreshable_snapshot, "_refresh_task", object())
+    loader.error = RuntimeError("db down")
+
+    assert snapshot.get() == {}
+    assert snapshot.get() == {}
+    assert loader.calls == 1
+    assert snapshot.seconds_until_due(time.monotonic()) <= (
+        refreshable_snapshot._FIRST_LOAD_RETRY_SECONDS
+    )
+
+
+def test_invalidation_during_a_build_leaves_it_due(snapshot, loader):
+    loader.gate = threading.Event()
+    build = threading.Thread(target=snapshot.refresh)
+    build.start()
+    time.sleep(0.05)
+    snapshot.invalidate()
+    loader.gate.set()
+    build.join()
+
+    assert snapshot.current == {"version": 1}
+    assert snapshot.is_due()
+
+
+def test_restored_value_is_served_until_the_first_load(snapshot, loader, monkeypatch):
+    monkeypatch.setattr(refreshable_snapshot, "_refresh_task", object())
+    snapshot.restore({"version": "boot"})
+
+    assert snapshot.get() == {"version": "boot"}
+    assert snapshot.loaded and snapshot.is_due()
+    assert snapshot.age() is None
+
+
+def test_refresher_rebuilds_due_and_invalidated_snapshots(snapshot, loader, monkeypatch):
+    monkeypatch.setattr(Config, "ROUTING_SNAPSHOT_REFRESHER_ENABLED", True)
+
+    async def wait_for(version):
+        for _ in range(200):
+            if snapshot.current.get("version") == version:
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"snapshot never reached version {version}")
+
+    async def main():
+        refreshable_snapshot.start_snapshot_refresher()
+        try:
+            await wait_for(1)
+            snapshot.invalidate()
+            await wait_for(2)
+        finally:
+            refreshable_snapshot.stop_snapshot_refresher()
+
+    asyncio.run(main())
+
+    stats = refreshable_snapshot.get_snapshot_stats()["test"]
+    assert stats["refreshes"] == 2 and stats["failures"] == 0
+    assert not refreshable_snapshot.is_snapshot_refresher_running()
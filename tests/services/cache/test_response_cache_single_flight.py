@@ -0,0 +1,229 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.config import Config
+from src.schemas.internal.chat import InternalChatRequest, InternalMessage
+from src.services.cache import response_cache
+from src.services.cache.response_cache import ResponseCache, make_cache_key
+
+
+def _response(text):
+    return {"content": text}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache(max_cache_size=2)
+    cache.set_by_key("a", _response("a"), "m")
+    cache.set_by_key("b", _response("b"), "m")
+    assert cache.get_by_key("a") is not None
+
+    cache.set_by_key("c", _response("c"), "m")
+
+    assert cache.get_by_key("b") is None
+    assert cache.get_by_key("a") == _response("a")
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_memory_is_bounded_in_bytes():
+    cache = ResponseCache(max_cache_bytes=1600)
+    for i in range(20):
+        cache.set_by_key(f"k{i}", _response("x" * 20), "m")
+
+    stats = cache.get_stats()
+    assert stats["memory_cache_bytes"] <= 1600
+    assert 0 < stats["memory_cache_size"] < 20
+    assert cache.get_by_key("k19") is not None
+
+    assert cache.set_by_key("big", _response("x" * 200), "m") is False
+    assert cache.get_stats()["oversized"] == 1
+
+
+def test_key_is_scoped_and_covers_generation_params():
+    messages = [{"role": "user", "content": "hi"}]
+    key = make_cache_key(messages, "m", {"temperature": 0}, scope="1")
+
+    assert key == make_cache_key(messages, "m", {"temperature": 0, "user": "x"}, scope="1")
+    assert key != make_cache_key(messages, "m", {"temperature": 0}, scope="2")
+    assert key != make_cache_key(messages, "m", {"temperature": 0, "seed": 7}, scope="1")
+
+
+def test_single_flight_coalesces_concurrent_requests():
+    cache = ResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _response("answer"), True
+
+    async def run():
+        return await asyncio.gather(*(cache.single_flight("k", fetch, "m") for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert [hit for _, hit in results].count(False) == 1
+    assert all(response == _response("answer") for response, _ in results)
+    assert cache.get_stats()["coalesced"] == 4
+    assert asyncio.run(cache.single_flight("k", fetch, "m")) == (_response("answer"), True)
+
+
+def test_redis_reads_and_writes_run_off_the_event_loop():
+    calls = []
+
+    class FakeRedis:
+        def __init__(self):
+            self.data = {}
+
+        def get(self, key):
+            calls.append(("get", threading.get_ident()))
+            return self.data.get(key)
+
+        def setex(self, key, ttl, value):
+            calls.append(("setex", threading.get_ident()))
+            self.data[key] = value
+
+    cache = ResponseCache()
+    cache._redis_client = FakeRedis()
+
+    async def run():
+        async def fetch():
+            return _response("answer"), True
+
+        await cache.single_flight("k", fetch, "m")
+        return threading.get_ident(), await cache.get_by_key_async("k")
+
+    loop_thread, cached = asyncio.run(run())
+    assert cached == _response("answer")
+    assert [op for op, _ in calls] == ["get", "setex", "get"]
+    assert all(thread != loop_thread for _, thread in calls)
+
+
+def test_single_flight_followers_retry_when_leader_fails():
+    cache = ResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("upstream down")
+        return _response("ok"), False
+
+    async def run():
+        return await asyncio.gather(
+            cache.single_flight("k", fetch, "m"),
+            cache.single_flight("k", fetch, "m"),
+            return_exceptions=True,
+        )
+
+    leader, follower = asyncio.run(run())
+
+    assert isinstance(leader, RuntimeError)
+    assert follower == (_response("ok"), False)
+    assert cache.get_by_key("k") is None  # not cacheable
+
+
+@pytest.fixture
+def handler_cache(monkeypatch):
+    monkeypatch.setattr(Config, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(Config, "RESPONSE_CACHE_HIT_COST_FACTOR", 0.5)
+    cache = ResponseCache()
+    monkeypatch.setattr(response_cache, "_cache", cache)
+    return cache
+
+
+def _handler():
+    from src.handlers.chat_handler import ChatInferenceHandler
+
+    handler = ChatInferenceHandler("key")
+    handler.user = {"id": 1}
+    return handler
+
+
+def _request(**params):
+    return InternalChatRequest(
+        messages=[InternalMessage(role="user", content="hi")], model="m", **params
+    )
+
+
+COMPLETION = {
+    "content": "hello",
+    "finish_reason": "stop",
+    "tool_calls": None,
+    "prompt_tokens": 10,
+    "completion_tokens": 5,
+    "cache_read_tokens": 0,
+    "cache_write_tokens": 0,
+    "provider_used": "openrouter",
+    "provider_model_id": "m",
+}
+
+
+def test_handler_bills_cache_hits_at_the_hit_factor(handler_cache):
+    from src.handlers import chat_handler
+    from src.handlers.chat_handler import ChatInferenceHandler
+
+    async def fetch(request, messages, kwargs):
+        await asyncio.sleep(0.01)
+        return COMPLETION
+
+    fetch_mock = AsyncMock(side_effect=fetch)
+    charge = AsyncMock()
+
+    async def run():
+        return await asyncio.gather(
+            *(_handler().process(_request(temperature=0)) for _ in range(3))
+        )
+
+    with (
+        patch.object(ChatInferenceHandler, "_initialize_user_context", AsyncMock()),
+        patch.object(ChatInferenceHandler, "_check_credit_sufficiency", AsyncMock()),
+        patch.object(ChatInferenceHandler, "_fetch_completion", fetch_mock),
+        patch.object(ChatInferenceHandler, "_charge_and_record", charge),
+        patch.object(chat_handler, "_loss_proof_cost_split", return_value=(1.0, 0.4, 0.6)),
+    ):
+        responses = asyncio.run(run())
+
+    assert fetch_mock.await_count == 1
+    assert sorted(r.cost_usd for r in responses) == [0.5, 0.5, 1.0]
+    assert [getattr(r, "response_cache", None) for r in responses].count("hit") == 2
+    assert sorted(call.args[0] for call in charge.await_args_list) == [0.5, 0.5, 1.0]
+
+
+def test_handler_skips_the_cache_for_sampled_requests(handler_cache):
+    handler = _handler()
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert handler._response_cache_key(_request(), messages, {"temperature": 0.7}) is None
+    assert handler._response_cache_key(_request(), messages, {"temperature": 0}) is not None
+    assert handler._response_cache_key(_request(), messages, {"seed": 3}) is not None
+    assert (
+        handler._response_cache_key(_request(), messages, {"temperature": 0, "tools": [{}]}) is None
+    )
+
+
+def test_hedge_attempts_bypass_the_cache(handler_cache):
+    handler = _handler()
+    handler.is_hedge = True
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert handler._response_cache_key(_request(), messages, {"temperature": 0}) is None
+
+
+def test_cache_hits_of_byok_answers_pay_only_the_routing_fee(handler_cache, monkeypatch):
+    from src.handlers import chat_handler
+    from src.services import byok
+
+    monkeypatch.setattr(byok, "byok_routing_fee", lambda cost: cost * 0.1)
+    handler = _handler()
+
+    with patch.object(chat_handler, "_loss_proof_cost_split", return_value=(1.0, 0.4, 0.6)):
+        byok_hit = asyncio.run(handler._completion_cost("m", {**COMPLETION, "byok": True}, True))
+        platform_hit = asyncio.run(handler._completion_cost("m", COMPLETION, True))
+
+    assert byok_hit[0] == pytest.approx(0.05)
+    assert platform_hit[0] == pytest.approx(0.5)
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from src.config import Config
+from src.services.cache import local_memory_cache, shared_catalog_snapshot
+from src.services.cache.shared_catalog_snapshot import SharedCatalogSnapshot
+
+CATALOG = [{"id": "openai/gpt-4o", "pricing": {"prompt": "0.0000025"}}]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "catalog.snapshot")
+
+
+def test_workers_share_one_file(path):
+    writer = SharedCatalogSnapshot(path)
+    reader = SharedCatalogSnapshot(path)
+
+    assert writer.put("catalog:all", CATALOG, epoch=1, ttl=60, stale_ttl=60) is True
+    writer.put("catalog:openai", CATALOG[:0], epoch=1, ttl=60, stale_ttl=60)
+
+    assert reader.get("catalog:all", epoch=1) == (CATALOG, False)
+    assert reader.get("catalog:openai", epoch=1) == ([], False)
+    assert reader.get("catalog:groq", epoch=1) == (None, False)
+
+
+def test_other_epoch_is_a_miss(path):
+    snapshot = SharedCatalogSnapshot(path)
+    snapshot.put("catalog:all", CATALOG, epoch=1, ttl=60, stale_ttl=60)
+
+    assert snapshot.get("catalog:all", epoch=2) == (None, False)
+
+
+def test_entries_go_stale_then_expire(path, monkeypatch):
+    snapshot = SharedCatalogSnapshot(path)
+    snapshot.put("catalog:all", CATALOG, epoch=1, ttl=10, stale_ttl=10)
+    now = time.time()
+
+    monkeypatch.setattr(shared_catalog_snapshot.time, "time", lambda: now + 15)
+    assert snapshot.get("catalog:all", epoch=1) == (CATALOG, True)
+
+    monkeypatch.setattr(shared_catalog_snapshot.time, "time", lambda: now + 25)
+    assert snapshot.get("catalog:all", epoch=1) == (None, False)
+
+
+def test_recent_entry_is_not_rewritten(path):
+    snapshot = SharedCatalogSnapshot(path)
+
+    assert snapshot.put("catalog:all", CATALOG, epoch=1, ttl=60, stale_ttl=60) is True
+    assert snapshot.put("catalog:all", CATALOG, epoch=1, ttl=60, stale_ttl=60) is False
+    assert snapshot.put("catalog:all", CATALOG, epoch=2, ttl=60, stale_ttl=60) is True
+
+
+def test_reads_decode_once_per_file(path, monkeypatch):
+    monkeypatch.setattr(shared_catalog_snapshot, "_RECHECK_SECONDS", 0)
+    writer = SharedCatalogSnapshot(path)
+    reader = SharedCatalogSnapshot(path)
+    writer.put("catalog:all", CATALOG, epoch=1, ttl=60, stale_ttl=60)
+
+    first, _ = reader.get("catalog:all", epoch=1)
+    assert reader.get("catalog:all", epoch=1)[0] is first
+
+    writer.put("catalog:all", CATALOG[:0], epoch=2, ttl=60, stale_ttl=60)
+    assert reader.get("catalog:all", epoch=2) == ([], False)
+
+
+def test_writes_leave_other_keys_untouched(path):
+    snapshot = SharedCatalogSnapshot(path)
+    snapshot.put("catalog:all", CATALOG, epoch=1, ttl=60, stale_ttl=60)
+    file_id = snapshot._file("catalog:all").file_id()
+
+    snapshot.put("catalog:openai", CATALOG, epoch=1, ttl=60, stale_ttl=60)
+
+    assert snapshot._file("catalog:all").file_id() == file_id
+
+
+def test_corrupt_file_is_ignored(path):
+    with open(f"{path}.catalog_all", "wb") as f:
+        f.write(b"not a snapshot")
+
+    assert SharedCatalogSnapshot(path).get("catalog:all", epoch=0) == (None, False)
+
+
+def test_local_catalog_uses_snapshot_in_multi_worker_mode(path, monkeypatch):
+    monkeypatch.setattr(Config, "MULTI_WORKER_MODE", True)
+    monkeypatch.setattr(shared_catalog_snapshot, "_snapshot", SharedCatalogSnapshot(path))
+    monkeypatch.setattr(local_memory_cache, "get_catalog_epoch", lambda force=False: 7)
+
+    local_memory_cache.set_local_catalog("all", CATALOG)
+
+    assert local_memory_cache.get_local_cache().get("catalog:all") == (None, False)
+    assert local_memory_cache.get_local_catalog("all") == (CATALOG, False)
@@ -0,0 +1,181 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.services.cache import web_search_cache
+from src.services.tools.base import ToolResult
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache(monkeypatch):
+    web_search_cache.clear_web_search_cache()
+    monkeypatch.setattr(web_search_cache, "_get_redis_client", lambda: None)
+    yield
+    web_search_cache.clear_web_search_cache()
+
+
+def _ok(query="q"):
+    return ToolResult(success=True, result={"query": query, "results": []}, metadata={})
+
+
+def test_normalized_queries_share_a_key():
+    a = web_search_cache.build_cache_key("  Latest  AI news? ")
+    b = web_search_cache.build_cache_key("latest ai news")
+    assert a == b
+
+
+def test_depth_and_params_are_part_of_the_key():
+    basic = web_search_cache.build_cache_key("news", search_depth="basic")
+    advanced = web_search_cache.build_cache_key("news", search_depth="advanced")
+    fewer = web_search_cache.build_cache_key("news", max_results=3)
+    assert basic.startswith("basic:")
+    assert advanced.startswith("advanced:")
+    assert len({basic, advanced, fewer}) == 3
+
+
+@pytest.mark.asyncio
+async def test_second_call_is_served_from_memory():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return _ok()
+
+    key = web_search_cache.build_cache_key("q")
+    first = await web_search_cache.get_or_fetch(key, "basic", fetch)
+    second = await web_search_cache.get_or_fetch(key, "basic", fetch)
+
+    assert calls == 1
+    assert not first.metadata.get("cached")
+    assert second.metadata["cached"] is True
+    assert second.metadata["cache_source"] == "memory"
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return ToolResult(success=False, error="rate limited")
+
+    key = web_search_cache.build_cache_key("q")
+    await web_search_cache.get_or_fetch(key, "basic", fetch)
+    await web_search_cache.get_or_fetch(key, "basic", fetch)
+
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_are_coalesced():
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return _ok()
+
+    key = web_search_cache.build_cache_key("q")
+    waiters = [
+        asyncio.create_task(web_search_cache.get_or_fetch(key, "basic", fetch)) for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert all(r.success for r in results)
+    assert web_search_cache.get_web_search_cache_stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_search():
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return _ok()
+
+    key = web_search_cache.build_cache_key("q")
+    waiter = asyncio.create_task(web_search_cache.get_or_fetch(key, "basic", fetch))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await asyncio.sleep(0.01)
+
+    cached = await web_search_cache.get_or_fetch(key, "basic", fetch)
+    assert cached.metadata["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_refetched(monkeypatch):
+    monkeypatch.setattr(web_search_cache, "ttl_for_depth", lambda depth: 0)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return _ok()
+
+    key = web_search_cache.build_cache_key("q")
+    await web_search_cache.get_or_fetch(key, "basic", fetch)
+    await web_search_cache.get_or_fetch(key, "basic", fetch)
+
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_hot_entries_are_published_and_read_from_redis(monkeypatch):
+    redis = MagicMock()
+    pipe = redis.pipeline.return_value
+    pipe.execute.return_value = [None, -2]
+    monkeypatch.setattr(web_search_cache, "_get_redis_client", lambda: redis)
+
+    async def fetch():
+        return _ok()
+
+    key = web_search_cache.build_cache_key("q")
+    for _ in range(1 + web_search_cache.HOT_HIT_THRESHOLD):
+        await web_search_cache.get_or_fetch(key, "basic", fetch)
+    await asyncio.sleep(0.01)
+
+    redis.setex.assert_called_once()
+    redis_key, ttl, payload = redis.setex.call_args.args
+    assert redis_key == f"web_search:{key}"
+    assert 0 < ttl <= 120
+
+    # Another worker with a cold local cache picks the entry up from Redis.
+    web_search_cache.clear_web_search_cache()
+    pipe.execute.return_value = [payload, 60]
+
+    async def must_not_fetch():
+        raise AssertionError("upstream called despite shared hit")
+
+    result = await web_search_cache.get_or_fetch(key, "basic", must_not_fetch)
+    assert result.metadata["cache_source"] == "redis"
+    assert result.result == json.loads(payload)["result"]
+    pipe.get.assert_called_with(f"web_search:{key}")
+    pipe.ttl.assert_called_with(f"web_search:{key}")
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_fetches(monkeypatch):
+    monkeypatch.setattr(web_search_cache.Config, "WEB_SEARCH_CACHE_ENABLED", False)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return _ok()
+
+    key = web_search_cache.build_cache_key("q")
+    await web_search_cache.get_or_fetch(key, "basic", fetch)
+    await web_search_cache.get_or_fetch(key, "basic", fetch)
+
+    assert calls == 2
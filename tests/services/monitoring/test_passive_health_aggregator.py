@@ -0,0 +1,137 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.services.monitoring import passive_health_aggregator as pha
+from src.services.monitoring.passive_health_aggregator import PassiveHealthAggregator
+
+
+def test_samples_for_a_pair_collapse_into_one_entry():
+    aggregator = PassiveHealthAggregator(max_pairs=10)
+    aggregator.add("openrouter", "gpt-4", 100, "success", input_tokens=10, output_tokens=5)
+    aggregator.add("openrouter", "gpt-4", 300, "timeout", error_message="timed out")
+    aggregator.add("openrouter", "gpt-4", 200, "success", input_tokens=20, output_tokens=7)
+    aggregator.add("fireworks", "llama", 50, "success")
+
+    batch = {entry["model"]: entry for entry in aggregator.drain()}
+
+    entry = batch["gpt-4"]
+    assert len(batch) == 2
+    assert entry["call_count"] == 3
+    assert entry["success_count"] == 2
+    assert entry["error_count"] == 1
+    assert entry["response_time_ms_sum"] == 600
+    assert entry["last_status"] == "success"
+    assert entry["last_error_message"] == "timed out"
+    assert entry["input_tokens"] == 20
+    assert entry["window"]["error_classes"] == {"timeout": 1}
+    assert entry["window"]["input_tokens_sum"] == 30
+    assert entry["window"]["p50_ms"] == pytest.approx(200, rel=0.01)
+    assert aggregator.pending_pairs() == 0
+
+
+def test_buffer_is_bounded():
+    aggregator = PassiveHealthAggregator(max_pairs=2)
+    aggregator._flush_requested = asyncio.Event()
+
+    for i in range(5):
+        aggregator.add("p", f"m{i}", 10, "success")
+
+    assert aggregator._flush_requested.is_set()
+    assert aggregator.pending_pairs() == 4
+    assert aggregator.get_stats()["dropped"] == 1
+
+
+def test_capture_buffers_instead_of_writing_while_running(monkeypatch):
+    from src.services.monitoring.passive_health_monitor import capture_model_health
+
+    aggregator = PassiveHealthAggregator(max_pairs=10)
+    monkeypatch.setattr(pha, "_aggregator", aggregator)
+    monkeypatch.setattr(pha, "_flush_task", MagicMock())
+
+    with patch("src.services.monitoring.passive_health_monitor.record_model_call") as record:
+        asyncio.run(
+            capture_model_health(
+                "openrouter", "gpt-4", 120, usage={"prompt_tokens": 3, "completion_tokens": 4}
+            )
+        )
+
+    record.assert_not_called()
+    assert aggregator.drain()[0]["total_tokens"] == 7
+
+
+def test_flush_writes_one_batch():
+    aggregator = PassiveHealthAggregator(max_pairs=10)
+    for _ in range(50):
+        aggregator.add("openrouter", "gpt-4", 100, "success")
+
+    with patch("src.db.model_health.record_model_calls_batch", return_value=1) as write:
+        assert asyncio.run(aggregator.flush()) == 1
+
+    write.assert_called_once()
+    assert write.call_args.args[0][0]["call_count"] == 50
+
+
+def test_batch_upsert_merges_into_existing_rows():
+    from src.db import model_health
+
+    client = MagicMock()
+    table = client.table.return_value
+    table.select.return_value.in_.return_value.execute.return_value.data = [
+        {
+            "provider": "openrouter",
+            "model": "gpt-4",
+            "call_count": 10,
+            "success_count": 9,
+            "error_count": 1,
+            "average_response_time_ms": 100.0,
+            "metadata": {"keep": True},
+            "last_error_message": "old",
+            "input_tokens": 1,
+            "output_tokens": 1,
+            "total_tokens": 2,
+        }
+    ]
+    table.upsert.return_value.execute.return_value.data = [{}, {}]
+
+    aggregator = PassiveHealthAggregator(max_pairs=10)
+    for _ in range(10):
+        aggregator.add("openrouter", "gpt-4", 200, "success")
+    aggregator.add("fireworks", "llama", 50, "error", error_message="boom")
+
+    with patch.object(model_health, "get_supabase_client", return_value=client):
+        written = model_health.record_model_calls_batch(aggregator.drain())
+
+    rows = {row["model"]: row for row in table.upsert.call_args.args[0]}
+    assert written == 2
+    assert table.select.call_count == 1 and table.upsert.call_count == 1
+    assert rows["gpt-4"]["call_count"] == 20
+    assert rows["gpt-4"]["average_response_time_ms"] == 150
+    assert rows["gpt-4"]["last_error_message"] == "old"
+    assert rows["gpt-4"]["metadata"]["keep"] is True
+    assert rows["gpt-4"]["metadata"]["passive_window"]["calls"] == 10
+    assert rows["llama"]["error_count"] == 1
+    assert set(rows["gpt-4"]) == set(rows["llama"])
+
+
+def test_batch_lookup_is_chunked_by_model(monkeypatch):
+    from src.db import model_health
+
+    monkeypatch.setattr(model_health, "_MODEL_LOOKUP_CHUNK", 2)
+    client = MagicMock()
+    table = client.table.return_value
+    table.select.return_value.in_.return_value.execute.return_value.data = []
+    table.upsert.return_value.execute.return_value.data = [{}] * 5
+
+    aggregator = PassiveHealthAggregator(max_pairs=10)
+    for i in range(5):
+        aggregator.add("openrouter", f"model-{i}", 100, "success")
+
+    with patch.object(model_health, "get_supabase_client", return_value=client):
+        written = model_health.record_model_calls_batch(aggregator.drain())
+
+    chunks = [call.args[1] for call in table.select.return_value.in_.call_args_list]
+    assert written == 5
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert table.upsert.call_count == 1
@@ -0,0 +1,207 @@
+import asyncio
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.routes import status_page
+from src.services.monitoring import status_snapshot as ss
+
+
+class _Query:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def __getattr__(self, name):
+        # select / eq / order / range / gte all just chain
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=list(self._rows), count=len(self._rows))
+
+
+class _FakeDB:
+    def __init__(self, tables):
+        self.tables = tables
+        self.calls = 0
+
+    def table(self, name):
+        self.calls += 1
+        return _Query(self.tables.get(name, []))
+
+
+def _model(model="gpt-4", provider="openai", status="operational"):
+    return {
+        "model": model,
+        "provider": provider,
+        "gateway": "openrouter",
+        "status_indicator": status,
+        "monitoring_tier": "critical",
+        "uptime_percentage_24h": 99.9,
+        "uptime_percentage_7d": 99.9,
+        "uptime_percentage_30d": 99.9,
+        "average_response_time_ms": 400.0,
+        "last_called_at": None,
+        "last_success_at": None,
+        "last_failure_at": None,
+        "circuit_breaker_state": "closed",
+        "consecutive_failures": 0,
+        "usage_count_24h": 10,
+        "is_enabled": True,
+        "active_incidents_count": 0,
+    }
+
+
+def _tables(offline=0):
+    return {
+        "provider_health_current": [
+            {
+                "provider": "openai",
+                "gateway": "openrouter",
+                "status_indicator": "operational",
+                "total_models": 2,
+                "healthy_models": 2 - offline,
+                "offline_models": offline,
+                "avg_uptime_24h": 99.9,
+                "avg_uptime_7d": 99.9,
+                "avg_response_time_ms": 400.0,
+                "last_checked_at": None,
+            }
+        ],
+        "model_status_current": [_model("gpt-4"), _model("gpt-4o", status="offline")],
+        "model_health_incidents": [
+            {
+                "id": 1,
+                "provider": "openai",
+                "model": "gpt-4o",
+                "gateway": "openrouter",
+                "incident_type": "timeout",
+                "severity": "high",
+                "status": "active",
+                "started_at": datetime.now(UTC).isoformat(),
+                "resolved_at": None,
+                "duration_seconds": None,
+                "error_message": "timeout",
+                "error_count": 3,
+            }
+        ],
+    }
+
+
+@pytest.fixture(autouse=True)
+def _snapshot(monkeypatch):
+    monkeypatch.setattr(ss.Config, "STATUS_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(ss.Config, "STATUS_SNAPSHOT_REFRESH_SECONDS", 30)
+    ss.clear_status_snapshot()
+    yield
+    ss.clear_status_snapshot()
+
+
+def _refresh(db):
+    with patch("src.db.client.get_db", return_value=db):
+        return asyncio.run(ss.refresh_status_snapshot())
+
+
+def test_endpoints_fall_back_to_db_without_snapshot():
+    db = _FakeDB(_tables())
+    with patch.object(status_page, "get_db", return_value=db):
+        overview = asyncio.run(status_page.get_overall_status())
+    assert overview["status"] == "operational"
+    assert db.calls > 0
+
+
+def test_snapshot_is_served_without_db_and_honours_etag():
+    _refresh(_FakeDB(_tables()))
+
+    with patch.object(status_page, "get_db", side_effect=AssertionError("db hit")):
+        response = asyncio.run(status_page.get_providers_status())
+        etag = response.headers["etag"]
+        request = SimpleNamespace(headers={"if-none-match": etag})
+        not_modified = asyncio.run(status_page.get_providers_status(request))
+
+    assert response.status_code == 200
+    assert b'"name":"openai"' in response.body
+    assert not_modified.status_code == 304
+
+
+def test_unchanged_state_keeps_etag_and_publishes_nothing():
+    tables = _tables()
+    first = _refresh(_FakeDB(tables))
+    document = ss.get_status_document(ss.OVERVIEW)
+
+    # last_updated / active incident durations differ, content does not
+    with patch.object(ss, "datetime") as clock:
+        clock.now.return_value = datetime(2030, 1, 1, tzinfo=UTC)
+        second = _refresh(_FakeDB(tables))
+
+    assert set(first) == {ss.OVERVIEW, ss.PROVIDERS, ss.MODELS, ss.INCIDENTS, ss.STATS}
+    assert second == []
+    assert ss.get_status_document(ss.OVERVIEW).etag == document.etag
+    # ... but the served body carries the new timestamp
+    assert b"2030-01-01" in ss.get_status_document(ss.OVERVIEW).body
+    assert b"2030-01-01" not in document.body
+
+
+def test_empty_overview_keeps_etag_across_rebuilds():
+    _refresh(_FakeDB({}))
+    document = ss.get_status_document(ss.OVERVIEW)
+
+    # the "no providers" document is stamped with the build time
+    with patch.object(ss, "datetime") as clock:
+        clock.now.return_value = datetime(2030, 1, 1, tzinfo=UTC)
+        assert _refresh(_FakeDB({})) == []
+
+    assert ss.get_status_document(ss.OVERVIEW).etag == document.etag
+
+
+def test_changed_state_is_pushed_to_subscribers():
+    _refresh(_FakeDB(_tables()))
+
+    async def run():
+        queue = ss.subscribe()
+        try:
+            with patch("src.db.client.get_db", return_value=_FakeDB(_tables(offline=1))):
+                await ss.refresh_status_snapshot()
+            return queue.get_nowait()
+        finally:
+            ss.unsubscribe(queue)
+
+    changed = asyncio.run(run())
+    assert ss.OVERVIEW in changed
+    assert ss.PROVIDERS in changed
+
+
+def test_filtered_queries_are_answered_from_snapshot():
+    _refresh(_FakeDB(_tables()))
+
+    with patch.object(status_page, "get_db", side_effect=AssertionError("db hit")):
+        offline = asyncio.run(
+            status_page.get_models_status(
+                provider=None, gateway=None, status="offline", tier=None, limit=100, offset=0
+            )
+        )
+        detail = asyncio.run(status_page.get_model_status("openai", "gpt-4", gateway=None))
+        active = asyncio.run(
+            status_page.get_incidents(
+                status="active", severity=None, provider=None, limit=50, offset=0
+            )
+        )
+
+    assert [m["model_id"] for m in offline] == ["gpt-4o"]
+    assert "consecutive_failures" not in offline[0]
+    assert detail["usage_24h"] == 10
+    assert [i["id"] for i in active] == [1]
+
+
+def test_stale_or_disabled_snapshot_is_ignored(monkeypatch):
+    _refresh(_FakeDB(_tables()))
+    assert ss.get_status_document(ss.STATS) is not None
+
+    monkeypatch.setattr(ss.Config, "STATUS_SNAPSHOT_REFRESH_SECONDS", 0)
+    assert ss.get_status_document(ss.STATS) is None
+
+    monkeypatch.setattr(ss.Config, "STATUS_SNAPSHOT_REFRESH_SECONDS", 30)
+    monkeypatch.setattr(ss.Config, "STATUS_SNAPSHOT_ENABLED", False)
+    assert ss.get_status_document(ss.STATS) is None
+    assert ss.get_snapshot_models() is None
@@ -17,10 +17,10 @@ from src.services.pricing import pricing_lookup
 
 @pytest.fixture(autouse=True)
 def _reset_state():
-    pricing_lookup._openrouter_pricing_index = None
+    pricing_lookup._openrouter_pricing_index.clear()
     pricing_lookup.clear_unpriced_models()
     yield
-    pricing_lookup._openrouter_pricing_index = None
+    pricing_lookup._openrouter_pricing_index.clear()
     pricing_lookup.clear_unpriced_models()
 
 
@@ -4,11 +4,22 @@ See docs/BUSINESS_PIVOT_DIRECT_SUPPLY.md Phase 5.
 """
 
 import importlib
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
 from cryptography.fernet import Fernet
 
-from src.services.byok import byok_routing_fee, resolve_provider_key
+from src.services import byok
+from src.services.byok import byok_routing_fee, resolve_byok_key, resolve_provider_key
+
+
+@pytest.fixture(autouse=True)
+def _empty_key_cache():
+    byok.clear_byok_key_cache()
+    yield
+    byok.clear_byok_key_cache()
+
 
 # --- routing fee -----------------------------------------------------------
 
@@ -76,6 +87,87 @@ def test_anonymous_user_uses_platform_key(monkeypatch):
     assert is_byok is False
 
 
+# --- resolved-key cache ------------------------------------------------------
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Counts DB lookups; ``lookups.keys`` maps provider -> stored key."""
+    state = SimpleNamespace(calls=0, keys={"deepinfra": "sk-customer-1234"}, error=None)
+
+    def _lookup(uid, slug):
+        state.calls += 1
+        if state.error is not None:
+            raise state.error
+        return state.keys.get(slug)
+
+    monkeypatch.setattr("src.db.user_provider_keys.get_decrypted_provider_key", _lookup)
+    return state
+
+
+def test_resolved_keys_are_cached_sealed(lookups):
+    assert resolve_byok_key(42, "deepinfra") == "sk-customer-1234"
+    assert resolve_byok_key(42, "deepinfra") == "sk-customer-1234"
+
+    assert lookups.calls == 1
+    sealed = byok._key_cache[(42, "deepinfra")][0]
+    assert b"sk-customer-1234" not in sealed
+
+
+def test_users_without_a_key_are_cached_too(lookups):
+    assert resolve_byok_key(42, "groq") is None
+    assert resolve_byok_key(42, "groq") is None
+
+    assert lookups.calls == 1
+    assert byok.get_byok_key_cache_stats()["negative_hits"] >= 1
+
+
+def test_failed_lookups_are_not_cached(lookups):
+    lookups.error = RuntimeError("db down")
+    assert resolve_byok_key(42, "deepinfra") is None
+
+    lookups.error = None
+    assert resolve_byok_key(42, "deepinfra") == "sk-customer-1234"
+
+
+def test_key_writes_invalidate_the_cache(lookups, monkeypatch):
+    import src.db.user_provider_keys as upk
+
+    monkeypatch.setattr(upk, "get_supabase_client", MagicMock())
+    assert resolve_byok_key(42, "deepinfra") == "sk-customer-1234"
+    assert resolve_byok_key(42, "groq") is None
+
+    lookups.keys = {"groq": "sk-groq-5678"}
+    upk.delete_provider_key(42, "deepinfra")
+
+    assert resolve_byok_key(42, "deepinfra") is None
+    assert resolve_byok_key(42, "groq") == "sk-groq-5678"
+    assert lookups.calls == 4
+
+
+def test_newer_shared_epoch_drops_entries(lookups, monkeypatch):
+    resolve_byok_key(42, "deepinfra")
+    # Another worker invalidated: the epoch read from Redis moved on
+    monkeypatch.setattr(byok, "_epoch_value", byok._epoch_value + 1)
+
+    resolve_byok_key(42, "deepinfra")
+    assert lookups.calls == 2
+
+
+def test_entries_expire_quickly_while_the_epoch_is_unreachable(lookups, monkeypatch):
+    monkeypatch.setattr(byok, "_byok_epoch", lambda: byok._epoch_value)
+    monkeypatch.setattr(byok, "_epoch_reachable", False)
+    now = byok.time.monotonic()
+    monkeypatch.setattr(byok.time, "monotonic", lambda: now)
+    resolve_byok_key(42, "deepinfra")
+    resolve_byok_key(42, "deepinfra")
+    assert lookups.calls == 1
+
+    monkeypatch.setattr(byok.time, "monotonic", lambda: now + byok._EPOCH_RECHECK_SECONDS)
+    resolve_byok_key(42, "deepinfra")
+    assert lookups.calls == 2
+
+
 # --- crypto round-trip (BYOK requires REVERSIBLE encryption) ---------------
 
 
@@ -12,6 +12,14 @@ import pytest
 from src.services import byok
 
 
+@pytest.fixture(autouse=True)
+def _empty_key_cache():
+    """Each test patches its own key lookup; don't answer from a previous one."""
+    byok.clear_byok_key_cache()
+    yield
+    byok.clear_byok_key_cache()
+
+
 def test_context_is_provider_scoped():
     assert byok.get_byok_key_for("openrouter") is None
     token = byok.set_byok_context("openrouter", "sk-user-abc")
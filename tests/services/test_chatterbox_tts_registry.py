@@ -0,0 +1,153 @@
+import asyncio
+import base64
+import io
+import threading
+import wave
+
+import pytest
+
+import src.services.providers.chatterbox_tts_client as tts
+from src.config import Config
+from src.services.providers.chatterbox_tts_client import (
+    TTSQueueFull,
+    generate_speech,
+    open_speech_stream,
+    split_sentences,
+)
+
+SENTENCES = [
+    "The first sentence is long enough to stand on its own.",
+    "The second sentence is also long enough to stand alone.",
+    "A third one closes the paragraph with a period at the end.",
+]
+
+
+class StubModel:
+    """Tiny CPU stand-in for a Chatterbox model: 10 samples per character."""
+
+    sr = 16000
+
+    def __init__(self):
+        self.conds = "default-voice"
+        self.voices = []
+        self.gate = None
+
+    def generate(self, text, audio_prompt_path=None, **_kwargs):
+        if audio_prompt_path:
+            self.conds = f"cloned:{audio_prompt_path}"
+        self.voices.append(self.conds)
+        if self.gate is not None and text != SENTENCES[0]:
+            assert self.gate.wait(5)
+        return [0.5] * (10 * len(text))
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    loads = []
+
+    def load(model):
+        loads.append(model)
+        return StubModel()
+
+    monkeypatch.setattr(tts, "_load_model", load)
+    monkeypatch.setattr(tts, "_models", {})
+    monkeypatch.setattr(tts, "_default_conds", {})
+    monkeypatch.setattr(tts, "_model_locks", {})
+    monkeypatch.setattr(tts, "_executor", None)
+    monkeypatch.setattr(tts, "_slots", None)
+    monkeypatch.setattr(Config, "RESEMBLE_API_KEY", None, raising=False)
+    monkeypatch.setattr(Config, "CHATTERBOX_INFERENCE_WORKERS", 1)
+    monkeypatch.setattr(Config, "CHATTERBOX_MAX_QUEUED", 0)
+    return loads
+
+
+def _wav_frames(result):
+    data = base64.b64decode(result["audio_base64"].split(",", 1)[1])
+    with wave.open(io.BytesIO(data), "rb") as w:
+        assert w.getframerate() == StubModel.sr
+        return w.getnframes()
+
+
+def test_split_sentences_merges_short_ones():
+    text = "Hi. " + " ".join(SENTENCES) + " Ok."
+
+    assert split_sentences(text) == [
+        "Hi. " + SENTENCES[0],
+        SENTENCES[1],
+        SENTENCES[2] + " Ok.",
+    ]
+
+
+def test_model_is_loaded_once_across_requests(stub):
+    text = " ".join(SENTENCES)
+
+    async def main():
+        return [await generate_speech(text) for _ in range(3)]
+
+    results = asyncio.run(main())
+
+    assert stub == ["chatterbox-turbo"]
+    assert all(_wav_frames(r) == 10 * sum(map(len, SENTENCES)) for r in results)
+    assert results[0]["duration"] == pytest.approx(10 * sum(map(len, SENTENCES)) / 16000)
+
+
+def test_first_sentence_streams_before_the_rest_is_generated(stub):
+    gate = threading.Event()
+    tts.get_tts_model("chatterbox-turbo").gate = gate
+
+    async def main():
+        sample_rate, chunks = await open_speech_stream(" ".join(SENTENCES))
+        first = await asyncio.wait_for(chunks.__anext__(), timeout=5)
+        gate.set()
+        return sample_rate, [first] + [chunk async for chunk in chunks]
+
+    sample_rate, chunks = asyncio.run(main())
+
+    assert sample_rate == 16000
+    assert [len(c) for c in chunks] == [20 * len(s) for s in SENTENCES]
+
+
+def test_full_queue_rejects_instead_of_waiting(stub):
+    gate = threading.Event()
+    tts.get_tts_model("chatterbox-turbo").gate = gate
+
+    async def main():
+        _, chunks = await open_speech_stream(" ".join(SENTENCES))
+        with pytest.raises(TTSQueueFull):
+            await open_speech_stream("Another request.")
+        gate.set()
+        async for _ in chunks:
+            pass
+        _, chunks = await open_speech_stream("Accepted once the worker is free.")
+        # Drain it so the worker releases its slot before the next test swaps _slots
+        async for _ in chunks:
+            pass
+
+    asyncio.run(main())
+
+
+def test_cloned_voice_does_not_leak_into_the_next_request(stub, tmp_path, monkeypatch):
+    reference = tmp_path / "voice.wav"
+
+    async def download(_url):
+        reference.write_bytes(b"RIFF")
+        return str(reference)
+
+    monkeypatch.setattr(tts, "_download_voice_reference", download)
+    monkeypatch.setattr(tts, "_is_safe_url", lambda _url: True)
+    text = " ".join(SENTENCES[:2])
+
+    async def main():
+        await generate_speech(text, voice_reference_url="https://example.com/voice.wav")
+        await generate_speech(text)
+
+    asyncio.run(main())
+
+    cloned = f"cloned:{reference}"
+    assert tts.get_tts_model("chatterbox-turbo").voices == [
+        cloned,
+        cloned,
+        "default-voice",
+        "default-voice",
+    ]
+    assert not reference.exists()
@@ -330,7 +330,9 @@ class TestRedisStatePersistence:
     def test_consecutive_opens_loaded_from_redis(self, mock_redis):
         """Test that consecutive_opens is loaded from Redis"""
         mock_redis_client = MagicMock()
-        mock_redis_client.get.side_effect = lambda key: "2" if "consecutive_opens" in key else None
+        mock_redis_client.mget.side_effect = lambda keys: [
+            "2" if "consecutive_opens" in key else None for key in keys
+        ]
         mock_redis.return_value = mock_redis_client
 
         breaker = CircuitBreaker("test-provider")
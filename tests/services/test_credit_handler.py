@@ -596,6 +596,103 @@ class TestHandleCreditsAndUsage:
         # rate limit update was attempted
         mock_rate_limit.assert_called_once()
 
+    @pytest.mark.asyncio
+    @patch("src.db.settlement.settle_request")
+    @patch("src.services.pricing.calculate_cost_async")
+    @patch("src.db.users.deduct_credits")
+    @patch("src.db.users.record_usage")
+    @patch("src.db.rate_limits.update_rate_limit_usage")
+    @patch("src.services.billing.credit_handler._record_credit_metrics")
+    async def test_settle_request_replaces_multi_call_path(
+        self,
+        mock_metrics,
+        mock_rate_limit,
+        mock_record_usage,
+        mock_deduct,
+        mock_calc_cost,
+        mock_settle,
+        mock_user,
+        mock_trial_inactive,
+    ):
+        """With SETTLE_REQUEST_RPC_ENABLED, one settle_request call does the
+        deduction, usage record and rate-limit update."""
+        from src.config import Config
+
+        mock_calc_cost.return_value = 0.05
+        mock_settle.return_value = {"success": True, "charged": 0.05}
+        with patch.object(Config, "SETTLE_REQUEST_RPC_ENABLED", True):
+            cost = await handle_credits_and_usage(
+                api_key="test_key",
+                user=mock_user,
+                model="gpt-4",
+                trial=mock_trial_inactive,
+                total_tokens=1000,
+                prompt_tokens=500,
+                completion_tokens=500,
+                elapsed_ms=1000,
+                request_id="req-settle",
+                request_record={"provider_name": "openai", "input_tokens": 500},
+            )
+
+        assert cost == 0.05
+        mock_settle.assert_called_once()
+        assert mock_settle.call_args.args[0] == "req-settle"
+        assert mock_settle.call_args.kwargs["request_record"]["provider_name"] == "openai"
+        mock_deduct.assert_not_called()
+        mock_record_usage.assert_not_called()
+        mock_rate_limit.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("src.db.settlement.settle_request")
+    @patch("src.services.pricing.calculate_cost_async")
+    @patch("src.db.users.deduct_credits")
+    @patch("src.db.users.record_usage")
+    @patch("src.db.rate_limits.update_rate_limit_usage")
+    @patch("src.services.billing.credit_handler._record_credit_metrics")
+    async def test_settle_request_unavailable_falls_back(
+        self,
+        mock_metrics,
+        mock_rate_limit,
+        mock_record_usage,
+        mock_deduct,
+        mock_calc_cost,
+        mock_settle,
+        mock_user,
+        mock_trial_inactive,
+    ):
+        """When the RPC isn't deployed (returns None) the multi-call path runs."""
+        from src.config import Config
+
+        mock_calc_cost.return_value = 0.05
+        mock_settle.return_value = None
+        with (
+            patch.object(Config, "SETTLE_REQUEST_RPC_ENABLED", True),
+            patch(
+                "src.db.chat_completion_requests.save_chat_completion_request_with_cost_async",
+                new_callable=AsyncMock,
+            ) as mock_save_record,
+        ):
+            await handle_credits_and_usage(
+                api_key="test_key",
+                user=mock_user,
+                model="gpt-4",
+                trial=mock_trial_inactive,
+                total_tokens=1000,
+                prompt_tokens=500,
+                completion_tokens=500,
+                elapsed_ms=1000,
+                request_id="req-fallback",
+                request_record={"provider_name": "openai", "input_tokens": 500},
+            )
+
+        # settle_request wrote nothing, so the request record is saved separately
+        mock_save_record.assert_awaited_once()
+        assert mock_save_record.await_args.kwargs["request_id"] == "req-fallback"
+        assert mock_save_record.await_args.kwargs["provider_name"] == "openai"
+        mock_deduct.assert_called_once()
+        mock_record_usage.assert_called_once()
+        mock_rate_limit.assert_called_once()
+
 
 class TestHandleCreditsAndUsageWithFallback:
     """Test the fallback wrapper for streaming requests."""
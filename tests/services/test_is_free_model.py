@@ -11,37 +11,37 @@ The fix requires membership in the DB-backed free-model set (or its
 hardcoded fallback) — no bare suffix match.
 """
 
-import time
-
 from src.services.cache import model_capabilities_cache as cache
+from src.services.cache.refreshable_snapshot import RefreshableSnapshot
 
 
-def _reset_cache(free_models: set[str]) -> None:
-    cache._free_models = set(free_models)
-    cache._cache_loaded = True
-    cache._cache_loaded_at = time.monotonic()  # fresh — _ensure_loaded() won't reload
+def _reset_cache(monkeypatch, free_models: set[str]) -> None:
+    capabilities = cache.ModelCapabilities(free_models=frozenset(free_models))
+    snapshot = RefreshableSnapshot("model_capabilities", lambda: capabilities, capabilities, 900)
+    snapshot.refresh()  # fresh — accessors won't reload
+    monkeypatch.setattr(cache, "_capabilities", snapshot)
 
 
-def test_known_free_model_is_free():
-    _reset_cache({"google/gemini-2.0-flash-exp:free"})
+def test_known_free_model_is_free(monkeypatch):
+    _reset_cache(monkeypatch, {"google/gemini-2.0-flash-exp:free"})
     assert cache.is_free_model("google/gemini-2.0-flash-exp:free") is True
     assert cache.is_free_model("Google/Gemini-2.0-Flash-Exp:free") is True  # case-insensitive
 
 
-def test_unknown_model_with_free_suffix_is_not_free():
-    _reset_cache({"google/gemini-2.0-flash-exp:free"})
+def test_unknown_model_with_free_suffix_is_not_free(monkeypatch):
+    _reset_cache(monkeypatch, {"google/gemini-2.0-flash-exp:free"})
     # Fabricated ":free" suffix on a real, unrelated paid model — must NOT pass.
     assert cache.is_free_model("openai/gpt-4o:free") is False
     assert cache.is_free_model("anthropic/claude-opus-4.5:free") is False
 
 
-def test_paid_model_without_suffix_is_not_free():
-    _reset_cache({"google/gemini-2.0-flash-exp:free"})
+def test_paid_model_without_suffix_is_not_free(monkeypatch):
+    _reset_cache(monkeypatch, {"google/gemini-2.0-flash-exp:free"})
     assert cache.is_free_model("openai/gpt-4o") is False
 
 
-def test_falls_back_to_hardcoded_set_when_cache_empty():
-    _reset_cache(set())
+def test_falls_back_to_hardcoded_set_when_cache_empty(monkeypatch):
+    _reset_cache(monkeypatch, set())
     fallback_model = next(iter(cache._FREE_MODELS_FALLBACK))
     assert cache.is_free_model(fallback_model) is True
     assert cache.is_free_model("openai/gpt-4o:free") is False
@@ -0,0 +1,96 @@
+import pytest
+from prometheus_client import CollectorRegistry, Counter
+
+from src.services.metrics.label_governor import (
+    OTHER_MODEL_LABEL,
+    GovernedMetric,
+    ModelLabelGovernor,
+)
+
+
+def _counter(governor, registry=None):
+    metric = Counter(
+        "governed_test_total",
+        "test",
+        ["provider", "model", "status"],
+        registry=registry or CollectorRegistry(),
+    )
+    return GovernedMetric(metric, governor)
+
+
+def _models(metric):
+    return {labels[1] for labels in metric._metrics}
+
+
+def test_first_k_models_are_exact_and_the_tail_is_folded():
+    governor = ModelLabelGovernor(top_k=2, rerank_seconds=3600)
+    metric = _counter(governor)
+
+    metric.labels(provider="p", model="a", status="ok").inc()
+    metric.labels("p", "b", "ok").inc()
+    metric.labels(provider="p", model="c", status="ok").inc()
+
+    assert _models(metric) == {"a", "b", OTHER_MODEL_LABEL}
+    assert governor.get_stats()["folded"] == 1
+
+
+def test_rerank_promotes_busy_tail_model_and_removes_demoted_series():
+    governor = ModelLabelGovernor(top_k=2, rerank_seconds=3600)
+    metric = _counter(governor)
+
+    metric.labels(provider="p", model="a", status="ok").inc()
+    metric.labels(provider="p", model="b", status="ok").inc()
+    for _ in range(10):
+        metric.labels(provider="p", model="c", status="ok").inc()
+        metric.labels(provider="p", model="a", status="ok").inc()
+
+    governor.rerank()
+
+    assert governor.is_admitted("c")
+    assert not governor.is_admitted("b")
+    assert "b" not in _models(metric)
+    metric.labels(provider="p", model="c", status="ok").inc()
+    metric.labels(provider="p", model="b", status="ok").inc()
+    assert _models(metric) == {"a", "c", OTHER_MODEL_LABEL}
+    assert governor.get_stats()["demotions"] == 1
+
+
+def test_rerank_runs_lazily_and_reports_stats():
+    published = []
+    governor = ModelLabelGovernor(top_k=5, rerank_seconds=0, on_rerank=published.append)
+    metric = _counter(governor)
+
+    metric.labels(provider="p", model="a", status="ok").inc()
+
+    assert published == [governor]
+    stats = governor.get_stats()
+    assert stats["reranks"] == 1
+    assert stats["series"] == 1
+
+
+def test_disabled_governor_passes_labels_through():
+    governor = ModelLabelGovernor(top_k=1, rerank_seconds=3600, enabled=False)
+    metric = _counter(governor)
+
+    metric.labels(provider="p", model="a", status="ok").inc()
+    metric.labels(provider="p", model="b", status="ok").inc()
+
+    assert _models(metric) == {"a", "b"}
+
+
+def test_wrong_labels_still_raise_like_the_collector():
+    governor = ModelLabelGovernor(top_k=1, rerank_seconds=3600)
+    metric = _counter(governor)
+
+    with pytest.raises(ValueError):
+        metric.labels(provider="p", model="a", region="x")
+
+
+def test_shared_metrics_are_governed():
+    from src.services import prometheus_metrics
+
+    assert isinstance(prometheus_metrics.tokens_used, GovernedMetric)
+    assert isinstance(prometheus_metrics.model_inference_duration, GovernedMetric)
+    prometheus_metrics.tokens_used.labels(
+        provider="test", model="test-model", token_type="input"
+    ).inc()
@@ -0,0 +1,87 @@
+import asyncio
+import random
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from src.services.metrics.latency_sketch import (
+    RELATIVE_ACCURACY,
+    LatencySketch,
+    provider_hour_pattern,
+    record_into,
+    sketch_key,
+)
+
+
+class _HashPipe:
+    """Pipeline stand-in that applies HINCRBY to in-memory hashes."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hincrby(self, key, field, amount):
+        data = self.hashes.setdefault(key, {})
+        data[field] = str(int(data.get(field, 0)) + amount)
+
+    def expire(self, key, ttl):
+        pass
+
+
+def _record(values, key="k"):
+    pipe = _HashPipe()
+    for value in values:
+        record_into(pipe, key, value)
+    return pipe.hashes[key]
+
+
+def test_quantiles_are_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(6, 1) for _ in range(5000)]
+    sketch = LatencySketch.from_hash(_record(values))
+    exact = sorted(values)
+
+    for q in (0.5, 0.9, 0.95, 0.99):
+        expected = exact[int(q * len(exact))]
+        assert sketch.quantile(q) == pytest.approx(expected, rel=RELATIVE_ACCURACY * 1.01)
+    assert sketch.count == 5000
+
+
+def test_merge_equals_sketch_of_union():
+    a, b = [10, 20, 30, 5000], [15, 25, 900]
+    merged = LatencySketch.from_hash(_record(a))
+    merged.merge(LatencySketch.from_hash(_record(b)))
+    union = LatencySketch.from_hash(_record(a + b))
+
+    assert merged.buckets == union.buckets
+    assert merged.count == union.count == 7
+    assert merged.quantile(0.99) == union.quantile(0.99)
+
+
+def test_keys_keep_model_ids_with_colons_matchable():
+    minute = datetime(2026, 10, 18, 14, 5)
+    key = sketch_key("openrouter", "vendor/model:free", minute)
+    pattern = provider_hour_pattern("openrouter", datetime(2026, 10, 18, 14))
+
+    assert key == "latsk:openrouter:202610181405:vendor/model:free"
+    assert pattern == "latsk:openrouter:2026101814??:*"
+
+
+def test_aggregator_rolls_minute_sketches_into_hourly_stats():
+    from src.services.metrics.metrics_aggregator import MetricsAggregator
+
+    redis = Mock()
+    redis.scan_iter.return_value = iter(["latsk:p:202610181401:a", "latsk:p:202610181402:b"])
+    redis.pipeline.return_value.execute.return_value = [
+        _record([100, 200]),
+        _record([300, 400]),
+    ]
+    aggregator = MetricsAggregator(redis_client=redis, supabase_client=Mock())
+
+    stats = asyncio.run(aggregator._calculate_latency_stats("p", "2026-10-18:14"))
+
+    redis.scan_iter.assert_called_once_with("latsk:p:2026101814??:*")
+    assert stats["avg"] == 250
+    assert stats["p50"] == pytest.approx(300, rel=RELATIVE_ACCURACY)
+    assert stats["min"] == pytest.approx(100, rel=RELATIVE_ACCURACY)
+    assert stats["max"] == pytest.approx(400, rel=RELATIVE_ACCURACY)
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from src.services.leader_election import LeaderElector, LeaderLease
+
+
+class FakeRedis:
+    """Just enough of SET NX and the lease scripts."""
+
+    def __init__(self):
+        self.store = {}
+        self.down = False
+
+    def set(self, key, value, nx=False, px=None):
+        if self.down:
+            raise ConnectionError("redis down")
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, owner, *args):
+        if self.down:
+            raise ConnectionError("redis down")
+        if self.store.get(key) != owner:
+            return 0
+        if "pexpire" not in script:
+            del self.store[key]
+        return 1
+
+    def expire_all(self):
+        self.store.clear()
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+def test_only_one_worker_holds_the_lease(redis):
+    a = LeaderLease("jobs", 30, client_factory=lambda: redis)
+    b = LeaderLease("jobs", 30, client_factory=lambda: redis)
+
+    assert a.try_acquire() is True
+    assert b.try_acquire() is False
+    assert a.try_acquire() is True  # renewal
+
+    a.release()
+    assert b.try_acquire() is True
+    assert redis.store["gw:leader:jobs"] == b.owner
+
+
+def test_holder_steps_down_when_redis_is_unreachable(redis):
+    a = LeaderLease("jobs", 30, client_factory=lambda: redis)
+    assert a.try_acquire() is True
+
+    redis.down = True
+    assert a.try_acquire() is False
+
+
+def test_lost_lease_is_not_renewed_or_released(redis):
+    a = LeaderLease("jobs", 30, client_factory=lambda: redis)
+    b = LeaderLease("jobs", 30, client_factory=lambda: redis)
+    a.try_acquire()
+
+    redis.expire_all()  # a's lease expired and b took over
+    b.try_acquire()
+
+    assert a.try_acquire() is False
+    a.release()
+    assert redis.store["gw:leader:jobs"] == b.owner
+
+
+def test_local_lock_fallback_without_redis(tmp_path):
+    a = LeaderLease("jobs", 30, client_factory=lambda: None, lock_dir=str(tmp_path))
+    b = LeaderLease("jobs", 30, client_factory=lambda: None, lock_dir=str(tmp_path))
+
+    assert a.try_acquire() is True
+    assert b.try_acquire() is False
+    a.release()
+    assert b.try_acquire() is True
+    b.release()
+
+
+def test_elector_starts_and_stops_jobs_on_leadership_changes(redis):
+    events = []
+
+    async def elected():
+        events.append("start")
+
+    async def deposed():
+        events.append("stop")
+
+    elector = LeaderElector(
+        LeaderLease("jobs", 30, client_factory=lambda: redis), elected, deposed, interval=1
+    )
+
+    async def run():
+        await elector.step()
+        await elector.step()
+        redis.down = True
+        await elector.step()
+        redis.down = False
+        await elector.step()
+        await elector.stop()
+
+    asyncio.run(run())
+
+    assert events == ["start", "stop", "start", "stop"]
+    assert redis.store == {}
@@ -5,8 +5,7 @@ import src.services.pricing.pricing_lookup as pl
 
 
 def _reset_cache():
-    pl._pricing_cache = None
-    pl._pricing_cache_timestamp = None
+    pl._manual_pricing.clear()
 
 
 def test_load_manual_pricing_is_not_empty():
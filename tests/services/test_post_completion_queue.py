@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+import src.services.post_completion_queue as pcq
+from src.config import Config
+from src.services.post_completion_queue import PostCompletionQueue, SpillFile
+
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "POST_COMPLETION_QUEUE_ENABLED", True)
+    monkeypatch.setattr(Config, "POST_COMPLETION_SPILL_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "POST_COMPLETION_WORKERS", 2)
+    monkeypatch.setattr(Config, "POST_COMPLETION_DRAIN_SECONDS", 1)
+    monkeypatch.setattr(pcq, "_queue", None)
+    return tmp_path
+
+
+def stream_job(request_id, **extra):
+    return {
+        "request_id": request_id,
+        "user": {"id": 1, "email": "a@example.com", "api_key": "gw_live_secret"},
+        "api_key": "gw_live_secret",
+        "api_key_id": 7,
+        "model": "gpt-4o",
+        "provider": "openai",
+        "trial": {"is_trial": False},
+        "messages": [{"role": "user", "content": "private prompt"}],
+        "accumulated_content": "private answer",
+        "prompt_tokens": 10,
+        "completion_tokens": 5,
+        "total_tokens": 15,
+        "elapsed": 0.5,
+        **extra,
+    }
+
+
+def test_billing_runs_first_and_evicts_analytics_when_full():
+    ran = []
+
+    async def job(request_id=None, tag=None, **_kwargs):
+        ran.append(tag)
+
+    async def main():
+        queue = PostCompletionQueue(max_size=2)
+        queue.submit("model_health", job, {"tag": "health-1"})
+        queue.submit("model_health", job, {"tag": "health-2"})
+        queue.submit("stream_completion", job, stream_job("r1", tag="billing"))
+        queue.submit("model_health", job, {"tag": "health-3"})
+        queue.start(1)
+        assert await queue.stop(timeout=1) == 0
+
+    asyncio.run(main())
+
+    assert ran == ["billing", "health-1"]
+
+
+def test_billing_overflow_runs_from_the_journal_record(tmp_path, monkeypatch):
+    ran = []
+
+    async def job(**kwargs):
+        ran.append(("full", kwargs["request_id"]))
+
+    async def billing(**kwargs):
+        assert "api_key" not in kwargs and "messages" not in kwargs
+        ran.append(("billing", kwargs["request_id"]))
+
+    monkeypatch.setattr(pcq, "_resolve", lambda kind: billing)
+
+    async def main():
+        queue = PostCompletionQueue(max_size=1, spill=SpillFile(tmp_path / "own.jsonl"))
+        for i in range(4):
+            queue.submit("stream_completion", job, stream_job(f"r{i}"))
+        assert queue.depth() == 1
+        queue.start(1)
+        assert await queue.stop(timeout=1) == 0
+
+    asyncio.run(main())
+
+    assert ran == [("full", "r0"), ("billing", "r1"), ("billing", "r2"), ("billing", "r3")]
+    assert not (tmp_path / "own.jsonl").exists()
+
+
+def test_journal_holds_no_keys_or_content(tmp_path):
+    async def main():
+        queue = PostCompletionQueue(max_size=10, spill=SpillFile(tmp_path / "own.jsonl"))
+        queue.submit("stream_completion", None, stream_job("r1"))
+        queue.submit("stream_completion", None, stream_job("r2", is_anonymous=True))
+        return await queue.stop(timeout=0)
+
+    assert asyncio.run(main()) == 2
+    journal = (tmp_path / "own.jsonl").read_text()
+    for secret in ("gw_live_secret", "private", "a@example.com"):
+        assert secret not in journal
+    (record,) = [json.loads(line) for line in journal.splitlines()]
+    assert record["kwargs"]["user_id"] == 1 and record["kwargs"]["total_tokens"] == 15
+
+
+def test_unfinished_jobs_are_replayed_once_by_the_next_process(spill_dir, monkeypatch):
+    replayed = []
+
+    async def billing(**kwargs):
+        replayed.append(kwargs["request_id"])
+
+    monkeypatch.setattr(pcq, "_resolve", lambda kind: billing)
+
+    async def never(**_kwargs):
+        raise AssertionError("the stopped process must not run it")
+
+    async def previous_process(name):
+        queue = PostCompletionQueue(max_size=10, spill=SpillFile(spill_dir / name))
+        queue.submit("stream_completion", never, stream_job("r1"))
+        queue.submit("stream_completion", never, stream_job("r2"))
+        return await queue.stop(timeout=0)  # no workers: both stay spilled
+
+    assert asyncio.run(previous_process("old-a.jsonl")) == 2
+    assert asyncio.run(previous_process("old-b.jsonl")) == 2  # same jobs spilled twice
+    with open(spill_dir / "old-a.jsonl", "a") as f:
+        f.write(json.dumps({"done": "stream_completion:r2"}) + "\n")
+        f.write('{"id": "torn')
+
+    async def next_process():
+        await pcq.start_post_completion_queue()
+        await pcq.stop_post_completion_queue()
+
+    asyncio.run(next_process())
+
+    assert sorted(replayed) == ["r1", "r2"]
+    assert list(spill_dir.glob("*.jsonl")) == []
+
+
+def test_replayed_analytics_stay_journaled_until_they_run(spill_dir):
+    async def previous_process():
+        queue = PostCompletionQueue(max_size=10, spill=SpillFile(spill_dir / "old.jsonl"))
+        queue.submit("model_health", None, {"request_id": "r1", "model": "gpt-4o"})
+        return await queue.stop(timeout=0)  # journaled at shutdown
+
+    async def next_process():
+        # Replays, then stops before any worker picks the job up
+        queue = PostCompletionQueue(max_size=1, spill=SpillFile(spill_dir / "new.jsonl"))
+        queue.submit("model_health", None, {"request_id": "r0"})
+        assert await pcq._replay(queue, spill_dir, spill_dir / "new.jsonl") == 1
+        return await queue.stop(timeout=0)
+
+    assert asyncio.run(previous_process()) == 1
+    assert asyncio.run(next_process()) == 2
+
+    assert not (spill_dir / "old.jsonl").exists()
+    fd = os.open(spill_dir / "new.jsonl", os.O_RDONLY)
+    try:
+        pending = {record["id"] for record in pcq.read_pending(fd)}
+    finally:
+        os.close(fd)
+    assert "model_health:r1" in pending
+
+
+def test_journaled_billing_looks_the_user_and_key_up_again(monkeypatch):
+    from src.db import api_keys, users
+    from src.handlers import post_processing
+
+    charged = {}
+
+    async def handle(**kwargs):
+        charged.update(kwargs)
+        return 0.01, True
+
+    monkeypatch.setattr(users, "get_user_by_id", lambda user_id: {"id": user_id})
+    monkeypatch.setattr(
+        api_keys, "get_api_key_by_id", lambda key_id, user_id: {"api_key": "gw_live_secret"}
+    )
+    monkeypatch.setattr(post_processing, "_handle_credits_and_usage_with_fallback", handle)
+    monkeypatch.setattr(post_processing, "increment_api_key_usage", lambda api_key: None)
+    monkeypatch.setattr(post_processing, "log_activity", lambda **kwargs: None)
+
+    record = post_processing._stream_billing_record(stream_job("r1"))
+    asyncio.run(post_processing._replay_stream_billing(**json.loads(json.dumps(record))))
+
+    assert charged["api_key"] == "gw_live_secret"
+    assert charged["user"] == {"id": 1} and charged["request_id"] == "r1"
+    assert charged["total_tokens"] == 15 and charged["elapsed_ms"] == 500
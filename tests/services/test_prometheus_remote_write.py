@@ -4,7 +4,62 @@ Comprehensive tests for Prometheus Remote Write service
 
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
+import httpx
 import pytest
+import snappy
+from prometheus_client import CollectorRegistry, Counter
+
+from src.services.metrics.prometheus_remote_write import (
+    PrometheusRemoteWriter,
+    RemoteWriteShard,
+    SegmentLog,
+    SeriesEncoder,
+    collect_series,
+    encode_timestamp,
+)
+
+URL = "http://prometheus:9090/api/v1/write"
+TIMESTAMP = encode_timestamp(1700000000000)
+
+
+def _client(responses, requests):
+    """httpx client answering with the given statuses (or raising given errors) in order."""
+
+    def handler(request):
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return httpx.Response(response)
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def _shard(responses, **kwargs):
+    requests = []
+    return RemoteWriteShard(URL, client=_client(list(responses), requests), **kwargs), requests
+
+
+def _registry(models=2):
+    """A registry with one counter: two samples (_total, _created) per model."""
+    registry = CollectorRegistry()
+    counter = Counter("requests", "Requests", ["model"], registry=registry)
+    for i in range(models):
+        counter.labels(model=f"m{i}").inc()
+    return registry, counter
+
+
+def _ship(shard, registry, now=1000.0, resend_after=240.0, max_samples=2000):
+    encoder = SeriesEncoder({"instance": "host", "job": "gatewayz"})
+    return shard.enqueue_changed(
+        collect_series(registry), encoder, TIMESTAMP, now, resend_after, max_samples
+    )
+
+
+def _queue(shard, models):
+    """Queue one batch holding two samples per model."""
+    registry, _ = _registry(models)
+    assert _ship(shard, registry) == 2 * models
 
 
 class TestPrometheusProtobuf:
@@ -134,102 +189,86 @@ class TestPrometheusRemoteWrite:
         )
 
         assert writer.remote_write_url == "http://test:9090/api/v1/write"
+        assert writer.urls == ["http://test:9090/api/v1/write"]
         assert writer.push_interval == 30
         assert writer.enabled is False
-        assert writer.client is None
-        assert writer._push_count == 0
-        assert writer._push_errors == 0
-
-    async def test_push_metrics_when_disabled(self):
-        """Test push_metrics returns False when disabled"""
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
-
-        writer = PrometheusRemoteWriter(enabled=False)
-        result = await writer.push_metrics()
+        assert writer.shards == []
 
-        assert result is False
-
-    async def test_push_metrics_when_no_client(self):
-        """Test push_metrics returns False when client is None"""
+    def test_each_url_is_a_destination(self):
+        """Test comma-separated URLs become separate destinations"""
         from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
 
-        writer = PrometheusRemoteWriter(enabled=True)
-        writer.client = None
-        result = await writer.push_metrics()
+        writer = PrometheusRemoteWriter("http://a/api/v1/write, http://b/api/v1/write")
 
-        assert result is False
+        assert writer.urls == ["http://a/api/v1/write", "http://b/api/v1/write"]
 
-    @patch("src.services.metrics.prometheus_remote_write._serialize_metrics_to_protobuf")
-    async def test_push_metrics_success(self, mock_serialize):
-        """Test successful metrics push with protobuf"""
+    async def test_start_when_disabled(self):
+        """Test start does not start threads when disabled"""
         from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
 
-        # Mock the serialization
-        mock_serialize.return_value = b"compressed_protobuf_data"
-
-        # Create a mock client
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_client.post.return_value = mock_response
+        writer = PrometheusRemoteWriter(enabled=False)
+        await writer.start()
 
-        writer = PrometheusRemoteWriter(enabled=True)
-        writer.enabled = True  # Force enable for test
-        writer.client = mock_client
+        assert writer.shards == []
+        assert writer._thread is None
 
-        result = await writer.push_metrics()
+    def test_send_success(self):
+        """Test a queued batch is posted with the remote write headers"""
+        shard, requests = _shard([200])
+        _queue(shard, 2)
 
-        assert result is True
-        assert writer._push_count == 1
-        assert writer._push_errors == 0
-        mock_client.post.assert_called_once()
+        assert shard.send_next() == 0.0
 
-    @patch("src.services.metrics.prometheus_remote_write._serialize_metrics_to_protobuf")
-    async def test_push_metrics_http_error(self, mock_serialize):
-        """Test metrics push with HTTP error"""
-        import httpx
+        assert shard.pending() == 0
+        assert shard._push_count == 1
+        assert shard._samples_sent == 4
+        assert requests[0].headers["Content-Encoding"] == "snappy"
+        assert requests[0].headers["X-Prometheus-Remote-Write-Version"] == "0.1.0"
 
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
+    def test_server_errors_are_retried_with_backoff(self):
+        """Test 5xx responses keep the batch and back off"""
+        shard, requests = _shard([500, 503, 200])
+        _queue(shard, 1)
 
-        # Mock the serialization
-        mock_serialize.return_value = b"compressed_protobuf_data"
+        assert shard.send_next() == 1.0
+        assert shard.send_next() == 2.0
+        assert shard.pending() == 1
+        assert shard._push_errors == 2
 
-        # Create a mock client that raises HTTPStatusError
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_response.text = "Internal Server Error"
-        mock_client.post.side_effect = httpx.HTTPStatusError(
-            "Server error", request=Mock(), response=mock_response
-        )
+        assert shard.send_next() == 0.0
+        assert shard.pending() == 0
+        assert len(requests) == 3
+        assert requests[0].content == requests[2].content
 
-        writer = PrometheusRemoteWriter(enabled=True)
-        writer.enabled = True  # Force enable for test
-        writer.client = mock_client
+    def test_rejected_batches_are_dropped(self):
+        """Test 4xx responses (bad data) are not retried"""
+        shard, requests = _shard([400])
+        _queue(shard, 1)
 
-        result = await writer.push_metrics()
+        assert shard.send_next() == 0.0
 
-        assert result is False
-        assert writer._push_count == 0
-        assert writer._push_errors == 1
+        assert shard.pending() == 0
+        assert shard._samples_dropped == 2
+        assert shard._push_count == 0
 
     def test_get_stats(self):
         """Test get_stats returns correct statistics"""
         from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
 
         writer = PrometheusRemoteWriter(enabled=False)
-        writer._push_count = 10
-        writer._push_errors = 2
+        shard, _ = _shard([])
+        shard._push_count = 8
+        shard._push_errors = 2
+        writer.shards = [shard]
 
         stats = writer.get_stats()
 
         assert stats["enabled"] is False
-        assert stats["push_count"] == 10
+        assert stats["push_count"] == 8
         assert stats["push_errors"] == 2
         assert stats["success_rate"] == 80.0
-        # Check circuit breaker stats are included
-        assert "circuit_breaker" in stats
-        assert stats["circuit_breaker"]["open"] is False
+        # Check circuit breaker stats are included per destination
+        assert stats["destinations"][0]["circuit_breaker"]["open"] is False
 
     def test_get_stats_no_pushes(self):
         """Test get_stats with no pushes returns 0 success rate"""
@@ -242,117 +281,79 @@ class TestPrometheusRemoteWrite:
 
     def test_circuit_breaker_initial_state(self):
         """Test circuit breaker is initially closed"""
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
-
-        writer = PrometheusRemoteWriter(enabled=True)
-        assert writer._circuit_open is False
-        assert writer._consecutive_failures == 0
-        assert writer._check_circuit_breaker() is True
+        shard, _ = _shard([])
+        assert shard._circuit_open is False
+        assert shard._consecutive_failures == 0
+        assert shard._check_circuit_breaker() is True
 
     def test_circuit_breaker_opens_after_threshold(self):
         """Test circuit breaker opens after consecutive failures"""
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
-
-        writer = PrometheusRemoteWriter(enabled=True)
+        shard, _ = _shard([])
 
         # Simulate consecutive failures up to threshold
-        for _ in range(writer.CIRCUIT_BREAKER_THRESHOLD):
-            writer._record_failure()
+        for _ in range(shard.CIRCUIT_BREAKER_THRESHOLD):
+            shard._record_failure()
 
-        assert writer._circuit_open is True
-        assert writer._consecutive_failures == writer.CIRCUIT_BREAKER_THRESHOLD
-        assert writer._check_circuit_breaker() is False
+        assert shard._circuit_open is True
+        assert shard._consecutive_failures == shard.CIRCUIT_BREAKER_THRESHOLD
+        assert shard._check_circuit_breaker() is False
 
     def test_circuit_breaker_resets_on_success(self):
         """Test circuit breaker resets after successful push"""
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
-
-        writer = PrometheusRemoteWriter(enabled=True)
+        shard, _ = _shard([])
 
         # Simulate some failures (but not enough to open circuit)
-        writer._consecutive_failures = 3
+        shard._consecutive_failures = 3
 
         # Record a success
-        writer._record_success()
+        shard._record_success()
 
-        assert writer._consecutive_failures == 0
-        assert writer._circuit_open is False
+        assert shard._consecutive_failures == 0
+        assert shard._circuit_open is False
 
     def test_circuit_breaker_closes_after_timeout(self):
         """Test circuit breaker allows retry after timeout"""
         import time
 
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
-
-        writer = PrometheusRemoteWriter(enabled=True)
+        shard, _ = _shard([])
 
         # Open the circuit
-        writer._circuit_open = True
-        writer._circuit_open_time = time.time() - writer.CIRCUIT_BREAKER_RESET_TIMEOUT - 1
+        shard._circuit_open = True
+        shard._circuit_open_time = time.time() - shard.CIRCUIT_BREAKER_RESET_TIMEOUT - 1
 
         # Check should return True and reset the circuit
-        assert writer._check_circuit_breaker() is True
-        assert writer._circuit_open is False
+        assert shard._check_circuit_breaker() is True
+        assert shard._circuit_open is False
 
-    @patch("src.services.metrics.prometheus_remote_write._serialize_metrics_to_protobuf")
-    async def test_push_metrics_skipped_when_circuit_open(self, mock_serialize):
-        """Test push_metrics is skipped when circuit is open"""
+    def test_send_skipped_when_circuit_open(self):
+        """Test nothing is posted while the circuit is open"""
         import time
 
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
-
-        writer = PrometheusRemoteWriter(enabled=True)
-        writer.client = AsyncMock()
-        writer._circuit_open = True
-        writer._circuit_open_time = time.time()  # Recent, so it won't reset
-
-        result = await writer.push_metrics()
-
-        assert result is False
-        mock_serialize.assert_not_called()
-        writer.client.post.assert_not_called()
+        shard, requests = _shard([200])
+        _queue(shard, 1)
+        shard._circuit_open = True
+        shard._circuit_open_time = time.time()  # Recent, so it won't reset
 
-    @patch("src.services.metrics.prometheus_remote_write._serialize_metrics_to_protobuf")
-    async def test_circuit_breaker_opens_on_connection_errors(self, mock_serialize):
-        """Test circuit breaker opens after repeated connection errors"""
-        import httpx
+        assert shard.send_next() > 0
 
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
-
-        mock_serialize.return_value = b"compressed_data"
+        assert requests == []
+        assert shard.pending() == 1
 
-        writer = PrometheusRemoteWriter(enabled=True)
-        mock_client = AsyncMock()
-        mock_client.post.side_effect = httpx.ConnectError("Connection refused")
-        writer.client = mock_client
+    @pytest.mark.parametrize(
+        "error", [httpx.ConnectError("Connection refused"), httpx.ReadTimeout("timeout")]
+    )
+    def test_circuit_breaker_opens_on_connection_errors(self, error):
+        """Test circuit breaker opens after repeated connection errors and timeouts"""
+        shard, _ = _shard([error] * 5)
+        _queue(shard, 1)
 
         # Push until circuit opens
-        for _ in range(writer.CIRCUIT_BREAKER_THRESHOLD):
-            await writer.push_metrics()
-
-        assert writer._circuit_open is True
-        assert writer._push_errors == writer.CIRCUIT_BREAKER_THRESHOLD
+        for _ in range(shard.CIRCUIT_BREAKER_THRESHOLD):
+            shard.send_next()
 
-    @patch("src.services.metrics.prometheus_remote_write._serialize_metrics_to_protobuf")
-    async def test_circuit_breaker_opens_on_timeout_errors(self, mock_serialize):
-        """Test circuit breaker opens after repeated timeout errors"""
-        import httpx
-
-        from src.services.metrics.prometheus_remote_write import PrometheusRemoteWriter
-
-        mock_serialize.return_value = b"compressed_data"
-
-        writer = PrometheusRemoteWriter(enabled=True)
-        mock_client = AsyncMock()
-        mock_client.post.side_effect = httpx.TimeoutException("Request timeout")
-        writer.client = mock_client
-
-        # Push until circuit opens
-        for _ in range(writer.CIRCUIT_BREAKER_THRESHOLD):
-            await writer.push_metrics()
-
-        assert writer._circuit_open is True
-        assert writer._push_errors == writer.CIRCUIT_BREAKER_THRESHOLD
+        assert shard._circuit_open is True
+        assert shard._push_errors == shard.CIRCUIT_BREAKER_THRESHOLD
+        assert shard.pending() == 1
 
     @patch("src.services.metrics.prometheus_remote_write.Config")
     async def test_init_prometheus_remote_write_disabled(self, mock_config):
@@ -388,6 +389,9 @@ class TestPrometheusRemoteWrite:
 
         mock_config.PROMETHEUS_ENABLED = True
         mock_config.PROMETHEUS_REMOTE_WRITE_URL = "http://test:9090/api/v1/write"
+        mock_config.PROMETHEUS_REMOTE_WRITE_INTERVAL_SECONDS = 30
+        mock_config.PROMETHEUS_REMOTE_WRITE_MAX_SAMPLES_PER_SEND = 2000
+        mock_config.PROMETHEUS_REMOTE_WRITE_MAX_PENDING_BATCHES = 100
 
         # Mock the start method
         with patch.object(
@@ -589,3 +593,121 @@ class TestLabelSorting:
         # This should not raise and should produce valid compressed bytes
         result = _serialize_metrics_to_protobuf(mock_registry)
         assert isinstance(result, bytes)
+
+
+class TestIncrementalShipping:
+    """Only changed series are shipped, in bounded batches, with backpressure and a WAL"""
+
+    def test_encoded_series_match_the_protobuf_messages(self):
+        from src.services.prometheus_pb2 import Label, Sample, TimeSeries, WriteRequest
+
+        encoder = SeriesEncoder({"instance": "host", "job": "gatewayz"})
+        key = ("requests_total", (("model", "m0"), ("provider", "p")))
+
+        labels = {
+            "__name__": "requests_total",
+            "instance": "host",
+            "job": "gatewayz",
+            "model": "m0",
+            "provider": "p",
+        }
+        ts = TimeSeries()
+        for name in sorted(labels):
+            ts.labels.append(Label(name=name, value=labels[name]))
+        ts.samples.append(Sample(value=42.5, timestamp=1700000000000))
+        request = WriteRequest()
+        request.timeseries.append(ts)
+
+        assert encoder.series(key, 42.5, TIMESTAMP) == request.SerializeToString()
+
+    def test_only_changed_series_are_queued(self):
+        registry, counter = _registry(models=2)
+        shard, _ = _shard([])
+
+        assert _ship(shard, registry) == 4
+        # Same instant: first sends are jittered back by up to a resend window
+        assert _ship(shard, registry) == 0
+
+        counter.labels(model="m1").inc()
+        assert _ship(shard, registry) == 1
+        assert shard.pending() == 2
+
+    def test_unchanged_series_are_resent_before_they_go_stale(self):
+        registry, _ = _registry(models=2)
+        shard, _ = _shard([])
+
+        _ship(shard, registry, now=1000, resend_after=100)
+
+        assert _ship(shard, registry, now=1100, resend_after=100) == 4
+
+    def test_batches_are_bounded_and_compressed(self):
+        registry, _ = _registry(models=3)
+        shard, _ = _shard([])
+        encoder = SeriesEncoder({"instance": "host", "job": "gatewayz"})
+        snapshot = collect_series(registry)
+
+        shard.enqueue_changed(snapshot, encoder, TIMESTAMP, 1000, 240, 4)
+
+        batches = list(shard._pending)
+        assert [b.samples for b in batches] == [4, 2]
+        body = b"".join(snappy.uncompress(b.payload) for b in batches)
+        assert body == b"".join(encoder.series(k, v, TIMESTAMP) for k, v in snapshot)
+
+    def test_full_queue_leaves_series_for_the_next_collection(self):
+        registry, _ = _registry(models=2)
+        shard, _ = _shard([200], max_pending_batches=1)
+
+        assert _ship(shard, registry, max_samples=2) == 2
+        assert shard.send_next() == 0.0
+
+        assert _ship(shard, registry, now=1030, max_samples=2) == 2
+        assert _ship(shard, registry, now=1060, max_samples=2) == 0
+
+    def test_writer_ships_to_every_destination(self):
+        registry, counter = _registry(models=1)
+        writer = PrometheusRemoteWriter("http://a/w,http://b/w", registry=registry)
+        writer.shards = [_shard([])[0], _shard([])[0]]
+
+        assert writer.ship() == 4
+        counter.labels(model="m0").inc()
+        assert writer.ship() == 2
+        assert writer.get_stats()["series"] == 2
+
+    def test_unsent_batches_are_replayed_by_the_next_process(self, tmp_path):
+        registry, _ = _registry(models=1)
+        crashed, _ = _shard([], wal=SegmentLog(tmp_path / "dest"))
+        _ship(crashed, registry)
+        payload = crashed._pending[0].payload
+        crashed.wal.close()  # lock released, segment left behind
+
+        shard, requests = _shard([200], wal=SegmentLog(tmp_path / "dest"))
+
+        assert shard.pending() == 1
+        assert shard.send_next() == 0.0
+        assert requests[0].content == payload
+        assert list((tmp_path / "dest").rglob("*.seg")) == []
+
+    def test_segments_of_a_running_process_are_not_claimed(self, tmp_path):
+        registry, _ = _registry(models=1)
+        running, _ = _shard([], wal=SegmentLog(tmp_path / "dest"))
+        _ship(running, registry)
+
+        other, _ = _shard([], wal=SegmentLog(tmp_path / "dest"))
+
+        assert other.pending() == 0
+        assert len(list(running.wal.directory.glob("*.seg"))) == 1
+
+    async def test_stop_ships_final_values_and_keeps_undelivered_batches(self, tmp_path):
+        registry, _ = _registry(models=1)
+        writer = PrometheusRemoteWriter(
+            "http://127.0.0.1:1/api/v1/write",  # nothing listens there
+            push_interval=3600,
+            registry=registry,
+            wal_dir=str(tmp_path),
+        )
+
+        await writer.start()
+        await writer.stop(timeout=1)
+
+        assert writer.get_stats()["collections"] == 1
+        assert len(list(tmp_path.rglob("*.seg"))) == 1
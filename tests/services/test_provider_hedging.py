@@ -0,0 +1,147 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.config import Config
+from src.services import provider_hedging
+from src.services.provider_hedging import (
+    HedgeBudget,
+    HedgeLostError,
+    SettlementGate,
+    hedge_delay,
+    hedge_partner,
+    hedged_request,
+    race_first_chunk,
+    record_latency,
+)
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    monkeypatch.setattr(Config, "PROVIDER_HEDGING_ENABLED", True)
+    monkeypatch.setattr(Config, "PROVIDER_HEDGE_MIN_DELAY_MS", 10)
+    monkeypatch.setattr(Config, "PROVIDER_HEDGE_DEFAULT_DELAY_MS", 20)
+    monkeypatch.setattr(provider_hedging, "_latencies", {})
+    budget = HedgeBudget(ratio=1.0)
+    monkeypatch.setattr(provider_hedging, "_budget", budget)
+    return budget
+
+
+def _attempts(delays, calls, billed):
+    async def attempt(provider, gate):
+        calls.append(provider)
+        await asyncio.sleep(delays[provider])
+        if not gate.claim(provider):
+            raise HedgeLostError(provider)
+        billed.append(provider)
+        return provider
+
+    return attempt
+
+
+def test_fast_primary_is_not_hedged(hedging):
+    calls, billed = [], []
+    attempt = _attempts({"a": 0, "b": 0}, calls, billed)
+    hedge_partner(["a", "b"], 0, streaming=False)
+
+    assert asyncio.run(hedged_request(attempt, "a", "b", "m")) == "a"
+    assert calls == ["a"]
+    assert hedging.tokens == 1.0
+
+
+def test_slow_primary_is_hedged_and_only_winner_billed(hedging):
+    calls, billed = [], []
+    attempt = _attempts({"a": 1.0, "b": 0}, calls, billed)
+    hedge_partner(["a", "b"], 0, streaming=False)
+
+    assert asyncio.run(hedged_request(attempt, "a", "b", "m")) == "b"
+    assert calls == ["a", "b"]
+    assert billed == ["b"]
+
+
+def test_hedge_needs_budget(hedging):
+    hedging.ratio = 0.05
+    calls, billed, fired = [], [], []
+    attempt = _attempts({"a": 0.05, "b": 0}, calls, billed)
+    hedge_partner(["a", "b"], 0, streaming=False)
+
+    result = hedged_request(attempt, "a", "b", "m", on_hedge=lambda: fired.append("b"))
+    assert asyncio.run(result) == "a"
+    assert calls == ["a"]
+    assert fired == []
+
+
+def test_on_hedge_reports_only_fired_hedges(hedging):
+    fired = []
+    attempt = _attempts({"a": 1.0, "b": 0}, [], [])
+    hedge_partner(["a", "b"], 0, streaming=False)
+
+    asyncio.run(hedged_request(attempt, "a", "b", "m", on_hedge=lambda: fired.append("b")))
+    assert fired == ["b"]
+
+
+def test_partner_requires_opt_in_and_two_providers(hedging, monkeypatch):
+    assert hedge_partner(["a"], 0, streaming=False) is None
+    assert hedge_partner(["a", "b", "c"], 1, streaming=False) is None
+    assert hedge_partner(["a", "b"], 0, streaming=True) == "b"
+
+    monkeypatch.setattr(Config, "PROVIDER_HEDGING_ENABLED", False)
+    assert hedge_partner(["a", "b"], 0, streaming=False) is None
+
+
+def test_delay_tracks_model_p95(hedging):
+    assert hedge_delay("m") == pytest.approx(0.02)
+    for i in range(100):
+        record_latency("m", 0.1 if i < 97 else 5.0)
+    assert hedge_delay("m") == pytest.approx(0.1, rel=0.02)
+
+
+def test_stream_race_forwards_only_the_winner(hedging):
+    closed = []
+
+    async def stream(name, delay):
+        try:
+            await asyncio.sleep(delay)
+            for i in range(3):
+                yield f"{name}{i}"
+        finally:
+            closed.append(name)
+
+    async def consume():
+        return [chunk async for chunk in race_first_chunk(stream("a", 1.0), stream("b", 0))]
+
+    hedge_partner(["a", "b"], 0, streaming=True)
+    assert asyncio.run(consume()) == ["b0", "b1", "b2"]
+    assert sorted(closed) == ["a", "b"]
+
+
+def test_stream_race_falls_back_when_hedge_fails(hedging):
+    async def good():
+        await asyncio.sleep(0.01)
+        yield "a0"
+
+    async def bad():
+        raise RuntimeError("boom")
+        yield  # pragma: no cover
+
+    async def consume():
+        return [chunk async for chunk in race_first_chunk(good(), bad())]
+
+    hedge_partner(["a", "b"], 0, streaming=True)
+    assert asyncio.run(consume()) == ["a0"]
+
+
+def test_handler_refuses_to_bill_a_lost_attempt():
+    from src.handlers.chat_handler import ChatInferenceHandler
+
+    gate = SettlementGate()
+    winner = ChatInferenceHandler("key")
+    loser = ChatInferenceHandler("key")
+    winner.settlement_gate = loser.settlement_gate = gate
+
+    with patch.object(ChatInferenceHandler, "_settle_request", AsyncMock(return_value=True)):
+        asyncio.run(winner._charge_and_record(1.0, 0.5, 0.5, "m", "a", 1, 1))
+        with pytest.raises(HedgeLostError):
+            asyncio.run(loser._charge_and_record(1.0, 0.5, 0.5, "m", "b", 1, 1))
+        assert ChatInferenceHandler._settle_request.await_count == 1
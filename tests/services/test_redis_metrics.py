@@ -16,9 +16,19 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from src.services.metrics.latency_sketch import bucket_index
 from src.services.redis_metrics import RedisMetrics, RequestMetrics
 
 
+def _sketch_hash(latencies):
+    """Raw Redis hash of a latency sketch holding ``latencies``."""
+    data = {"n": str(len(latencies)), "s": str(sum(latencies))}
+    for latency in latencies:
+        field = f"b{bucket_index(latency)}"
+        data[field] = str(int(data.get(field, 0)) + 1)
+    return data
+
+
 @pytest.fixture
 def mock_redis_client():
     """Mock Redis client"""
@@ -33,7 +43,8 @@ def mock_redis_client():
     pipeline.zremrangebyscore = Mock(return_value=pipeline)
     pipeline.lpush = Mock(return_value=pipeline)
     pipeline.ltrim = Mock(return_value=pipeline)
-    pipeline.execute = AsyncMock(return_value=[])
+    pipeline.hgetall = Mock(return_value=pipeline)
+    pipeline.execute = Mock(return_value=[])
 
     client.pipeline = Mock(return_value=pipeline)
 
@@ -62,7 +73,6 @@ def mock_redis_client():
             "total_cost": "12.5",
         }
     )
-    client.zrange = Mock(return_value=["500", "550", "600", "800"])
     client.scan_iter = Mock(
         return_value=iter(["metrics:openrouter:2025-11-27:14", "metrics:openrouter:2025-11-27:13"])
     )
@@ -97,8 +107,9 @@ class TestRecordRequest:
         pipeline = mock_redis_client.pipeline.return_value
         assert pipeline.hincrby.called
         assert pipeline.hincrbyfloat.called
-        assert pipeline.zadd.called
-        assert pipeline.execute.called
+        assert pipeline.eval.call_args.args[2:] == ("provider_health", "openrouter", 2)
+        assert pipeline.execute.call_count == 1
+        mock_redis_client.zscore.assert_not_called()  # no extra round-trip
 
     @pytest.mark.asyncio
     async def test_record_failed_request(self, redis_metrics, mock_redis_client):
@@ -222,6 +233,9 @@ class TestLatencyPercentiles:
     @pytest.mark.asyncio
     async def test_get_latency_percentiles(self, redis_metrics, mock_redis_client):
         """Test calculating latency percentiles"""
+        pipeline = mock_redis_client.pipeline.return_value
+        pipeline.execute.return_value = [_sketch_hash([500, 550]), {}, _sketch_hash([600, 800])]
+
         result = await redis_metrics.get_latency_percentiles(
             "openrouter", "gpt-4", percentiles=[50, 95, 99]
         )
@@ -232,11 +246,29 @@ class TestLatencyPercentiles:
         assert "p95" in result
         assert "p99" in result
         assert result["count"] == 4  # 4 values in mock
+        assert result["avg"] == 612.5
+        assert result["p99"] == pytest.approx(800, rel=0.01)
+        # One HGETALL per minute of the default one-hour window
+        assert pipeline.hgetall.call_count == 60
+
+    @pytest.mark.asyncio
+    async def test_identical_latencies_are_all_counted(self, redis_metrics, mock_redis_client):
+        """Equal latencies no longer collide (sorted-set members were deduplicated)"""
+        pipeline = mock_redis_client.pipeline.return_value
+        pipeline.execute.return_value = [_sketch_hash([100] * 9 + [5000])]
+
+        result = await redis_metrics.get_latency_percentiles(
+            "openrouter", "gpt-4", percentiles=[50, 95]
+        )
+
+        assert result["count"] == 10
+        assert result["p50"] == pytest.approx(100, rel=0.01)
+        assert result["p95"] == pytest.approx(5000, rel=0.01)
 
     @pytest.mark.asyncio
     async def test_get_latency_percentiles_no_data(self, redis_metrics, mock_redis_client):
         """Test percentiles when no data exists"""
-        mock_redis_client.zrange.return_value = []
+        mock_redis_client.pipeline.return_value.execute.return_value = [{}] * 60
 
         result = await redis_metrics.get_latency_percentiles(
             "openrouter", "gpt-4", percentiles=[50, 95, 99]
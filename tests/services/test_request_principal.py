@@ -0,0 +1,236 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.db.rate_limits import DEFAULT_KEY_RATE_LIMIT_CONFIG
+from src.services import request_principal as rp
+
+
+def _doc(user_id=1, **overrides):
+    doc = {
+        "key": {
+            "id": 10,
+            "key_name": "default",
+            "environment_tag": "live",
+            "scope_permissions": {"read": ["*"]},
+            "is_primary": True,
+            "rate_limit_config": None,
+        },
+        "user": {
+            "id": user_id,
+            "tier": "pro",
+            "subscription_allowance": 5,
+            "purchased_credits": 2.5,
+            "settings": {"routing_mode": "price"},
+        },
+        "user_plan": {
+            "id": 3,
+            "plan_id": 7,
+            "started_at": "2026-10-01T00:00:00+00:00",
+            "expires_at": None,
+            "is_active": True,
+        },
+        "plan": {
+            "id": 7,
+            "name": "Pro",
+            "plan_type": "pro",
+            "daily_request_limit": 100,
+            "monthly_request_limit": 1000,
+            "daily_token_limit": 10000,
+            "monthly_token_limit": 100000,
+            "price_per_month": 10,
+            "features": [],
+        },
+        "is_admin": False,
+        "usage": {
+            "daily_requests": 4,
+            "daily_tokens": 40,
+            "monthly_requests": 9,
+            "monthly_tokens": 90,
+        },
+        "rate_limit_configs_row": None,
+        "routing_policy": {"api_key_id": 10, "mode": "cheapest"},
+        "byok_providers": ["openai"],
+    }
+    doc.update(overrides)
+    return doc
+
+
+@pytest.fixture(autouse=True)
+def _enabled(monkeypatch):
+    monkeypatch.setattr(rp.Config, "REQUEST_PRINCIPAL_ENABLED", True)
+    monkeypatch.setattr(rp.Config, "REQUEST_PRINCIPAL_TTL_SECONDS", 60)
+    monkeypatch.setattr(rp.Config, "REQUEST_PRINCIPAL_MAX_ENTRIES", 100)
+    rp.clear_request_principal_cache()
+    yield
+    rp.clear_request_principal_cache()
+
+
+def _load(api_key="gw_live_a", **overrides):
+    with patch(
+        "src.db.request_principal.fetch_request_principal", return_value=_doc(**overrides)
+    ) as fetch:
+        principal = rp.get_request_principal(api_key)
+    return principal, fetch
+
+
+def test_build_enriches_user_like_get_user():
+    principal = rp.build_request_principal("gw_live_a", _doc())
+
+    assert principal.api_key_id == 10
+    assert principal.user["key_id"] == 10
+    assert principal.user["api_key"] == "gw_live_a"
+    assert principal.user["environment_tag"] == "live"
+    assert principal.balance == 7.5
+    assert principal.plan["plan_name"] == "Pro"
+    assert principal.plan["daily_request_limit"] == 100
+    assert principal.rate_limit_config == DEFAULT_KEY_RATE_LIMIT_CONFIG
+    assert principal.routing_preferences[0] == "price"
+    assert principal.has_byok_key("openai")
+    assert not principal.has_byok_key("anthropic")
+
+
+def test_rate_limit_config_prefers_key_column_then_table_row():
+    from_key = rp.build_request_principal(
+        "k",
+        _doc(
+            key={"id": 10, "rate_limit_config": {"requests_per_minute": 5}},
+            rate_limit_configs_row={"max_requests": 99, "window_seconds": 60},
+        ),
+    )
+    from_row = rp.build_request_principal(
+        "k", _doc(rate_limit_configs_row={"max_requests": 99, "window_seconds": 60})
+    )
+
+    assert from_key.rate_limit_config == {"requests_per_minute": 5}
+    assert from_row.rate_limit_config["requests_per_hour"] == 99
+
+
+def test_second_load_is_served_from_cache():
+    first, fetch = _load()
+    assert fetch.call_count == 1
+
+    with patch("src.db.request_principal.fetch_request_principal") as fetch_again:
+        second = rp.get_request_principal("gw_live_a")
+
+    fetch_again.assert_not_called()
+    assert second is first
+    assert rp.get_request_principal_cache_stats()["hits"] == 1
+
+
+def test_peek_for_user_finds_any_key():
+    principal, _ = _load()
+    assert rp.peek_request_principal_for_user(1) is principal
+    assert rp.peek_request_principal_for_user(2) is None
+
+
+def test_expired_principal_is_not_returned(monkeypatch):
+    _load()
+    monkeypatch.setattr(rp.Config, "REQUEST_PRINCIPAL_TTL_SECONDS", 0)
+    assert rp.peek_request_principal("gw_live_a") is None
+    assert rp.peek_request_principal_for_user(1) is None
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(rp.Config, "REQUEST_PRINCIPAL_MAX_ENTRIES", 2)
+    _load("k1", user_id=1)
+    _load("k2", user_id=2)
+    _load("k3", user_id=3)
+
+    assert rp.peek_request_principal("k1") is None
+    assert rp.peek_request_principal_for_user(1) is None
+    assert rp.peek_request_principal("k3") is not None
+
+
+def test_invalidate_by_user_drops_every_key():
+    _load("k1", user_id=1)
+    _load("k2", user_id=1)
+    _load("k3", user_id=2)
+
+    rp.invalidate_request_principal(user_id=1)
+
+    assert rp.peek_request_principal("k1") is None
+    assert rp.peek_request_principal("k2") is None
+    assert rp.peek_request_principal("k3") is not None
+
+
+def test_disabled_never_loads(monkeypatch):
+    monkeypatch.setattr(rp.Config, "REQUEST_PRINCIPAL_ENABLED", False)
+    with patch("src.db.request_principal.fetch_request_principal") as fetch:
+        assert rp.get_request_principal("gw_live_a") is None
+    fetch.assert_not_called()
+
+
+def test_rpc_failure_falls_back_to_none():
+    with patch(
+        "src.db.request_principal.fetch_request_principal", side_effect=RuntimeError("no rpc")
+    ):
+        assert rp.get_request_principal("gw_live_a") is None
+    assert rp.get_request_principal_cache_stats()["load_errors"] == 1
+
+
+def test_accessors_read_snapshot_without_db():
+    from src.db import plans, users
+
+    _load()
+    with (
+        patch("src.db.plans.get_supabase_client") as plans_client,
+        patch("src.db.users.get_supabase_client") as users_client,
+    ):
+        user = users.get_user("gw_live_a")
+        plan = plans.get_user_plan(1)
+        usage = plans.get_user_usage_within_plan_limits(1)
+        is_admin = plans.is_admin_tier_user(1)
+
+    plans_client.assert_not_called()
+    users_client.assert_not_called()
+    assert user["id"] == 1
+    assert plan["plan_name"] == "Pro"
+    assert usage["usage"]["daily_requests"] == 4
+    assert is_admin is False
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        # Legacy/temporary key: no api_keys_new row
+        {"key": None},
+        # Balance still only in the legacy credits column
+        {"user": {"id": 1, "credits": 3, "subscription_allowance": 0, "purchased_credits": 0}},
+    ],
+)
+def test_get_user_takes_the_lookup_path_for_legacy_state(overrides):
+    from src.db import users
+
+    _load(**overrides)
+    users._user_cache.pop("gw_live_a", None)
+    with patch("src.db.users._get_user_uncached", return_value={"id": 1}) as lookup:
+        assert users.get_user("gw_live_a") == {"id": 1}
+    lookup.assert_called_once_with("gw_live_a")
+    users._user_cache.pop("gw_live_a", None)
+
+
+def test_byok_skips_lookup_when_user_has_no_key_for_provider():
+    from src.services.byok import resolve_byok_key
+
+    _load()
+    with patch("src.db.user_provider_keys.get_decrypted_provider_key") as lookup:
+        assert resolve_byok_key(1, "anthropic") is None
+    lookup.assert_not_called()
+
+
+def test_credit_invalidation_hook_drops_principal():
+    from src.db.users import invalidate_user_cache_by_id
+
+    _load()
+    invalidate_user_cache_by_id(1)
+    assert rp.peek_request_principal("gw_live_a") is None
+
+
+def test_fetch_normalizes_list_payload():
+    from src.db import request_principal as db_rp
+
+    client = MagicMock()
+    client.rpc.return_value.execute.return_value.data = [_doc()]
+    with patch.object(db_rp, "get_supabase_client", return_value=client):
+        assert db_rp.fetch_request_principal("k")["user"]["id"] == 1
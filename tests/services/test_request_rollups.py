@@ -0,0 +1,126 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+import src.db.request_rollups as rollups_db
+import src.services.request_rollups as rollups
+from src.config import Config
+from src.services.request_rollups import RequestRollupAggregator, record_request
+
+NOW = datetime(2026, 10, 18, 12, 30, 15, tzinfo=UTC)
+
+
+def _add(aggregator, now=NOW, **overrides):
+    fields = {
+        "model_id": 7,
+        "user_id": 42,
+        "status": "completed",
+        "input_tokens": 10,
+        "output_tokens": 20,
+        "cost_usd": 0.5,
+        "processing_time_ms": 300,
+    }
+    fields.update(overrides)
+    return aggregator.add(now=now, **fields)
+
+
+def test_requests_in_the_same_minute_share_one_delta():
+    aggregator = RequestRollupAggregator(max_keys=100)
+    _add(aggregator)
+    _add(aggregator, now=NOW + timedelta(seconds=30), status="failed", processing_time_ms=70000)
+    _add(aggregator, now=NOW + timedelta(minutes=1))
+    _add(aggregator, user_id=None)
+
+    rows = {(r["minute"], r["user_id"]): r for r in aggregator.drain()}
+
+    assert len(rows) == 3
+    merged = rows[("2026-10-18T12:30:00+00:00", 42)]
+    assert merged["requests"] == 2
+    assert merged["errors"] == 1
+    assert merged["input_tokens"] == 20
+    assert merged["output_tokens"] == 40
+    assert merged["cost_usd"] == 1.0
+    assert merged["latency_ms_sum"] == 70300
+    assert merged["latency_hist"] == [0, 0, 1, 0, 0, 0, 0, 0, 0, 1]
+    assert merged["first_request_at"] < merged["last_request_at"]
+    assert ("2026-10-18T12:30:00+00:00", -1) in rows
+    assert aggregator.pending_keys() == 0
+
+
+def test_unresolved_models_are_looked_up_once_at_flush(monkeypatch):
+    lookups = []
+
+    def lookup(model_name, provider_name=None):
+        lookups.append((model_name, provider_name))
+        return 99
+
+    import src.db.chat_completion_requests as ccr
+
+    monkeypatch.setattr(ccr, "get_model_id_by_name", lookup)
+    aggregator = RequestRollupAggregator(max_keys=100)
+    _add(aggregator, model_id=None, model_name="openai/gpt-4o", provider_name="openrouter")
+    _add(aggregator, model_id=None, model_name="openai/gpt-4o", provider_name="openrouter")
+    first = aggregator.drain()
+    _add(aggregator, model_id=None, model_name="openai/gpt-4o", provider_name="openrouter")
+    second = aggregator.drain()
+
+    assert [r["model_id"] for r in first + second] == [99, 99]
+    assert first[0]["requests"] == 2
+    assert lookups == [("openai/gpt-4o", "openrouter")]
+
+
+def test_new_keys_are_dropped_past_twice_the_limit():
+    aggregator = RequestRollupAggregator(max_keys=2)
+    results = [_add(aggregator, user_id=i) for i in range(5)]
+
+    assert results == [True, True, True, True, False]
+    assert _add(aggregator, user_id=0) is True  # existing key still accumulates
+    assert aggregator.get_stats()["dropped"] == 1
+
+
+def test_flush_batches_and_stops_when_not_deployed(monkeypatch):
+    calls = []
+
+    def apply(rows):
+        calls.append(len(rows))
+        return None if len(calls) == 2 else len(rows) * 6
+
+    monkeypatch.setattr(rollups_db, "apply_rollup_deltas", apply)
+    monkeypatch.setattr(rollups, "_FLUSH_BATCH", 2)
+    aggregator = RequestRollupAggregator(max_keys=100)
+    for i in range(5):
+        _add(aggregator, user_id=i)
+
+    assert aggregator.flush_sync() == 12
+    assert calls == [2, 2]
+    assert aggregator.get_stats()["rows_written"] == 12
+
+
+def test_record_request_is_collected_only_while_running(monkeypatch):
+    flushed = []
+    monkeypatch.setattr(rollups_db, "apply_rollup_deltas", lambda rows: flushed.extend(rows) or 0)
+    monkeypatch.setattr(Config, "REQUEST_ROLLUPS_ENABLED", True)
+    monkeypatch.setattr(Config, "REQUEST_ROLLUPS_FLUSH_SECONDS", 60)
+
+    record_request(model_id=1, user_id=1, status="completed")
+
+    async def main():
+        rollups.start_request_rollups()
+        record_request(model_id=1, user_id=1, status="completed", input_tokens=5)
+        await rollups.stop_request_rollups()
+
+    asyncio.run(main())
+    record_request(model_id=1, user_id=1, status="completed")
+
+    assert len(flushed) == 1
+    assert flushed[0]["requests"] == 1
+    assert flushed[0]["input_tokens"] == 5
+    assert rollups.get_request_rollup_aggregator() is None
+
+
+@pytest.mark.parametrize(
+    "latency,slot", [(0, 0), (99.9, 0), (100, 1), (999, 3), (60000, 9), (10**7, 9)]
+)
+def test_latency_slots_match_width_bucket(latency, slot):
+    assert rollups_db.latency_slot(latency) == slot
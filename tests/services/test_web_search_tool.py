@@ -15,15 +15,27 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import httpx
 import pytest
 
+from src.services.cache import web_search_cache
 from src.services.tools import (
     AVAILABLE_TOOLS,
     execute_tool,
     get_tool_by_name,
 )
 from src.services.tools.base import ToolResult
+from src.services.tools import web_search as web_search_module
 from src.services.tools.web_search import WebSearchTool
 
 
+@pytest.fixture(autouse=True)
+def _reset_web_search_state():
+    """Each test gets a fresh pooled client and an empty result cache."""
+    web_search_module._http_client = None
+    web_search_cache.clear_web_search_cache()
+    yield
+    web_search_module._http_client = None
+    web_search_cache.clear_web_search_cache()
+
+
 class TestWebSearchToolDefinition:
     """Tests for WebSearchTool definition."""
 
@@ -103,7 +115,7 @@ class TestWebSearchToolExecution:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.return_value = mock_response
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 tool = WebSearchTool()
                 result = await tool.execute(query="test query")
@@ -159,7 +171,7 @@ class TestWebSearchToolExecution:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.return_value = mock_response
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 tool = WebSearchTool()
                 result = await tool.execute(query="test query")
@@ -180,7 +192,7 @@ class TestWebSearchToolExecution:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.return_value = mock_response
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 tool = WebSearchTool()
                 result = await tool.execute(query="test query")
@@ -198,7 +210,7 @@ class TestWebSearchToolExecution:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.side_effect = httpx.TimeoutException("Request timed out")
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 tool = WebSearchTool()
                 result = await tool.execute(query="test query")
@@ -216,7 +228,7 @@ class TestWebSearchToolExecution:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.side_effect = httpx.RequestError("Connection failed")
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 tool = WebSearchTool()
                 result = await tool.execute(query="test query")
@@ -248,7 +260,7 @@ class TestWebSearchToolExecution:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.return_value = mock_response
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 tool = WebSearchTool()
                 result = await tool.execute(
@@ -285,7 +297,7 @@ class TestWebSearchToolExecution:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.return_value = mock_response
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 tool = WebSearchTool()
 
@@ -312,7 +324,7 @@ class TestWebSearchToolExecution:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.return_value = mock_response
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 tool = WebSearchTool()
                 result = await tool.execute(query="very obscure query")
@@ -349,7 +361,7 @@ class TestWebSearchToolIntegration:
             with patch("httpx.AsyncClient") as mock_client:
                 mock_client_instance = AsyncMock()
                 mock_client_instance.post.return_value = mock_response
-                mock_client.return_value.__aenter__.return_value = mock_client_instance
+                mock_client.return_value = mock_client_instance
 
                 result = await execute_tool("web_search", {"query": "test"})
 
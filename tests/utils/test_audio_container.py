@@ -0,0 +1,145 @@
+import asyncio
+import base64
+import io
+import math
+import wave
+from array import array
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config import Config
+from src.routes.audio import _transcribe_audio
+from src.utils.audio_container import (
+    AudioTooLarge,
+    probe_duration_seconds,
+    split_wav_at_silence,
+    spool_base64,
+    spool_upload,
+)
+
+RATE = 8000
+
+
+def _tone(seconds):
+    return array("h", (int(8000 * math.sin(i / 3)) for i in range(int(seconds * RATE))))
+
+
+def _silence(seconds):
+    return array("h", bytes(2 * int(seconds * RATE)))
+
+
+def _wav(*parts):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        for part in parts:
+            w.writeframes(part.tobytes())
+    buf.seek(0)
+    return buf
+
+
+def _frames(f):
+    with wave.open(f, "rb") as w:
+        return w.getnframes()
+
+
+def test_wav_duration_is_read_from_the_header():
+    audio = _wav(_tone(2.5))
+
+    assert probe_duration_seconds(audio, ".wav") == pytest.approx(2.5)
+    assert audio.tell() == 0
+
+
+def test_unknown_container_has_no_duration():
+    assert probe_duration_seconds(io.BytesIO(b"\x00" * 1000), ".mp3") is None
+
+
+def test_mp3_cbr_duration_from_frame_header():
+    # MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417-byte frames
+    frame = b"\xff\xfb\x90\x00" + b"\x00" * 413
+    audio = io.BytesIO(frame * 100)
+
+    assert probe_duration_seconds(audio, ".mp3") == pytest.approx(100 * 417 * 8 / 128000, rel=0.01)
+
+
+def test_split_cuts_at_the_silent_gap():
+    audio = _wav(_tone(6), _silence(0.5), _tone(6))
+
+    chunks = split_wav_at_silence(audio, target_seconds=8, max_chunk_bytes=10**9, search_seconds=4)
+    try:
+        assert len(chunks) == 2
+        first_start, first = chunks[0]
+        second_start, second = chunks[1]
+        assert first_start == 0
+        assert 6.0 <= second_start <= 6.5
+        assert _frames(first) + _frames(second) == int(12.5 * RATE)
+    finally:
+        for _, chunk in chunks:
+            chunk.close()
+
+
+def test_short_or_compressed_audio_is_not_split():
+    assert split_wav_at_silence(_wav(_tone(1)), target_seconds=8, max_chunk_bytes=10**9) == []
+    assert split_wav_at_silence(io.BytesIO(b"ID3" + b"\x00" * 100), 8, 10**9) == []
+
+
+def test_spool_base64_matches_b64decode():
+    payload = bytes(range(256)) * 300
+    encoded = base64.b64encode(payload).decode()
+    wrapped = "data:audio/wav;base64," + "\n".join(
+        encoded[i : i + 76] for i in range(0, len(encoded), 76)
+    )
+
+    spool, size = spool_base64(wrapped, max_bytes=10**6, offset=wrapped.index(",") + 1)
+
+    assert size == len(payload)
+    assert spool.read() == payload
+
+
+def test_spooling_enforces_the_size_limit():
+    upload = MagicMock()
+    upload.read = AsyncMock(side_effect=[b"x" * 1024 * 1024, b"x" * 1024 * 1024, b""])
+
+    with pytest.raises(AudioTooLarge):
+        asyncio.run(spool_upload(upload, max_bytes=1024 * 1024 + 1))
+    with pytest.raises(AudioTooLarge):
+        spool_base64(base64.b64encode(b"x" * 100).decode(), max_bytes=99)
+
+
+def test_split_chunks_are_transcribed_and_stitched(monkeypatch):
+    monkeypatch.setattr(Config, "AUDIO_SPLIT_ENABLED", True)
+    monkeypatch.setattr(Config, "AUDIO_SPLIT_TARGET_SECONDS", 8)
+    audio = _wav(_tone(6), _silence(0.5), _tone(6))
+    size = len(audio.getvalue())
+    sizes = []
+
+    async def create(file, **_params):
+        name, chunk, _ = file
+        sizes.append(len(chunk.read()))
+        index = int(name.split("-")[1].split(".")[0])
+        return SimpleNamespace(
+            text=f"part {index}",
+            language="english",
+            duration=6.0,
+            segments=[{"id": 0, "start": 1.0, "end": 2.0, "text": f"part {index}"}],
+            words=None,
+        )
+
+    client = MagicMock()
+    client.audio.transcriptions.create = create
+    params = {"model": "whisper-1", "response_format": "verbose_json"}
+
+    result = asyncio.run(
+        _transcribe_audio(client, audio, size, ".wav", "audio/wav", params, "req-1")
+    )
+
+    assert len(sizes) == 2
+    assert result.text == "part 0 part 1"
+    assert [s["id"] for s in result.segments] == [0, 1]
+    second_start = result.segments[1]["start"] - 1.0
+    assert 6.0 <= second_start <= 6.5
+    assert result.duration == pytest.approx(second_start + 6.0)
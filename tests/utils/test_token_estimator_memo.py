@@ -0,0 +1,109 @@
+import asyncio
+import random
+import threading
+
+import pytest
+import regex
+
+import src.utils.token_estimator as token_estimator
+from src.utils.token_estimator import (
+    CompletionTokenCounter,
+    count_completion_tokens,
+    count_tokens_messages,
+    count_tokens_messages_async,
+)
+
+# cl100k_base pre-tokenizer; tiktoken itself needs network access to load the ranks
+CL100K_PATTERN = regex.compile(
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+"""
+    r"""|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+)
+
+
+class FakeEncoding:
+    """Splits like cl100k, then charges one token per 3 characters of each piece."""
+
+    def __init__(self):
+        self.encoded_chars = 0
+
+    def encode(self, text):
+        self.encoded_chars += len(text)
+        tokens = []
+        for piece in CL100K_PATTERN.findall(text):
+            tokens += range(-(-len(piece) // 3))
+        return tokens
+
+
+@pytest.fixture
+def enc(monkeypatch):
+    fake = FakeEncoding()
+    monkeypatch.setattr(token_estimator, "_get_tiktoken_encoding", lambda: fake)
+    monkeypatch.setattr(token_estimator, "_memo", token_estimator.OrderedDict())
+    return fake
+
+
+def test_repeated_prompts_are_encoded_once(enc):
+    system = {"role": "system", "content": "You are a careful assistant. " * 100}
+    first = count_tokens_messages([system, {"role": "user", "content": "hi"}])
+    encoded = enc.encoded_chars
+
+    second = count_tokens_messages([system, {"role": "user", "content": "hey"}])
+
+    assert second == first
+    assert enc.encoded_chars - encoded == len("hey")
+
+
+def test_memo_is_bounded(enc, monkeypatch):
+    monkeypatch.setattr(token_estimator, "_MEMO_MAX_ENTRIES", 3)
+    for i in range(10):
+        token_estimator.count_tokens_text(f"{i} " + "x" * 300)
+
+    assert len(token_estimator._memo) == 3
+
+
+def test_large_uncached_prompt_is_encoded_off_the_loop(enc, monkeypatch):
+    monkeypatch.setattr(token_estimator, "_OFFLOAD_MIN_CHARS", 1000)
+    threads = []
+    encode = enc.encode
+
+    def recording_encode(text):
+        threads.append(threading.current_thread().name)
+        return encode(text)
+
+    enc.encode = recording_encode
+    messages = [{"role": "user", "content": "lorem ipsum " * 200}]
+
+    result = asyncio.run(count_tokens_messages_async(messages))
+
+    assert result == count_tokens_messages(messages)
+    assert threads[0].startswith("tokenizer")
+    assert len(threads) == 1  # the sync recount hit the memo
+
+
+def test_incremental_completion_count_matches_full_encode(enc):
+    rng = random.Random(7)
+    words = ["hello", "don't", "1234567", ".\n", "  ", "\n\n", "日本語", "foo.bar", "!!", "\t"]
+    for _ in range(50):
+        pieces = rng.randint(0, 1500)
+        text = "".join(rng.choice(words) + rng.choice(["", " ", "  ", "\n"]) for _ in range(pieces))
+        counter = CompletionTokenCounter()
+        i = 0
+        while i < len(text):
+            step = rng.randint(1, 12)
+            counter.add(text[i : i + step])
+            i += step
+
+        assert counter.count() == count_completion_tokens(text)
+
+
+def test_completion_count_stays_linear_without_whitespace(enc):
+    counter = CompletionTokenCounter()
+    longest = 0
+    for _ in range(32_000):
+        counter.add("你好")
+        longest = max(longest, counter._pending_chars)
+
+    assert longest <= CompletionTokenCounter._MAX_PENDING_CHARS
+    assert counter.count() > 0
+    assert enc.encoded_chars == 64_000  # every character encoded exactly once
+    assert len(counter._pending) == 0